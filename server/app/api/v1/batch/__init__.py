@@ -0,0 +1,5 @@
+"""
+Batch API Module
+
+Executes several API requests in one authenticated round trip.
+"""
@@ -0,0 +1,246 @@
+"""
+Batch API Router
+
+POST /api/v1/batch runs several API requests in one round trip, e.g. the
+mobile app's startup fan-out (pets, scans, health events, goals, summaries,
+reminders, subscription status).
+
+The batch is authenticated once: the JWT is validated, the user loaded and
+the Supabase client built a single time, then shared with every
+sub-request through the batch context (see batch_context). Sub-requests are
+dispatched in-process through the whole application, middleware included, so
+each one is rate limited, size and time limited and audit logged, and gets
+exactly the behaviour, validation and errors of the individual endpoint.
+Consecutive GETs run concurrently; writes run alone and in order.
+"""
+
+import asyncio
+import gzip
+import json
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.security import HTTPAuthorizationCredentials
+from starlette.types import ASGIApp, Message, Scope
+from supabase import Client
+
+from app.api.v1.dependencies import get_authenticated_supabase_client
+from app.core.security.jwt_handler import get_current_user, security
+from app.models.core.batch import (
+    SAFE_METHODS,
+    BatchRequest,
+    BatchResponse,
+    BatchSubRequest,
+    BatchSubResponse
+)
+from app.models.core.user import UserResponse
+from app.shared.services.batch_context import BatchContext, batch_scope
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+router = APIRouter(prefix="/batch", tags=["batch"])
+
+# Sub-requests in flight at once within one batch
+MAX_CONCURRENCY = 8
+
+# Response headers not worth echoing per sub-request
+_DROPPED_HEADERS = {"content-length", "content-encoding", "transfer-encoding", "connection", "vary"}
+
+# Batch request headers passed on to sub-requests (client identity for the
+# rate limiter and audit log, host for trusted host checks)
+_FORWARDED_HEADERS = (
+    b"host", b"user-agent", b"x-api-version", b"x-client-version",
+    b"x-forwarded-for", b"x-real-ip"
+)
+
+
+def _query_string(sub: BatchSubRequest) -> bytes:
+    """Merge a query string in the path with the query dict"""
+    _, _, raw_query = sub.path.partition("?")
+    params: List[Tuple[str, Any]] = parse_qsl(raw_query, keep_blank_values=True)
+    for key, value in sub.query.items():
+        if isinstance(value, (list, tuple)):
+            params.extend((key, item) for item in value)
+        elif isinstance(value, bool):
+            params.append((key, "true" if value else "false"))
+        elif value is not None:
+            params.append((key, value))
+    return urlencode(params).encode("latin-1")
+
+
+def _sub_scope(parent: Scope, sub: BatchSubRequest, authorization: bytes, body: bytes) -> Scope:
+    """Build the ASGI scope for a sub-request from the batch request's scope"""
+    path = sub.path.partition("?")[0]
+    headers = [
+        (b"authorization", authorization),
+        (b"accept", b"application/json"),
+    ]
+    for name, value in parent.get("headers", []):
+        if name in _FORWARDED_HEADERS:
+            headers.append((name, value))
+    if body:
+        headers.append((b"content-type", b"application/json"))
+        headers.append((b"content-length", str(len(body)).encode("latin-1")))
+
+    return {
+        "type": "http",
+        "asgi": parent.get("asgi", {"version": "3.0"}),
+        "http_version": parent.get("http_version", "1.1"),
+        "method": sub.method,
+        "scheme": parent.get("scheme", "http"),
+        "server": parent.get("server"),
+        "client": parent.get("client"),
+        "root_path": parent.get("root_path", ""),
+        "path": path,
+        "raw_path": path.encode("utf-8"),
+        "query_string": _query_string(sub),
+        "headers": headers,
+        "state": parent.get("state", {}),
+    }
+
+
+async def _dispatch(
+    app: ASGIApp,
+    parent: Scope,
+    sub: BatchSubRequest,
+    authorization: bytes
+) -> BatchSubResponse:
+    """Run one sub-request through the app and capture the response"""
+    body = json.dumps(sub.body).encode("utf-8") if sub.body is not None else b""
+    request_sent = False
+    status_code = 500
+    compressed = False
+    headers: Dict[str, str] = {}
+    chunks: List[bytes] = []
+
+    async def receive() -> Message:
+        nonlocal request_sent
+        if request_sent:
+            return {"type": "http.disconnect"}
+        request_sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message: Message) -> None:
+        nonlocal status_code, compressed
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+            for name, value in message.get("headers", []):
+                name = name.decode("latin-1").lower()
+                if name == "content-encoding":
+                    compressed = value == b"gzip"
+                elif name not in _DROPPED_HEADERS:
+                    headers[name] = value.decode("latin-1")
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await app(_sub_scope(parent, sub, authorization, body), receive, send)
+    except Exception as e:
+        logger.error(f"[BATCH] {sub.method} {sub.path} failed: {type(e).__name__}: {e}")
+        return BatchSubResponse(id=sub.id, status=500, body={"detail": "Internal server error"})
+
+    raw = b"".join(chunks)
+    if compressed:
+        # JSONCompressionMiddleware gzips JSON whatever the client accepts
+        raw = gzip.decompress(raw)
+    content: Optional[Any] = None
+    if raw:
+        if headers.get("content-type", "").startswith("application/json"):
+            content = json.loads(raw)
+        else:
+            content = raw.decode("utf-8", errors="replace")
+    headers.pop("content-type", None)
+    return BatchSubResponse(id=sub.id, status=status_code, headers=headers, body=content)
+
+
+def _waves(requests: List[BatchSubRequest]) -> List[List[BatchSubRequest]]:
+    """
+    Group sub-requests into waves that can run concurrently
+
+    Consecutive safe requests share a wave; each write is a wave of its own,
+    so every request still sees the effects of the writes listed before it.
+    """
+    waves: List[List[BatchSubRequest]] = []
+    for sub in requests:
+        if sub.method in SAFE_METHODS and waves and waves[-1][0].method in SAFE_METHODS:
+            waves[-1].append(sub)
+        else:
+            waves.append([sub])
+    return waves
+
+
+async def execute_batch(
+    app: ASGIApp,
+    parent: Scope,
+    context: BatchContext,
+    requests: List[BatchSubRequest],
+    max_concurrency: int = MAX_CONCURRENCY
+) -> List[BatchSubResponse]:
+    """
+    Execute sub-requests within one batch context
+
+    Args:
+        app: ASGI app serving the sub-requests (the application, so its
+             middleware applies to every sub-request)
+        parent: Scope of the batch request
+        context: Authentication shared by the sub-requests
+        requests: Sub-requests in client order
+        max_concurrency: Sub-requests in flight at once
+
+    Returns:
+        Sub-responses in the order of the requests
+    """
+    authorization = f"Bearer {context.access_token}".encode("latin-1")
+    semaphore = asyncio.Semaphore(max_concurrency)
+    results: Dict[str, BatchSubResponse] = {}
+
+    async def run(sub: BatchSubRequest) -> None:
+        async with semaphore:
+            results[sub.id] = await _dispatch(app, parent, sub, authorization)
+
+    with batch_scope(context):
+        for wave in _waves(requests):
+            await asyncio.gather(*(run(sub) for sub in wave))
+            if wave[0].method not in SAFE_METHODS:
+                # A write may have changed which pets the user owns
+                context.owned_pets.clear()
+
+    return [results[sub.id] for sub in requests]
+
+
+@router.post("", response_model=BatchResponse)
+async def execute_batch_request(
+    batch: BatchRequest,
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: UserResponse = Depends(get_current_user),
+    supabase: Client = Depends(get_authenticated_supabase_client)
+):
+    """
+    Execute several API requests in one authenticated round trip
+
+    Each sub-request behaves exactly like the same call made on its own and
+    reports its own status; one failing sub-request does not fail the batch.
+
+    Args:
+        batch: Sub-requests (id, method, path, query, body)
+        request: The batch request (its app serves the sub-requests)
+        credentials: Bearer token shared with the sub-requests
+        current_user: Current authenticated user
+        supabase: Authenticated Supabase client shared with the sub-requests
+
+    Returns:
+        One response per sub-request, in request order
+    """
+    context = BatchContext(
+        access_token=credentials.credentials,
+        user=current_user,
+        supabase=supabase
+    )
+    responses = await execute_batch(request.app, request.scope, context, batch.requests)
+    logger.info(
+        f"[BATCH] {len(responses)} sub-requests for user {current_user.id}: "
+        f"{sum(1 for r in responses if r.status < 400)} succeeded"
+    )
+    return BatchResponse(responses=responses)
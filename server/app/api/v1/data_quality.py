@@ -8,6 +8,7 @@ from typing import List, Dict, Any, Optional
 
 from app.core.database import get_db
 from app.services.data_quality_service import DataQualityService, DataQualityMetrics
+from app.services.food_quality_catalog_service import FoodQualityCatalogService
 from app.models.nutrition.food_items import FoodItemResponse
 import logging
 import asyncio
@@ -24,6 +25,12 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Batch assessment is columnar, so the cap only bounds the IN list size
+MAX_BATCH_ITEMS = 500
+
+# Live scoring reads nutritional_info page by page; beyond this use stored scores
+MAX_LIVE_SCORING_ITEMS = 5000
+
 
 @router.get("/assess/{food_item_id}", response_model=Dict[str, Any])
 @handle_errors("assess_food_item_quality")
@@ -86,38 +93,28 @@ async def assess_multiple_food_items_quality(
     Returns:
         List of data quality assessments
     """
-    if len(food_item_ids) > 50:
-        raise HTTPException(status_code=400, detail="Maximum 50 items allowed per batch")
+    if len(food_item_ids) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Maximum {MAX_BATCH_ITEMS} items allowed per batch")
         
     # Fetch food items data using query builder
     # Note: QueryBuilderService doesn't support .in_() yet, so we use direct query for this case
     response = await execute_async(
-        lambda: db.table('food_items').select('*').in_('id', food_item_ids).execute()
+        lambda: db.table('food_items')
+            .select('id, name, brand, barcode, nutritional_info')
+            .in_('id', food_item_ids)
+            .execute()
     )
     
     results = handle_empty_response(response.data)
     if not results:
         raise HTTPException(status_code=404, detail="No food items found")
-            
+    
+    # Score all items in one columnar pass
+    all_metrics = DataQualityService.assess_data_quality_batch(results)
+    
     assessments = []
     
-    for result in results:
-        # Convert to dictionary format
-        food_item_data = {
-            'id': str(result['id']),
-            'name': result['name'],
-            'brand': result['brand'],
-            'barcode': result['barcode'],
-            'category': result['category'],
-            'nutritional_info': result['nutritional_info'] or {},
-            'data_completeness': result['data_completeness'],
-            'created_at': result['created_at'],
-            'updated_at': result['updated_at']
-        }
-        
-        # Assess data quality
-        metrics = DataQualityService.assess_data_quality(food_item_data)
-        
+    for result, metrics in zip(results, all_metrics):
         # Format response with item info
         assessment = DataQualityService.format_quality_summary(metrics)
         assessment['food_item_id'] = str(result['id'])
@@ -132,71 +129,33 @@ async def assess_multiple_food_items_quality(
 @router.get("/stats/overview", response_model=Dict[str, Any])
 @handle_errors("get_quality_statistics_overview")
 async def get_quality_statistics_overview(
-    limit: int = Query(1000, ge=1, le=5000, description="Number of items to analyze"),
+    limit: Optional[int] = Query(
+        None, ge=1, le=MAX_LIVE_SCORING_ITEMS,
+        description="Score this many items live instead of using stored scores"
+    ),
     db = Depends(get_db)
 ):
     """
     Get overall data quality statistics
     
+    By default the statistics are aggregated in the database from the
+    materialized quality scores, so nothing is re-scored. With limit, the
+    first items of the catalog are scored live instead (a page at a time).
+    
     Args:
-        limit: Maximum number of food items to analyze
+        limit: Number of food items to score live (None for stored scores)
         db: Database session
         
     Returns:
         Overall quality statistics
     """
-    # Fetch sample of food items using query builder
-    query_builder = QueryBuilderService(db, 'food_items')
-    query_builder.select(['id', 'name', 'brand', 'barcode', 'nutritional_info', 'data_completeness'])
-    result = await query_builder.with_ordering('updated_at', desc=True).with_limit(limit).execute()
-    
-    results = handle_empty_response(result["data"])
-    
-    if not results:
-        return {
-            "total_items": 0,
-            "quality_distribution": {"excellent": 0, "good": 0, "fair": 0, "poor": 0},
-            "average_score": 0.0,
-            "ingredients_coverage": 0.0,
-            "nutritional_coverage": 0.0
-        }
-    
-    # Analyze quality distribution
-    quality_counts = {"excellent": 0, "good": 0, "fair": 0, "poor": 0}
-    total_score = 0.0
-    total_items = len(results)
-    items_with_ingredients = 0
-    items_with_nutritional = 0
-    
-    for result in results:
-        food_item_data = {
-            'id': str(result['id']),
-            'name': result['name'],
-            'brand': result['brand'],
-            'barcode': result['barcode'],
-            'nutritional_info': result['nutritional_info'] or {}
-        }
-        
-        metrics = DataQualityService.assess_data_quality(food_item_data)
-        
-        # Count quality levels
-        quality_counts[metrics.level.value] += 1
-        total_score += metrics.overall_score
-        
-        # Count coverage
-        if metrics.ingredients_count > 0:
-            items_with_ingredients += 1
-        if metrics.nutritional_fields_count > 0:
-            items_with_nutritional += 1
-    
-    return {
-        "total_items": total_items,
-        "quality_distribution": quality_counts,
-        "average_score": round(total_score / total_items, 3),
-        "ingredients_coverage": round(items_with_ingredients / total_items, 3),
-        "nutritional_coverage": round(items_with_nutritional / total_items, 3),
-        "sample_size": limit
-    }
+    catalog_service = FoodQualityCatalogService(db)
+    if limit is None:
+        stats = await catalog_service.stored_statistics()
+    else:
+        stats = await catalog_service.compute_statistics(limit=limit)
+    stats["sample_size"] = stats["total_items"]
+    return stats
 
 
 @router.get("/recommendations/{food_item_id}", response_model=Dict[str, Any])
@@ -215,19 +174,36 @@ async def get_quality_recommendations(
     Returns:
         Quality improvement recommendations
     """
-    # First assess the item
-    assessment = await assess_food_item_quality(food_item_id, db)
+    response = await execute_async(
+        lambda: db.table('food_items')
+            .select('id, name, brand, barcode, nutritional_info, quality_score, quality_level, quality_version')
+            .eq('id', food_item_id)
+            .limit(1)
+            .execute()
+    )
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Food item not found")
     
-    # Extract recommendations
-    recommendations = assessment.get('recommendations', [])
+    result = response.data[0]
+    result['nutritional_info'] = result.get('nutritional_info') or {}
+    metrics = DataQualityService.assess_data_quality(result)
+    
+    # Prefer the materialized score when it was computed with the current weights
+    if (result.get('quality_score') is not None
+            and result.get('quality_version') == DataQualityService.scoring_version()):
+        current_score = float(result['quality_score'])
+        current_level = result['quality_level']
+    else:
+        current_score = round(metrics.overall_score, 3)
+        current_level = metrics.level.value
     
     return {
         "food_item_id": food_item_id,
-        "current_quality_level": assessment.get('quality_level'),
-        "current_score": assessment.get('overall_score'),
-        "recommendations": recommendations,
-        "priority": "high" if assessment.get('overall_score', 0) < 0.5 else 
-                   "medium" if assessment.get('overall_score', 0) < 0.7 else "low"
+        "current_quality_level": current_level,
+        "current_score": current_score,
+        "recommendations": DataQualityService.get_quality_recommendations(metrics),
+        "priority": "high" if current_score < 0.5 else 
+                   "medium" if current_score < 0.7 else "low"
     }
 
 
@@ -241,44 +217,32 @@ async def get_low_quality_items(
     """
     Get food items with quality scores below threshold
     
+    Served from the materialized scores of the current scoring version,
+    without re-scoring; /assess/{food_item_id} has the full breakdown.
+    
     Args:
         threshold: Quality score threshold (0.0 to 1.0)
         limit: Maximum number of results
         db: Database session
         
     Returns:
-        List of low-quality food items with assessments
+        List of low-quality food items with their stored score and level
     """
-    # Fetch food items with low data completeness
-    # Note: QueryBuilderService doesn't support .lt() yet, so we use direct query for this case
-    response = await execute_async(
-        lambda: db.table('food_items').select('id, name, brand, barcode, category, nutritional_info, data_completeness').lt('data_completeness', threshold).order('data_completeness', desc=False).limit(limit).execute()
+    catalog_service = FoodQualityCatalogService(db)
+    results = handle_empty_response(
+        await catalog_service.get_low_quality_items(threshold, limit)
     )
     
-    results = handle_empty_response(response.data)
-    
-    low_quality_items = []
-    
-    for result in results:
-        food_item_data = {
-            'id': str(result['id']),
-            'name': result['name'],
+    return [
+        {
+            'food_item_id': str(result['id']),
+            'food_name': result['name'],
             'brand': result['brand'],
             'barcode': result['barcode'],
             'category': result['category'],
-            'nutritional_info': result['nutritional_info'] or {}
+            'overall_score': float(result['quality_score']),
+            'quality_level': result['quality_level'],
+            'legacy_completeness': result['data_completeness']
         }
-        
-        metrics = DataQualityService.assess_data_quality(food_item_data)
-        
-        # Only include if still below threshold with new calculation
-        if metrics.overall_score < threshold:
-            assessment = DataQualityService.format_quality_summary(metrics)
-            assessment['food_item_id'] = str(result['id'])
-            assessment['food_name'] = result['name']
-            assessment['brand'] = result['brand']
-            assessment['legacy_completeness'] = result['data_completeness']
-            
-            low_quality_items.append(assessment)
-    
-    return low_quality_items
+        for result in results
+    ]
@@ -53,6 +53,12 @@ def get_authenticated_supabase_client(
         This is a limitation of our current architecture.
     """
     from app.shared.services.supabase_auth_service import SupabaseAuthService
+    from app.shared.services.batch_context import get_batch_context
+    
+    # Sub-requests of a batch share the client built for the batch
+    batch = get_batch_context(credentials.credentials)
+    if batch is not None:
+        return batch.supabase
     
     # Use centralized service to create authenticated client
     # This follows Supabase Python 2.9.1 documentation exactly
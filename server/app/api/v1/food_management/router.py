@@ -32,10 +32,14 @@ from app.shared.services.data_transformation_service import DataTransformationSe
 from app.shared.services.query_result_parser import QueryResultParser
 from app.shared.services.id_generation_service import IDGenerationService
 from app.shared.decorators.error_handler import handle_errors
+from app.services.data_quality_service import DataQualityService
 
 router = APIRouter(prefix="/foods", tags=["food-management"])
 logger = get_logger(__name__)
 
+# FoodItemResponse fields that are not food_items columns
+FOOD_ITEM_RESPONSE_EXCLUDE = ("description",)
+
 
 @router.get("/recent", response_model=List[FoodItemResponse])
 @handle_errors("get_recent_foods")
@@ -56,7 +60,7 @@ async def get_recent_foods(
         List of recent food items
     """
     # Get recent food items using query builder
-    query_builder = QueryBuilderService(supabase, "food_items")
+    query_builder = QueryBuilderService.for_model(supabase, "food_items", FoodItemResponse, exclude=FOOD_ITEM_RESPONSE_EXCLUDE)
     result = await query_builder.with_ordering("created_at", desc=True)\
         .with_limit(limit)\
         .execute()
@@ -158,7 +162,7 @@ async def search_foods(
             
             # Search in name field (primary search) - handles full product names
             # ILIKE is case-insensitive: matches "Weruva", "WERUVA", "weruva", etc.
-            query_name = QueryBuilderService(supabase, "food_items", include_count=False)
+            query_name = QueryBuilderService.for_model(supabase, "food_items", FoodItemResponse, exclude=FOOD_ITEM_RESPONSE_EXCLUDE)
             if category:
                 query_name.with_filters({"category": category})
             if brand:
@@ -175,7 +179,7 @@ async def search_foods(
             
             # Search in brand field (for brand-only searches)
             # Case-insensitive: "Weruva", "WERUVA", "weruva" all match
-            query_brand = QueryBuilderService(supabase, "food_items", include_count=False)
+            query_brand = QueryBuilderService.for_model(supabase, "food_items", FoodItemResponse, exclude=FOOD_ITEM_RESPONSE_EXCLUDE)
             if category:
                 query_brand.with_filters({"category": category})
             if brand:
@@ -190,29 +194,7 @@ async def search_foods(
                     all_results.append(item)
                     seen_ids.add(item["id"])
             
-            # Search in description field (if exists)
-            # Case-insensitive search in description
-            # Note: description might not exist in all records, so we'll try it
-            try:
-                query_desc = QueryBuilderService(supabase, "food_items", include_count=False)
-                if category:
-                    query_desc.with_filters({"category": category})
-                if brand:
-                    # Brand filter is also case-insensitive via ILIKE
-                    query_desc.with_ilike("brand", brand)
-                # Case-insensitive search in description field
-                query_desc.with_ilike("description", search_term)
-                result_desc = await query_desc.with_pagination(limit, 0, include_count=False).execute()
-                
-                for item in result_desc.get("data", []):
-                    if item["id"] not in seen_ids:
-                        all_results.append(item)
-                        seen_ids.add(item["id"])
-            except Exception as e:
-                # Description field might not be searchable or might not exist
-                logger.debug(f"Description search not available: {e}")
-            
-            # Sort results by relevance (name matches first, then brand, then description)
+            # Sort results by relevance (name matches first, then brand)
             # All comparisons are case-insensitive (using .lower()) to handle mixed case in database
             # This ensures consistent sorting regardless of how data is stored (e.g., "Weruva" vs "WERUVA")
             def sort_key(item):
@@ -250,7 +232,15 @@ async def search_foods(
             }
         else:
             # No search query, just filters
-            query_builder = QueryBuilderService(supabase, "food_items", include_count=True)
+            # Estimated count: exact counts over the whole catalog are slow
+            query_builder = QueryBuilderService.for_model(
+                supabase,
+                "food_items",
+                FoodItemResponse,
+                exclude=FOOD_ITEM_RESPONSE_EXCLUDE,
+                include_count=True,
+                count_method=QueryBuilderService.ESTIMATED_COUNT
+            )
             filters = {}
             if category:
                 filters["category"] = category
@@ -406,7 +396,7 @@ async def get_food_by_barcode(
         logger.debug(f"Trying barcode search strategy: '{search_barcode}'")
         
         # Query food_items table by barcode using query builder
-        query_builder = QueryBuilderService(supabase, "food_items")
+        query_builder = QueryBuilderService.for_model(supabase, "food_items", FoodItemResponse, exclude=FOOD_ITEM_RESPONSE_EXCLUDE)
         query_result = await query_builder.with_filters({"barcode": search_barcode}).with_limit(1).execute()
         
         if query_result.get("data"):
@@ -419,7 +409,7 @@ async def get_food_by_barcode(
     # This helps catch barcodes stored with different formatting
     if not result:
         logger.debug(f"Trying case-insensitive partial barcode search for: '{cleaned_barcode}'")
-        query_builder = QueryBuilderService(supabase, "food_items")
+        query_builder = QueryBuilderService.for_model(supabase, "food_items", FoodItemResponse, exclude=FOOD_ITEM_RESPONSE_EXCLUDE)
         query_builder.with_ilike("barcode", cleaned_barcode)
         query_result = await query_builder.with_limit(1).execute()
         
@@ -431,7 +421,7 @@ async def get_food_by_barcode(
         # Also try with normalized barcode if different
         if not result and normalized_barcode and normalized_barcode != cleaned_barcode:
             logger.debug(f"Trying case-insensitive partial search with normalized barcode: '{normalized_barcode}'")
-            query_builder = QueryBuilderService(supabase, "food_items")
+            query_builder = QueryBuilderService.for_model(supabase, "food_items", FoodItemResponse, exclude=FOOD_ITEM_RESPONSE_EXCLUDE)
             query_builder.with_ilike("barcode", normalized_barcode)
             query_result = await query_builder.with_limit(1).execute()
             
@@ -521,6 +511,7 @@ async def create_food_item_with_slash(
     # Prepare data for insertion using data transformation service
     item_data = DataTransformationService.model_to_dict_with_nested(food_item)
     item_data["id"] = IDGenerationService.generate_uuid()
+    item_data.update(DataQualityService.quality_columns(item_data))
     
     # Insert new food item using service role client to bypass RLS
     from app.core.database import get_supabase_service_role_client
@@ -579,7 +570,9 @@ async def update_food_item(
     """
     # Check if food item exists using query builder
     query_builder = QueryBuilderService(supabase, "food_items")
-    existing_result = await query_builder.select(["id"]).with_filters({"id": food_id}).with_limit(1).execute()
+    existing_result = await query_builder.select(
+        ["id", "name", "brand", "barcode", "nutritional_info"]
+    ).with_filters({"id": food_id}).with_limit(1).execute()
     
     if not existing_result["data"]:
         raise HTTPException(status_code=404, detail="Food item not found")
@@ -587,6 +580,14 @@ async def update_food_item(
     # Prepare update data using data transformation service
     update_data = DataTransformationService.model_to_dict_with_nested(food_update, exclude_none=True)
     
+    # Keep the materialized quality score in step with the merged row
+    existing_item = QueryResultParser.parse_json_fields(
+        existing_result["data"][0],
+        ["nutritional_info"],
+        defaults={"nutritional_info": {}}
+    )
+    update_data.update(DataQualityService.quality_columns({**existing_item, **update_data}))
+    
     # Update food item using centralized service
     from app.core.database import get_supabase_service_role_client
     service_supabase = get_supabase_service_role_client()
@@ -675,7 +676,7 @@ async def get_food_item(
         Food item details
     """
     # Get food item using query builder
-    query_builder = QueryBuilderService(supabase, "food_items")
+    query_builder = QueryBuilderService.for_model(supabase, "food_items", FoodItemResponse, exclude=FOOD_ITEM_RESPONSE_EXCLUDE)
     result = await query_builder.with_filters({"id": food_id}).with_limit(1).execute()
     
     if not result["data"]:
@@ -2,16 +2,23 @@
 GDPR compliance router
 """
 
-from fastapi import APIRouter, HTTPException, Depends, status, Response
+from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi.responses import StreamingResponse
 from app.models.core.user import UserResponse
 from app.core.security.jwt_handler import get_current_user
 from app.services.gdpr_service import GDPRService
+from app.services.gdpr_retention_worker import GDPRDeletionResumeWorker, GDPRRetentionWorker
 from app.core.config import settings
 from app.utils.logging_config import get_logger
 
 router = APIRouter()
 logger = get_logger(__name__)
 
+# Started from the app lifespan when GDPR_RETENTION_WORKER_ENABLED and
+# GDPR_DELETION_RESUME_ENABLED are set
+gdpr_retention_worker = GDPRRetentionWorker()
+gdpr_deletion_resume_worker = GDPRDeletionResumeWorker()
+
 @router.get("/export")
 async def export_user_data(
     current_user: UserResponse = Depends(get_current_user)
@@ -19,7 +26,7 @@ async def export_user_data(
     """
     Export all user data (GDPR Article 20 - Right to data portability)
     
-    Returns a ZIP file containing all user data in JSON format
+    Streams a ZIP file containing all user data as NDJSON files
     """
     try:
         gdpr_service = GDPRService()
@@ -31,16 +38,21 @@ async def export_user_data(
                 detail="Data export is currently disabled"
             )
         
-        # Export user data
-        zip_data = gdpr_service.export_user_data(current_user.id)
+        # Read the first page before sending headers so a failing database
+        # still gets a 500 instead of a truncated download
+        export_stream = gdpr_service.stream_user_data_export(current_user.id)
+        first_chunk = await anext(export_stream)
+        
+        async def body():
+            yield first_chunk
+            async for chunk in export_stream:
+                yield chunk
         
-        # Return ZIP file
-        return Response(
-            content=zip_data,
+        return StreamingResponse(
+            body(),
             media_type="application/zip",
             headers={
-                "Content-Disposition": f"attachment; filename=user_data_{current_user.id}.zip",
-                "Content-Type": "application/zip"
+                "Content-Disposition": f"attachment; filename=user_data_{current_user.id}.zip"
             }
         )
         
@@ -3,7 +3,7 @@ Health Events API Router
 CRUD operations for pet health event tracking
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from fastapi.security import HTTPAuthorizationCredentials
 from typing import List, Optional
 
@@ -22,6 +22,7 @@ from app.models.health.health_event import (
 )
 from app.services import HealthEventService
 from app.shared.services.pet_authorization import verify_pet_ownership
+from app.shared.services.pagination_service import PaginationService
 from app.shared.services.response_utils import handle_empty_response
 
 router = APIRouter(prefix="/health-events", tags=["health-events"])
@@ -62,13 +63,19 @@ async def get_pet_health_events(
     pet_id: str,
     limit: int = Query(20, ge=1, le=100, description="Maximum results (default optimized for mobile)"),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (replaces offset)"),
     category: Optional[str] = Query(None),
     current_user: UserResponse = Depends(get_current_user),
     supabase: Client = Depends(get_authenticated_supabase_client)
 ):
     """
     Get health events for a specific pet with optional filtering
+    
+    Newest first. Pass next_cursor from the response as cursor to fetch the
+    following page; total is an estimate for large histories.
     """
+    PaginationService.validate_cursor(cursor, "event_date")
+    
     # CRITICAL: Print immediately to verify route is being hit
     import sys
     import logging
@@ -107,7 +114,7 @@ async def get_pet_health_events(
             try:
                 category_enum = HealthEventCategory(category)
                 events = await HealthEventService.get_health_events_by_category(
-                    pet_id, category_enum.value, current_user.id, supabase, limit, offset
+                    pet_id, category_enum.value, current_user.id, supabase, limit, offset, cursor
                 )
             except ValueError:
                 from app.shared.services.user_friendly_error_messages import UserFriendlyErrorMessages
@@ -118,7 +125,7 @@ async def get_pet_health_events(
         else:
             logger.info(f"📞 [get_pet_health_events] Calling service.get_health_events_for_pet()")
             events = await HealthEventService.get_health_events_for_pet(
-                pet_id, current_user.id, supabase, limit, offset
+                pet_id, current_user.id, supabase, limit, offset, cursor
             )
             logger.info(f"📥 [get_pet_health_events] Service returned {len(events)} events")
 
@@ -164,15 +171,18 @@ async def get_pet_health_events(
         events=health_event_responses,
         total=total,
         limit=limit,
-        offset=offset
+        offset=0 if cursor else offset,
+        next_cursor=PaginationService.next_cursor(events, limit, "event_date")
     )
 
 
 @router.get("/pet/{pet_id}/mobile", response_model=List[dict])
 async def get_pet_health_events_mobile(
     pet_id: str,
+    response: Response,
     limit: int = Query(20, ge=1, le=50, description="Maximum results (mobile optimized)"),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
     current_user: UserResponse = Depends(get_current_user),
     supabase: Client = Depends(get_authenticated_supabase_client)
 ):
@@ -180,8 +190,11 @@ async def get_pet_health_events_mobile(
     Mobile-optimized endpoint to get health events with minimal fields.
     
     Returns only essential fields (id, pet_id, event_category, event_date, severity, created_at)
-    for faster loading on mobile devices with limited bandwidth.
+    for faster loading on mobile devices with limited bandwidth. The
+    X-Next-Cursor header holds the cursor for the following page.
     """
+    PaginationService.validate_cursor(cursor, "event_date")
+    
     # Verify pet ownership
     await verify_pet_ownership(pet_id, current_user.id, supabase)
     
@@ -194,11 +207,12 @@ async def get_pet_health_events_mobile(
         default_columns=["id", "pet_id", "event_category", "event_date", "severity", "created_at"]
     )
     result = await query_builder.with_filters({"pet_id": pet_id, "user_id": current_user.id})\
-        .with_ordering("event_date", desc=True)\
-        .with_limit(limit)\
+        .with_cursor(limit, cursor, order_by="event_date")\
         .execute()
     
-    return handle_empty_response(result["data"])
+    events = handle_empty_response(result["data"])
+    PaginationService.set_next_cursor_header(response, events, limit, "event_date")
+    return events
 
 
 @router.get("/{event_id}", response_model=HealthEventResponse)
@@ -3,7 +3,7 @@ Medication Reminders API Router
 CRUD operations for medication reminder scheduling
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from fastapi.security import HTTPAuthorizationCredentials
 from typing import List, Optional
 
@@ -22,6 +22,7 @@ from app.models.health.medication_reminder import (
 )
 from app.services import MedicationReminderService
 from app.shared.services.pet_authorization import verify_pet_ownership
+from app.shared.services.pagination_service import PaginationService
 
 router = APIRouter(prefix="/medication-reminders", tags=["medication-reminders"])
 
@@ -74,20 +75,25 @@ async def get_pet_medication_reminders(
     pet_id: str,
     limit: int = Query(20, ge=1, le=100, description="Maximum results (default optimized for mobile)"),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (replaces offset)"),
     active_only: bool = Query(True),
     current_user: UserResponse = Depends(get_current_user),
     supabase: Client = Depends(get_authenticated_supabase_client)
 ):
     """
     Get medication reminders for a specific pet with optional filtering
+    
+    Newest first. Pass next_cursor from the response as cursor to fetch the
+    following page.
     """
+    PaginationService.validate_cursor(cursor)
     
     # Verify pet ownership using centralized service
     await verify_pet_ownership(pet_id, current_user.id, supabase)
     
     # Get reminders using service
     reminders = await MedicationReminderService.get_medication_reminders_for_pet(
-        pet_id, current_user.id, supabase, limit, offset, active_only
+        pet_id, current_user.id, supabase, limit, offset, active_only, cursor
     )
 
     # Get total count
@@ -99,15 +105,18 @@ async def get_pet_medication_reminders(
         reminders=reminders,
         total=total,
         limit=limit,
-        offset=offset
+        offset=0 if cursor else offset,
+        next_cursor=PaginationService.next_cursor(reminders, limit)
     )
 
 
 @router.get("/pet/{pet_id}/mobile", response_model=List[dict])
 async def get_pet_medication_reminders_mobile(
     pet_id: str,
+    response: Response,
     limit: int = Query(20, ge=1, le=50, description="Maximum results (mobile optimized)"),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
     active_only: bool = Query(True),
     current_user: UserResponse = Depends(get_current_user),
     supabase: Client = Depends(get_authenticated_supabase_client)
@@ -116,8 +125,11 @@ async def get_pet_medication_reminders_mobile(
     Mobile-optimized endpoint to get medication reminders with minimal fields.
     
     Returns only essential fields (id, pet_id, medication_name, frequency, is_active, created_at)
-    for faster loading on mobile devices with limited bandwidth.
+    for faster loading on mobile devices with limited bandwidth. The
+    X-Next-Cursor header holds the cursor for the following page.
     """
+    PaginationService.validate_cursor(cursor)
+    
     # Verify pet ownership
     await verify_pet_ownership(pet_id, current_user.id, supabase)
     
@@ -135,11 +147,12 @@ async def get_pet_medication_reminders_mobile(
         filters["is_active"] = True
     
     result = await query_builder.with_filters(filters)\
-        .with_ordering("created_at", desc=True)\
-        .with_limit(limit)\
+        .with_cursor(limit, cursor)\
         .execute()
     
-    return handle_empty_response(result["data"])
+    reminders = handle_empty_response(result["data"])
+    PaginationService.set_next_cursor_header(response, reminders, limit)
+    return reminders
 
 
 @router.get("/health-event/{health_event_id}", response_model=MedicationReminderListResponse)
@@ -147,12 +160,17 @@ async def get_health_event_medication_reminders(
     health_event_id: str,
     limit: int = Query(20, ge=1, le=100, description="Maximum results (default optimized for mobile)"),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (replaces offset)"),
     current_user: UserResponse = Depends(get_current_user),
     supabase: Client = Depends(get_authenticated_supabase_client)
 ):
     """
     Get medication reminders for a specific health event
+    
+    Newest first. Pass next_cursor from the response as cursor to fetch the
+    following page.
     """
+    PaginationService.validate_cursor(cursor)
     # Verify health event ownership
     from app.shared.utils.async_supabase import execute_async
     health_event_response = await execute_async(
@@ -168,7 +186,7 @@ async def get_health_event_medication_reminders(
     
     # Get reminders using service
     reminders = await MedicationReminderService.get_medication_reminders_for_health_event(
-        health_event_id, current_user.id, supabase, limit, offset
+        health_event_id, current_user.id, supabase, limit, offset, cursor
     )
 
     # Get total count
@@ -180,7 +198,8 @@ async def get_health_event_medication_reminders(
         reminders=reminders,
         total=total,
         limit=limit,
-        offset=offset
+        offset=0 if cursor else offset,
+        next_cursor=PaginationService.next_cursor(reminders, limit)
     )
 
 
@@ -3,11 +3,10 @@ Push notification router for handling APNs integration
 Handles device token registration, notification sending, and management
 """
 
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Dict, Any, Optional
 import json
-import asyncio
 from datetime import datetime, timedelta
 from app.shared.services.datetime_service import DateTimeService
 from pydantic import BaseModel
@@ -19,6 +18,8 @@ from app.api.v1.dependencies import get_authenticated_supabase_client
 from app.utils.logging_config import get_logger
 from supabase import Client
 from app.services.push_notification_service import PushNotificationService
+from app.services.notification_scheduler import NotificationScheduler, ScheduledNotification
+from app.services.health.medication_reminder_dispatcher import MedicationReminderDispatcher
 
 logger = get_logger(__name__)
 
@@ -37,6 +38,11 @@ except Exception as e:
     logger.warning("Push notifications will not be available until configuration is fixed")
     push_service = None
 
+# Workers sending through push_service (started in main.py): the durable
+# queue for notifications sent later, and server-side medication reminders
+notification_scheduler = NotificationScheduler(push_service) if push_service is not None else None
+medication_reminder_dispatcher = MedicationReminderDispatcher(push_service) if push_service is not None else None
+
 
 class DeviceTokenRequest(BaseModel):
     """Request model for device token registration"""
@@ -159,16 +165,16 @@ async def register_device_token_anonymous(
 @router.post("/send")
 async def send_push_notification(
     request: SendNotificationRequest,
-    background_tasks: BackgroundTasks,
     current_user: UserResponse = Depends(get_current_user)
 ):
     """
     Send push notification to device
     
+    A "delay" in the payload queues the notification instead of sending it now.
+    
     Args:
         request: SendNotificationRequest containing device_token and payload
         current_user: Current authenticated user
-        background_tasks: Background tasks handler
         
     Returns:
         Success message
@@ -228,12 +234,14 @@ async def send_push_notification(
         
         if delay > 0:
             # Schedule notification for later
-            background_tasks.add_task(
-                send_delayed_notification,
-                device_token,
-                payload,
-                delay
-            )
+            await notification_scheduler.schedule([
+                ScheduledNotification(
+                    device_token=device_token,
+                    payload=payload,
+                    delay_seconds=delay,
+                    user_id=current_user.id
+                )
+            ])
             return {"message": "Notification scheduled successfully"}
         else:
             # Send immediately
@@ -275,9 +283,11 @@ async def cancel_all_notifications(
             )
         
         # Cancel all scheduled notifications for this user
-        await push_service.cancel_user_notifications(current_user.id)
+        cancelled = await notification_scheduler.cancel_user_notifications(current_user.id)
         
-        return {"message": "All notifications cancelled successfully"}
+        return {"message": "All notifications cancelled successfully", "cancelled": cancelled}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to cancel notifications: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to cancel notifications: {str(e)}")
@@ -285,15 +295,15 @@ async def cancel_all_notifications(
 
 @router.post("/schedule-engagement")
 async def schedule_engagement_notifications(
-    background_tasks: BackgroundTasks,
     current_user: UserResponse = Depends(get_current_user)
 ):
     """
     Schedule engagement reminder notifications
     
+    Calling this again moves the user's pending reminders instead of adding more.
+    
     Args:
         current_user: Current authenticated user
-        background_tasks: Background tasks handler
         
     Returns:
         Success message
@@ -350,21 +360,33 @@ async def schedule_engagement_notifications(
             logger.error(f"Invalid monthly delay: {monthly_delay}")
             monthly_delay = min(monthly_delay, MAX_NOTIFICATION_DELAY_SECONDS)
         
-        background_tasks.add_task(
-            send_delayed_notification,
-            current_user.device_token,
-            weekly_payload,
-            weekly_delay
-        )
+        if notification_scheduler is None:
+            from app.shared.services.user_friendly_error_messages import UserFriendlyErrorMessages
+            raise HTTPException(
+                status_code=503, 
+                detail=UserFriendlyErrorMessages.get_user_friendly_message("service unavailable")
+            )
         
-        background_tasks.add_task(
-            send_delayed_notification,
-            current_user.device_token,
-            monthly_payload,
-            monthly_delay
-        )
+        await notification_scheduler.schedule([
+            ScheduledNotification(
+                device_token=current_user.device_token,
+                payload=weekly_payload,
+                delay_seconds=weekly_delay,
+                user_id=current_user.id,
+                dedupe_key=f"engagement:weekly:{current_user.id}"
+            ),
+            ScheduledNotification(
+                device_token=current_user.device_token,
+                payload=monthly_payload,
+                delay_seconds=monthly_delay,
+                user_id=current_user.id,
+                dedupe_key=f"engagement:monthly:{current_user.id}"
+            )
+        ])
         
         return {"message": "Engagement notifications scheduled successfully"}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to schedule notifications: {str(e)}")
 
@@ -373,7 +395,6 @@ async def schedule_engagement_notifications(
 async def send_birthday_notification(
     pet_name: str,
     pet_id: str,
-    background_tasks: BackgroundTasks,
     current_user: UserResponse = Depends(get_current_user)
 ):
     """
@@ -383,7 +404,6 @@ async def send_birthday_notification(
         pet_name: Name of the pet
         pet_id: ID of the pet
         current_user: Current authenticated user
-        background_tasks: Background tasks handler
         
     Returns:
         Success message
@@ -425,40 +445,3 @@ async def send_birthday_notification(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to send birthday notification: {str(e)}")
 
-
-async def send_delayed_notification(device_token: str, payload: Dict[str, Any], delay: int):
-    """
-    Send notification after specified delay
-    
-    Args:
-        device_token: Target device token
-        payload: Notification payload
-        delay: Delay in seconds (integer)
-    """
-    # Validate and clamp delay to prevent overflow errors
-    # This prevents OverflowError: timestamp out of range for platform time_t
-    MIN_DELAY_SECONDS = 0
-    
-    if delay < MIN_DELAY_SECONDS:
-        logger.warning(f"Invalid delay value {delay} seconds, using 0")
-        delay = MIN_DELAY_SECONDS
-    elif delay > MAX_NOTIFICATION_DELAY_SECONDS:
-        logger.warning(f"Delay value {delay} seconds exceeds maximum {MAX_NOTIFICATION_DELAY_SECONDS}, capping to maximum")
-        delay = MAX_NOTIFICATION_DELAY_SECONDS
-    
-    # Remove delay from payload before sending (it's not part of APNs payload)
-    payload_without_delay = {k: v for k, v in payload.items() if k != "delay"}
-    
-    try:
-        # Use asyncio.sleep with validated delay
-        await asyncio.sleep(delay)
-        
-        if push_service is None:
-            logger.error("Push notification service is not configured - cannot send delayed notification")
-            return
-        
-        await push_service.send_notification(device_token, payload_without_delay)
-    except OverflowError as e:
-        logger.error(f"Overflow error with delay {delay} seconds: {e}. This should not happen after validation.")
-    except Exception as e:
-        logger.error(f"Failed to send delayed notification to {device_token[:20]}...: {e}")
@@ -5,7 +5,7 @@ Handles feeding records and daily nutrition summaries.
 Extracted from app.routers.nutrition for better organization.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from fastapi.security import HTTPAuthorizationCredentials
 from typing import List, Optional
 from datetime import datetime
@@ -25,9 +25,12 @@ from supabase import Client
 
 # Import centralized services
 from app.shared.services.database_operation_service import DatabaseOperationService
+from app.services.analytics.analytics_cache_service import AnalyticsCacheService
+from app.services.nutrition.nutrition_summary_service import NutritionSummaryService
 from app.shared.services.response_model_service import ResponseModelService
 from app.shared.services.response_utils import handle_empty_response
 from app.shared.services.query_builder_service import QueryBuilderService
+from app.shared.services.pagination_service import PaginationService
 from app.shared.services.data_transformation_service import DataTransformationService
 from app.shared.services.id_generation_service import IDGenerationService
 from app.shared.services.datetime_service import DateTimeService
@@ -260,6 +263,9 @@ async def record_feeding_with_slash(
         # Log error but don't fail the feeding record creation
         logger.warning(f"Failed to update nutritional trends: {e}")
     
+    # Drop cached analytics computed before this feeding
+    await AnalyticsCacheService(supabase).invalidate_pet(feeding_record.pet_id)
+    
     # Convert to response model
     return ResponseModelService.convert_to_model(created_record, FeedingRecordResponse)
 
@@ -476,6 +482,9 @@ async def delete_feeding_record(
                 except Exception as trend_error:
                     # Log error but don't fail the delete operation
                     logger.warning(f"Failed to update nutritional trends after delete: {trend_error}")
+            
+            if pet_id:
+                await AnalyticsCacheService(supabase).invalidate_pet(pet_id)
         else:
             # Delete returned False - record might not exist or RLS blocked it
             logger.warning(
@@ -511,18 +520,66 @@ async def delete_feeding_record(
     return None
 
 
+# FeedingRecordResponse fields that come from the embedded food analysis
+FEEDING_RECORD_JOINED_FIELDS = (
+    "food_name", "food_brand", "calories_per_100g",
+    "protein_percentage", "fat_percentage", "fiber_percentage"
+)
+FEEDING_RECORD_ANALYSIS_COLUMNS = (
+    "food_name", "brand", "calories_per_100g",
+    "protein_percentage", "fat_percentage", "fiber_percentage"
+)
+
+
+def _flatten_feeding_record(record: dict) -> dict:
+    """
+    Move embedded food analysis values onto a feeding record
+    
+    Stored calories win; when they are missing or zero they are calculated
+    from the analysis' calories_per_100g and amount_grams.
+    """
+    analysis = record.pop("food_analysis", None) or {}
+    record["food_name"] = analysis.get("food_name")
+    record["food_brand"] = analysis.get("brand")
+    for field in ("calories_per_100g", "protein_percentage", "fat_percentage", "fiber_percentage"):
+        record[field] = analysis.get(field)
+    
+    calories = record.get("calories")
+    if not calories:
+        calories_per_100g = analysis.get("calories_per_100g")
+        amount_grams = record.get("amount_grams") or 0
+        if calories_per_100g and float(calories_per_100g) > 0 and float(amount_grams) > 0:
+            calories = (float(calories_per_100g) / 100.0) * float(amount_grams)
+    record["calories"] = calories
+    return record
+
+
 @router.get("/{pet_id}", response_model=List[FeedingRecordResponse])
 @handle_errors("get_feeding_records")
 async def get_feeding_records(
     pet_id: str,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=100, description="Page size (omit for all records)"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    start_date: Optional[datetime] = Query(None, description="Only records fed at or after this time"),
+    end_date: Optional[datetime] = Query(None, description="Only records fed at or before this time"),
     current_user: UserResponse = Depends(get_current_user),
     supabase: Client = Depends(get_authenticated_supabase_client)
 ):
     """
     Get feeding records for a pet
     
+    Newest first, with food name, brand and per-100g values joined from the
+    food analysis. With limit (or cursor) the list is paginated and the
+    X-Next-Cursor header holds the cursor for the following page.
+    
     Args:
         pet_id: Pet ID
+        response: Response (for the X-Next-Cursor header)
+        limit: Optional page size
+        cursor: Optional cursor of the previous page
+        start_date: Optional lower bound on feeding_time
+        end_date: Optional upper bound on feeding_time
         supabase: Authenticated Supabase client
         current_user: Current authenticated user
         
@@ -530,155 +587,42 @@ async def get_feeding_records(
         List of feeding records for the pet
         
     Raises:
-        HTTPException: If pet not found or user not authorized
+        HTTPException: If pet not found, user not authorized or cursor invalid
     """
+    PaginationService.validate_cursor(cursor)
+    
     # Verify pet ownership
     from app.shared.services.pet_authorization import verify_pet_ownership
     await verify_pet_ownership(pet_id, current_user.id, supabase)
     
-    # Get feeding records with joined food_analysis data
+    # Feeding records with their food analysis embedded (one request, no merge query)
     # Note: feeding_records table only has pet_id, not user_id
     # Authorization is handled via RLS policies checking pet ownership
-    # CRITICAL: Ensure calories column is included in the query
-    query_builder = QueryBuilderService(supabase, "feeding_records")
-    result = await query_builder.with_filters({"pet_id": pet_id})\
-        .with_ordering("created_at", desc=True)\
-        .execute()
-    
-    # CRITICAL DEBUG: Execute a raw SQL query to verify what's actually in the database
-    # This bypasses any potential issues with the query builder or RLS
-    try:
-        raw_query_result = await asyncio.to_thread(
-            lambda: supabase.rpc(
-                'get_feeding_records_raw',
-                {'p_pet_id': pet_id}
-            ).execute()
-        )
-        if raw_query_result.data:
-            logger.info(
-                f"[GET_FEEDING_RECORDS] ⚠️ RAW SQL Query Result (first 2 records): "
-                f"{raw_query_result.data[:2]}"
-            )
-    except Exception as raw_error:
-        logger.warning(
-            f"[GET_FEEDING_RECORDS] Raw SQL query failed (function may not exist): {raw_error}"
+    query_builder = QueryBuilderService.for_model(
+        supabase,
+        "feeding_records",
+        FeedingRecordResponse,
+        exclude=FEEDING_RECORD_JOINED_FIELDS,
+        embed={"food_analysis:food_analyses": FEEDING_RECORD_ANALYSIS_COLUMNS}
+    ).with_filters({"pet_id": pet_id})\
+        .with_date_range(
+            "feeding_time",
+            start_date.isoformat() if start_date else None,
+            end_date.isoformat() if end_date else None
         )
+    if limit or cursor:
+        limit = limit or 20
+        query_builder.with_cursor(limit, cursor)
+    else:
+        query_builder.with_ordering("created_at", desc=True)
+    result = await query_builder.execute()
     
-    # Handle empty response
     records_data = handle_empty_response(result["data"])
+    if limit:
+        PaginationService.set_next_cursor_header(response, records_data, limit)
     
-    # CRITICAL DEBUG: Log ALL records to verify calories column from database
-    logger.info(f"[GET_FEEDING_RECORDS] Retrieved {len(records_data)} records from database")
-    if records_data:
-        for idx, record in enumerate(records_data[:5]):  # Log first 5 records
-            record_id = record.get('id', 'unknown')
-            db_calories = record.get('calories')
-            logger.info(
-                f"[GET_FEEDING_RECORDS] Record {idx} (ID: {record_id}) - "
-                f"RAW calories from DB: {repr(db_calories)} (type: {type(db_calories).__name__}), "
-                f"amount_grams: {record.get('amount_grams')}, "
-                f"food_analysis_id: {record.get('food_analysis_id')}"
-            )
-    
-    # Join food_analysis data for each feeding record
-    # Get all unique food_analysis_ids
-    food_analysis_ids = list(set([record.get("food_analysis_id") for record in records_data if record.get("food_analysis_id")]))
-    
-    # Fetch all food_analyses in one query
-    food_analyses_map = {}
-    if food_analysis_ids:
-        food_analysis_query = QueryBuilderService(supabase, "food_analyses")
-        # Query for all food_analyses for this pet (RLS will filter by pet_id)
-        analysis_result = await food_analysis_query.with_filters({
-            "pet_id": pet_id
-        }).execute()
-        
-        # Create a map of food_analysis_id -> food_analysis data
-        for analysis in analysis_result.get("data", []):
-            food_analyses_map[analysis.get("id")] = analysis
-    
-    # Enrich records with food_analysis data
-    enriched_records = []
-    for record in records_data:
-        food_analysis_id = record.get("food_analysis_id")
-        amount_grams = record.get("amount_grams", 0)
-        record_id = record.get("id", "unknown")
-        
-        # CRITICAL: Preserve calories from database if already set
-        # The feeding_records table has a calories column that may already contain the correct value
-        # This is important because food_analysis might have calories_per_100g = 0, but the database
-        # feeding_records table may have the correct calculated calories stored
-        existing_calories = record.get("calories")
-        
-        # Log what we're starting with
-        logger.debug(
-            f"[GET_FEEDING_RECORDS] Processing record {record_id}: "
-            f"existing_calories={existing_calories}, food_analysis_id={food_analysis_id}, amount_grams={amount_grams}"
-        )
-        
-        if food_analysis_id and food_analysis_id in food_analyses_map:
-            analysis = food_analyses_map[food_analysis_id]
-            record["food_name"] = analysis.get("food_name")
-            record["food_brand"] = analysis.get("brand")
-            
-            # CRITICAL: Only calculate calories if database doesn't have a valid value (> 0)
-            # Always preserve database calories if they exist - don't overwrite with calculated value
-            if existing_calories is None or existing_calories == 0:
-                # Calculate calories: (calories_per_100g / 100) * amount_grams
-                calories_per_100g = analysis.get("calories_per_100g")
-                if calories_per_100g is not None and calories_per_100g > 0 and amount_grams > 0:
-                    calculated_calories = (float(calories_per_100g) / 100.0) * float(amount_grams)
-                    record["calories"] = calculated_calories
-                    logger.info(
-                        f"[GET_FEEDING_RECORDS] Calculated calories for record {record_id}: "
-                        f"{calculated_calories} (from food_analysis {food_analysis_id}, "
-                        f"calories_per_100g={calories_per_100g}, amount={amount_grams}g)"
-                    )
-                else:
-                    # Keep existing value (None or 0) - don't overwrite with None
-                    # This preserves the database value even if food_analysis has no calories data
-                    logger.debug(
-                        f"[GET_FEEDING_RECORDS] Keeping existing calories for record {record_id}: "
-                        f"{existing_calories} (food_analysis calories_per_100g={calories_per_100g}, cannot calculate)"
-                    )
-            else:
-                # Database already has calories - ALWAYS use that value, don't recalculate
-                logger.info(
-                    f"[GET_FEEDING_RECORDS] ✅ Using database calories for record {record_id}: {existing_calories} "
-                    f"(NOT recalculating from food_analysis)"
-                )
-                # Explicitly set it to ensure it's included in response
-                record["calories"] = existing_calories
-        else:
-            # No food_analysis found - preserve database calories if they exist
-            if existing_calories is not None and existing_calories > 0:
-                logger.info(
-                    f"[GET_FEEDING_RECORDS] ✅ No food_analysis found for record {record_id}, "
-                    f"but using database calories: {existing_calories}"
-                )
-                record["calories"] = existing_calories
-            else:
-                logger.debug(
-                    f"[GET_FEEDING_RECORDS] No food_analysis found for record {record_id}, "
-                    f"and no database calories (value: {existing_calories})"
-                )
-        
-        # Log final calories value being returned
-        final_calories = record.get("calories")
-        logger.info(
-            f"[GET_FEEDING_RECORDS] ✅ Final calories for record {record_id}: {final_calories} "
-            f"(type: {type(final_calories).__name__})"
-        )
-        
-        # CRITICAL: Ensure calories is always in the record dict (even if None)
-        # This ensures the response model includes the calories field
-        if "calories" not in record:
-            record["calories"] = None
-            logger.warning(
-                f"[GET_FEEDING_RECORDS] ⚠️ Calories key missing from record {record_id}, setting to None"
-            )
-        
-        enriched_records.append(record)
+    enriched_records = [_flatten_feeding_record(record) for record in records_data]
+    logger.debug(f"[GET_FEEDING_RECORDS] Returning {len(enriched_records)} records for pet {pet_id}")
     
     # Convert to response models
     return ResponseModelService.convert_list_to_models(enriched_records, FeedingRecordResponse)
@@ -688,14 +632,18 @@ async def get_feeding_records(
 @handle_errors("get_daily_summaries")
 async def get_daily_summaries(
     pet_id: str,
+    days: int = Query(7, ge=1, le=365),
     current_user: UserResponse = Depends(get_current_user),
     supabase: Client = Depends(get_authenticated_supabase_client)
 ):
     """
     Get daily nutrition summaries for a pet
     
+    Summaries are read from the trigger-maintained daily rollup.
+    
     Args:
         pet_id: Pet ID
+        days: Number of days to include, ending today (default: 7)
         supabase: Authenticated Supabase client
         current_user: Current authenticated user
         
@@ -709,10 +657,7 @@ async def get_daily_summaries(
     from app.shared.services.pet_authorization import verify_pet_ownership
     await verify_pet_ownership(pet_id, current_user.id, supabase)
     
-    # Get daily summaries (this would contain the actual summary logic)
-    summaries = []  # Placeholder for actual summary generation
-    
-    return summaries
+    return await NutritionSummaryService(supabase).get_daily_summaries(pet_id, days)
 
 
 @router.get("/daily-summary/{pet_id}", response_model=Optional[DailyNutritionSummaryResponse])
@@ -731,7 +676,7 @@ async def get_daily_summary(
         current_user: Current authenticated user
         
     Returns:
-        Today's nutrition summary
+        Today's nutrition summary, or None if nothing was fed today
         
     Raises:
         HTTPException: If pet not found or user not authorized
@@ -740,7 +685,4 @@ async def get_daily_summary(
     from app.shared.services.pet_authorization import verify_pet_ownership
     await verify_pet_ownership(pet_id, current_user.id, supabase)
     
-    # Get today's summary (this would contain the actual summary logic)
-    summary = None  # Placeholder for actual summary generation
-    
-    return summary
+    return await NutritionSummaryService(supabase).get_summary_for_date(pet_id)
@@ -5,18 +5,20 @@ Handles nutrition insights and multi-pet analytics.
 Extracted from app.routers.nutrition for better organization.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.security import HTTPAuthorizationCredentials
 from typing import List
 
 from app.core.database import get_db
 from app.models.nutrition.nutrition import (
     MultiPetNutritionInsights,
-    DailyNutritionSummaryResponse
+    DailyNutritionSummaryResponse,
+    WeeklyNutritionSummaryResponse
 )
 from app.models.core.user import UserResponse
 from app.core.security.jwt_handler import get_current_user, security
 from app.api.v1.dependencies import get_authenticated_supabase_client
+from app.services.nutrition.nutrition_summary_service import NutritionSummaryService
 from app.utils.logging_config import get_logger
 from supabase import Client
 
@@ -26,13 +28,17 @@ router = APIRouter(prefix="/summaries", tags=["nutrition-summaries"])
 
 @router.get("/insights/multi-pet", response_model=MultiPetNutritionInsights)
 async def get_multi_pet_insights(
+    days: int = Query(7, ge=1, le=90),
     current_user: UserResponse = Depends(get_current_user),
     supabase: Client = Depends(get_authenticated_supabase_client)
 ):
     """
     Get multi-pet nutrition insights for the current user
     
+    All pets and their recent daily rollups are read in one query.
+    
     Args:
+        days: Number of days of summaries to consider (default: 7)
         supabase: Authenticated Supabase client
         current_user: Current authenticated user
         
@@ -43,37 +49,7 @@ async def get_multi_pet_insights(
         HTTPException: If insights generation fails
     """
     try:
-        # Get user's pets
-        from app.shared.utils.async_supabase import execute_async
-        pets_response = await execute_async(
-            lambda: supabase.table("pets").select("*").eq("user_id", current_user.id).execute()
-        )
-        
-        pets = pets_response.data if pets_response.data else []
-        
-        if not pets:
-            return MultiPetNutritionInsights(
-                total_pets=0,
-                average_nutrition_score=0,
-                insights=[],
-                recommendations=[]
-            )
-        
-        # Generate insights (this would contain the actual analytics logic)
-        insights = {
-            "total_pets": len(pets),
-            "average_nutrition_score": 85,
-            "insights": [
-                "All pets are meeting their nutritional requirements",
-                "Consider rotating protein sources for variety"
-            ],
-            "recommendations": [
-                "Monitor weight trends monthly",
-                "Schedule annual nutrition review"
-            ]
-        }
-        
-        return MultiPetNutritionInsights(**insights)
+        return await NutritionSummaryService(supabase).get_multi_pet_insights(current_user.id, days)
         
     except Exception as e:
         logger.error(f"Failed to generate multi-pet insights: {e}")
@@ -86,7 +62,7 @@ async def get_multi_pet_insights(
 @router.get("/daily/{pet_id}", response_model=List[DailyNutritionSummaryResponse])
 async def get_daily_nutrition_summaries(
     pet_id: str,
-    days: int = 7,
+    days: int = Query(7, ge=1, le=365),
     current_user: UserResponse = Depends(get_current_user),
     supabase: Client = Depends(get_authenticated_supabase_client)
 ):
@@ -111,10 +87,7 @@ async def get_daily_nutrition_summaries(
         from app.shared.services.pet_authorization import verify_pet_ownership
         await verify_pet_ownership(pet_id, current_user.id, supabase)
         
-        # Get daily summaries (this would contain the actual summary logic)
-        summaries = []  # Placeholder for actual summary generation
-        
-        return summaries
+        return await NutritionSummaryService(supabase).get_daily_summaries(pet_id, days)
         
     except HTTPException:
         raise
@@ -124,3 +97,41 @@ async def get_daily_nutrition_summaries(
             status_code=500,
             detail=f"Failed to get daily nutrition summaries: {str(e)}"
         )
+
+
+@router.get("/weekly/{pet_id}", response_model=List[WeeklyNutritionSummaryResponse])
+async def get_weekly_nutrition_summaries(
+    pet_id: str,
+    weeks: int = Query(4, ge=1, le=52),
+    current_user: UserResponse = Depends(get_current_user),
+    supabase: Client = Depends(get_authenticated_supabase_client)
+):
+    """
+    Get weekly nutrition rollups for a pet
+    
+    Args:
+        pet_id: Pet ID
+        weeks: Number of weeks to include, including the current one (default: 4)
+        supabase: Authenticated Supabase client
+        current_user: Current authenticated user
+        
+    Returns:
+        List of weekly nutrition summaries, newest first
+        
+    Raises:
+        HTTPException: If pet not found or user not authorized
+    """
+    try:
+        from app.shared.services.pet_authorization import verify_pet_ownership
+        await verify_pet_ownership(pet_id, current_user.id, supabase)
+        
+        return await NutritionSummaryService(supabase).get_weekly_summaries(pet_id, weeks)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to get weekly nutrition summaries: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to get weekly nutrition summaries: {str(e)}"
+        )
@@ -12,6 +12,7 @@ from app.core.security.jwt_handler import get_current_user, security
 from app.api.v1.dependencies import get_authenticated_supabase_client
 from app.core.database import get_supabase_client
 from supabase import Client
+from app.services.storage_service import StorageService
 from app.utils.logging_config import get_logger
 
 # Import centralized services
@@ -102,7 +103,8 @@ async def get_user_pets_mobile(
     Mobile-optimized endpoint to get pets with minimal fields
     
     Returns only essential fields (id, name, species, image_url) for faster
-    loading on mobile devices with limited bandwidth.
+    loading on mobile devices with limited bandwidth, plus image_urls with
+    the thumbnail, list-size and full image URLs.
     """
     from app.shared.services.query_builder_service import QueryBuilderService
     
@@ -117,6 +119,9 @@ async def get_user_pets_mobile(
     # Handle empty response
     pets_data = handle_empty_response(result["data"])
     
+    for pet in pets_data:
+        pet["image_urls"] = StorageService.derivative_urls(pet.get("image_url"))
+    
     # Return minimal data structure
     return pets_data
 
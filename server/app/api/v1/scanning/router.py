@@ -2,8 +2,8 @@
 Scan management and analysis router
 """
 
-from fastapi import APIRouter, HTTPException, Depends, status, Query
-from typing import List, Dict
+from fastapi import APIRouter, HTTPException, Depends, status, Query, Response
+from typing import List, Dict, Optional
 from app.models.scanning.scan import ScanCreate, ScanResponse, ScanUpdate, ScanAnalysisRequest, ScanResult, ScanStatus, ScanMethod
 from app.models.scanning.ingredient import IngredientAnalysis
 from app.models.core.user import UserResponse
@@ -20,6 +20,7 @@ from app.shared.services.database_operation_service import DatabaseOperationServ
 from app.shared.services.response_model_service import ResponseModelService
 from app.shared.services.response_utils import handle_empty_response
 from app.shared.services.query_builder_service import QueryBuilderService
+from app.shared.services.pagination_service import PaginationService
 from app.shared.services.data_transformation_service import DataTransformationService
 from app.shared.decorators.error_handler import handle_errors
 
@@ -29,6 +30,9 @@ import base64
 router = APIRouter()
 logger = get_logger(__name__)
 
+# ScanResponse fields that are not scans columns (filled in after the query)
+SCAN_RESPONSE_EXCLUDE = ("scan_method", "nutritional_analysis")
+
 @router.post("", response_model=ScanResponse)
 async def create_scan_no_slash(
     scan_data: ScanCreate,
@@ -77,20 +81,33 @@ async def create_scan_with_slash(
 @router.get("/", response_model=List[ScanResponse])
 @handle_errors("get_user_scans")
 async def get_user_scans(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=100, description="Page size (omit for all scans)"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
     current_user: UserResponse = Depends(get_current_user),
     supabase: Client = Depends(get_authenticated_supabase_client)
 ):
     """
     Get all scans for the current user
     
-    Returns a list of all scan records belonging to the authenticated user
+    Returns scan records belonging to the authenticated user, newest first.
+    With limit (or cursor) the list is paginated and the X-Next-Cursor header
+    holds the cursor for the following page.
     """
+    PaginationService.validate_cursor(cursor)
     
     # Get scans for the current user using query builder
-    query_builder = QueryBuilderService(supabase, "scans")
-    result = await query_builder.with_filters({"user_id": current_user.id})\
-        .with_ordering("created_at", desc=True)\
-        .execute()
+    query_builder = QueryBuilderService.for_model(
+        supabase, "scans", ScanResponse, exclude=SCAN_RESPONSE_EXCLUDE
+    ).with_filters({"user_id": current_user.id})
+    if limit or cursor:
+        limit = limit or 20
+        query_builder.with_cursor(limit, cursor)
+    else:
+        query_builder.with_ordering("created_at", desc=True)
+    result = await query_builder.execute()
+    if limit:
+        PaginationService.set_next_cursor_header(response, result["data"], limit)
     
     # Handle empty response
     scans_data = handle_empty_response(result["data"])
@@ -106,16 +123,21 @@ async def get_user_scans(
 @router.get("/mobile", response_model=List[dict])
 @handle_errors("get_user_scans_mobile")
 async def get_user_scans_mobile(
+    response: Response,
     current_user: UserResponse = Depends(get_current_user),
     limit: int = Query(20, ge=1, le=50, description="Maximum results (mobile optimized)"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
     supabase: Client = Depends(get_authenticated_supabase_client)
 ):
     """
     Mobile-optimized endpoint to get scans with minimal fields.
     
     Returns only essential fields (id, pet_id, status, created_at, image_url)
-    for faster loading on mobile devices with limited bandwidth.
+    for faster loading on mobile devices with limited bandwidth, plus
+    image_urls with the thumbnail, list-size and full image URLs. The
+    X-Next-Cursor header holds the cursor for the following page.
     """
+    PaginationService.validate_cursor(cursor)
     
     # Select only essential fields for mobile
     query_builder = QueryBuilderService(
@@ -124,16 +146,17 @@ async def get_user_scans_mobile(
         default_columns=["id", "pet_id", "status", "created_at", "image_url"]
     )
     result = await query_builder.with_filters({"user_id": current_user.id})\
-        .with_ordering("created_at", desc=True)\
-        .with_limit(limit)\
+        .with_cursor(limit, cursor)\
         .execute()
     
     # Handle empty response
     scans_data = handle_empty_response(result["data"])
+    PaginationService.set_next_cursor_header(response, scans_data, limit)
     
     # Convert status enum
     for scan in scans_data:
         scan["status"] = ScanStatus(scan["status"]).value if scan.get("status") else "pending"
+        scan["image_urls"] = StorageService.derivative_urls(scan.get("image_url"))
     
     return scans_data
 
@@ -151,7 +174,7 @@ async def get_scan(
     """
     
     # Get scan by ID and verify ownership using query builder
-    query_builder = QueryBuilderService(supabase, "scans")
+    query_builder = QueryBuilderService.for_model(supabase, "scans", ScanResponse, exclude=SCAN_RESPONSE_EXCLUDE)
     result = await query_builder.with_filters({
         "id": scan_id,
         "user_id": current_user.id
@@ -100,6 +100,13 @@ class Settings(BaseSettings):
     # File Upload Limits
     max_file_size_mb: int = Field(default=10, ge=1, le=100, description="Maximum file upload size in MB")
     max_request_size_mb: int = Field(default=50, ge=1, le=500, description="Maximum request size in MB")
+    image_optimization_workers: int = Field(
+        default=2,
+        alias="IMAGE_OPTIMIZATION_WORKERS",
+        ge=1,
+        le=16,
+        description="Worker processes for image optimization"
+    )
     
     # Environment
     environment: str = Field(default="development", alias="ENVIRONMENT", description="Application environment")
@@ -122,6 +129,58 @@ class Settings(BaseSettings):
     data_retention_days: int = Field(default=365, ge=30, le=2555, description="Data retention period in days")
     enable_data_export: bool = Field(default=True, description="Enable data export for GDPR")
     enable_data_deletion: bool = Field(default=True, description="Enable data deletion for GDPR")
+    gdpr_deletion_concurrency: int = Field(
+        default=4,
+        alias="GDPR_DELETION_CONCURRENCY",
+        ge=1,
+        le=32,
+        description="Tables and storage buckets deleted at once when erasing an account"
+    )
+    gdpr_delete_batch_size: int = Field(
+        default=500,
+        alias="GDPR_DELETE_BATCH_SIZE",
+        ge=10,
+        le=5000,
+        description="Rows deleted per statement when erasing an account"
+    )
+    gdpr_retention_worker_enabled: bool = Field(
+        default=False,
+        alias="GDPR_RETENTION_WORKER_ENABLED",
+        description="Run the retention sweep (anonymizes expired accounts) in this process"
+    )
+    gdpr_retention_batch_size: int = Field(
+        default=50,
+        alias="GDPR_RETENTION_BATCH_SIZE",
+        ge=1,
+        le=1000,
+        description="Expired accounts anonymized per sweep batch"
+    )
+    gdpr_retention_batch_pause_seconds: float = Field(
+        default=5.0,
+        alias="GDPR_RETENTION_BATCH_PAUSE_SECONDS",
+        ge=0.0,
+        le=600.0,
+        description="Pause between full sweep batches, to limit load on the database"
+    )
+    gdpr_retention_poll_interval_seconds: float = Field(
+        default=3600.0,
+        alias="GDPR_RETENTION_POLL_INTERVAL_SECONDS",
+        ge=60.0,
+        le=86400.0,
+        description="How often the sweep checks for newly expired accounts once caught up"
+    )
+    gdpr_deletion_resume_enabled: bool = Field(
+        default=True,
+        alias="GDPR_DELETION_RESUME_ENABLED",
+        description="Resume failed or interrupted account deletions in this process"
+    )
+    gdpr_deletion_resume_interval_seconds: float = Field(
+        default=300.0,
+        alias="GDPR_DELETION_RESUME_INTERVAL_SECONDS",
+        ge=30.0,
+        le=86400.0,
+        description="How often failed or interrupted account deletions are checked for"
+    )
     
     # RevenueCat Integration
     revenuecat_api_key: Optional[str] = Field(
@@ -150,7 +209,54 @@ class Settings(BaseSettings):
     apns_team_id: Optional[str] = Field(default=None, alias="APNS_TEAM_ID", description="APNs team ID")
     apns_bundle_id: Optional[str] = Field(default=None, alias="APNS_BUNDLE_ID", description="App bundle identifier")
     apns_private_key: Optional[str] = Field(default=None, alias="APNS_PRIVATE_KEY", description="APNs private key (P8 format)")
-    
+    apns_max_connections: int = Field(
+        default=2,
+        alias="APNS_MAX_CONNECTIONS",
+        ge=1,
+        le=20,
+        description="HTTP/2 connections kept open to APNs (each multiplexes many requests)"
+    )
+    apns_max_concurrency: int = Field(
+        default=200,
+        alias="APNS_MAX_CONCURRENCY",
+        ge=1,
+        le=2000,
+        description="Notifications in flight at once when sending a batch"
+    )
+    notification_worker_enabled: bool = Field(
+        default=True,
+        alias="NOTIFICATION_WORKER_ENABLED",
+        description="Run the scheduled notification and medication reminder workers in this process"
+    )
+    notification_poll_interval_seconds: float = Field(
+        default=5.0,
+        alias="NOTIFICATION_POLL_INTERVAL_SECONDS",
+        ge=0.5,
+        le=300.0,
+        description="How often the worker checks for due notifications when the queue is idle"
+    )
+    notification_batch_size: int = Field(
+        default=500,
+        alias="NOTIFICATION_BATCH_SIZE",
+        ge=1,
+        le=5000,
+        description="Due notifications claimed per batch"
+    )
+    notification_lease_seconds: int = Field(
+        default=120,
+        alias="NOTIFICATION_LEASE_SECONDS",
+        ge=10,
+        le=3600,
+        description="How long a claimed batch is reserved before another worker may retry it"
+    )
+    notification_max_attempts: int = Field(
+        default=5,
+        alias="NOTIFICATION_MAX_ATTEMPTS",
+        ge=1,
+        le=20,
+        description="Send attempts before a scheduled notification is marked failed"
+    )
+
     @field_validator('secret_key')
     @classmethod
     def validate_secret_key(cls, v):
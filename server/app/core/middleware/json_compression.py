@@ -11,11 +11,18 @@ from starlette.types import ASGIApp
 from starlette.responses import Response, StreamingResponse
 import gzip
 import logging
-from typing import Callable
+from typing import AsyncIterator, Callable
 
 logger = logging.getLogger(__name__)
 
 
+async def _prepend(head: bytes, rest: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Yield already-read bytes, then the rest of a body iterator"""
+    yield head
+    async for chunk in rest:
+        yield chunk
+
+
 class JSONCompressionMiddleware(BaseHTTPMiddleware):
     """
     Middleware that always compresses JSON responses for mobile optimization.
@@ -63,12 +70,23 @@ class JSONCompressionMiddleware(BaseHTTPMiddleware):
                 body = response._content
             else:
                 # Try to read from body iterator
-                async for chunk in response.body_iterator:
+                body_iterator = response.body_iterator
+                async for chunk in body_iterator:
                     body += chunk
                     # Prevent reading too much
                     if len(body) > 10 * 1024 * 1024:  # 10MB limit
                         logger.warning("Response body too large for compression")
-                        return response
+                        return StreamingResponse(
+                            _prepend(body, body_iterator),
+                            status_code=response.status_code,
+                            headers=dict(response.headers)
+                        )
+                # The iterator is consumed: keep the body for the uncompressed paths below
+                response = Response(
+                    content=body,
+                    status_code=response.status_code,
+                    headers=dict(response.headers)
+                )
         except Exception as e:
             logger.debug(f"Could not read response body: {e}")
             return response
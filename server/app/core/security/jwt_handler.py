@@ -61,6 +61,12 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Sub-requests of a batch reuse the user the batch was authenticated as
+    from app.shared.services.batch_context import get_batch_context
+    batch = get_batch_context(credentials.credentials)
+    if batch is not None:
+        return batch.user
+    
     # Check if token is blacklisted (revoked)
     if not AuthSecurityService.validate_token_not_blacklisted(credentials.credentials):
         logger.warning("Attempted use of blacklisted/revoked token")
@@ -7,18 +7,20 @@ Follows Single Responsibility Principle: Input validation only
 
 import re
 import html
-import bleach
 import logging
 from typing import Optional, Dict, Any
 from fastapi import HTTPException, status
 
+from app.shared.services.html_sanitization_service import HTMLSanitizationService
 from .security_patterns import (
-    DANGEROUS_PATTERNS,
-    SQL_INJECTION_PATTERNS,
-    INAPPROPRIATE_WORDS,
     RESERVED_USERNAMES,
-    WEAK_PASSWORDS,
-    OBFUSCATION_PATTERNS
+    WEAK_PASSWORDS
+)
+from .security_scanner import (
+    DANGEROUS,
+    SQL_INJECTION,
+    contains_inappropriate_content,
+    scan_text
 )
 
 logger = logging.getLogger(__name__)
@@ -45,30 +47,26 @@ class InputValidator:
         if not text:
             return ""
         
-        # Check for dangerous patterns
-        text_lower = text.lower()
-        for pattern in DANGEROUS_PATTERNS:
-            if re.search(pattern, text_lower, re.IGNORECASE):
-                logger.warning(f"Dangerous pattern detected in text: {pattern}")
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Input contains potentially dangerous content"
-                )
-        
-        # Check for SQL injection patterns
-        for pattern in SQL_INJECTION_PATTERNS:
-            if re.search(pattern, text_lower, re.IGNORECASE):
-                logger.warning(f"SQL injection pattern detected: {pattern}")
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Input contains potentially malicious content"
-                )
+        # One pass over all dangerous and SQL injection patterns
+        scan = scan_text(text)
+        if DANGEROUS in scan.categories:
+            logger.warning(f"Dangerous pattern detected in text: {scan.pattern_for(DANGEROUS)}")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Input contains potentially dangerous content"
+            )
+        if SQL_INJECTION in scan.categories:
+            logger.warning(f"SQL injection pattern detected: {scan.pattern_for(SQL_INJECTION)}")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Input contains potentially malicious content"
+            )
         
         # HTML escape
         sanitized = html.escape(text)
         
         # Remove HTML tags
-        sanitized = bleach.clean(sanitized, tags=[], strip=True)
+        sanitized = HTMLSanitizationService.strip_tags(sanitized)
         
         # Limit length
         if max_length and len(sanitized) > max_length:
@@ -252,33 +250,7 @@ class InputValidator:
         Returns:
             True if inappropriate content is found
         """
-        text_lower = text.lower()
-        
-        # Check for exact matches
-        for word in INAPPROPRIATE_WORDS:
-            if word in text_lower:
-                return True
-        
-        # Check for obfuscated patterns
-        normalized_text = text_lower
-        for pattern, replacement in OBFUSCATION_PATTERNS:
-            normalized_text = re.sub(pattern, replacement, normalized_text)
-        
-        # Check normalized text
-        for word in INAPPROPRIATE_WORDS:
-            if word in normalized_text:
-                return True
-        
-        # Check for repeated characters
-        repeated_pattern = r'(.)\1{2,}'
-        if re.search(repeated_pattern, text_lower):
-            for word in INAPPROPRIATE_WORDS:
-                if len(word) > 2:
-                    repeated_word = ''.join([char + '{1,}' for char in word])
-                    if re.search(repeated_word, text_lower):
-                        return True
-        
-        return False
+        return contains_inappropriate_content(text)
     
     @classmethod
     def validate_phone_number(cls, phone: str) -> str:
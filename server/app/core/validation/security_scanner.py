@@ -0,0 +1,255 @@
+"""
+Compiled security scanner for input validation
+
+All patterns in security_patterns are compiled once at import into a
+single regex, so a text is scanned in one pass (in C) instead of one
+re.search call per pattern, and the scan reports every category that
+matched. The profanity checks are compiled the same way: one alternation
+for the word list, one str.translate table for the obfuscation rules and
+one alternation for stretched words ("fuuuck").
+"""
+
+import re
+import sys
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from .security_patterns import (
+    DANGEROUS_PATTERNS,
+    SQL_INJECTION_PATTERNS,
+    INAPPROPRIATE_WORDS,
+    OBFUSCATION_PATTERNS
+)
+
+# Scan categories, in priority order
+DANGEROUS = "dangerous"
+SQL_INJECTION = "sql_injection"
+
+
+@dataclass(frozen=True)
+class ScanResult:
+    """
+    Outcome of scanning one text
+
+    Attributes:
+        matches: (category, first matching pattern) per matched category,
+            in priority order
+    """
+    matches: Tuple[Tuple[str, str], ...] = ()
+
+    def __bool__(self) -> bool:
+        return bool(self.matches)
+
+    @property
+    def categories(self) -> FrozenSet[str]:
+        """Categories with at least one matching pattern"""
+        return frozenset(category for category, _ in self.matches)
+
+    def pattern_for(self, category: str) -> Optional[str]:
+        """First pattern that matched for a category"""
+        for matched_category, pattern in self.matches:
+            if matched_category == category:
+                return pattern
+        return None
+
+
+# Characters with a meaning in a regular expression
+_REGEX_SPECIAL = set(".^$*+?{}[]()|\\")
+_QUANTIFIERS = set("*+?{")
+
+
+def _split_literal_prefix(pattern: str) -> Tuple[str, str]:
+    """
+    Split a pattern into its leading literal text and the remaining regex
+
+    A character only counts as literal if no quantifier follows it, e.g.
+    "union\\s+select" -> ("union", "\\s+select") and "ab*c" -> ("a", "b*c").
+    """
+    literal = []
+    index = 0
+    while index < len(pattern):
+        if pattern[index] == "\\":
+            token = pattern[index:index + 2]
+            is_literal = len(token) == 2 and not token[1].isalnum()
+        else:
+            token = pattern[index]
+            is_literal = token not in _REGEX_SPECIAL
+        following = pattern[index + len(token):index + len(token) + 1]
+        if not is_literal or (following and following in _QUANTIFIERS):
+            break
+        literal.append(token[-1])
+        index += len(token)
+    return "".join(literal), pattern[index:]
+
+
+class _TrieNode:
+    """Literal-prefix trie node; ends holds (order, group, rest) of patterns ending here"""
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.ends: List[Tuple[int, str, str]] = []
+        self.order = sys.maxsize
+
+    def add(self, literal: str, order: int, group: str, rest: str):
+        node = self
+        node.order = min(node.order, order)
+        for character in literal:
+            node = node.children.setdefault(character, _TrieNode())
+            node.order = min(node.order, order)
+        node.ends.append((order, group, rest))
+
+    def to_regex(self) -> str:
+        """Alternation over this node's patterns, earliest pattern first"""
+        branches = [
+            (order, f"(?={rest})(?P<{group}>)" if rest else f"(?P<{group}>)")
+            for order, group, rest in self.ends
+        ]
+        branches.extend(
+            (child.order, re.escape(character) + child.to_regex())
+            for character, child in self.children.items()
+        )
+        branches.sort(key=lambda branch: branch[0])
+        if len(branches) == 1:
+            return branches[0][1]
+        return "(?:" + "|".join(regex for _, regex in branches) + ")"
+
+
+class SecurityScanner:
+    """
+    Single-pass scanner over categorized regular expressions
+
+    Patterns are merged into one regex shaped like a trie over their literal
+    prefixes ("select", "sleep(", "sp_" share the "s" branch), so at each
+    position the engine follows one path instead of trying every pattern.
+    The whole regex is a lookahead, so a match consumes no text and every
+    start position is tried: a match in one category cannot hide a match of
+    another category that starts inside it. Where several categories match
+    at the same position, the others are checked there with their own
+    compiled trie. Texts are lower-cased once and matched without
+    re.IGNORECASE (all patterns are lower-case).
+    """
+
+    def __init__(self, categories: Dict[str, Sequence[str]]):
+        """
+        Compile the scanner
+
+        Args:
+            categories: Category -> patterns, in priority order
+        """
+        self._group_category: Dict[str, str] = {}
+        self._group_pattern: Dict[str, str] = {}
+        self._priority = {category: index for index, category in enumerate(categories)}
+
+        root = _TrieNode()
+        category_roots: Dict[str, _TrieNode] = {}
+        for category, patterns in categories.items():
+            category_root = category_roots.setdefault(category, _TrieNode())
+            for pattern in patterns:
+                group = f"p{len(self._group_pattern)}"
+                self._group_category[group] = category
+                self._group_pattern[group] = pattern
+                literal, rest = _split_literal_prefix(pattern)
+                if not literal:
+                    raise ValueError(f"Pattern must start with a literal character: {pattern!r}")
+                root.add(literal, len(self._group_pattern), group, rest)
+                category_root.add(literal, len(self._group_pattern), group, rest)
+        self._regex = re.compile(f"(?={root.to_regex()})")
+        self._category_regex = {
+            category: re.compile(category_root.to_regex())
+            for category, category_root in category_roots.items()
+            if category_root.ends or category_root.children
+        }
+
+    def scan(self, text: Optional[str]) -> ScanResult:
+        """
+        Scan a text once and report all matched categories
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            ScanResult (falsy when nothing matched)
+        """
+        if not text:
+            return ScanResult()
+
+        text_lower = text.lower()
+        found: Dict[str, str] = {}
+        for match in self._regex.finditer(text_lower):
+            category = self._group_category[match.lastgroup]
+            if category not in found:
+                found[category] = self._group_pattern[match.lastgroup]
+            for other, regex in self._category_regex.items():
+                if other in found:
+                    continue
+                other_match = regex.match(text_lower, match.start())
+                if other_match:
+                    found[other] = self._group_pattern[other_match.lastgroup]
+            if len(found) == len(self._category_regex):
+                break
+
+        ordered = sorted(found, key=self._priority.__getitem__)
+        return ScanResult(matches=tuple((category, found[category]) for category in ordered))
+
+
+_DEFAULT_SCANNER = SecurityScanner({
+    DANGEROUS: DANGEROUS_PATTERNS,
+    SQL_INJECTION: SQL_INJECTION_PATTERNS,
+})
+
+
+def scan_text(text: Optional[str]) -> ScanResult:
+    """Scan text for dangerous markup and SQL injection patterns"""
+    return _DEFAULT_SCANNER.scan(text)
+
+
+def _obfuscation_table() -> Dict[int, Optional[str]]:
+    """
+    Fold the sequential OBFUSCATION_PATTERNS substitutions into one table
+
+    Every rule replaces single characters, so applying the rules in order to
+    each character gives the same result as applying them to a whole text.
+    """
+    characters = set()
+    for pattern, _ in OBFUSCATION_PATTERNS:
+        characters.update(re.sub(r"^\[|\]$", "", pattern).replace("\\", ""))
+
+    table: Dict[int, Optional[str]] = {}
+    for character in characters:
+        result = character
+        for pattern, replacement in OBFUSCATION_PATTERNS:
+            result = re.sub(pattern, replacement, result)
+        if result != character:
+            table[ord(character)] = result or None
+    return table
+
+
+_WORDS_REGEX = re.compile("|".join(re.escape(word) for word in INAPPROPRIATE_WORDS))
+_OBFUSCATION_TABLE = _obfuscation_table()
+_REPEATED_CHARACTER_REGEX = re.compile(r"(.)\1{2,}")
+_STRETCHED_WORDS_REGEX = re.compile(
+    "|".join("".join(re.escape(c) + "+" for c in word) for word in INAPPROPRIATE_WORDS if len(word) > 2)
+)
+
+
+def contains_inappropriate_content(text: Optional[str]) -> bool:
+    """
+    Check text for profanity, including obfuscated and stretched spellings
+
+    Args:
+        text: Text to check
+
+    Returns:
+        True if inappropriate content is found
+    """
+    if not text:
+        return False
+    text_lower = text.lower()
+    if _WORDS_REGEX.search(text_lower):
+        return True
+    if _WORDS_REGEX.search(text_lower.translate(_OBFUSCATION_TABLE)):
+        return True
+    return bool(
+        _REPEATED_CHARACTER_REGEX.search(text_lower)
+        and _STRETCHED_WORDS_REGEX.search(text_lower)
+    )
@@ -1,7 +1,7 @@
 """
 Core Models Module
 
-Foundational models: User, Pet, Subscription, Waitlist
+Foundational models: User, Pet, Subscription, Waitlist, Batch
 """
 
 from .user import (
@@ -40,6 +40,13 @@ from .waitlist import (
     WaitlistResponse,
 )
 
+from .batch import (
+    BatchSubRequest,
+    BatchRequest,
+    BatchSubResponse,
+    BatchResponse,
+)
+
 __all__ = [
     # User models
     'User',
@@ -69,5 +76,10 @@ __all__ = [
     # Waitlist models
     'WaitlistSignup',
     'WaitlistResponse',
+    # Batch models
+    'BatchSubRequest',
+    'BatchRequest',
+    'BatchSubResponse',
+    'BatchResponse',
 ]
 
@@ -0,0 +1,86 @@
+"""
+Batch request models
+
+Request/response schemas for POST /api/v1/batch
+"""
+
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+
+# Methods allowed in a batch; SAFE_METHODS sub-requests may run concurrently
+BATCH_METHODS = ("GET", "POST", "PUT", "PATCH", "DELETE")
+SAFE_METHODS = ("GET",)
+
+# Sub-requests accepted per batch
+MAX_BATCH_REQUESTS = 20
+
+# Routes that must be called directly: auth flows have their own rate limits
+# and the webhook is authenticated differently
+UNBATCHABLE_PREFIXES = (
+    "/api/v1/batch",
+    "/api/v1/auth/",
+    "/api/v1/mfa/",
+    "/api/v1/subscriptions/revenuecat",
+)
+
+
+class BatchSubRequest(BaseModel):
+    """One sub-request of a batch"""
+    id: str = Field(..., min_length=1, max_length=64, description="Client key echoed in the response")
+    method: str = Field("GET", description="HTTP method")
+    path: str = Field(..., min_length=1, max_length=512, description="API path, e.g. /api/v1/pets/")
+    query: Dict[str, Any] = Field(default_factory=dict, description="Query parameters")
+    body: Optional[Any] = Field(None, description="JSON body for writes")
+
+    @field_validator("method")
+    @classmethod
+    def validate_method(cls, v: str) -> str:
+        """Normalize and restrict the method"""
+        method = v.upper()
+        if method not in BATCH_METHODS:
+            raise ValueError(f"Unsupported method: {v}")
+        return method
+
+    @field_validator("path")
+    @classmethod
+    def validate_path(cls, v: str) -> str:
+        """Only API routes that may be batched"""
+        path = v.split("?", 1)[0]
+        if not path.startswith("/api/v1/") or ".." in path:
+            raise ValueError("Path must be an /api/v1/ route")
+        if path.startswith(UNBATCHABLE_PREFIXES):
+            raise ValueError(f"{path} cannot be called from a batch")
+        return v
+
+
+class BatchRequest(BaseModel):
+    """
+    Batch of sub-requests executed with one authentication
+
+    Consecutive GET sub-requests run concurrently; a write runs on its own
+    after everything before it, so ordering between writes and reads is kept.
+    """
+    requests: List[BatchSubRequest] = Field(..., min_length=1, max_length=MAX_BATCH_REQUESTS)
+
+    @model_validator(mode="after")
+    def validate_unique_ids(self) -> "BatchRequest":
+        """Sub-request ids must be unique"""
+        ids = [sub.id for sub in self.requests]
+        if len(ids) != len(set(ids)):
+            raise ValueError("Sub-request ids must be unique")
+        return self
+
+
+class BatchSubResponse(BaseModel):
+    """Result of one sub-request"""
+    id: str
+    status: int
+    headers: Dict[str, str] = Field(default_factory=dict)
+    body: Optional[Any] = None
+
+
+class BatchResponse(BaseModel):
+    """Results in the order the sub-requests were given"""
+    responses: List[BatchSubResponse]
@@ -193,6 +193,7 @@ class HealthEventListResponse(BaseModel):
     total: int
     limit: int
     offset: int
+    next_cursor: Optional[str] = None
     
     model_config = ConfigDict(
         json_schema_extra={
@@ -213,7 +214,8 @@ class HealthEventListResponse(BaseModel):
                 ],
                 "total": 1,
                 "limit": 50,
-                "offset": 0
+                "offset": 0,
+                "next_cursor": None
             }
         }
     )
@@ -7,6 +7,7 @@ from datetime import datetime
 from pydantic import BaseModel, Field, field_validator, ConfigDict
 from typing import Optional, List
 from enum import Enum
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 
 class MedicationFrequency(str, Enum):
@@ -72,6 +73,10 @@ class MedicationReminderBase(BaseModel):
     start_date: datetime
     end_date: Optional[datetime] = None
     is_active: bool = Field(default=True)
+    timezone: Optional[str] = Field(
+        default=None,
+        description="IANA timezone the reminder times are in; without one the server does not send the reminder"
+    )
     
     @field_validator('reminder_times')
     @classmethod
@@ -80,6 +85,21 @@ class MedicationReminderBase(BaseModel):
         if not v:
             raise ValueError('At least one reminder time is required')
         return v
+    
+    @field_validator('timezone')
+    @classmethod
+    def validate_timezone(cls, v):
+        """Validate timezone name"""
+        return validate_timezone_name(v) if v is not None else v
+
+
+def validate_timezone_name(name: str) -> str:
+    """Raise ValueError unless name is a known IANA timezone"""
+    try:
+        ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f'Unknown timezone: {name}')
+    return name
 
 
 class MedicationReminder(MedicationReminderBase):
@@ -111,7 +131,8 @@ class MedicationReminderCreate(MedicationReminderBase):
                 ],
                 "start_date": "2025-01-15T09:00:00Z",
                 "end_date": "2025-01-22T09:00:00Z",
-                "is_active": True
+                "is_active": True,
+                "timezone": "America/New_York"
             }
         }
     )
@@ -126,6 +147,13 @@ class MedicationReminderUpdate(BaseModel):
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
     is_active: Optional[bool] = None
+    timezone: Optional[str] = None
+    
+    @field_validator('timezone')
+    @classmethod
+    def validate_timezone(cls, v):
+        """Validate timezone name"""
+        return validate_timezone_name(v) if v is not None else v
     
     model_config = ConfigDict(
         json_schema_extra={
@@ -148,6 +176,7 @@ class MedicationReminderResponse(MedicationReminderBase):
     health_event_id: str
     pet_id: str
     user_id: str
+    next_fire_at: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
     
@@ -182,6 +211,7 @@ class MedicationReminderListResponse(BaseModel):
     total: int
     limit: int
     offset: int
+    next_cursor: Optional[str] = None
     
     model_config = ConfigDict(
         json_schema_extra={
@@ -208,7 +238,8 @@ class MedicationReminderListResponse(BaseModel):
                 ],
                 "total": 1,
                 "limit": 50,
-                "offset": 0
+                "offset": 0,
+                "next_cursor": None
             }
         }
     )
@@ -168,6 +168,10 @@ class FeedingRecordResponse(FeedingRecordBase):
     food_name: Optional[str] = None  # Optional: populated when joining food_analysis
     food_brand: Optional[str] = None  # Optional: populated when joining food_analysis
     calories: Optional[float] = None  # Optional: calculated from food_analysis and amount_grams
+    calories_per_100g: Optional[float] = None  # Optional: populated when joining food_analysis
+    protein_percentage: Optional[float] = None  # Optional: populated when joining food_analysis
+    fat_percentage: Optional[float] = None  # Optional: populated when joining food_analysis
+    fiber_percentage: Optional[float] = None  # Optional: populated when joining food_analysis
     
     class Config:
         from_attributes = True
@@ -193,6 +197,23 @@ class DailyNutritionSummaryResponse(DailyNutritionSummaryBase):
     class Config:
         from_attributes = True
 
+class WeeklyNutritionSummaryResponse(BaseModel):
+    """Weekly nutrition rollup of the daily summaries (weekly_nutrition_summaries view)"""
+    pet_id: str
+    week_start: date
+    week_end: date
+    days_logged: int = Field(..., ge=0, le=7)
+    total_calories: float = Field(..., ge=0)
+    average_daily_calories: float = Field(..., ge=0)
+    total_protein: float = Field(..., ge=0)
+    total_fat: float = Field(..., ge=0)
+    total_fiber: float = Field(..., ge=0)
+    feeding_count: int = Field(..., ge=0)
+    average_compatibility: float = Field(..., ge=0, le=100)
+    
+    class Config:
+        from_attributes = True
+
 class MultiPetNutritionInsights(BaseModel):
     """Multi-pet nutrition insights"""
     pets: List[Dict[str, Any]]
@@ -43,10 +43,13 @@ from .analytics import (
 
 # Other services (not yet organized by domain)
 from .data_quality_service import DataQualityService
+from .food_quality_catalog_service import FoodQualityCatalogService
 from .gdpr_service import GDPRService
+from .gdpr_retention_worker import GDPRDeletionResumeWorker, GDPRRetentionWorker
 from .image_optimizer import ImageOptimizerService
 from .mfa_service import MFAService
 from .monitoring import MonitoringService
+from .notification_scheduler import NotificationScheduler
 from .push_notification_service import PushNotificationService
 from .storage_service import StorageService
 
@@ -74,10 +77,14 @@ __all__ = [
     # Other
     'AdvancedAnalyticsService',
     'DataQualityService',
+    'FoodQualityCatalogService',
     'GDPRService',
+    'GDPRRetentionWorker',
+    'GDPRDeletionResumeWorker',
     'ImageOptimizerService',
     'MFAService',
     'MonitoringService',
+    'NotificationScheduler',
     'PushNotificationService',
     'StorageService',
 ]
@@ -9,6 +9,7 @@ from .pattern_analytics_service import PatternAnalyticsService
 from .trend_analytics_service import TrendAnalyticsService
 from .recommendation_service import RecommendationService
 from .advanced_analytics_service import AdvancedAnalyticsService
+from .analytics_cache_service import AnalyticsCacheService
 
 __all__ = [
     'HealthAnalyticsService',
@@ -16,4 +17,5 @@ __all__ = [
     'TrendAnalyticsService',
     'RecommendationService',
     'AdvancedAnalyticsService',
+    'AnalyticsCacheService',
 ]
@@ -6,9 +6,10 @@ Handles complex nutritional analytics, pattern recognition, and predictive insig
 from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime, date, timedelta
 from app.shared.services.datetime_service import DateTimeService
-from app.shared.services.database_operation_service import DatabaseOperationService
+from app.services.analytics.analytics_cache_service import AnalyticsCacheService
+from app.shared.services.time_series_service import TimeSeries, TimeSeriesService
+from app.utils.logging_config import get_logger
 from decimal import Decimal
-import statistics
 import json
 from supabase import Client
 from app.models.nutrition.advanced_nutrition import (
@@ -17,6 +18,8 @@ from app.models.nutrition.advanced_nutrition import (
     NutritionalRecommendationCreate, NutritionalRecommendationResponse
 )
 
+logger = get_logger(__name__)
+
 
 class AdvancedAnalyticsService:
     """
@@ -27,6 +30,12 @@ class AdvancedAnalyticsService:
     Follows KISS by keeping analytics methods focused and simple
     """
     
+    # Numeric nutritional_trends columns used by the analyses
+    TREND_COLUMNS = (
+        "total_calories", "total_protein_g", "total_fiber_g", "feeding_count",
+        "average_compatibility_score", "weight_change_kg"
+    )
+    
     def __init__(self, supabase: Client):
         """
         Initialize advanced analytics service
@@ -61,20 +70,15 @@ class AdvancedAnalyticsService:
         Returns:
             Analytics cache response
         """
-        # Check for existing cache
+        # Tiered cache (memory -> Redis -> table) with concurrent misses coalesced
         # Note: Pet ownership is verified by the router before calling this method
-        if not force_refresh:
-            cached = await self._get_cached_analytics(pet_id, analysis_type)
-            if cached and cached.expires_at > DateTimeService.now():
-                return cached
-        
-        # Generate new analytics
-        analysis_data = await self._perform_analysis(pet_id, analysis_type, date_range)
-        
-        # Cache the results
-        cache_response = await self._cache_analytics(pet_id, analysis_type, analysis_data)
-        
-        return cache_response
+        cache = AnalyticsCacheService(self.supabase)
+        return await cache.get_or_compute(
+            pet_id,
+            analysis_type,
+            lambda: self._perform_analysis(pet_id, analysis_type, date_range),
+            force_refresh=force_refresh
+        )
     
     async def get_health_insights(
         self, 
@@ -119,20 +123,23 @@ class AdvancedAnalyticsService:
                 overall_health_score=0.0
             )
         
+        # Build columnar series once for every metric below
+        series = self._build_series(trends)
+        
         # Analyze weight management
-        weight_status = await self._analyze_weight_management(trends)
+        weight_status = await self._analyze_weight_management(series)
         
         # Calculate nutritional adequacy score
-        adequacy_score = self._calculate_nutritional_adequacy_score(trends)
+        adequacy_score = self._calculate_nutritional_adequacy_score(series)
         
         # Calculate feeding consistency score
-        consistency_score = self._calculate_feeding_consistency_score(trends)
+        consistency_score = self._calculate_feeding_consistency_score(series)
         
         # Identify health risks
-        health_risks = await self._identify_health_risks(trends, weight_status)
+        health_risks = await self._identify_health_risks(series, weight_status)
         
         # Identify positive indicators
-        positive_indicators = await self._identify_positive_indicators(trends)
+        positive_indicators = await self._identify_positive_indicators(series)
         
         # Generate recommendations
         recommendations = await self._generate_health_recommendations(
@@ -199,6 +206,9 @@ class AdvancedAnalyticsService:
                 optimization_suggestions=[]
             )
         
+        # Build columnar series once for every metric below
+        series = self._build_series(trends)
+        
         # Analyze feeding times
         feeding_times = await self._analyze_feeding_times(trends)
         
@@ -206,13 +216,13 @@ class AdvancedAnalyticsService:
         preferred_foods = await self._analyze_preferred_foods(pet_id)
         
         # Identify nutritional gaps
-        nutritional_gaps = await self._identify_nutritional_gaps(trends)
+        nutritional_gaps = await self._identify_nutritional_gaps(series)
         
         # Analyze seasonal patterns
-        seasonal_patterns = await self._analyze_seasonal_patterns(trends)
+        seasonal_patterns = await self._analyze_seasonal_patterns(series)
         
         # Generate behavioral insights
-        behavioral_insights = await self._generate_behavioral_insights(trends, feeding_times)
+        behavioral_insights = await self._generate_behavioral_insights(series, feeding_times)
         
         # Generate optimization suggestions
         optimization_suggestions = await self._generate_optimization_suggestions(
@@ -230,26 +240,6 @@ class AdvancedAnalyticsService:
             optimization_suggestions=optimization_suggestions
         )
     
-    async def _get_cached_analytics(
-        self, 
-        pet_id: str, 
-        analysis_type: AnalyticsType
-    ) -> Optional[NutritionalAnalyticsCacheResponse]:
-        """Get cached analytics if available and not expired"""
-        response = self.supabase.table("nutritional_analytics_cache")\
-            .select("*")\
-            .eq("pet_id", pet_id)\
-            .eq("analysis_type", analysis_type.value)\
-            .gt("expires_at", DateTimeService.now_iso())\
-            .order("generated_at", desc=True)\
-            .limit(1)\
-            .execute()
-        
-        if response.data:
-            return NutritionalAnalyticsCacheResponse(**response.data[0])
-        
-        return None
-    
     async def _perform_analysis(
         self, 
         pet_id: str, 
@@ -270,43 +260,17 @@ class AdvancedAnalyticsService:
         else:
             raise ValueError(f"Unknown analysis type: {analysis_type}")
     
-    async def _cache_analytics(
-        self, 
-        pet_id: str, 
-        analysis_type: AnalyticsType,
-        analysis_data: Dict[str, Any]
-    ) -> NutritionalAnalyticsCacheResponse:
-        """Cache analytics results"""
-        # Set expiration time based on analysis type
-        expiration_hours = {
-            AnalyticsType.WEEKLY_SUMMARY: 24,
-            AnalyticsType.MONTHLY_TRENDS: 72,
-            AnalyticsType.HEALTH_INSIGHTS: 48,
-            AnalyticsType.WEIGHT_ANALYSIS: 24,
-            AnalyticsType.NUTRITIONAL_PATTERNS: 72
-        }
-        
-        expires_at = DateTimeService.now() + timedelta(hours=expiration_hours.get(analysis_type, 24))
-        
-        cache_data = {
-            "pet_id": pet_id,
-            "analysis_type": analysis_type.value,
-            "analysis_data": analysis_data,
-            "expires_at": expires_at.isoformat()
-        }
-        
-        db_service = DatabaseOperationService(self.supabase)
-        result = await db_service.insert_with_timestamps("nutritional_analytics_cache", cache_data)
-        
-        return NutritionalAnalyticsCacheResponse(**result)
+    def _build_series(self, trends: List[Dict[str, Any]]) -> TimeSeries:
+        """Build the columnar time series for nutritional_trends rows"""
+        return TimeSeries.from_records(trends, "trend_date", self.TREND_COLUMNS)
     
-    async def _analyze_weight_management(self, trends: List[Dict[str, Any]]) -> str:
+    async def _analyze_weight_management(self, series: TimeSeries) -> str:
         """Analyze weight management status"""
-        if not trends:
+        if len(series) == 0:
             return "no_data"
         
         # Calculate total weight change
-        total_weight_change = sum(trend.get("weight_change_kg", 0) for trend in trends)
+        total_weight_change = float(series.column("weight_change_kg").sum())
         
         if total_weight_change > 1.0:
             return "weight_gain"
@@ -315,15 +279,14 @@ class AdvancedAnalyticsService:
         else:
             return "stable"
     
-    def _calculate_nutritional_adequacy_score(self, trends: List[Dict[str, Any]]) -> float:
+    def _calculate_nutritional_adequacy_score(self, series: TimeSeries) -> float:
         """Calculate nutritional adequacy score"""
-        if not trends:
+        if len(series) == 0:
             return 0.0
         
-        compatibility_scores = [trend.get("average_compatibility_score", 0) for trend in trends]
-        return statistics.mean(compatibility_scores)
+        return TimeSeriesService.mean(series.column("average_compatibility_score"))
     
-    def _calculate_feeding_consistency_score(self, trends: List[Dict[str, Any]]) -> float:
+    def _calculate_feeding_consistency_score(self, series: TimeSeries) -> float:
         """
         Calculate feeding consistency score
         
@@ -335,62 +298,51 @@ class AdvancedAnalyticsService:
             Score from 0-100, where 100 is perfectly consistent
         """
         # Need at least 2 data points to calculate consistency
-        if not trends or len(trends) < 2:
+        if len(series) < 2:
             logger.debug(
-                f"[_calculate_feeding_consistency_score] Not enough trends data: {len(trends) if trends else 0}, "
+                f"[_calculate_feeding_consistency_score] Not enough trends data: {len(series)}, "
                 f"need at least 2 for consistency calculation"
             )
             return 0.0
         
-        # Extract feeding counts from trends
-        feeding_counts = [trend.get("feeding_count", 0) for trend in trends]
-        
         # Filter out zero counts for more meaningful analysis
-        non_zero_counts = [count for count in feeding_counts if count > 0]
+        feeding_counts = series.column("feeding_count")
+        non_zero_counts = feeding_counts[feeding_counts > 0]
         
-        if not non_zero_counts:
+        if non_zero_counts.size == 0:
             logger.debug("[_calculate_feeding_consistency_score] No non-zero feeding counts found")
             return 0.0
         
-        # Calculate mean feeding count
-        mean_count = statistics.mean(non_zero_counts)
-        if mean_count == 0:
+        if non_zero_counts.size == 1:
+            # Perfect consistency if only one data point
+            return 100.0
+        
+        # Coefficient of variation (lower is more consistent)
+        cv = TimeSeriesService.coefficient_of_variation(non_zero_counts)
+        if cv is None:
             logger.debug("[_calculate_feeding_consistency_score] Mean count is 0")
             return 0.0
         
-        try:
-            # Calculate standard deviation
-            if len(non_zero_counts) == 1:
-                # Perfect consistency if only one data point
-                return 100.0
-            
-            stdev = statistics.stdev(non_zero_counts)
-            # Calculate coefficient of variation (lower is more consistent)
-            cv = stdev / mean_count
-            
-            # Convert to score (0-100, higher is more consistent)
-            # CV of 0 = 100% consistent, CV of 1.0 or higher = 0% consistent
-            consistency_score = max(0, 100 - (cv * 100))
-            
-            logger.info(
-                f"[_calculate_feeding_consistency_score] Calculated score: {consistency_score:.1f}% "
-                f"(mean={mean_count:.1f}, stdev={stdev:.2f}, cv={cv:.2f}, data_points={len(non_zero_counts)})"
-            )
-            
-            return consistency_score
-        except statistics.StatisticsError as e:
-            logger.warning(f"[_calculate_feeding_consistency_score] Statistics error: {e}")
-            return 0.0
+        # Convert to score (0-100, higher is more consistent)
+        # CV of 0 = 100% consistent, CV of 1.0 or higher = 0% consistent
+        consistency_score = max(0, 100 - (cv * 100))
+        
+        logger.info(
+            f"[_calculate_feeding_consistency_score] Calculated score: {consistency_score:.1f}% "
+            f"(cv={cv:.2f}, data_points={non_zero_counts.size})"
+        )
+        
+        return consistency_score
     
     async def _identify_health_risks(
         self, 
-        trends: List[Dict[str, Any]], 
+        series: TimeSeries, 
         weight_status: str
     ) -> List[str]:
         """Identify potential health risks"""
         risks = []
         
-        if not trends:
+        if len(series) == 0:
             return ["Insufficient data for risk assessment"]
         
         # Weight-related risks
@@ -400,60 +352,54 @@ class AdvancedAnalyticsService:
             risks.append("Weight loss may indicate underfeeding or health issues")
         
         # Nutritional risks
-        avg_compatibility = statistics.mean([t.get("average_compatibility_score", 0) for t in trends])
+        avg_compatibility = TimeSeriesService.mean(series.column("average_compatibility_score"))
         if avg_compatibility < 50:
             risks.append("Low nutritional compatibility may affect health")
         
         # Feeding consistency risks
-        feeding_counts = [t.get("feeding_count", 0) for t in trends]
-        if len(feeding_counts) > 1:
-            feeding_variance = statistics.stdev(feeding_counts)
+        if len(series) > 1:
+            feeding_variance = TimeSeriesService.stdev(series.column("feeding_count"))
             if feeding_variance > 2:
                 risks.append("Inconsistent feeding schedule may affect digestion")
         
         # Calorie risks
-        calories = [t.get("total_calories", 0) for t in trends]
-        if calories:
-            avg_calories = statistics.mean(calories)
-            if avg_calories < 150:
-                risks.append("Low calorie intake may lead to malnutrition")
-            elif avg_calories > 500:
-                risks.append("High calorie intake may lead to obesity")
+        avg_calories = TimeSeriesService.mean(series.column("total_calories"))
+        if avg_calories < 150:
+            risks.append("Low calorie intake may lead to malnutrition")
+        elif avg_calories > 500:
+            risks.append("High calorie intake may lead to obesity")
         
         return risks
     
-    async def _identify_positive_indicators(self, trends: List[Dict[str, Any]]) -> List[str]:
+    async def _identify_positive_indicators(self, series: TimeSeries) -> List[str]:
         """Identify positive health indicators"""
         indicators = []
         
-        if not trends:
+        if len(series) == 0:
             return indicators
         
         # Weight stability
-        total_weight_change = sum(t.get("weight_change_kg", 0) for t in trends)
+        total_weight_change = float(series.column("weight_change_kg").sum())
         if abs(total_weight_change) < 0.5:
             indicators.append("Excellent weight stability")
         
         # Nutritional adequacy
-        avg_compatibility = statistics.mean([t.get("average_compatibility_score", 0) for t in trends])
+        avg_compatibility = TimeSeriesService.mean(series.column("average_compatibility_score"))
         if avg_compatibility > 80:
             indicators.append("Excellent nutritional compatibility")
         elif avg_compatibility > 60:
             indicators.append("Good nutritional balance")
         
         # Feeding consistency
-        feeding_counts = [t.get("feeding_count", 0) for t in trends]
-        if len(feeding_counts) > 1:
-            feeding_variance = statistics.stdev(feeding_counts)
+        if len(series) > 1:
+            feeding_variance = TimeSeriesService.stdev(series.column("feeding_count"))
             if feeding_variance < 1:
                 indicators.append("Very consistent feeding schedule")
         
         # Calorie adequacy
-        calories = [t.get("total_calories", 0) for t in trends]
-        if calories:
-            avg_calories = statistics.mean(calories)
-            if 200 <= avg_calories <= 400:
-                indicators.append("Optimal calorie intake")
+        avg_calories = TimeSeriesService.mean(series.column("total_calories"))
+        if 200 <= avg_calories <= 400:
+            indicators.append("Optimal calorie intake")
         
         return indicators
     
@@ -577,64 +523,66 @@ class AdvancedAnalyticsService:
         # For now, return mock data
         return ["Chicken & Rice", "Salmon Formula", "Lamb & Sweet Potato"]
     
-    async def _identify_nutritional_gaps(self, trends: List[Dict[str, Any]]) -> List[str]:
+    async def _identify_nutritional_gaps(self, series: TimeSeries) -> List[str]:
         """Identify nutritional gaps in the diet"""
         gaps = []
         
-        if not trends:
+        if len(series) == 0:
             return ["Insufficient data for gap analysis"]
         
         # Analyze protein levels
-        protein_levels = [t.get("total_protein_g", 0) for t in trends]
-        if protein_levels:
-            avg_protein = statistics.mean(protein_levels)
-            if avg_protein < 20:
-                gaps.append("Low protein intake")
+        avg_protein = TimeSeriesService.mean(series.column("total_protein_g"))
+        if avg_protein < 20:
+            gaps.append("Low protein intake")
         
         # Analyze fiber levels
-        fiber_levels = [t.get("total_fiber_g", 0) for t in trends]
-        if fiber_levels:
-            avg_fiber = statistics.mean(fiber_levels)
-            if avg_fiber < 5:
-                gaps.append("Insufficient fiber intake")
+        avg_fiber = TimeSeriesService.mean(series.column("total_fiber_g"))
+        if avg_fiber < 5:
+            gaps.append("Insufficient fiber intake")
         
         return gaps
     
-    async def _analyze_seasonal_patterns(self, trends: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Analyze seasonal patterns in nutrition"""
-        # This would analyze trends over different seasons
-        # For now, return mock data
+    async def _analyze_seasonal_patterns(self, series: TimeSeries) -> Dict[str, Any]:
+        """
+        Analyze seasonal patterns in nutrition
+        
+        Groups daily trends by meteorological season and reports mean calories
+        and feeding frequency for each season that has data.
+        """
+        seasonality = TimeSeriesService.seasonality(
+            series, ("total_calories", "feeding_count"), period="season"
+        )
+        
         return {
-            "winter": {"calories": 320, "feeding_frequency": 2.1},
-            "spring": {"calories": 300, "feeding_frequency": 2.0},
-            "summer": {"calories": 280, "feeding_frequency": 1.9},
-            "fall": {"calories": 310, "feeding_frequency": 2.0}
+            season: {
+                "calories": values.get("total_calories", 0.0),
+                "feeding_frequency": values.get("feeding_count", 0.0),
+                "days": values["count"]
+            }
+            for season, values in seasonality["buckets"].items()
         }
     
     async def _generate_behavioral_insights(
         self, 
-        trends: List[Dict[str, Any]], 
+        series: TimeSeries, 
         feeding_times: List[str]
     ) -> List[str]:
         """Generate behavioral insights from patterns"""
         insights = []
         
-        if not trends:
+        if len(series) == 0:
             return ["Insufficient data for behavioral analysis"]
         
-        # Analyze feeding frequency patterns
-        feeding_counts = [t.get("feeding_count", 0) for t in trends]
-        if len(feeding_counts) > 1:
-            avg_feedings = statistics.mean(feeding_counts)
+        if len(series) > 1:
+            # Analyze feeding frequency patterns
+            avg_feedings = TimeSeriesService.mean(series.column("feeding_count"))
             if avg_feedings > 2.5:
                 insights.append("Pet prefers frequent small meals")
             elif avg_feedings < 1.5:
                 insights.append("Pet prefers fewer large meals")
-        
-        # Analyze calorie consistency
-        calories = [t.get("total_calories", 0) for t in trends]
-        if len(calories) > 1:
-            calorie_variance = statistics.stdev(calories)
+            
+            # Analyze calorie consistency
+            calorie_variance = TimeSeriesService.stdev(series.column("total_calories"))
             if calorie_variance < 50:
                 insights.append("Very consistent appetite and feeding behavior")
             elif calorie_variance > 150:
@@ -0,0 +1,399 @@
+"""
+Analytics Cache Service
+
+Tiered cache in front of the nutritional_analytics_cache table:
+- L1: in-process LRU (no I/O)
+- L2: Redis, shared between workers (when configured)
+- L3: nutritional_analytics_cache table, one row per (pet_id, analysis_type)
+
+Concurrent misses for the same key are coalesced so an expensive analysis
+runs once per change, and new feeding/weight data invalidates every tier,
+including results still being computed from the old data.
+"""
+
+import asyncio
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from supabase import Client
+
+from app.models.nutrition.advanced_nutrition import (
+    AnalyticsType, NutritionalAnalyticsCacheResponse
+)
+from app.shared.services.cache_service import CacheEntry, SingleFlight, cache_service
+from app.shared.services.database_operation_service import DatabaseOperationService
+from app.shared.services.datetime_service import DateTimeService
+from app.shared.utils.async_supabase import execute_async
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class AnalyticsCacheService:
+    """
+    Write-through cache for advanced analytics results
+
+    Reads go L1 -> L2 -> L3 and back-fill the faster tiers. Writes upsert the
+    table row and then populate L2 and L1. Per-process L1 entries are capped
+    at a short TTL so other workers' invalidations (which only reach this
+    worker through L2/L3) are observed quickly.
+
+    A result whose pet is invalidated while it is being computed is dropped
+    from every tier after it is written. Invalidations in this process mark
+    its in-flight computations; with Redis, a per-pet generation counter
+    covers the other workers.
+    """
+
+    TABLE_NAME = "nutritional_analytics_cache"
+    CONFLICT_COLUMNS = "pet_id,analysis_type"
+    KEY_PREFIX = "analytics"
+
+    # Expiration per analysis type (hours)
+    EXPIRATION_HOURS = {
+        AnalyticsType.WEEKLY_SUMMARY: 24,
+        AnalyticsType.MONTHLY_TRENDS: 72,
+        AnalyticsType.HEALTH_INSIGHTS: 48,
+        AnalyticsType.WEIGHT_ANALYSIS: 24,
+        AnalyticsType.NUTRITIONAL_PATTERNS: 72
+    }
+    DEFAULT_EXPIRATION_HOURS = 24
+
+    L1_MAX_ENTRIES = 1024
+    L1_TTL_SECONDS = 60  # bounds staleness after another worker's invalidation
+    GENERATION_TTL_SECONDS = 3600  # outlives any computation
+    LOCK_TTL_SECONDS = 30
+    LOCK_WAIT_SECONDS = 5.0
+    LOCK_POLL_INTERVAL = 0.1
+
+    # Shared across instances - services are constructed per request
+    _l1: "OrderedDict[str, CacheEntry]" = OrderedDict()
+    _single_flight = SingleFlight()
+    _computing: Dict[str, Set["_Computation"]] = {}
+
+    def __init__(self, supabase: Client):
+        """
+        Initialize analytics cache service
+
+        Args:
+            supabase: Authenticated Supabase client (for RLS compliance)
+        """
+        self.supabase = supabase
+
+    @classmethod
+    def cache_key(cls, pet_id: str, analysis_type: AnalyticsType) -> str:
+        """Build the cache key shared by L1 and L2"""
+        return f"{cls.KEY_PREFIX}:{pet_id}:{analysis_type.value}"
+
+    @classmethod
+    def generation_key(cls, pet_id: str) -> str:
+        """Redis key counting a pet's invalidations"""
+        return f"{cls.KEY_PREFIX}:{pet_id}:generation"
+
+    async def get_or_compute(
+        self,
+        pet_id: str,
+        analysis_type: AnalyticsType,
+        compute: Callable[[], Awaitable[Dict[str, Any]]],
+        force_refresh: bool = False
+    ) -> NutritionalAnalyticsCacheResponse:
+        """
+        Return cached analytics or compute, persist and cache them
+
+        Args:
+            pet_id: Pet ID
+            analysis_type: Analysis type
+            compute: Coroutine factory producing analysis_data
+            force_refresh: Skip cache reads and recompute
+
+        Returns:
+            Analytics cache response
+        """
+        if not force_refresh:
+            cached = await self.get(pet_id, analysis_type)
+            if cached:
+                return cached
+
+        key = self.cache_key(pet_id, analysis_type)
+        return await self._single_flight.do(
+            key,
+            lambda: self._compute_and_store(pet_id, analysis_type, compute, force_refresh)
+        )
+
+    async def get(
+        self,
+        pet_id: str,
+        analysis_type: AnalyticsType
+    ) -> Optional[NutritionalAnalyticsCacheResponse]:
+        """
+        Read analytics through the cache tiers
+
+        Args:
+            pet_id: Pet ID
+            analysis_type: Analysis type
+
+        Returns:
+            Unexpired cached analytics, or None
+        """
+        key = self.cache_key(pet_id, analysis_type)
+
+        # L1
+        row = self._l1_get(key)
+        if row is not None:
+            return self._to_response(row)
+
+        # L2
+        if cache_service.redis_enabled:
+            row = await cache_service.get(key)
+            if row and self._is_fresh(row):
+                self._l1_set(key, row)
+                return self._to_response(row)
+
+        # L3
+        row = await self._read_row(pet_id, analysis_type)
+        if row and self._is_fresh(row):
+            await self._populate(key, row)
+            return self._to_response(row)
+
+        return None
+
+    async def invalidate_pet(self, pet_id: str) -> None:
+        """
+        Drop all cached analytics for a pet from every tier
+
+        Called after feeding or weight data changes. Failures are logged and
+        swallowed so cache maintenance never fails the triggering write.
+
+        Args:
+            pet_id: Pet ID
+        """
+        keys = [self.cache_key(pet_id, analysis_type) for analysis_type in AnalyticsType]
+        for computation in self._computing.get(pet_id, ()):
+            computation.invalidated = True
+        for key in keys:
+            self._l1.pop(key, None)
+
+        try:
+            if cache_service.redis_enabled:
+                # Bumped before the deletes, so a computation that stores after
+                # them sees it (see _compute_and_store)
+                generation_key = self.generation_key(pet_id)
+                await cache_service.redis_client.incr(generation_key)
+                await cache_service.redis_client.expire(generation_key, self.GENERATION_TTL_SECONDS)
+                await cache_service.redis_client.delete(*keys)
+
+            await execute_async(
+                lambda: self.supabase.table(self.TABLE_NAME)
+                    .delete()
+                    .eq("pet_id", pet_id)
+                    .execute(),
+                table_name=self.TABLE_NAME
+            )
+        except Exception as e:
+            logger.warning(f"Failed to invalidate analytics cache for pet {pet_id}: {e}")
+
+    async def _compute_and_store(
+        self,
+        pet_id: str,
+        analysis_type: AnalyticsType,
+        compute: Callable[[], Awaitable[Dict[str, Any]]],
+        force_refresh: bool
+    ) -> NutritionalAnalyticsCacheResponse:
+        """Compute under a distributed lock (when Redis is available) and write through"""
+        key = self.cache_key(pet_id, analysis_type)
+        lock_key = f"{key}:lock"
+        computation = _Computation()
+        self._computing.setdefault(pet_id, set()).add(computation)
+        generation = await self._shared_generation(pet_id)
+        lock_acquired = await self._acquire_lock(lock_key)
+
+        try:
+            if not lock_acquired:
+                # Another worker is computing - wait for it to publish to L2
+                row = await self._wait_for_l2(key)
+                if row:
+                    self._l1_set(key, row)
+                    return self._to_response(row)
+            elif not force_refresh:
+                # Re-check L2 after winning the lock in case another worker just finished
+                row = await cache_service.get(key) if cache_service.redis_enabled else None
+                if row and self._is_fresh(row):
+                    self._l1_set(key, row)
+                    return self._to_response(row)
+
+            analysis_data = await compute()
+            row = await self._write_row(pet_id, analysis_type, analysis_data)
+            await self._populate(key, row)
+
+            # Checked after storing: an invalidation that deleted before our
+            # writes has already marked the computation or bumped the generation
+            if computation.invalidated or await self._shared_generation(pet_id) != generation:
+                logger.info(f"{key} was invalidated while computing; dropping the stored result")
+                await self._drop(pet_id, analysis_type)
+            return self._to_response(row)
+        finally:
+            computing = self._computing.get(pet_id)
+            if computing is not None:
+                computing.discard(computation)
+                if not computing:
+                    self._computing.pop(pet_id, None)
+            if lock_acquired and cache_service.redis_enabled:
+                try:
+                    await cache_service.redis_client.delete(lock_key)
+                except Exception as e:
+                    logger.warning(f"Failed to release analytics lock {lock_key}: {e}")
+
+    async def _shared_generation(self, pet_id: str) -> Optional[Any]:
+        """The pet's invalidation count in Redis (None without Redis or on errors)"""
+        if not cache_service.redis_enabled:
+            return None
+        try:
+            return await cache_service.redis_client.get(self.generation_key(pet_id))
+        except Exception as e:
+            logger.warning(f"Failed to read analytics generation for pet {pet_id}: {e}")
+            return None
+
+    async def _drop(self, pet_id: str, analysis_type: AnalyticsType) -> None:
+        """Remove one analysis from every tier"""
+        key = self.cache_key(pet_id, analysis_type)
+        self._l1.pop(key, None)
+        try:
+            if cache_service.redis_enabled:
+                await cache_service.redis_client.delete(key)
+            await execute_async(
+                lambda: self.supabase.table(self.TABLE_NAME)
+                    .delete()
+                    .eq("pet_id", pet_id)
+                    .eq("analysis_type", analysis_type.value)
+                    .execute(),
+                table_name=self.TABLE_NAME
+            )
+        except Exception as e:
+            logger.warning(f"Failed to drop analytics cache {key}: {e}")
+
+    async def _acquire_lock(self, lock_key: str) -> bool:
+        """Try to take the cross-worker compute lock (always succeeds without Redis)"""
+        if not cache_service.redis_enabled:
+            return True
+        try:
+            acquired = await cache_service.redis_client.set(
+                lock_key, "1", nx=True, ex=self.LOCK_TTL_SECONDS
+            )
+            return bool(acquired)
+        except Exception as e:
+            logger.warning(f"Redis lock error for {lock_key}: {e}. Computing without lock.")
+            return True
+
+    async def _wait_for_l2(self, key: str) -> Optional[Dict[str, Any]]:
+        """Poll L2 until another worker publishes the value or the wait times out"""
+        deadline = asyncio.get_running_loop().time() + self.LOCK_WAIT_SECONDS
+        while asyncio.get_running_loop().time() < deadline:
+            await asyncio.sleep(self.LOCK_POLL_INTERVAL)
+            row = await cache_service.get(key)
+            if row and self._is_fresh(row):
+                return row
+        logger.info(f"Timed out waiting for {key}; computing locally")
+        return None
+
+    async def _read_row(self, pet_id: str, analysis_type: AnalyticsType) -> Optional[Dict[str, Any]]:
+        """Read the persisted row for (pet_id, analysis_type)"""
+        response = await execute_async(
+            lambda: self.supabase.table(self.TABLE_NAME)
+                .select("*")
+                .eq("pet_id", pet_id)
+                .eq("analysis_type", analysis_type.value)
+                .gt("expires_at", DateTimeService.now_iso())
+                .limit(1)
+                .execute(),
+            table_name=self.TABLE_NAME
+        )
+        return response.data[0] if response.data else None
+
+    async def _write_row(
+        self,
+        pet_id: str,
+        analysis_type: AnalyticsType,
+        analysis_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Upsert the persisted row keyed by (pet_id, analysis_type)"""
+        now = DateTimeService.now()
+        hours = self.EXPIRATION_HOURS.get(analysis_type, self.DEFAULT_EXPIRATION_HOURS)
+
+        cache_data = {
+            "pet_id": pet_id,
+            "analysis_type": analysis_type.value,
+            "analysis_data": analysis_data,
+            "generated_at": now,
+            "expires_at": now + timedelta(hours=hours)
+        }
+
+        db_service = DatabaseOperationService(self.supabase)
+        rows = await db_service.upsert_on_conflict(
+            self.TABLE_NAME,
+            cache_data,
+            on_conflict=self.CONFLICT_COLUMNS,
+            include_created_at=False,
+            include_updated_at=False
+        )
+        if not rows:
+            raise ValueError("Failed to persist analytics cache")
+        return rows[0]
+
+    async def _populate(self, key: str, row: Dict[str, Any]) -> None:
+        """Write a row to L2 and L1"""
+        ttl = self._remaining_seconds(row)
+        if ttl <= 0:
+            return
+        if cache_service.redis_enabled:
+            await cache_service.set(key, row, ttl)
+        self._l1_set(key, row)
+
+    def _l1_get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Read from L1, evicting expired entries"""
+        entry = self._l1.get(key)
+        if entry is None:
+            return None
+        if entry.is_expired() or not self._is_fresh(entry.data):
+            self._l1.pop(key, None)
+            return None
+        self._l1.move_to_end(key)
+        return entry.data
+
+    def _l1_set(self, key: str, row: Dict[str, Any]) -> None:
+        """Write to L1 with LRU eviction"""
+        ttl = min(self._remaining_seconds(row), self.L1_TTL_SECONDS)
+        if ttl <= 0:
+            return
+        self._l1[key] = CacheEntry(row, ttl)
+        self._l1.move_to_end(key)
+        while len(self._l1) > self.L1_MAX_ENTRIES:
+            self._l1.popitem(last=False)
+
+    @staticmethod
+    def _remaining_seconds(row: Dict[str, Any]) -> float:
+        """Seconds until the row's expires_at"""
+        response = NutritionalAnalyticsCacheResponse(**row)
+        expires_at = response.expires_at
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=DateTimeService.now().tzinfo)
+        return (expires_at - DateTimeService.now()).total_seconds()
+
+    @classmethod
+    def _is_fresh(cls, row: Dict[str, Any]) -> bool:
+        """Whether a row has not yet expired"""
+        try:
+            return cls._remaining_seconds(row) > 0
+        except Exception:
+            return False
+
+    @staticmethod
+    def _to_response(row: Dict[str, Any]) -> NutritionalAnalyticsCacheResponse:
+        """Convert a cached row to the response model"""
+        return NutritionalAnalyticsCacheResponse(**row)
+
+
+class _Computation:
+    """An analysis being computed; marked when its pet is invalidated meanwhile"""
+
+    def __init__(self):
+        self.invalidated = False
@@ -8,8 +8,8 @@ Extracted from advanced_analytics_service.py for better single responsibility.
 from typing import List, Optional, Dict, Any
 from datetime import datetime, date, timedelta
 from app.shared.services.datetime_service import DateTimeService
+from app.shared.services.time_series_service import TimeSeries, TimeSeriesService
 from decimal import Decimal
-import statistics
 
 from supabase import Client
 from app.models.nutrition.advanced_nutrition import HealthInsights
@@ -94,12 +94,13 @@ class HealthAnalyticsService:
         try:
             # Get weight data
             weight_data = await self._get_weight_data(pet_id, date_range)
+            weight_series = TimeSeries.from_records(weight_data, "date", ("weight",))
             
             # Analyze weight trends
-            weight_trend = await self._analyze_weight_trend(weight_data)
+            weight_trend = await self._analyze_weight_trend(weight_series)
             
             # Calculate weight management score
-            management_score = await self._calculate_weight_management_score(weight_data)
+            management_score = await self._calculate_weight_management_score(weight_series)
             
             # Generate weight recommendations
             recommendations = await self._generate_weight_recommendations(weight_data, weight_trend)
@@ -278,47 +279,41 @@ class HealthAnalyticsService:
             }
         ]
     
-    async def _analyze_weight_trend(self, weight_data: List[Dict[str, Any]]) -> str:
+    async def _analyze_weight_trend(self, weight_series: TimeSeries) -> str:
         """
         Analyze weight trend
         
         Args:
-            weight_data: Weight data records
+            weight_series: Weight time series
             
         Returns:
             Weight trend description
         """
-        if len(weight_data) < 2:
+        if len(weight_series) < 2:
             return "insufficient_data"
         
-        weights = [record.get("weight", 0) for record in weight_data]
-        if weights:
-            if weights[-1] > weights[0]:
-                return "increasing"
-            elif weights[-1] < weights[0]:
-                return "decreasing"
-            else:
-                return "stable"
-        
-        return "stable"
+        # Direction of the least-squares fit over elapsed days
+        fit = TimeSeriesService.least_squares(
+            weight_series.elapsed_days(), weight_series.column("weight")
+        )
+        return TimeSeriesService.classify_change(fit["slope"], 0.0)
     
-    async def _calculate_weight_management_score(self, weight_data: List[Dict[str, Any]]) -> float:
+    async def _calculate_weight_management_score(self, weight_series: TimeSeries) -> float:
         """
         Calculate weight management score
         
         Args:
-            weight_data: Weight data records
+            weight_series: Weight time series
             
         Returns:
             Weight management score (0-100)
         """
-        if not weight_data:
+        if len(weight_series) == 0:
             return 0.0
         
         # Calculate consistency score
-        weights = [record.get("weight", 0) for record in weight_data]
-        if len(weights) > 1:
-            variance = statistics.variance(weights)
+        if len(weight_series) > 1:
+            variance = TimeSeriesService.variance(weight_series.column("weight"))
             consistency_score = max(0, 100 - (variance * 10))
             return min(100, consistency_score)
         
@@ -8,7 +8,7 @@ Extracted from advanced_analytics_service.py for better single responsibility.
 from typing import List, Optional, Dict, Any
 from datetime import datetime, date, timedelta
 from app.shared.services.datetime_service import DateTimeService
-import statistics
+from app.shared.services.time_series_service import TimeSeries, TimeSeriesService
 
 from supabase import Client
 from app.models.nutrition.advanced_nutrition import NutritionalPatterns
@@ -168,20 +168,18 @@ class PatternAnalyticsService:
         try:
             # Get nutritional data
             nutrition_data = await self._get_nutritional_data(pet_id, date_range)
+            series = TimeSeries.from_records(nutrition_data, "date", ("protein", "fiber"))
             
             gaps = []
             
-            # Analyze protein intake
-            protein_levels = [record.get("protein", 0) for record in nutrition_data]
-            if protein_levels:
-                avg_protein = statistics.mean(protein_levels)
+            if len(series) > 0:
+                # Analyze protein intake
+                avg_protein = TimeSeriesService.mean(series.column("protein"))
                 if avg_protein < 20:  # Example threshold
                     gaps.append("Low protein intake - consider protein-rich foods")
-            
-            # Analyze fiber intake
-            fiber_levels = [record.get("fiber", 0) for record in nutrition_data]
-            if fiber_levels:
-                avg_fiber = statistics.mean(fiber_levels)
+                
+                # Analyze fiber intake
+                avg_fiber = TimeSeriesService.mean(series.column("fiber"))
                 if avg_fiber < 3:  # Example threshold
                     gaps.append("Low fiber intake - consider fiber-rich foods")
             
@@ -263,8 +261,21 @@ class PatternAnalyticsService:
         Returns:
             Seasonal patterns analysis
         """
+        series = TimeSeries.from_records(feeding_data, "date", ("amount",))
+        seasonality = TimeSeriesService.seasonality(series, ("amount",), period="season")
+        
+        # Variation of per-season mean amounts (coefficient of variation)
+        variation = seasonality["variation"].get("amount", 0.0)
+        if len(seasonality["buckets"]) < 2 or variation < 0.1:
+            seasonal_variation = "minimal"
+        elif variation < 0.25:
+            seasonal_variation = "moderate"
+        else:
+            seasonal_variation = "significant"
+        
         return {
-            "seasonal_variation": "minimal",
+            "seasonal_variation": seasonal_variation,
+            "seasonal_amounts": seasonality["buckets"],
             "weather_correlation": "none",
             "activity_correlation": "moderate"
         }
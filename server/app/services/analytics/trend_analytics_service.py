@@ -5,10 +5,10 @@ Focused service for trend analysis, forecasting, and temporal pattern recognitio
 Extracted from advanced_analytics_service.py for better single responsibility.
 """
 
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Sequence
 from datetime import datetime, date, timedelta
 from app.shared.services.datetime_service import DateTimeService
-import statistics
+from app.shared.services.time_series_service import TimeSeries, TimeSeriesService
 
 from supabase import Client
 
@@ -24,6 +24,9 @@ class TrendAnalyticsService:
     - Predictive analytics
     """
     
+    # Numeric columns extracted from nutritional data records
+    NUTRITION_COLUMNS = ("calories", "protein", "carbs", "fat", "fiber")
+    
     def __init__(self, supabase: Client):
         """
         Initialize trend analytics service
@@ -54,11 +57,14 @@ class TrendAnalyticsService:
             # Get nutritional data
             nutrition_data = await self._get_nutritional_data(pet_id, date_range)
             
+            # Build columnar series once and reuse it for every metric
+            series = TimeSeries.from_records(nutrition_data, "date", self.NUTRITION_COLUMNS)
+            
             # Analyze calorie trends
-            calorie_trends = await self._analyze_calorie_trends(nutrition_data)
+            calorie_trends = await self._analyze_calorie_trends(series)
             
             # Analyze macronutrient trends
-            macro_trends = await self._analyze_macronutrient_trends(nutrition_data)
+            macro_trends = await self._analyze_macronutrient_trends(series)
             
             # Analyze feeding frequency trends
             frequency_trends = await self._analyze_feeding_frequency_trends(nutrition_data)
@@ -212,67 +218,52 @@ class TrendAnalyticsService:
             }
         ]
     
-    async def _analyze_calorie_trends(self, nutrition_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    async def _analyze_calorie_trends(self, series: TimeSeries) -> Dict[str, Any]:
         """
         Analyze calorie trends
         
         Args:
-            nutrition_data: Nutritional data records
+            series: Nutritional time series
             
         Returns:
             Calorie trends analysis
         """
-        if not nutrition_data:
+        if len(series) == 0:
             return {"trend": "no_data", "change_percentage": 0}
         
-        calories = [record.get("calories", 0) for record in nutrition_data]
+        calories = series.column("calories")
         
         if len(calories) < 2:
             return {"trend": "insufficient_data", "change_percentage": 0}
         
-        # Calculate trend
-        first_half = calories[:len(calories)//2]
-        second_half = calories[len(calories)//2:]
-        
-        avg_first = statistics.mean(first_half)
-        avg_second = statistics.mean(second_half)
-        
-        change_percentage = ((avg_second - avg_first) / avg_first) * 100 if avg_first > 0 else 0
-        
-        if change_percentage > 5:
-            trend = "increasing"
-        elif change_percentage < -5:
-            trend = "decreasing"
-        else:
-            trend = "stable"
+        # Least-squares trend over elapsed days
+        trend = TimeSeriesService.linear_trend(calories, series.elapsed_days())
         
         return {
-            "trend": trend,
-            "change_percentage": round(change_percentage, 2),
-            "average_calories": round(statistics.mean(calories), 2)
+            "trend": trend["trend"],
+            "change_percentage": round(trend["change_percentage"], 2),
+            "average_calories": round(TimeSeriesService.mean(calories), 2)
         }
     
-    async def _analyze_macronutrient_trends(self, nutrition_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    async def _analyze_macronutrient_trends(self, series: TimeSeries) -> Dict[str, Any]:
         """
         Analyze macronutrient trends
         
         Args:
-            nutrition_data: Nutritional data records
+            series: Nutritional time series
             
         Returns:
             Macronutrient trends analysis
         """
-        if not nutrition_data:
+        if len(series) == 0:
             return {"protein_trend": "no_data", "carb_trend": "no_data", "fat_trend": "no_data"}
         
-        proteins = [record.get("protein", 0) for record in nutrition_data]
-        carbs = [record.get("carbs", 0) for record in nutrition_data]
-        fats = [record.get("fat", 0) for record in nutrition_data]
+        days = series.elapsed_days()
         
         return {
-            "protein_trend": await self._calculate_trend(proteins),
-            "carb_trend": await self._calculate_trend(carbs),
-            "fat_trend": await self._calculate_trend(fats)
+            "protein_trend": await self._calculate_trend(series.column("protein"), days),
+            "carb_trend": await self._calculate_trend(series.column("carbs"), days),
+            "fat_trend": await self._calculate_trend(series.column("fat"), days)
         }
     
     async def _analyze_feeding_frequency_trends(self, nutrition_data: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -322,33 +313,18 @@ class TrendAnalyticsService:
         
         return insights
     
-    async def _calculate_trend(self, values: List[float]) -> str:
+    async def _calculate_trend(self, values: Sequence[float], days: Optional[Sequence[float]] = None) -> str:
         """
         Calculate trend for a list of values
         
         Args:
-            values: List of numeric values
+            values: List of numeric values in chronological order
+            days: Optional elapsed days for each value (defaults to even spacing)
             
         Returns:
             Trend description
         """
-        if len(values) < 2:
-            return "insufficient_data"
-        
-        first_half = values[:len(values)//2]
-        second_half = values[len(values)//2:]
-        
-        avg_first = statistics.mean(first_half)
-        avg_second = statistics.mean(second_half)
-        
-        change_percentage = ((avg_second - avg_first) / avg_first) * 100 if avg_first > 0 else 0
-        
-        if change_percentage > 5:
-            return "increasing"
-        elif change_percentage < -5:
-            return "decreasing"
-        else:
-            return "stable"
+        return TimeSeriesService.linear_trend(values, days)["trend"]
     
     async def _get_health_data(self, pet_id: str, date_range: Optional[Dict[str, date]] = None) -> List[Dict[str, Any]]:
         """Get health data for analysis"""
@@ -0,0 +1,219 @@
+"""
+Food Quality Catalog Service
+Catalog-wide data quality scoring with bounded memory and materialized scores
+"""
+
+from typing import Any, AsyncIterator, Dict, List, Optional
+import logging
+
+from supabase import Client
+
+from app.services.data_quality_service import (
+    DataQualityBatchScores, DataQualityLevel, DataQualityService, QualityStatsAccumulator
+)
+from app.shared.utils.async_supabase import execute_async
+
+logger = logging.getLogger(__name__)
+
+
+class FoodQualityCatalogService:
+    """
+    Streams food_items in keyset-paginated pages, scores each page with the
+    columnar DataQualityService path and optionally persists the scores to
+    food_items.quality_score / quality_level.
+    """
+
+    TABLE_NAME = "food_items"
+
+    # Columns needed for scoring (nutritional_info is the only large one)
+    SCORING_COLUMNS = "id,name,brand,barcode,nutritional_info"
+
+    # Rows per page; bounds memory regardless of catalog size
+    PAGE_SIZE = 1000
+
+    def __init__(self, supabase: Client):
+        """
+        Initialize catalog quality service
+
+        Args:
+            supabase: Supabase client (service role for persisting scores)
+        """
+        self.supabase = supabase
+
+    async def iter_pages(
+        self,
+        page_size: int = PAGE_SIZE,
+        limit: Optional[int] = None,
+        stale_only: bool = False
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Yield food_items rows page by page, ordered by id
+
+        Uses keyset pagination (id > last seen id) so every page is an index
+        range scan, however deep into the catalog it is.
+
+        Args:
+            page_size: Rows per page
+            limit: Stop after this many rows (None for the whole catalog)
+            stale_only: Only rows never scored or scored with an older
+                scoring configuration
+        """
+        last_id: Optional[str] = None
+        fetched = 0
+        version = DataQualityService.scoring_version()
+
+        while limit is None or fetched < limit:
+            size = page_size if limit is None else min(page_size, limit - fetched)
+
+            def query(after=last_id, size=size):
+                builder = self.supabase.table(self.TABLE_NAME).select(self.SCORING_COLUMNS)
+                if after is not None:
+                    builder = builder.gt("id", after)
+                if stale_only:
+                    builder = builder.or_(f"quality_version.is.null,quality_version.neq.{version}")
+                return builder.order("id").limit(size).execute()
+
+            response = await execute_async(query, table_name=self.TABLE_NAME)
+            rows = response.data or []
+            if not rows:
+                break
+
+            yield rows
+
+            fetched += len(rows)
+            last_id = rows[-1]["id"]
+            if len(rows) < size:
+                break
+
+    async def compute_statistics(
+        self,
+        limit: Optional[int] = None,
+        persist: bool = False,
+        stale_only: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Score the catalog page by page and aggregate quality statistics
+
+        Args:
+            limit: Maximum number of items to score (None for the whole catalog)
+            persist: Also write each page's scores to food_items
+            stale_only: Only score rows whose stored score is missing or stale
+
+        Returns:
+            Quality statistics (see QualityStatsAccumulator.summary)
+        """
+        stats = QualityStatsAccumulator()
+        persisted = 0
+
+        async for rows in self.iter_pages(limit=limit, stale_only=stale_only):
+            batch = DataQualityService.score_batch(rows)
+            stats.add(batch)
+            if persist:
+                persisted += await self.persist_scores(batch)
+
+        summary = stats.summary()
+        if persist:
+            summary["persisted_items"] = persisted
+        return summary
+
+    async def stored_statistics(self) -> Dict[str, Any]:
+        """
+        Aggregate quality statistics from the materialized scores
+
+        Aggregated in the database (food_quality_statistics) without scoring
+        anything, as an index-only scan over the stored quality and coverage
+        columns. Only scores of the current scoring version count towards
+        the distribution and average; the other rows are unscored_items.
+
+        Returns:
+            Quality statistics (see QualityStatsAccumulator.summary) plus
+            scored_items and unscored_items
+        """
+        response = await execute_async(
+            lambda: self.supabase.rpc("food_quality_statistics", {
+                "p_version": DataQualityService.scoring_version()
+            }).execute(),
+            table_name=self.TABLE_NAME
+        )
+        rows = response.data or []
+
+        distribution = {level.value: 0 for level in DataQualityLevel}
+        for row in rows:
+            if row["quality_level"] is not None:
+                distribution[row["quality_level"]] += int(row["items"])
+        total_items = sum(int(row["items"]) for row in rows)
+        scored_items = sum(distribution.values())
+        score_sum = sum(float(row["score_sum"]) for row in rows)
+
+        def ratio(count: float, total: int) -> float:
+            return round(count / total, 3) if total else 0.0
+
+        return {
+            "total_items": total_items,
+            "quality_distribution": distribution,
+            "average_score": ratio(score_sum, scored_items),
+            "ingredients_coverage": ratio(sum(int(row["items_with_ingredients"]) for row in rows), total_items),
+            "nutritional_coverage": ratio(sum(int(row["items_with_nutritional"]) for row in rows), total_items),
+            "scored_items": scored_items,
+            "unscored_items": total_items - scored_items
+        }
+
+    async def persist_scores(self, batch: DataQualityBatchScores) -> int:
+        """
+        Write a batch of scores to food_items in one statement
+
+        Args:
+            batch: Scored batch (items without an id are skipped)
+
+        Returns:
+            Number of rows updated
+        """
+        version = DataQualityService.scoring_version()
+        payload = [
+            {
+                "id": item_id,
+                "quality_score": round(score, 3),
+                "quality_level": level,
+                "quality_version": version
+            }
+            for item_id, score, level in zip(
+                batch.ids, batch.overall_score.tolist(), batch.levels.tolist()
+            )
+            if item_id is not None
+        ]
+        if not payload:
+            return 0
+
+        response = await execute_async(
+            lambda: self.supabase.rpc("apply_food_quality_scores", {"p_scores": payload}).execute(),
+            table_name=self.TABLE_NAME
+        )
+        return int(response.data or 0)
+
+    async def get_low_quality_items(self, threshold: float, limit: int) -> List[Dict[str, Any]]:
+        """
+        Lowest-scoring items below threshold (served by idx_food_items_quality_version_score)
+
+        Only scores of the current scoring version are compared; rows scored
+        with older weights wait for rescore_food_quality.py.
+
+        Args:
+            threshold: Quality score threshold (exclusive)
+            limit: Maximum number of rows
+
+        Returns:
+            Food item rows with their stored quality_score and quality_level,
+            worst first
+        """
+        version = DataQualityService.scoring_version()
+        response = await execute_async(
+            lambda: self.supabase.table(self.TABLE_NAME)
+                .select("id,name,brand,barcode,category,data_completeness,quality_score,quality_level")
+                .eq("quality_version", version)
+                .lt("quality_score", threshold)
+                .order("quality_score", desc=False)
+                .limit(limit)
+                .execute(),
+            table_name=self.TABLE_NAME
+        )
+        return response.data or []
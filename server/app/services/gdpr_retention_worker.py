@@ -0,0 +1,85 @@
+"""
+GDPR Retention Worker
+
+Background workers for GDPR housekeeping:
+- GDPRRetentionWorker anonymizes accounts past the retention period, a batch
+  at a time (GDPRService.cleanup_expired_data, which keeps its position
+  between batches). Full batches are spaced by
+  GDPR_RETENTION_BATCH_PAUSE_SECONDS so a large backlog is worked off
+  without saturating the database.
+- GDPRDeletionResumeWorker resumes account deletions that failed or were
+  interrupted. It has its own flag, so deletions are finished even where
+  the retention sweep is not run.
+"""
+
+from typing import Optional
+
+from app.core.config import settings
+from app.services.gdpr_service import GDPRService
+from app.shared.services.polling_worker import PollingWorker
+
+
+class _GDPRWorker(PollingWorker):
+    """Worker running a GDPRService task"""
+
+    def __init__(self, gdpr_service: Optional[GDPRService] = None):
+        """
+        Args:
+            gdpr_service: Service to run (created on first use by default)
+        """
+        super().__init__()
+        self._gdpr_service = gdpr_service
+
+    @property
+    def gdpr_service(self) -> GDPRService:
+        if self._gdpr_service is None:
+            self._gdpr_service = GDPRService()
+        return self._gdpr_service
+
+
+class GDPRRetentionWorker(_GDPRWorker):
+    """Worker that anonymizes expired accounts"""
+
+    WORKER_NAME = "GDPR retention worker"
+
+    def batch_size(self) -> int:
+        return settings.gdpr_retention_batch_size
+
+    def poll_interval(self) -> float:
+        return settings.gdpr_retention_poll_interval_seconds
+
+    def batch_pause(self) -> float:
+        return settings.gdpr_retention_batch_pause_seconds
+
+    async def dispatch_due(self, batch_size: Optional[int] = None) -> int:
+        """
+        Anonymize one batch of expired accounts
+
+        Returns:
+            Number of accounts processed
+        """
+        return await self.gdpr_service.cleanup_expired_data(batch_size)
+
+
+class GDPRDeletionResumeWorker(_GDPRWorker):
+    """Worker that resumes failed or interrupted account deletions"""
+
+    WORKER_NAME = "GDPR deletion resume worker"
+
+    # Deletion jobs resumed per batch
+    BATCH_SIZE = 10
+
+    def batch_size(self) -> int:
+        return self.BATCH_SIZE
+
+    def poll_interval(self) -> float:
+        return settings.gdpr_deletion_resume_interval_seconds
+
+    async def dispatch_due(self, batch_size: Optional[int] = None) -> int:
+        """
+        Resume one batch of deletion jobs
+
+        Returns:
+            Number of jobs that completed
+        """
+        return await self.gdpr_service.resume_failed_deletions(batch_size or self.BATCH_SIZE)
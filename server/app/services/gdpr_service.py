@@ -3,10 +3,10 @@ GDPR compliance service for data export and deletion
 """
 
 from app.utils.logging_config import get_logger
+import asyncio
 import json
 import zipfile
-import io
-from typing import Dict, Any, List, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional
 from datetime import datetime, timedelta
 from app.shared.services.datetime_service import DateTimeService
 from fastapi import HTTPException, status
@@ -14,12 +14,82 @@ from app.core.config import settings
 from app.core.database import get_supabase_client
 from app.core.database import get_supabase_service_role_client
 from app.shared.services.database_operation_service import DatabaseOperationService
+from app.shared.services.pagination_service import PaginationService
+from app.shared.services.query_builder_service import QueryBuilderService
+from app.shared.utils.async_supabase import execute_async
+from app.services.storage_service import StorageService
 
 logger = get_logger(__name__)
 
+
+class _ZipStreamBuffer:
+    """
+    Write-only file object for streaming a ZipFile
+    
+    It has no seek or tell, so zipfile writes entries with data descriptors
+    instead of seeking back to patch headers; written bytes are collected
+    until drain() hands them to the response.
+    """
+    
+    def __init__(self):
+        self._chunks: List[bytes] = []
+    
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
 class GDPRService:
     """Service for GDPR compliance operations"""
     
+    # (file in the export, table, column holding the user ID)
+    EXPORT_FILES = [
+        ("user_profile.ndjson", "users", "id"),
+        ("pets.ndjson", "pets", "user_id"),
+        ("scans.ndjson", "scans", "user_id"),
+        ("favorites.ndjson", "favorites", "user_id"),
+        ("audit_logs.ndjson", "user_activities", "user_id"),
+    ]
+    EXPORT_PAGE_SIZE = 500
+    
+    # Deletion runs these phases in order; steps within a phase run
+    # concurrently. Children go before pets and users, whose rows they
+    # reference, and the auth user last so a failed run can still be resumed.
+    DELETION_PHASES = [
+        [
+            "rows:scans",
+            "rows:favorites",
+            "rows:health_events",
+            "rows:medication_reminders",
+            "rows:scheduled_notifications",
+            "rows:user_activities",
+            "rows:security_events",
+            *(f"storage:{bucket['name']}" for bucket in StorageService.BUCKETS.values()),
+        ],
+        ["rows:pets"],
+        ["rows:users"],
+        ["auth"],
+    ]
+    DELETION_JOBS_TABLE = "gdpr_deletion_jobs"
+    MAX_DELETION_ATTEMPTS = 10
+    STALE_DELETION_MINUTES = 15
+    STORAGE_LIST_PAGE_SIZE = 1000
+    STORAGE_REMOVE_BATCH_SIZE = 100
+    
+    CHECKPOINTS_TABLE = "gdpr_job_checkpoints"
+    RETENTION_CHECKPOINT = "retention_sweep"
+    RETENTION_FAILURES_TABLE = "gdpr_retention_failures"
+    MAX_RETENTION_ATTEMPTS = 5
+    RETENTION_RETRY_MINUTES = 60
+    
     def __init__(self):
         self.supabase = get_supabase_client()
         # Use centralized service role client for admin operations
@@ -30,79 +100,84 @@ class GDPRService:
             # Fallback to regular client if service role fails
             self.service_supabase = self.supabase
     
-    def export_user_data(self, user_id: str) -> bytes:
+    def _require_service_role(self):
+        """
+        The service role client, for erasure and retention writes
+        
+        Under RLS the anon client deletes and reads none of another user's
+        rows, so a job run with the fallback client would record steps as
+        done without having removed anything.
+        
+        Raises:
+            RuntimeError: If only the anon client is available
+        """
+        if self.service_supabase is self.supabase:
+            raise RuntimeError("Service role client unavailable; GDPR jobs cannot run with the anon client")
+        return self.service_supabase
+    
+    async def stream_user_data_export(self, user_id: str) -> AsyncIterator[bytes]:
         """
-        Export all user data in GDPR-compliant format
+        Export all user data in GDPR-compliant format as a streamed ZIP
+        
+        Each table is read in keyset pages of EXPORT_PAGE_SIZE rows and written
+        as one JSON object per line (NDJSON), so memory stays bounded by a page
+        however much data the user has. The ZIP is yielded in chunks as pages
+        are compressed; manifest.json, with row counts, is written last.
         
         Args:
             user_id: User ID
             
-        Returns:
-            ZIP file containing user data
+        Yields:
+            Chunks of the ZIP file
             
         Raises:
-            HTTPException: If export fails
+            Exception: If a query fails (the stream is cut off, leaving an
+                invalid ZIP rather than a silently incomplete export)
         """
-        try:
-            # Create in-memory ZIP file
-            zip_buffer = io.BytesIO()
-            
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                # Export user profile
-                user_data = self._export_user_profile(user_id)
-                zip_file.writestr("user_profile.json", json.dumps(user_data, indent=2))
-                
-                # Export pets
-                pets_data = self._export_pets(user_id)
-                zip_file.writestr("pets.json", json.dumps(pets_data, indent=2))
-                
-                # Export scans
-                scans_data = self._export_scans(user_id)
-                zip_file.writestr("scans.json", json.dumps(scans_data, indent=2))
-                
-                # Export favorites
-                favorites_data = self._export_favorites(user_id)
-                zip_file.writestr("favorites.json", json.dumps(favorites_data, indent=2))
-                
-                # Export audit logs
-                audit_data = self._export_audit_logs(user_id)
-                zip_file.writestr("audit_logs.json", json.dumps(audit_data, indent=2))
-                
-                # Create manifest
-                manifest = {
-                    "export_date": DateTimeService.now_iso(),
-                    "user_id": user_id,
-                    "data_retention_days": settings.data_retention_days,
-                    "files": [
-                        "user_profile.json",
-                        "pets.json", 
-                        "scans.json",
-                        "favorites.json",
-                        "audit_logs.json"
-                    ],
-                    "gdpr_compliance": {
-                        "data_subject": user_id,
-                        "data_controller": "SniffTest",
-                        "legal_basis": "Consent",
-                        "purpose": "Pet food ingredient analysis and allergy management"
-                    }
+        buffer = _ZipStreamBuffer()
+        record_counts: Dict[str, int] = {}
+        
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
+            for file_name, table, user_column in self.EXPORT_FILES:
+                record_counts[file_name] = 0
+                with zip_file.open(file_name, "w", force_zip64=True) as entry:
+                    async for page in self._export_pages(table, user_column, user_id):
+                        entry.write(b"".join(
+                            json.dumps(row, default=str).encode() + b"\n" for row in page
+                        ))
+                        record_counts[file_name] += len(page)
+                        chunk = buffer.drain()
+                        if chunk:
+                            yield chunk
+            
+            manifest = {
+                "export_date": DateTimeService.now_iso(),
+                "user_id": user_id,
+                "data_retention_days": settings.data_retention_days,
+                "format": "ndjson",
+                "files": [file_name for file_name, _, _ in self.EXPORT_FILES],
+                "record_counts": record_counts,
+                "gdpr_compliance": {
+                    "data_subject": user_id,
+                    "data_controller": "SniffTest",
+                    "legal_basis": "Consent",
+                    "purpose": "Pet food ingredient analysis and allergy management"
                 }
-                zip_file.writestr("manifest.json", json.dumps(manifest, indent=2))
-            
-            zip_buffer.seek(0)
-            return zip_buffer.getvalue()
-            
-        except Exception as e:
-            logger.error(f"Failed to export user data for {user_id}: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to export user data"
-            )
+            }
+            zip_file.writestr("manifest.json", json.dumps(manifest, indent=2))
+        
+        yield buffer.drain()
     
     async def delete_user_data(self, user_id: str) -> bool:
         """
         Delete all user data (Right to be Forgotten)
         
+        Runs the deletion job for the user: DELETION_PHASES in order, the
+        steps of each phase (tables and storage buckets) concurrently, up to
+        GDPR_DELETION_CONCURRENCY at a time. Each completed step is recorded
+        in gdpr_deletion_jobs, so calling this again after a failure (or the
+        retention worker picking the job up) resumes where it stopped.
+        
         Args:
             user_id: User ID
             
@@ -116,35 +191,7 @@ class GDPRService:
             # Log deletion request
             await self._log_deletion_request(user_id)
             
-            # Get user and pet data before deletion for image cleanup
-            user_data = self.supabase.table("users").select("image_url").eq("id", user_id).execute()
-            pets_data = self.supabase.table("pets").select("image_url").eq("user_id", user_id).execute()
-            
-            # Delete user data in order (respecting foreign key constraints)
-            # 1. Delete scans
-            self.supabase.table("scans").delete().eq("user_id", user_id).execute()
-            
-            # 2. Delete favorites
-            self.supabase.table("favorites").delete().eq("user_id", user_id).execute()
-            
-            # 3. Delete pets
-            self.supabase.table("pets").delete().eq("user_id", user_id).execute()
-            
-            # 4. Delete user profile
-            self.supabase.table("users").delete().eq("id", user_id).execute()
-            
-            # 5. Delete audit logs
-            self.supabase.table("user_activities").delete().eq("user_id", user_id).execute()
-            
-            # 6. Delete security events
-            self.supabase.table("security_events").delete().eq("user_id", user_id).execute()
-            
-            # 7. Delete from Supabase Auth
-            self.service_supabase.auth.admin.delete_user(user_id)
-            
-            # 8. Delete user and pet images from storage
-            self._delete_user_images_from_storage(user_data.data, pets_data.data)
-            
+            await self._run_deletion_job(user_id)
             return True
             
         except Exception as e:
@@ -154,10 +201,186 @@ class GDPRService:
                 detail="Failed to delete user data"
             )
     
+    async def resume_failed_deletions(self, limit: int = 10) -> int:
+        """
+        Resume deletion jobs that failed or were interrupted
+        
+        A running job counts as interrupted when it has not recorded a step
+        for STALE_DELETION_MINUTES. Jobs stop being retried after
+        MAX_DELETION_ATTEMPTS.
+        
+        Args:
+            limit: Maximum number of jobs to resume
+            
+        Returns:
+            Number of jobs that completed
+        """
+        stale_before = (DateTimeService.now() - timedelta(minutes=self.STALE_DELETION_MINUTES)).isoformat()
+        response = await execute_async(
+            lambda: self.service_supabase.table(self.DELETION_JOBS_TABLE)
+                .select("user_id")
+                .or_(f'status.eq.failed,and(status.eq.running,updated_at.lt."{stale_before}")')
+                .lt("attempts", self.MAX_DELETION_ATTEMPTS)
+                .order("updated_at")
+                .limit(limit)
+                .execute(),
+            table_name=self.DELETION_JOBS_TABLE
+        )
+        
+        completed = 0
+        for job in response.data or []:
+            try:
+                await self._run_deletion_job(job["user_id"])
+                completed += 1
+            except Exception as e:
+                logger.error(f"Resumed deletion of {job['user_id']} failed: {e}")
+        return completed
+    
+    async def _run_deletion_job(self, user_id: str) -> None:
+        """
+        Start or resume a user's deletion job and run its remaining steps
+        
+        Raises:
+            RuntimeError: If a step fails (after recording the job as failed)
+        """
+        self._require_service_role()
+        response = await execute_async(
+            lambda: self.service_supabase.rpc("start_gdpr_deletion", {"p_user_id": user_id}).execute(),
+            table_name=self.DELETION_JOBS_TABLE
+        )
+        completed_steps = set(response.data or [])
+        semaphore = asyncio.Semaphore(settings.gdpr_deletion_concurrency)
+        
+        async def run_step(step: str) -> None:
+            async with semaphore:
+                await self._run_deletion_step(user_id, step)
+            await execute_async(
+                lambda: self.service_supabase.rpc(
+                    "complete_gdpr_deletion_step", {"p_user_id": user_id, "p_step": step}
+                ).execute(),
+                table_name=self.DELETION_JOBS_TABLE
+            )
+        
+        for phase in self.DELETION_PHASES:
+            steps = [step for step in phase if step not in completed_steps]
+            results = await asyncio.gather(*(run_step(step) for step in steps), return_exceptions=True)
+            errors = [f"{step}: {result}" for step, result in zip(steps, results) if isinstance(result, Exception)]
+            if errors:
+                await self._finish_deletion_job(user_id, "failed", "; ".join(errors))
+                raise RuntimeError(f"Deletion stopped at {', '.join(errors)}")
+        
+        await self._finish_deletion_job(user_id, "completed")
+    
+    async def _finish_deletion_job(self, user_id: str, job_status: str, error: Optional[str] = None) -> None:
+        """Record the outcome of a deletion run"""
+        await execute_async(
+            lambda: self.service_supabase.table(self.DELETION_JOBS_TABLE)
+                .update({"status": job_status, "last_error": error})
+                .eq("user_id", user_id)
+                .execute(),
+            table_name=self.DELETION_JOBS_TABLE
+        )
+    
+    async def _run_deletion_step(self, user_id: str, step: str) -> None:
+        """
+        Run one deletion step; every step is safe to repeat
+        
+        Args:
+            user_id: User ID
+            step: "rows:<table>", "storage:<bucket>" or "auth"
+        """
+        kind, _, target = step.partition(":")
+        if kind == "rows":
+            await self._delete_rows(target, "id" if target == "users" else "user_id", user_id)
+        elif kind == "storage":
+            await self._delete_storage_folder(target, user_id)
+        elif kind == "auth":
+            try:
+                await execute_async(lambda: self.service_supabase.auth.admin.delete_user(user_id))
+            except Exception as e:
+                # Already deleted by an earlier, interrupted run
+                if "not found" not in str(e).lower():
+                    raise
+        else:
+            raise ValueError(f"Unknown deletion step {step}")
+    
+    async def _delete_rows(self, table: str, column: str, user_id: str) -> None:
+        """
+        Delete a user's rows from a table in batches of GDPR_DELETE_BATCH_SIZE
+        
+        Short statements keep locks and WAL per statement small for users
+        with many rows, instead of one long delete holding the table.
+        
+        Raises:
+            RuntimeError: If a batch was not fully deleted, so the step is
+                not recorded as complete
+        """
+        client = self._require_service_role()
+        batch_size = settings.gdpr_delete_batch_size
+        while True:
+            response = await execute_async(
+                lambda: client.table(table).select("id").eq(column, user_id).limit(batch_size).execute(),
+                table_name=table
+            )
+            ids = [row["id"] for row in response.data or []]
+            if ids:
+                deleted = await execute_async(
+                    lambda: client.table(table).delete().in_("id", ids).execute(),
+                    table_name=table
+                )
+                if len(deleted.data or []) < len(ids):
+                    raise RuntimeError(f"Deleted {len(deleted.data or [])} of {len(ids)} {table} rows")
+            if len(ids) < batch_size:
+                return
+    
+    async def _delete_storage_folder(self, bucket_name: str, user_id: str) -> None:
+        """
+        Delete everything a user has in a storage bucket
+        
+        All of a user's objects live under "{user_id}/" (see StorageService),
+        so they are listed from there, including images no row points to any
+        more, and removed in batches of STORAGE_REMOVE_BATCH_SIZE.
+        
+        Raises:
+            RuntimeError: If a batch was not fully removed
+        """
+        bucket = self._require_service_role().storage.from_(bucket_name)
+        paths = await self._list_storage_files(bucket, bucket_name, user_id)
+        for start in range(0, len(paths), self.STORAGE_REMOVE_BATCH_SIZE):
+            batch = paths[start:start + self.STORAGE_REMOVE_BATCH_SIZE]
+            removed = await execute_async(lambda: bucket.remove(batch), table_name=bucket_name)
+            if len(removed or []) < len(batch):
+                raise RuntimeError(f"Removed {len(removed or [])} of {len(batch)} objects from {bucket_name}")
+        if paths:
+            logger.info(f"Deleted {len(paths)} objects from {bucket_name} for {user_id}")
+    
+    async def _list_storage_files(self, bucket, bucket_name: str, folder: str) -> List[str]:
+        """Paths of all files under a storage folder, walking subfolders"""
+        paths: List[str] = []
+        folders = [folder]
+        while folders:
+            current = folders.pop()
+            offset = 0
+            while True:
+                items = await execute_async(
+                    lambda: bucket.list(current, {"limit": self.STORAGE_LIST_PAGE_SIZE, "offset": offset}),
+                    table_name=bucket_name
+                ) or []
+                for item in items:
+                    # Folders are listed without an id
+                    (paths if item.get("id") else folders).append(f"{current}/{item['name']}")
+                if len(items) < self.STORAGE_LIST_PAGE_SIZE:
+                    break
+                offset += self.STORAGE_LIST_PAGE_SIZE
+        return paths
+    
     async def anonymize_user_data(self, user_id: str) -> bool:
         """
         Anonymize user data while preserving functionality
         
+        Each table is anonymized with one update over the user's rows, and
+        the tables are updated concurrently.
+        
         Args:
             user_id: User ID
             
@@ -168,59 +391,41 @@ class GDPRService:
             HTTPException: If anonymization fails
         """
         try:
+            client = self._require_service_role()
+            
             # Generate anonymous ID
             anonymous_id = f"anon_{user_id[:8]}_{DateTimeService.now().strftime('%Y%m%d')}"
+            now = DateTimeService.now_iso()
             
-            # Anonymize user profile using centralized service
-            db_service = DatabaseOperationService(self.supabase)
-            await db_service.update_with_timestamp(
-                "users",
-                user_id,
-                {
+            updates = [
+                ("users", "id", {
                     "email": f"anonymous_{anonymous_id}@deleted.local",
                     "first_name": "Anonymous",
                     "last_name": "User"
-                }
-            )
-            
-            # Anonymize pets - need to get pet IDs first
-            pets_response = self.supabase.table("pets").select("id").eq("user_id", user_id).execute()
-            if pets_response.data:
-                for pet in pets_response.data:
-                    await db_service.update_with_timestamp(
-                        "pets",
-                        pet["id"],
-                        {
-                            "name": "Anonymous Pet",
-                            "vet_name": None,
-                            "vet_phone": None
-                        }
-                    )
-            
-            # Anonymize scans - need to get scan IDs first
-            scans_response = self.supabase.table("scans").select("id").eq("user_id", user_id).execute()
-            if scans_response.data:
-                for scan in scans_response.data:
-                    await db_service.update_with_timestamp(
-                        "scans",
-                        scan["id"],
-                        {"raw_text": "[ANONYMIZED]"}
-                    )
-            
-            # Anonymize favorites - need to get favorite IDs first
-            favorites_response = self.supabase.table("favorites").select("id").eq("user_id", user_id).execute()
-            if favorites_response.data:
-                for favorite in favorites_response.data:
-                    await db_service.update_with_timestamp(
-                        "favorites",
-                        favorite["id"],
-                        {
-                            "product_name": "[ANONYMIZED]",
-                            "brand": "[ANONYMIZED]",
-                            "notes": None
-                        }
-                    )
-            
+                }),
+                ("pets", "user_id", {
+                    "name": "Anonymous Pet",
+                    "vet_name": None,
+                    "vet_phone": None
+                }),
+                ("scans", "user_id", {"raw_text": "[ANONYMIZED]"}),
+                ("favorites", "user_id", {
+                    "product_name": "[ANONYMIZED]",
+                    "brand": "[ANONYMIZED]",
+                    "notes": None
+                }),
+            ]
+            
+            def update(table: str, column: str, data: Dict[str, Any]):
+                return execute_async(
+                    lambda: client.table(table)
+                        .update({**data, "updated_at": now})
+                        .eq(column, user_id)
+                        .execute(),
+                    table_name=table
+                )
+            
+            await asyncio.gather(*(update(table, column, data) for table, column, data in updates))
             return True
             
         except Exception as e:
@@ -386,50 +591,39 @@ class GDPRService:
                 detail="Failed to get retention information"
             )
     
-    def _export_user_profile(self, user_id: str) -> Dict[str, Any]:
-        """Export user profile data"""
-        try:
-            response = self.supabase.table("users").select("*").eq("id", user_id).execute()
-            return response.data[0] if response.data else {}
-        except Exception as e:
-            logger.error(f"Failed to export user profile for {user_id}: {e}")
-            return {}
-    
-    def _export_pets(self, user_id: str) -> List[Dict[str, Any]]:
-        """Export pets data"""
-        try:
-            response = self.supabase.table("pets").select("*").eq("user_id", user_id).execute()
-            return response.data or []
-        except Exception as e:
-            logger.error(f"Failed to export pets for {user_id}: {e}")
-            return []
-    
-    def _export_scans(self, user_id: str) -> List[Dict[str, Any]]:
-        """Export scans data"""
-        try:
-            response = self.supabase.table("scans").select("*").eq("user_id", user_id).execute()
-            return response.data or []
-        except Exception as e:
-            logger.error(f"Failed to export scans for {user_id}: {e}")
-            return []
-    
-    def _export_favorites(self, user_id: str) -> List[Dict[str, Any]]:
-        """Export favorites data"""
-        try:
-            response = self.supabase.table("favorites").select("*").eq("user_id", user_id).execute()
-            return response.data or []
-        except Exception as e:
-            logger.error(f"Failed to export favorites for {user_id}: {e}")
-            return []
-    
-    def _export_audit_logs(self, user_id: str) -> List[Dict[str, Any]]:
-        """Export audit logs"""
-        try:
-            response = self.supabase.table("user_activities").select("*").eq("user_id", user_id).execute()
-            return response.data or []
-        except Exception as e:
-            logger.error(f"Failed to export audit logs for {user_id}: {e}")
-            return []
+    async def _export_pages(
+        self,
+        table: str,
+        user_column: str,
+        user_id: str
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Read a user's rows from a table in keyset pages ordered by (created_at, id)
+        
+        Args:
+            table: Table name
+            user_column: Column holding the user ID
+            user_id: User ID
+            
+        Yields:
+            Non-empty pages of at most EXPORT_PAGE_SIZE rows
+        """
+        cursor: Optional[str] = None
+        while True:
+            query = self.supabase.table(table).select("*").eq(user_column, user_id)
+            query = QueryBuilderService.apply_keyset(query, cursor, desc=False).limit(self.EXPORT_PAGE_SIZE)
+            try:
+                response = await execute_async(lambda: query.execute(), table_name=table)
+            except Exception as e:
+                logger.error(f"Failed to export {table} for {user_id}: {e}")
+                raise
+            
+            rows = response.data or []
+            if rows:
+                yield rows
+            cursor = PaginationService.next_cursor(rows, self.EXPORT_PAGE_SIZE)
+            if not cursor:
+                return
     
     async def _log_deletion_request(self, user_id: str):
         """Log data deletion request"""
@@ -448,60 +642,114 @@ class GDPRService:
         except Exception as e:
             logger.error(f"Failed to log deletion request for {user_id}: {e}")
     
-    def _delete_user_images_from_storage(self, user_data: list, pets_data: list):
+    async def cleanup_expired_data(self, batch_size: Optional[int] = None) -> int:
         """
-        Delete user and pet images from Supabase Storage
+        Anonymize the next batch of users past the retention period
+        
+        The sweep walks users with created_at before the retention cutoff in
+        (created_at, id) order and keeps its position in gdpr_job_checkpoints,
+        so each run continues where the last stopped and every user is
+        anonymized once. Run it repeatedly (see GDPRRetentionWorker).
+        
+        The position always moves past the whole batch. Users whose
+        anonymization failed are recorded in gdpr_retention_failures and
+        retried with later batches, at most every RETENTION_RETRY_MINUTES and
+        MAX_RETENTION_ATTEMPTS times in all, so one failing user cannot hold
+        up the sweep.
         
         Args:
-            user_data: List of user data with image URLs
-            pets_data: List of pet data with image URLs
-        """
-        try:
-            # Delete user profile images
-            for user in user_data:
-                if user.get("image_url"):
-                    image_url = user["image_url"]
-                    if "storage/v1/object/public/user-images/" in image_url:
-                        # Extract the storage path from the full URL
-                        storage_path = image_url.split("/storage/v1/object/public/user-images/")[-1]
-                        try:
-                            self.supabase.storage.from_("user-images").remove([storage_path])
-                        except Exception as e:
-                            logger.warning(f"Failed to delete user image {storage_path}: {e}")
+            batch_size: Users per batch (defaults to GDPR_RETENTION_BATCH_SIZE)
             
-            # Delete pet images
-            for pet in pets_data:
-                if pet.get("image_url"):
-                    image_url = pet["image_url"]
-                    if "storage/v1/object/public/pet-images/" in image_url:
-                        # Extract the storage path from the full URL
-                        storage_path = image_url.split("/storage/v1/object/public/pet-images/")[-1]
-                        try:
-                            self.supabase.storage.from_("pet-images").remove([storage_path])
-                        except Exception as e:
-                            logger.warning(f"Failed to delete pet image {storage_path}: {e}")
-                            
-        except Exception as e:
-            logger.error(f"Failed to delete images from storage: {e}")
-    
-    async def cleanup_expired_data(self):
+        Returns:
+            Number of users processed (new expired users and retries)
         """
-        Clean up data that has exceeded retention period
+        self._require_service_role()
+        batch_size = batch_size or settings.gdpr_retention_batch_size
+        now = DateTimeService.now()
+        cutoff = (now - timedelta(days=settings.data_retention_days)).isoformat()
+        retry_before = (now - timedelta(minutes=self.RETENTION_RETRY_MINUTES)).isoformat()
         
-        This should be run as a scheduled task
-        """
-        try:
-            cutoff_date = DateTimeService.now() - timedelta(days=settings.data_retention_days)
-            
-            # Find users with expired data
-            expired_users = self.supabase.table("users").select("id").lt("created_at", cutoff_date.isoformat()).execute()
-            
-            for user in expired_users.data:
-                user_id = user["id"]
-                
-                # Anonymize instead of delete for research purposes
+        checkpoint = await execute_async(
+            lambda: self.service_supabase.table(self.CHECKPOINTS_TABLE)
+                .select("cursor")
+                .eq("name", self.RETENTION_CHECKPOINT)
+                .execute(),
+            table_name=self.CHECKPOINTS_TABLE
+        )
+        cursor = checkpoint.data[0]["cursor"] if checkpoint.data else None
+        
+        query = self.service_supabase.table("users").select("id, created_at").lt("created_at", cutoff)
+        query = QueryBuilderService.apply_keyset(query, cursor, desc=False).limit(batch_size)
+        response = await execute_async(lambda: query.execute(), table_name="users")
+        users = response.data or []
+        
+        failed = await execute_async(
+            lambda: self.service_supabase.table(self.RETENTION_FAILURES_TABLE)
+                .select("user_id, attempts")
+                .lt("attempts", self.MAX_RETENTION_ATTEMPTS)
+                .lt("updated_at", retry_before)
+                .order("updated_at")
+                .limit(batch_size)
+                .execute(),
+            table_name=self.RETENTION_FAILURES_TABLE
+        )
+        retries = {row["user_id"]: row["attempts"] for row in failed.data or []}
+        
+        user_ids = list(dict.fromkeys([*(user["id"] for user in users), *retries]))
+        if not user_ids:
+            return 0
+        
+        semaphore = asyncio.Semaphore(settings.gdpr_deletion_concurrency)
+        
+        async def anonymize(user_id: str) -> None:
+            async with semaphore:
                 await self.anonymize_user_data(user_id)
-            
-            
-        except Exception as e:
-            logger.error(f"Failed to cleanup expired data: {e}")
+        
+        results = await asyncio.gather(*(anonymize(user_id) for user_id in user_ids), return_exceptions=True)
+        
+        failures = []
+        recovered = []
+        for user_id, result in zip(user_ids, results):
+            if isinstance(result, Exception):
+                logger.error(f"Retention sweep failed to anonymize user {user_id}: {result}")
+                failures.append({
+                    "user_id": user_id,
+                    "attempts": retries.get(user_id, 0) + 1,
+                    "last_error": (str(getattr(result, "detail", "")) or str(result) or type(result).__name__)[:500],
+                    "updated_at": DateTimeService.now_iso()
+                })
+            elif user_id in retries:
+                recovered.append(user_id)
+        
+        if failures:
+            await execute_async(
+                lambda: self.service_supabase.table(self.RETENTION_FAILURES_TABLE)
+                    .upsert(failures, on_conflict="user_id")
+                    .execute(),
+                table_name=self.RETENTION_FAILURES_TABLE
+            )
+        if recovered:
+            await execute_async(
+                lambda: self.service_supabase.table(self.RETENTION_FAILURES_TABLE)
+                    .delete()
+                    .in_("user_id", recovered)
+                    .execute(),
+                table_name=self.RETENTION_FAILURES_TABLE
+            )
+        
+        if users:
+            last = users[-1]
+            await execute_async(
+                lambda: self.service_supabase.table(self.CHECKPOINTS_TABLE).upsert({
+                    "name": self.RETENTION_CHECKPOINT,
+                    "cursor": PaginationService.encode_cursor(last["created_at"], last["id"]),
+                    "updated_at": DateTimeService.now_iso()
+                }, on_conflict="name").execute(),
+                table_name=self.CHECKPOINTS_TABLE
+            )
+        
+        logger.info(
+            f"Retention sweep anonymized {len(user_ids) - len(failures)}/{len(user_ids)} users "
+            f"({len(retries)} retries, {len(failures)} failed)"
+        )
+        return len(user_ids)
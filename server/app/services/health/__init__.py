@@ -6,9 +6,11 @@ Combines all health-related services into a unified interface.
 
 from .health_event_service import HealthEventService
 from .medication_reminder_service import MedicationReminderService
+from .medication_reminder_dispatcher import MedicationReminderDispatcher
 
 __all__ = [
     'HealthEventService',
     'MedicationReminderService',
+    'MedicationReminderDispatcher',
 ]
 
@@ -14,6 +14,7 @@ from app.models.health.health_event import (
     HealthEventCategory
 )
 from app.shared.services.database_operation_service import DatabaseOperationService
+from app.shared.services.query_builder_service import QueryBuilderService
 from app.utils.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -74,15 +75,19 @@ class HealthEventService:
         user_id: str,
         supabase,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
         Get health events for a specific pet
+        
+        Ordered by (event_date, id) descending. When cursor is given the page
+        starts after it and offset is ignored.
         """
         logger.info(f"🔍 [get_health_events_for_pet] Querying health events")
         logger.info(f"   pet_id: {pet_id}")
         logger.info(f"   user_id: {user_id}")
-        logger.info(f"   limit: {limit}, offset: {offset}")
+        logger.info(f"   limit: {limit}, offset: {offset}, cursor: {cursor}")
         
         # Initialize diagnostic variables
         pet_owner_id = None
@@ -141,7 +146,11 @@ class HealthEventService:
             logger.info(f"   Building query: table('health_events').select('*').eq('pet_id', '{pet_id}').order('event_date', desc=True).range({offset}, {offset + limit - 1})")
             print(f"🔍 [QUERY] Building query for pet_id={pet_id}, offset={offset}, limit={limit}")
             
-            response = supabase.table("health_events").select("*").eq("pet_id", pet_id).order("event_date", desc=True).range(offset, offset + limit - 1).execute()
+            query = QueryBuilderService.apply_keyset(
+                supabase.table("health_events").select("*").eq("pet_id", pet_id), cursor, "event_date"
+            )
+            query = query.limit(limit) if cursor else query.range(offset, offset + limit - 1)
+            response = query.execute()
             
             result_count = len(response.data) if response.data else 0
             logger.info(f"   Events found with RLS: {result_count}")
@@ -184,12 +193,22 @@ class HealthEventService:
         user_id: str,
         supabase,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
         Get health events for a specific pet filtered by category
+        
+        Ordered by (event_date, id) descending. When cursor is given the page
+        starts after it and offset is ignored.
         """
-        response = supabase.table("health_events").select("*").eq("pet_id", pet_id).eq("user_id", user_id).eq("event_category", category).order("event_date", desc=True).range(offset, offset + limit - 1).execute()
+        query = QueryBuilderService.apply_keyset(
+            supabase.table("health_events").select("*").eq("pet_id", pet_id).eq("user_id", user_id).eq("event_category", category),
+            cursor,
+            "event_date"
+        )
+        query = query.limit(limit) if cursor else query.range(offset, offset + limit - 1)
+        response = query.execute()
         
         if not response.data:
             return []
@@ -275,7 +294,10 @@ class HealthEventService:
         
         # Use RLS like the main query - don't add explicit user_id filter
         # RLS policy automatically filters by auth.uid() = user_id
-        response = supabase.table("health_events").select("id", count="exact").eq("pet_id", pet_id).execute()
+        # Estimated count, without fetching the ids themselves
+        response = supabase.table("health_events").select(
+            "id", count=QueryBuilderService.ESTIMATED_COUNT, head=True
+        ).eq("pet_id", pet_id).execute()
         
         count = response.count or 0
         logger.info(f"📊 [get_health_events_count_for_pet] Count: {count} for pet_id={pet_id}, user_id={user_id}")
@@ -0,0 +1,162 @@
+"""
+Medication Reminder Dispatcher
+
+Sends medication reminders from the server. Each active reminder carries
+next_fire_at, its next dose time; the dispatcher claims due reminders in
+batches through claim_due_medication_reminders (partial index on
+next_fire_at, FOR UPDATE SKIP LOCKED under a lease), pushes them over the
+shared APNs client and moves each reminder on to its following dose.
+
+Only reminders with a timezone are sent; the others have no next_fire_at
+and are left to the app's local notifications.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+from supabase import Client
+
+from app.core.config import settings
+from app.services.health.medication_reminder_service import MedicationReminderService
+from app.services.push_notification_service import PushNotificationService
+from app.shared.services.datetime_service import DateTimeService
+from app.shared.services.polling_worker import PollingWorker
+from app.shared.utils.async_supabase import execute_async
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class MedicationReminderDispatcher(PollingWorker):
+    """Worker that pushes due medication reminders"""
+
+    TABLE_NAME = "medication_reminders"
+    WORKER_NAME = "Medication reminder dispatcher"
+
+    # Doses this late (e.g. after an outage) are skipped rather than sent
+    MISSED_DOSE_GRACE_SECONDS = 3600
+
+    def __init__(self, push_service: PushNotificationService, supabase: Optional[Client] = None):
+        """
+        Args:
+            push_service: APNs client used to send reminders
+            supabase: Service role client (defaults to the shared one on first use)
+        """
+        super().__init__()
+        self.push_service = push_service
+        self._supabase = supabase
+
+    @property
+    def supabase(self) -> Client:
+        if self._supabase is None:
+            from app.core.database import get_supabase_service_role_client
+            self._supabase = get_supabase_service_role_client()
+        return self._supabase
+
+    def batch_size(self) -> int:
+        return settings.notification_batch_size
+
+    def poll_interval(self) -> float:
+        return settings.notification_poll_interval_seconds
+
+    async def dispatch_due(self, batch_size: Optional[int] = None) -> int:
+        """
+        Claim one batch of due reminders, send them and schedule their next dose
+
+        A claimed next_fire_at that is no longer one of the reminder's dose
+        times is rescheduled without sending.
+
+        Args:
+            batch_size: Reminders to claim (defaults to NOTIFICATION_BATCH_SIZE)
+
+        Returns:
+            Number of reminders claimed
+        """
+        response = await execute_async(
+            lambda: self.supabase.rpc("claim_due_medication_reminders", {
+                "p_limit": batch_size or settings.notification_batch_size,
+                "p_lease_seconds": settings.notification_lease_seconds
+            }).execute(),
+            table_name=self.TABLE_NAME
+        )
+        claimed = response.data or []
+        if not claimed:
+            return 0
+
+        now = DateTimeService.now()
+        notifications: Dict[str, Dict[str, Any]] = {}
+        updates: List[Dict[str, Any]] = []
+        skipped = 0
+
+        for reminder in claimed:
+            fired_at = MedicationReminderService.as_utc(reminder["next_fire_at"])
+            is_dose = MedicationReminderService.compute_next_fire_at(
+                reminder, fired_at - timedelta(microseconds=1)
+            ) == fired_at
+
+            if is_dose:
+                late = (now - fired_at).total_seconds() > self.MISSED_DOSE_GRACE_SECONDS
+                if reminder.get("device_token") and not late:
+                    notifications[reminder["id"]] = {
+                        "device_token": reminder["device_token"],
+                        "payload": self.build_payload(reminder, fired_at)
+                    }
+                else:
+                    skipped += 1
+
+            next_fire_at = MedicationReminderService.compute_next_fire_at(reminder, max(now, fired_at))
+            updates.append({
+                "id": reminder["id"],
+                "fired_at": reminder["next_fire_at"],
+                "next_fire_at": next_fire_at.isoformat() if next_fire_at else None,
+                "sent": False
+            })
+
+        results = await self.push_service.send_batch_by_key(notifications) if notifications else {}
+        for update in updates:
+            result = results.get(update["id"])
+            update["sent"] = bool(result and result.success)
+
+        await execute_async(
+            lambda: self.supabase.rpc("advance_medication_reminders", {"p_updates": updates}).execute(),
+            table_name=self.TABLE_NAME
+        )
+
+        sent = sum(1 for update in updates if update["sent"])
+        logger.info(
+            f"Medication reminders: {len(claimed)} due, {sent}/{len(notifications)} sent, "
+            f"{skipped} skipped, {len(claimed) - len(notifications) - skipped} rescheduled"
+        )
+        return len(claimed)
+
+    @staticmethod
+    def build_payload(reminder: Dict[str, Any], fired_at: datetime) -> Dict[str, Any]:
+        """APNs payload matching the app's local medication notifications"""
+        pet_name = reminder.get("pet_name") or "your pet"
+        payload: Dict[str, Any] = {
+            "aps": {
+                "alert": {
+                    "title": "💊 Medication Reminder",
+                    "body": f"Time to give {reminder['medication_name']} ({reminder['dosage']}) to {pet_name}"
+                },
+                "sound": "default",
+                "badge": 1,
+                "category": "medication_reminder"
+            },
+            "type": "medication_reminder",
+            "medication_id": reminder["id"],
+            "pet_id": reminder["pet_id"],
+            "medication_name": reminder["medication_name"],
+            "dosage": reminder["dosage"],
+            "action": "view_medication"
+        }
+
+        # Which of the reminder's times this dose is, in its local time
+        local_time = fired_at.astimezone(ZoneInfo(reminder.get("timezone") or "UTC")).strftime("%H:%M")
+        for reminder_time in MedicationReminderService.parse_reminder_times(reminder.get("reminder_times")):
+            if reminder_time.get("time", "").zfill(5) == local_time:
+                payload["reminder_time"] = reminder_time["time"]
+                payload["reminder_label"] = reminder_time.get("label")
+                break
+        return payload
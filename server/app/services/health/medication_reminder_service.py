@@ -1,10 +1,14 @@
 """
 Medication Reminder Service
 Business logic for medication reminder management
+
+Every write keeps next_fire_at (the next dose time) current so the
+reminder dispatcher only has to read the reminders that are due.
 """
 
-from datetime import datetime
-from typing import List, Optional, Dict, Any
+from datetime import datetime, time, timedelta, timezone
+from typing import List, Optional, Dict, Any, Union
+from zoneinfo import ZoneInfo
 import json
 
 from app.models.health.medication_reminder import (
@@ -14,12 +18,112 @@ from app.models.health.medication_reminder import (
     MedicationReminderResponse
 )
 from app.shared.services.database_operation_service import DatabaseOperationService
+from app.shared.services.datetime_service import DateTimeService
+from app.shared.services.query_builder_service import QueryBuilderService
 from app.shared.utils.async_supabase import execute_async
 
 
 class MedicationReminderService:
     """Service for managing medication reminders"""
     
+    # Days between dose days per frequency; "once" fires on its start day
+    # only and "as_needed" is never scheduled
+    DOSE_DAY_INTERVALS = {
+        "daily": 1,
+        "twice_daily": 1,
+        "three_times_daily": 1,
+        "every_other_day": 2,
+        "weekly": 7
+    }
+    
+    # Fields that change when a reminder fires next
+    SCHEDULE_FIELDS = ("frequency", "reminder_times", "start_date", "end_date", "is_active", "timezone")
+    
+    @staticmethod
+    def compute_next_fire_at(reminder: Dict[str, Any], after: datetime) -> Optional[datetime]:
+        """
+        Next dose time strictly after a moment
+        
+        Reminder times are wall-clock times in the reminder's timezone, so a
+        09:00 dose stays at 09:00 local time across DST changes. A reminder
+        without a timezone is left to the app's local notifications and never
+        fires from the server.
+        
+        Args:
+            reminder: Reminder row or dict with the SCHEDULE_FIELDS
+            after: Aware datetime to search from
+            
+        Returns:
+            Next dose time in UTC, or None if the reminder will not fire again
+        """
+        frequency = reminder.get("frequency")
+        if not reminder.get("is_active", True) or not reminder.get("timezone"):
+            return None
+        if frequency != "once" and frequency not in MedicationReminderService.DOSE_DAY_INTERVALS:
+            return None
+        
+        times = sorted(
+            time.fromisoformat(rt["time"].zfill(5))
+            for rt in MedicationReminderService.parse_reminder_times(reminder.get("reminder_times"))
+        )
+        if not times:
+            return None
+        
+        tz = ZoneInfo(reminder["timezone"])
+        start = MedicationReminderService.as_utc(reminder["start_date"])
+        end = MedicationReminderService.as_utc(reminder["end_date"]) if reminder.get("end_date") else None
+        start_day = start.astimezone(tz).date()
+        
+        if frequency == "once":
+            days = [start_day]
+        else:
+            # First dose day on or after the later of start and after; its
+            # times may all be past, so the following dose day is also tried
+            interval = MedicationReminderService.DOSE_DAY_INTERVALS[frequency]
+            first = max(start_day, after.astimezone(tz).date())
+            first += timedelta(days=-(first - start_day).days % interval)
+            days = [first, first + timedelta(days=interval)]
+        
+        for day in days:
+            for dose_time in times:
+                fire_at = datetime.combine(day, dose_time, tzinfo=tz).astimezone(timezone.utc)
+                if fire_at <= after or fire_at < start:
+                    continue
+                if end is not None and fire_at > end:
+                    return None
+                return fire_at
+        return None
+    
+    @staticmethod
+    def as_utc(value: Union[str, datetime]) -> datetime:
+        """Parse a stored timestamp; naive values are taken as UTC"""
+        dt = DateTimeService.from_iso(value) if isinstance(value, str) else value
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.astimezone(timezone.utc)
+    
+    @staticmethod
+    def parse_reminder_times(value: Any) -> List[Dict[str, Any]]:
+        """Reminder times as a list (rows written before the migration hold a JSON string)"""
+        if isinstance(value, str):
+            try:
+                value = json.loads(value)
+            except json.JSONDecodeError:
+                return []
+        return value if isinstance(value, list) else []
+    
+    @staticmethod
+    def _parse_reminder(reminder: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalize a reminder row for responses"""
+        reminder["reminder_times"] = MedicationReminderService.parse_reminder_times(reminder.get("reminder_times"))
+        return reminder
+    
+    @staticmethod
+    def _next_fire_at_iso(reminder: Dict[str, Any]) -> Optional[str]:
+        """next_fire_at column value for a reminder as of now"""
+        next_fire_at = MedicationReminderService.compute_next_fire_at(reminder, DateTimeService.now())
+        return next_fire_at.isoformat() if next_fire_at else None
+    
     @staticmethod
     async def create_medication_reminder(
         reminder_data: MedicationReminderCreate,
@@ -37,15 +141,18 @@ class MedicationReminderService:
             "medication_name": reminder_data.medication_name,
             "dosage": reminder_data.dosage,
             "frequency": reminder_data.frequency.value,
-            "reminder_times": json.dumps([rt.model_dump() for rt in reminder_data.reminder_times]),
+            "reminder_times": [rt.model_dump() for rt in reminder_data.reminder_times],
             "start_date": reminder_data.start_date.isoformat(),
             "end_date": reminder_data.end_date.isoformat() if reminder_data.end_date else None,
-            "is_active": reminder_data.is_active
+            "is_active": reminder_data.is_active,
+            "timezone": reminder_data.timezone
         }
+        db_reminder["next_fire_at"] = MedicationReminderService._next_fire_at_iso(db_reminder)
         
         # Insert into database using centralized service
         db_service = DatabaseOperationService(supabase)
-        return await db_service.insert_with_timestamps("medication_reminders", db_reminder)
+        reminder = await db_service.insert_with_timestamps("medication_reminders", db_reminder)
+        return MedicationReminderService._parse_reminder(reminder)
     
     @staticmethod
     async def get_medication_reminders_for_pet(
@@ -54,32 +161,29 @@ class MedicationReminderService:
         supabase,
         limit: int = 50,
         offset: int = 0,
-        active_only: bool = True
+        active_only: bool = True,
+        cursor: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
         Get medication reminders for a specific pet
+        
+        Ordered by (created_at, id) descending. When cursor is given the page
+        starts after it and offset is ignored.
         """
         query = supabase.table("medication_reminders").select("*").eq("pet_id", pet_id).eq("user_id", user_id)
         
         if active_only:
             query = query.eq("is_active", True)
         
-        query = query.order("created_at", desc=True).range(offset, offset + limit - 1)
+        query = QueryBuilderService.apply_keyset(query, cursor)
+        query = query.limit(limit) if cursor else query.range(offset, offset + limit - 1)
         
         response = await execute_async(lambda: query.execute())
         
         if not response.data:
             return []
         
-        # Parse reminder times from JSON
-        for reminder in response.data:
-            if reminder.get("reminder_times"):
-                try:
-                    reminder["reminder_times"] = json.loads(reminder["reminder_times"])
-                except (json.JSONDecodeError, TypeError):
-                    reminder["reminder_times"] = []
-        
-        return response.data
+        return [MedicationReminderService._parse_reminder(reminder) for reminder in response.data]
     
     @staticmethod
     async def get_medication_reminders_for_health_event(
@@ -87,28 +191,25 @@ class MedicationReminderService:
         user_id: str,
         supabase,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
         Get medication reminders for a specific health event
+        
+        Ordered by (created_at, id) descending. When cursor is given the page
+        starts after it and offset is ignored.
         """
         query = supabase.table("medication_reminders").select("*").eq("health_event_id", health_event_id).eq("user_id", user_id)
-        query = query.order("created_at", desc=True).range(offset, offset + limit - 1)
+        query = QueryBuilderService.apply_keyset(query, cursor)
+        query = query.limit(limit) if cursor else query.range(offset, offset + limit - 1)
         
         response = await execute_async(lambda: query.execute())
         
         if not response.data:
             return []
         
-        # Parse reminder times from JSON
-        for reminder in response.data:
-            if reminder.get("reminder_times"):
-                try:
-                    reminder["reminder_times"] = json.loads(reminder["reminder_times"])
-                except (json.JSONDecodeError, TypeError):
-                    reminder["reminder_times"] = []
-        
-        return response.data
+        return [MedicationReminderService._parse_reminder(reminder) for reminder in response.data]
     
     @staticmethod
     async def get_medication_reminder_by_id(
@@ -126,16 +227,7 @@ class MedicationReminderService:
         if not response.data:
             return None
         
-        reminder = response.data[0]
-        
-        # Parse reminder times from JSON
-        if reminder.get("reminder_times"):
-            try:
-                reminder["reminder_times"] = json.loads(reminder["reminder_times"])
-            except (json.JSONDecodeError, TypeError):
-                reminder["reminder_times"] = []
-        
-        return reminder
+        return MedicationReminderService._parse_reminder(response.data[0])
     
     @staticmethod
     async def update_medication_reminder(
@@ -160,7 +252,7 @@ class MedicationReminderService:
             update_data["frequency"] = updates.frequency.value
         
         if updates.reminder_times is not None:
-            update_data["reminder_times"] = json.dumps([rt.model_dump() for rt in updates.reminder_times])
+            update_data["reminder_times"] = [rt.model_dump() for rt in updates.reminder_times]
         
         if updates.start_date is not None:
             update_data["start_date"] = updates.start_date.isoformat()
@@ -171,10 +263,19 @@ class MedicationReminderService:
         if updates.is_active is not None:
             update_data["is_active"] = updates.is_active
         
+        if updates.timezone is not None:
+            update_data["timezone"] = updates.timezone
+        
         if not update_data:
             # No updates to make
             return await MedicationReminderService.get_medication_reminder_by_id(reminder_id, user_id, supabase)
         
+        if any(field in update_data for field in MedicationReminderService.SCHEDULE_FIELDS):
+            current = await MedicationReminderService.get_medication_reminder_by_id(reminder_id, user_id, supabase)
+            if not current:
+                return None
+            update_data["next_fire_at"] = MedicationReminderService._next_fire_at_iso({**current, **update_data})
+        
         # Update in database using centralized service
         db_service = DatabaseOperationService(supabase)
         try:
@@ -182,14 +283,7 @@ class MedicationReminderService:
         except Exception:
             return None
         
-        # Parse reminder times from JSON
-        if reminder.get("reminder_times"):
-            try:
-                reminder["reminder_times"] = json.loads(reminder["reminder_times"])
-            except (json.JSONDecodeError, TypeError):
-                reminder["reminder_times"] = []
-        
-        return reminder
+        return MedicationReminderService._parse_reminder(reminder)
     
     @staticmethod
     async def delete_medication_reminder(
@@ -215,8 +309,15 @@ class MedicationReminderService:
         """
         Activate a medication reminder
         """
+        reminder = await MedicationReminderService.get_medication_reminder_by_id(reminder_id, user_id, supabase)
+        if not reminder:
+            return False
+        
         db_service = DatabaseOperationService(supabase)
-        await db_service.update_with_timestamp("medication_reminders", reminder_id, {"is_active": True})
+        await db_service.update_with_timestamp("medication_reminders", reminder_id, {
+            "is_active": True,
+            "next_fire_at": MedicationReminderService._next_fire_at_iso({**reminder, "is_active": True})
+        })
         return True
     
     @staticmethod
@@ -229,7 +330,7 @@ class MedicationReminderService:
         Deactivate a medication reminder
         """
         db_service = DatabaseOperationService(supabase)
-        await db_service.update_with_timestamp("medication_reminders", reminder_id, {"is_active": False})
+        await db_service.update_with_timestamp("medication_reminders", reminder_id, {"is_active": False, "next_fire_at": None})
         return True
     
     @staticmethod
@@ -242,7 +343,9 @@ class MedicationReminderService:
         """
         Get count of medication reminders for a pet
         """
-        query = supabase.table("medication_reminders").select("id", count="exact").eq("pet_id", pet_id).eq("user_id", user_id)
+        query = supabase.table("medication_reminders").select(
+            "id", count=QueryBuilderService.ESTIMATED_COUNT, head=True
+        ).eq("pet_id", pet_id).eq("user_id", user_id)
         
         if active_only:
             query = query.eq("is_active", True)
@@ -261,7 +364,7 @@ class MedicationReminderService:
         Get count of medication reminders for a health event
         """
         response = await execute_async(
-            lambda: supabase.table("medication_reminders").select("id", count="exact").eq("health_event_id", health_event_id).eq("user_id", user_id).execute()
+            lambda: supabase.table("medication_reminders").select("id", count=QueryBuilderService.ESTIMATED_COUNT, head=True).eq("health_event_id", health_event_id).eq("user_id", user_id).execute()
         )
         
         return response.count or 0
@@ -1,15 +1,96 @@
 """
 Server-side image optimization service
 Handles image compression, resizing, and format conversion
+
+Optimization is CPU-bound (decode, resize, JPEG encode), so async callers
+use optimize_image_async or optimize_upload_async, which run it in a small
+process pool instead of on the event loop. Uploads wait for a free worker
+before their bytes are read, so only one image per worker is held in memory
+however many uploads are in progress.
 """
 
+import asyncio
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from PIL import Image
 from io import BytesIO
-from typing import Tuple, Optional
+from typing import BinaryIO, Callable, Tuple, Optional, TypeVar, Union
+from app.core.config import settings
 from app.utils.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+T = TypeVar('T')
+
+# Shared by all requests; created on first use (see _get_pool)
+_pool: Optional[ProcessPoolExecutor] = None
+_slots: Optional[asyncio.Semaphore] = None
+# Guards swapping _pool (held briefly, never across an await or a shutdown)
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Return the optimization process pool, creating it on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawn rather than fork: forking a process that runs an event loop
+            # and HTTP client threads can deadlock the child
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.image_optimization_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def _discard_pool(broken: ProcessPoolExecutor) -> None:
+    """
+    Drop a broken pool so the next request creates a new one
+
+    Only the given instance is shut down, and without waiting: when several
+    requests see the same breakage, the first one replaces it and the others
+    leave the new pool (and its requests) alone.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _get_slots() -> asyncio.Semaphore:
+    """Return the semaphore limiting optimizations in flight to the pool size"""
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(settings.image_optimization_workers)
+    return _slots
+
+
+# Process pool entry points (must be module-level functions to be picklable)
+
+def _optimize_in_worker(image_data: bytes, target_size: int, max_size: int) -> Tuple[bytes, dict]:
+    return ImageOptimizerService.optimize_image(image_data, target_size, max_size)
+
+
+def _optimize_to_file_in_worker(image_data: bytes, output_path: str, target_size: int, max_size: int) -> dict:
+    optimized_data, metadata = ImageOptimizerService.optimize_image(image_data, target_size, max_size)
+    with open(output_path, 'wb') as output:
+        output.write(optimized_data)
+    return metadata
+
+
+def _derivatives_in_worker(image_data: bytes, output_dir: str, target_size: int, max_size: int) -> dict:
+    return ImageOptimizerService.create_derivatives(image_data, output_dir, target_size, max_size)
+
+
+def _verify_in_worker(image_data: bytes) -> dict:
+    return ImageOptimizerService.verify_image(image_data)
+
+
 class ImageOptimizerService:
     """Service for optimizing images on the server side"""
     
@@ -28,6 +109,31 @@ class ImageOptimizerService:
     # Starting JPEG quality
     START_QUALITY = 85
     
+    # Formats accepted for upload (as reported by Pillow)
+    ALLOWED_FORMATS = {'JPEG', 'PNG', 'WEBP'}
+    
+    # Content type of each allowed format
+    CONTENT_TYPES = {'JPEG': 'image/jpeg', 'PNG': 'image/png', 'WEBP': 'image/webp'}
+    
+    # Largest accepted image in pixels (rejects decompression bombs before
+    # decoding; 50MP covers current phone cameras)
+    MAX_PIXELS = 50_000_000
+    
+    # Typical JPEG size at a quality relative to its size at START_QUALITY,
+    # from highest to lowest quality; used to predict the quality that meets
+    # a size target instead of stepping down and re-encoding
+    QUALITY_SIZE_RATIOS = ((85, 1.0), (75, 0.66), (65, 0.5), (55, 0.4), (45, 0.33), (30, 0.23))
+    
+    # Downscale rounds when even MIN_QUALITY is over the target size
+    MAX_DOWNSCALE_ROUNDS = 3
+    
+    # Derivatives created per upload: name -> longest side in pixels,
+    # largest first ("full" is the optimized image, at most MAX_DIMENSION)
+    DERIVATIVE_SIZES = {"full": MAX_DIMENSION, "list": 480, "thumbnail": 200}
+    
+    # File extension -> format each derivative is written in
+    DERIVATIVE_FORMATS = {"jpg": "JPEG", "webp": "WEBP"}
+    
     @classmethod
     def optimize_image(
         cls,
@@ -36,7 +142,13 @@ class ImageOptimizerService:
         max_size: int = MAX_FILE_SIZE
     ) -> Tuple[bytes, dict]:
         """
-        Optimize image with progressive compression and resizing
+        Optimize image by resizing and predicting the JPEG quality
+        
+        Large JPEGs are downscaled while decoding (Image.draft), which is
+        much cheaper than decoding at full size and resizing. The image is
+        then encoded at START_QUALITY; only if that is over the target size
+        is it re-encoded at the quality predicted to fit (one or two more
+        encodes instead of stepping quality down by 10 per encode).
         
         Args:
             image_data: Raw image bytes
@@ -50,90 +162,13 @@ class ImageOptimizerService:
             ValueError: If image cannot be optimized within constraints
         """
         try:
-            # Open image
-            img = Image.open(BytesIO(image_data))
-            original_size = len(image_data)
-            original_dimensions = img.size
-            
-            # Convert to RGB if necessary (handles RGBA, P, L modes)
-            if img.mode != 'RGB':
-                if img.mode == 'RGBA':
-                    # Handle transparency by adding white background
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    background.paste(img, mask=img.split()[3] if len(img.split()) == 4 else None)
-                    img = background
-                else:
-                    img = img.convert('RGB')
-            
-            # Step 1: Resize if image is too large
-            if cls._should_resize(img):
-                img = cls._resize_image(img, cls.MAX_DIMENSION)
-            
-            # Step 2: Progressive compression
-            quality = cls.START_QUALITY
-            attempts = 0
-            max_attempts = 10
-            
-            while attempts < max_attempts:
-                attempts += 1
-                
-                # Compress image
-                output = BytesIO()
-                img.save(
-                    output,
-                    format='JPEG',
-                    quality=quality,
-                    optimize=True,
-                    progressive=True
-                )
-                compressed_data = output.getvalue()
-                current_size = len(compressed_data)
-                
-                # Check if size is acceptable
-                if current_size <= target_size:
-                    break
-                
-                # Reduce quality
-                quality -= 10
-                
-                # If quality too low, resize further
-                if quality < cls.MIN_QUALITY:
-                    quality = cls.MIN_QUALITY
-                    reduction_factor = (target_size / current_size) ** 0.5
-                    new_dimension = int(max(img.size) * reduction_factor)
-                    img = cls._resize_image(img, new_dimension)
-            
-            # Final size check
-            if current_size > max_size:
-                raise ValueError(
-                    f"Image size ({current_size:,} bytes) exceeds maximum "
-                    f"allowed ({max_size:,} bytes) after {attempts} optimization attempts"
-                )
-            
-            # Calculate metadata
-            compression_ratio = current_size / original_size
-            size_reduction = (1 - compression_ratio) * 100
-            
-            metadata = {
-                "original_size": original_size,
-                "optimized_size": current_size,
-                "compression_ratio": round(compression_ratio, 3),
-                "size_reduction_percent": round(size_reduction, 1),
-                "original_dimensions": {
-                    "width": original_dimensions[0],
-                    "height": original_dimensions[1]
-                },
-                "optimized_dimensions": {
-                    "width": img.size[0],
-                    "height": img.size[1]
-                },
-                "final_quality": quality,
-                "optimization_attempts": attempts
-            }
+            img, original_dimensions = cls._open_rgb(image_data)
+            compressed_data, img, quality, attempts = cls._compress(img, target_size, max_size)
+            metadata = cls._metadata(len(image_data), original_dimensions, compressed_data, img, quality, attempts)
             
             logger.info(
-                f"Image optimized: {original_size:,} → {current_size:,} bytes "
-                f"({size_reduction:.1f}% reduction)"
+                f"Image optimized: {metadata['original_size']:,} → {metadata['optimized_size']:,} bytes "
+                f"({metadata['size_reduction_percent']:.1f}% reduction, {attempts} encodes)"
             )
             
             return compressed_data, metadata
@@ -142,6 +177,354 @@ class ImageOptimizerService:
             logger.error(f"Image optimization failed: {str(e)}")
             raise ValueError(f"Image optimization failed: {str(e)}")
     
+    @classmethod
+    def create_derivatives(
+        cls,
+        image_data: bytes,
+        output_dir: str,
+        target_size: int = TARGET_FILE_SIZE,
+        max_size: int = MAX_FILE_SIZE
+    ) -> dict:
+        """
+        Write every derivative of an image from a single decode
+        
+        The full derivative is optimized as in optimize_image; each smaller
+        one is resized from the next larger (so only the first resize
+        touches the decoded image). Every derivative is written once per
+        DERIVATIVE_FORMATS entry as "<name>.<extension>" in output_dir.
+        
+        Args:
+            image_data: Raw image bytes
+            output_dir: Existing directory to write the files to
+            target_size: Target file size of the full JPEG in bytes
+            max_size: Maximum allowed file size of the full JPEG in bytes
+            
+        Returns:
+            Optimization metadata of the full JPEG (see optimize_image)
+            plus "derivatives": file name -> width, height and size
+            
+        Raises:
+            ValueError: If image cannot be optimized within constraints
+        """
+        try:
+            img, original_dimensions = cls._open_rgb(image_data)
+            full_data, img, quality, attempts = cls._compress(img, target_size, max_size)
+            metadata = cls._metadata(len(image_data), original_dimensions, full_data, img, quality, attempts)
+            
+            derivatives = {}
+            for name, dimension in cls.DERIVATIVE_SIZES.items():
+                if max(img.size) > dimension:
+                    img = cls._resize_image(img, dimension)
+                for extension, image_format in cls.DERIVATIVE_FORMATS.items():
+                    if name == "full" and image_format == "JPEG":
+                        data = full_data
+                    else:
+                        data = cls._encode(img, cls.START_QUALITY, image_format)
+                    file_name = f"{name}.{extension}"
+                    with open(os.path.join(output_dir, file_name), 'wb') as output:
+                        output.write(data)
+                    derivatives[file_name] = {"width": img.size[0], "height": img.size[1], "size": len(data)}
+            metadata["derivatives"] = derivatives
+            
+            logger.info(
+                f"Image derivatives created: {metadata['original_size']:,} bytes → "
+                f"{sum(d['size'] for d in derivatives.values()):,} bytes in {len(derivatives)} files"
+            )
+            
+            return metadata
+            
+        except Exception as e:
+            logger.error(f"Image derivative creation failed: {str(e)}")
+            raise ValueError(f"Image derivative creation failed: {str(e)}")
+    
+    @classmethod
+    def _open_rgb(cls, image_data: bytes) -> Tuple[Image.Image, Tuple[int, int]]:
+        """
+        Decode an image to RGB no larger than MAX_DIMENSION
+        
+        Returns:
+            Tuple of (image, original (width, height))
+        """
+        img = Image.open(BytesIO(image_data))
+        original_dimensions = img.size
+        
+        # Let the JPEG decoder scale by 1/2, 1/4 or 1/8 while decoding,
+        # never below the size the image is resized to
+        if img.format == 'JPEG' and cls._should_resize(img):
+            img.draft('RGB', cls._fit_dimensions(img.size, cls.MAX_DIMENSION))
+        
+        # Convert to RGB if necessary (handles RGBA, P, L modes)
+        if img.mode != 'RGB':
+            if img.mode == 'RGBA':
+                # Handle transparency by adding white background
+                background = Image.new('RGB', img.size, (255, 255, 255))
+                background.paste(img, mask=img.split()[3] if len(img.split()) == 4 else None)
+                img = background
+            else:
+                img = img.convert('RGB')
+        
+        # Resize if image is too large
+        if cls._should_resize(img):
+            img = cls._resize_image(img, cls.MAX_DIMENSION)
+        
+        return img, original_dimensions
+    
+    @classmethod
+    def _compress(
+        cls,
+        img: Image.Image,
+        target_size: int,
+        max_size: int
+    ) -> Tuple[bytes, Image.Image, int, int]:
+        """
+        Encode at the highest quality within the target size, downscaling
+        if even the minimum quality is too large
+        
+        Returns:
+            Tuple of (jpeg_bytes, encoded image, quality, encodes)
+            
+        Raises:
+            ValueError: If the result is still over max_size
+        """
+        attempts = 0
+        for _ in range(cls.MAX_DOWNSCALE_ROUNDS + 1):
+            compressed_data, quality, encodes = cls._encode_to_target(img, target_size)
+            attempts += encodes
+            current_size = len(compressed_data)
+            if current_size <= target_size:
+                break
+            reduction_factor = (target_size / current_size) ** 0.5
+            img = cls._resize_image(img, int(max(img.size) * reduction_factor))
+        
+        # Final size check
+        if current_size > max_size:
+            raise ValueError(
+                f"Image size ({current_size:,} bytes) exceeds maximum "
+                f"allowed ({max_size:,} bytes) after {attempts} optimization attempts"
+            )
+        return compressed_data, img, quality, attempts
+    
+    @staticmethod
+    def _metadata(
+        original_size: int,
+        original_dimensions: Tuple[int, int],
+        compressed_data: bytes,
+        img: Image.Image,
+        quality: int,
+        attempts: int
+    ) -> dict:
+        """Optimization metadata returned by optimize_image"""
+        current_size = len(compressed_data)
+        compression_ratio = current_size / original_size
+        size_reduction = (1 - compression_ratio) * 100
+        
+        return {
+            "original_size": original_size,
+            "optimized_size": current_size,
+            "compression_ratio": round(compression_ratio, 3),
+            "size_reduction_percent": round(size_reduction, 1),
+            "original_dimensions": {
+                "width": original_dimensions[0],
+                "height": original_dimensions[1]
+            },
+            "optimized_dimensions": {
+                "width": img.size[0],
+                "height": img.size[1]
+            },
+            "final_quality": quality,
+            "optimization_attempts": attempts
+        }
+    
+    @classmethod
+    async def optimize_image_async(
+        cls,
+        image_data: bytes,
+        target_size: int = TARGET_FILE_SIZE,
+        max_size: int = MAX_FILE_SIZE
+    ) -> Tuple[bytes, dict]:
+        """
+        Optimize image in the process pool without blocking the event loop
+        
+        Same arguments, result and errors as optimize_image.
+        """
+        async with _get_slots():
+            return await cls._run_in_pool(_optimize_in_worker, image_data, target_size, max_size)
+    
+    @classmethod
+    async def optimize_upload_async(
+        cls,
+        source: Union[bytes, BinaryIO],
+        output_path: str,
+        target_size: int = TARGET_FILE_SIZE,
+        max_size: int = MAX_FILE_SIZE
+    ) -> dict:
+        """
+        Optimize an upload in the process pool and write the JPEG to a file
+        
+        A file-like source (e.g. an UploadFile's spooled file) is only read
+        once a worker is free, and is left at the position it was passed in
+        at. The optimized image goes straight to output_path, so it can be
+        streamed to storage from disk.
+        
+        Args:
+            source: Raw image bytes or a binary file positioned at the image
+            output_path: File to write the optimized JPEG to
+            target_size: Target file size in bytes
+            max_size: Maximum allowed file size in bytes
+            
+        Returns:
+            Optimization metadata (see optimize_image)
+            
+        Raises:
+            ValueError: If image cannot be optimized within constraints
+        """
+        async with _get_slots():
+            image_data = await cls.read_source(source)
+            return await cls._run_in_pool(
+                _optimize_to_file_in_worker, image_data, output_path, target_size, max_size
+            )
+    
+    @classmethod
+    async def create_derivatives_async(
+        cls,
+        source: Union[bytes, BinaryIO],
+        output_dir: str,
+        target_size: int = TARGET_FILE_SIZE,
+        max_size: int = MAX_FILE_SIZE
+    ) -> dict:
+        """
+        Create an upload's derivatives in the process pool
+        
+        Same arguments, result and errors as create_derivatives, except
+        that source may be a file, read as in optimize_upload_async.
+        """
+        async with _get_slots():
+            image_data = await cls.read_source(source)
+            return await cls._run_in_pool(
+                _derivatives_in_worker, image_data, output_dir, target_size, max_size
+            )
+    
+    @staticmethod
+    async def read_source(source: Union[bytes, BinaryIO]) -> bytes:
+        """Raw bytes of a source, reading a file without moving its position"""
+        if isinstance(source, bytes):
+            return source
+        position = source.tell()
+        image_data = await asyncio.to_thread(source.read)
+        source.seek(position)
+        return image_data
+    
+    @classmethod
+    async def _run_in_pool(cls, func: Callable[..., T], *args) -> T:
+        """
+        Run func in the process pool; if the pool has died (e.g. a worker
+        was killed), replace it and run func in a thread instead
+        
+        The caller's slot is kept: the semaphore outlives pool replacement.
+        """
+        loop = asyncio.get_running_loop()
+        pool = _get_pool()
+        try:
+            return await loop.run_in_executor(pool, func, *args)
+        except BrokenProcessPool:
+            logger.warning("Image optimization pool broke, recreating it")
+            _discard_pool(pool)
+            return await asyncio.to_thread(func, *args)
+    
+    @classmethod
+    def shutdown_pool(cls) -> None:
+        """
+        Stop the optimization worker processes and wait for them
+        
+        Called on app shutdown, once no request holds a slot; a pool that
+        breaks while serving is replaced by _run_in_pool instead.
+        """
+        global _pool, _slots
+        with _pool_lock:
+            pool, _pool = _pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+        _slots = None
+    
+    @classmethod
+    def _encode(cls, img: Image.Image, quality: int, image_format: str = 'JPEG') -> bytes:
+        """Encode image as progressive, optimized JPEG (or as WebP)"""
+        output = BytesIO()
+        if image_format == 'WEBP':
+            img.save(output, format='WEBP', quality=quality)
+        else:
+            img.save(
+                output,
+                format='JPEG',
+                quality=quality,
+                optimize=True,
+                progressive=True
+            )
+        return output.getvalue()
+    
+    @classmethod
+    def _predict_quality(cls, size_ratio: float) -> int:
+        """
+        Highest quality expected to encode at most size_ratio times the
+        START_QUALITY size (linear interpolation of QUALITY_SIZE_RATIOS)
+        """
+        for (quality, ratio), (lower_quality, lower_ratio) in zip(
+            cls.QUALITY_SIZE_RATIOS, cls.QUALITY_SIZE_RATIOS[1:]
+        ):
+            if size_ratio >= ratio:
+                return quality
+            if size_ratio >= lower_ratio:
+                fraction = (size_ratio - lower_ratio) / (ratio - lower_ratio)
+                return lower_quality + int(fraction * (quality - lower_quality))
+        return cls.MIN_QUALITY
+    
+    @classmethod
+    def _encode_to_target(cls, img: Image.Image, target_size: int) -> Tuple[bytes, int, int]:
+        """
+        Encode at the quality predicted to fit the target size
+        
+        The first guess comes from QUALITY_SIZE_RATIOS scaled to the
+        START_QUALITY size; later guesses interpolate between the last two
+        encodes (log size is close to linear in quality), so most images
+        need two or three encodes.
+        
+        Args:
+            img: RGB image to encode
+            target_size: Target file size in bytes
+            
+        Returns:
+            Tuple of (jpeg_bytes, quality, encodes); the bytes are the
+            MIN_QUALITY encoding, over target_size, if nothing fits
+        """
+        data = cls._encode(img, cls.START_QUALITY)
+        quality, encodes = cls.START_QUALITY, 1
+        previous: Optional[Tuple[int, int]] = None
+        
+        while len(data) > target_size and quality > cls.MIN_QUALITY:
+            if previous is None:
+                predicted = cls._predict_quality(target_size / len(data))
+            else:
+                previous_quality, previous_size = previous
+                slope = (math.log(previous_size) - math.log(len(data))) / (previous_quality - quality)
+                if slope > 0:
+                    predicted = quality - math.ceil((math.log(len(data)) - math.log(target_size)) / slope)
+                else:
+                    predicted = quality - 1
+            previous = (quality, len(data))
+            # Always make progress, even if the prediction is off
+            quality = max(cls.MIN_QUALITY, min(predicted, quality - 1))
+            data = cls._encode(img, quality)
+            encodes += 1
+        return data, quality, encodes
+    
+    @staticmethod
+    def _fit_dimensions(size: Tuple[int, int], max_dimension: int) -> Tuple[int, int]:
+        """Dimensions of size scaled so its longer side is max_dimension"""
+        width, height = size
+        if width > height:
+            return max_dimension, int(max_dimension * height / width)
+        return int(max_dimension * width / height), max_dimension
+    
     @classmethod
     def _should_resize(cls, img: Image.Image) -> bool:
         """Check if image should be resized based on dimensions"""
@@ -159,20 +542,8 @@ class ImageOptimizerService:
         Returns:
             Resized PIL Image object
         """
-        width, height = img.size
-        aspect_ratio = width / height
-        
-        if width > height:
-            # Landscape
-            new_width = max_dimension
-            new_height = int(max_dimension / aspect_ratio)
-        else:
-            # Portrait or square
-            new_width = int(max_dimension * aspect_ratio)
-            new_height = max_dimension
-        
         # Use high-quality Lanczos resampling
-        return img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+        return img.resize(cls._fit_dimensions(img.size, max_dimension), Image.Resampling.LANCZOS)
     
     @classmethod
     def create_thumbnail(
@@ -210,21 +581,106 @@ class ImageOptimizerService:
         return output.getvalue()
     
     @classmethod
-    def validate_image(cls, image_data: bytes) -> bool:
+    def inspect_image(cls, source: Union[bytes, BinaryIO]) -> dict:
+        """
+        Check an upload's format and dimensions from its header
+        
+        Only the header is parsed; the pixels are not decoded. A file-like
+        source is left at the position it was passed in at.
+        
+        Args:
+            source: Raw image bytes or a binary file positioned at the image
+            
+        Returns:
+            Dictionary with format, mode, width and height
+            
+        Raises:
+            ValueError: If the data is not an image, not an allowed format,
+                or too large to decode
+        """
+        stream = BytesIO(source) if isinstance(source, bytes) else source
+        position = stream.tell()
+        try:
+            with Image.open(stream) as img:
+                info = {
+                    "format": img.format,
+                    "mode": img.mode,
+                    "width": img.size[0],
+                    "height": img.size[1]
+                }
+        except Exception as e:
+            raise ValueError(f"Invalid image file: {str(e)}")
+        finally:
+            stream.seek(position)
+        
+        if info["format"] not in cls.ALLOWED_FORMATS:
+            raise ValueError(f"Unsupported image format: {info['format']}")
+        if info["width"] * info["height"] > cls.MAX_PIXELS:
+            raise ValueError(f"Image is too large: {info['width']}x{info['height']}")
+        return info
+    
+    @classmethod
+    def verify_image(cls, image_data: bytes) -> dict:
         """
-        Validate that data is a valid image
+        Check an image like inspect_image, then decode all of it
+        
+        Truncated or corrupt pixel data is only found by decoding, which
+        inspect_image does not do.
         
         Args:
             image_data: Raw image bytes
             
+        Returns:
+            Dictionary with format, mode, width and height
+            
+        Raises:
+            ValueError: If the data is not a valid, complete image in an
+                allowed format and size
+        """
+        info = cls.inspect_image(image_data)
+        try:
+            with Image.open(BytesIO(image_data)) as img:
+                img.verify()
+            # verify() leaves the image unusable and skips the pixel data
+            with Image.open(BytesIO(image_data)) as img:
+                img.load()
+        except Exception as e:
+            raise ValueError(f"Corrupt image file: {str(e)}")
+        return info
+    
+    @classmethod
+    async def verify_upload_async(cls, source: Union[bytes, BinaryIO]) -> Tuple[bytes, dict]:
+        """
+        Read an upload and verify it (see verify_image) in the process pool
+        
+        Args:
+            source: Raw image bytes or a binary file positioned at the image
+            
+        Returns:
+            Tuple of (image bytes, image info)
+            
+        Raises:
+            ValueError: If the image is invalid
+        """
+        async with _get_slots():
+            image_data = await cls.read_source(source)
+            return image_data, await cls._run_in_pool(_verify_in_worker, image_data)
+    
+    @classmethod
+    def validate_image(cls, image_data: Union[bytes, BinaryIO]) -> bool:
+        """
+        Validate that data is an image in an allowed format and size
+        
+        Args:
+            image_data: Raw image bytes or a binary file
+            
         Returns:
             True if valid image, False otherwise
         """
         try:
-            img = Image.open(BytesIO(image_data))
-            img.verify()
+            cls.inspect_image(image_data)
             return True
-        except Exception:
+        except ValueError:
             return False
     
     @classmethod
@@ -0,0 +1,216 @@
+"""
+Notification Scheduler
+
+Durable queue for push notifications that are sent later (delayed sends,
+engagement reminders). Notifications are rows in scheduled_notifications
+ordered by send_at, so they survive restarts and deploys.
+
+Every API process runs one worker. It claims due rows in batches through
+claim_due_notifications (FOR UPDATE SKIP LOCKED under a lease), sends them
+over the shared APNs client and records the outcome, so any number of
+instances can run side by side without sending a row twice.
+"""
+
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+from supabase import Client
+
+from app.core.config import settings
+from app.services.push_notification_service import (
+    INVALID_TOKEN_REASONS, PushNotificationService, PushResult
+)
+from app.shared.services.datetime_service import DateTimeService
+from app.shared.services.polling_worker import PollingWorker
+from app.shared.utils.async_supabase import execute_async
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class ScheduledNotification:
+    """
+    A notification to send at a later time
+
+    Attributes:
+        device_token: Target device token
+        payload: APNs payload
+        delay_seconds: Seconds from now until it is sent
+        user_id: Owner, used to cancel the user's pending notifications
+        dedupe_key: Scheduling again with the same key replaces the pending one
+    """
+    device_token: str
+    payload: Dict[str, Any]
+    delay_seconds: int
+    user_id: Optional[str] = None
+    dedupe_key: Optional[str] = None
+
+
+class NotificationScheduler(PollingWorker):
+    """Schedules notifications and runs the worker that sends them"""
+
+    TABLE_NAME = "scheduled_notifications"
+    WORKER_NAME = "Scheduled notification worker"
+
+    # Retry backoff after a transient APNs failure, doubled per attempt
+    RETRY_BASE_SECONDS = 30
+    RETRY_MAX_SECONDS = 3600
+
+    def __init__(self, push_service: PushNotificationService, supabase: Optional[Client] = None):
+        """
+        Args:
+            push_service: APNs client used to send due notifications
+            supabase: Service role client (defaults to the shared one on first use)
+        """
+        super().__init__()
+        self.push_service = push_service
+        self._supabase = supabase
+
+    @property
+    def supabase(self) -> Client:
+        if self._supabase is None:
+            from app.core.database import get_supabase_service_role_client
+            self._supabase = get_supabase_service_role_client()
+        return self._supabase
+
+    async def schedule(self, notifications: List[ScheduledNotification]) -> List[str]:
+        """
+        Add notifications to the queue
+
+        Args:
+            notifications: Notifications to schedule
+
+        Returns:
+            IDs of the queued rows
+        """
+        now = DateTimeService.now()
+        rows: Dict[Any, Dict[str, Any]] = {}
+        for index, notification in enumerate(notifications):
+            # A dedupe key may appear once per statement; the last one wins
+            rows[notification.dedupe_key or index] = {
+                "user_id": notification.user_id,
+                "device_token": notification.device_token,
+                "payload": notification.payload,
+                "send_at": (now + timedelta(seconds=max(0, notification.delay_seconds))).isoformat(),
+                "dedupe_key": notification.dedupe_key
+            }
+        if not rows:
+            return []
+
+        response = await execute_async(
+            lambda: self.supabase.rpc("schedule_notifications", {"p_notifications": list(rows.values())}).execute(),
+            table_name=self.TABLE_NAME
+        )
+        return list(response.data or [])
+
+    async def cancel_user_notifications(self, user_id: str) -> int:
+        """
+        Cancel all pending notifications for a user
+
+        Args:
+            user_id: User ID to cancel notifications for
+
+        Returns:
+            Number of notifications cancelled
+        """
+        response = await execute_async(
+            lambda: self.supabase.table(self.TABLE_NAME)
+                .update({"status": "cancelled", "locked_until": None})
+                .eq("user_id", user_id)
+                .eq("status", "pending")
+                .execute(),
+            table_name=self.TABLE_NAME
+        )
+        return len(response.data or [])
+
+    async def dispatch_due(self, batch_size: Optional[int] = None) -> int:
+        """
+        Claim one batch of due notifications, send it and record the outcome
+
+        Args:
+            batch_size: Rows to claim (defaults to NOTIFICATION_BATCH_SIZE)
+
+        Returns:
+            Number of notifications claimed
+        """
+        response = await execute_async(
+            lambda: self.supabase.rpc("claim_due_notifications", {
+                "p_limit": batch_size or settings.notification_batch_size,
+                "p_lease_seconds": settings.notification_lease_seconds,
+                "p_max_attempts": settings.notification_max_attempts
+            }).execute(),
+            table_name=self.TABLE_NAME
+        )
+        claimed = response.data or []
+        if not claimed:
+            return 0
+
+        results = await self.push_service.send_batch_by_key({
+            row["id"]: {"device_token": row["device_token"], "payload": row["payload"]} for row in claimed
+        })
+
+        await self._record_results(claimed, results)
+        return len(claimed)
+
+    async def _record_results(self, claimed: List[Dict[str, Any]], results: Dict[str, PushResult]) -> None:
+        """
+        Mark rows sent, failed or due again, one update per outcome
+
+        Rows are only updated while they still hold the lease they were
+        claimed with: a row rescheduled (or claimed again after the lease ran
+        out) in the meantime is a newer notification and is left alone.
+        """
+        now = DateTimeService.now()
+        updates: Dict[tuple, List[str]] = {}
+
+        for row in claimed:
+            result = results[row["id"]]
+            if result.success:
+                key = ("sent", None, None, row["locked_until"])
+            elif self._is_retryable(result) and row["attempts"] < settings.notification_max_attempts:
+                backoff = min(self.RETRY_BASE_SECONDS * 2 ** (row["attempts"] - 1), self.RETRY_MAX_SECONDS)
+                key = ("pending", result.reason, (now + timedelta(seconds=backoff)).isoformat(), row["locked_until"])
+            else:
+                key = ("failed", result.reason, None, row["locked_until"])
+            updates.setdefault(key, []).append(row["id"])
+
+        for (status, reason, retry_at, lease), ids in updates.items():
+            data: Dict[str, Any] = {"status": status, "locked_until": None, "last_error": reason}
+            if status == "sent":
+                data["sent_at"] = now.isoformat()
+            if retry_at:
+                data["send_at"] = retry_at
+            try:
+                # Only rows still pending under this claim: a cancel or reschedule while sending wins
+                await execute_async(
+                    lambda: self.supabase.table(self.TABLE_NAME)
+                        .update(data)
+                        .in_("id", ids)
+                        .eq("status", "pending")
+                        .eq("locked_until", lease)
+                        .execute(),
+                    table_name=self.TABLE_NAME
+                )
+            except Exception as e:
+                # The lease expires and the rows are claimed again
+                logger.error(f"Failed to record {len(ids)} {status} scheduled notifications: {e}")
+
+        logger.info(
+            "Scheduled notifications dispatched: "
+            + ", ".join(f"{status}={len(ids)}" for (status, *_), ids in updates.items())
+        )
+
+    @staticmethod
+    def _is_retryable(result: PushResult) -> bool:
+        """Network errors, throttling and APNs server errors are worth retrying"""
+        if result.reason in INVALID_TOKEN_REASONS:
+            return False
+        return result.status == 0 or result.status == 429 or result.status >= 500
+
+    def batch_size(self) -> int:
+        return settings.notification_batch_size
+
+    def poll_interval(self) -> float:
+        return settings.notification_poll_interval_seconds
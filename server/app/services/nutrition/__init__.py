@@ -8,11 +8,13 @@ from .weight_tracking_service import WeightTrackingService
 from .food_comparison_service import FoodComparisonService
 from .nutritional_trends_service import NutritionalTrendsService
 from .nutritional_calculator import NutritionalCalculator
+from .nutrition_summary_service import NutritionSummaryService
 
 __all__ = [
     'WeightTrackingService',
     'FoodComparisonService',
     'NutritionalTrendsService',
     'NutritionalCalculator',
+    'NutritionSummaryService',
 ]
 
@@ -7,9 +7,10 @@ from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
 from app.shared.services.datetime_service import DateTimeService
 from decimal import Decimal
-import statistics
+import numpy as np
 from supabase import Client
 from app.shared.services.database_operation_service import DatabaseOperationService
+from app.shared.utils.async_supabase import execute_async
 from app.models.nutrition.advanced_nutrition import (
     FoodComparisonCreate, FoodComparisonResponse,
     FoodComparisonMetrics, FoodComparisonDashboard
@@ -26,6 +27,15 @@ class FoodComparisonService:
     Follows KISS by keeping comparison logic focused and simple
     """
     
+    # Columns needed to build comparison entries
+    FOOD_DETAIL_COLUMNS = (
+        "id,food_name,brand,calories_per_100g,protein_percentage,fat_percentage,"
+        "fiber_percentage,moisture_percentage,ingredients,allergens,analyzed_at"
+    )
+    
+    # Composite score weights: calories, protein, fat, fiber, cost
+    RANKING_WEIGHTS = np.array([0.25, 0.25, 0.20, 0.15, 0.15])
+    
     def __init__(self, supabase: Client):
         """
         Initialize food comparison service
@@ -187,29 +197,47 @@ class FoodComparisonService:
         return await self._generate_detailed_metrics(food_ids, foods)
     
     async def _validate_food_access(self, food_ids: List[str], user_id: str) -> None:
-        """Validate that user has access to all food IDs"""
-        for food_id in food_ids:
-            response = self.supabase.table("food_analyses")\
-                .select("id")\
-                .eq("id", food_id)\
-                .eq("user_id", user_id)\
-                .execute()
-            
-            if not response.data:
+        """Validate that user has access to all food IDs (single IN query)"""
+        unique_ids = list(dict.fromkeys(food_ids))
+        response = await execute_async(
+            lambda: self.supabase.table("food_analyses")
+                .select("id")
+                .in_("id", unique_ids)
+                .eq("user_id", user_id)
+                .execute(),
+            table_name="food_analyses"
+        )
+        
+        found_ids = {row["id"] for row in response.data or []}
+        for food_id in unique_ids:
+            if food_id not in found_ids:
                 raise ValueError(f"Food analysis {food_id} not found or access denied")
     
     async def _get_food_details(self, food_ids: List[str]) -> List[Dict[str, Any]]:
-        """Get detailed food information for comparison"""
+        """
+        Get detailed food information for comparison
+        
+        Fetches all foods with one IN query and returns them in the requested
+        order (duplicates and missing IDs are skipped).
+        """
+        unique_ids = list(dict.fromkeys(food_ids))
+        if not unique_ids:
+            return []
+        
+        response = await execute_async(
+            lambda: self.supabase.table("food_analyses")
+                .select(self.FOOD_DETAIL_COLUMNS)
+                .in_("id", unique_ids)
+                .execute(),
+            table_name="food_analyses"
+        )
+        
+        rows_by_id = {row["id"]: row for row in response.data or []}
         foods = []
         
-        for food_id in food_ids:
-            response = self.supabase.table("food_analyses")\
-                .select("*")\
-                .eq("id", food_id)\
-                .execute()
-            
-            if response.data:
-                food_data = response.data[0]
+        for food_id in unique_ids:
+            food_data = rows_by_id.get(food_id)
+            if food_data:
                 foods.append({
                     "id": food_data["id"],
                     "name": food_data["food_name"],
@@ -226,6 +254,11 @@ class FoodComparisonService:
         
         return foods
     
+    @staticmethod
+    def _food_column(foods: List[Dict[str, Any]], key: str) -> np.ndarray:
+        """Extract one nutrient across all foods as a float array (missing -> 0)"""
+        return np.array([float(food.get(key) or 0.0) for food in foods], dtype=np.float64)
+    
     async def _generate_comparison_data(self, food_ids: List[str]) -> Dict[str, Any]:
         """Generate comparison data for storage"""
         foods = await self._get_food_details(food_ids)
@@ -242,93 +275,94 @@ class FoodComparisonService:
         food_ids: List[str], 
         foods: List[Dict[str, Any]]
     ) -> FoodComparisonMetrics:
-        """Generate detailed comparison metrics"""
+        """Generate detailed comparison metrics (columnar over all foods)"""
         if not foods:
             raise ValueError("No food data available for comparison")
         
+        ids = [food["id"] for food in foods]
+        index = np.arange(len(foods))
+        
         # Extract nutritional data
-        calories = {food["id"]: food["calories_per_100g"] for food in foods}
-        protein = {food["id"]: food["protein_percentage"] for food in foods}
-        fat = {food["id"]: food["fat_percentage"] for food in foods}
-        fiber = {food["id"]: food["fiber_percentage"] for food in foods}
+        calories = self._food_column(foods, "calories_per_100g")
+        protein = self._food_column(foods, "protein_percentage")
+        fat = self._food_column(foods, "fat_percentage")
+        fiber = self._food_column(foods, "fiber_percentage")
         
         # Calculate cost per calorie (mock data - would come from price data)
-        cost_per_calorie = {food["id"]: 0.01 + (i * 0.005) for i, food in enumerate(foods)}
-        
-        # Calculate nutritional density (calories per gram of essential nutrients)
-        nutritional_density = {}
-        for food in foods:
-            # Simple nutritional density calculation
-            essential_nutrients = food["protein_percentage"] + food["fat_percentage"]
-            if essential_nutrients > 0:
-                density = food["calories_per_100g"] / essential_nutrients
-            else:
-                density = 0
-            nutritional_density[food["id"]] = round(density, 2)
+        cost_per_calorie = 0.01 + index * 0.005
+        
+        # Nutritional density (calories per gram of essential nutrients)
+        essential_nutrients = protein + fat
+        density = np.divide(
+            calories, essential_nutrients,
+            out=np.zeros_like(calories), where=essential_nutrients > 0
+        )
         
         # Calculate compatibility scores (mock data - would come from pet compatibility)
-        compatibility_scores = {food["id"]: 70 + (i * 5) for i, food in enumerate(foods)}
+        compatibility_scores = 70 + index * 5
         
         # Generate overall rankings
         overall_rankings = self._calculate_overall_rankings(foods, calories, protein, fat, fiber, cost_per_calorie)
         
+        def as_map(values: np.ndarray) -> Dict[str, float]:
+            return dict(zip(ids, values.tolist()))
+        
         return FoodComparisonMetrics(
-            calories_comparison=calories,
-            protein_comparison=protein,
-            fat_comparison=fat,
-            fiber_comparison=fiber,
-            cost_per_calorie=cost_per_calorie,
-            nutritional_density=nutritional_density,
-            compatibility_scores=compatibility_scores,
+            calories_comparison=as_map(calories),
+            protein_comparison=as_map(protein),
+            fat_comparison=as_map(fat),
+            fiber_comparison=as_map(fiber),
+            cost_per_calorie=as_map(cost_per_calorie),
+            nutritional_density=as_map(np.round(density, 2)),
+            compatibility_scores=as_map(compatibility_scores.astype(np.float64)),
             overall_rankings=overall_rankings
         )
     
     def _calculate_overall_rankings(
         self, 
         foods: List[Dict[str, Any]], 
-        calories: Dict[str, float],
-        protein: Dict[str, float],
-        fat: Dict[str, float],
-        fiber: Dict[str, float],
-        cost_per_calorie: Dict[str, float]
+        calories: np.ndarray,
+        protein: np.ndarray,
+        fat: np.ndarray,
+        fiber: np.ndarray,
+        cost_per_calorie: np.ndarray
     ) -> List[Dict[str, Any]]:
-        """Calculate overall rankings for foods"""
-        rankings = []
+        """
+        Calculate overall rankings for foods
         
-        for food in foods:
-            food_id = food["id"]
-            
-            # Calculate composite score (0-100)
-            # Weight factors: calories (25%), protein (25%), fat (20%), fiber (15%), cost (15%)
-            calorie_score = min(100, max(0, 100 - abs(calories[food_id] - 350) / 3.5))
-            protein_score = min(100, protein[food_id] * 2)  # 50% protein = 100 points
-            fat_score = min(100, fat[food_id] * 4)  # 25% fat = 100 points
-            fiber_score = min(100, fiber[food_id] * 10)  # 10% fiber = 100 points
-            cost_score = min(100, max(0, 100 - cost_per_calorie[food_id] * 1000))
-            
-            composite_score = (
-                calorie_score * 0.25 +
-                protein_score * 0.25 +
-                fat_score * 0.20 +
-                fiber_score * 0.15 +
-                cost_score * 0.15
-            )
-            
+        Arrays are aligned with foods. Component scores (0-100) are computed
+        for all foods at once; composite weights are calories 25%, protein 25%,
+        fat 20%, fiber 15% and cost 15%.
+        """
+        scores = np.column_stack([
+            np.clip(100 - np.abs(calories - 350) / 3.5, 0, 100),
+            np.minimum(100, protein * 2),   # 50% protein = 100 points
+            np.minimum(100, fat * 4),       # 25% fat = 100 points
+            np.minimum(100, fiber * 10),    # 10% fiber = 100 points
+            np.clip(100 - cost_per_calorie * 1000, 0, 100)
+        ])
+        composite = np.round(scores @ self.RANKING_WEIGHTS, 1)
+        scores = np.round(scores, 1)
+        
+        # Stable descending sort by composite score
+        order = np.argsort(-composite, kind="stable")
+        
+        rankings = []
+        for i in order.tolist():
+            food = foods[i]
+            calorie_score, protein_score, fat_score, fiber_score, cost_score = scores[i].tolist()
             rankings.append({
-                "food_id": food_id,
+                "food_id": food["id"],
                 "food_name": food["name"],
                 "brand": food["brand"],
-                "composite_score": round(composite_score, 1),
-                "calorie_score": round(calorie_score, 1),
-                "protein_score": round(protein_score, 1),
-                "fat_score": round(fat_score, 1),
-                "fiber_score": round(fiber_score, 1),
-                "cost_score": round(cost_score, 1)
+                "composite_score": float(composite[i]),
+                "calorie_score": calorie_score,
+                "protein_score": protein_score,
+                "fat_score": fat_score,
+                "fiber_score": fiber_score,
+                "cost_score": cost_score
             })
         
-        # Sort by composite score
-        rankings.sort(key=lambda x: x["composite_score"], reverse=True)
-        
         return rankings
     
     async def _generate_comparison_recommendations(
@@ -0,0 +1,306 @@
+"""
+Nutrition Summary Service
+Serves daily/weekly nutrition summaries and multi-pet insights from the
+daily_nutrition_summaries rollup
+
+The rollup is maintained by database triggers on feeding_records
+(scripts/database/maintain_daily_nutrition_summaries.sql), so every method
+here is a plain indexed read of at most one row per pet-day; nothing is
+aggregated from raw feeding records at request time.
+"""
+
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+from supabase import Client
+
+from app.models.nutrition.nutrition import (
+    ComparativeInsight,
+    DailyNutritionSummaryResponse,
+    MultiPetNutritionInsights,
+    WeeklyNutritionSummaryResponse
+)
+from app.shared.services.datetime_service import DateTimeService
+from app.shared.services.query_builder_service import QueryBuilderService
+from app.shared.utils.async_supabase import execute_async
+
+
+class NutritionSummaryService:
+    """
+    Service for reading pre-aggregated nutrition summaries
+
+    Pet ownership is verified by the calling router; RLS on the rollup
+    table and view restricts reads to the user's own pets.
+    """
+
+    # Average calorie score below which a pet gets a calorie insight
+    LOW_SCORE_THRESHOLD = 60.0
+
+    # Below this the insight is reported as high severity
+    CRITICAL_SCORE_THRESHOLD = 40.0
+
+    # Score spread between best and worst pet worth pointing out
+    SCORE_SPREAD_THRESHOLD = 20.0
+
+    def __init__(self, supabase: Client):
+        """
+        Initialize nutrition summary service
+
+        Args:
+            supabase: Authenticated Supabase client (for RLS compliance)
+        """
+        self.supabase = supabase
+        self._daily_columns = ",".join(
+            QueryBuilderService.columns_for_model(DailyNutritionSummaryResponse)
+        )
+
+    @staticmethod
+    def _since(days: int) -> date:
+        """First date included in a window of `days` days ending today"""
+        return DateTimeService.now().date() - timedelta(days=max(days, 1) - 1)
+
+    async def get_daily_summaries(
+        self,
+        pet_id: str,
+        days: int = 7
+    ) -> List[DailyNutritionSummaryResponse]:
+        """
+        Get daily summaries for a pet, newest first
+
+        Args:
+            pet_id: Pet ID
+            days: Number of days to include, ending today
+
+        Returns:
+            One summary per day that has feedings
+        """
+        response = await execute_async(
+            lambda: self.supabase.table("daily_nutrition_summaries")
+            .select(self._daily_columns)
+            .eq("pet_id", pet_id)
+            .gte("date", self._since(days).isoformat())
+            .order("date", desc=True)
+            .execute()
+        )
+        return [DailyNutritionSummaryResponse(**row) for row in response.data or []]
+
+    async def get_summary_for_date(
+        self,
+        pet_id: str,
+        summary_date: Optional[date] = None
+    ) -> Optional[DailyNutritionSummaryResponse]:
+        """
+        Get the summary for one day (today by default)
+
+        Args:
+            pet_id: Pet ID
+            summary_date: Day to read
+
+        Returns:
+            The day's summary, or None if nothing was fed that day
+        """
+        summary_date = summary_date or DateTimeService.now().date()
+        response = await execute_async(
+            lambda: self.supabase.table("daily_nutrition_summaries")
+            .select(self._daily_columns)
+            .eq("pet_id", pet_id)
+            .eq("date", summary_date.isoformat())
+            .limit(1)
+            .execute()
+        )
+        rows = response.data or []
+        return DailyNutritionSummaryResponse(**rows[0]) if rows else None
+
+    async def get_weekly_summaries(
+        self,
+        pet_id: str,
+        weeks: int = 4
+    ) -> List[WeeklyNutritionSummaryResponse]:
+        """
+        Get weekly rollups for a pet, newest first
+
+        Args:
+            pet_id: Pet ID
+            weeks: Number of weeks to include, including the current one
+
+        Returns:
+            One rollup per week that has feedings
+        """
+        today = DateTimeService.now().date()
+        first_week = today - timedelta(days=today.weekday()) - timedelta(weeks=max(weeks, 1) - 1)
+        response = await execute_async(
+            lambda: self.supabase.table("weekly_nutrition_summaries")
+            .select("*")
+            .eq("pet_id", pet_id)
+            .gte("week_start", first_week.isoformat())
+            .order("week_start", desc=True)
+            .execute()
+        )
+        return [WeeklyNutritionSummaryResponse(**row) for row in response.data or []]
+
+    async def get_multi_pet_insights(
+        self,
+        user_id: str,
+        days: int = 7
+    ) -> MultiPetNutritionInsights:
+        """
+        Build insights across all of a user's pets from one query
+
+        Pets are fetched with their recent daily summaries and calorie targets
+        embedded, so the cost is a single request regardless of pet count.
+
+        Args:
+            user_id: Owner of the pets
+            days: Number of days of summaries to consider
+
+        Returns:
+            Per-pet scores, recent summaries and comparative insights
+        """
+        since = self._since(days).isoformat()
+        response = await execute_async(
+            lambda: self.supabase.table("pets")
+            .select(
+                f"id,name,species,"
+                f"daily_nutrition_summaries({self._daily_columns}),"
+                f"calorie_goals(daily_calories),"
+                f"nutritional_requirements(daily_calories)"
+            )
+            .eq("user_id", user_id)
+            .gte("daily_nutrition_summaries.date", since)
+            .order("date", desc=True, foreign_table="daily_nutrition_summaries")
+            .order("name")
+            .execute()
+        )
+
+        pets = []
+        recent_summaries = {}
+        for row in response.data or []:
+            summaries = row.get("daily_nutrition_summaries") or []
+            pets.append(self.score_pet(row, summaries, days))
+            recent_summaries[row["id"]] = [
+                DailyNutritionSummaryResponse(**summary) for summary in summaries
+            ]
+
+        return MultiPetNutritionInsights(
+            pets=pets,
+            generated_at=DateTimeService.now(),
+            recent_summaries=recent_summaries,
+            comparative_insights=self.comparative_insights(pets)
+        )
+
+    @staticmethod
+    def _calorie_goal(pet: Dict[str, Any]) -> Optional[float]:
+        """
+        Daily calorie target from the embedded relations
+
+        Mirrors nutrition_calorie_target in SQL, which scored the summaries:
+        the calorie goal wins, otherwise the nutritional requirements.
+        """
+        for relation in ("calorie_goals", "nutritional_requirements"):
+            target = pet.get(relation)
+            if isinstance(target, list):
+                target = target[0] if target else None
+            if target and target.get("daily_calories") is not None:
+                return float(target["daily_calories"])
+        return None
+
+    @classmethod
+    def score_pet(
+        cls,
+        pet: Dict[str, Any],
+        summaries: List[Dict[str, Any]],
+        days: int
+    ) -> Dict[str, Any]:
+        """
+        Score one pet from its daily summary rows
+
+        Args:
+            pet: Pet row (id, name, species, embedded calorie_goals and
+                nutritional_requirements)
+            summaries: The pet's daily_nutrition_summaries rows in the window
+            days: Window length in days
+
+        Returns:
+            Pet entry for MultiPetNutritionInsights.pets
+        """
+        days_logged = len(summaries)
+        calorie_goal = cls._calorie_goal(pet)
+        average_calories = (
+            sum(float(s["total_calories"]) for s in summaries) / days_logged
+            if days_logged else 0.0
+        )
+        # The daily score is only meaningful against a goal
+        average_score = (
+            sum(float(s["average_compatibility"]) for s in summaries) / days_logged
+            if days_logged and calorie_goal else None
+        )
+
+        return {
+            "pet_id": pet["id"],
+            "name": pet.get("name"),
+            "species": pet.get("species"),
+            "days_logged": days_logged,
+            "logging_consistency": round(days_logged / max(days, 1) * 100, 1),
+            "average_daily_calories": round(average_calories, 1),
+            "calorie_goal": calorie_goal,
+            "nutrition_score": round(average_score, 1) if average_score is not None else None
+        }
+
+    @classmethod
+    def comparative_insights(cls, pets: List[Dict[str, Any]]) -> List[ComparativeInsight]:
+        """
+        Derive insights across scored pets
+
+        Args:
+            pets: Entries produced by score_pet
+
+        Returns:
+            Insights ordered by pet, then a cross-pet comparison if relevant
+        """
+        insights = []
+        for pet in pets:
+            name = pet["name"] or "Your pet"
+            if pet["days_logged"] == 0:
+                insights.append(ComparativeInsight(
+                    type="missing_data",
+                    title=f"No recent feedings for {name}",
+                    description=f"Log {name}'s meals to see nutrition trends.",
+                    severity="medium"
+                ))
+                continue
+            if pet["calorie_goal"] is None:
+                insights.append(ComparativeInsight(
+                    type="missing_goal",
+                    title=f"No calorie goal for {name}",
+                    description=f"Set a daily calorie goal to score {name}'s intake.",
+                    severity="low"
+                ))
+                continue
+            if pet["nutrition_score"] < cls.LOW_SCORE_THRESHOLD:
+                direction = "above" if pet["average_daily_calories"] > pet["calorie_goal"] else "below"
+                insights.append(ComparativeInsight(
+                    type="calorie_target",
+                    title=f"{name} is off their calorie goal",
+                    description=(
+                        f"{name} averaged {pet['average_daily_calories']:.0f} kcal/day, "
+                        f"{direction} the goal of {pet['calorie_goal']:.0f} kcal."
+                    ),
+                    severity="high" if pet["nutrition_score"] < cls.CRITICAL_SCORE_THRESHOLD else "medium"
+                ))
+
+        scored = [pet for pet in pets if pet["nutrition_score"] is not None]
+        if len(scored) >= 2:
+            best = max(scored, key=lambda pet: pet["nutrition_score"])
+            worst = min(scored, key=lambda pet: pet["nutrition_score"])
+            if best["nutrition_score"] - worst["nutrition_score"] >= cls.SCORE_SPREAD_THRESHOLD:
+                insights.append(ComparativeInsight(
+                    type="comparison",
+                    title="Nutrition scores differ between pets",
+                    description=(
+                        f"{best['name']} scores {best['nutrition_score']:.0f} while "
+                        f"{worst['name']} scores {worst['nutrition_score']:.0f}; "
+                        f"review {worst['name']}'s portions."
+                    ),
+                    severity="low"
+                ))
+        return insights
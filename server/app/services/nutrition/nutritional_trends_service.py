@@ -6,14 +6,15 @@ Handles nutritional trend analysis, pattern recognition, and insights generation
 from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime, date, timedelta
 from app.shared.services.datetime_service import DateTimeService
+from app.shared.services.time_series_service import TimeSeries, TimeSeriesService
 from decimal import Decimal
-import statistics
 import json
 from supabase import Client
 from app.models.nutrition.advanced_nutrition import (
     NutritionalTrendResponse, NutritionalTrendsDashboard,
     WeeklyNutritionSummary, MonthlyTrendAnalysis,
-    HealthInsights, NutritionalPatterns
+    HealthInsights, NutritionalPatterns,
+    WeightTrendAnalysis, TrendDirection, TrendStrength
 )
 
 
@@ -26,6 +27,12 @@ class NutritionalTrendsService:
     Follows KISS by keeping analysis methods focused and simple
     """
     
+    # Numeric nutritional_trends columns used by the analyses
+    TREND_COLUMNS = (
+        "total_calories", "total_protein_g", "total_fat_g", "total_fiber_g",
+        "feeding_count", "average_compatibility_score", "weight_change_kg"
+    )
+    
     def __init__(self, supabase: Client):
         """
         Initialize nutritional trends service
@@ -127,14 +134,16 @@ class NutritionalTrendsService:
         weight_change = sum(t.weight_change_kg for t in week_trends)
         
         # Calculate averages
+        series = self._build_series(week_trends)
+        compatibility = series.column("average_compatibility_score")
         avg_daily_calories = total_calories / len(week_trends)
-        avg_compatibility = statistics.mean([t.average_compatibility_score for t in week_trends])
+        avg_compatibility = TimeSeriesService.mean(compatibility)
         feeding_frequency = total_feedings / len(week_trends)
         
-        # Determine compatibility trend
+        # Determine compatibility trend (series is oldest -> newest)
         if len(week_trends) >= 2:
-            recent_avg = statistics.mean([t.average_compatibility_score for t in week_trends[:3]])
-            older_avg = statistics.mean([t.average_compatibility_score for t in week_trends[-3:]])
+            recent_avg = TimeSeriesService.mean(compatibility[-3:])
+            older_avg = TimeSeriesService.mean(compatibility[:3])
             
             if recent_avg > older_avg + 5:
                 compatibility_trend = "improving"
@@ -147,7 +156,7 @@ class NutritionalTrendsService:
         
         # Generate recommendations
         recommendations = await self._generate_weekly_recommendations(
-            pet_id, week_trends, avg_daily_calories, avg_compatibility
+            pet_id, series, avg_daily_calories, avg_compatibility
         )
         
         # Calculate health score
@@ -211,24 +220,27 @@ class NutritionalTrendsService:
             if month_start <= t.trend_date <= month_end
         ]
         
+        # Build columnar series once for every monthly metric
+        series = self._build_series(month_trends)
+        
         # Analyze weight trend
-        weight_trend = await self._analyze_weight_trend_for_month(month_trends)
+        weight_trend = await self._analyze_weight_trend_for_month(series)
         
         # Analyze calorie trend
-        calorie_trend = await self._analyze_calorie_trend(month_trends)
+        calorie_trend = await self._analyze_calorie_trend(series)
         
         # Analyze nutritional adequacy
-        nutritional_adequacy = await self._analyze_nutritional_adequacy(month_trends)
+        nutritional_adequacy = await self._analyze_nutritional_adequacy(series)
         
         # Analyze feeding patterns
-        feeding_patterns = await self._analyze_feeding_patterns(month_trends)
+        feeding_patterns = await self._analyze_feeding_patterns(series)
         
         # Generate health indicators
-        health_indicators = await self._generate_health_indicators(month_trends)
+        health_indicators = await self._generate_health_indicators(series)
         
         # Generate insights and predictions
-        insights = await self._generate_monthly_insights(month_trends, weight_trend, calorie_trend)
-        predictions = await self._generate_monthly_predictions(month_trends, insights)
+        insights = await self._generate_monthly_insights(series, weight_trend, calorie_trend)
+        predictions = await self._generate_monthly_predictions(series, insights)
         
         return MonthlyTrendAnalysis(
             pet_id=pet_id,
@@ -273,9 +285,10 @@ class NutritionalTrendsService:
         # Generate trend data
         calorie_trends = self._format_calorie_trends(trends)
         macronutrient_trends = self._format_macronutrient_trends(trends)
-        weight_correlation = self._calculate_weight_correlation(trends)
+        series = self._build_series(trends)
+        weight_correlation = self._calculate_weight_correlation(series)
         feeding_patterns = self._format_feeding_patterns(trends)
-        insights = await self._generate_dashboard_insights(trends)
+        insights = await self._generate_dashboard_insights(series)
         
         return NutritionalTrendsDashboard(
             pet_id=pet_id,
@@ -287,10 +300,14 @@ class NutritionalTrendsService:
             insights=insights
         )
     
+    def _build_series(self, trends: List[NutritionalTrendResponse]) -> TimeSeries:
+        """Build the columnar time series for a list of trend records"""
+        return TimeSeries.from_records(trends, "trend_date", self.TREND_COLUMNS)
+    
     async def _generate_weekly_recommendations(
         self, 
         pet_id: str, 
-        trends: List[NutritionalTrendResponse],
+        series: TimeSeries,
         avg_calories: float,
         avg_compatibility: float
     ) -> List[str]:
@@ -306,8 +323,8 @@ class NutritionalTrendsService:
             recommendations.append("Consider reducing portion sizes to prevent overfeeding")
         
         # Check for consistency
-        if len(trends) >= 3:
-            calorie_variance = statistics.stdev([t.total_calories for t in trends])
+        if len(series) >= 3:
+            calorie_variance = TimeSeriesService.stdev(series.column("total_calories"))
             if calorie_variance > 100:
                 recommendations.append("Try to maintain more consistent feeding amounts")
         
@@ -358,18 +375,15 @@ class NutritionalTrendsService:
             for trend in sorted(trends, key=lambda x: x.trend_date)
         ]
     
-    def _calculate_weight_correlation(self, trends: List[NutritionalTrendResponse]) -> Dict[str, Any]:
+    def _calculate_weight_correlation(self, series: TimeSeries) -> Dict[str, Any]:
         """Calculate correlation between nutrition and weight changes"""
-        if len(trends) < 3:
+        if len(series) < 3:
             return {"correlation": 0, "strength": "insufficient_data"}
         
-        calories = [t.total_calories for t in trends]
-        weight_changes = [t.weight_change_kg for t in trends]
-        
-        try:
-            correlation = statistics.correlation(calories, weight_changes)
-        except statistics.StatisticsError:
-            correlation = 0
+        correlation = TimeSeriesService.correlation(
+            series.column("total_calories"),
+            series.column("weight_change_kg")
+        )
         
         if abs(correlation) > 0.7:
             strength = "strong"
@@ -395,25 +409,24 @@ class NutritionalTrendsService:
             for trend in sorted(trends, key=lambda x: x.trend_date)
         ]
     
-    async def _generate_dashboard_insights(self, trends: List[NutritionalTrendResponse]) -> List[str]:
+    async def _generate_dashboard_insights(self, series: TimeSeries) -> List[str]:
         """Generate insights for the trends dashboard"""
         insights = []
         
-        if not trends:
+        if len(series) == 0:
             return ["No nutritional data available for analysis"]
         
         # Calorie consistency
-        calories = [t.total_calories for t in trends]
+        calories = series.column("total_calories")
         if len(calories) > 1:
-            calorie_variance = statistics.stdev(calories)
+            calorie_variance = TimeSeriesService.stdev(calories)
             if calorie_variance < 50:
                 insights.append("Excellent calorie consistency - keep up the good work!")
             elif calorie_variance > 150:
                 insights.append("Consider maintaining more consistent feeding amounts")
         
         # Compatibility trends
-        compatibility_scores = [t.average_compatibility_score for t in trends]
-        avg_compatibility = statistics.mean(compatibility_scores)
+        avg_compatibility = TimeSeriesService.mean(series.column("average_compatibility_score"))
         
         if avg_compatibility > 80:
             insights.append("Great nutritional compatibility with your pet's needs")
@@ -421,8 +434,7 @@ class NutritionalTrendsService:
             insights.append("Consider reviewing your pet's diet for better nutritional balance")
         
         # Weight management
-        weight_changes = [t.weight_change_kg for t in trends]
-        total_weight_change = sum(weight_changes)
+        total_weight_change = float(series.column("weight_change_kg").sum())
         
         if total_weight_change > 1.0:
             insights.append("Monitor weight gain - consider adjusting portion sizes")
@@ -431,49 +443,66 @@ class NutritionalTrendsService:
         
         return insights
     
-    async def _analyze_weight_trend_for_month(self, trends: List[NutritionalTrendResponse]) -> Any:
-        """Analyze weight trend for the month"""
-        # This would integrate with the weight tracking service
-        # For now, return a simple analysis
-        if not trends:
-            return {"trend": "no_data", "change": 0.0}
-        
-        weight_changes = [t.weight_change_kg for t in trends]
-        total_change = sum(weight_changes)
-        
-        if total_change > 0.5:
-            return {"trend": "increasing", "change": total_change}
-        elif total_change < -0.5:
-            return {"trend": "decreasing", "change": total_change}
+    async def _analyze_weight_trend_for_month(self, series: TimeSeries) -> WeightTrendAnalysis:
+        """Analyze weight trend for the month from daily weight changes"""
+        if len(series) == 0:
+            return WeightTrendAnalysis(
+                trend_direction=TrendDirection.STABLE,
+                weight_change_kg=0.0,
+                average_daily_change=0.0,
+                trend_strength=TrendStrength.WEAK,
+                days_analyzed=0,
+                confidence_level=0.0
+            )
+        
+        daily_changes = series.column("weight_change_kg")
+        total_change = float(daily_changes.sum())
+        
+        abs_change = abs(total_change)
+        if abs_change > 2.0:
+            trend_strength = TrendStrength.STRONG
+        elif abs_change > 0.5:
+            trend_strength = TrendStrength.MODERATE
         else:
-            return {"trend": "stable", "change": total_change}
+            trend_strength = TrendStrength.WEAK
+        
+        return WeightTrendAnalysis(
+            trend_direction=TrendDirection(TimeSeriesService.classify_change(total_change, 0.5)),
+            weight_change_kg=round(total_change, 2),
+            average_daily_change=round(TimeSeriesService.mean(daily_changes), 3),
+            trend_strength=trend_strength,
+            days_analyzed=len(series),
+            confidence_level=min(1.0, len(series) / 14)
+        )
     
-    async def _analyze_calorie_trend(self, trends: List[NutritionalTrendResponse]) -> Dict[str, Any]:
+    async def _analyze_calorie_trend(self, series: TimeSeries) -> Dict[str, Any]:
         """Analyze calorie trend for the month"""
-        if not trends:
+        if len(series) == 0:
             return {"trend": "no_data", "average": 0.0}
         
-        calories = [t.total_calories for t in trends]
-        avg_calories = statistics.mean(calories)
+        calories = series.column("total_calories")
+        avg_calories = TimeSeriesService.mean(calories)
         
         if len(calories) > 1:
-            trend_direction = "increasing" if calories[-1] > calories[0] else "decreasing"
+            # Least-squares direction over the month instead of first vs last day
+            fit = TimeSeriesService.least_squares(series.elapsed_days(), calories)
+            trend_direction = "increasing" if fit["slope"] > 0 else "decreasing"
         else:
             trend_direction = "stable"
         
         return {
             "trend": trend_direction,
             "average": round(avg_calories, 1),
-            "variance": round(statistics.stdev(calories) if len(calories) > 1 else 0, 1)
+            "variance": round(TimeSeriesService.stdev(calories), 1)
         }
     
-    async def _analyze_nutritional_adequacy(self, trends: List[NutritionalTrendResponse]) -> Dict[str, Any]:
+    async def _analyze_nutritional_adequacy(self, series: TimeSeries) -> Dict[str, Any]:
         """Analyze nutritional adequacy for the month"""
-        if not trends:
+        if len(series) == 0:
             return {"score": 0, "status": "no_data"}
         
-        compatibility_scores = [t.average_compatibility_score for t in trends]
-        avg_score = statistics.mean(compatibility_scores)
+        compatibility_scores = series.column("average_compatibility_score")
+        avg_score = TimeSeriesService.mean(compatibility_scores)
         
         if avg_score > 80:
             status = "excellent"
@@ -484,44 +513,45 @@ class NutritionalTrendsService:
         else:
             status = "poor"
         
+        improving = (
+            len(compatibility_scores) > 1
+            and TimeSeriesService.least_squares(series.elapsed_days(), compatibility_scores)["slope"] > 0
+        )
+        
         return {
             "score": round(avg_score, 1),
             "status": status,
-            "trend": "improving" if len(compatibility_scores) > 1 and compatibility_scores[-1] > compatibility_scores[0] else "stable"
+            "trend": "improving" if improving else "stable"
         }
     
-    async def _analyze_feeding_patterns(self, trends: List[NutritionalTrendResponse]) -> Dict[str, Any]:
+    async def _analyze_feeding_patterns(self, series: TimeSeries) -> Dict[str, Any]:
         """Analyze feeding patterns for the month"""
-        if not trends:
+        if len(series) == 0:
             return {"frequency": 0, "consistency": "no_data"}
         
-        feeding_counts = [t.feeding_count for t in trends]
-        avg_frequency = statistics.mean(feeding_counts)
+        feeding_counts = series.column("feeding_count")
+        avg_frequency = TimeSeriesService.mean(feeding_counts)
         
         if len(feeding_counts) > 1:
-            consistency = "consistent" if statistics.stdev(feeding_counts) < 1 else "variable"
+            consistency = "consistent" if TimeSeriesService.stdev(feeding_counts) < 1 else "variable"
         else:
             consistency = "unknown"
         
         return {
             "frequency": round(avg_frequency, 1),
             "consistency": consistency,
-            "total_feedings": sum(feeding_counts)
+            "total_feedings": int(feeding_counts.sum())
         }
     
-    async def _generate_health_indicators(self, trends: List[NutritionalTrendResponse]) -> Dict[str, Any]:
+    async def _generate_health_indicators(self, series: TimeSeries) -> Dict[str, Any]:
         """Generate health indicators from trends"""
-        if not trends:
+        if len(series) == 0:
             return {"overall": "no_data"}
         
         # Calculate various health indicators
-        calories = [t.total_calories for t in trends]
-        compatibility_scores = [t.average_compatibility_score for t in trends]
-        weight_changes = [t.weight_change_kg for t in trends]
-        
-        avg_calories = statistics.mean(calories)
-        avg_compatibility = statistics.mean(compatibility_scores)
-        total_weight_change = sum(weight_changes)
+        avg_calories = TimeSeriesService.mean(series.column("total_calories"))
+        avg_compatibility = TimeSeriesService.mean(series.column("average_compatibility_score"))
+        total_weight_change = float(series.column("weight_change_kg").sum())
         
         # Determine overall health status
         if avg_compatibility > 80 and abs(total_weight_change) < 0.5:
@@ -540,17 +570,22 @@ class NutritionalTrendsService:
             "weight_stability": "stable" if abs(total_weight_change) < 0.5 else "unstable"
         }
     
-    async def _generate_monthly_insights(self, trends: List[NutritionalTrendResponse], weight_trend: Any, calorie_trend: Any) -> List[str]:
+    async def _generate_monthly_insights(
+        self,
+        series: TimeSeries,
+        weight_trend: WeightTrendAnalysis,
+        calorie_trend: Dict[str, Any]
+    ) -> List[str]:
         """Generate monthly insights"""
         insights = []
         
-        if not trends:
+        if len(series) == 0:
             return ["No data available for analysis"]
         
         # Weight insights
-        if weight_trend["trend"] == "increasing":
+        if weight_trend.trend_direction == TrendDirection.INCREASING:
             insights.append("Weight is trending upward - monitor portion sizes")
-        elif weight_trend["trend"] == "decreasing":
+        elif weight_trend.trend_direction == TrendDirection.DECREASING:
             insights.append("Weight is trending downward - ensure adequate nutrition")
         
         # Calorie insights
@@ -560,9 +595,9 @@ class NutritionalTrendsService:
             insights.append("Calorie intake is decreasing - ensure nutritional needs are met")
         
         # Consistency insights
-        calories = [t.total_calories for t in trends]
+        calories = series.column("total_calories")
         if len(calories) > 1:
-            variance = statistics.stdev(calories)
+            variance = TimeSeriesService.stdev(calories)
             if variance < 50:
                 insights.append("Excellent feeding consistency this month")
             elif variance > 150:
@@ -570,26 +605,26 @@ class NutritionalTrendsService:
         
         return insights
     
-    async def _generate_monthly_predictions(self, trends: List[NutritionalTrendResponse], insights: List[str]) -> List[str]:
+    async def _generate_monthly_predictions(self, series: TimeSeries, insights: List[str]) -> List[str]:
         """Generate monthly predictions based on trends"""
         predictions = []
         
-        if not trends:
+        if len(series) == 0:
             return ["Insufficient data for predictions"]
         
-        # Simple prediction logic (in production, this would use ML models)
-        calories = [t.total_calories for t in trends]
+        # Exponentially weighted level favours the most recent days
+        calories = series.column("total_calories")
         if len(calories) > 1:
-            recent_avg = statistics.mean(calories[-7:]) if len(calories) >= 7 else statistics.mean(calories)
+            recent_avg = float(TimeSeriesService.ewma(calories, span=7)[-1])
             
             if recent_avg > 400:
                 predictions.append("Continued high calorie intake may lead to weight gain")
             elif recent_avg < 200:
                 predictions.append("Low calorie intake may lead to weight loss")
         
-        compatibility_scores = [t.average_compatibility_score for t in trends]
+        compatibility_scores = series.column("average_compatibility_score")
         if len(compatibility_scores) > 1:
-            recent_compatibility = statistics.mean(compatibility_scores[-7:]) if len(compatibility_scores) >= 7 else statistics.mean(compatibility_scores)
+            recent_compatibility = float(TimeSeriesService.ewma(compatibility_scores, span=7)[-1])
             
             if recent_compatibility > 80:
                 predictions.append("Excellent nutritional balance should continue with current diet")
@@ -8,11 +8,12 @@ Fixed: 2025-11-29 - Correct descending parameter for Supabase order()
 from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime, date, timedelta
 from decimal import Decimal
-import statistics
 from supabase import Client
 from ...utils.logging_config import get_logger
 from ...shared.services.datetime_service import DateTimeService
+from ...shared.services.time_series_service import TimeSeries, TimeSeriesService
 from ...shared.services.database_operation_service import DatabaseOperationService
+from ..analytics.analytics_cache_service import AnalyticsCacheService
 from app.models.nutrition.advanced_nutrition import (
     PetWeightRecordCreate, PetWeightRecordResponse,
     PetWeightGoalCreate, PetWeightGoalResponse,
@@ -90,6 +91,9 @@ class WeightTrackingService:
         # Update nutritional trends for this date
         await self._update_nutritional_trends(weight_record.pet_id, weight_record.recorded_at.date())
         
+        # Cached analytics no longer reflect this pet's weight history
+        await AnalyticsCacheService(self.supabase).invalidate_pet(weight_record.pet_id)
+        
         return PetWeightRecordResponse(**result)
     
     async def get_weight_history(
@@ -312,6 +316,8 @@ class WeightTrackingService:
             
             logger.info(f"[delete_weight_record] Record deleted successfully")
             
+            await AnalyticsCacheService(self.supabase).invalidate_pet(pet_id)
+            
             # Get the most recent weight after deletion (if any)
             history_response = self.supabase.table("pet_weight_records") \
                 .select("*") \
@@ -378,17 +384,22 @@ class WeightTrackingService:
                 confidence_level=0.0
             )
         
-        # Sort by date
-        sorted_records = sorted(weight_records, key=lambda x: x.recorded_at)
-        
-        # Calculate trend
-        current_weight = sorted_records[-1].weight_kg
-        old_weight = sorted_records[0].weight_kg
-        weight_change = current_weight - old_weight
-        
-        # Calculate daily change
-        days_span = (sorted_records[-1].recorded_at - sorted_records[0].recorded_at).days
-        daily_change = weight_change / days_span if days_span > 0 else 0
+        # Columnar series sorted by date
+        series = TimeSeries.from_records(weight_records, "recorded_at", ("weight_kg",))
+        weights = series.column("weight_kg")
+        days = series.elapsed_days()
+        
+        # Least-squares fit: slope is kg/day, fitted change spans the full window
+        # (robust to a single noisy first or last weigh-in)
+        fit = TimeSeriesService.least_squares(days, weights)
+        days_span = series.span_days()
+        if days_span > 0:
+            daily_change = fit["slope"]
+            weight_change = daily_change * days_span
+        else:
+            # All measurements on the same instant - fall back to endpoint difference
+            daily_change = 0
+            weight_change = float(weights[-1] - weights[0])
         
         # Determine trend direction
         if weight_change > 0.5:
@@ -407,8 +418,10 @@ class WeightTrackingService:
         else:
             trend_strength = TrendStrength.WEAK
         
-        # Calculate confidence level based on data points and consistency
-        confidence = min(1.0, len(weight_records) / 14)  # Max confidence at 2 weeks of data
+        # Confidence grows with data points (max at 2 weeks of data) and is
+        # scaled by how well the linear fit explains the measurements
+        coverage = min(1.0, len(weight_records) / 14)
+        confidence = round(coverage * (0.5 + 0.5 * fit["r_squared"]), 3)
         
         return WeightTrendAnalysis(
             trend_direction=trend_direction,
@@ -1,15 +1,20 @@
 """
 Push notification service for APNs integration
 Handles sending notifications via Apple Push Notification service
+
+Requests go over a long-lived HTTP/2 client: a few connections, each
+multiplexing many concurrent requests, as Apple recommends. The provider
+token (ES256 JWT) is signed once and reused until it is close to Apple's
+one-hour limit.
 """
 
 import asyncio
-import json
 import ssl
-from typing import Dict, Any, Optional
-from datetime import datetime, timedelta
+import time
+from dataclasses import dataclass
+from typing import Dict, Any, Hashable, Iterable, List, Optional
 from app.shared.services.datetime_service import DateTimeService
-import aiohttp
+import httpx
 import logging
 import jwt
 
@@ -17,17 +22,71 @@ from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# APNs reasons meaning the device token will never work again
+INVALID_TOKEN_REASONS = {"BadDeviceToken", "Unregistered"}
+
+# Log message per APNs error reason (see Apple's "Handling notification responses")
+_REASON_LOG_MESSAGES = {
+    "BadTopic": "Bundle ID mismatch. Expected: {bundle_id}",
+    "ExpiredProviderToken": "APNs JWT token expired after regenerating it",
+    "MissingTopic": "Missing apns-topic header. Bundle ID: {bundle_id}",
+    "PayloadTooLarge": "Notification payload too large for {token}...",
+    "TopicDisallowed": "Topic not allowed for bundle ID: {bundle_id}",
+    "BadMessageId": "Bad APNs message ID",
+    "BadExpirationDate": "Bad expiration date in APNs request",
+    "BadPriority": "Bad priority in APNs request",
+    "MissingDeviceToken": "Missing device token in APNs request",
+}
+
+
+@dataclass
+class PushResult:
+    """
+    Outcome of one APNs request
+    
+    Attributes:
+        device_token: Target device token
+        status: HTTP status from APNs, or 0 if no response was received
+        reason: APNs error reason (or the transport error) when not sent
+        apns_id: Notification ID assigned by APNs
+    """
+    device_token: str
+    status: int
+    reason: Optional[str] = None
+    apns_id: Optional[str] = None
+    
+    @property
+    def success(self) -> bool:
+        return self.status == 200
+
 
 class PushNotificationService:
     """Service for sending push notifications via APNs"""
     
-    def __init__(self):
-        self.apns_url = settings.apns_url
+    # Apple rejects provider tokens older than an hour and throttles
+    # refreshing more often than every 20 minutes
+    PROVIDER_TOKEN_TTL_SECONDS = 50 * 60
+    
+    # Tokens per cleanup statement; the IN list travels in the PostgREST URL
+    TOKEN_CLEANUP_BATCH_SIZE = 100
+    
+    def __init__(self, apns_url: Optional[str] = None):
+        """
+        Args:
+            apns_url: APNs server URL (defaults to APNS_URL; an http:// URL,
+                e.g. a local mock server, is spoken to over HTTP/2 without TLS)
+        """
+        self.apns_url = apns_url or settings.apns_url
         self.apns_key_id = settings.apns_key_id
         self.apns_team_id = settings.apns_team_id
         self.apns_bundle_id = settings.apns_bundle_id
         self.apns_private_key = settings.apns_private_key
+        self.max_concurrency = settings.apns_max_concurrency
         
+        self._client: Optional[httpx.AsyncClient] = None
+        self._provider_token: Optional[str] = None
+        self._provider_token_issued_at = 0.0
+    
     async def send_notification(
         self, 
         device_token: str, 
@@ -43,73 +102,92 @@ class PushNotificationService:
         Returns:
             Boolean indicating success
         """
-        try:
-            # Create APNs request
-            url = f"{self.apns_url}/3/device/{device_token}"
-            headers = await self._create_headers()
+        result = await self._send(device_token, payload)
+        if not result.success:
+            self._log_failure(result)
+            if result.reason in INVALID_TOKEN_REASONS:
+                await self._cleanup_invalid_tokens([device_token])
+        return result.success
+    
+    async def send_batch(
+        self,
+        notifications: Iterable[Dict[str, Any]],
+        max_concurrency: Optional[int] = None
+    ) -> Dict[str, PushResult]:
+        """
+        Send many notifications concurrently over the shared connections
+        
+        At most max_concurrency requests are in flight at once; the rest
+        wait for a free slot, so a campaign to a large device list is not
+        turned into one task per device up front. Invalid device tokens are
+        removed from the database in one pass at the end.
+        
+        Args:
+            notifications: Notification data with device_token and payload
+            max_concurrency: Requests in flight at once (defaults to
+                APNS_MAX_CONCURRENCY)
             
-            # Prepare payload
-            apns_payload = {
-                "aps": payload.get("aps", {}),
-                **{k: v for k, v in payload.items() if k != "aps"}
-            }
+        Returns:
+            Dictionary mapping device tokens to their PushResult
+        """
+        pending = iter(notifications)
+        results: Dict[str, PushResult] = {}
+        
+        async def worker():
+            # Workers share one iterator, so each notification is sent once
+            for notification in pending:
+                result = await self._send(notification["device_token"], notification["payload"])
+                results[result.device_token] = result
+        
+        await asyncio.gather(*(worker() for _ in range(max_concurrency or self.max_concurrency)))
+        
+        failures: Dict[str, int] = {}
+        for result in results.values():
+            if not result.success:
+                failures[result.reason or str(result.status)] = failures.get(result.reason or str(result.status), 0) + 1
+        if failures:
+            logger.warning(f"APNs batch: {len(results) - sum(failures.values())}/{len(results)} sent, failures: {failures}")
+        
+        invalid_tokens = [token for token, result in results.items() if result.reason in INVALID_TOKEN_REASONS]
+        if invalid_tokens:
+            await self._cleanup_invalid_tokens(invalid_tokens)
+        
+        return results
+    
+    async def send_batch_by_key(
+        self,
+        notifications: Dict[Hashable, Dict[str, Any]]
+    ) -> Dict[Hashable, PushResult]:
+        """
+        Send notifications keyed by the caller's IDs
+        
+        Unlike send_batch, one device may receive several notifications:
+        each round sends at most one per device token.
+        
+        Args:
+            notifications: Caller ID -> notification data with device_token and payload
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    url,
-                    headers=headers,
-                    json=apns_payload,
-                    ssl=self._create_ssl_context()
-                ) as response:
-                    if response.status == 200:
-                        return True
-                    else:
-                        # APNs returns detailed error information in JSON format
-                        try:
-                            error_data = await response.json()
-                            error_reason = error_data.get("reason", "Unknown error")
-                            
-                            # Handle specific APNs error codes
-                            if error_reason == "BadDeviceToken":
-                                logger.warning(f"Invalid device token: {device_token[:20]}...")
-                                # Remove invalid token from database
-                                await self._cleanup_invalid_token(device_token)
-                            elif error_reason == "BadTopic":
-                                logger.error(f"Bundle ID mismatch. Expected: {self.apns_bundle_id}")
-                            elif error_reason == "ExpiredProviderToken":
-                                logger.error("APNs JWT token expired - should regenerate")
-                            elif error_reason == "MissingTopic":
-                                logger.error(f"Missing apns-topic header. Bundle ID: {self.apns_bundle_id}")
-                            elif error_reason == "PayloadTooLarge":
-                                logger.error(f"Notification payload too large for {device_token[:20]}...")
-                            elif error_reason == "TopicDisallowed":
-                                logger.error(f"Topic not allowed for bundle ID: {self.apns_bundle_id}")
-                            elif error_reason == "BadMessageId":
-                                logger.error("Bad APNs message ID")
-                            elif error_reason == "BadExpirationDate":
-                                logger.error("Bad expiration date in APNs request")
-                            elif error_reason == "BadPriority":
-                                logger.error("Bad priority in APNs request")
-                            elif error_reason == "MissingDeviceToken":
-                                logger.error("Missing device token in APNs request")
-                            elif error_reason == "Unregistered":
-                                logger.warning(f"Device token unregistered: {device_token[:20]}...")
-                                # Remove unregistered token from database
-                                await self._cleanup_invalid_token(device_token)
-                            else:
-                                logger.error(f"APNs error ({response.status}): {error_reason}")
-                            
-                            logger.error(f"APNs error response: {error_data}")
-                            return False
-                        except Exception as parse_error:
-                            error_text = await response.text()
-                            logger.error(f"Failed to parse APNs error response: {parse_error}")
-                            logger.error(f"Raw error response ({response.status}): {error_text}")
-                            return False
-                        
-        except Exception as e:
-            logger.error(f"Error sending push notification: {e}")
-            return False
+        Returns:
+            Dictionary mapping caller IDs to their PushResult
+        """
+        results: Dict[Hashable, PushResult] = {}
+        remaining = list(notifications.items())
+        while remaining:
+            round_keys: Dict[str, Hashable] = {}
+            later = []
+            for key, notification in remaining:
+                if notification["device_token"] in round_keys:
+                    later.append((key, notification))
+                else:
+                    round_keys[notification["device_token"]] = key
+            sent = await self.send_batch(
+                {"device_token": token, "payload": notifications[key]["payload"]}
+                for token, key in round_keys.items()
+            )
+            for token, key in round_keys.items():
+                results[key] = sent[token]
+            remaining = later
+        return results
     
     async def send_batch_notifications(
         self, 
@@ -124,64 +202,111 @@ class PushNotificationService:
         Returns:
             Dictionary mapping device tokens to success status
         """
-        results = {}
+        results = await self.send_batch(notifications)
+        return {device_token: result.success for device_token, result in results.items()}
+    
+    async def close(self) -> None:
+        """Close the APNs connections (called on app shutdown)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def _send(
+        self,
+        device_token: str,
+        payload: Dict[str, Any],
+        retry_expired_token: bool = True
+    ) -> PushResult:
+        """Send one notification and report the APNs response"""
+        # Prepare payload
+        apns_payload = {
+            "aps": payload.get("aps", {}),
+            **{k: v for k, v in payload.items() if k != "aps"}
+        }
         
-        # Send notifications concurrently
-        tasks = []
-        for notification in notifications:
-            device_token = notification["device_token"]
-            payload = notification["payload"]
-            task = self.send_notification(device_token, payload)
-            tasks.append((device_token, task))
+        try:
+            response = await self._get_client().post(
+                f"/3/device/{device_token}",
+                headers=self._create_headers(),
+                json=apns_payload
+            )
+        except httpx.HTTPError as e:
+            logger.error(f"Error sending push notification: {type(e).__name__}: {e}")
+            return PushResult(device_token=device_token, status=0, reason=type(e).__name__)
         
-        # Wait for all tasks to complete
-        for device_token, task in tasks:
+        reason = None
+        if response.status_code != 200:
+            # APNs returns detailed error information in JSON format
             try:
-                success = await task
-                results[device_token] = success
-            except Exception as e:
-                logger.error(f"Error sending notification to {device_token}: {e}")
-                results[device_token] = False
+                reason = response.json().get("reason", "Unknown error")
+            except ValueError:
+                reason = response.text or "Unknown error"
         
-        return results
-    
-    async def cancel_user_notifications(self, user_id: str) -> bool:
-        """
-        Cancel all pending notifications for a user
+        if reason == "ExpiredProviderToken" and retry_expired_token:
+            # Our clock and Apple's disagree; sign a new token and retry once
+            self._provider_token = None
+            return await self._send(device_token, payload, retry_expired_token=False)
         
-        Args:
-            user_id: User ID to cancel notifications for
-            
-        Returns:
-            Boolean indicating success
-        """
-        try:
-            # In a real implementation, you would maintain a queue of scheduled notifications
-            # and cancel them based on user_id. For now, we'll just log the action.
-            return True
-        except Exception as e:
-            logger.error(f"Error cancelling notifications for user {user_id}: {e}")
-            return False
+        return PushResult(
+            device_token=device_token,
+            status=response.status_code,
+            reason=reason,
+            apns_id=response.headers.get("apns-id")
+        )
     
-    async def _create_headers(self) -> Dict[str, str]:
-        """Create APNs request headers with JWT token"""
-        try:
-            # Generate JWT token for APNs authentication
-            jwt_token = await self._generate_jwt_token()
-            
-            return {
-                "authorization": f"bearer {jwt_token}",
-                "apns-topic": self.apns_bundle_id,
-                "apns-push-type": "alert",
-                "apns-priority": "10",
-                "apns-expiration": str(int(DateTimeService.now().timestamp()) + 3600),  # 1 hour
-                "content-type": "application/json"
-            }
-        except Exception as e:
-            logger.error(f"Error creating APNs headers: {e}")
-            return {}
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the shared HTTP/2 client, creating it on first use"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.apns_url,
+                http2=True,
+                # HTTP/2 without TLS needs prior knowledge (no HTTP/1.1 upgrade)
+                http1=not self.apns_url.startswith("http://"),
+                verify=self._create_ssl_context(),
+                limits=httpx.Limits(
+                    max_connections=settings.apns_max_connections,
+                    max_keepalive_connections=settings.apns_max_connections
+                ),
+                timeout=httpx.Timeout(10.0)
+            )
+        return self._client
+    
+    def _log_failure(self, result: PushResult) -> None:
+        """Log why a notification was not sent"""
+        token = result.device_token[:20]
+        if result.reason == "BadDeviceToken":
+            logger.warning(f"Invalid device token: {token}...")
+        elif result.reason == "Unregistered":
+            logger.warning(f"Device token unregistered: {token}...")
+        elif result.reason in _REASON_LOG_MESSAGES:
+            logger.error(_REASON_LOG_MESSAGES[result.reason].format(bundle_id=self.apns_bundle_id, token=token))
+        else:
+            logger.error(f"APNs error ({result.status}): {result.reason}")
     
-    async def _generate_jwt_token(self) -> str:
+    def _create_headers(self) -> Dict[str, str]:
+        """Create APNs request headers with the cached provider token"""
+        return {
+            "authorization": f"bearer {self._get_provider_token()}",
+            "apns-topic": self.apns_bundle_id or "",
+            "apns-push-type": "alert",
+            "apns-priority": "10",
+            "apns-expiration": str(int(DateTimeService.now().timestamp()) + 3600),  # 1 hour
+            "content-type": "application/json"
+        }
+    
+    def _get_provider_token(self) -> str:
+        """Return the provider token, signing a new one when it is due"""
+        now = time.monotonic()
+        if self._provider_token is None or now - self._provider_token_issued_at >= self.PROVIDER_TOKEN_TTL_SECONDS:
+            token = self._generate_jwt_token()
+            if not token:
+                # Misconfigured: let APNs reject it, but try again next time
+                return token
+            self._provider_token = token
+            self._provider_token_issued_at = now
+        return self._provider_token
+    
+    def _generate_jwt_token(self) -> str:
         """
         Generate JWT token for APNs authentication
         Uses ES256 algorithm with APNs private key
@@ -198,27 +323,22 @@ class PushNotificationService:
                 logger.error("APNS_PRIVATE_KEY not configured")
                 return ""
             
-            # JWT payload with issuer, issued at, and expiration
-            now = DateTimeService.now()
+            # JWT payload with issuer and issued at (APNs ignores exp and
+            # rejects tokens issued more than an hour ago)
             jwt_payload = {
                 "iss": self.apns_team_id,
-                "iat": int(now.timestamp()),
-                "exp": int((now + timedelta(hours=1)).timestamp())
+                "iat": int(DateTimeService.now().timestamp())
             }
             
             # Generate JWT token with ES256 algorithm
-            token = jwt.encode(
+            return jwt.encode(
                 jwt_payload,
                 self.apns_private_key,
                 algorithm="ES256",
                 headers={"kid": self.apns_key_id}
             )
-            
-            return token
         except Exception as e:
             logger.error(f"Error generating JWT token: {e}")
-            import traceback
-            logger.error(f"Error generating notification payload: {e}")
             return ""
     
     def _create_ssl_context(self) -> ssl.SSLContext:
@@ -258,58 +378,53 @@ class PushNotificationService:
             logger.error(f"Error validating device token: {e}")
             return False
     
-    async def _cleanup_invalid_token(self, device_token: str) -> None:
+    async def _cleanup_invalid_tokens(self, device_tokens: List[str]) -> None:
         """
-        Remove invalid or unregistered device token from database
+        Remove invalid or unregistered device tokens from database
         
-        This method removes the token from:
+        This method removes the tokens from:
         - users.device_token field
         - device_tokens_temp table
         
+        Tokens are removed in batches of TOKEN_CLEANUP_BATCH_SIZE, so a large
+        campaign's invalid tokens never become one unbounded IN filter.
+        
         Args:
-            device_token: Invalid device token to remove
+            device_tokens: Invalid device tokens to remove
         """
         try:
             from app.core.database import get_supabase_service_role_client
-            from app.shared.services.database_operation_service import DatabaseOperationService
             from app.shared.utils.async_supabase import execute_async
             
             service_supabase = get_supabase_service_role_client()
-            db_service = DatabaseOperationService(service_supabase)
             
-            # Remove from users table
-            try:
-                # Find users with this device token
-                user_response = await execute_async(
-                    lambda: service_supabase.table("users")
-                        .select("id")
-                        .eq("device_token", device_token)
-                        .execute()
-                )
+            for start in range(0, len(device_tokens), self.TOKEN_CLEANUP_BATCH_SIZE):
+                batch = device_tokens[start:start + self.TOKEN_CLEANUP_BATCH_SIZE]
                 
-                if user_response.data:
-                    for user in user_response.data:
-                        user_id = user.get("id")
-                        await db_service.update_with_timestamp(
-                            "users",
-                            user_id,
-                            {"device_token": None}
-                        )
-                        logger.info(f"Removed invalid device token from user {user_id}")
-            except Exception as user_error:
-                logger.warning(f"Error removing token from users table: {user_error}")
-            
-            # Remove from device_tokens_temp table
-            try:
-                await execute_async(
-                    lambda: service_supabase.table("device_tokens_temp")
-                        .delete()
-                        .eq("device_token", device_token)
-                        .execute()
-                )
-                logger.info(f"Removed invalid device token from device_tokens_temp table")
-            except Exception as temp_error:
-                logger.warning(f"Error removing token from device_tokens_temp table: {temp_error}")
+                # Remove from users table
+                try:
+                    user_response = await execute_async(
+                        lambda: service_supabase.table("users")
+                            .update({"device_token": None, "updated_at": DateTimeService.now_iso()})
+                            .in_("device_token", batch)
+                            .execute()
+                    )
+                    for user in user_response.data or []:
+                        logger.info(f"Removed invalid device token from user {user.get('id')}")
+                except Exception as user_error:
+                    logger.warning(f"Error removing tokens from users table: {user_error}")
+                
+                # Remove from device_tokens_temp table
+                try:
+                    await execute_async(
+                        lambda: service_supabase.table("device_tokens_temp")
+                            .delete()
+                            .in_("device_token", batch)
+                            .execute()
+                    )
+                    logger.info(f"Removed {len(batch)} invalid device tokens from device_tokens_temp table")
+                except Exception as temp_error:
+                    logger.warning(f"Error removing tokens from device_tokens_temp table: {temp_error}")
             
         except Exception as e:
-            logger.error(f"Error cleaning up invalid device token: {e}")
+            logger.error(f"Error cleaning up invalid device tokens: {e}")
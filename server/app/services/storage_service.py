@@ -3,11 +3,17 @@ Storage service for handling file uploads to Supabase Storage
 Manages uploads for user images, pet images, and scan images
 """
 
-from typing import Optional, Tuple
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
 from fastapi import UploadFile, HTTPException, status
 from app.core.database import get_supabase_client
 from app.services.image_optimizer import ImageOptimizerService
+from app.shared.utils.async_supabase import execute_async
 from app.utils.logging_config import get_logger
+import asyncio
+import hashlib
+import os
+import re
+import tempfile
 import uuid
 from datetime import datetime
 from app.shared.services.datetime_service import DateTimeService
@@ -37,10 +43,28 @@ class StorageService:
         }
     }
     
+    # Files stored per content-addressed image, e.g. "thumbnail.webp"
+    DERIVATIVE_FILES = [
+        f"{name}.{extension}"
+        for name in ImageOptimizerService.DERIVATIVE_SIZES
+        for extension in ImageOptimizerService.DERIVATIVE_FORMATS
+    ]
+    FULL_IMAGE_FILE = "full.jpg"
+    
+    # Content type per derivative file extension
+    CONTENT_TYPES = {"jpg": "image/jpeg", "webp": "image/webp"}
+    
+    # Cache lifetime of content-addressed objects, which never change (1 year)
+    IMMUTABLE_CACHE_SECONDS = "31536000"
+    
+    # Full image URL or path of a content-addressed image
+    _DERIVATIVE_URL = re.compile(r"^(?P<prefix>(?:.*/)?(?P<hash>[0-9a-f]{64}))/full\.jpg(?P<query>\?.*)?$")
+    _CONTENT_HASH = re.compile(r"^[0-9a-f]{64}$")
+    
     @classmethod
     async def upload_scan_image(
         cls,
-        image_data: bytes,
+        image_data: Union[bytes, BinaryIO],
         user_id: str,
         scan_id: str,
         optimize: bool = True
@@ -49,7 +73,7 @@ class StorageService:
         Upload scan image to storage (only for OCR scans)
         
         Args:
-            image_data: Raw image bytes
+            image_data: Raw image bytes or a binary file (e.g. a spooled upload)
             user_id: User ID for folder structure
             scan_id: Scan ID for unique filename
             optimize: Whether to optimize image before upload
@@ -61,62 +85,20 @@ class StorageService:
             HTTPException: If upload fails or validation fails
         """
         try:
-            bucket_config = cls.BUCKETS["scan_images"]
-            
-            # Validate file size
-            if len(image_data) > bucket_config["max_size"]:
-                raise HTTPException(
-                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                    detail=f"Image exceeds maximum size of {bucket_config['max_size'] / 1_048_576:.1f}MB"
-                )
-            
-            # Validate image
-            if not ImageOptimizerService.validate_image(image_data):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Invalid image file"
-                )
-            
-            # Optimize image if requested
-            upload_data = image_data
-            if optimize:
-                try:
-                    optimized_data, metadata = ImageOptimizerService.optimize_image(
-                        image_data,
-                        target_size=2_097_152  # 2MB target
-                    )
-                    upload_data = optimized_data
-                except Exception as e:
-                    logger.warning(f"Image optimization failed, uploading original: {e}")
-                    upload_data = image_data
-            
             # Generate unique file path
             timestamp = DateTimeService.now().strftime("%Y%m%d_%H%M%S")
             file_path = f"{user_id}/scans/{scan_id}_{timestamp}.jpg"
             
-            # Upload to Supabase Storage
-            supabase = get_supabase_client()
-            response = supabase.storage.from_(bucket_config["name"]).upload(
-                path=file_path,
-                file=upload_data,
-                file_options={
-                    "content-type": "image/jpeg",
-                    "cache-control": "3600",
-                    "upsert": "false"
-                }
+            return await cls._upload_image(
+                "scan_images",
+                image_data,
+                file_path,
+                upsert=False,
+                optimize=optimize,
+                target_size=2_097_152,  # 2MB target
+                derivatives_folder=f"{user_id}/scans/{scan_id}"
             )
             
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Failed to upload image to storage"
-                )
-            
-            # Get public URL
-            public_url = supabase.storage.from_(bucket_config["name"]).get_public_url(file_path)
-            
-            return public_url
-            
         except HTTPException:
             raise
         except Exception as e:
@@ -129,7 +111,7 @@ class StorageService:
     @classmethod
     async def upload_user_image(
         cls,
-        image_data: bytes,
+        image_data: Union[bytes, BinaryIO],
         user_id: str,
         optimize: bool = True
     ) -> str:
@@ -137,7 +119,7 @@ class StorageService:
         Upload user profile image to storage
         
         Args:
-            image_data: Raw image bytes
+            image_data: Raw image bytes or a binary file (e.g. a spooled upload)
             user_id: User ID for folder structure
             optimize: Whether to optimize image before upload
             
@@ -145,50 +127,14 @@ class StorageService:
             Public URL of uploaded image
         """
         try:
-            bucket_config = cls.BUCKETS["user_images"]
-            
-            if len(image_data) > bucket_config["max_size"]:
-                raise HTTPException(
-                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                    detail=f"Image exceeds maximum size of {bucket_config['max_size'] / 1_048_576:.1f}MB"
-                )
-            
-            if not ImageOptimizerService.validate_image(image_data):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Invalid image file"
-                )
-            
-            upload_data = image_data
-            if optimize:
-                try:
-                    optimized_data, _ = ImageOptimizerService.optimize_image(image_data)
-                    upload_data = optimized_data
-                except Exception as e:
-                    logger.warning(f"Image optimization failed: {e}")
-            
-            file_path = f"{user_id}/profile.jpg"
-            
-            supabase = get_supabase_client()
-            response = supabase.storage.from_(bucket_config["name"]).upload(
-                path=file_path,
-                file=upload_data,
-                file_options={
-                    "content-type": "image/jpeg",
-                    "cache-control": "3600",
-                    "upsert": "true"  # Allow overwriting profile images
-                }
+            return await cls._upload_image(
+                "user_images",
+                image_data,
+                f"{user_id}/profile.jpg",
+                upsert=True,  # Allow overwriting profile images
+                optimize=optimize
             )
             
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Failed to upload image to storage"
-                )
-            
-            public_url = supabase.storage.from_(bucket_config["name"]).get_public_url(file_path)
-            return public_url
-            
         except HTTPException:
             raise
         except Exception as e:
@@ -201,7 +147,7 @@ class StorageService:
     @classmethod
     async def upload_pet_image(
         cls,
-        image_data: bytes,
+        image_data: Union[bytes, BinaryIO],
         user_id: str,
         pet_id: str,
         optimize: bool = True
@@ -209,8 +155,11 @@ class StorageService:
         """
         Upload pet image to storage
         
+        The derivatives of the image it replaces are removed once the new
+        image is stored.
+        
         Args:
-            image_data: Raw image bytes
+            image_data: Raw image bytes or a binary file (e.g. a spooled upload)
             user_id: User ID for folder structure
             pet_id: Pet ID for unique filename
             optimize: Whether to optimize image before upload
@@ -219,59 +168,315 @@ class StorageService:
             Public URL of uploaded image
         """
         try:
-            bucket_config = cls.BUCKETS["pet_images"]
+            folder = f"{user_id}/pets/{pet_id}"
+            url = await cls._upload_image(
+                "pet_images",
+                image_data,
+                f"{folder}.jpg",
+                upsert=True,  # Allow overwriting pet images
+                optimize=optimize,
+                derivatives_folder=folder
+            )
+            await cls._remove_replaced_derivatives("pet_images", folder, url)
+            return url
             
-            if len(image_data) > bucket_config["max_size"]:
-                raise HTTPException(
-                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                    detail=f"Image exceeds maximum size of {bucket_config['max_size'] / 1_048_576:.1f}MB"
-                )
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Pet image upload failed: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to upload pet image: {str(e)}"
+            )
+    
+    @classmethod
+    async def _upload_image(
+        cls,
+        bucket_key: str,
+        source: Union[bytes, BinaryIO],
+        file_path: str,
+        upsert: bool,
+        optimize: bool,
+        target_size: int = ImageOptimizerService.TARGET_FILE_SIZE,
+        derivatives_folder: Optional[str] = None
+    ) -> str:
+        """
+        Validate, optimize and upload one image
+        
+        The header is checked first; the image is then decoded once, in the
+        optimizer's process pool. The optimized JPEG is written to a
+        temporary file and streamed from there to storage, so the request
+        only holds the upload itself (spooled to disk by Starlette when
+        large) and, while it is being optimized, one copy of its bytes.
+        If the original is uploaded instead, it is fully decoded first, so
+        corrupt files are rejected, and stored with its detected format's
+        content type.
+        
+        With derivatives_folder, all derivatives (see
+        ImageOptimizerService.DERIVATIVE_SIZES) are stored in a
+        content-addressed folder instead; file_path is then only used if
+        they cannot be created.
+        
+        Args:
+            bucket_key: Key into BUCKETS
+            source: Raw image bytes or a binary file positioned at the image
+            file_path: Path of the object in the bucket
+            upsert: Whether to overwrite an existing object
+            optimize: Whether to optimize image before upload
+            target_size: Target file size in bytes for optimization
+            derivatives_folder: Folder to store derivatives under
             
-            if not ImageOptimizerService.validate_image(image_data):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Invalid image file"
-                )
+        Returns:
+            Public URL of uploaded image (the full derivative's, if created)
             
-            upload_data = image_data
+        Raises:
+            HTTPException: If validation or upload fails
+        """
+        bucket_config = cls.BUCKETS[bucket_key]
+        
+        # Validate file size
+        size = cls._source_size(source)
+        if size > bucket_config["max_size"]:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Image exceeds maximum size of {bucket_config['max_size'] / 1_048_576:.1f}MB"
+            )
+        
+        # Validate image (header only)
+        if not ImageOptimizerService.validate_image(source):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid image file"
+            )
+        
+        bucket = get_supabase_client().storage.from_(bucket_config["name"])
+        
+        if optimize and derivatives_folder:
+            try:
+                return await cls._upload_derivatives(
+                    bucket, bucket_config["name"], source, derivatives_folder, target_size
+                )
+            except Exception as e:
+                logger.warning(f"Image derivatives failed, uploading original: {e}")
+                optimize = False
+        
+        output_path = None
+        try:
             if optimize:
+                with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as output:
+                    output_path = output.name
                 try:
-                    optimized_data, _ = ImageOptimizerService.optimize_image(image_data)
-                    upload_data = optimized_data
+                    await ImageOptimizerService.optimize_upload_async(
+                        source, output_path, target_size=target_size
+                    )
                 except Exception as e:
-                    logger.warning(f"Image optimization failed: {e}")
-            
-            file_path = f"{user_id}/pets/{pet_id}.jpg"
+                    logger.warning(f"Image optimization failed, uploading original: {e}")
+                    os.unlink(output_path)
+                    output_path = None
             
-            supabase = get_supabase_client()
-            response = supabase.storage.from_(bucket_config["name"]).upload(
-                path=file_path,
-                file=upload_data,
-                file_options={
-                    "content-type": "image/jpeg",
-                    "cache-control": "3600",
-                    "upsert": "true"  # Allow overwriting pet images
-                }
+            if output_path:
+                content, content_type = output_path, "image/jpeg"
+            else:
+                try:
+                    content, info = await ImageOptimizerService.verify_upload_async(source)
+                except ValueError:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Invalid image file"
+                    )
+                content_type = ImageOptimizerService.CONTENT_TYPES[info["format"]]
+            await cls._upload_object(
+                bucket, bucket_config["name"], file_path, content, upsert=upsert, content_type=content_type
             )
-            
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Failed to upload image to storage"
+        finally:
+            if output_path:
+                os.unlink(output_path)
+        
+        return bucket.get_public_url(file_path)
+    
+    @classmethod
+    async def _upload_derivatives(
+        cls,
+        bucket,
+        bucket_name: str,
+        source: Union[bytes, BinaryIO],
+        folder: str,
+        target_size: int
+    ) -> str:
+        """
+        Store an image's derivatives under a key derived from its content
+        
+        The folder is per resource (pet or scan) and the key is the SHA-256
+        of the upload, so uploading the same image for it again (a retried
+        scan, the same pet photo) finds the derivatives already stored and
+        skips decoding and uploading. Folders are never shared between
+        resources, so deleting one resource's image cannot remove another's.
+        The objects never change, so they are served with a long cache
+        lifetime.
+        
+        Returns:
+            Public URL of the full derivative
+        """
+        content_hash = await asyncio.to_thread(cls._content_hash, source)
+        prefix = f"{folder}/{content_hash}"
+        full_url = bucket.get_public_url(f"{prefix}/{cls.FULL_IMAGE_FILE}")
+        
+        existing = await execute_async(lambda: bucket.list(prefix), table_name=bucket_name)
+        if set(cls.DERIVATIVE_FILES) <= {item.get("name") for item in existing or []}:
+            logger.info(f"Image {prefix} already stored, skipping upload")
+            return full_url
+        
+        with tempfile.TemporaryDirectory() as output_dir:
+            await ImageOptimizerService.create_derivatives_async(source, output_dir, target_size=target_size)
+            await asyncio.gather(*(
+                cls._upload_object(
+                    bucket,
+                    bucket_name,
+                    f"{prefix}/{file_name}",
+                    os.path.join(output_dir, file_name),
+                    upsert=True,
+                    content_type=cls.CONTENT_TYPES[file_name.rsplit(".", 1)[1]],
+                    cache_control=cls.IMMUTABLE_CACHE_SECONDS
                 )
-            
-            public_url = supabase.storage.from_(bucket_config["name"]).get_public_url(file_path)
-            return public_url
-            
-        except HTTPException:
-            raise
+                for file_name in cls.DERIVATIVE_FILES
+            ))
+        return full_url
+    
+    @classmethod
+    async def _remove_replaced_derivatives(cls, bucket_key: str, folder: str, image_url: str) -> None:
+        """
+        Remove the images a resource's new image replaced
+        
+        Every content-addressed folder under the resource's folder other than
+        the new image's is removed, and so is the single-file image if the
+        new one has derivatives. Failures are logged: the upload succeeded.
+        
+        Args:
+            bucket_key: Key into BUCKETS
+            folder: Resource folder, e.g. "{user_id}/pets/{pet_id}"
+            image_url: URL of the new image
+        """
+        bucket_name = cls.BUCKETS[bucket_key]["name"]
+        match = cls._DERIVATIVE_URL.match(image_url)
+        current = match["hash"] if match else None
+        try:
+            bucket = get_supabase_client().storage.from_(bucket_name)
+            entries = await execute_async(lambda: bucket.list(folder), table_name=bucket_name)
+            stale = [
+                f"{folder}/{entry['name']}/{file_name}"
+                for entry in entries or []
+                if cls._CONTENT_HASH.match(entry.get("name") or "") and entry["name"] != current
+                for file_name in cls.DERIVATIVE_FILES
+            ]
+            if current:
+                stale.append(f"{folder}.jpg")
+            if stale:
+                await execute_async(lambda: bucket.remove(stale), table_name=bucket_name)
         except Exception as e:
-            logger.error(f"Pet image upload failed: {str(e)}")
+            logger.warning(f"Failed to remove replaced images under {folder}: {e}")
+    
+    @staticmethod
+    async def _upload_object(
+        bucket,
+        bucket_name: str,
+        path: str,
+        content: Union[bytes, str],
+        upsert: bool,
+        content_type: str = "image/jpeg",
+        cache_control: str = "3600"
+    ) -> None:
+        """
+        Upload bytes, or stream a local file, to a bucket path
+        
+        Raises:
+            HTTPException: If storage does not accept the upload
+        """
+        def upload(file):
+            return bucket.upload(
+                path=path,
+                file=file,
+                file_options={
+                    "content-type": content_type,
+                    "cache-control": cache_control,
+                    "upsert": "true" if upsert else "false"
+                }
+            )
+        
+        if isinstance(content, bytes):
+            response = await execute_async(lambda: upload(content), table_name=bucket_name)
+        else:
+            with open(content, "rb") as file:
+                response = await execute_async(lambda: upload(file), table_name=bucket_name)
+        
+        if response.status_code != 200:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to upload pet image: {str(e)}"
+                detail="Failed to upload image to storage"
             )
     
+    @staticmethod
+    def _content_hash(source: Union[bytes, BinaryIO]) -> str:
+        """SHA-256 of a source, reading a file in chunks without moving its position"""
+        if isinstance(source, bytes):
+            return hashlib.sha256(source).hexdigest()
+        position = source.tell()
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: source.read(1_048_576), b""):
+            digest.update(chunk)
+        source.seek(position)
+        return digest.hexdigest()
+    
+    @classmethod
+    def derivative_urls(cls, image_url: Optional[str]) -> Optional[Dict[str, str]]:
+        """
+        URLs of an image's derivatives, from the URL of its full image
+        
+        Images stored before derivatives existed (or whose derivatives could
+        not be created) are a single file; every size then points at it and
+        there are no WebP URLs.
+        
+        Args:
+            image_url: Stored image URL (e.g. pets.image_url)
+            
+        Returns:
+            Size name -> JPEG URL and "<size>_webp" -> WebP URL, e.g.
+            {"full": ..., "list": ..., "thumbnail": ..., "thumbnail_webp": ...},
+            or None without an image
+        """
+        if not image_url:
+            return None
+        match = cls._DERIVATIVE_URL.match(image_url)
+        if not match:
+            return {name: image_url for name in ImageOptimizerService.DERIVATIVE_SIZES}
+        
+        urls = {}
+        for extension in ImageOptimizerService.DERIVATIVE_FORMATS:
+            suffix = "" if extension == "jpg" else f"_{extension}"
+            for name in ImageOptimizerService.DERIVATIVE_SIZES:
+                urls[f"{name}{suffix}"] = f"{match['prefix']}/{name}.{extension}{match['query'] or ''}"
+        return urls
+    
+    @classmethod
+    def derivative_paths(cls, storage_path: str) -> List[str]:
+        """
+        Storage paths of all derivatives of an image, from the path of its
+        full image (just the path itself for single-file images)
+        """
+        match = cls._DERIVATIVE_URL.match(storage_path)
+        if not match:
+            return [storage_path]
+        return [f"{match['prefix']}/{file_name}" for file_name in cls.DERIVATIVE_FILES]
+    
+    @staticmethod
+    def _source_size(source: Union[bytes, BinaryIO]) -> int:
+        """Size in bytes of raw bytes or of a file from its current position"""
+        if isinstance(source, bytes):
+            return len(source)
+        position = source.tell()
+        size = source.seek(0, os.SEEK_END) - position
+        source.seek(position)
+        return size
+    
     @classmethod
     async def delete_scan_image(cls, user_id: str, image_url: str) -> bool:
         """
@@ -296,7 +501,7 @@ class StorageService:
                 )
             
             supabase = get_supabase_client()
-            response = supabase.storage.from_("scan-images").remove([file_path])
+            response = supabase.storage.from_("scan-images").remove(cls.derivative_paths(file_path))
             
             return True
             
@@ -345,8 +550,10 @@ class StorageService:
         Returns:
             Public URL of uploaded image
         """
-        # Read file data
-        image_data = await file.read()
+        # Pass the spooled upload on as a file; it is only read into memory
+        # while the image is being optimized
+        image_data = file.file
+        image_data.seek(0)
         
         # Route to appropriate upload method
         if upload_type == "user":
@@ -7,6 +7,7 @@ Combines all subscription-related services into a unified interface.
 from .revenuecat_webhook_service import RevenueCatWebhookService
 from .revenuecat_api_service import RevenueCatAPIService
 from .revenuecat_subscription_service import RevenueCatSubscriptionService
+from .entitlement_cache import EntitlementCache
 
 # Backward compatibility: Unified service that combines all three
 from .revenuecat_service import RevenueCatService
@@ -15,6 +16,7 @@ __all__ = [
     'RevenueCatWebhookService',
     'RevenueCatAPIService',
     'RevenueCatSubscriptionService',
+    'EntitlementCache',
     'RevenueCatService',  # Backward compatibility
 ]
 
@@ -0,0 +1,175 @@
+"""
+Entitlement Cache
+
+Per-user cache of subscription status (the dict returned by
+SubscriptionChecker.check_subscription_status):
+- L1: in-process LRU (no I/O), also readable from sync code; entries are
+  short-lived because a webhook handled by another worker only reaches this
+  one through Redis or the database
+- L2: Redis, shared between workers (when configured)
+
+RevenueCat webhooks write the new status (purchase, renewal) or drop the
+cached one (expiration, cancellation, ...), so premium checks are answered
+from memory between subscription changes. An entry never outlives the
+subscription period it describes, so an expiry whose webhook was missed is
+re-checked when it happens.
+"""
+
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Union
+
+from app.shared.services.cache_service import CacheEntry, cache_service
+from app.shared.services.datetime_service import DateTimeService
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class EntitlementCache:
+    """Two-tier cache of subscription status keyed by user ID"""
+
+    KEY_PREFIX = "entitlement"
+
+    TTL_SECONDS = 6 * 3600
+    MIN_TTL_SECONDS = 30
+    L1_MAX_ENTRIES = 10000
+    L1_TTL_SECONDS = 60  # bounds staleness after another worker's webhook
+
+    # Shared across instances - checkers are constructed per request
+    _l1: "OrderedDict[str, CacheEntry]" = OrderedDict()
+
+    @classmethod
+    def cache_key(cls, user_id: str) -> str:
+        """Build the cache key shared by L1 and L2"""
+        return f"{cls.KEY_PREFIX}:{user_id}"
+
+    @classmethod
+    async def get(cls, user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Read a user's cached status through L1 and L2
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            Cached subscription status, or None
+        """
+        status = cls.get_local(user_id)
+        if status is not None:
+            return status
+
+        if cache_service.redis_enabled:
+            status = await cache_service.get(cls.cache_key(user_id))
+            if status:
+                cls._l1_set(user_id, status, cls._ttl(status))
+                return status
+        return None
+
+    @classmethod
+    def get_local(cls, user_id: str) -> Optional[Dict[str, Any]]:
+        """Read a user's cached status from L1 only (no I/O)"""
+        key = cls.cache_key(user_id)
+        entry = cls._l1.get(key)
+        if entry is None:
+            return None
+        if entry.is_expired():
+            cls._l1.pop(key, None)
+            return None
+        cls._l1.move_to_end(key)
+        return entry.data
+
+    @classmethod
+    async def set(cls, user_id: str, status: Dict[str, Any]) -> None:
+        """
+        Cache a user's status in L2 and L1
+
+        Failures are logged and swallowed so caching never fails the caller.
+
+        Args:
+            user_id: User ID
+            status: Subscription status to cache
+        """
+        ttl = cls._ttl(status)
+        try:
+            if cache_service.redis_enabled:
+                await cache_service.set(cls.cache_key(user_id), status, ttl)
+        except Exception as e:
+            logger.warning(f"Failed to cache entitlement for user {user_id}: {e}")
+        cls._l1_set(user_id, status, ttl)
+
+    @classmethod
+    async def invalidate(cls, user_id: Optional[str]) -> None:
+        """
+        Drop a user's cached status from every tier
+
+        Args:
+            user_id: User ID (ignored if None)
+        """
+        if not user_id:
+            return
+        key = cls.cache_key(user_id)
+        cls._l1.pop(key, None)
+        try:
+            if cache_service.redis_enabled:
+                await cache_service.redis_client.delete(key)
+        except Exception as e:
+            logger.warning(f"Failed to invalidate entitlement for user {user_id}: {e}")
+
+    @staticmethod
+    def subscribed_status(
+        product_id: Optional[str],
+        expires_date: Optional[Union[str, int]],
+        source: str,
+        subscription_status: str = "active"
+    ) -> Dict[str, Any]:
+        """Status of a user with an active premium subscription"""
+        return {
+            "has_active_subscription": True,
+            "is_premium": True,
+            "is_admin": False,
+            "source": source,
+            "subscription": {
+                "product_id": product_id,
+                "expires_date": expires_date,
+                "status": subscription_status
+            },
+            "user_role": "premium"
+        }
+
+    @staticmethod
+    def parse_expiry(value: Optional[Union[str, int, float]]) -> Optional[datetime]:
+        """Parse an ISO timestamp or epoch milliseconds (as sent by RevenueCat)"""
+        if value is None or value == "":
+            return None
+        try:
+            if isinstance(value, (int, float)):
+                return datetime.fromtimestamp(value / 1000, tz=DateTimeService.now().tzinfo)
+            expiry = DateTimeService.from_iso(value)
+            if expiry.tzinfo is None:
+                expiry = expiry.replace(tzinfo=DateTimeService.now().tzinfo)
+            return expiry
+        except (TypeError, ValueError):
+            return None
+
+    @classmethod
+    def _ttl(cls, status: Dict[str, Any]) -> float:
+        """Cache lifetime, capped at the end of the cached subscription period"""
+        ttl = cls.TTL_SECONDS
+        subscription = status.get("subscription") or {}
+        if status.get("has_active_subscription"):
+            expiry = cls.parse_expiry(subscription.get("expires_date") or subscription.get("expiration_date"))
+            if expiry is not None:
+                remaining = (expiry - DateTimeService.now()).total_seconds()
+                ttl = min(ttl, max(remaining, cls.MIN_TTL_SECONDS))
+        return ttl
+
+    @classmethod
+    def _l1_set(cls, user_id: str, status: Dict[str, Any], ttl: float) -> None:
+        """Write to L1 with LRU eviction"""
+        ttl = min(ttl, cls.L1_TTL_SECONDS)
+        key = cls.cache_key(user_id)
+        cls._l1[key] = CacheEntry(status, ttl)
+        cls._l1.move_to_end(key)
+        while len(cls._l1) > cls.L1_MAX_ENTRIES:
+            cls._l1.popitem(last=False)
@@ -16,6 +16,7 @@ import logging
 
 from app.shared.services.datetime_service import DateTimeService
 from app.shared.services.database_operation_service import DatabaseOperationService
+from app.services.subscription.entitlement_cache import EntitlementCache
 from app.shared.utils.async_supabase import execute_async
 from app.models.core.user import UserRole
 from app.core.config import settings
@@ -131,6 +132,8 @@ class RevenueCatSubscriptionService:
                 
                 await db_service.insert_with_timestamps("subscriptions", subscription_data)
             
+            await EntitlementCache.invalidate(user_id)
+            
             # Verify the update succeeded
             verify_response = await execute_async(
                 lambda: self.supabase.table("subscriptions").select("status, product_id").eq("user_id", user_id).execute()
@@ -4,6 +4,10 @@ RevenueCat Webhook Service
 Handles all RevenueCat webhook events for subscription lifecycle management.
 Extracted from revenuecat_service.py for better single responsibility.
 
+Each handler also updates the entitlement cache after writing the database:
+purchases and renewals cache the new premium status, other changes drop the
+cached status so the next check resolves it from the database.
+
 Documentation: https://www.revenuecat.com/docs/webhooks
 """
 
@@ -12,6 +16,7 @@ from supabase import Client
 import logging
 
 from app.models.core.user import UserRole
+from app.services.subscription.entitlement_cache import EntitlementCache
 from app.services.subscription.revenuecat_subscription_service import RevenueCatSubscriptionService
 
 logger = logging.getLogger(__name__)
@@ -75,6 +80,10 @@ class RevenueCatWebhookService:
                     # Upgrade user role to premium
                     await self.subscription_service.update_user_role(user_id, UserRole.PREMIUM)
                     
+                    await EntitlementCache.set(user_id, EntitlementCache.subscribed_status(
+                        product_id, expires_date, "revenuecat_webhook"
+                    ))
+                    
                     logger.info(f"User {user_id} upgraded to premium")
         
         except Exception as e:
@@ -112,6 +121,10 @@ class RevenueCatWebhookService:
                 
                 # Ensure user has premium role
                 await self.subscription_service.update_user_role(user_id, UserRole.PREMIUM)
+                
+                await EntitlementCache.set(user_id, EntitlementCache.subscribed_status(
+                    product_id, expires_date, "revenuecat_webhook"
+                ))
         
         except Exception as e:
             logger.error(f"Error handling renewal: {str(e)}", exc_info=True)
@@ -142,6 +155,7 @@ class RevenueCatWebhookService:
             )
             
             # Don't downgrade user yet - they have access until expiration
+            await EntitlementCache.invalidate(user_id)
         
         except Exception as e:
             logger.error(f"Error handling cancellation: {str(e)}", exc_info=True)
@@ -169,6 +183,7 @@ class RevenueCatWebhookService:
                 product_id=product_id,
                 entitlement_id=self.PREMIUM_ENTITLEMENT
             )
+            await EntitlementCache.invalidate(user_id)
         
         except Exception as e:
             logger.error(f"Error handling uncancellation: {str(e)}", exc_info=True)
@@ -228,6 +243,7 @@ class RevenueCatWebhookService:
                     # Downgrade user to free, but check if user should be protected
                     # Set allow_downgrade=False to check protection before downgrading
                     await self.subscription_service.update_user_role(user_id, UserRole.FREE, allow_downgrade=False)
+                    await EntitlementCache.invalidate(user_id)
                     
                     # Check if downgrade was actually applied
                     from app.shared.utils.async_supabase import execute_async
@@ -267,6 +283,7 @@ class RevenueCatWebhookService:
                 product_id=product_id,
                 entitlement_id=self.PREMIUM_ENTITLEMENT
             )
+            await EntitlementCache.invalidate(user_id)
             
             # Optionally: Send email notification to user
         
@@ -318,6 +335,7 @@ class RevenueCatWebhookService:
                 product_id=product_id,
                 entitlement_id=self.PREMIUM_ENTITLEMENT
             )
+            await EntitlementCache.invalidate(user_id)
         
         except Exception as e:
             logger.error(f"Error handling subscription paused: {str(e)}", exc_info=True)
@@ -345,6 +363,9 @@ class RevenueCatWebhookService:
                 await self.subscription_service.update_user_role(from_user_id, UserRole.FREE, allow_downgrade=False)
             
             await self.subscription_service.update_user_role(to_user_id, UserRole.PREMIUM)
+            
+            await EntitlementCache.invalidate(from_user_id)
+            await EntitlementCache.invalidate(to_user_id)
         
         except Exception as e:
             logger.error(f"Error handling transfer: {str(e)}", exc_info=True)
@@ -1,15 +1,22 @@
 """
-Centralized subscription checker using RevenueCat as the source of truth
+Centralized subscription checker
 
-This service provides a single point of truth for subscription status checks,
-ensuring all parts of the application use RevenueCat consistently.
+This service provides a single point of truth for subscription status checks.
+Status is answered from the entitlement cache, which RevenueCat webhooks keep
+current; a cache miss is resolved from the database and then reconciled with
+the RevenueCat API in the background, never on the request path.
 """
 
+import asyncio
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Set
 from supabase import Client
 
+from app.core.config import settings
+from app.services.subscription.entitlement_cache import EntitlementCache
 from app.services.subscription.revenuecat_service import RevenueCatService
+from app.shared.services.datetime_service import DateTimeService
+from app.shared.utils.async_supabase import execute_async
 from app.models.core.user import UserRole
 
 logger = logging.getLogger(__name__)
@@ -17,14 +24,23 @@ logger = logging.getLogger(__name__)
 
 class SubscriptionChecker:
     """
-    Centralized subscription checker that uses RevenueCat as the source of truth.
+    Centralized subscription checker backed by the entitlement cache.
     
     This class ensures:
-    1. RevenueCat is always checked first for subscription status
+    1. Premium checks cost no network I/O while a user's status is cached
     2. Admin/protected users can bypass subscription requirements
     3. Consistent subscription checking across the entire application
     """
     
+    # Subscription statuses that grant premium access
+    ACTIVE_STATUSES = {"active", "grace_period", "billing_retry"}
+    # Statuses that keep premium access until the paid period ends
+    UNTIL_EXPIRY_STATUSES = {"cancelled", "billing_issue"}
+    
+    # RevenueCat reconciliations running in this process
+    _reconciling: Set[str] = set()
+    _background_tasks: Set[asyncio.Task] = set()
+    
     def __init__(self, supabase: Client):
         """
         Initialize subscription checker
@@ -35,16 +51,18 @@ class SubscriptionChecker:
         self.supabase = supabase
         self.revenuecat_service = RevenueCatService(supabase)
     
-    async def check_subscription_status(self, user_id: str) -> Dict[str, Any]:
+    async def check_subscription_status(self, user_id: str, refresh: bool = False) -> Dict[str, Any]:
         """
-        Check user's subscription status using RevenueCat as source of truth
+        Check user's subscription status
         
-        This is the primary method for checking subscription status.
-        It checks RevenueCat first, then falls back to database, and finally
-        checks if user is a protected admin user.
+        This is the primary method for checking subscription status. A cached
+        status is returned as is. Otherwise the status is resolved from the
+        database, cached, and a RevenueCat reconciliation is started in the
+        background (see reconcile_with_revenuecat).
         
         Args:
             user_id: User ID to check
+            refresh: Skip the cache and resolve from the database
             
         Returns:
             Dictionary with subscription status:
@@ -52,17 +70,37 @@ class SubscriptionChecker:
                 "has_active_subscription": bool,
                 "is_premium": bool,
                 "is_admin": bool,
-                "source": str,  # "revenuecat", "database", "admin_protection"
+                "source": str,  # "revenuecat", "revenuecat_webhook", "database", "admin_protection", ...
                 "subscription": Optional[Dict],  # Subscription details if available
                 "user_role": str  # "premium" or "free"
             }
         """
+        if not refresh:
+            cached = await EntitlementCache.get(user_id)
+            if cached is not None:
+                return cached
+        
+        status = await self._resolve_status(user_id)
+        if status["source"] != "error":
+            await EntitlementCache.set(user_id, status)
+            self._schedule_reconciliation(user_id)
+        return status
+    
+    async def _resolve_status(self, user_id: str) -> Dict[str, Any]:
+        """
+        Resolve subscription status from the database
+        
+        Checks the bypass flag, then the subscriptions table, then admin
+        protection.
+        """
         try:
             # STEP 0: Check bypass_subscription flag FIRST (highest priority)
             # This must be checked before any subscription checks to prevent downgrades
-            user_response = self.supabase.table("users").select("role, bypass_subscription").eq(
-                "id", user_id
-            ).execute()
+            user_response = await execute_async(
+                lambda: self.supabase.table("users").select("role, bypass_subscription").eq(
+                    "id", user_id
+                ).execute()
+            )
             
             if user_response.data:
                 user_data = user_response.data[0]
@@ -93,66 +131,16 @@ class SubscriptionChecker:
                         "user_role": "premium"
                     }
             
-            # Step 1: Check RevenueCat API (source of truth)
-            try:
-                rc_info = await self.revenuecat_service.get_subscriber_info(user_id)
-                
-                if rc_info.get("has_subscription", False):
-                    entitlements = rc_info.get("entitlements", {})
-                    premium_entitlement = entitlements.get(
-                        RevenueCatService.PREMIUM_ENTITLEMENT, {}
-                    )
-                    
-                    if premium_entitlement.get("is_active"):
-                        logger.info(f"✅ User {user_id} has active RevenueCat subscription")
-                        
-                        # Update database to sync with RevenueCat
-                        subscriber = rc_info.get("subscriber", {})
-                        product_id = self._extract_product_id(premium_entitlement, subscriber)
-                        expires_date = premium_entitlement.get("expires_date")
-                        
-                        await self.revenuecat_service._update_subscription(
-                            user_id=user_id,
-                            status="active",
-                            product_id=product_id or "unknown",
-                            entitlement_id=RevenueCatService.PREMIUM_ENTITLEMENT,
-                            expires_at=expires_date
-                        )
-                        
-                        # Ensure user role is premium using centralized manager
-                        from app.shared.services.user_role_manager import UserRoleManager
-                        role_manager = UserRoleManager(self.supabase)
-                        await role_manager.update_user_role(
-                            user_id, 
-                            UserRole.PREMIUM,
-                            "RevenueCat subscription active"
-                        )
-                        
-                        return {
-                            "has_active_subscription": True,
-                            "is_premium": True,
-                            "is_admin": False,
-                            "source": "revenuecat",
-                            "subscription": {
-                                "product_id": product_id,
-                                "expires_date": expires_date,
-                                "status": "active"
-                            },
-                            "user_role": "premium"
-                        }
-            except Exception as e:
-                logger.warning(f"RevenueCat API check failed for user {user_id}: {str(e)}")
-                # Continue to database check
-            
-            # Step 2: Check database for subscription record
-            subscription_response = self.supabase.table("subscriptions").select(
-                "status, product_id, expiration_date"
-            ).eq("user_id", user_id).execute()
+            # Step 1: Check database for subscription record (kept current by webhooks)
+            subscription_response = await execute_async(
+                lambda: self.supabase.table("subscriptions").select(
+                    "status, product_id, expiration_date"
+                ).eq("user_id", user_id).execute()
+            )
             
             if subscription_response.data:
                 for sub in subscription_response.data:
-                    sub_status = sub.get("status", "").lower()
-                    if sub_status in ["active", "grace_period", "billing_retry"]:
+                    if self._grants_premium(sub):
                         logger.info(f"✅ User {user_id} has active subscription in database")
                         return {
                             "has_active_subscription": True,
@@ -163,7 +151,7 @@ class SubscriptionChecker:
                             "user_role": "premium"
                         }
             
-            # Step 3: Check if user is admin (bypass subscription requirement via email)
+            # Step 2: Check if user is admin (bypass subscription requirement via email)
             if await self.revenuecat_service.is_admin_user(user_id):
                 logger.info(f"🛡️ User {user_id} is admin user - granting premium access without subscription")
                 
@@ -171,9 +159,11 @@ class SubscriptionChecker:
                 if user_response.data:
                     current_role = user_response.data[0].get("role", "free")
                 else:
-                    user_response = self.supabase.table("users").select("role").eq(
-                        "id", user_id
-                    ).execute()
+                    user_response = await execute_async(
+                        lambda: self.supabase.table("users").select("role").eq(
+                            "id", user_id
+                        ).execute()
+                    )
                     current_role = user_response.data[0].get("role", "free") if user_response.data else "free"
                 
                 if current_role != "premium":
@@ -194,7 +184,7 @@ class SubscriptionChecker:
                     "user_role": "premium"
                 }
             
-            # Step 4: No subscription found - user is free
+            # Step 3: No subscription found - user is free
             # Final safeguard: double-check for bypass users (should never reach here since checked in Step 0)
             if user_response.data:
                 bypass_subscription = user_response.data[0].get("bypass_subscription", False)
@@ -239,7 +229,8 @@ class SubscriptionChecker:
         """
         Synchronous check if user has premium access (cached/quick check)
         
-        This checks the database role first for quick access.
+        Answers from this process's entitlement cache when the user's status
+        is cached, otherwise from the database role.
         For authoritative checks, use check_subscription_status() instead.
         
         Args:
@@ -248,6 +239,10 @@ class SubscriptionChecker:
         Returns:
             True if user has premium access (subscription or admin)
         """
+        cached = EntitlementCache.get_local(user_id)
+        if cached is not None:
+            return bool(cached.get("is_premium"))
+        
         try:
             user_response = self.supabase.table("users").select("role").eq(
                 "id", user_id
@@ -262,6 +257,95 @@ class SubscriptionChecker:
             logger.error(f"Error checking premium status for user {user_id}: {str(e)}")
             return False
     
+    async def reconcile_with_revenuecat(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Bring the database and cache in line with RevenueCat
+        
+        Catches purchases whose webhook was missed: if RevenueCat has an
+        active premium entitlement that the cached status does not show, the
+        subscription record and role are updated and the cache repopulated.
+        Expirations are left to the EXPIRATION webhook, which knows about
+        downgrade protection.
+        
+        Args:
+            user_id: User ID to reconcile
+            
+        Returns:
+            The updated status, or None if nothing changed
+        """
+        rc_info = await self.revenuecat_service.get_subscriber_info(user_id)
+        if not rc_info.get("has_subscription", False):
+            return None
+        
+        entitlements = rc_info.get("entitlements", {})
+        premium_entitlement = entitlements.get(RevenueCatService.PREMIUM_ENTITLEMENT, {})
+        expires_date = premium_entitlement.get("expires_date")
+        expiry = EntitlementCache.parse_expiry(expires_date)
+        if not (premium_entitlement.get("is_active") or (expiry and expiry > DateTimeService.now())):
+            return None
+        
+        cached = await EntitlementCache.get(user_id)
+        if cached and (cached.get("has_active_subscription") or cached.get("source") == "bypass_subscription"):
+            return None
+        
+        logger.info(f"✅ User {user_id} has active RevenueCat subscription missing locally - syncing")
+        subscriber = rc_info.get("subscriber", {})
+        product_id = self._extract_product_id(premium_entitlement, subscriber)
+        
+        await self.revenuecat_service._update_subscription(
+            user_id=user_id,
+            status="active",
+            product_id=product_id or "unknown",
+            entitlement_id=RevenueCatService.PREMIUM_ENTITLEMENT,
+            expires_at=expires_date
+        )
+        
+        # Ensure user role is premium using centralized manager
+        from app.shared.services.user_role_manager import UserRoleManager
+        role_manager = UserRoleManager(self.supabase)
+        await role_manager.update_user_role(
+            user_id, 
+            UserRole.PREMIUM,
+            "RevenueCat subscription active"
+        )
+        
+        status = EntitlementCache.subscribed_status(product_id, expires_date, "revenuecat")
+        await EntitlementCache.set(user_id, status)
+        return status
+    
+    def _schedule_reconciliation(self, user_id: str) -> None:
+        """Reconcile a user with RevenueCat in the background, once at a time"""
+        if not settings.revenuecat_api_key or user_id in self._reconciling:
+            return
+        self._reconciling.add(user_id)
+        task = asyncio.create_task(self._reconcile_quietly(user_id))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
+    async def _reconcile_quietly(self, user_id: str) -> None:
+        """Run reconcile_with_revenuecat, logging instead of raising"""
+        try:
+            await self.reconcile_with_revenuecat(user_id)
+        except Exception as e:
+            logger.warning(f"RevenueCat reconciliation failed for user {user_id}: {str(e)}")
+        finally:
+            self._reconciling.discard(user_id)
+    
+    def _grants_premium(self, subscription: Dict[str, Any]) -> bool:
+        """
+        Whether a subscriptions row grants premium access
+        
+        Cancelled subscriptions and ones with a billing issue keep access
+        until their expiration date.
+        """
+        sub_status = (subscription.get("status") or "").lower()
+        if sub_status in self.ACTIVE_STATUSES:
+            return True
+        if sub_status in self.UNTIL_EXPIRY_STATUSES:
+            expiry = EntitlementCache.parse_expiry(subscription.get("expiration_date"))
+            return expiry is not None and expiry > DateTimeService.now()
+        return False
+    
     def _extract_product_id(
         self, 
         premium_entitlement: Dict[str, Any], 
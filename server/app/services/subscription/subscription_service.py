@@ -8,6 +8,7 @@ import base64
 from datetime import datetime, timezone
 from app.shared.services.datetime_service import DateTimeService
 from app.shared.services.database_operation_service import DatabaseOperationService
+from app.services.subscription.entitlement_cache import EntitlementCache
 from typing import Optional, Dict, Any
 from fastapi import HTTPException, status
 from supabase import Client
@@ -229,6 +230,7 @@ class SubscriptionService:
             # Create new subscription using centralized service
             result = await db_service.insert_with_timestamps("subscriptions", subscription_data)
         
+        await EntitlementCache.invalidate(user_id)
         return subscription_data
     
     def _get_subscription_tier(self, product_id: str) -> str:
@@ -323,6 +325,7 @@ class SubscriptionService:
                 sub_response.data[0]["id"],
                 {"auto_renew": False}
             )
+            await EntitlementCache.invalidate(user_id)
             
             return True
         except Exception as e:
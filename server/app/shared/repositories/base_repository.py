@@ -284,7 +284,13 @@ class BaseRepository(ABC, Generic[T]):
             PaginationResponse with items, total_count, has_more, offset, and limit
         """
         # Initialize query builder with count support for pagination
-        query_builder = QueryBuilderService(self.supabase, self.table_name, include_count=True)
+        # Estimated counts avoid a full count over large tables
+        query_builder = QueryBuilderService(
+            self.supabase,
+            self.table_name,
+            include_count=True,
+            count_method=QueryBuilderService.ESTIMATED_COUNT
+        )
         
         if filters:
             query_builder.with_filters(filters)
@@ -310,6 +316,54 @@ class BaseRepository(ABC, Generic[T]):
             limit=limit
         )
     
+    async def get_page(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        limit: int = 20,  # Reduced default for mobile optimization
+        cursor: Optional[str] = None,
+        order_by: str = "created_at",
+        desc: bool = True,
+        include_count: bool = False
+    ) -> PaginationResponse[Dict[str, Any]]:
+        """
+        Get a page of results with keyset (cursor) pagination
+        
+        Pages are ordered by (order_by, id); each page continues after the
+        previous page's next_cursor, so deep pages stay as fast as the first.
+        
+        Args:
+            filters: Optional dictionary of field:value filters
+            limit: Maximum number of results (default: 20 for mobile)
+            cursor: next_cursor of the previous page (None for the first page)
+            order_by: Field name to order by (NOT NULL)
+            desc: Whether to order descending
+            include_count: Whether to include an estimated total count
+            
+        Returns:
+            PaginationResponse with items, has_more and next_cursor
+            
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        query_builder = QueryBuilderService(
+            self.supabase,
+            self.table_name,
+            include_count=include_count,
+            count_method=QueryBuilderService.ESTIMATED_COUNT
+        )
+        
+        if filters:
+            query_builder.with_filters(filters)
+        
+        result = await query_builder.with_cursor(limit, cursor, order_by, desc).execute()
+        
+        return PaginationService.build_cursor_response(
+            items=result["data"],
+            limit=limit,
+            sort_field=order_by,
+            total_count=result.get("count") if include_count else None
+        )
+    
     async def get_all_with_ordering(
         self,
         filters: Optional[Dict[str, Any]] = None,
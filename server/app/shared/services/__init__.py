@@ -10,6 +10,7 @@ This package provides the single source of truth for:
 - Validation
 - ID generation
 - Pagination
+- Time-series analytics
 - Error handling utilities
 """
 
@@ -37,6 +38,9 @@ from app.shared.services.pagination_service import (
     PaginationResponse
 )
 
+# Analytics
+from app.shared.services.time_series_service import TimeSeries, TimeSeriesService
+
 __all__ = [
     # Database operations
     'DatabaseOperationService',
@@ -57,4 +61,8 @@ __all__ = [
     'IDGenerationService',
     'PaginationService',
     'PaginationResponse',
+    
+    # Analytics
+    'TimeSeries',
+    'TimeSeriesService',
 ]
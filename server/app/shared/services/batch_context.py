@@ -0,0 +1,72 @@
+"""
+Batch request context
+
+Holds the authentication resolved once for a POST /api/v1/batch call so the
+sub-requests it dispatches reuse it instead of repeating the work:
+
+- get_current_user returns the already validated user
+- get_authenticated_supabase_client returns the already built client
+- verify_pet_ownership remembers pets it has verified for the user
+
+The context lives in a ContextVar, so it is visible to the sub-requests
+dispatched from the batch endpoint (and to the threads FastAPI runs sync
+dependencies in) and to nothing else.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional
+
+from supabase import Client
+
+from app.models.core.user import User
+
+
+@dataclass
+class BatchContext:
+    """
+    Authentication shared by the sub-requests of one batch
+
+    Attributes:
+        access_token: Bearer token the batch was authenticated with
+        user: User resolved from the token
+        supabase: Authenticated Supabase client for the user
+        owned_pets: Pet rows already verified as owned by the user, by id
+    """
+    access_token: str
+    user: User
+    supabase: Client
+    owned_pets: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+
+_current_batch: ContextVar[Optional[BatchContext]] = ContextVar("current_batch", default=None)
+
+
+def get_batch_context(access_token: Optional[str] = None) -> Optional[BatchContext]:
+    """
+    Get the active batch context
+
+    Args:
+        access_token: When given, the context is only returned if it was
+            authenticated with this token (a sub-request cannot switch users)
+
+    Returns:
+        The active BatchContext, or None outside a batch
+    """
+    context = _current_batch.get()
+    if context is None:
+        return None
+    if access_token is not None and access_token != context.access_token:
+        return None
+    return context
+
+
+@contextmanager
+def batch_scope(context: BatchContext) -> Iterator[BatchContext]:
+    """Activate a batch context for the duration of the block"""
+    token = _current_batch.set(context)
+    try:
+        yield context
+    finally:
+        _current_batch.reset(token)
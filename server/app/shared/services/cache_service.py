@@ -8,7 +8,8 @@ Supports both in-memory caching (default) and Redis caching (when configured)
 for distributed systems and better scalability.
 """
 
-from typing import Optional, Any, Dict, Callable
+from typing import Optional, Any, Dict, Callable, Awaitable, TypeVar
+import asyncio
 import time
 import logging
 import json
@@ -17,6 +18,8 @@ from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar('T')
+
 # Try to import Redis for distributed caching
 try:
     import redis.asyncio as aioredis
@@ -122,6 +125,16 @@ class CacheService:
             self._use_redis = False
             self._redis_client = None
     
+    @property
+    def redis_enabled(self) -> bool:
+        """Whether a Redis client is configured for distributed caching"""
+        return bool(self._use_redis and self._redis_client)
+    
+    @property
+    def redis_client(self) -> Optional[Any]:
+        """Underlying async Redis client (None when Redis is not configured)"""
+        return self._redis_client if self._use_redis else None
+    
     async def get(self, key: str) -> Optional[Any]:
         """
         Get cached value (async for Redis support)
@@ -240,6 +253,57 @@ class CacheService:
         return len(expired_keys)
 
 
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key into one execution
+    
+    When several coroutines miss the cache for the same key at once, only the
+    first one runs the loader; the others await its result. Prevents cache
+    stampedes on expensive computations within a process.
+    """
+    
+    def __init__(self):
+        """Initialize with no in-flight calls"""
+        self._in_flight: Dict[str, asyncio.Future] = {}
+    
+    async def do(self, key: str, loader: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run loader once per key among concurrent callers
+        
+        Args:
+            key: Coalescing key
+            loader: Coroutine factory producing the value
+            
+        Returns:
+            Loader result (shared by all concurrent callers)
+            
+        Raises:
+            Exception: Whatever the loader raised (propagated to every waiter)
+        """
+        existing = self._in_flight.get(key)
+        if existing is not None:
+            return await asyncio.shield(existing)
+        
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            result = await loader()
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so an exception with no waiters is not logged as unhandled
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._in_flight.pop(key, None)
+    
+    def in_flight(self, key: str) -> bool:
+        """Check whether a loader is currently running for key"""
+        return key in self._in_flight
+
+
 # Global cache service instance
 cache_service = CacheService()
 
@@ -11,7 +11,7 @@ All database operations should use this service for consistency.
 """
 
 import logging
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Union
 from supabase import Client
 import asyncio
 from datetime import datetime, date
@@ -285,6 +285,61 @@ class DatabaseOperationService:
             logger.error(f"❌ Error upserting into {table_name}: {str(e)}", exc_info=True)
             raise
     
+    async def upsert_on_conflict(
+        self,
+        table_name: str,
+        data: Union[Dict[str, Any], List[Dict[str, Any]]],
+        on_conflict: str,
+        include_created_at: bool = False,
+        include_updated_at: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Native upsert (INSERT ... ON CONFLICT DO UPDATE) in a single request
+        
+        Unlike upsert_with_timestamps, this does not read the row first and
+        supports composite conflict targets and batches of rows. Requires a
+        unique index on the conflict columns.
+        
+        Args:
+            table_name: Table name
+            data: Row or list of rows to upsert
+            on_conflict: Comma-separated conflict columns (e.g. "pet_id,analysis_type")
+            include_created_at: Whether to add created_at (overwrites on update)
+            include_updated_at: Whether to add updated_at
+            
+        Returns:
+            Upserted rows
+            
+        Raises:
+            Exception: If upsert fails
+        """
+        rows = data if isinstance(data, list) else [data]
+        if not rows:
+            return []
+        
+        try:
+            now_iso = DateTimeService.now_iso()
+            serialized_rows = []
+            for row in rows:
+                serialized = self._serialize_datetime_objects(row)
+                if include_created_at and "created_at" not in serialized:
+                    serialized["created_at"] = now_iso
+                if include_updated_at and "updated_at" not in serialized:
+                    serialized["updated_at"] = now_iso
+                serialized_rows.append(serialized)
+            
+            response = await execute_async(
+                lambda: self.supabase.table(table_name)
+                    .upsert(serialized_rows, on_conflict=on_conflict)
+                    .execute(),
+                table_name=table_name
+            )
+            return response.data or []
+        
+        except Exception as e:
+            logger.error(f"❌ Error upserting into {table_name} on ({on_conflict}): {str(e)}", exc_info=True)
+            raise
+    
     async def delete_record(
         self,
         table_name: str,
@@ -11,11 +11,17 @@ Follows KISS by providing simple, clear API.
 
 import bleach
 import logging
+import re
+import threading
 from typing import Optional, List
 from enum import Enum
 
 logger = logging.getLogger(__name__)
 
+# Characters bleach rewrites (markup, entities, control characters); text
+# without any of them comes back from bleach.clean unchanged
+_NEEDS_CLEANING = re.compile(r'[<>&\x00-\x08\x0b-\x1f]')
+
 
 class SanitizationLevel(str, Enum):
     """Sanitization strictness levels"""
@@ -54,6 +60,55 @@ class HTMLSanitizationService:
     # Allowed URL schemes
     ALLOWED_SCHEMES = ['http', 'https', 'mailto']
     
+    # bleach.Cleaner instances are not thread-safe; keep one per level per thread
+    _cleaners = threading.local()
+    
+    @classmethod
+    def _cleaner(cls, level: "SanitizationLevel") -> bleach.Cleaner:
+        """
+        Get the reusable cleaner for a level
+        
+        Building a Cleaner sets up an html5lib parser and serializer, which
+        bleach.clean would otherwise redo on every call.
+        """
+        cleaners = cls._cleaners.__dict__
+        cleaner = cleaners.get(level)
+        if cleaner is None:
+            if level == SanitizationLevel.MODERATE:
+                cleaner = bleach.Cleaner(
+                    tags=cls.MODERATE_ALLOWED_TAGS,
+                    attributes=cls.ALLOWED_ATTRIBUTES,
+                    protocols=cls.ALLOWED_SCHEMES,
+                    strip=True
+                )
+            elif level == SanitizationLevel.PERMISSIVE:
+                cleaner = bleach.Cleaner(
+                    tags=cls.PERMISSIVE_ALLOWED_TAGS,
+                    attributes=cls.ALLOWED_ATTRIBUTES,
+                    protocols=cls.ALLOWED_SCHEMES,
+                    strip=True
+                )
+            else:
+                # Remove all HTML tags - most secure
+                cleaner = bleach.Cleaner(tags=[], strip=True)
+            cleaners[level] = cleaner
+        return cleaner
+    
+    @classmethod
+    def strip_tags(cls, text: str) -> str:
+        """
+        Remove all HTML tags (same result as bleach.clean(text, tags=[], strip=True))
+        
+        Args:
+            text: Text to clean
+            
+        Returns:
+            Text without markup
+        """
+        if not _NEEDS_CLEANING.search(text):
+            return text
+        return cls._cleaner(SanitizationLevel.STRICT).clean(text)
+    
     @staticmethod
     def sanitize(
         text: Optional[str],
@@ -63,6 +118,9 @@ class HTMLSanitizationService:
         """
         Sanitize HTML content based on specified level
         
+        Plain text (no markup, entities or control characters) is returned
+        as is without running the HTML parser.
+        
         Args:
             text: Text content to sanitize (can be None)
             level: Sanitization strictness level
@@ -83,30 +141,13 @@ class HTMLSanitizationService:
             return text.strip()
         
         try:
-            if level == SanitizationLevel.STRICT:
-                # Remove all HTML tags - most secure
-                sanitized = bleach.clean(text, tags=[], strip=True)
-            elif level == SanitizationLevel.MODERATE:
-                # Allow basic formatting tags
-                sanitized = bleach.clean(
-                    text,
-                    tags=HTMLSanitizationService.MODERATE_ALLOWED_TAGS,
-                    attributes=HTMLSanitizationService.ALLOWED_ATTRIBUTES,
-                    protocols=HTMLSanitizationService.ALLOWED_SCHEMES,
-                    strip=True
-                )
-            elif level == SanitizationLevel.PERMISSIVE:
-                # Allow more formatting tags
-                sanitized = bleach.clean(
-                    text,
-                    tags=HTMLSanitizationService.PERMISSIVE_ALLOWED_TAGS,
-                    attributes=HTMLSanitizationService.ALLOWED_ATTRIBUTES,
-                    protocols=HTMLSanitizationService.ALLOWED_SCHEMES,
-                    strip=True
-                )
+            if not _NEEDS_CLEANING.search(text):
+                sanitized = text
             else:
-                # Default to strict
-                sanitized = bleach.clean(text, tags=[], strip=True)
+                if level not in (SanitizationLevel.MODERATE, SanitizationLevel.PERMISSIVE):
+                    # Default to strict
+                    level = SanitizationLevel.STRICT
+                sanitized = HTMLSanitizationService._cleaner(level).clean(text)
             
             # Apply length limit if specified
             if max_length and len(sanitized) > max_length:
@@ -5,11 +5,17 @@ This is the SINGLE SOURCE OF TRUTH for:
 1. Building paginated responses with has_more calculation
 2. Consistent pagination response format
 3. Standardized pagination metadata
+4. Opaque keyset cursors (sort value + id) for cursor pagination
 
 All pagination responses should use this service for consistency.
 """
 
-from typing import List, TypeVar, Generic, Type
+import base64
+import json
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, TypeVar, Generic, Type
+from fastapi import HTTPException, Response, status
 from pydantic import BaseModel
 
 T = TypeVar('T')
@@ -20,12 +26,14 @@ class PaginationResponse(BaseModel, Generic[T]):
     Standard pagination response model
     
     Generic pagination response that can be used with any data type.
+    With cursor pagination, offset is 0 and next_cursor fetches the next page.
     """
     items: List[T]
     total_count: int
     has_more: bool
-    offset: int
+    offset: int = 0
     limit: int
+    next_cursor: Optional[str] = None
 
 
 class PaginationService:
@@ -38,6 +46,12 @@ class PaginationService:
     - Easier maintenance of pagination logic
     """
     
+    # Carries next_cursor for endpoints whose body is a plain list
+    NEXT_CURSOR_HEADER = "X-Next-Cursor"
+    
+    # Cursor ids are row primary keys
+    _UUID = re.compile(r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$")
+    
     @staticmethod
     def build_pagination_response(
         items: List[T],
@@ -116,3 +130,169 @@ class PaginationService:
             return 1
         return (offset // limit) + 1
 
+
+    @staticmethod
+    def encode_cursor(sort_value: Any, id: Any, sort_field: str = "created_at") -> str:
+        """
+        Encode an opaque keyset cursor
+        
+        Args:
+            sort_value: Sort column value of the last item on the page
+            id: ID of the last item on the page (tiebreaker)
+            sort_field: Sort column the cursor belongs to
+            
+        Returns:
+            URL-safe cursor string
+        """
+        payload = json.dumps([sort_field, sort_value, id], separators=(",", ":"), default=str)
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+    
+    @staticmethod
+    def decode_cursor(cursor: str, sort_field: str = "created_at") -> Tuple[Any, str]:
+        """
+        Decode a keyset cursor
+        
+        Args:
+            cursor: Cursor from a previous page's next_cursor
+            sort_field: Sort column the current query orders by
+            
+        Returns:
+            Tuple of (sort_value, id)
+            
+        Raises:
+            ValueError: If the cursor is malformed, belongs to another ordering,
+                or holds a sort value or id that is not a number/ISO timestamp or UUID
+        """
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            field, sort_value, id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        except (ValueError, TypeError):
+            raise ValueError("Invalid pagination cursor")
+        if field != sort_field or not PaginationService._is_cursor_value(sort_value):
+            raise ValueError("Invalid pagination cursor")
+        if not isinstance(id, str) or not PaginationService._UUID.match(id):
+            raise ValueError("Invalid pagination cursor")
+        return sort_value, id
+    
+    @staticmethod
+    def _is_cursor_value(value: Any) -> bool:
+        """
+        Whether a decoded sort value is safe to embed in a keyset filter
+        
+        Only numbers and ISO dates/timestamps are accepted: the value is
+        interpolated into a PostgREST or() filter, so free text could add
+        conditions of its own.
+        """
+        if isinstance(value, bool):
+            return False
+        if isinstance(value, (int, float)):
+            return True
+        if not isinstance(value, str):
+            return False
+        try:
+            datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return False
+        return True
+    
+    @staticmethod
+    def validate_cursor(cursor: Optional[str], sort_field: str = "created_at") -> Optional[str]:
+        """
+        Validate a cursor query parameter
+        
+        Args:
+            cursor: Cursor from the request (None for the first page)
+            sort_field: Sort column of the endpoint
+            
+        Returns:
+            The cursor unchanged
+            
+        Raises:
+            HTTPException: 400 if the cursor is invalid
+        """
+        if cursor:
+            try:
+                PaginationService.decode_cursor(cursor, sort_field)
+            except ValueError as e:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        return cursor
+    
+    @staticmethod
+    def next_cursor(
+        items: List[Dict[str, Any]],
+        limit: int,
+        sort_field: str = "created_at"
+    ) -> Optional[str]:
+        """
+        Cursor for the page after items
+        
+        A full page may be followed by more items, so it gets a cursor from its
+        last item; a short page is the last one.
+        
+        Args:
+            items: Rows of the current page (dicts with sort_field and id)
+            limit: Requested page size
+            sort_field: Sort column of the query
+            
+        Returns:
+            Cursor string, or None if there are no more pages
+        """
+        if not items or len(items) < limit:
+            return None
+        last = items[-1]
+        return PaginationService.encode_cursor(last.get(sort_field), last.get("id"), sort_field)
+    
+    @staticmethod
+    def set_next_cursor_header(
+        response: Response,
+        items: List[Dict[str, Any]],
+        limit: int,
+        sort_field: str = "created_at"
+    ) -> Optional[str]:
+        """
+        Set the X-Next-Cursor header for list endpoints
+        
+        Args:
+            response: FastAPI response to add the header to
+            items: Rows of the current page
+            limit: Requested page size
+            sort_field: Sort column of the query
+            
+        Returns:
+            The next cursor, or None on the last page
+        """
+        cursor = PaginationService.next_cursor(items, limit, sort_field)
+        if cursor:
+            response.headers[PaginationService.NEXT_CURSOR_HEADER] = cursor
+        return cursor
+    
+    @staticmethod
+    def build_cursor_response(
+        items: List[Dict[str, Any]],
+        limit: int,
+        sort_field: str = "created_at",
+        total_count: Optional[int] = None
+    ) -> PaginationResponse[Dict[str, Any]]:
+        """
+        Build a cursor-paginated response
+        
+        Args:
+            items: Rows of the current page
+            limit: Requested page size
+            sort_field: Sort column of the query
+            total_count: Total (possibly estimated) count, if one was requested
+            
+        Returns:
+            PaginationResponse with next_cursor set when more pages may follow
+        """
+        cursor = PaginationService.next_cursor(items, limit, sort_field)
+        if total_count is None:
+            total_count = len(items) + (1 if cursor else 0)
+        return PaginationResponse(
+            items=items,
+            total_count=total_count,
+            has_more=cursor is not None,
+            offset=0,
+            limit=limit,
+            next_cursor=cursor
+        )
@@ -46,6 +46,12 @@ async def verify_pet_ownership(
     import logging
     logger = logging.getLogger(__name__)
     
+    # Within a batch, a pet verified by one sub-request is not re-queried
+    from app.shared.services.batch_context import get_batch_context
+    batch = get_batch_context()
+    if batch is not None and batch.user.id == user_id and pet_id in batch.owned_pets:
+        return batch.owned_pets[pet_id]
+    
     supabase = db or get_supabase_client()
     
     # Query pet by ID
@@ -97,6 +103,8 @@ async def verify_pet_ownership(
                         detail="Pet not found or access denied"
                     )
                 # Success - RLS worked and pet belongs to user
+                if batch is not None and batch.user.id == user_id:
+                    batch.owned_pets[pet_id] = found_pet
                 return found_pet
             else:
                 # RLS query returned no results - RLS might not be working
@@ -166,4 +174,6 @@ async def verify_pet_ownership(
             detail="Pet not found or access denied"
         )
     
+    if batch is not None and batch.user.id == user_id:
+        batch.owned_pets[pet_id] = response.data[0]
     return response.data[0]
@@ -0,0 +1,81 @@
+"""
+Polling Worker
+
+Base class for background workers that drain a database queue in batches.
+The loop claims and handles one batch at a time; a full batch means more
+work is due so it continues after batch_pause (immediately by default),
+otherwise it sleeps for the poll interval. It runs as a task on the app's
+event loop, started and stopped from the lifespan.
+"""
+
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class PollingWorker(ABC):
+    """Runs dispatch_due in a loop until stopped"""
+
+    # Name used in log messages
+    WORKER_NAME = "worker"
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+
+    @abstractmethod
+    async def dispatch_due(self, batch_size: Optional[int] = None) -> int:
+        """
+        Claim and handle one batch
+
+        Returns:
+            Number of items claimed
+        """
+
+    @abstractmethod
+    def batch_size(self) -> int:
+        """Items claimed per batch"""
+
+    @abstractmethod
+    def poll_interval(self) -> float:
+        """Seconds to wait when the queue has nothing more due"""
+
+    def batch_pause(self) -> float:
+        """Seconds to wait between full batches, to rate-limit a backlog"""
+        return 0.0
+
+    async def run(self) -> None:
+        """Dispatch due items until stopped"""
+        while not self._stopping.is_set():
+            batch_size = self.batch_size()
+            try:
+                claimed = await self.dispatch_due(batch_size)
+            except Exception as e:
+                logger.error(f"{self.WORKER_NAME} dispatch failed: {e}")
+                claimed = 0
+
+            # A full batch means more may be due; otherwise wait for the next poll
+            delay = self.poll_interval() if claimed < batch_size else self.batch_pause()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+
+    def start(self) -> None:
+        """Start the worker on the running event loop"""
+        if self._task is None or self._task.done():
+            self._stopping = asyncio.Event()
+            self._task = asyncio.create_task(self.run())
+            logger.info(f"{self.WORKER_NAME} started")
+
+    async def stop(self) -> None:
+        """Stop the worker after the batch in progress"""
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
@@ -5,15 +5,19 @@ This is the SINGLE SOURCE OF TRUTH for:
 1. Building Supabase queries with filters, pagination, and ordering
 2. Consistent query construction patterns
 3. Standardized search and filter logic
+4. Column projections derived from response models (with embedded relations)
 
 All query building should use this service for consistency.
 """
 
-from typing import Dict, Any, List, Optional, TYPE_CHECKING
+from functools import lru_cache
+from typing import Dict, Any, FrozenSet, Iterable, List, Optional, Sequence, Tuple, Type, Union, TYPE_CHECKING
+from pydantic import BaseModel
 from supabase import Client
 import logging
 import asyncio
 from app.core.config import settings
+from app.shared.services.pagination_service import PaginationService
 
 if TYPE_CHECKING:
     # QueryResponse may not be available in all supabase versions
@@ -40,7 +44,19 @@ class QueryBuilderService:
     # Maximum limit to prevent excessive data fetching
     MAX_LIMIT = 500
     
-    def __init__(self, supabase: Client, table_name: str, default_columns: Optional[List[str]] = None, include_count: bool = False):
+    # PostgREST count modes: "estimated" counts exactly up to the server's
+    # max-rows and uses the planner estimate beyond it
+    EXACT_COUNT = "exact"
+    ESTIMATED_COUNT = "estimated"
+    
+    def __init__(
+        self,
+        supabase: Client,
+        table_name: str,
+        default_columns: Optional[List[str]] = None,
+        include_count: bool = False,
+        count_method: str = EXACT_COUNT
+    ):
         """
         Initialize query builder service
         
@@ -50,6 +66,7 @@ class QueryBuilderService:
             default_columns: Optional list of default columns to select (None means all)
                             Use None only when you explicitly need all columns
             include_count: Whether to include total count in the query response
+            count_method: Count mode when include_count is set (EXACT_COUNT or ESTIMATED_COUNT)
         """
         self.supabase = supabase
         self.table_name = table_name
@@ -58,7 +75,7 @@ class QueryBuilderService:
         if default_columns:
             select_str = ",".join(default_columns)
             if include_count:
-                self.query = supabase.table(table_name).select(select_str, count="exact")
+                self.query = supabase.table(table_name).select(select_str, count=count_method)
             else:
                 self.query = supabase.table(table_name).select(select_str)
         else:
@@ -69,10 +86,104 @@ class QueryBuilderService:
                     "Consider specifying columns for better performance."
                 )
             if include_count:
-                self.query = supabase.table(table_name).select("*", count="exact")
+                self.query = supabase.table(table_name).select("*", count=count_method)
             else:
                 self.query = supabase.table(table_name).select("*")
     
+    @classmethod
+    def for_model(
+        cls,
+        supabase: Client,
+        table_name: str,
+        response_model: Type[BaseModel],
+        exclude: Iterable[str] = (),
+        rename: Optional[Dict[str, str]] = None,
+        embed: Optional[Dict[str, Union[Type[BaseModel], Sequence[str]]]] = None,
+        include_count: bool = False,
+        count_method: str = EXACT_COUNT
+    ) -> 'QueryBuilderService':
+        """
+        Create a query builder that selects only what a response model needs
+        
+        Args:
+            supabase: Supabase client instance
+            table_name: Name of the database table
+            response_model: Pydantic model the rows are converted to
+            exclude: Model fields that are not table columns (computed or filled in later)
+            rename: Model field -> table column, selected as "field:column"
+            embed: Embedded relations, e.g. {"food_analyses": ["food_name", "brand"]} or
+                   {"analysis:food_analyses": FoodAnalysisModel}; fetched in the same request
+            include_count: Whether to include total count in the query response
+            count_method: Count mode when include_count is set
+            
+        Returns:
+            QueryBuilderService selecting the projected columns
+        """
+        columns = cls.columns_for_model(response_model, exclude, rename, embed)
+        return cls(
+            supabase,
+            table_name,
+            default_columns=columns,
+            include_count=include_count,
+            count_method=count_method
+        )
+    
+    @classmethod
+    def columns_for_model(
+        cls,
+        response_model: Type[BaseModel],
+        exclude: Iterable[str] = (),
+        rename: Optional[Dict[str, str]] = None,
+        embed: Optional[Dict[str, Union[Type[BaseModel], Sequence[str]]]] = None
+    ) -> List[str]:
+        """
+        Select list for a response model
+        
+        Model fields map to columns of the same name (or their alias). Fields
+        named by an embed key are selected through the embedded relation instead.
+        Plain column lists are cached per model.
+        
+        Args:
+            response_model: Pydantic model the rows are converted to
+            exclude: Model fields that are not table columns
+            rename: Model field -> table column
+            embed: Relation (optionally "alias:relation") -> model or column list
+            
+        Returns:
+            List of select items for QueryBuilderService(default_columns=...)
+        """
+        embed = embed or {}
+        embedded_names = frozenset(key.split(":", 1)[0] for key in embed)
+        columns = list(cls._model_columns(
+            response_model,
+            frozenset(exclude) | embedded_names,
+            tuple(sorted((rename or {}).items()))
+        ))
+        for relation, target in embed.items():
+            if isinstance(target, type) and issubclass(target, BaseModel):
+                nested = cls._model_columns(target, frozenset(), ())
+            else:
+                nested = tuple(target)
+            columns.append(f"{relation}({','.join(nested)})")
+        return columns
+    
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _model_columns(
+        response_model: Type[BaseModel],
+        exclude: FrozenSet[str],
+        rename: Tuple[Tuple[str, str], ...]
+    ) -> Tuple[str, ...]:
+        """Cached column names for a model (field order preserved)."""
+        renamed = dict(rename)
+        columns = []
+        for name, field in response_model.model_fields.items():
+            if name in exclude:
+                continue
+            key = field.alias if isinstance(field.alias, str) else name
+            columns.append(f"{key}:{renamed[name]}" if name in renamed else key)
+        return tuple(columns)
+    
     def with_filters(self, filters: Dict[str, Any]) -> 'QueryBuilderService':
         """
         Add equality filters to the query
@@ -189,6 +300,73 @@ class QueryBuilderService:
         
         return self
     
+    @staticmethod
+    def apply_keyset(
+        query,
+        cursor: Optional[str],
+        order_by: str = "created_at",
+        desc: bool = True,
+        tiebreaker: str = "id"
+    ):
+        """
+        Order a Supabase query by (order_by, tiebreaker) and start after a cursor
+        
+        Unlike range()/offset, the cursor filter lets the database seek straight to
+        the page through an index on (order_by, tiebreaker), so deep pages cost the
+        same as the first. order_by must be NOT NULL.
+        
+        Args:
+            query: Supabase select query builder
+            cursor: Cursor from PaginationService.next_cursor (None for the first page)
+            order_by: Sort column
+            desc: Whether to order descending
+            tiebreaker: Unique column that makes the order total
+            
+        Returns:
+            The ordered (and filtered) query builder
+            
+        Raises:
+            ValueError: If the cursor is invalid for this ordering
+        """
+        if cursor:
+            value, last_id = PaginationService.decode_cursor(cursor, order_by)
+            op = "lt" if desc else "gt"
+            query = query.or_(
+                f'{order_by}.{op}."{value}",'
+                f'and({order_by}.eq."{value}",{tiebreaker}.{op}."{last_id}")'
+            )
+        return query.order(order_by, desc=desc).order(tiebreaker, desc=desc)
+    
+    def with_cursor(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        order_by: str = "created_at",
+        desc: bool = True,
+        tiebreaker: str = "id"
+    ) -> 'QueryBuilderService':
+        """
+        Add keyset (cursor) pagination to the query
+        
+        Use instead of with_ordering + with_pagination for list endpoints; build
+        the next cursor from the results with PaginationService.next_cursor.
+        
+        Args:
+            limit: Maximum number of results (will be capped at MAX_LIMIT)
+            cursor: Cursor of the previous page (None for the first page)
+            order_by: Sort column (NOT NULL)
+            desc: Whether to order descending
+            tiebreaker: Unique column that makes the order total
+            
+        Returns:
+            Self for method chaining
+            
+        Raises:
+            ValueError: If the cursor is invalid for this ordering
+        """
+        self.query = self.apply_keyset(self.query, cursor, order_by, desc, tiebreaker)
+        return self.with_limit(limit)
+    
     def with_ordering(
         self, 
         field: str, 
@@ -0,0 +1,462 @@
+"""
+Centralized time-series analytics service
+
+This is the SINGLE SOURCE OF TRUTH for:
+1. Turning list-of-dict / model records into columnar NumPy arrays
+2. Trend detection (least-squares slope instead of first-half/second-half means)
+3. Rolling means, EWMA, seasonality and correlation
+
+Analytics services build a TimeSeries once per request and run every
+statistic over the same arrays instead of re-walking the records per metric.
+"""
+
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+
+SECONDS_PER_DAY = 86400.0
+
+# Month -> meteorological season (northern hemisphere)
+SEASON_BY_MONTH = {
+    12: "winter", 1: "winter", 2: "winter",
+    3: "spring", 4: "spring", 5: "spring",
+    6: "summer", 7: "summer", 8: "summer",
+    9: "fall", 10: "fall", 11: "fall",
+}
+
+
+def _read_field(record: Any, key: str) -> Any:
+    """Read a field from a dict or an attribute-style model"""
+    if isinstance(record, Mapping):
+        return record.get(key)
+    return getattr(record, key, None)
+
+
+def _to_datetime(value: Any) -> Optional[datetime]:
+    """Coerce ISO strings, dates and datetimes into aware UTC datetimes"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        dt = value
+    elif isinstance(value, date):
+        dt = datetime(value.year, value.month, value.day)
+    elif isinstance(value, str):
+        try:
+            dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    else:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+class TimeSeries:
+    """
+    Columnar view over time-stamped records
+
+    Built once per request from the raw query rows. Values are float64 arrays
+    sorted by timestamp; missing numeric values become 0.0 (matching the
+    ``record.get(key, 0)`` behavior the services used before).
+    """
+
+    def __init__(
+        self,
+        timestamps: np.ndarray,
+        columns: Dict[str, np.ndarray],
+        datetimes: Optional[List[datetime]] = None
+    ):
+        """
+        Initialize time series
+
+        Args:
+            timestamps: POSIX seconds (float64), sorted ascending
+            columns: Mapping of column name to float64 array aligned with timestamps
+            datetimes: Optional parsed datetimes aligned with timestamps
+        """
+        self.timestamps = timestamps
+        self.columns = columns
+        self.datetimes = datetimes or [
+            datetime.fromtimestamp(ts, tz=timezone.utc) for ts in timestamps
+        ]
+
+    @classmethod
+    def from_records(
+        cls,
+        records: Iterable[Any],
+        time_key: str,
+        value_keys: Sequence[str]
+    ) -> "TimeSeries":
+        """
+        Build a time series from dict rows or Pydantic models
+
+        Records without a parseable timestamp are dropped. Output is sorted
+        ascending by timestamp regardless of the query order.
+
+        Args:
+            records: Query rows (dicts) or response models
+            time_key: Field holding the timestamp/date
+            value_keys: Numeric fields to extract as columns
+
+        Returns:
+            TimeSeries instance
+        """
+        parsed: List[datetime] = []
+        raw_values: List[List[float]] = []
+
+        for record in records:
+            dt = _to_datetime(_read_field(record, time_key))
+            if dt is None:
+                continue
+            parsed.append(dt)
+            row = []
+            for key in value_keys:
+                value = _read_field(record, key)
+                try:
+                    row.append(float(value) if value is not None else 0.0)
+                except (TypeError, ValueError):
+                    row.append(0.0)
+            raw_values.append(row)
+
+        timestamps = np.array([dt.timestamp() for dt in parsed], dtype=np.float64)
+        values = np.array(raw_values, dtype=np.float64).reshape(len(parsed), len(value_keys))
+
+        order = np.argsort(timestamps, kind="stable")
+        timestamps = timestamps[order]
+        values = values[order]
+        datetimes = [parsed[i] for i in order]
+
+        columns = {key: values[:, idx] for idx, key in enumerate(value_keys)}
+        return cls(timestamps, columns, datetimes)
+
+    def __len__(self) -> int:
+        return int(self.timestamps.size)
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Get a column by name
+
+        Args:
+            name: Column name
+
+        Returns:
+            Column values (empty array if the column was not extracted)
+        """
+        return self.columns.get(name, np.empty(0, dtype=np.float64))
+
+    def elapsed_days(self) -> np.ndarray:
+        """
+        Get days elapsed since the first observation
+
+        Returns:
+            Float64 array of fractional days
+        """
+        if self.timestamps.size == 0:
+            return self.timestamps
+        return (self.timestamps - self.timestamps[0]) / SECONDS_PER_DAY
+
+    def span_days(self) -> float:
+        """Get the number of days between first and last observation"""
+        if self.timestamps.size < 2:
+            return 0.0
+        return float((self.timestamps[-1] - self.timestamps[0]) / SECONDS_PER_DAY)
+
+
+class TimeSeriesService:
+    """
+    Centralized service for time-series statistics
+
+    All methods are vectorized over NumPy arrays and accept any sequence of
+    numbers, so they work both on TimeSeries columns and plain lists.
+    """
+
+    # Default relative change (percent) that separates "stable" from a trend
+    DEFAULT_TREND_THRESHOLD = 5.0
+
+    @staticmethod
+    def as_array(values: Sequence[float]) -> np.ndarray:
+        """Convert a sequence of numbers into a float64 array"""
+        return np.asarray(values, dtype=np.float64)
+
+    @staticmethod
+    def mean(values: Sequence[float]) -> float:
+        """
+        Arithmetic mean
+
+        Returns:
+            Mean value, or 0.0 for an empty input
+        """
+        arr = TimeSeriesService.as_array(values)
+        return float(arr.mean()) if arr.size else 0.0
+
+    @staticmethod
+    def stdev(values: Sequence[float]) -> float:
+        """
+        Sample standard deviation (same definition as statistics.stdev)
+
+        Returns:
+            Standard deviation, or 0.0 with fewer than two values
+        """
+        arr = TimeSeriesService.as_array(values)
+        return float(arr.std(ddof=1)) if arr.size > 1 else 0.0
+
+    @staticmethod
+    def variance(values: Sequence[float]) -> float:
+        """
+        Sample variance (same definition as statistics.variance)
+
+        Returns:
+            Variance, or 0.0 with fewer than two values
+        """
+        arr = TimeSeriesService.as_array(values)
+        return float(arr.var(ddof=1)) if arr.size > 1 else 0.0
+
+    @staticmethod
+    def coefficient_of_variation(values: Sequence[float]) -> Optional[float]:
+        """
+        Coefficient of variation (stdev / mean)
+
+        Returns:
+            CV, or None when the mean is zero or fewer than two values exist
+        """
+        arr = TimeSeriesService.as_array(values)
+        if arr.size < 2:
+            return None
+        mean = arr.mean()
+        if mean == 0:
+            return None
+        return float(arr.std(ddof=1) / mean)
+
+    @staticmethod
+    def least_squares(x: Sequence[float], y: Sequence[float]) -> Dict[str, float]:
+        """
+        Ordinary least-squares fit of y = slope * x + intercept
+
+        Args:
+            x: Independent variable (e.g. elapsed days)
+            y: Dependent variable
+
+        Returns:
+            Dict with slope, intercept and r_squared (a flat series has r_squared 1.0)
+        """
+        x_arr = TimeSeriesService.as_array(x)
+        y_arr = TimeSeriesService.as_array(y)
+        if x_arr.size < 2:
+            intercept = float(y_arr[0]) if y_arr.size else 0.0
+            return {"slope": 0.0, "intercept": intercept, "r_squared": 0.0}
+
+        x_centered = x_arr - x_arr.mean()
+        sxx = float(np.dot(x_centered, x_centered))
+        if sxx == 0:
+            # All observations at the same x - no slope can be estimated
+            return {"slope": 0.0, "intercept": float(y_arr.mean()), "r_squared": 0.0}
+
+        y_centered = y_arr - y_arr.mean()
+        slope = float(np.dot(x_centered, y_centered) / sxx)
+        intercept = float(y_arr.mean() - slope * x_arr.mean())
+
+        ss_tot = float(np.dot(y_centered, y_centered))
+        residuals = y_arr - (slope * x_arr + intercept)
+        ss_res = float(np.dot(residuals, residuals))
+        r_squared = 1.0 if ss_tot == 0 else max(0.0, 1.0 - ss_res / ss_tot)
+
+        return {"slope": slope, "intercept": intercept, "r_squared": r_squared}
+
+    @staticmethod
+    def linear_trend(
+        values: Sequence[float],
+        x: Optional[Sequence[float]] = None,
+        threshold: float = DEFAULT_TREND_THRESHOLD
+    ) -> Dict[str, Any]:
+        """
+        Classify a trend from a least-squares fit
+
+        The change percentage compares the fitted value at the last point with
+        the fitted value at the first point, so a single outlier at either end
+        no longer flips the direction.
+
+        Args:
+            values: Observations in chronological order
+            x: Optional x positions (e.g. elapsed days); defaults to the index
+            threshold: Percent change above which the trend is not "stable"
+
+        Returns:
+            Dict with trend, change_percentage, slope, r_squared and fitted_change
+        """
+        y = TimeSeriesService.as_array(values)
+        if y.size < 2:
+            return {
+                "trend": "insufficient_data",
+                "change_percentage": 0.0,
+                "slope": 0.0,
+                "r_squared": 0.0,
+                "fitted_change": 0.0
+            }
+
+        x_arr = TimeSeriesService.as_array(x) if x is not None else np.arange(y.size, dtype=np.float64)
+        fit = TimeSeriesService.least_squares(x_arr, y)
+
+        fitted_start = fit["intercept"] + fit["slope"] * x_arr[0]
+        fitted_end = fit["intercept"] + fit["slope"] * x_arr[-1]
+        fitted_change = fitted_end - fitted_start
+        change_percentage = (fitted_change / fitted_start) * 100 if fitted_start > 0 else 0.0
+
+        return {
+            "trend": TimeSeriesService.classify_change(change_percentage, threshold),
+            "change_percentage": float(change_percentage),
+            "slope": fit["slope"],
+            "r_squared": fit["r_squared"],
+            "fitted_change": float(fitted_change)
+        }
+
+    @staticmethod
+    def classify_change(change: float, threshold: float = DEFAULT_TREND_THRESHOLD) -> str:
+        """
+        Map a signed change onto increasing/decreasing/stable
+
+        Args:
+            change: Signed change (percent or absolute, matching threshold)
+            threshold: Magnitude at which the change stops being "stable"
+
+        Returns:
+            Trend label
+        """
+        if change > threshold:
+            return "increasing"
+        if change < -threshold:
+            return "decreasing"
+        return "stable"
+
+    @staticmethod
+    def rolling_mean(values: Sequence[float], window: int) -> np.ndarray:
+        """
+        Trailing rolling mean
+
+        The first ``window - 1`` positions average over the available prefix,
+        so the output has the same length as the input.
+
+        Args:
+            values: Observations in chronological order
+            window: Window size (number of observations)
+
+        Returns:
+            Array of rolling means
+        """
+        arr = TimeSeriesService.as_array(values)
+        if arr.size == 0 or window <= 1:
+            return arr.copy()
+        cumsum = np.cumsum(np.insert(arr, 0, 0.0))
+        result = np.empty_like(arr)
+        full = cumsum[window:] - cumsum[:-window]
+        result[window - 1:] = full / window
+        head = min(window - 1, arr.size)
+        result[:head] = cumsum[1:head + 1] / np.arange(1, head + 1)
+        return result
+
+    @staticmethod
+    def ewma(values: Sequence[float], span: Optional[float] = None, alpha: Optional[float] = None) -> np.ndarray:
+        """
+        Exponentially weighted moving average
+
+        Args:
+            values: Observations in chronological order
+            span: Span in observations (alpha = 2 / (span + 1))
+            alpha: Smoothing factor in (0, 1]; takes precedence over span
+
+        Returns:
+            Array of smoothed values
+        """
+        arr = TimeSeriesService.as_array(values)
+        if arr.size == 0:
+            return arr.copy()
+        if alpha is None:
+            alpha = 2.0 / ((span or 7.0) + 1.0)
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha must be in (0, 1]")
+
+        # Closed form: s_t = (1-a)^t * x_0 + sum_{i=1..t} a(1-a)^(t-i) x_i
+        decay = 1.0 - alpha
+        n = arr.size
+        powers = decay ** np.arange(n, dtype=np.float64)
+        if powers[-1] < 1e-12:
+            # Long series: the closed form loses precision, use the recurrence
+            result = np.empty_like(arr)
+            result[0] = arr[0]
+            for i in range(1, n):
+                result[i] = alpha * arr[i] + decay * result[i - 1]
+            return result
+
+        weights = arr / powers
+        weights[1:] *= alpha
+        return np.cumsum(weights) * powers
+
+    @staticmethod
+    def correlation(x: Sequence[float], y: Sequence[float]) -> float:
+        """
+        Pearson correlation coefficient
+
+        Returns:
+            Correlation in [-1, 1], or 0.0 when either series is constant or too short
+        """
+        x_arr = TimeSeriesService.as_array(x)
+        y_arr = TimeSeriesService.as_array(y)
+        if x_arr.size < 2 or x_arr.size != y_arr.size:
+            return 0.0
+        x_centered = x_arr - x_arr.mean()
+        y_centered = y_arr - y_arr.mean()
+        denominator = np.sqrt(np.dot(x_centered, x_centered) * np.dot(y_centered, y_centered))
+        if denominator == 0:
+            return 0.0
+        return float(np.clip(np.dot(x_centered, y_centered) / denominator, -1.0, 1.0))
+
+    @staticmethod
+    def seasonality(
+        series: TimeSeries,
+        columns: Sequence[str],
+        period: str = "season"
+    ) -> Dict[str, Any]:
+        """
+        Group column means by a calendar bucket
+
+        Args:
+            series: Source time series
+            columns: Columns to aggregate
+            period: "season", "month" or "weekday"
+
+        Returns:
+            Dict with per-bucket means/counts and a variation score per column
+            (coefficient of variation across bucket means)
+        """
+        if period == "season":
+            labels = [SEASON_BY_MONTH[dt.month] for dt in series.datetimes]
+        elif period == "month":
+            labels = [dt.strftime("%B").lower() for dt in series.datetimes]
+        elif period == "weekday":
+            labels = [dt.strftime("%A").lower() for dt in series.datetimes]
+        else:
+            raise ValueError(f"Unknown seasonality period: {period}")
+
+        if not labels:
+            return {"buckets": {}, "variation": {}}
+
+        label_array = np.array(labels)
+        unique_labels, inverse, counts = np.unique(label_array, return_inverse=True, return_counts=True)
+
+        buckets: Dict[str, Dict[str, Any]] = {
+            str(label): {"count": int(count)} for label, count in zip(unique_labels, counts)
+        }
+        variation: Dict[str, float] = {}
+
+        for name in columns:
+            values = series.column(name)
+            sums = np.bincount(inverse, weights=values, minlength=unique_labels.size)
+            means = sums / counts
+            for label, value in zip(unique_labels, means):
+                buckets[str(label)][name] = round(float(value), 2)
+            cv = TimeSeriesService.coefficient_of_variation(means)
+            variation[name] = round(abs(cv), 3) if cv is not None else 0.0
+
+        return {"buckets": buckets, "variation": variation}
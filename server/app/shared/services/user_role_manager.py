@@ -15,7 +15,7 @@ from typing import Optional
 from supabase import Client
 
 from app.models.core.user import UserRole
-from app.services.subscription import RevenueCatService
+from app.services.subscription import EntitlementCache, RevenueCatService
 
 logger = logging.getLogger(__name__)
 
@@ -113,7 +113,7 @@ class UserRoleManager:
             # Step 5: Perform the role update using centralized service
             # allow_role_update=True because we've already checked bypass flag above
             db_service = DatabaseOperationService(self.supabase)
-            result = db_service.update_with_timestamp(
+            result = await db_service.update_with_timestamp(
                 "users",
                 user_id,
                 {"role": new_role.value},
@@ -124,6 +124,8 @@ class UserRoleManager:
             updated_role = result.get("role") if result else None
             
             if updated_role == new_role.value:
+                # Cached subscription status carries the role
+                await EntitlementCache.invalidate(user_id)
                 logger.info(
                     f"✅ Successfully updated user {user_id} role to {new_role.value}. "
                     f"Reason: {reason or 'N/A'}"
@@ -0,0 +1,574 @@
+"""
+Data quality scoring
+
+Comprehensive data quality scoring based on ingredients and nutritional
+values. Shared by the API (through app.services.data_quality_service) and
+the importing/standardizor scripts; it needs no app configuration, so the
+scripts can import it without the API's environment.
+"""
+
+from typing import Dict, List, Optional, Tuple, Any
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from enum import Enum
+import hashlib
+import json
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class DataQualityLevel(Enum):
+    """Data quality classification levels"""
+    EXCELLENT = "excellent"
+    GOOD = "good" 
+    FAIR = "fair"
+    POOR = "poor"
+
+
+@dataclass
+class DataQualityMetrics:
+    """Comprehensive data quality metrics"""
+    overall_score: float
+    level: DataQualityLevel
+    ingredients_score: float
+    nutritional_score: float
+    completeness_score: float
+    ingredients_count: int
+    nutritional_fields_count: int
+    missing_critical_fields: List[str]
+    quality_indicators: Dict[str, bool]
+
+
+@dataclass
+class DataQualityBatchScores:
+    """
+    Columnar quality scores for a batch of food items
+    
+    Every array is aligned with ``ids`` (one entry per input item).
+    """
+    ids: List[Optional[str]]
+    overall_score: np.ndarray
+    levels: np.ndarray
+    ingredients_score: np.ndarray
+    nutritional_score: np.ndarray
+    completeness_score: np.ndarray
+    ingredients_count: np.ndarray
+    nutritional_fields_count: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+@dataclass
+class QualityStatsAccumulator:
+    """
+    Streaming aggregate of quality statistics
+    
+    Batches are folded in as they are scored, so catalog-wide statistics
+    need memory proportional to one page rather than the whole catalog.
+    """
+    total_items: int = 0
+    total_score: float = 0.0
+    items_with_ingredients: int = 0
+    items_with_nutritional: int = 0
+    quality_distribution: Dict[str, int] = field(
+        default_factory=lambda: {level.value: 0 for level in DataQualityLevel}
+    )
+    
+    def add(self, batch: DataQualityBatchScores) -> None:
+        """Fold a scored batch into the running totals"""
+        if len(batch) == 0:
+            return
+        self.total_items += len(batch)
+        self.total_score += float(batch.overall_score.sum())
+        self.items_with_ingredients += int(np.count_nonzero(batch.ingredients_count))
+        self.items_with_nutritional += int(np.count_nonzero(batch.nutritional_fields_count))
+        levels, counts = np.unique(batch.levels, return_counts=True)
+        for level, count in zip(levels.tolist(), counts.tolist()):
+            self.quality_distribution[level] += count
+    
+    def summary(self) -> Dict[str, Any]:
+        """Statistics in the /stats/overview response shape"""
+        if not self.total_items:
+            return {
+                "total_items": 0,
+                "quality_distribution": dict(self.quality_distribution),
+                "average_score": 0.0,
+                "ingredients_coverage": 0.0,
+                "nutritional_coverage": 0.0
+            }
+        return {
+            "total_items": self.total_items,
+            "quality_distribution": dict(self.quality_distribution),
+            "average_score": round(self.total_score / self.total_items, 3),
+            "ingredients_coverage": round(self.items_with_ingredients / self.total_items, 3),
+            "nutritional_coverage": round(self.items_with_nutritional / self.total_items, 3)
+        }
+
+
+class DataQualityService:
+    """
+    Enhanced data quality assessment service
+    Focuses on ingredients and nutritional values as primary quality indicators
+    """
+    
+    # Critical nutritional fields that should be present for good quality
+    CRITICAL_NUTRITIONAL_FIELDS = [
+        'calories_per_100g',
+        'protein_percentage', 
+        'fat_percentage',
+        'fiber_percentage',
+        'moisture_percentage'
+    ]
+    
+    # Important nutritional fields that add to quality
+    IMPORTANT_NUTRITIONAL_FIELDS = [
+        'ash_percentage',
+        'carbohydrates_percentage',
+        'sodium_percentage'
+    ]
+    
+    # Extended nutritional fields for excellent quality
+    EXTENDED_NUTRITIONAL_FIELDS = [
+        'sugars_percentage',
+        'saturated_fat_percentage'
+    ]
+    # food_items.has_nutritional_info (add_food_quality_statistics.sql) lists
+    # the same fields for nutritional coverage
+    
+    # Per-field weights for the nutritional score
+    CRITICAL_FIELD_WEIGHT = 0.4
+    IMPORTANT_FIELD_WEIGHT = 0.2
+    EXTENDED_FIELD_WEIGHT = 0.1
+    
+    # Ingredient count bins: < 3, < 6, < 10, < 15 (0 ingredients scores 0.0)
+    INGREDIENT_COUNT_BINS = [1, 3, 6, 10, 15]
+    INGREDIENT_BIN_SCORES = [0.0, 0.2, 0.5, 0.7, 0.85, 1.0]
+    
+    # Basic product fields counted towards completeness (0.1 each)
+    BASIC_INFO_FIELDS = ['name', 'brand', 'barcode']
+    
+    # Quality thresholds
+    EXCELLENT_THRESHOLD = 0.9
+    GOOD_THRESHOLD = 0.7
+    FAIR_THRESHOLD = 0.5
+
+    @classmethod
+    def calculate_ingredients_score(cls, ingredients: List[str]) -> Tuple[float, int]:
+        """
+        Calculate ingredients quality score
+        
+        Args:
+            ingredients: List of ingredient strings
+            
+        Returns:
+            Tuple of (score, count)
+        """
+        ingredient_count = len(ingredients or [])
+        
+        # Same bins as score_batch (np.digitize matches bisect_right)
+        score = cls.INGREDIENT_BIN_SCORES[bisect_right(cls.INGREDIENT_COUNT_BINS, ingredient_count)]
+        
+        return score, ingredient_count
+
+    @classmethod
+    def calculate_nutritional_score(cls, nutritional_data: Dict[str, Any]) -> Tuple[float, int]:
+        """
+        Calculate nutritional information quality score
+        
+        Args:
+            nutritional_data: Dictionary containing nutritional information
+            
+        Returns:
+            Tuple of (score, count of available fields)
+        """
+        critical = sum(1 for f in cls.CRITICAL_NUTRITIONAL_FIELDS if nutritional_data.get(f) is not None)
+        important = sum(1 for f in cls.IMPORTANT_NUTRITIONAL_FIELDS if nutritional_data.get(f) is not None)
+        extended = sum(1 for f in cls.EXTENDED_NUTRITIONAL_FIELDS if nutritional_data.get(f) is not None)
+        
+        # Critical fields weigh 0.4 each, important 0.2, extended 0.1
+        total_score = (
+            critical * cls.CRITICAL_FIELD_WEIGHT +
+            important * cls.IMPORTANT_FIELD_WEIGHT +
+            extended * cls.EXTENDED_FIELD_WEIGHT
+        )
+        available_fields = critical + important + extended
+        
+        return min(total_score, 1.0), available_fields
+
+    @classmethod
+    def calculate_completeness_score(cls, food_item: Dict[str, Any]) -> float:
+        """
+        Calculate overall data completeness score
+        
+        Args:
+            food_item: Complete food item data
+            
+        Returns:
+            Completeness score (0.0 to 1.0)
+        """
+        # Basic product information (30% weight)
+        basic_count = sum(1 for f in cls.BASIC_INFO_FIELDS if food_item.get(f))
+        
+        # Nutritional information (50% weight)
+        nutritional_data = food_item.get('nutritional_info') or {}
+        nutritional_score, _ = cls.calculate_nutritional_score(nutritional_data)
+        
+        # Ingredients information (20% weight)
+        ingredients = nutritional_data.get('ingredients') or []
+        ingredients_score, _ = cls.calculate_ingredients_score(ingredients)
+        
+        score = basic_count * 0.1 + nutritional_score * 0.5 + ingredients_score * 0.2
+        
+        return min(score, 1.0)
+
+    @classmethod
+    def identify_missing_critical_fields(cls, nutritional_data: Dict[str, Any]) -> List[str]:
+        """
+        Identify missing critical nutritional fields
+        
+        Args:
+            nutritional_data: Dictionary containing nutritional information
+            
+        Returns:
+            List of missing critical field names
+        """
+        missing_fields = []
+        
+        for field in cls.CRITICAL_NUTRITIONAL_FIELDS:
+            if nutritional_data.get(field) is None:
+                missing_fields.append(field)
+                
+        return missing_fields
+
+    @classmethod
+    def generate_quality_indicators(cls, nutritional_data: Dict[str, Any], 
+                                  ingredients: List[str]) -> Dict[str, bool]:
+        """
+        Generate quality indicator flags
+        
+        Args:
+            nutritional_data: Dictionary containing nutritional information
+            ingredients: List of ingredients
+            
+        Returns:
+            Dictionary of quality indicators
+        """
+        return {
+            'has_calories': nutritional_data.get('calories_per_100g') is not None,
+            'has_protein': nutritional_data.get('protein_percentage') is not None,
+            'has_fat': nutritional_data.get('fat_percentage') is not None,
+            'has_fiber': nutritional_data.get('fiber_percentage') is not None,
+            'has_moisture': nutritional_data.get('moisture_percentage') is not None,
+            'has_ingredients': len(ingredients) > 0,
+            'has_allergens': len(nutritional_data.get('allergens', [])) > 0,
+            'has_additives': len(nutritional_data.get('additives', [])) > 0,
+            'has_vitamins': len(nutritional_data.get('vitamins', [])) > 0,
+            'has_minerals': len(nutritional_data.get('minerals', [])) > 0,
+            'has_extended_nutrition': any(
+                nutritional_data.get(field) is not None 
+                for field in cls.EXTENDED_NUTRITIONAL_FIELDS
+            )
+        }
+
+    @classmethod
+    def assess_data_quality(cls, food_item: Dict[str, Any]) -> DataQualityMetrics:
+        """
+        Comprehensive data quality assessment
+        
+        Args:
+            food_item: Complete food item data
+            
+        Returns:
+            DataQualityMetrics object with detailed quality assessment
+        """
+        nutritional_data = food_item.get('nutritional_info') or {}
+        ingredients = nutritional_data.get('ingredients') or []
+        
+        # Calculate individual scores
+        ingredients_score, ingredients_count = cls.calculate_ingredients_score(ingredients)
+        nutritional_score, nutritional_fields_count = cls.calculate_nutritional_score(nutritional_data)
+        completeness_score = cls.calculate_completeness_score(food_item)
+        
+        # Calculate overall score (weighted average)
+        overall_score = cls._overall_score(ingredients_score, nutritional_score, completeness_score)
+        
+        # Determine quality level
+        level = cls.classify_level(overall_score)
+            
+        # Identify missing critical fields
+        missing_critical_fields = cls.identify_missing_critical_fields(nutritional_data)
+        
+        # Generate quality indicators
+        quality_indicators = cls.generate_quality_indicators(nutritional_data, ingredients)
+        
+        return DataQualityMetrics(
+            overall_score=overall_score,
+            level=level,
+            ingredients_score=ingredients_score,
+            nutritional_score=nutritional_score,
+            completeness_score=completeness_score,
+            ingredients_count=ingredients_count,
+            nutritional_fields_count=nutritional_fields_count,
+            missing_critical_fields=missing_critical_fields,
+            quality_indicators=quality_indicators
+        )
+
+    @staticmethod
+    def _overall_score(ingredients_score, nutritional_score, completeness_score):
+        """Weighted overall score (works on floats and arrays alike)"""
+        return (
+            ingredients_score * 0.3 +
+            nutritional_score * 0.5 +
+            completeness_score * 0.2
+        )
+
+    @classmethod
+    def classify_level(cls, overall_score: float) -> DataQualityLevel:
+        """
+        Map an overall score to its quality level
+        
+        Args:
+            overall_score: Overall quality score (0.0 to 1.0)
+            
+        Returns:
+            DataQualityLevel for the score
+        """
+        if overall_score >= cls.EXCELLENT_THRESHOLD:
+            return DataQualityLevel.EXCELLENT
+        elif overall_score >= cls.GOOD_THRESHOLD:
+            return DataQualityLevel.GOOD
+        elif overall_score >= cls.FAIR_THRESHOLD:
+            return DataQualityLevel.FAIR
+        return DataQualityLevel.POOR
+
+    @classmethod
+    def scoring_version(cls) -> str:
+        """
+        Fingerprint of the scoring configuration
+        
+        Stored with each materialized score. Any change to field lists,
+        weights, bins or thresholds changes the fingerprint, which marks
+        every stored score as stale for the bulk rescore.
+        
+        Returns:
+            Short hex digest of the scoring configuration
+        """
+        config = {
+            'fields': [
+                cls.CRITICAL_NUTRITIONAL_FIELDS,
+                cls.IMPORTANT_NUTRITIONAL_FIELDS,
+                cls.EXTENDED_NUTRITIONAL_FIELDS,
+                cls.BASIC_INFO_FIELDS
+            ],
+            'weights': [cls.CRITICAL_FIELD_WEIGHT, cls.IMPORTANT_FIELD_WEIGHT, cls.EXTENDED_FIELD_WEIGHT],
+            'overall': [cls._overall_score(1, 0, 0), cls._overall_score(0, 1, 0), cls._overall_score(0, 0, 1)],
+            'ingredients': [cls.INGREDIENT_COUNT_BINS, cls.INGREDIENT_BIN_SCORES],
+            'thresholds': [cls.EXCELLENT_THRESHOLD, cls.GOOD_THRESHOLD, cls.FAIR_THRESHOLD]
+        }
+        return hashlib.sha1(json.dumps(config).encode()).hexdigest()[:12]
+
+    @classmethod
+    def quality_columns(cls, food_item: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Materialized quality columns for a food_items row
+        
+        Merge the result into any insert/update payload that changes name,
+        brand, barcode or nutritional_info.
+        
+        Args:
+            food_item: Food item data (name, brand, barcode, nutritional_info)
+            
+        Returns:
+            Dictionary with quality_score, quality_level, quality_version
+            and quality_scored_at
+        """
+        metrics = cls.assess_data_quality(food_item)
+        return {
+            'quality_score': round(metrics.overall_score, 3),
+            'quality_level': metrics.level.value,
+            'quality_version': cls.scoring_version(),
+            'quality_scored_at': datetime.now(timezone.utc).isoformat()
+        }
+
+    @classmethod
+    def score_batch(cls, food_items: List[Dict[str, Any]]) -> DataQualityBatchScores:
+        """
+        Score many food items at once
+        
+        Field presence is gathered into boolean matrices in a single pass and
+        all scores are computed as array operations. Produces exactly the same
+        values as assess_data_quality for each item.
+        
+        Args:
+            food_items: Food item rows (id, name, brand, barcode, nutritional_info)
+            
+        Returns:
+            DataQualityBatchScores aligned with food_items
+        """
+        fields = (
+            cls.CRITICAL_NUTRITIONAL_FIELDS +
+            cls.IMPORTANT_NUTRITIONAL_FIELDS +
+            cls.EXTENDED_NUTRITIONAL_FIELDS
+        )
+        n_items = len(food_items)
+        
+        presence = np.zeros((n_items, len(fields)), dtype=bool)
+        basic = np.zeros((n_items, len(cls.BASIC_INFO_FIELDS)), dtype=bool)
+        ingredients_count = np.zeros(n_items, dtype=np.int64)
+        
+        for i, item in enumerate(food_items):
+            nutritional_data = item.get('nutritional_info') or {}
+            presence[i] = [nutritional_data.get(f) is not None for f in fields]
+            basic[i] = [bool(item.get(f)) for f in cls.BASIC_INFO_FIELDS]
+            ingredients_count[i] = len(nutritional_data.get('ingredients') or [])
+        
+        n_critical = len(cls.CRITICAL_NUTRITIONAL_FIELDS)
+        n_important = len(cls.IMPORTANT_NUTRITIONAL_FIELDS)
+        critical = presence[:, :n_critical].sum(axis=1)
+        important = presence[:, n_critical:n_critical + n_important].sum(axis=1)
+        extended = presence[:, n_critical + n_important:].sum(axis=1)
+        
+        nutritional_score = np.minimum(
+            critical * cls.CRITICAL_FIELD_WEIGHT +
+            important * cls.IMPORTANT_FIELD_WEIGHT +
+            extended * cls.EXTENDED_FIELD_WEIGHT,
+            1.0
+        )
+        
+        bin_index = np.digitize(ingredients_count, cls.INGREDIENT_COUNT_BINS)
+        ingredients_score = np.asarray(cls.INGREDIENT_BIN_SCORES)[bin_index]
+        
+        completeness_score = np.minimum(
+            basic.sum(axis=1) * 0.1 + nutritional_score * 0.5 + ingredients_score * 0.2,
+            1.0
+        )
+        overall_score = cls._overall_score(ingredients_score, nutritional_score, completeness_score)
+        
+        levels = np.select(
+            [
+                overall_score >= cls.EXCELLENT_THRESHOLD,
+                overall_score >= cls.GOOD_THRESHOLD,
+                overall_score >= cls.FAIR_THRESHOLD
+            ],
+            [
+                DataQualityLevel.EXCELLENT.value,
+                DataQualityLevel.GOOD.value,
+                DataQualityLevel.FAIR.value
+            ],
+            default=DataQualityLevel.POOR.value
+        )
+        
+        return DataQualityBatchScores(
+            ids=[str(item['id']) if item.get('id') is not None else None for item in food_items],
+            overall_score=overall_score,
+            levels=levels,
+            ingredients_score=ingredients_score,
+            nutritional_score=nutritional_score,
+            completeness_score=completeness_score,
+            ingredients_count=ingredients_count,
+            nutritional_fields_count=presence.sum(axis=1)
+        )
+
+    @classmethod
+    def assess_data_quality_batch(cls, food_items: List[Dict[str, Any]]) -> List[DataQualityMetrics]:
+        """
+        Full assessment for many food items, using the columnar scoring path
+        
+        Args:
+            food_items: Food item rows
+            
+        Returns:
+            DataQualityMetrics per item, in input order
+        """
+        batch = cls.score_batch(food_items)
+        metrics = []
+        
+        for i, item in enumerate(food_items):
+            nutritional_data = item.get('nutritional_info') or {}
+            ingredients = nutritional_data.get('ingredients') or []
+            metrics.append(DataQualityMetrics(
+                overall_score=float(batch.overall_score[i]),
+                level=DataQualityLevel(batch.levels[i]),
+                ingredients_score=float(batch.ingredients_score[i]),
+                nutritional_score=float(batch.nutritional_score[i]),
+                completeness_score=float(batch.completeness_score[i]),
+                ingredients_count=int(batch.ingredients_count[i]),
+                nutritional_fields_count=int(batch.nutritional_fields_count[i]),
+                missing_critical_fields=cls.identify_missing_critical_fields(nutritional_data),
+                quality_indicators=cls.generate_quality_indicators(nutritional_data, ingredients)
+            ))
+        
+        return metrics
+
+    @classmethod
+    def get_quality_recommendations(cls, metrics: DataQualityMetrics) -> List[str]:
+        """
+        Generate quality improvement recommendations
+        
+        Args:
+            metrics: DataQualityMetrics object
+            
+        Returns:
+            List of improvement recommendations
+        """
+        recommendations = []
+        
+        # Ingredients recommendations
+        if metrics.ingredients_count == 0:
+            recommendations.append("Add ingredient list for better product transparency")
+        elif metrics.ingredients_count < 3:
+            recommendations.append("Provide more detailed ingredient information")
+            
+        # Nutritional recommendations
+        if metrics.nutritional_score < 0.5:
+            recommendations.append("Add basic nutritional information (calories, protein, fat)")
+        elif metrics.nutritional_score < 0.8:
+            recommendations.append("Include additional nutritional values (fiber, moisture, ash)")
+            
+        # Missing critical fields
+        if metrics.missing_critical_fields:
+            missing_list = ", ".join(metrics.missing_critical_fields)
+            recommendations.append(f"Add missing critical nutritional data: {missing_list}")
+            
+        # Quality indicators
+        if not metrics.quality_indicators.get('has_allergens'):
+            recommendations.append("Include allergen information for pet safety")
+            
+        return recommendations
+
+    @classmethod
+    def format_quality_summary(cls, metrics: DataQualityMetrics) -> Dict[str, Any]:
+        """
+        Format quality metrics for API response
+        
+        Args:
+            metrics: DataQualityMetrics object
+            
+        Returns:
+            Formatted dictionary for API response
+        """
+        return {
+            'overall_score': round(metrics.overall_score, 3),
+            'quality_level': metrics.level.value,
+            'breakdown': {
+                'ingredients': {
+                    'score': round(metrics.ingredients_score, 3),
+                    'count': metrics.ingredients_count
+                },
+                'nutritional': {
+                    'score': round(metrics.nutritional_score, 3),
+                    'fields_count': metrics.nutritional_fields_count
+                },
+                'completeness': {
+                    'score': round(metrics.completeness_score, 3)
+                }
+            },
+            'missing_critical_fields': metrics.missing_critical_fields,
+            'quality_indicators': metrics.quality_indicators,
+            'recommendations': cls.get_quality_recommendations(metrics)
+        }
@@ -0,0 +1,522 @@
+"""
+OpenPetFoodFacts product extraction
+
+Single implementation of the product -> food_items mapping shared by
+importing/import_no_duplicates.py and standardizor/update_nutritional_info.py.
+
+Field lookups are driven by precompiled tables (nutrient fallback keys,
+keyword regexes) instead of per-call `.get() or .get()` chains, numeric
+coercion takes a float() fast path before falling back to regex cleanup, and
+the batch functions coerce whole nutrient columns with NumPy at once.
+"""
+
+from dataclasses import dataclass
+import math
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# ----------------------------------------------------------------------
+# Field mapping tables
+# ----------------------------------------------------------------------
+
+# nutritional_info field -> nutriments keys, in order of preference
+NUTRIENT_FIELDS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ('calories_per_100g', ('energy-kcal_100g', 'energy_100g', 'energy-kcal', 'energy')),
+    ('protein_percentage', ('proteins_100g', 'proteins')),
+    ('fat_percentage', ('fat_100g', 'fat')),
+    ('fiber_percentage', ('fiber_100g', 'fiber')),
+    ('moisture_percentage', ('water_100g', 'moisture_100g', 'water', 'moisture')),
+    ('ash_percentage', ('ash_100g', 'ash')),
+    ('carbohydrates_percentage', ('carbohydrates_100g', 'carbohydrates')),
+    ('sugars_percentage', ('sugars_100g', 'sugars')),
+    ('saturated_fat_percentage', ('saturated-fat_100g', 'saturated-fat')),
+    ('sodium_percentage', ('sodium_100g', 'sodium')),
+)
+NUTRIENT_COLUMNS: Tuple[str, ...] = tuple(name for name, _ in NUTRIENT_FIELDS)
+
+ARRAY_FIELDS = ('ingredients', 'allergens', 'additives', 'vitamins', 'minerals')
+STRING_FIELDS = ('source', 'external_id', 'last_updated')
+OBJECT_FIELDS = ('nutrient_levels', 'packaging_info', 'manufacturing_info')
+NUMERIC_FIELDS = NUTRIENT_COLUMNS + ('data_quality_score',)
+
+# The complete standardized nutritional_info structure (22 properties)
+NUTRITIONAL_INFO_DEFAULTS: Dict[str, Any] = {
+    **{name: None for name in NUTRIENT_COLUMNS},
+    **{name: [] for name in ARRAY_FIELDS},
+    'source': '',
+    'external_id': '',
+    'data_quality_score': 0.0,
+    'last_updated': '',
+    **{name: {} for name in OBJECT_FIELDS},
+}
+
+# Nutriments counted by calculate_data_completeness
+COMPLETENESS_NUTRIENTS = (
+    'energy-kcal_100g', 'proteins_100g', 'fat_100g',
+    'fiber_100g', 'water_100g', 'ash_100g'
+)
+
+NAME_FIELDS = ('product_name', 'product_name_en', 'product_name_fr')
+INGREDIENT_FIELDS = ('ingredients_text', 'ingredients_text_en', 'ingredients_text_fr', 'ingredients')
+
+SOURCE = 'openpetfoodfacts'
+
+_NON_NUMERIC = re.compile(r'[^\d.,\-]')
+_LIST_SEPARATORS = re.compile(r'[,;]')
+
+_DOG = re.compile(r'dog|chien')
+_CAT = re.compile(r'cat|chat')
+_DOG_TEXT = re.compile(r'dog|chien|canine')
+_CAT_TEXT = re.compile(r'cat|chat|feline')
+
+# Checked in order; the first match wins
+_LIFE_STAGES = (
+    ('puppy', re.compile(r'puppy|puppies|chiot')),
+    ('kitten', re.compile(r'kitten|kittens|chaton')),
+    ('adult', re.compile(r'adult|adulte')),
+    ('senior', re.compile(r'senior|sénior')),
+)
+_PRODUCT_TYPES = (
+    ('dry', re.compile(r'dry|croquette|kibble')),
+    ('wet', re.compile(r'wet|pate|mousse|sauce')),
+    ('treat', re.compile(r'treat|reward|snack|friandise')),
+    ('supplement', re.compile(r'supplement|vitamin|supplément')),
+)
+_NAME_CATEGORIES = (
+    ('Dog Food', re.compile(r'dog|chien|canine')),
+    ('Cat Food', re.compile(r'cat|chat|feline')),
+    ('Pet Treats', re.compile(r'treat|reward|snack')),
+    ('Pet Supplements', re.compile(r'supplement|vitamin')),
+)
+
+
+# ----------------------------------------------------------------------
+# Numeric coercion
+# ----------------------------------------------------------------------
+
+def to_float(value: Any) -> Optional[float]:
+    """
+    Coerce a nutriment value to float
+
+    Numbers and plain numeric strings take the float() fast path; strings with
+    units or decimal commas ("12 %", "3,5") are cleaned with a regex.
+    Non-finite results are treated as missing.
+    """
+    if value is None:
+        return None
+    try:
+        result = float(value)
+    except (TypeError, ValueError):
+        if not isinstance(value, str):
+            return None
+        cleaned = _NON_NUMERIC.sub('', value.strip()).replace(',', '.')
+        if not cleaned:
+            return None
+        try:
+            result = float(cleaned)
+        except ValueError:
+            return None
+    return result if math.isfinite(result) else None
+
+
+def coerce_floats(values: Sequence[Any]) -> np.ndarray:
+    """
+    Coerce a column of nutriment values to a float64 array (NaN when missing)
+
+    The whole column is converted by NumPy in one call; only columns that
+    contain values NumPy cannot parse fall back to to_float per element.
+    """
+    try:
+        column = np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        column = None
+    if column is None or column.ndim != 1:
+        coerced = (to_float(value) for value in values)
+        column = np.array([np.nan if value is None else value for value in coerced], dtype=np.float64)
+    column[~np.isfinite(column)] = np.nan
+    return column
+
+
+def _pick(mapping: Dict[str, Any], keys: Tuple[str, ...]) -> Any:
+    """First value present (not None or empty) among keys."""
+    for key in keys:
+        value = mapping.get(key)
+        if value is not None and value != '':
+            return value
+    return None
+
+
+def _raw_nutrients(product: Dict[str, Any]) -> List[Any]:
+    nutriments = product.get('nutriments') or {}
+    if not isinstance(nutriments, dict):
+        nutriments = {}
+    return [_pick(nutriments, keys) for _, keys in NUTRIENT_FIELDS]
+
+
+def _nutrient_matrix(products: Sequence[Dict[str, Any]]) -> np.ndarray:
+    """(len(products), len(NUTRIENT_COLUMNS)) float64 matrix, NaN when missing."""
+    matrix = np.full((len(products), len(NUTRIENT_COLUMNS)), np.nan)
+    if not products:
+        return matrix
+    raw = [_raw_nutrients(product) for product in products]
+    for j, column in enumerate(zip(*raw)):
+        matrix[:, j] = coerce_floats(column)
+    return matrix
+
+
+def _row_values(row: np.ndarray) -> List[Optional[float]]:
+    return [None if math.isnan(value) else value for value in row.tolist()]
+
+
+# ----------------------------------------------------------------------
+# Field extraction
+# ----------------------------------------------------------------------
+
+def _life_stage(text: str) -> Optional[str]:
+    for stage, pattern in _LIFE_STAGES:
+        if pattern.search(text):
+            return stage
+    return None
+
+
+def _categories(product: Dict[str, Any]) -> List[str]:
+    categories = []
+    for field in ('categories_tags', 'categories_hierarchy'):
+        values = product.get(field)
+        if isinstance(values, list):
+            categories.extend(c.lower() for c in values if isinstance(c, str))
+    return categories
+
+
+def extract_species_info(product: Dict[str, Any]) -> Tuple[str, str]:
+    """Extract species and life stage from categories, name and keywords."""
+    species = 'unknown'
+    life_stage = 'unknown'
+
+    for category in _categories(product):
+        if _DOG.search(category):
+            species = 'dog'
+        elif _CAT.search(category):
+            species = 'cat'
+        life_stage = _life_stage(category) or life_stage
+
+    # Product name and keywords take precedence over categories
+    product_name = ' '.join(product.get(field) or '' for field in NAME_FIELDS)
+    keywords = product.get('_keywords', [])
+    keyword_text = ' '.join(keywords) if isinstance(keywords, list) else str(keywords)
+    combined_text = f"{product_name} {keyword_text}".lower()
+
+    if _DOG_TEXT.search(combined_text):
+        species = 'dog'
+    elif _CAT_TEXT.search(combined_text):
+        species = 'cat'
+    life_stage = _life_stage(combined_text) or life_stage
+
+    return species, life_stage
+
+
+def extract_product_type(product: Dict[str, Any]) -> str:
+    """Extract product type (dry, wet, treat, supplement) from categories."""
+    for category in _categories(product):
+        for product_type, pattern in _PRODUCT_TYPES:
+            if pattern.search(category):
+                return product_type
+    return 'unknown'
+
+
+def _unique(values: Iterable[str], limit: int) -> List[str]:
+    """Order-preserving, case-insensitive de-duplication capped at limit."""
+    seen = set()
+    unique = []
+    for value in values:
+        key = value.lower()
+        if key not in seen:
+            seen.add(key)
+            unique.append(value)
+            if len(unique) == limit:
+                break
+    return unique
+
+
+def extract_ingredients(product: Dict[str, Any]) -> List[str]:
+    """Ingredients from the first populated ingredients text field (max 20)."""
+    for field in INGREDIENT_FIELDS:
+        text = product.get(field)
+        if text and isinstance(text, str):
+            parts = (part.strip() for part in _LIST_SEPARATORS.split(text))
+            return _unique((part for part in parts if len(part) > 1), 20)
+    return []
+
+
+def extract_tag_names(tags: Any, limit: Optional[int] = 20) -> List[str]:
+    """Readable names for 'en:' taxonomy tags ('en:vitamin-a' -> 'Vitamin A')."""
+    if not isinstance(tags, list):
+        return []
+    names = []
+    for tag in tags:
+        if isinstance(tag, str) and tag.startswith('en:'):
+            name = tag[3:].replace('-', ' ').title()
+            if name not in names:
+                names.append(name)
+                if len(names) == limit:
+                    break
+    return names
+
+
+def extract_allergens(product: Dict[str, Any]) -> List[str]:
+    """Allergens from the free-text field followed by 'en:' tags (max 10)."""
+    allergens = []
+    text = product.get('allergens', '')
+    if text and isinstance(text, str):
+        allergens = [part.strip() for part in _LIST_SEPARATORS.split(text) if part.strip()]
+    for name in extract_tag_names(product.get('allergens_tags', []), limit=None):
+        if name not in allergens:
+            allergens.append(name)
+    return allergens[:10]
+
+
+def extract_category(product: Dict[str, Any]) -> Optional[str]:
+    """Category from categories text, 'en:' category tags or the product name."""
+    categories = product.get('categories', '')
+    if categories and isinstance(categories, str):
+        category = categories.split(',')[0].strip()
+        if category and len(category) <= 50:
+            return category
+
+    for category in extract_tag_names(product.get('categories_tags', []), limit=None):
+        if len(category) <= 50:
+            return category
+
+    product_name = _pick(product, NAME_FIELDS)
+    if product_name and isinstance(product_name, str):
+        name_lower = product_name.lower()
+        for category, pattern in _NAME_CATEGORIES:
+            if pattern.search(name_lower):
+                return category
+
+    return None
+
+
+def calculate_data_completeness(product: Dict[str, Any]) -> float:
+    """Data completeness score (0-1) of a raw product."""
+    score = 0.0
+
+    if product.get('product_name'):
+        score += 0.1
+    if product.get('brands'):
+        score += 0.1
+    if product.get('code'):
+        score += 0.1
+
+    nutriments = product.get('nutriments') or {}
+    if nutriments and isinstance(nutriments, dict):
+        available = sum(1 for field in COMPLETENESS_NUTRIENTS if nutriments.get(field))
+        score += (available / len(COMPLETENESS_NUTRIENTS)) * 0.4
+
+    if product.get('ingredients_text') or product.get('ingredients'):
+        score += 0.2
+
+    images = product.get('images') or {}
+    if images and isinstance(images, dict):
+        image_count = len([k for k in images.keys() if k not in ('1', '2', '3', '4', '5')])
+        score += min(image_count / 3, 1.0) * 0.1
+
+    return min(score, 1.0)
+
+
+def _as_dict(value: Any) -> Dict[str, Any]:
+    return value if isinstance(value, dict) else {}
+
+
+def _arrays(product: Dict[str, Any]) -> Dict[str, List[str]]:
+    return {
+        'ingredients': extract_ingredients(product),
+        'allergens': extract_allergens(product),
+        'additives': extract_tag_names(product.get('additives_tags', [])),
+        'vitamins': extract_tag_names(product.get('vitamins_tags', [])),
+        'minerals': extract_tag_names(product.get('minerals_tags', [])),
+    }
+
+
+def _nutritional_info(
+    product: Dict[str, Any],
+    nutrients: List[Optional[float]],
+    arrays: Dict[str, List[str]],
+    completeness: float
+) -> Dict[str, Any]:
+    info = dict(zip(NUTRIENT_COLUMNS, nutrients))
+    info.update(arrays)
+    info.update({
+        'source': SOURCE,
+        'external_id': str(product.get('_id') or ''),
+        'data_quality_score': completeness,
+        'last_updated': str(product.get('last_modified_t') or ''),
+        'nutrient_levels': _as_dict(product.get('nutrient_levels')),
+        'packaging_info': _as_dict(product.get('packaging')),
+        'manufacturing_info': {
+            'country': product.get('countries') or '',
+            'brand': product.get('brands') or '',
+            'manufacturer': product.get('manufacturing_places') or ''
+        }
+    })
+    return info
+
+
+def standardize_nutritional_info(nutritional_info: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Complete nutritional_info to the standardized 22-property structure
+
+    Unknown keys are dropped, missing ones get their defaults and values are
+    coerced to the expected type (numbers, lists, strings, objects).
+    """
+    standardized = {
+        key: (list(value) if isinstance(value, list) else dict(value) if isinstance(value, dict) else value)
+        for key, value in NUTRITIONAL_INFO_DEFAULTS.items()
+    }
+    if not nutritional_info:
+        return standardized
+
+    for key, value in nutritional_info.items():
+        if key in NUMERIC_FIELDS:
+            standardized[key] = to_float(value)
+        elif key in ARRAY_FIELDS:
+            standardized[key] = value if isinstance(value, list) else []
+        elif key in STRING_FIELDS:
+            standardized[key] = str(value) if value is not None else ''
+        elif key in OBJECT_FIELDS:
+            standardized[key] = _as_dict(value)
+
+    return standardized
+
+
+# ----------------------------------------------------------------------
+# Product extraction
+# ----------------------------------------------------------------------
+
+def _product_fields(product: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """food_items columns other than nutrients; None when the product has no usable name."""
+    name = _pick(product, NAME_FIELDS)
+    if not isinstance(name, str) or len(name.strip()) < 2:
+        return None
+
+    brand = product.get('brands') or product.get('brands_old')
+    barcode = product.get('code') or product.get('_id')
+    country = product.get('countries', '')
+    language = product.get('lang', 'en')
+    species, life_stage = extract_species_info(product)
+    category = extract_category(product)
+
+    return {
+        'name': name.strip()[:200],
+        'brand': brand[:100] if brand else None,
+        'barcode': barcode[:50] if barcode else None,
+        'category': category[:50] if category else None,
+        'description': None,
+        'species': species,
+        'life_stage': life_stage,
+        'product_type': extract_product_type(product),
+        'country': country[:100] if country else None,
+        'language': language[:10] if language else 'en',
+        'keywords': product.get('_keywords', []),
+        'categories_hierarchy': product.get('categories_hierarchy', []),
+        'brands_hierarchy': product.get('brands_hierarchy', []),
+        'allergens_hierarchy': product.get('allergens_hierarchy', []),
+        'data_completeness': calculate_data_completeness(product),
+        'external_source': SOURCE,
+        'external_id': product.get('_id')
+    }
+
+
+def _complete_record(
+    record: Dict[str, Any],
+    product: Dict[str, Any],
+    nutrients: List[Optional[float]]
+) -> Dict[str, Any]:
+    arrays = _arrays(product)
+    record.update(zip(NUTRIENT_COLUMNS, nutrients))
+    record.update(arrays)
+    record['nutritional_info'] = _nutritional_info(product, nutrients, arrays, record['data_completeness'])
+    return record
+
+
+def extract_product(product: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Map one raw product to a food_items record
+
+    Returns:
+        food_items columns, the flat nutrient and array fields, and the
+        standardized 'nutritional_info' document; None when the product
+        has no usable name.
+    """
+    record = _product_fields(product)
+    if record is None:
+        return None
+    nutrients = [to_float(value) for value in _raw_nutrients(product)]
+    return _complete_record(record, product, nutrients)
+
+
+def extract_nutritional_info(product: Dict[str, Any]) -> Dict[str, Any]:
+    """Standardized nutritional_info document for one raw product."""
+    nutrients = [to_float(value) for value in _raw_nutrients(product)]
+    return _nutritional_info(product, nutrients, _arrays(product), calculate_data_completeness(product))
+
+
+@dataclass
+class ProductBatch:
+    """Extracted records of a batch plus a columnar view of their nutrients."""
+    records: List[Dict[str, Any]]
+    positions: np.ndarray  # index of each record in the input batch
+    nutrients: np.ndarray  # (len(records), len(NUTRIENT_COLUMNS)) float64, NaN when missing
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def column(self, name: str) -> np.ndarray:
+        """One column of the batch (float64 for nutrients, object otherwise)."""
+        if name in NUTRIENT_COLUMNS:
+            return self.nutrients[:, NUTRIENT_COLUMNS.index(name)]
+        column = np.empty(len(self.records), dtype=object)
+        column[:] = [record.get(name) for record in self.records]
+        return column
+
+    def to_columns(self) -> Dict[str, np.ndarray]:
+        """All record fields as columns, for bulk loading."""
+        if not self.records:
+            return {}
+        return {name: self.column(name) for name in self.records[0] if name != 'nutritional_info'}
+
+
+def extract_products_batch(products: Sequence[Dict[str, Any]]) -> ProductBatch:
+    """
+    Map a batch of raw products to food_items records
+
+    Same output as extract_product for each product, with nutrient coercion
+    done per column for the whole batch. Products without a usable name are
+    dropped; positions maps records back to the input.
+    """
+    records = []
+    kept = []
+    positions = []
+    for i, product in enumerate(products):
+        record = _product_fields(product)
+        if record is not None:
+            records.append(record)
+            kept.append(product)
+            positions.append(i)
+
+    matrix = _nutrient_matrix(kept)
+    for record, product, row in zip(records, kept, matrix):
+        _complete_record(record, product, _row_values(row))
+
+    return ProductBatch(records=records, positions=np.array(positions, dtype=np.int64), nutrients=matrix)
+
+
+def extract_nutritional_info_batch(products: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Standardized nutritional_info documents for a batch of raw products."""
+    matrix = _nutrient_matrix(products)
+    return [
+        _nutritional_info(product, _row_values(row), _arrays(product), calculate_data_completeness(product))
+        for product, row in zip(products, matrix)
+    ]
@@ -136,6 +136,25 @@ CREATE TABLE IF NOT EXISTS public.food_items (
     packaging_info JSONB DEFAULT '{}',
     manufacturing_info JSONB DEFAULT '{}',
     nutritional_info JSONB DEFAULT '{}',
+    quality_score DECIMAL(4,3) CHECK (quality_score >= 0 AND quality_score <= 1),
+    quality_level TEXT CHECK (quality_level IN ('excellent', 'good', 'fair', 'poor')),
+    quality_version TEXT,
+    quality_scored_at TIMESTAMP WITH TIME ZONE,
+    source_hash TEXT,
+    -- Quality statistics coverage (nutritional fields as in DataQualityService)
+    has_ingredients BOOLEAN GENERATED ALWAYS AS (
+        COALESCE(CASE
+            WHEN jsonb_typeof(nutritional_info->'ingredients') = 'array'
+            THEN jsonb_array_length(nutritional_info->'ingredients') > 0
+        END, FALSE)
+    ) STORED,
+    has_nutritional_info BOOLEAN GENERATED ALWAYS AS (
+        COALESCE(jsonb_strip_nulls(nutritional_info) ?| ARRAY[
+            'calories_per_100g', 'protein_percentage', 'fat_percentage', 'fiber_percentage',
+            'moisture_percentage', 'ash_percentage', 'carbohydrates_percentage', 'sodium_percentage',
+            'sugars_percentage', 'saturated_fat_percentage'
+        ], FALSE)
+    ) STORED,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
@@ -326,6 +345,7 @@ CREATE INDEX IF NOT EXISTS idx_scans_user_id ON public.scans(user_id);
 CREATE INDEX IF NOT EXISTS idx_scans_pet_id ON public.scans(pet_id);
 CREATE INDEX IF NOT EXISTS idx_scans_confidence_score ON public.scans(confidence_score);
 CREATE INDEX IF NOT EXISTS idx_scans_method ON public.scans(method);
+CREATE INDEX IF NOT EXISTS idx_scans_user_created_id ON public.scans(user_id, created_at DESC, id DESC);
 CREATE INDEX IF NOT EXISTS idx_favorites_user_id ON public.favorites(user_id);
 CREATE INDEX IF NOT EXISTS idx_favorites_pet_id ON public.favorites(pet_id);
 
@@ -343,6 +363,10 @@ CREATE INDEX IF NOT EXISTS idx_food_items_external_id ON public.food_items(exter
 CREATE INDEX IF NOT EXISTS idx_food_items_external_source ON public.food_items(external_source);
 CREATE INDEX IF NOT EXISTS idx_food_items_nova_group ON public.food_items(nova_group);
 CREATE INDEX IF NOT EXISTS idx_food_items_nutrition_grade ON public.food_items(nutrition_grade);
+CREATE INDEX IF NOT EXISTS idx_food_items_quality_score ON public.food_items(quality_score) WHERE quality_score IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_food_items_quality_level ON public.food_items(quality_level);
+CREATE INDEX IF NOT EXISTS idx_food_items_quality_version_score ON public.food_items(quality_version, quality_score);
+CREATE INDEX IF NOT EXISTS idx_food_items_quality_statistics ON public.food_items(quality_version, quality_level) INCLUDE (quality_score, has_ingredients, has_nutritional_info);
 
 -- GIN indexes for array fields
 CREATE INDEX IF NOT EXISTS idx_food_items_keywords ON public.food_items USING GIN (keywords);
@@ -367,6 +391,7 @@ CREATE INDEX IF NOT EXISTS idx_feeding_records_pet_id ON public.feeding_records(
 CREATE INDEX IF NOT EXISTS idx_feeding_records_feeding_time ON public.feeding_records(feeding_time DESC);
 CREATE INDEX IF NOT EXISTS idx_feeding_records_food_analysis_id ON public.feeding_records(food_analysis_id);
 CREATE INDEX IF NOT EXISTS idx_feeding_records_calories ON public.feeding_records(calories) WHERE calories IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_feeding_records_pet_created_id ON public.feeding_records(pet_id, created_at DESC, id DESC);
 CREATE INDEX IF NOT EXISTS idx_daily_summaries_pet_id ON public.daily_nutrition_summaries(pet_id);
 CREATE INDEX IF NOT EXISTS idx_daily_summaries_date ON public.daily_nutrition_summaries(date DESC);
 CREATE INDEX IF NOT EXISTS idx_nutrition_recommendations_pet_id ON public.nutrition_recommendations(pet_id);
@@ -383,7 +408,7 @@ CREATE INDEX IF NOT EXISTS idx_pet_weight_goals_pet_id ON public.pet_weight_goal
 CREATE INDEX IF NOT EXISTS idx_pet_weight_goals_active ON public.pet_weight_goals(pet_id, is_active) WHERE is_active = TRUE;
 CREATE INDEX IF NOT EXISTS idx_nutritional_trends_pet_date ON public.nutritional_trends(pet_id, trend_date);
 CREATE INDEX IF NOT EXISTS idx_food_comparisons_user_id ON public.food_comparisons(user_id);
-CREATE INDEX IF NOT EXISTS idx_analytics_cache_pet_type ON public.nutritional_analytics_cache(pet_id, analysis_type);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_analytics_cache_pet_type ON public.nutritional_analytics_cache(pet_id, analysis_type);
 CREATE INDEX IF NOT EXISTS idx_analytics_cache_expires ON public.nutritional_analytics_cache(expires_at);
 
 -- Device tokens temp indexes
@@ -517,6 +542,13 @@ CREATE TABLE IF NOT EXISTS public.medication_reminders (
     start_date TIMESTAMP WITH TIME ZONE NOT NULL,
     end_date TIMESTAMP WITH TIME ZONE,
     is_active BOOLEAN DEFAULT TRUE,
+    -- IANA timezone the reminder times are in; NULL leaves the reminder to
+    -- the app's local notifications (the server never sends it)
+    timezone TEXT,
+    -- Next dose time, maintained by the API and the reminder dispatcher
+    next_fire_at TIMESTAMP WITH TIME ZONE,
+    last_fired_at TIMESTAMP WITH TIME ZONE,
+    locked_until TIMESTAMP WITH TIME ZONE,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
@@ -529,6 +561,7 @@ CREATE INDEX IF NOT EXISTS idx_health_events_event_category ON public.health_eve
 CREATE INDEX IF NOT EXISTS idx_health_events_event_date ON public.health_events(event_date);
 CREATE INDEX IF NOT EXISTS idx_health_events_created_at ON public.health_events(created_at);
 CREATE INDEX IF NOT EXISTS idx_health_events_documents ON public.health_events USING GIN(documents);
+CREATE INDEX IF NOT EXISTS idx_health_events_pet_event_date_id ON public.health_events(pet_id, event_date DESC, id DESC);
 
 -- Health events comments
 COMMENT ON COLUMN public.health_events.documents IS 'Array of document URLs for vet paperwork and medical records';
@@ -540,6 +573,11 @@ CREATE INDEX IF NOT EXISTS idx_medication_reminders_user_id ON public.medication
 CREATE INDEX IF NOT EXISTS idx_medication_reminders_is_active ON public.medication_reminders(is_active);
 CREATE INDEX IF NOT EXISTS idx_medication_reminders_start_date ON public.medication_reminders(start_date);
 CREATE INDEX IF NOT EXISTS idx_medication_reminders_end_date ON public.medication_reminders(end_date);
+CREATE INDEX IF NOT EXISTS idx_medication_reminders_pet_created_id ON public.medication_reminders(pet_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_medication_reminders_health_event_created_id ON public.medication_reminders(health_event_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_medication_reminders_next_fire_at
+    ON public.medication_reminders(next_fire_at)
+    WHERE is_active = TRUE AND next_fire_at IS NOT NULL;
 
 -- =============================================================================
 -- ROW LEVEL SECURITY (RLS) POLICIES
@@ -1324,6 +1362,309 @@ SET search_path = public;
 COMMENT ON FUNCTION backfill_missing_nutritional_trends() IS 
 'Backfills missing nutritional trends records for all dates that have feeding records but no corresponding trend records. Returns summary statistics: total_found, total_processed, total_errors. Can be called anytime to sync nutritional_trends with feeding_records data.';
 
+-- Function to bulk-apply data quality scores computed by the backend
+-- p_scores: [{"id": uuid, "quality_score": number, "quality_level": text, "quality_version": text}, ...]
+CREATE OR REPLACE FUNCTION apply_food_quality_scores(p_scores JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+    v_updated INTEGER;
+BEGIN
+    UPDATE public.food_items f
+    SET quality_score = s.quality_score,
+        quality_level = s.quality_level,
+        quality_version = s.quality_version,
+        quality_scored_at = NOW()
+    FROM jsonb_to_recordset(p_scores) AS s(
+        id UUID, quality_score DECIMAL(4,3), quality_level TEXT, quality_version TEXT
+    )
+    WHERE f.id = s.id;
+
+    GET DIAGNOSTICS v_updated = ROW_COUNT;
+    RETURN v_updated;
+END;
+$$ LANGUAGE plpgsql
+SET search_path = public;
+
+REVOKE EXECUTE ON FUNCTION apply_food_quality_scores(JSONB) FROM PUBLIC, anon, authenticated;
+
+-- Bulk nutritional_info updates from the standardizor (one UPDATE ... FROM per batch)
+-- p_rows: [{"id": uuid, "nutritional_info": jsonb, "quality_score": number, "quality_level": text, "quality_version": text}, ...]
+CREATE OR REPLACE FUNCTION bulk_update_food_nutritional_info(p_rows JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+    v_updated INTEGER;
+BEGIN
+    UPDATE public.food_items f
+    SET nutritional_info = r.nutritional_info,
+        quality_score = r.quality_score,
+        quality_level = r.quality_level,
+        quality_version = r.quality_version,
+        quality_scored_at = NOW()
+    FROM jsonb_to_recordset(p_rows) AS r(
+        id UUID, nutritional_info JSONB, quality_score DECIMAL(4,3), quality_level TEXT, quality_version TEXT
+    )
+    WHERE f.id = r.id
+      AND f.nutritional_info IS DISTINCT FROM r.nutritional_info;
+
+    GET DIAGNOSTICS v_updated = ROW_COUNT;
+    RETURN v_updated;
+END;
+$$ LANGUAGE plpgsql
+SET search_path = public;
+
+REVOKE EXECUTE ON FUNCTION bulk_update_food_nutritional_info(JSONB) FROM PUBLIC, anon, authenticated;
+
+-- Catalog quality statistics aggregated from the materialized scores, one row
+-- per quality level (NULL level: stale or never scored)
+-- p_version: DataQualityService.scoring_version()
+DROP FUNCTION IF EXISTS food_quality_statistics(TEXT, TEXT[]);
+CREATE OR REPLACE FUNCTION food_quality_statistics(p_version TEXT)
+RETURNS TABLE (
+    quality_level TEXT,
+    items BIGINT,
+    score_sum NUMERIC,
+    items_with_ingredients BIGINT,
+    items_with_nutritional BIGINT
+) AS $$
+    SELECT
+        CASE WHEN f.quality_version = p_version THEN f.quality_level END,
+        COUNT(*),
+        COALESCE(SUM(f.quality_score) FILTER (WHERE f.quality_version = p_version), 0),
+        COUNT(*) FILTER (WHERE f.has_ingredients),
+        COUNT(*) FILTER (WHERE f.has_nutritional_info)
+    FROM public.food_items f
+    GROUP BY 1;
+$$ LANGUAGE sql STABLE
+SET search_path = public;
+
+-- Daily nutrition rollup: daily_nutrition_summaries is maintained by triggers
+-- -----------------------------------------------------------------------------
+-- Calorie score: how close a day's calories are to the pet's target (0-100)
+-- -----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION nutrition_calorie_score(
+    p_total_calories DECIMAL,
+    p_target_calories DECIMAL
+)
+RETURNS DECIMAL(5,2) AS $$
+    SELECT CASE
+        WHEN p_target_calories IS NULL OR p_target_calories <= 0 THEN 0
+        ELSE ROUND(GREATEST(
+            0,
+            100 - ABS(p_total_calories - p_target_calories) / p_target_calories * 100
+        ), 2)
+    END;
+$$ LANGUAGE sql IMMUTABLE
+SET search_path = public;
+
+-- Calorie target: the pet's calorie goal, else its nutritional requirements.
+-- NutritionSummaryService._calorie_goal falls back the same way.
+CREATE OR REPLACE FUNCTION nutrition_calorie_target(p_pet_id UUID)
+RETURNS DECIMAL(10,2) AS $$
+    SELECT COALESCE(
+        (SELECT cg.daily_calories FROM public.calorie_goals cg WHERE cg.pet_id = p_pet_id),
+        (SELECT nr.daily_calories FROM public.nutritional_requirements nr WHERE nr.pet_id = p_pet_id)
+    );
+$$ LANGUAGE sql STABLE
+SET search_path = public;
+
+CREATE OR REPLACE FUNCTION nutrition_calorie_recommendations(
+    p_total_calories DECIMAL,
+    p_target_calories DECIMAL
+)
+RETURNS TEXT[] AS $$
+    SELECT CASE
+        WHEN p_target_calories IS NULL THEN ARRAY['Set a daily calorie goal to track intake']
+        WHEN p_total_calories < p_target_calories * 0.8 THEN ARRAY['Calorie intake was below the daily goal']
+        WHEN p_total_calories > p_target_calories * 1.2 THEN ARRAY['Calorie intake was above the daily goal']
+        ELSE ARRAY[]::TEXT[]
+    END;
+$$ LANGUAGE sql IMMUTABLE
+SET search_path = public;
+
+REVOKE EXECUTE ON FUNCTION nutrition_calorie_target(UUID) FROM PUBLIC, anon, authenticated;
+
+-- -----------------------------------------------------------------------------
+-- Recompute one pet-day
+-- -----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION refresh_daily_nutrition_summary(
+    p_pet_id UUID,
+    p_date DATE
+)
+RETURNS VOID AS $$
+DECLARE
+    v_total_calories DECIMAL(10,2);
+    v_total_protein DECIMAL(10,2);
+    v_total_fat DECIMAL(10,2);
+    v_total_fiber DECIMAL(10,2);
+    v_feeding_count INTEGER;
+    v_target DECIMAL(10,2);
+BEGIN
+    -- Same formulas as update_nutritional_trends: stored calories win,
+    -- otherwise calories and macros come from the analysed food
+    SELECT
+        COALESCE(SUM(COALESCE(NULLIF(fr.calories, 0), (fa.calories_per_100g / 100.0) * fr.amount_grams, 0)), 0),
+        COALESCE(SUM((fa.protein_percentage / 100.0) * fr.amount_grams), 0),
+        COALESCE(SUM((fa.fat_percentage / 100.0) * fr.amount_grams), 0),
+        COALESCE(SUM((fa.fiber_percentage / 100.0) * fr.amount_grams), 0),
+        COUNT(*)
+    INTO v_total_calories, v_total_protein, v_total_fat, v_total_fiber, v_feeding_count
+    FROM public.feeding_records fr
+    LEFT JOIN public.food_analyses fa ON fa.id = fr.food_analysis_id
+    WHERE fr.pet_id = p_pet_id
+    AND fr.feeding_time >= p_date
+    AND fr.feeding_time < p_date + 1;
+
+    IF v_feeding_count = 0 THEN
+        DELETE FROM public.daily_nutrition_summaries
+        WHERE pet_id = p_pet_id AND date = p_date;
+        RETURN;
+    END IF;
+
+    v_target := nutrition_calorie_target(p_pet_id);
+
+    INSERT INTO public.daily_nutrition_summaries (
+        pet_id, date, total_calories, total_protein, total_fat, total_fiber,
+        feeding_count, average_compatibility, recommendations
+    ) VALUES (
+        p_pet_id, p_date, v_total_calories, v_total_protein, v_total_fat, v_total_fiber,
+        v_feeding_count, nutrition_calorie_score(v_total_calories, v_target),
+        nutrition_calorie_recommendations(v_total_calories, v_target)
+    )
+    ON CONFLICT (pet_id, date) DO UPDATE SET
+        total_calories = EXCLUDED.total_calories,
+        total_protein = EXCLUDED.total_protein,
+        total_fat = EXCLUDED.total_fat,
+        total_fiber = EXCLUDED.total_fiber,
+        feeding_count = EXCLUDED.feeding_count,
+        average_compatibility = EXCLUDED.average_compatibility,
+        recommendations = EXCLUDED.recommendations;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER
+SET search_path = public;
+
+COMMENT ON FUNCTION refresh_daily_nutrition_summary(UUID, DATE) IS
+'Recomputes the daily_nutrition_summaries row for one pet and day from feeding_records; deletes it when the day has no feedings.';
+
+REVOKE EXECUTE ON FUNCTION refresh_daily_nutrition_summary(UUID, DATE) FROM PUBLIC, anon, authenticated;
+
+-- -----------------------------------------------------------------------------
+-- Triggers: every write path keeps the rollup current
+-- -----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION feeding_records_refresh_daily_summary()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM refresh_daily_nutrition_summary(OLD.pet_id, OLD.feeding_time::date);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        IF TG_OP = 'INSERT'
+           OR NEW.pet_id IS DISTINCT FROM OLD.pet_id
+           OR NEW.feeding_time::date IS DISTINCT FROM OLD.feeding_time::date THEN
+            PERFORM refresh_daily_nutrition_summary(NEW.pet_id, NEW.feeding_time::date);
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER
+SET search_path = public;
+
+DROP TRIGGER IF EXISTS refresh_daily_nutrition_summary_on_feeding ON public.feeding_records;
+CREATE TRIGGER refresh_daily_nutrition_summary_on_feeding
+    AFTER INSERT OR UPDATE OR DELETE ON public.feeding_records
+    FOR EACH ROW EXECUTE FUNCTION feeding_records_refresh_daily_summary();
+
+-- Corrected nutrition on an analysis changes every day it was fed on
+CREATE OR REPLACE FUNCTION food_analyses_refresh_daily_summaries()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_day RECORD;
+BEGIN
+    FOR v_day IN
+        SELECT DISTINCT fr.pet_id, fr.feeding_time::date AS day
+        FROM public.feeding_records fr
+        WHERE fr.food_analysis_id = NEW.id
+    LOOP
+        PERFORM refresh_daily_nutrition_summary(v_day.pet_id, v_day.day);
+    END LOOP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER
+SET search_path = public;
+
+DROP TRIGGER IF EXISTS refresh_daily_nutrition_summaries_on_analysis ON public.food_analyses;
+CREATE TRIGGER refresh_daily_nutrition_summaries_on_analysis
+    AFTER UPDATE OF calories_per_100g, protein_percentage, fat_percentage, fiber_percentage
+    ON public.food_analyses
+    FOR EACH ROW EXECUTE FUNCTION food_analyses_refresh_daily_summaries();
+
+-- A changed calorie target re-scores the pet's days without re-aggregating them
+CREATE OR REPLACE FUNCTION rescore_daily_nutrition_summaries(p_pet_id UUID)
+RETURNS VOID AS $$
+DECLARE
+    v_target DECIMAL(10,2) := nutrition_calorie_target(p_pet_id);
+BEGIN
+    UPDATE public.daily_nutrition_summaries
+    SET average_compatibility = nutrition_calorie_score(total_calories, v_target),
+        recommendations = nutrition_calorie_recommendations(total_calories, v_target)
+    WHERE pet_id = p_pet_id;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER
+SET search_path = public;
+
+-- Goals and requirements both feed the target: a new, changed or deleted row
+-- re-scores the pet (a deleted goal falls back to the requirements)
+CREATE OR REPLACE FUNCTION calorie_target_rescore_daily_summaries()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM rescore_daily_nutrition_summaries(OLD.pet_id);
+    END IF;
+    IF TG_OP = 'INSERT'
+       OR (TG_OP = 'UPDATE' AND NEW.pet_id IS DISTINCT FROM OLD.pet_id) THEN
+        PERFORM rescore_daily_nutrition_summaries(NEW.pet_id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER
+SET search_path = public;
+
+DROP TRIGGER IF EXISTS rescore_daily_nutrition_summaries_on_goal ON public.calorie_goals;
+CREATE TRIGGER rescore_daily_nutrition_summaries_on_goal
+    AFTER INSERT OR UPDATE OF daily_calories, pet_id OR DELETE ON public.calorie_goals
+    FOR EACH ROW EXECUTE FUNCTION calorie_target_rescore_daily_summaries();
+
+DROP TRIGGER IF EXISTS rescore_daily_nutrition_summaries_on_requirements ON public.nutritional_requirements;
+CREATE TRIGGER rescore_daily_nutrition_summaries_on_requirements
+    AFTER INSERT OR UPDATE OF daily_calories, pet_id OR DELETE ON public.nutritional_requirements
+    FOR EACH ROW EXECUTE FUNCTION calorie_target_rescore_daily_summaries();
+
+DROP FUNCTION IF EXISTS calorie_goals_rescore_daily_summaries();
+
+REVOKE EXECUTE ON FUNCTION feeding_records_refresh_daily_summary() FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION food_analyses_refresh_daily_summaries() FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION rescore_daily_nutrition_summaries(UUID) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION calorie_target_rescore_daily_summaries() FROM PUBLIC, anon, authenticated;
+
+-- -----------------------------------------------------------------------------
+-- Weekly rollup (reads the daily rows, RLS applies through security_invoker)
+-- -----------------------------------------------------------------------------
+CREATE OR REPLACE VIEW public.weekly_nutrition_summaries
+WITH (security_invoker = true) AS
+SELECT
+    pet_id,
+    date_trunc('week', date)::date AS week_start,
+    (date_trunc('week', date)::date + 6) AS week_end,
+    COUNT(*)::INTEGER AS days_logged,
+    SUM(total_calories) AS total_calories,
+    ROUND(AVG(total_calories), 2) AS average_daily_calories,
+    SUM(total_protein) AS total_protein,
+    SUM(total_fat) AS total_fat,
+    SUM(total_fiber) AS total_fiber,
+    SUM(feeding_count)::INTEGER AS feeding_count,
+    ROUND(AVG(average_compatibility), 2) AS average_compatibility
+FROM public.daily_nutrition_summaries
+GROUP BY pet_id, date_trunc('week', date);
+
 -- Insert initial ingredient data
 INSERT INTO public.ingredients (name, aliases, safety_level, species_compatibility, description, common_allergen) VALUES
 ('chicken', ARRAY['chicken meat', 'chicken breast', 'chicken thigh'], 'caution', 'both', 'Common protein source, but frequent allergen', true),
@@ -1348,6 +1689,340 @@ INSERT INTO public.ingredients (name, aliases, safety_level, species_compatibili
 ('salmon', ARRAY['salmon meal', 'salmon oil'], 'safe', 'both', 'High-quality protein and omega-3 fatty acids', false)
 ON CONFLICT (name) DO NOTHING;
 
+-- =============================================================================
+-- SCHEDULED NOTIFICATIONS (Durable push notification queue)
+-- =============================================================================
+
+-- Delayed and engagement notifications, claimed in send_at order by the
+-- API's notification worker (see NotificationScheduler)
+CREATE TABLE IF NOT EXISTS public.scheduled_notifications (
+    id UUID DEFAULT uuid_generate_v4() PRIMARY KEY,
+    user_id UUID REFERENCES public.users(id) ON DELETE CASCADE,
+    device_token TEXT NOT NULL,
+    payload JSONB NOT NULL,
+    send_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    -- Scheduling again with the same key replaces the pending notification
+    dedupe_key TEXT,
+    status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'sent', 'failed', 'cancelled')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    locked_until TIMESTAMP WITH TIME ZONE,
+    last_error TEXT,
+    sent_at TIMESTAMP WITH TIME ZONE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- The worker's claim query walks this index in send_at order
+CREATE INDEX IF NOT EXISTS idx_scheduled_notifications_due
+    ON public.scheduled_notifications(send_at)
+    WHERE status = 'pending';
+CREATE UNIQUE INDEX IF NOT EXISTS uq_scheduled_notifications_dedupe_key
+    ON public.scheduled_notifications(dedupe_key)
+    WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_scheduled_notifications_user_pending
+    ON public.scheduled_notifications(user_id)
+    WHERE status = 'pending';
+
+DROP TRIGGER IF EXISTS update_scheduled_notifications_updated_at ON public.scheduled_notifications;
+CREATE TRIGGER update_scheduled_notifications_updated_at
+    BEFORE UPDATE ON public.scheduled_notifications
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- Only the backend (service role) reads or writes the queue
+ALTER TABLE public.scheduled_notifications ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Allow service role full access" ON public.scheduled_notifications;
+CREATE POLICY "Allow service role full access"
+    ON public.scheduled_notifications
+    FOR ALL
+    TO service_role
+    USING (true)
+    WITH CHECK (true);
+
+-- -----------------------------------------------------------------------------
+-- Enqueue notifications; a pending row with the same dedupe_key is replaced
+-- Replacing a claimed row clears its lease, so the worker sending the old
+-- notification cannot record its outcome over the new one
+-- p_notifications: [{user_id, device_token, payload, send_at, dedupe_key}, ...]
+-- -----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION schedule_notifications(p_notifications JSONB)
+RETURNS SETOF UUID AS $$
+    INSERT INTO public.scheduled_notifications (user_id, device_token, payload, send_at, dedupe_key)
+    SELECT
+        (n->>'user_id')::UUID,
+        n->>'device_token',
+        n->'payload',
+        (n->>'send_at')::TIMESTAMPTZ,
+        n->>'dedupe_key'
+    FROM jsonb_array_elements(p_notifications) AS n
+    ON CONFLICT (dedupe_key) WHERE status = 'pending'
+    DO UPDATE SET
+        user_id = EXCLUDED.user_id,
+        device_token = EXCLUDED.device_token,
+        payload = EXCLUDED.payload,
+        send_at = EXCLUDED.send_at,
+        attempts = 0,
+        locked_until = NULL,
+        last_error = NULL
+    RETURNING id;
+$$ LANGUAGE sql SECURITY DEFINER
+SET search_path = public, pg_temp;
+
+-- Backend (service role) only
+REVOKE EXECUTE ON FUNCTION schedule_notifications(JSONB) FROM PUBLIC, anon, authenticated;
+
+-- -----------------------------------------------------------------------------
+-- Claim up to p_limit due notifications for p_lease_seconds
+-- Rows locked by another worker are skipped rather than waited on. A row
+-- whose lease ran out after p_max_attempts claims (the worker died before
+-- recording an outcome) is marked failed instead of being claimed again.
+-- locked_until is returned as the claim's lease: outcomes are only recorded
+-- on rows still holding it.
+-- -----------------------------------------------------------------------------
+DROP FUNCTION IF EXISTS claim_due_notifications(INTEGER, INTEGER);
+CREATE OR REPLACE FUNCTION claim_due_notifications(
+    p_limit INTEGER,
+    p_lease_seconds INTEGER,
+    p_max_attempts INTEGER
+)
+RETURNS TABLE (id UUID, device_token TEXT, payload JSONB, attempts INTEGER, locked_until TIMESTAMPTZ) AS $$
+    WITH exhausted AS (
+        UPDATE public.scheduled_notifications sn
+        SET status = 'failed',
+            locked_until = NULL,
+            last_error = COALESCE(sn.last_error, 'LeaseExpired')
+        WHERE sn.status = 'pending'
+        AND sn.send_at <= NOW()
+        AND sn.locked_until < NOW()
+        AND sn.attempts >= p_max_attempts
+    )
+    UPDATE public.scheduled_notifications sn
+    SET locked_until = NOW() + make_interval(secs => p_lease_seconds),
+        attempts = sn.attempts + 1
+    WHERE sn.id IN (
+        SELECT due.id
+        FROM public.scheduled_notifications due
+        WHERE due.status = 'pending'
+        AND due.send_at <= NOW()
+        AND (due.locked_until IS NULL OR due.locked_until < NOW())
+        AND due.attempts < p_max_attempts
+        ORDER BY due.send_at
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING sn.id, sn.device_token, sn.payload, sn.attempts, sn.locked_until;
+$$ LANGUAGE sql SECURITY DEFINER
+SET search_path = public, pg_temp;
+
+-- Backend (service role) only
+REVOKE EXECUTE ON FUNCTION claim_due_notifications(INTEGER, INTEGER, INTEGER) FROM PUBLIC, anon, authenticated;
+
+-- =============================================================================
+-- MEDICATION REMINDER DISPATCH
+-- =============================================================================
+
+-- -----------------------------------------------------------------------------
+-- Claim up to p_limit due reminders for p_lease_seconds, with what the
+-- notification needs (pet name, the owner's device token)
+-- -----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION claim_due_medication_reminders(p_limit INTEGER, p_lease_seconds INTEGER)
+RETURNS TABLE (
+    id UUID,
+    pet_id UUID,
+    medication_name TEXT,
+    dosage TEXT,
+    frequency TEXT,
+    reminder_times JSONB,
+    start_date TIMESTAMP WITH TIME ZONE,
+    end_date TIMESTAMP WITH TIME ZONE,
+    timezone TEXT,
+    next_fire_at TIMESTAMP WITH TIME ZONE,
+    pet_name TEXT,
+    device_token TEXT
+) AS $$
+    WITH claimed AS (
+        UPDATE public.medication_reminders mr
+        SET locked_until = NOW() + make_interval(secs => p_lease_seconds)
+        WHERE mr.id IN (
+            SELECT due.id
+            FROM public.medication_reminders due
+            WHERE due.is_active = TRUE
+            AND due.timezone IS NOT NULL
+            AND due.next_fire_at <= NOW()
+            AND (due.locked_until IS NULL OR due.locked_until < NOW())
+            ORDER BY due.next_fire_at
+            LIMIT p_limit
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING mr.*
+    )
+    SELECT
+        c.id, c.pet_id, c.medication_name, c.dosage, c.frequency, c.reminder_times,
+        c.start_date, c.end_date, c.timezone, c.next_fire_at,
+        p.name, u.device_token
+    FROM claimed c
+    JOIN public.pets p ON p.id = c.pet_id
+    JOIN public.users u ON u.id = c.user_id;
+$$ LANGUAGE sql SECURITY DEFINER
+SET search_path = public, pg_temp;
+
+-- Backend (service role) only
+REVOKE EXECUTE ON FUNCTION claim_due_medication_reminders(INTEGER, INTEGER) FROM PUBLIC, anon, authenticated;
+
+-- -----------------------------------------------------------------------------
+-- Move claimed reminders to their next dose and release them
+-- p_updates: [{id, fired_at, next_fire_at, sent}, ...]
+-- A reminder edited while it was claimed keeps the next_fire_at of the edit
+-- -----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION advance_medication_reminders(p_updates JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+    updated_count INTEGER;
+BEGIN
+    UPDATE public.medication_reminders mr
+    SET next_fire_at = CASE
+            WHEN mr.next_fire_at = (u->>'fired_at')::TIMESTAMPTZ THEN (u->>'next_fire_at')::TIMESTAMPTZ
+            ELSE mr.next_fire_at
+        END,
+        last_fired_at = CASE
+            WHEN (u->>'sent')::BOOLEAN THEN (u->>'fired_at')::TIMESTAMPTZ
+            ELSE mr.last_fired_at
+        END,
+        locked_until = NULL
+    FROM jsonb_array_elements(p_updates) AS u
+    WHERE mr.id = (u->>'id')::UUID;
+
+    GET DIAGNOSTICS updated_count = ROW_COUNT;
+    RETURN updated_count;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER
+SET search_path = public, pg_temp;
+
+-- Backend (service role) only
+REVOKE EXECUTE ON FUNCTION advance_medication_reminders(JSONB) FROM PUBLIC, anon, authenticated;
+
+-- =============================================================================
+-- GDPR DELETION JOBS AND RETENTION SWEEP CHECKPOINTS
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS public.gdpr_deletion_jobs (
+    -- No foreign key: the job outlives the user it deletes
+    user_id UUID PRIMARY KEY,
+    status TEXT NOT NULL DEFAULT 'running' CHECK (status IN ('running', 'failed', 'completed')),
+    completed_steps TEXT[] NOT NULL DEFAULT '{}',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_gdpr_deletion_jobs_incomplete
+    ON public.gdpr_deletion_jobs(updated_at)
+    WHERE status <> 'completed';
+
+DROP TRIGGER IF EXISTS update_gdpr_deletion_jobs_updated_at ON public.gdpr_deletion_jobs;
+CREATE TRIGGER update_gdpr_deletion_jobs_updated_at
+    BEFORE UPDATE ON public.gdpr_deletion_jobs
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+CREATE TABLE IF NOT EXISTS public.gdpr_job_checkpoints (
+    name TEXT PRIMARY KEY,
+    cursor TEXT,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Users the retention sweep failed to anonymize, retried with later batches
+CREATE TABLE IF NOT EXISTS public.gdpr_retention_failures (
+    user_id UUID PRIMARY KEY,
+    attempts INTEGER NOT NULL DEFAULT 1,
+    last_error TEXT,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_gdpr_retention_failures_retry
+    ON public.gdpr_retention_failures(updated_at);
+
+-- The retention sweep pages users by (created_at, id)
+CREATE INDEX IF NOT EXISTS idx_users_created_id ON public.users(created_at, id);
+
+-- Only the backend (service role) reads or writes these tables
+ALTER TABLE public.gdpr_deletion_jobs ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.gdpr_job_checkpoints ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.gdpr_retention_failures ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Allow service role full access" ON public.gdpr_deletion_jobs;
+CREATE POLICY "Allow service role full access"
+    ON public.gdpr_deletion_jobs
+    FOR ALL
+    TO service_role
+    USING (true)
+    WITH CHECK (true);
+
+DROP POLICY IF EXISTS "Allow service role full access" ON public.gdpr_job_checkpoints;
+CREATE POLICY "Allow service role full access"
+    ON public.gdpr_job_checkpoints
+    FOR ALL
+    TO service_role
+    USING (true)
+    WITH CHECK (true);
+
+DROP POLICY IF EXISTS "Allow service role full access" ON public.gdpr_retention_failures;
+CREATE POLICY "Allow service role full access"
+    ON public.gdpr_retention_failures
+    FOR ALL
+    TO service_role
+    USING (true)
+    WITH CHECK (true);
+
+-- -----------------------------------------------------------------------------
+-- Start (or resume) a user's deletion; returns the steps already completed
+-- -----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION start_gdpr_deletion(p_user_id UUID)
+RETURNS TEXT[] AS $$
+    INSERT INTO public.gdpr_deletion_jobs (user_id, status, attempts)
+    VALUES (p_user_id, 'running', 1)
+    ON CONFLICT (user_id) DO UPDATE
+    SET status = 'running',
+        attempts = gdpr_deletion_jobs.attempts + 1,
+        last_error = NULL
+    RETURNING completed_steps;
+$$ LANGUAGE sql SECURITY DEFINER
+SET search_path = public, pg_temp;
+
+-- Backend (service role) only
+REVOKE EXECUTE ON FUNCTION start_gdpr_deletion(UUID) FROM PUBLIC, anon, authenticated;
+
+-- -----------------------------------------------------------------------------
+-- Record one completed step; steps of a phase finish concurrently
+-- -----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION complete_gdpr_deletion_step(p_user_id UUID, p_step TEXT)
+RETURNS VOID AS $$
+    UPDATE public.gdpr_deletion_jobs
+    SET completed_steps = array_append(completed_steps, p_step)
+    WHERE user_id = p_user_id
+    AND NOT (p_step = ANY(completed_steps));
+$$ LANGUAGE sql SECURITY DEFINER
+SET search_path = public, pg_temp;
+
+-- Backend (service role) only
+REVOKE EXECUTE ON FUNCTION complete_gdpr_deletion_step(UUID, TEXT) FROM PUBLIC, anon, authenticated;
+
+-- =============================================================================
+-- CATALOG SYNC STATE
+-- =============================================================================
+
+-- Watermark of the last complete sync per source: the newest last_modified_t
+-- read by a run that finished without errors. --since auto starts from it,
+-- so products of an interrupted run are picked up again by the next one.
+CREATE TABLE IF NOT EXISTS public.catalog_sync_state (
+    external_source TEXT PRIMARY KEY,
+    synced_through TIMESTAMP WITH TIME ZONE NOT NULL,
+    completed_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Written by importing/sync_catalog.py over a direct connection; no API access
+ALTER TABLE public.catalog_sync_state ENABLE ROW LEVEL SECURITY;
+
 -- =============================================================================
 -- SUCCESS MESSAGE
 -- =============================================================================
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark Product Extraction
+Measures throughput (products per second) of the shared OpenPetFoodFacts
+extraction module, per product and in batches.
+
+Usage:
+    python3 benchmark_extraction.py [file_path] [--limit N] [--batch-size N] [--repeat N]
+
+Without a JSONL file, a synthetic sample of products is generated.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add the server directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.shared.utils.product_extraction import (
+    extract_nutritional_info, extract_nutritional_info_batch,
+    extract_product, extract_products_batch
+)
+
+def load_products(file_path, limit):
+    """Load up to limit products from a JSONL file."""
+    products = []
+    with open(file_path, 'r', encoding='utf-8') as file:
+        for line in file:
+            if not line.strip():
+                continue
+            try:
+                products.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+            if len(products) >= limit:
+                break
+    return products
+
+def synthetic_products(count, seed=42):
+    """Generate products shaped like the OpenPetFoodFacts export."""
+    rng = random.Random(seed)
+    species = ['dog', 'cat', 'chien', 'chat']
+    stages = ['puppy', 'kitten', 'adult', 'senior', '']
+    kinds = ['dry', 'wet', 'treats', 'supplements']
+    products = []
+    for i in range(count):
+        animal = rng.choice(species)
+        nutriments = {
+            'energy-kcal_100g': rng.uniform(250, 450),
+            'proteins_100g': rng.uniform(5, 40),
+            'fat_100g': str(round(rng.uniform(3, 25), 1)),
+            'fiber_100g': f"{rng.uniform(0.5, 6):.1f} %",
+            'water_100g': rng.uniform(6, 82),
+            'ash_100g': rng.choice([None, '', rng.uniform(1, 10)]),
+            'sodium_100g': f"{rng.uniform(0, 1):.2f}".replace('.', ','),
+        }
+        products.append({
+            '_id': f'{3000000000000 + i}',
+            'code': f'{3000000000000 + i}',
+            'product_name': f'{rng.choice(stages)} {animal} food {i}'.strip(),
+            'brands': f'Brand {i % 97}',
+            'lang': 'en',
+            'countries': 'France',
+            'categories': f'Pet food, {animal.title()} food',
+            'categories_tags': [f'en:{animal}-food', f'en:{rng.choice(kinds)}-{animal}-food'],
+            '_keywords': [animal, 'food', rng.choice(stages)],
+            'ingredients_text': 'chicken, rice; corn, beet pulp, fish oil, vitamins, minerals',
+            'allergens_tags': ['en:fish'] if i % 3 else [],
+            'additives_tags': ['en:e306', 'en:e321'],
+            'vitamins_tags': ['en:vitamin-a', 'en:vitamin-d3'],
+            'minerals_tags': ['en:zinc-sulphate'],
+            'nutriments': nutriments,
+            'nutrient_levels': {'fat': 'moderate'},
+            'last_modified_t': 1700000000 + i,
+            'images': {'front_en': {}, 'ingredients_en': {}},
+        })
+    return products
+
+def measure(label, func, products, repeat):
+    """Run func over products repeat times and report the best throughput."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(products)
+        best = min(best, time.perf_counter() - start)
+    rate = len(products) / best if best > 0 else float('inf')
+    print(f"   {label:<38} {rate:>12,.0f} products/sec  ({best * 1000:.1f} ms)")
+    return rate
+
+def in_batches(func, batch_size):
+    """Apply a batch function over products in chunks of batch_size."""
+    def run(products):
+        for start in range(0, len(products), batch_size):
+            func(products[start:start + batch_size])
+    return run
+
+def main():
+    """Main function to run the benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmark OpenPetFoodFacts product extraction')
+    parser.add_argument('file_path', nargs='?', default='openpetfoodfacts-products.jsonl')
+    parser.add_argument('--limit', '-l', type=int, default=20000, help='Number of products to benchmark')
+    parser.add_argument('--batch-size', '-b', type=int, default=500, help='Products per batch')
+    parser.add_argument('--repeat', '-r', type=int, default=3, help='Runs per measurement (best is reported)')
+    args = parser.parse_args()
+
+    if Path(args.file_path).exists():
+        print(f"📁 Loading up to {args.limit:,} products from {args.file_path}")
+        products = load_products(args.file_path, args.limit)
+    else:
+        print(f"🧪 {args.file_path} not found, using {args.limit:,} synthetic products")
+        products = synthetic_products(args.limit)
+
+    if not products:
+        print("❌ No products to benchmark")
+        sys.exit(1)
+
+    print(f"\n⏱️  Extraction throughput ({len(products):,} products, batch size {args.batch_size}):")
+    measure('extract_product (per product)', lambda ps: [extract_product(p) for p in ps], products, args.repeat)
+    measure('extract_products_batch', in_batches(extract_products_batch, args.batch_size), products, args.repeat)
+    measure('extract_nutritional_info (per product)', lambda ps: [extract_nutritional_info(p) for p in ps], products, args.repeat)
+    measure('extract_nutritional_info_batch', in_batches(extract_nutritional_info_batch, args.batch_size), products, args.repeat)
+
+if __name__ == '__main__':
+    main()
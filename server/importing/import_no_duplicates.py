@@ -4,14 +4,13 @@ Import OpenPetFoodFacts Data Without Duplicates
 Checks existing data and only imports new records.
 
 Usage:
-    python3 import_no_duplicates.py [--dry-run] [--resume-from N]
+    python3 import_no_duplicates.py [--dry-run] [--resume-from N] [--batch-size N]
 """
 
 import json
 import sys
 import logging
 import time
-import re
 import os
 from pathlib import Path
 from datetime import datetime
@@ -22,6 +21,12 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+# Add the server directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.shared.utils.data_quality_scoring import DataQualityService
+from app.shared.utils.product_extraction import extract_products_batch
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -45,397 +50,22 @@ def get_existing_external_ids(conn):
     cursor.close()
     return existing_ids
 
-def safe_float(value):
-    """Safely convert a value to float."""
-    if value is None:
-        return None
-    try:
-        if isinstance(value, str):
-            cleaned = re.sub(r'[^\d.,\-]', '', value.strip())
-            if not cleaned:
-                return None
-            cleaned = cleaned.replace(',', '.')
-            return float(cleaned)
-        return float(value)
-    except (ValueError, TypeError):
-        return None
-
-def extract_species_info(product):
-    """Extract species and life stage information."""
-    species = 'unknown'
-    life_stage = 'unknown'
-    
-    categories = product.get('categories_tags', [])
-    categories_hierarchy = product.get('categories_hierarchy', [])
-    
-    for category in categories + categories_hierarchy:
-        if isinstance(category, str):
-            category_lower = category.lower()
-            if 'dog' in category_lower or 'chien' in category_lower:
-                species = 'dog'
-            elif 'cat' in category_lower or 'chat' in category_lower:
-                species = 'cat'
-            
-            if any(stage in category_lower for stage in ['puppy', 'puppies', 'chiot']):
-                life_stage = 'puppy'
-            elif any(stage in category_lower for stage in ['kitten', 'kittens', 'chaton']):
-                life_stage = 'kitten'
-            elif any(stage in category_lower for stage in ['adult', 'adulte']):
-                life_stage = 'adult'
-            elif any(stage in category_lower for stage in ['senior', 'sénior', 'senior']):
-                life_stage = 'senior'
-    
-    # Check product name and keywords
-    product_name = (product.get('product_name', '') + ' ' + 
-                   product.get('product_name_en', '') + ' ' + 
-                   product.get('product_name_fr', '')).lower()
-    
-    keywords = product.get('_keywords', [])
-    if isinstance(keywords, list):
-        keyword_text = ' '.join(keywords).lower()
-    else:
-        keyword_text = str(keywords).lower()
-    
-    combined_text = f"{product_name} {keyword_text}"
-    
-    if 'dog' in combined_text or 'chien' in combined_text or 'canine' in combined_text:
-        species = 'dog'
-    elif 'cat' in combined_text or 'chat' in combined_text or 'feline' in combined_text:
-        species = 'cat'
-    
-    if any(stage in combined_text for stage in ['puppy', 'puppies', 'chiot']):
-        life_stage = 'puppy'
-    elif any(stage in combined_text for stage in ['kitten', 'kittens', 'chaton']):
-        life_stage = 'kitten'
-    elif any(stage in combined_text for stage in ['adult', 'adulte']):
-        life_stage = 'adult'
-    elif any(stage in combined_text for stage in ['senior', 'sénior', 'senior']):
-        life_stage = 'senior'
-    
-    return species, life_stage
-
-def extract_product_type(product):
-    """Extract product type."""
-    categories = product.get('categories_tags', [])
-    categories_hierarchy = product.get('categories_hierarchy', [])
-    
-    for category in categories + categories_hierarchy:
-        if isinstance(category, str):
-            category_lower = category.lower()
-            if any(dry in category_lower for dry in ['dry', 'croquette', 'kibble']):
-                return 'dry'
-            elif any(wet in category_lower for wet in ['wet', 'pate', 'mousse', 'sauce']):
-                return 'wet'
-            elif any(treat in category_lower for treat in ['treat', 'reward', 'snack', 'friandise']):
-                return 'treat'
-            elif any(supp in category_lower for supp in ['supplement', 'vitamin', 'supplément']):
-                return 'supplement'
-    
-    return 'unknown'
-
-def extract_ingredients(product):
-    """Extract ingredients list."""
-    ingredients = []
-    
-    ingredient_fields = [
-        'ingredients_text',
-        'ingredients_text_en',
-        'ingredients_text_fr',
-        'ingredients'
-    ]
-    
-    for field in ingredient_fields:
-        ingredient_text = product.get(field)
-        if ingredient_text and isinstance(ingredient_text, str):
-            ingredient_list = re.split(r'[,;]', ingredient_text)
-            for ingredient in ingredient_list:
-                cleaned = ingredient.strip()
-                if cleaned and len(cleaned) > 1:
-                    ingredients.append(cleaned)
-            break
-    
-    # Remove duplicates
-    seen = set()
-    unique_ingredients = []
-    for ingredient in ingredients:
-        if ingredient.lower() not in seen:
-            seen.add(ingredient.lower())
-            unique_ingredients.append(ingredient)
-            
-    return unique_ingredients[:20]
-
-def extract_allergens(product):
-    """Extract allergens list."""
-    allergens = []
-    
-    allergens_text = product.get('allergens', '')
-    if allergens_text and isinstance(allergens_text, str):
-        allergen_list = re.split(r'[,;]', allergens_text)
-        for allergen in allergen_list:
-            cleaned = allergen.strip()
-            if cleaned:
-                allergens.append(cleaned)
-    
-    allergens_tags = product.get('allergens_tags', [])
-    if isinstance(allergens_tags, list):
-        for tag in allergens_tags:
-            if isinstance(tag, str) and tag.startswith('en:'):
-                allergen_name = tag[3:].replace('-', ' ').title()
-                if allergen_name not in allergens:
-                    allergens.append(allergen_name)
-    
-    return allergens[:10]
-
-def extract_additives(product):
-    """Extract food additives from product data."""
-    additives = []
-    
-    # Check additives_tags
-    additives_tags = product.get('additives_tags', [])
-    if isinstance(additives_tags, list):
-        for tag in additives_tags:
-            if isinstance(tag, str) and tag.startswith('en:'):
-                additive_name = tag[3:].replace('-', ' ').title()
-                if additive_name not in additives:
-                    additives.append(additive_name)
-    
-    return additives[:20]
-
-def extract_vitamins(product):
-    """Extract vitamins from product data."""
-    vitamins = []
-    
-    # Check vitamins_tags
-    vitamins_tags = product.get('vitamins_tags', [])
-    if isinstance(vitamins_tags, list):
-        for tag in vitamins_tags:
-            if isinstance(tag, str) and tag.startswith('en:'):
-                vitamin_name = tag[3:].replace('-', ' ').title()
-                if vitamin_name not in vitamins:
-                    vitamins.append(vitamin_name)
-    
-    return vitamins[:20]
-
-def extract_minerals(product):
-    """Extract minerals from product data."""
-    minerals = []
-    
-    # Check minerals_tags
-    minerals_tags = product.get('minerals_tags', [])
-    if isinstance(minerals_tags, list):
-        for tag in minerals_tags:
-            if isinstance(tag, str) and tag.startswith('en:'):
-                mineral_name = tag[3:].replace('-', ' ').title()
-                if mineral_name not in minerals:
-                    minerals.append(mineral_name)
-    
-    return minerals[:20]
-
-def calculate_data_completeness(product):
-    """Calculate data completeness score."""
-    score = 0.0
-    
-    if product.get('product_name'):
-        score += 0.1
-    if product.get('brands'):
-        score += 0.1
-    if product.get('code'):
-        score += 0.1
-        
-    nutriments = product.get('nutriments', {})
-    if nutriments:
-        nutritional_fields = [
-            'energy-kcal_100g', 'proteins_100g', 'fat_100g',
-            'fiber_100g', 'water_100g', 'ash_100g'
-        ]
-        available_fields = sum(1 for field in nutritional_fields if nutriments.get(field))
-        score += (available_fields / len(nutritional_fields)) * 0.4
-        
-    if product.get('ingredients_text') or product.get('ingredients'):
-        score += 0.2
-        
-    images = product.get('images', {})
-    if images:
-        image_count = len([k for k in images.keys() if k not in ['1', '2', '3', '4', '5']])
-        score += min(image_count / 3, 1.0) * 0.1
-        
-    return min(score, 1.0)
-
-def extract_comprehensive_data(product):
-    """Extract comprehensive product data."""
-    try:
-        name = product.get('product_name') or product.get('product_name_en') or product.get('product_name_fr')
-        if not name or len(name.strip()) < 2:
-            return None
-            
-        brand = product.get('brands') or product.get('brands_old')
-        barcode = product.get('code') or product.get('_id')
-        
-        species, life_stage = extract_species_info(product)
-        product_type = extract_product_type(product)
-        
-        # Extract nutritional data - all 22 fields
-        nutriments = product.get('nutriments', {})
-        
-        # Core nutritional values (10 fields)
-        calories = safe_float(nutriments.get('energy-kcal_100g') or nutriments.get('energy_100g'))
-        protein = safe_float(nutriments.get('proteins_100g'))
-        fat = safe_float(nutriments.get('fat_100g'))
-        fiber = safe_float(nutriments.get('fiber_100g'))
-        moisture = safe_float(nutriments.get('water_100g'))
-        ash = safe_float(nutriments.get('ash_100g'))
-        carbohydrates = safe_float(nutriments.get('carbohydrates_100g'))
-        sugars = safe_float(nutriments.get('sugars_100g'))
-        saturated_fat = safe_float(nutriments.get('saturated-fat_100g'))
-        sodium = safe_float(nutriments.get('sodium_100g'))
-        
-        # Extract arrays (5 fields)
-        ingredients = extract_ingredients(product)
-        allergens = extract_allergens(product)
-        additives = extract_additives(product)
-        vitamins = extract_vitamins(product)
-        minerals = extract_minerals(product)
-        
-        country = product.get('countries', '')
-        language = product.get('lang', 'en')
-        keywords = product.get('_keywords', [])
-        categories_hierarchy = product.get('categories_hierarchy', [])
-        brands_hierarchy = product.get('brands_hierarchy', [])
-        allergens_hierarchy = product.get('allergens_hierarchy', [])
-        
-        completeness = calculate_data_completeness(product)
-        
-        # Validate and clean data
-        category = extract_category(product)
-        if category and len(category) > 50:
-            category = category[:50]
-        
-        return {
-            'name': name.strip()[:200],
-            'brand': brand[:100] if brand else None,
-            'barcode': barcode[:50] if barcode else None,
-            'category': category,
-            'description': None,
-            'species': species,
-            'life_stage': life_stage,
-            'product_type': product_type,
-            'country': country[:100] if country else None,
-            'language': language[:10] if language else 'en',
-            # Core nutritional values (10 fields)
-            'calories_per_100g': calories,
-            'protein_percentage': protein,
-            'fat_percentage': fat,
-            'fiber_percentage': fiber,
-            'moisture_percentage': moisture,
-            'ash_percentage': ash,
-            'carbohydrates_percentage': carbohydrates,
-            'sugars_percentage': sugars,
-            'saturated_fat_percentage': saturated_fat,
-            'sodium_percentage': sodium,
-            # Arrays (5 fields)
-            'ingredients': ingredients,
-            'allergens': allergens,
-            'additives': additives,
-            'vitamins': vitamins,
-            'minerals': minerals,
-            # Metadata
-            'keywords': keywords,
-            'categories_hierarchy': categories_hierarchy,
-            'brands_hierarchy': brands_hierarchy,
-            'allergens_hierarchy': allergens_hierarchy,
-            'data_completeness': completeness,
-            'external_source': 'openpetfoodfacts',
-            'external_id': product.get('_id')
-        }
-        
-    except Exception as e:
-        logger.warning(f"Error extracting product data: {e}")
-        return None
-
-def extract_category(product):
-    """Extract category from product data with validation."""
-    categories = product.get('categories', '')
-    if categories:
-        category_parts = categories.split(',')
-        if category_parts:
-            category = category_parts[0].strip()
-            # Clean and validate category
-            if category and len(category) <= 50:
-                return category
-    
-    categories_tags = product.get('categories_tags', [])
-    if categories_tags and isinstance(categories_tags, list):
-        for tag in categories_tags:
-            if isinstance(tag, str) and tag.startswith('en:'):
-                category = tag[3:].replace('-', ' ').title()
-                # Clean and validate category
-                if category and len(category) <= 50:
-                    return category
-    
-    # Try to extract from product name or other fields
-    product_name = product.get('product_name', '') or product.get('product_name_en', '') or product.get('product_name_fr', '')
-    if product_name:
-        # Simple category extraction from product name
-        name_lower = product_name.lower()
-        if any(word in name_lower for word in ['dog', 'chien', 'canine']):
-            return 'Dog Food'
-        elif any(word in name_lower for word in ['cat', 'chat', 'feline']):
-            return 'Cat Food'
-        elif any(word in name_lower for word in ['treat', 'reward', 'snack']):
-            return 'Pet Treats'
-        elif any(word in name_lower for word in ['supplement', 'vitamin']):
-            return 'Pet Supplements'
-    
-    return None
-
 def insert_food_item(conn, product_data, dry_run=False):
     """Insert a single food item into the database."""
     try:
         if dry_run:
             return True
         
-        # Prepare nutritional info JSONB - all 22 fields
-        nutritional_info = {}
+        # Standardized nutritional info JSONB - all 22 fields
+        nutritional_info = product_data['nutritional_info']
         
-        # Core nutritional values (10 fields)
-        if product_data['calories_per_100g'] is not None:
-            nutritional_info['calories_per_100g'] = product_data['calories_per_100g']
-        if product_data['protein_percentage'] is not None:
-            nutritional_info['protein_percentage'] = product_data['protein_percentage']
-        if product_data['fat_percentage'] is not None:
-            nutritional_info['fat_percentage'] = product_data['fat_percentage']
-        if product_data['fiber_percentage'] is not None:
-            nutritional_info['fiber_percentage'] = product_data['fiber_percentage']
-        if product_data['moisture_percentage'] is not None:
-            nutritional_info['moisture_percentage'] = product_data['moisture_percentage']
-        if product_data['ash_percentage'] is not None:
-            nutritional_info['ash_percentage'] = product_data['ash_percentage']
-        if product_data['carbohydrates_percentage'] is not None:
-            nutritional_info['carbohydrates_percentage'] = product_data['carbohydrates_percentage']
-        if product_data['sugars_percentage'] is not None:
-            nutritional_info['sugars_percentage'] = product_data['sugars_percentage']
-        if product_data['saturated_fat_percentage'] is not None:
-            nutritional_info['saturated_fat_percentage'] = product_data['saturated_fat_percentage']
-        if product_data['sodium_percentage'] is not None:
-            nutritional_info['sodium_percentage'] = product_data['sodium_percentage']
-        
-        # Arrays (5 fields) - always include, even if empty
-        nutritional_info['ingredients'] = product_data.get('ingredients', [])
-        nutritional_info['allergens'] = product_data.get('allergens', [])
-        nutritional_info['additives'] = product_data.get('additives', [])
-        nutritional_info['vitamins'] = product_data.get('vitamins', [])
-        nutritional_info['minerals'] = product_data.get('minerals', [])
-        
-        # Metadata (4 fields)
-        nutritional_info['source'] = 'openpetfoodfacts'
-        nutritional_info['external_id'] = product_data['external_id']
-        nutritional_info['data_quality_score'] = product_data['data_completeness']
-        nutritional_info['last_updated'] = product_data.get('last_updated', '')
-        
-        # Objects (3 fields) - always include, even if empty
-        nutritional_info['nutrient_levels'] = product_data.get('nutrient_levels', {})
-        nutritional_info['packaging_info'] = product_data.get('packaging_info', {})
-        nutritional_info['manufacturing_info'] = product_data.get('manufacturing_info', {})
+        # Materialized quality score, kept in step with nutritional_info
+        quality = DataQualityService.quality_columns({
+            'name': product_data['name'],
+            'brand': product_data['brand'],
+            'barcode': product_data['barcode'],
+            'nutritional_info': nutritional_info
+        })
         
         cursor = conn.cursor()
         
@@ -444,11 +74,13 @@ def insert_food_item(conn, product_data, dry_run=False):
             name, brand, barcode, category, description, nutritional_info,
             species, life_stage, product_type, country, language,
             data_completeness, external_source, external_id,
-            keywords, categories_hierarchy, brands_hierarchy, allergens_hierarchy
+            keywords, categories_hierarchy, brands_hierarchy, allergens_hierarchy,
+            quality_score, quality_level, quality_version, quality_scored_at
         ) VALUES (
             %s, %s, %s, %s, %s, %s,
             %s, %s, %s, %s, %s,
             %s, %s, %s,
+            %s, %s, %s, %s,
             %s, %s, %s, %s
         )
         """
@@ -471,7 +103,11 @@ def insert_food_item(conn, product_data, dry_run=False):
             product_data['keywords'],
             product_data['categories_hierarchy'],
             product_data['brands_hierarchy'],
-            product_data['allergens_hierarchy']
+            product_data['allergens_hierarchy'],
+            quality['quality_score'],
+            quality['quality_level'],
+            quality['quality_version'],
+            quality['quality_scored_at']
         ))
         
         conn.commit()
@@ -500,6 +136,12 @@ def insert_food_item(conn, product_data, dry_run=False):
         logger.error(f"Error inserting {product_data['name']}: {e}")
         return False
 
+def insert_batch(conn, products, dry_run=False):
+    """Extract a batch of raw products and insert them; returns (inserted, skipped)."""
+    batch = extract_products_batch(products)
+    inserted = sum(1 for product_data in batch.records if insert_food_item(conn, product_data, dry_run))
+    return inserted, len(products) - inserted
+
 def main():
     """Main function."""
     import argparse
@@ -507,6 +149,7 @@ def main():
     parser = argparse.ArgumentParser(description='Import OpenPetFoodFacts data without duplicates')
     parser.add_argument('--dry-run', '-d', action='store_true', help='Run without inserting data')
     parser.add_argument('--resume-from', '-r', type=int, default=0, help='Resume from line number')
+    parser.add_argument('--batch-size', '-b', type=int, default=500, help='Products extracted per batch')
     args = parser.parse_args()
     
     print("🚀 OpenPetFoodFacts Data Import (No Duplicates)")
@@ -576,6 +219,33 @@ def main():
     error_count = 0
     duplicate_count = 0
     new_count = 0
+    line_num = 0
+    pending = []
+    
+    def flush():
+        """Extract and insert the pending batch; False if the connection cannot be restored."""
+        nonlocal conn, pending, processed_count, new_count, skipped_count, error_count
+        batch, pending = pending, []
+        if not batch:
+            return True
+        try:
+            inserted, skipped = insert_batch(conn, batch, args.dry_run)
+        except psycopg2.OperationalError as e:
+            logger.error(f"Database connection error near line {line_num}: {e}")
+            error_count += len(batch)
+            # Try to reconnect
+            try:
+                conn.close()
+                conn = psycopg2.connect(database_url)
+                logger.info("Database connection restored")
+            except Exception as reconnect_error:
+                logger.error(f"Failed to reconnect to database: {reconnect_error}")
+                return False
+            return True
+        processed_count += inserted
+        new_count += inserted
+        skipped_count += skipped
+        return True
     
     start_time = time.time()
     
@@ -601,18 +271,10 @@ def main():
                         duplicate_count += 1
                         continue
                     
-                    # Extract data
-                    product_data = extract_comprehensive_data(product)
-                    if not product_data:
-                        skipped_count += 1
-                        continue
-                    
-                    # Insert into database
-                    if insert_food_item(conn, product_data, args.dry_run):
-                        processed_count += 1
-                        new_count += 1
-                    else:
-                        skipped_count += 1
+                    # Extract and insert in batches
+                    pending.append(product)
+                    if len(pending) >= args.batch_size and not flush():
+                        break
                     
                     # Progress update
                     if line_num % 1000 == 0:
@@ -625,20 +287,11 @@ def main():
                 except json.JSONDecodeError as e:
                     logger.warning(f"Invalid JSON at line {line_num}: {e}")
                     error_count += 1
-                except psycopg2.OperationalError as e:
-                    logger.error(f"Database connection error at line {line_num}: {e}")
-                    # Try to reconnect
-                    try:
-                        conn.close()
-                        conn = psycopg2.connect(database_url)
-                        logger.info("Database connection restored")
-                    except Exception as reconnect_error:
-                        logger.error(f"Failed to reconnect to database: {reconnect_error}")
-                        break
-                    error_count += 1
                 except Exception as e:
                     logger.error(f"Error processing line {line_num}: {e}")
                     error_count += 1
+            
+            flush()
                     
     except Exception as e:
         logger.error(f"Error processing file: {e}")
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Incremental OpenPetFoodFacts Catalog Sync
+Applies new and changed products from OpenPetFoodFacts exports to food_items.
+
+Unlike import_no_duplicates.py (insert-only), this script also picks up changes
+to products that are already in the catalog:
+
+- Lines older than --since (by last_modified_t) are skipped before JSON parsing;
+  by default --since is the watermark of the last complete run
+  (catalog_sync_state), which only advances after a run without errors, so an
+  interrupted run's unprocessed products are read again
+- Existing rows are looked up per batch by external_id / barcode (indexed),
+  not loaded into memory up front
+- A product is written only when it is new or its content hash
+  (food_items.source_hash) changed; rows are upserted in set-based statements
+- Derived data is refreshed with every write: the standardized nutritional_info,
+  the materialized quality score, and the indexed array columns
+
+Input can be the full JSONL export or delta exports (optionally .gz).
+
+Requires scripts/database/add_food_items_source_hash.sql.
+
+Usage:
+    python3 sync_catalog.py [files ...] [--since auto|all|UNIX_TIME] [--dry-run] [--batch-size N]
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import psycopg2
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Add the server directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.shared.utils.data_quality_scoring import DataQualityService
+from app.shared.utils.product_extraction import SOURCE, extract_products_batch
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Columns written by the sync and their SQL types (for jsonb_to_recordset)
+SYNC_COLUMNS = {
+    'name': 'TEXT',
+    'brand': 'TEXT',
+    'barcode': 'TEXT',
+    'category': 'TEXT',
+    'description': 'TEXT',
+    'species': 'TEXT',
+    'life_stage': 'TEXT',
+    'product_type': 'TEXT',
+    'country': 'TEXT',
+    'language': 'TEXT',
+    'data_completeness': 'DECIMAL(3,2)',
+    'external_source': 'TEXT',
+    'external_id': 'TEXT',
+    'keywords': 'TEXT[]',
+    'categories_hierarchy': 'TEXT[]',
+    'brands_hierarchy': 'TEXT[]',
+    'allergens_hierarchy': 'TEXT[]',
+    'nutritional_info': 'JSONB',
+    'quality_score': 'DECIMAL(4,3)',
+    'quality_level': 'TEXT',
+    'quality_version': 'TEXT',
+    'last_updated_external': 'TIMESTAMPTZ',
+    'source_hash': 'TEXT',
+}
+
+_COLUMN_LIST = ', '.join(SYNC_COLUMNS)
+_RECORD_DEFINITION = ', '.join(f"{name} {sql_type}" for name, sql_type in SYNC_COLUMNS.items())
+
+INSERT_SQL = f"""
+INSERT INTO public.food_items ({_COLUMN_LIST}, quality_scored_at)
+SELECT {_COLUMN_LIST}, NOW()
+FROM jsonb_to_recordset(%s::jsonb) AS v({_RECORD_DEFINITION})
+"""
+
+UPDATE_SQL = f"""
+UPDATE public.food_items f
+SET {', '.join(f"{name} = v.{name}" for name in SYNC_COLUMNS)},
+    quality_scored_at = NOW()
+FROM jsonb_to_recordset(%s::jsonb) AS v(id UUID, {_RECORD_DEFINITION})
+WHERE f.id = v.id
+"""
+
+# Content unchanged, only the export timestamp moved
+TOUCH_SQL = """
+UPDATE public.food_items f
+SET last_updated_external = v.last_updated_external
+FROM jsonb_to_recordset(%s::jsonb) AS v(id UUID, last_updated_external TIMESTAMPTZ)
+WHERE f.id = v.id
+"""
+
+EXISTING_SQL = """
+SELECT id, external_id, barcode, external_source, last_updated_external, source_hash
+FROM public.food_items
+WHERE external_id = ANY(%s) OR barcode = ANY(%s)
+"""
+
+WATERMARK_SQL = """
+SELECT EXTRACT(EPOCH FROM synced_through)::BIGINT
+FROM public.catalog_sync_state
+WHERE external_source = %s
+"""
+
+# Never moves the watermark back (e.g. after re-syncing an older export)
+SAVE_WATERMARK_SQL = """
+INSERT INTO public.catalog_sync_state (external_source, synced_through, completed_at)
+VALUES (%s, to_timestamp(%s), NOW())
+ON CONFLICT (external_source) DO UPDATE
+SET synced_through = GREATEST(catalog_sync_state.synced_through, EXCLUDED.synced_through),
+    completed_at = NOW()
+"""
+
+# Read the modification time without parsing the whole line
+_LAST_MODIFIED = re.compile(rb'"last_modified_t"\s*:\s*(\d+)')
+
+# Refresh planner statistics after large syncs
+ANALYZE_THRESHOLD = 1000
+
+
+def content_hash(record: Dict[str, Any]) -> str:
+    """
+    Stable hash of an extracted food_items record (key order independent)
+
+    nutritional_info.last_updated mirrors last_modified_t, so it is left out:
+    a product re-exported without changes keeps its hash.
+    """
+    content = dict(record)
+    if isinstance(content.get('nutritional_info'), dict):
+        content['nutritional_info'] = {
+            key: value for key, value in content['nutritional_info'].items() if key != 'last_updated'
+        }
+    canonical = json.dumps(content, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def _timestamp(product: Dict[str, Any]) -> Optional[int]:
+    try:
+        return int(product.get('last_modified_t'))
+    except (TypeError, ValueError):
+        return None
+
+
+def iter_products(paths: Iterable[str], since: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield products from JSONL exports (plain or .gz)
+
+    Lines whose last_modified_t is not newer than since are skipped before
+    JSON parsing; lines without a timestamp are always parsed.
+    """
+    for path in paths:
+        opener = gzip.open if str(path).endswith('.gz') else open
+        with opener(path, 'rb') as file:
+            for line_num, line in enumerate(file, 1):
+                if not line.strip():
+                    continue
+                if since is not None:
+                    match = _LAST_MODIFIED.search(line)
+                    if match and int(match.group(1)) <= since:
+                        continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    logger.warning(f"Invalid JSON at {path}:{line_num}: {e}")
+
+
+def sync_watermark(conn) -> Optional[int]:
+    """last_modified_t (unix time) up to which the last complete run synced."""
+    with conn.cursor() as cursor:
+        cursor.execute(WATERMARK_SQL, (SOURCE,))
+        row = cursor.fetchone()
+    return row[0] if row and row[0] is not None else None
+
+
+class CatalogSync:
+    """Batches products, diffs them against food_items and writes only changes."""
+
+    def __init__(self, conn, dry_run: bool = False, batch_size: int = 500):
+        self.conn = conn
+        self.dry_run = dry_run
+        self.batch_size = batch_size
+        self.stats = Counter()
+        self.newest_modified: Optional[int] = None
+
+    def _fetch_existing(self, products: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        external_ids = [str(p['_id']) for p in products if p.get('_id')]
+        barcodes = [str(p.get('code') or p.get('_id')) for p in products if p.get('code') or p.get('_id')]
+        with self.conn.cursor() as cursor:
+            cursor.execute(EXISTING_SQL, (external_ids, barcodes))
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def _row(self, record: Dict[str, Any], product: Dict[str, Any], source_hash: str) -> Dict[str, Any]:
+        """Values for SYNC_COLUMNS, including the derived quality score."""
+        row = {name: record.get(name) for name in SYNC_COLUMNS}
+        row.update(DataQualityService.quality_columns(record))
+        row.pop('quality_scored_at', None)
+        modified = _timestamp(product)
+        row['last_updated_external'] = (
+            datetime.fromtimestamp(modified, tz=timezone.utc).isoformat() if modified else None
+        )
+        row['source_hash'] = source_hash
+        return row
+
+    def process_batch(self, products: List[Dict[str, Any]]):
+        """Diff a batch of products against food_items and write the changes."""
+        # Later occurrences of a product win (delta files can repeat products)
+        latest = {}
+        for product in products:
+            key = product.get('_id') or product.get('code')
+            if key:
+                latest[str(key)] = product
+            else:
+                self.stats['invalid'] += 1
+        products = list(latest.values())
+        if not products:
+            return
+
+        existing = self._fetch_existing(products)
+        by_external_id = {row['external_id']: row for row in existing if row['external_id']}
+        by_barcode = {row['barcode']: row for row in existing if row['barcode']}
+
+        # Skip products whose stored timestamp is already current, before extracting them
+        candidates = []
+        for product in products:
+            current = by_external_id.get(str(product.get('_id')))
+            modified = _timestamp(product)
+            if (current and current['last_updated_external'] and modified
+                    and current['last_updated_external'].timestamp() >= modified):
+                self.stats['unchanged'] += 1
+                continue
+            candidates.append(product)
+
+        batch = extract_products_batch(candidates)
+        self.stats['invalid'] += len(candidates) - len(batch)
+
+        inserts, updates, touches = [], [], []
+        for record, position in zip(batch.records, batch.positions.tolist()):
+            product = candidates[position]
+            source_hash = content_hash(record)
+            current = by_external_id.get(record['external_id']) or by_barcode.get(record['barcode'])
+
+            if current is None:
+                inserts.append(self._row(record, product, source_hash))
+            elif current['external_source'] not in (None, SOURCE):
+                # Barcode belongs to a row from another source (e.g. user contribution)
+                self.stats['conflicts'] += 1
+            elif current['source_hash'] == source_hash:
+                self.stats['unchanged'] += 1
+                modified = _timestamp(product)
+                if modified:
+                    touches.append({
+                        'id': str(current['id']),
+                        'last_updated_external': datetime.fromtimestamp(modified, tz=timezone.utc).isoformat()
+                    })
+            else:
+                updates.append({'id': str(current['id']), **self._row(record, product, source_hash)})
+
+        self._write(INSERT_SQL, inserts, 'inserted')
+        self._write(UPDATE_SQL, updates, 'updated')
+        self._write(TOUCH_SQL, touches, 'touched')
+
+    def _write(self, sql: str, rows: List[Dict[str, Any]], stat: str):
+        """Apply rows in one statement; fall back to row by row if the batch fails."""
+        if not rows:
+            return
+        if self.dry_run:
+            self.stats[stat] += len(rows)
+            return
+
+        try:
+            with self.conn.cursor() as cursor:
+                cursor.execute(sql, (json.dumps(rows, default=str),))
+            self.conn.commit()
+            self.stats[stat] += len(rows)
+            return
+        except psycopg2.IntegrityError as e:
+            self.conn.rollback()
+            logger.warning(f"Batch {stat} failed ({e.pgcode}); retrying {len(rows)} rows individually")
+
+        for row in rows:
+            try:
+                with self.conn.cursor() as cursor:
+                    cursor.execute(sql, (json.dumps([row], default=str),))
+                self.conn.commit()
+                self.stats[stat] += 1
+            except psycopg2.IntegrityError as e:
+                self.conn.rollback()
+                self.stats['errors'] += 1
+                logger.warning(f"Could not sync {row.get('external_id') or row.get('id')}: {e}")
+
+    def run(self, paths: List[str], since: Optional[int]) -> Counter:
+        """Sync all products from paths modified after since."""
+        start_time = time.time()
+        pending = []
+
+        for product in iter_products(paths, since):
+            self.stats['read'] += 1
+            modified = _timestamp(product)
+            if modified and (self.newest_modified is None or modified > self.newest_modified):
+                self.newest_modified = modified
+            pending.append(product)
+            if len(pending) >= self.batch_size:
+                self.process_batch(pending)
+                pending = []
+            if self.stats['read'] % 10000 == 0:
+                elapsed = time.time() - start_time
+                logger.info(
+                    f"📊 {self.stats['read']:,} products read ({self.stats['read'] / elapsed:.0f}/sec) | "
+                    f"new {self.stats['inserted']:,} | updated {self.stats['updated']:,} | "
+                    f"unchanged {self.stats['unchanged']:,}"
+                )
+
+        self.process_batch(pending)
+
+        changed = self.stats['inserted'] + self.stats['updated']
+        if changed >= ANALYZE_THRESHOLD and not self.dry_run:
+            self._analyze()
+        self._save_watermark()
+
+        self.stats['seconds'] = int(time.time() - start_time)
+        return self.stats
+
+    def _save_watermark(self):
+        """
+        Record the newest last_modified_t read as the next --since auto
+
+        Only after the whole run succeeded: the export is not sorted by
+        last_modified_t, so a partial run must not move the watermark past
+        products it never wrote.
+        """
+        if self.dry_run or self.newest_modified is None:
+            return
+        if self.stats['errors']:
+            logger.warning(f"⚠️  {self.stats['errors']} products failed; sync watermark not advanced")
+            return
+        with self.conn.cursor() as cursor:
+            cursor.execute(SAVE_WATERMARK_SQL, (SOURCE, self.newest_modified))
+        self.conn.commit()
+
+    def _analyze(self):
+        """Refresh planner statistics for food_items after a large sync."""
+        try:
+            with self.conn.cursor() as cursor:
+                cursor.execute("ANALYZE public.food_items")
+            self.conn.commit()
+            logger.info("📈 Refreshed food_items statistics")
+        except psycopg2.Error as e:
+            self.conn.rollback()
+            logger.warning(f"Could not analyze food_items: {e}")
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description='Incrementally sync OpenPetFoodFacts exports into food_items')
+    parser.add_argument('files', nargs='*', default=['openpetfoodfacts-products.jsonl'],
+                        help='JSONL export or delta files (.jsonl or .jsonl.gz)')
+    parser.add_argument('--since', default='auto',
+                        help="'auto' (where the last complete sync ended), 'all', or a unix timestamp")
+    parser.add_argument('--dry-run', '-d', action='store_true', help='Diff without writing')
+    parser.add_argument('--batch-size', '-b', type=int, default=500, help='Products per batch')
+    args = parser.parse_args()
+
+    database_url = os.getenv('DATABASE_URL')
+    if not database_url:
+        logger.error("❌ DATABASE_URL not found in .env file")
+        sys.exit(1)
+
+    missing = [path for path in args.files if not Path(path).exists()]
+    if missing:
+        logger.error(f"❌ File not found: {', '.join(missing)}")
+        sys.exit(1)
+
+    conn = psycopg2.connect(database_url)
+    try:
+        if args.since == 'auto':
+            since = sync_watermark(conn)
+        elif args.since == 'all':
+            since = None
+        else:
+            since = int(args.since)
+
+        if since is None:
+            logger.info("🔄 Syncing all products")
+        else:
+            logger.info(f"🔄 Syncing products modified after {datetime.fromtimestamp(since, tz=timezone.utc).isoformat()}")
+        if args.dry_run:
+            logger.info("🧪 DRY RUN MODE: No data will be written")
+
+        stats = CatalogSync(conn, dry_run=args.dry_run, batch_size=args.batch_size).run(args.files, since)
+    finally:
+        conn.close()
+
+    logger.info("🎉 Sync completed!")
+    logger.info(f"⏱️  {stats['seconds']}s | 📖 Read: {stats['read']:,}")
+    logger.info(f"✅ New: {stats['inserted']:,} | 🔄 Updated: {stats['updated']:,} | "
+                f"⏭️  Unchanged: {stats['unchanged']:,} (timestamp only: {stats['touched']:,})")
+    logger.info(f"⚠️  Invalid: {stats['invalid']:,} | Source conflicts: {stats['conflicts']:,} | Errors: {stats['errors']:,}")
+
+
+if __name__ == '__main__':
+    main()
@@ -24,14 +24,24 @@ from app.api.v1.scanning.router import router as scans_router
 from app.api.v1.food_management.router import router as food_management_router
 from app.api.v1.mfa.router import router as mfa_router
 from app.api.v1.monitoring.router import router as monitoring_router
-from app.api.v1.gdpr.router import router as gdpr_router
-from app.api.v1.notifications.router import router as notifications_router
+from app.api.v1.gdpr.router import (
+    router as gdpr_router,
+    gdpr_deletion_resume_worker,
+    gdpr_retention_worker
+)
+from app.api.v1.notifications.router import (
+    router as notifications_router,
+    push_service,
+    notification_scheduler,
+    medication_reminder_dispatcher,
+)
 from app.api.v1.nutritional_analysis.router import router as nutritional_analysis_router
 from app.api.v1.advanced_nutrition import router as advanced_nutrition_router
 from app.api.v1.nutrition import router as nutrition_router
 from app.api.v1.data_quality import router as data_quality_router
 from app.api.v1.health_events.router import router as health_events_router
 from app.api.v1.waitlist.router import router as waitlist_router
+from app.api.v1.batch.router import router as batch_router
 from app.api.v1.subscriptions.revenuecat_webhook import router as revenuecat_webhook_router
 from app.core.config import settings
 from app.core.middleware import (
@@ -44,6 +54,7 @@ from app.core.middleware import (
     RequestTimeoutMiddleware,
     QueryMonitoringMiddleware,
 )
+from app.services.image_optimizer import ImageOptimizerService
 
 # Load environment variables
 load_dotenv()
@@ -76,9 +87,25 @@ async def lifespan(app: FastAPI):
         logger.error(f"⚠️  Startup error: {e}")
         logger.warning("Application starting in degraded mode - health check will respond but features may be limited")
     
+    background_workers = [
+        worker for worker in (notification_scheduler, medication_reminder_dispatcher)
+        if worker is not None and settings.notification_worker_enabled
+    ]
+    if settings.gdpr_retention_worker_enabled:
+        background_workers.append(gdpr_retention_worker)
+    if settings.gdpr_deletion_resume_enabled:
+        background_workers.append(gdpr_deletion_resume_worker)
+    for worker in background_workers:
+        worker.start()
+    
     yield
     
     # Shutdown
+    for worker in background_workers:
+        await worker.stop()
+    ImageOptimizerService.shutdown_pool()
+    if push_service is not None:
+        await push_service.close()
     log_shutdown(logger, "SniffTest API")
 
 # Initialize FastAPI app
@@ -252,6 +279,7 @@ app.include_router(food_management_router, prefix="/api/v1", tags=["food-managem
 app.include_router(data_quality_router, prefix="/api/v1/data-quality", tags=["data-quality"])
 app.include_router(health_events_router, prefix="/api/v1", tags=["health-events"])
 app.include_router(waitlist_router, prefix="/api/v1/waitlist", tags=["waitlist"])
+app.include_router(batch_router, prefix="/api/v1", tags=["batch"])
 app.include_router(
     revenuecat_webhook_router,
     prefix="/api/v1/subscriptions/revenuecat",
@@ -0,0 +1,44 @@
+-- Migration: Materialized data-quality score on food_items
+-- Date: 2026-10-18
+-- Description: Stores the DataQualityService overall score and level per food item so
+--              catalog-wide quality queries (low-quality lists, distributions) are index
+--              lookups instead of re-scoring nutritional_info JSON on every request.
+--              Populate existing rows with scripts/database/rescore_food_quality.py.
+
+ALTER TABLE IF EXISTS public.food_items
+ADD COLUMN IF NOT EXISTS quality_score DECIMAL(4,3) CHECK (quality_score >= 0 AND quality_score <= 1),
+ADD COLUMN IF NOT EXISTS quality_level TEXT CHECK (quality_level IN ('excellent', 'good', 'fair', 'poor')),
+ADD COLUMN IF NOT EXISTS quality_scored_at TIMESTAMP WITH TIME ZONE;
+
+COMMENT ON COLUMN public.food_items.quality_score IS
+'Overall data quality score (0-1) computed by DataQualityService. NULL until the item is scored.';
+
+-- Worst-first lookups: WHERE quality_score < threshold ORDER BY quality_score
+CREATE INDEX IF NOT EXISTS idx_food_items_quality_score
+ON public.food_items(quality_score)
+WHERE quality_score IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_food_items_quality_level ON public.food_items(quality_level);
+
+-- Bulk-apply scores computed by the backend: one UPDATE per page of items
+-- p_scores: [{"id": uuid, "quality_score": number, "quality_level": text}, ...]
+CREATE OR REPLACE FUNCTION apply_food_quality_scores(p_scores JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+    v_updated INTEGER;
+BEGIN
+    UPDATE public.food_items f
+    SET quality_score = s.quality_score,
+        quality_level = s.quality_level,
+        quality_scored_at = NOW()
+    FROM jsonb_to_recordset(p_scores) AS s(id UUID, quality_score DECIMAL(4,3), quality_level TEXT)
+    WHERE f.id = s.id;
+
+    GET DIAGNOSTICS v_updated = ROW_COUNT;
+    RETURN v_updated;
+END;
+$$ LANGUAGE plpgsql
+SET search_path = public;
+
+-- Backend (service role) only
+REVOKE EXECUTE ON FUNCTION apply_food_quality_scores(JSONB) FROM PUBLIC, anon, authenticated;
@@ -0,0 +1,43 @@
+-- Migration: Track the scoring configuration behind each materialized quality score
+-- Date: 2026-10-18
+-- Description: quality_version stores DataQualityService.scoring_version() (a fingerprint
+--              of the scoring weights, bins and thresholds) with every quality_score.
+--              When the weights change, rows with a different version are rescored in bulk
+--              by scripts/database/rescore_food_quality.py (stale rows only by default).
+--              Requires add_food_items_quality_score.sql.
+
+ALTER TABLE IF EXISTS public.food_items
+ADD COLUMN IF NOT EXISTS quality_version TEXT;
+
+COMMENT ON COLUMN public.food_items.quality_version IS
+'Scoring configuration fingerprint used for quality_score. Rows with an older version are stale.';
+
+-- Low-quality listings filter on the current version and order by score
+CREATE INDEX IF NOT EXISTS idx_food_items_quality_version_score
+ON public.food_items(quality_version, quality_score);
+
+-- Bulk-apply scores computed by the backend, now including the scoring version
+-- p_scores: [{"id": uuid, "quality_score": number, "quality_level": text, "quality_version": text}, ...]
+CREATE OR REPLACE FUNCTION apply_food_quality_scores(p_scores JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+    v_updated INTEGER;
+BEGIN
+    UPDATE public.food_items f
+    SET quality_score = s.quality_score,
+        quality_level = s.quality_level,
+        quality_version = s.quality_version,
+        quality_scored_at = NOW()
+    FROM jsonb_to_recordset(p_scores) AS s(
+        id UUID, quality_score DECIMAL(4,3), quality_level TEXT, quality_version TEXT
+    )
+    WHERE f.id = s.id;
+
+    GET DIAGNOSTICS v_updated = ROW_COUNT;
+    RETURN v_updated;
+END;
+$$ LANGUAGE plpgsql
+SET search_path = public;
+
+-- Backend (service role) only
+REVOKE EXECUTE ON FUNCTION apply_food_quality_scores(JSONB) FROM PUBLIC, anon, authenticated;
@@ -0,0 +1,26 @@
+-- Migration: Track the synced OpenPetFoodFacts content of each food item
+-- Date: 2026-10-18
+-- Description: source_hash stores a hash of the extracted product written by
+--              importing/sync_catalog.py. Together with last_updated_external
+--              (the product's last_modified_t) it lets the incremental sync skip
+--              unchanged products and rewrite only the ones that changed.
+--              catalog_sync_state records where the last complete sync ended,
+--              the default starting point of the next one.
+
+ALTER TABLE IF EXISTS public.food_items
+ADD COLUMN IF NOT EXISTS source_hash TEXT;
+
+COMMENT ON COLUMN public.food_items.source_hash IS
+'SHA-256 of the extracted external product at the last sync. Unchanged hash means nothing to update.';
+
+-- Watermark of the last complete sync per source: the newest last_modified_t
+-- read by a run that finished without errors. --since auto starts from it,
+-- so products of an interrupted run are picked up again by the next one.
+CREATE TABLE IF NOT EXISTS public.catalog_sync_state (
+    external_source TEXT PRIMARY KEY,
+    synced_through TIMESTAMP WITH TIME ZONE NOT NULL,
+    completed_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Written by importing/sync_catalog.py over a direct connection; no API access
+ALTER TABLE public.catalog_sync_state ENABLE ROW LEVEL SECURITY;
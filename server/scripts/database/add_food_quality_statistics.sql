@@ -0,0 +1,59 @@
+-- Migration: Catalog quality statistics from the materialized scores
+-- Date: 2026-10-18
+-- Description: /data-quality/stats/overview re-scored every food item's
+--              nutritional_info in the backend on each request. It now reads
+--              one row per quality level, aggregated in the database from
+--              quality_score/quality_level. Rows whose quality_version is not
+--              the current scoring version (stale or never scored) are
+--              counted apart, under a NULL level; rescore them with
+--              scripts/database/rescore_food_quality.py.
+--
+--              Ingredient and nutritional coverage are stored generated
+--              columns, kept current by every write path, and the statistics
+--              are an index-only scan of idx_food_items_quality_statistics:
+--              no nutritional_info is read per request. Adding the columns
+--              rewrites food_items once.
+--              Requires add_food_items_quality_version.sql.
+
+-- has_nutritional_info: any of DataQualityService's critical, important or
+-- extended nutritional fields is set (keep the list in sync with the scorer)
+ALTER TABLE IF EXISTS public.food_items
+ADD COLUMN IF NOT EXISTS has_ingredients BOOLEAN GENERATED ALWAYS AS (
+    COALESCE(CASE
+        WHEN jsonb_typeof(nutritional_info->'ingredients') = 'array'
+        THEN jsonb_array_length(nutritional_info->'ingredients') > 0
+    END, FALSE)
+) STORED,
+ADD COLUMN IF NOT EXISTS has_nutritional_info BOOLEAN GENERATED ALWAYS AS (
+    COALESCE(jsonb_strip_nulls(nutritional_info) ?| ARRAY[
+        'calories_per_100g', 'protein_percentage', 'fat_percentage', 'fiber_percentage',
+        'moisture_percentage', 'ash_percentage', 'carbohydrates_percentage', 'sodium_percentage',
+        'sugars_percentage', 'saturated_fat_percentage'
+    ], FALSE)
+) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_food_items_quality_statistics
+ON public.food_items(quality_version, quality_level)
+INCLUDE (quality_score, has_ingredients, has_nutritional_info);
+
+DROP FUNCTION IF EXISTS food_quality_statistics(TEXT, TEXT[]);
+
+-- p_version: DataQualityService.scoring_version()
+CREATE OR REPLACE FUNCTION food_quality_statistics(p_version TEXT)
+RETURNS TABLE (
+    quality_level TEXT,
+    items BIGINT,
+    score_sum NUMERIC,
+    items_with_ingredients BIGINT,
+    items_with_nutritional BIGINT
+) AS $$
+    SELECT
+        CASE WHEN f.quality_version = p_version THEN f.quality_level END,
+        COUNT(*),
+        COALESCE(SUM(f.quality_score) FILTER (WHERE f.quality_version = p_version), 0),
+        COUNT(*) FILTER (WHERE f.has_ingredients),
+        COUNT(*) FILTER (WHERE f.has_nutritional_info)
+    FROM public.food_items f
+    GROUP BY 1;
+$$ LANGUAGE sql STABLE
+SET search_path = public;
@@ -0,0 +1,117 @@
+-- Migration: Resumable GDPR deletion and incremental retention sweep
+-- Date: 2026-10-18
+-- Description: Account deletion used to delete one table after another and
+--              one storage object at a time; a failure half way left the
+--              account partly deleted with no record of how far it got.
+--              Each deletion is now a row in gdpr_deletion_jobs with the steps
+--              (tables, storage buckets, auth user) already done, so a failed
+--              or interrupted deletion resumes from where it stopped.
+--
+--              The retention cleanup walks users whose created_at is past the
+--              retention period in (created_at, id) order, a batch at a time,
+--              and remembers its position in gdpr_job_checkpoints instead of
+--              loading every expired user on each run. Users it fails to
+--              anonymize go to gdpr_retention_failures and are retried later,
+--              so they do not hold up the sweep.
+
+CREATE TABLE IF NOT EXISTS public.gdpr_deletion_jobs (
+    -- No foreign key: the job outlives the user it deletes
+    user_id UUID PRIMARY KEY,
+    status TEXT NOT NULL DEFAULT 'running' CHECK (status IN ('running', 'failed', 'completed')),
+    completed_steps TEXT[] NOT NULL DEFAULT '{}',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_gdpr_deletion_jobs_incomplete
+    ON public.gdpr_deletion_jobs(updated_at)
+    WHERE status <> 'completed';
+
+DROP TRIGGER IF EXISTS update_gdpr_deletion_jobs_updated_at ON public.gdpr_deletion_jobs;
+CREATE TRIGGER update_gdpr_deletion_jobs_updated_at
+    BEFORE UPDATE ON public.gdpr_deletion_jobs
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+CREATE TABLE IF NOT EXISTS public.gdpr_job_checkpoints (
+    name TEXT PRIMARY KEY,
+    cursor TEXT,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Users the retention sweep failed to anonymize, retried with later batches
+CREATE TABLE IF NOT EXISTS public.gdpr_retention_failures (
+    user_id UUID PRIMARY KEY,
+    attempts INTEGER NOT NULL DEFAULT 1,
+    last_error TEXT,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_gdpr_retention_failures_retry
+    ON public.gdpr_retention_failures(updated_at);
+
+-- The retention sweep pages users by (created_at, id)
+CREATE INDEX IF NOT EXISTS idx_users_created_id ON public.users(created_at, id);
+
+-- Only the backend (service role) reads or writes these tables
+ALTER TABLE public.gdpr_deletion_jobs ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.gdpr_job_checkpoints ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.gdpr_retention_failures ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Allow service role full access" ON public.gdpr_deletion_jobs;
+CREATE POLICY "Allow service role full access"
+    ON public.gdpr_deletion_jobs
+    FOR ALL
+    TO service_role
+    USING (true)
+    WITH CHECK (true);
+
+DROP POLICY IF EXISTS "Allow service role full access" ON public.gdpr_job_checkpoints;
+CREATE POLICY "Allow service role full access"
+    ON public.gdpr_job_checkpoints
+    FOR ALL
+    TO service_role
+    USING (true)
+    WITH CHECK (true);
+
+DROP POLICY IF EXISTS "Allow service role full access" ON public.gdpr_retention_failures;
+CREATE POLICY "Allow service role full access"
+    ON public.gdpr_retention_failures
+    FOR ALL
+    TO service_role
+    USING (true)
+    WITH CHECK (true);
+
+-- -----------------------------------------------------------------------------
+-- Start (or resume) a user's deletion; returns the steps already completed
+-- -----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION start_gdpr_deletion(p_user_id UUID)
+RETURNS TEXT[] AS $$
+    INSERT INTO public.gdpr_deletion_jobs (user_id, status, attempts)
+    VALUES (p_user_id, 'running', 1)
+    ON CONFLICT (user_id) DO UPDATE
+    SET status = 'running',
+        attempts = gdpr_deletion_jobs.attempts + 1,
+        last_error = NULL
+    RETURNING completed_steps;
+$$ LANGUAGE sql SECURITY DEFINER
+SET search_path = public, pg_temp;
+
+-- Backend (service role) only
+REVOKE EXECUTE ON FUNCTION start_gdpr_deletion(UUID) FROM PUBLIC, anon, authenticated;
+
+-- -----------------------------------------------------------------------------
+-- Record one completed step; steps of a phase finish concurrently
+-- -----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION complete_gdpr_deletion_step(p_user_id UUID, p_step TEXT)
+RETURNS VOID AS $$
+    UPDATE public.gdpr_deletion_jobs
+    SET completed_steps = array_append(completed_steps, p_step)
+    WHERE user_id = p_user_id
+    AND NOT (p_step = ANY(completed_steps));
+$$ LANGUAGE sql SECURITY DEFINER
+SET search_path = public, pg_temp;
+
+-- Backend (service role) only
+REVOKE EXECUTE ON FUNCTION complete_gdpr_deletion_step(UUID, TEXT) FROM PUBLIC, anon, authenticated;
@@ -0,0 +1,21 @@
+-- Migration: Indexes for keyset (cursor) pagination of list endpoints
+-- Date: 2026-10-18
+-- Description: List endpoints page with WHERE (sort, id) < (cursor) ORDER BY sort DESC, id DESC
+--              instead of OFFSET (QueryBuilderService.with_cursor / apply_keyset).
+--              These composite indexes let each page seek directly to the cursor
+--              for the per-user / per-pet filters the endpoints use.
+
+CREATE INDEX IF NOT EXISTS idx_scans_user_created_id
+ON public.scans(user_id, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_feeding_records_pet_created_id
+ON public.feeding_records(pet_id, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_health_events_pet_event_date_id
+ON public.health_events(pet_id, event_date DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_medication_reminders_pet_created_id
+ON public.medication_reminders(pet_id, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_medication_reminders_health_event_created_id
+ON public.medication_reminders(health_event_id, created_at DESC, id DESC);
@@ -0,0 +1,111 @@
+-- Migration: Server-side medication reminder dispatch
+-- Date: 2026-10-18
+-- Description: Medication reminders were only stored; nothing on the server
+--              sent them. Each active reminder now carries next_fire_at, the
+--              next dose time computed from its frequency, reminder times,
+--              start/end dates and timezone. A partial index on it lets the
+--              dispatcher claim just the due reminders in batches instead of
+--              scanning every reminder each minute.
+--
+--              Only reminders with a timezone are sent by the server: reminder
+--              times are local wall-clock times, and without one they would
+--              fire at UTC. Existing reminders (and clients that do not send a
+--              timezone) keep timezone NULL and next_fire_at NULL, and stay
+--              with the app's local notifications, so nothing is sent twice.
+--
+--              reminder_times was written as a JSON string inside the JSONB
+--              column; existing rows are converted to real arrays.
+
+ALTER TABLE public.medication_reminders
+    ADD COLUMN IF NOT EXISTS timezone TEXT,
+    ADD COLUMN IF NOT EXISTS next_fire_at TIMESTAMP WITH TIME ZONE,
+    ADD COLUMN IF NOT EXISTS last_fired_at TIMESTAMP WITH TIME ZONE,
+    ADD COLUMN IF NOT EXISTS locked_until TIMESTAMP WITH TIME ZONE;
+
+UPDATE public.medication_reminders
+SET reminder_times = (reminder_times #>> '{}')::jsonb
+WHERE jsonb_typeof(reminder_times) = 'string';
+
+CREATE INDEX IF NOT EXISTS idx_medication_reminders_next_fire_at
+    ON public.medication_reminders(next_fire_at)
+    WHERE is_active = TRUE AND next_fire_at IS NOT NULL;
+
+-- -----------------------------------------------------------------------------
+-- Claim up to p_limit due reminders for p_lease_seconds, with what the
+-- notification needs (pet name, the owner's device token)
+-- -----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION claim_due_medication_reminders(p_limit INTEGER, p_lease_seconds INTEGER)
+RETURNS TABLE (
+    id UUID,
+    pet_id UUID,
+    medication_name TEXT,
+    dosage TEXT,
+    frequency TEXT,
+    reminder_times JSONB,
+    start_date TIMESTAMP WITH TIME ZONE,
+    end_date TIMESTAMP WITH TIME ZONE,
+    timezone TEXT,
+    next_fire_at TIMESTAMP WITH TIME ZONE,
+    pet_name TEXT,
+    device_token TEXT
+) AS $$
+    WITH claimed AS (
+        UPDATE public.medication_reminders mr
+        SET locked_until = NOW() + make_interval(secs => p_lease_seconds)
+        WHERE mr.id IN (
+            SELECT due.id
+            FROM public.medication_reminders due
+            WHERE due.is_active = TRUE
+            AND due.timezone IS NOT NULL
+            AND due.next_fire_at <= NOW()
+            AND (due.locked_until IS NULL OR due.locked_until < NOW())
+            ORDER BY due.next_fire_at
+            LIMIT p_limit
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING mr.*
+    )
+    SELECT
+        c.id, c.pet_id, c.medication_name, c.dosage, c.frequency, c.reminder_times,
+        c.start_date, c.end_date, c.timezone, c.next_fire_at,
+        p.name, u.device_token
+    FROM claimed c
+    JOIN public.pets p ON p.id = c.pet_id
+    JOIN public.users u ON u.id = c.user_id;
+$$ LANGUAGE sql SECURITY DEFINER
+SET search_path = public, pg_temp;
+
+-- Backend (service role) only
+REVOKE EXECUTE ON FUNCTION claim_due_medication_reminders(INTEGER, INTEGER) FROM PUBLIC, anon, authenticated;
+
+-- -----------------------------------------------------------------------------
+-- Move claimed reminders to their next dose and release them
+-- p_updates: [{id, fired_at, next_fire_at, sent}, ...]
+-- A reminder edited while it was claimed keeps the next_fire_at of the edit
+-- -----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION advance_medication_reminders(p_updates JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+    updated_count INTEGER;
+BEGIN
+    UPDATE public.medication_reminders mr
+    SET next_fire_at = CASE
+            WHEN mr.next_fire_at = (u->>'fired_at')::TIMESTAMPTZ THEN (u->>'next_fire_at')::TIMESTAMPTZ
+            ELSE mr.next_fire_at
+        END,
+        last_fired_at = CASE
+            WHEN (u->>'sent')::BOOLEAN THEN (u->>'fired_at')::TIMESTAMPTZ
+            ELSE mr.last_fired_at
+        END,
+        locked_until = NULL
+    FROM jsonb_array_elements(p_updates) AS u
+    WHERE mr.id = (u->>'id')::UUID;
+
+    GET DIAGNOSTICS updated_count = ROW_COUNT;
+    RETURN updated_count;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER
+SET search_path = public, pg_temp;
+
+-- Backend (service role) only
+REVOKE EXECUTE ON FUNCTION advance_medication_reminders(JSONB) FROM PUBLIC, anon, authenticated;
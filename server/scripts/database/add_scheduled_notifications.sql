@@ -0,0 +1,131 @@
+-- Migration: Durable queue for scheduled push notifications
+-- Date: 2026-10-18
+-- Description: Delayed and engagement notifications used to wait in an
+--              in-process asyncio.sleep, so they were lost on every restart or
+--              deploy. They are now rows in scheduled_notifications, ordered by
+--              send_at. Every API instance runs a worker that claims due rows in
+--              batches with FOR UPDATE SKIP LOCKED under a lease, so instances
+--              never send the same row twice and a crashed worker's rows are
+--              picked up again once the lease runs out.
+
+CREATE TABLE IF NOT EXISTS public.scheduled_notifications (
+    id UUID DEFAULT uuid_generate_v4() PRIMARY KEY,
+    user_id UUID REFERENCES public.users(id) ON DELETE CASCADE,
+    device_token TEXT NOT NULL,
+    payload JSONB NOT NULL,
+    send_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    -- Scheduling again with the same key replaces the pending notification
+    dedupe_key TEXT,
+    status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'sent', 'failed', 'cancelled')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    locked_until TIMESTAMP WITH TIME ZONE,
+    last_error TEXT,
+    sent_at TIMESTAMP WITH TIME ZONE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- The worker's claim query walks this index in send_at order
+CREATE INDEX IF NOT EXISTS idx_scheduled_notifications_due
+    ON public.scheduled_notifications(send_at)
+    WHERE status = 'pending';
+CREATE UNIQUE INDEX IF NOT EXISTS uq_scheduled_notifications_dedupe_key
+    ON public.scheduled_notifications(dedupe_key)
+    WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_scheduled_notifications_user_pending
+    ON public.scheduled_notifications(user_id)
+    WHERE status = 'pending';
+
+DROP TRIGGER IF EXISTS update_scheduled_notifications_updated_at ON public.scheduled_notifications;
+CREATE TRIGGER update_scheduled_notifications_updated_at
+    BEFORE UPDATE ON public.scheduled_notifications
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- Only the backend (service role) reads or writes the queue
+ALTER TABLE public.scheduled_notifications ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Allow service role full access" ON public.scheduled_notifications;
+CREATE POLICY "Allow service role full access"
+    ON public.scheduled_notifications
+    FOR ALL
+    TO service_role
+    USING (true)
+    WITH CHECK (true);
+
+-- -----------------------------------------------------------------------------
+-- Enqueue notifications; a pending row with the same dedupe_key is replaced
+-- Replacing a claimed row clears its lease, so the worker sending the old
+-- notification cannot record its outcome over the new one
+-- p_notifications: [{user_id, device_token, payload, send_at, dedupe_key}, ...]
+-- -----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION schedule_notifications(p_notifications JSONB)
+RETURNS SETOF UUID AS $$
+    INSERT INTO public.scheduled_notifications (user_id, device_token, payload, send_at, dedupe_key)
+    SELECT
+        (n->>'user_id')::UUID,
+        n->>'device_token',
+        n->'payload',
+        (n->>'send_at')::TIMESTAMPTZ,
+        n->>'dedupe_key'
+    FROM jsonb_array_elements(p_notifications) AS n
+    ON CONFLICT (dedupe_key) WHERE status = 'pending'
+    DO UPDATE SET
+        user_id = EXCLUDED.user_id,
+        device_token = EXCLUDED.device_token,
+        payload = EXCLUDED.payload,
+        send_at = EXCLUDED.send_at,
+        attempts = 0,
+        locked_until = NULL,
+        last_error = NULL
+    RETURNING id;
+$$ LANGUAGE sql SECURITY DEFINER
+SET search_path = public, pg_temp;
+
+-- Backend (service role) only
+REVOKE EXECUTE ON FUNCTION schedule_notifications(JSONB) FROM PUBLIC, anon, authenticated;
+
+-- -----------------------------------------------------------------------------
+-- Claim up to p_limit due notifications for p_lease_seconds
+-- Rows locked by another worker are skipped rather than waited on. A row
+-- whose lease ran out after p_max_attempts claims (the worker died before
+-- recording an outcome) is marked failed instead of being claimed again.
+-- locked_until is returned as the claim's lease: outcomes are only recorded
+-- on rows still holding it.
+-- -----------------------------------------------------------------------------
+DROP FUNCTION IF EXISTS claim_due_notifications(INTEGER, INTEGER);
+CREATE OR REPLACE FUNCTION claim_due_notifications(
+    p_limit INTEGER,
+    p_lease_seconds INTEGER,
+    p_max_attempts INTEGER
+)
+RETURNS TABLE (id UUID, device_token TEXT, payload JSONB, attempts INTEGER, locked_until TIMESTAMPTZ) AS $$
+    WITH exhausted AS (
+        UPDATE public.scheduled_notifications sn
+        SET status = 'failed',
+            locked_until = NULL,
+            last_error = COALESCE(sn.last_error, 'LeaseExpired')
+        WHERE sn.status = 'pending'
+        AND sn.send_at <= NOW()
+        AND sn.locked_until < NOW()
+        AND sn.attempts >= p_max_attempts
+    )
+    UPDATE public.scheduled_notifications sn
+    SET locked_until = NOW() + make_interval(secs => p_lease_seconds),
+        attempts = sn.attempts + 1
+    WHERE sn.id IN (
+        SELECT due.id
+        FROM public.scheduled_notifications due
+        WHERE due.status = 'pending'
+        AND due.send_at <= NOW()
+        AND (due.locked_until IS NULL OR due.locked_until < NOW())
+        AND due.attempts < p_max_attempts
+        ORDER BY due.send_at
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING sn.id, sn.device_token, sn.payload, sn.attempts, sn.locked_until;
+$$ LANGUAGE sql SECURITY DEFINER
+SET search_path = public, pg_temp;
+
+-- Backend (service role) only
+REVOKE EXECUTE ON FUNCTION claim_due_notifications(INTEGER, INTEGER, INTEGER) FROM PUBLIC, anon, authenticated;
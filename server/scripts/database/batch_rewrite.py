@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Batch Rewrite Engine
+Set-based column rewrites for the food_items maintenance scripts
+
+Rows are streamed with keyset pagination (id > last seen id), a declarative
+mapping decides what should happen to each row, and changes are written
+grouped by target value: one UPDATE ... WHERE id IN (...) per distinct new
+value (and one DELETE for rows to remove) instead of one request per row.
+
+- Memory is bounded by the flush threshold, not by the table size
+- Dry runs report the old → new transitions that would be applied
+- A checkpoint file records the last id whose changes are written, so an
+  interrupted run resumes where it stopped
+
+Used by cleanup_country_column.py, cleanup_language_column.py,
+convert_country_to_english.py and combine_language_country.py.
+"""
+
+import json
+import logging
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from postgrest.types import CountMethod, ReturnMethod
+
+logger = logging.getLogger(__name__)
+
+
+class _Action:
+    """Sentinel mapping result (KEEP or DELETE)."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __repr__(self) -> str:
+        return self.name
+
+
+# Leave the row unchanged
+KEEP = _Action("KEEP")
+# Delete the row
+DELETE = _Action("DELETE")
+
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    One entry of a rule table
+
+    Attributes:
+        label: Statistics bucket for rows matched by this rule
+        matches: Predicate on the normalized column value
+        target: New value, KEEP, DELETE, or a callable(row) returning one of those
+    """
+    label: str
+    matches: Callable[[str], bool]
+    target: Any = KEEP
+
+
+class RuleMapping:
+    """
+    First-match-wins rule table over one column
+
+    Called with a row, returns (label, target) for the first rule whose
+    predicate matches the normalized column value, or (default_label, KEEP).
+    """
+
+    def __init__(
+        self,
+        column: str,
+        rules: Sequence[Rule],
+        default_label: str = "unmatched",
+        normalize: Callable[[Any], str] = lambda value: (value or "").strip()
+    ):
+        self.column = column
+        self.rules = tuple(rules)
+        self.default_label = default_label
+        self.normalize = normalize
+
+    def __call__(self, row: Dict[str, Any]) -> Tuple[str, Any]:
+        value = self.normalize(row.get(self.column))
+        for rule in self.rules:
+            if rule.matches(value):
+                target = rule.target(row) if callable(rule.target) else rule.target
+                return rule.label, target
+        return self.default_label, KEEP
+
+
+@dataclass
+class RewriteStats:
+    """Outcome of a rewrite run."""
+    scanned: int = 0
+    changes: int = 0
+    updated: int = 0
+    deleted: int = 0
+    statements: int = 0
+    resumed_from: Optional[str] = None
+    labels: Counter = field(default_factory=Counter)
+    transitions: Counter = field(default_factory=Counter)
+    examples: List[Dict[str, Any]] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+
+    def diff_lines(self, limit: int = 20) -> List[str]:
+        """Most frequent 'old → new' transitions with their row counts."""
+        lines = [
+            f"{old!r} → {new!r}: {count}"
+            for (old, new), count in self.transitions.most_common(limit)
+        ]
+        if len(self.transitions) > limit:
+            lines.append(f"... and {len(self.transitions) - limit} more distinct changes")
+        return lines
+
+
+class BatchRewriter:
+    """
+    Streams a table and applies a mapping to one column with grouped writes
+
+    The mapping is called with each row and returns (label, target) where
+    target is the new column value, KEEP or DELETE (see RuleMapping).
+    """
+
+    # Rows fetched per page
+    PAGE_SIZE = 1000
+
+    # Pending changes that trigger a flush; bounds memory
+    FLUSH_THRESHOLD = 5000
+
+    # Ids per statement; keeps the id=in.(...) filter well inside URL limits
+    ID_CHUNK_SIZE = 250
+
+    def __init__(
+        self,
+        supabase,
+        table: str,
+        column: str,
+        columns: str,
+        mapping: Callable[[Dict[str, Any]], Tuple[str, Any]],
+        filters: Optional[Callable[[Any], Any]] = None,
+        dry_run: bool = True,
+        checkpoint_file: Optional[str] = None,
+        page_size: int = PAGE_SIZE,
+        flush_threshold: int = FLUSH_THRESHOLD,
+        max_examples: int = 10
+    ):
+        """
+        Initialize the rewriter
+
+        Args:
+            supabase: Supabase client (service role)
+            table: Table to rewrite
+            column: Column the mapping rewrites
+            columns: Columns to select (must include id and column)
+            mapping: Row -> (label, target)
+            filters: Optional function adding filters to the select builder
+            dry_run: Only report what would change
+            checkpoint_file: Where to record progress for resuming (live runs only)
+            page_size: Rows per page
+            flush_threshold: Pending changes before a flush
+            max_examples: Changed rows kept as examples
+        """
+        self.supabase = supabase
+        self.table = table
+        self.column = column
+        self.columns = columns
+        self.mapping = mapping
+        self.filters = filters
+        self.dry_run = dry_run
+        self.checkpoint_file = Path(checkpoint_file) if checkpoint_file else None
+        self.page_size = page_size
+        self.flush_threshold = flush_threshold
+        self.max_examples = max_examples
+
+        self._updates: Dict[Any, List[str]] = defaultdict(list)
+        self._deletes: List[str] = []
+
+    # ------------------------------------------------------------------
+    # Checkpoints
+    # ------------------------------------------------------------------
+
+    def _load_checkpoint(self) -> Optional[str]:
+        if self.checkpoint_file is None or not self.checkpoint_file.exists():
+            return None
+        try:
+            checkpoint = json.loads(self.checkpoint_file.read_text())
+        except (OSError, json.JSONDecodeError):
+            return None
+        if checkpoint.get("table") != self.table or checkpoint.get("column") != self.column:
+            return None
+        return checkpoint.get("last_id")
+
+    def _save_checkpoint(self, last_id: str):
+        if self.checkpoint_file is None or self.dry_run:
+            return
+        self.checkpoint_file.write_text(json.dumps({
+            "table": self.table,
+            "column": self.column,
+            "last_id": last_id
+        }))
+
+    def _clear_checkpoint(self):
+        if self.checkpoint_file is not None and not self.dry_run and self.checkpoint_file.exists():
+            self.checkpoint_file.unlink()
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def iter_pages(self, after: Optional[str] = None) -> Iterator[List[Dict[str, Any]]]:
+        """Yield pages of rows ordered by id, starting after the given id."""
+        while True:
+            builder = self.supabase.table(self.table).select(self.columns)
+            if self.filters is not None:
+                builder = self.filters(builder)
+            if after is not None:
+                builder = builder.gt("id", after)
+            rows = builder.order("id").limit(self.page_size).execute().data or []
+            if not rows:
+                return
+
+            yield rows
+
+            after = rows[-1]["id"]
+            if len(rows) < self.page_size:
+                return
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    @property
+    def pending(self) -> int:
+        return len(self._deletes) + sum(len(ids) for ids in self._updates.values())
+
+    def _flush(self, stats: RewriteStats):
+        """Write pending changes: one statement per target value (per id chunk)."""
+        updates, self._updates = self._updates, defaultdict(list)
+        deletes, self._deletes = self._deletes, []
+        if self.dry_run:
+            return
+
+        for value, ids in updates.items():
+            for start in range(0, len(ids), self.ID_CHUNK_SIZE):
+                chunk = ids[start:start + self.ID_CHUNK_SIZE]
+                try:
+                    response = self.supabase.table(self.table).update(
+                        {self.column: value},
+                        count=CountMethod.exact,
+                        returning=ReturnMethod.minimal
+                    ).in_("id", chunk).execute()
+                    stats.updated += response.count if response.count is not None else len(chunk)
+                    stats.statements += 1
+                except Exception as e:
+                    error_msg = f"Error setting {self.column}={value!r} on {len(chunk)} rows: {e}"
+                    logger.error(error_msg)
+                    stats.errors.append(error_msg)
+
+        for start in range(0, len(deletes), self.ID_CHUNK_SIZE):
+            chunk = deletes[start:start + self.ID_CHUNK_SIZE]
+            try:
+                response = self.supabase.table(self.table).delete(
+                    count=CountMethod.exact,
+                    returning=ReturnMethod.minimal
+                ).in_("id", chunk).execute()
+                stats.deleted += response.count if response.count is not None else len(chunk)
+                stats.statements += 1
+            except Exception as e:
+                error_msg = f"Error deleting {len(chunk)} rows: {e}"
+                logger.error(error_msg)
+                stats.errors.append(error_msg)
+
+        logger.info(
+            f"💾 Written so far: {stats.updated} updated, {stats.deleted} deleted "
+            f"({stats.statements} statements)"
+        )
+
+    # ------------------------------------------------------------------
+    # Running
+    # ------------------------------------------------------------------
+
+    def _record(self, row: Dict[str, Any], stats: RewriteStats):
+        label, target = self.mapping(row)
+        stats.labels[label] += 1
+
+        old_value = row.get(self.column)
+        if target is KEEP or target == old_value:
+            return
+
+        stats.changes += 1
+        if target is DELETE:
+            self._deletes.append(row["id"])
+            stats.transitions[(old_value, "<deleted>")] += 1
+        else:
+            self._updates[target].append(row["id"])
+            stats.transitions[(old_value, target)] += 1
+
+        if len(stats.examples) < self.max_examples:
+            stats.examples.append({**row, "label": label, "new_value": target})
+
+    def run(self, resume: bool = True) -> RewriteStats:
+        """
+        Stream the table once, applying and writing changes as it goes
+
+        Blocking: the Supabase client is synchronous and pages are written
+        before the next one is read.
+
+        Args:
+            resume: Continue after the id stored in the checkpoint file
+
+        Returns:
+            RewriteStats for the rows scanned in this run
+        """
+        stats = RewriteStats()
+        after = self._load_checkpoint() if resume else None
+        if after is not None:
+            stats.resumed_from = after
+            logger.info(f"🔄 Resuming {self.table}.{self.column} rewrite after id {after}")
+
+        for rows in self.iter_pages(after):
+            for row in rows:
+                stats.scanned += 1
+                self._record(row, stats)
+
+            if self.pending >= self.flush_threshold:
+                self._flush(stats)
+            # Everything up to this page is written once nothing is pending
+            if self.pending == 0 and not stats.errors:
+                self._save_checkpoint(rows[-1]["id"])
+
+            logger.info(f"📦 Scanned {stats.scanned} rows, {stats.changes} changes so far...")
+
+        self._flush(stats)
+        if not stats.errors:
+            self._clear_checkpoint()
+        return stats
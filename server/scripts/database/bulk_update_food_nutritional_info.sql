@@ -0,0 +1,35 @@
+-- Migration: Bulk nutritional_info updates for the standardizor
+-- Date: 2026-10-18
+-- Description: standardizor/update_nutritional_info.py sends changed rows in batches of
+--              hundreds through this function instead of one PATCH per record. Each batch
+--              is applied with a single UPDATE ... FROM jsonb_to_recordset; rows whose
+--              nutritional_info is already identical are left untouched.
+--              Requires add_food_items_quality_score.sql and add_food_items_quality_version.sql.
+
+-- Bulk nutritional_info updates from the standardizor (one UPDATE ... FROM per batch)
+-- p_rows: [{"id": uuid, "nutritional_info": jsonb, "quality_score": number, "quality_level": text, "quality_version": text}, ...]
+CREATE OR REPLACE FUNCTION bulk_update_food_nutritional_info(p_rows JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+    v_updated INTEGER;
+BEGIN
+    UPDATE public.food_items f
+    SET nutritional_info = r.nutritional_info,
+        quality_score = r.quality_score,
+        quality_level = r.quality_level,
+        quality_version = r.quality_version,
+        quality_scored_at = NOW()
+    FROM jsonb_to_recordset(p_rows) AS r(
+        id UUID, nutritional_info JSONB, quality_score DECIMAL(4,3), quality_level TEXT, quality_version TEXT
+    )
+    WHERE f.id = r.id
+      AND f.nutritional_info IS DISTINCT FROM r.nutritional_info;
+
+    GET DIAGNOSTICS v_updated = ROW_COUNT;
+    RETURN v_updated;
+END;
+$$ LANGUAGE plpgsql
+SET search_path = public;
+
+-- Backend (service role) only
+REVOKE EXECUTE ON FUNCTION bulk_update_food_nutritional_info(JSONB) FROM PUBLIC, anon, authenticated;
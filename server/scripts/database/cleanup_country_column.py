@@ -24,13 +24,17 @@ This script will:
 18. Replace those with 'en:United States'
 19. Provide statistics on what was cleaned up
 
+Rows are streamed once with keyset pagination and rewritten with grouped bulk
+updates (see batch_rewrite.py). Interrupted live runs resume from a checkpoint.
+
 Usage:
-    python scripts/database/cleanup_country_column.py [--dry-run] [--confirm]
+    python scripts/database/cleanup_country_column.py [--dry-run] [--confirm] [--restart]
 """
 
 import asyncio
 import sys
 import os
+from pathlib import Path
 from typing import List, Dict, Any
 from datetime import datetime
 from dotenv import load_dotenv
@@ -38,10 +42,11 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
-# Add the parent directory to the path so we can import app modules
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Add the server directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from app.core.config import settings
+from batch_rewrite import BatchRewriter, Rule, RuleMapping
 import logging
 
 # Configure logging
@@ -51,21 +56,46 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+US_COUNTRY = 'en:United States'
+
+CHECKPOINT_FILE = Path(__file__).with_suffix('.checkpoint.json')
+
+# Checked in order; the first matching rule decides (values are stripped)
+US_COUNTRY_RULES = RuleMapping('country', [
+    Rule('records_already_correct', lambda c: c == US_COUNTRY),
+    # 'en:US' in any capacity (must be checked before standalone 'US')
+    Rule('records_with_en_us', lambda c: 'en:us' in c.lower(), US_COUNTRY),
+    Rule('records_with_en_united_states_hyphen', lambda c: c.lower() == 'en:united-states', US_COUNTRY),
+    Rule('records_with_united_states', lambda c: c.lower() == 'united states', US_COUNTRY),
+    Rule('records_with_us_only', lambda c: c.lower() == 'us', US_COUNTRY),
+    Rule('records_with_united_states_hyphen', lambda c: c.lower() == 'united-states', US_COUNTRY),
+    Rule('records_with_usa', lambda c: c.lower() == 'usa', US_COUNTRY),
+    Rule('records_with_etats_unis', lambda c: c.casefold() == 'états-unis', US_COUNTRY),
+    Rule('records_with_united_states_of_america', lambda c: 'united states of america' in c.lower(), US_COUNTRY),
+    # e.g. 'United States, Canada'
+    Rule('records_containing_united_states', lambda c: 'united states' in c.lower(), US_COUNTRY),
+], default_label='records_other')
+
+US_COUNTRY_LABELS = [rule.label for rule in US_COUNTRY_RULES.rules]
+
 
 class CountryColumnCleanup:
     """
     Handles database cleanup operations for country column standardization
     """
     
-    def __init__(self, dry_run: bool = True):
+    def __init__(self, dry_run: bool = True, resume: bool = True):
         """
         Initialize the cleanup handler
         
         Args:
             dry_run: If True, only analyze data without making changes
+            resume: Continue an interrupted live run from its checkpoint
         """
         self.dry_run = dry_run
+        self.resume = resume
         self.supabase = None
+        self.result = None
         self.stats = {
             'total_records': 0,
             'records_with_en_us': 0,
@@ -103,21 +133,26 @@ class CountryColumnCleanup:
             logger.error(f"❌ Failed to initialize database: {e}")
             return False
     
-    async def analyze_data(self) -> Dict[str, Any]:
+    async def cleanup_records(self) -> Dict[str, Any]:
         """
-        Analyze the current state of country column in food_items table
+        Stream food_items once and standardize US country values
+        
+        Matching rows are rewritten with one grouped update per batch of ids
+        (all targets are 'en:United States'); in dry-run mode nothing is written.
         
         Returns:
-            Dict containing analysis results
+            Dict containing cleanup results
         """
-        logger.info("🔍 Analyzing country column in food_items table...")
+        logger.info("🔍 Analyzing and cleaning country column in food_items table...")
+        if self.dry_run:
+            logger.info("🔍 DRY RUN MODE - No records will be updated")
         
         try:
             # Get total count of food items with country values
             total_response = self.supabase.table("food_items").select(
                 "id", 
                 count="exact"
-            ).not_.is_("country", "null").execute()
+            ).not_.is_("country", "null").limit(1).execute()
             
             self.stats['total_records'] = total_response.count or 0
             
@@ -127,231 +162,39 @@ class CountryColumnCleanup:
                 logger.warning("⚠️  No food items with country values found in database")
                 return self.stats
             
-            # Get all food items with country values (handle pagination)
-            logger.info("📋 Fetching food items with country values...")
-            all_food_items = []
-            page_size = 1000
-            offset = 0
-            
-            while True:
-                response = self.supabase.table("food_items").select(
-                    "id, name, brand, country"
-                ).not_.is_("country", "null").range(offset, offset + page_size - 1).execute()
-                
-                if not response.data:
-                    break
-                    
-                all_food_items.extend(response.data)
-                offset += page_size
-                
-                logger.info(f"📦 Retrieved {len(all_food_items)} food items so far...")
-                
-                # Break if we got fewer items than page size (last page)
-                if len(response.data) < page_size:
-                    break
-            
-            food_items = all_food_items
-            logger.info(f"📦 Retrieved {len(food_items)} food items total")
-            
-            # Analyze each item
-            items_to_update = []
-            items_with_en_us = []
-            items_with_en_united_states_hyphen = []
-            items_with_united_states = []
-            items_with_us_only = []
-            items_with_united_states_hyphen = []
-            items_with_usa = []
-            items_with_united_states_of_america = []
-            items_containing_united_states = []
-            items_with_etats_unis = []
-            items_already_correct = []
-            
-            for item in food_items:
-                country = item.get('country', '').strip()
-                country_lower = country.lower()
-                country_casefold = country.casefold()
-                
-                if not country:
-                    continue
-                
-                # Check if already correct first (skip processing)
-                if country == 'en:United States':
-                    items_already_correct.append(item)
-                    continue
-                
-                # Check if country contains 'en:US' or 'en:us' in any capacity (case-insensitive, must check before standalone US)
-                if 'en:us' in country_lower:
-                    items_with_en_us.append(item)
-                    items_to_update.append({
-                        'id': item['id'],
-                        'old_country': country,
-                        'new_country': 'en:United States'
-                    })
-                # Check if country is exactly 'en:united-states' (case-insensitive)
-                elif country_lower == 'en:united-states':
-                    items_with_en_united_states_hyphen.append(item)
-                    items_to_update.append({
-                        'id': item['id'],
-                        'old_country': country,
-                        'new_country': 'en:United States'
-                    })
-                # Check if country is exactly 'United States' (case-insensitive, without prefix)
-                elif country_lower == 'united states':
-                    items_with_united_states.append(item)
-                    items_to_update.append({
-                        'id': item['id'],
-                        'old_country': country,
-                        'new_country': 'en:United States'
-                    })
-                # Check if country is exactly 'US' (case-insensitive, without prefix)
-                # Only match if it's not already handled by 'en:US' check above
-                elif country_lower == 'us':
-                    items_with_us_only.append(item)
-                    items_to_update.append({
-                        'id': item['id'],
-                        'old_country': country,
-                        'new_country': 'en:United States'
-                    })
-                # Check if country is exactly 'united-states' (case-insensitive, without prefix)
-                elif country_lower == 'united-states':
-                    items_with_united_states_hyphen.append(item)
-                    items_to_update.append({
-                        'id': item['id'],
-                        'old_country': country,
-                        'new_country': 'en:United States'
-                    })
-                # Check if country is exactly 'USA' (case-insensitive)
-                elif country_lower == 'usa':
-                    items_with_usa.append(item)
-                    items_to_update.append({
-                        'id': item['id'],
-                        'old_country': country,
-                        'new_country': 'en:United States'
-                    })
-                # Check if country is exactly 'États-Unis' (case-insensitive, French for United States)
-                elif country_casefold == 'états-unis':
-                    items_with_etats_unis.append(item)
-                    items_to_update.append({
-                        'id': item['id'],
-                        'old_country': country,
-                        'new_country': 'en:United States'
-                    })
-                # Check if country contains 'United States of America' (case-insensitive)
-                elif 'united states of america' in country_lower:
-                    items_with_united_states_of_america.append(item)
-                    items_to_update.append({
-                        'id': item['id'],
-                        'old_country': country,
-                        'new_country': 'en:United States'
-                    })
-                # Check if country contains 'United States' (but not already matched above)
-                # This catches cases like "United States, Canada" or similar
-                elif 'united states' in country_lower:
-                    items_containing_united_states.append(item)
-                    items_to_update.append({
-                        'id': item['id'],
-                        'old_country': country,
-                        'new_country': 'en:United States'
-                    })
-            
-            self.stats['records_with_en_us'] = len(items_with_en_us)
-            self.stats['records_with_en_united_states_hyphen'] = len(items_with_en_united_states_hyphen)
-            self.stats['records_with_united_states'] = len(items_with_united_states)
-            self.stats['records_with_us_only'] = len(items_with_us_only)
-            self.stats['records_with_united_states_hyphen'] = len(items_with_united_states_hyphen)
-            self.stats['records_with_usa'] = len(items_with_usa)
-            self.stats['records_with_united_states_of_america'] = len(items_with_united_states_of_america)
-            self.stats['records_containing_united_states'] = len(items_containing_united_states)
-            self.stats['records_with_etats_unis'] = len(items_with_etats_unis)
-            self.stats['records_already_correct'] = len(items_already_correct)
-            
-            # Store items to update for later use
-            self.items_to_update = items_to_update
+            rewriter = BatchRewriter(
+                self.supabase,
+                table="food_items",
+                column="country",
+                columns="id, name, brand, country",
+                mapping=US_COUNTRY_RULES,
+                filters=lambda builder: builder.not_.is_("country", "null"),
+                dry_run=self.dry_run,
+                checkpoint_file=CHECKPOINT_FILE
+            )
+            self.result = rewriter.run(resume=self.resume)
             
-            # Log analysis results
-            logger.info(f"📊 Analysis Results:")
-            logger.info(f"  Records containing 'en:US': {self.stats['records_with_en_us']}")
-            logger.info(f"  Records with 'en:united-states': {self.stats['records_with_en_united_states_hyphen']}")
-            logger.info(f"  Records with 'United States' (exact, no prefix): {self.stats['records_with_united_states']}")
-            logger.info(f"  Records with 'US' (no prefix): {self.stats['records_with_us_only']}")
-            logger.info(f"  Records with 'united-states' (no prefix): {self.stats['records_with_united_states_hyphen']}")
-            logger.info(f"  Records with 'USA': {self.stats['records_with_usa']}")
-            logger.info(f"  Records with 'United States of America': {self.stats['records_with_united_states_of_america']}")
-            logger.info(f"  Records containing 'United States' (e.g., 'United States, Canada'): {self.stats['records_containing_united_states']}")
-            logger.info(f"  Records with 'États-Unis' (French): {self.stats['records_with_etats_unis']}")
-            logger.info(f"  Records already correct: {self.stats['records_already_correct']}")
-            logger.info(f"  Total records to update: {len(items_to_update)}")
+            for label in US_COUNTRY_LABELS:
+                self.stats[label] = self.result.labels[label]
+            self.stats['records_updated'] = self.result.updated
+            self.stats['errors'].extend(self.result.errors)
             
-            # Show some examples of items that will be updated
-            if items_to_update:
+            # Show some examples of items that were (or would be) updated
+            if self.result.examples:
                 logger.info("📝 Sample items to be updated:")
-                for i, item_update in enumerate(items_to_update[:10]):  # Show first 10
-                    # Find the full item data for display
-                    item_data = next(
-                        (item for item in food_items if item['id'] == item_update['id']), 
-                        None
+                for i, item in enumerate(self.result.examples):
+                    logger.info(
+                        f"  {i+1}. {item.get('name', 'Unknown')} "
+                        f"(Brand: {item.get('brand', 'Unknown')}) "
+                        f"[{item['country']} → {item['new_value']}]"
                     )
-                    if item_data:
-                        logger.info(
-                            f"  {i+1}. {item_data.get('name', 'Unknown')} "
-                            f"(Brand: {item_data.get('brand', 'Unknown')}) "
-                            f"[{item_update['old_country']} → {item_update['new_country']}]"
-                        )
-                if len(items_to_update) > 10:
-                    logger.info(f"  ... and {len(items_to_update) - 10} more")
-            
-            return self.stats
-            
-        except Exception as e:
-            error_msg = f"Error analyzing data: {e}"
-            logger.error(error_msg)
-            self.stats['errors'].append(error_msg)
-            return self.stats
-    
-    async def cleanup_records(self) -> Dict[str, Any]:
-        """
-        Update food items with standardized country values
-        
-        Returns:
-            Dict containing cleanup results
-        """
-        if self.dry_run:
-            logger.info("🔍 DRY RUN MODE - No records will be updated")
-            return self.stats
-        
-        if not hasattr(self, 'items_to_update') or not self.items_to_update:
-            logger.info("✅ No records need to be updated")
-            return self.stats
-        
-        logger.info("🧹 Starting country column cleanup...")
-        
-        try:
-            updated_count = 0
-            
-            # Update records one by one to ensure accuracy
-            # (Supabase doesn't support batch updates with different values easily)
-            for i, item_update in enumerate(self.items_to_update):
-                try:
-                    # Update the record
-                    update_response = self.supabase.table("food_items").update({
-                        'country': item_update['new_country']
-                    }).eq('id', item_update['id']).execute()
-                    
-                    if update_response.data:
-                        updated_count += 1
-                    
-                    # Log progress every 100 records
-                    if (i + 1) % 100 == 0:
-                        logger.info(f"📊 Updated {i + 1} of {len(self.items_to_update)} records...")
-                        
-                except Exception as e:
-                    error_msg = f"Error updating record {item_update['id']}: {e}"
-                    logger.error(error_msg)
-                    self.stats['errors'].append(error_msg)
-            
-            self.stats['records_updated'] = updated_count
-            logger.info(f"✅ Cleanup completed. Updated {updated_count} records")
+                if self.result.changes > len(self.result.examples):
+                    logger.info(f"  ... and {self.result.changes - len(self.result.examples)} more")
             
+            logger.info(
+                f"✅ Scanned {self.result.scanned} records, {self.result.changes} changes, "
+                f"{self.result.updated} updated in {self.result.statements} statements"
+            )
             return self.stats
             
         except Exception as e:
@@ -398,8 +241,16 @@ class CountryColumnCleanup:
         report.append(f"  Records with 'États-Unis' (French): {self.stats['records_with_etats_unis']}")
         report.append(f"  Records already correct: {self.stats['records_already_correct']}")
         report.append(f"  Records updated: {self.stats['records_updated']}")
+        if self.result and self.result.resumed_from:
+            report.append(f"  (resumed after id {self.result.resumed_from}; counts cover this run only)")
         report.append("")
         
+        if self.result and self.result.transitions:
+            report.append("🔄 CHANGES (old → new: rows):")
+            for line in self.result.diff_lines():
+                report.append(f"  {line}")
+            report.append("")
+        
         if self.stats['errors']:
             report.append("❌ ERRORS:")
             for error in self.stats['errors']:
@@ -450,10 +301,7 @@ class CountryColumnCleanup:
             if not await self.initialize():
                 return False
             
-            # Analyze current data
-            await self.analyze_data()
-            
-            # Perform cleanup
+            # Analyze and clean up in one pass
             await self.cleanup_records()
             
             # Generate and display report
@@ -492,6 +340,11 @@ async def main():
         action="store_true", 
         help="Confirm that you want to update records"
     )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Ignore the checkpoint of an interrupted run and start from the beginning"
+    )
     
     args = parser.parse_args()
     
@@ -513,7 +366,7 @@ async def main():
                 return
     
     # Create cleanup handler
-    cleanup = CountryColumnCleanup(dry_run=dry_run)
+    cleanup = CountryColumnCleanup(dry_run=dry_run, resume=not args.restart)
     
     # Run cleanup
     success = await cleanup.cleanup()
@@ -8,13 +8,18 @@ This script will:
 2. Delete those records
 3. Provide statistics on what was cleaned up
 
+Rows are streamed once with keyset pagination and deleted in grouped batches
+(see batch_rewrite.py). Interrupted live runs resume from a checkpoint.
+
 Usage:
-    python scripts/database/cleanup_language_column.py [--dry-run] [--confirm]
+    python scripts/database/cleanup_language_column.py [--dry-run] [--confirm] [--restart]
 """
 
 import asyncio
 import sys
 import os
+from collections import Counter
+from pathlib import Path
 from typing import List, Dict, Any
 from datetime import datetime
 from dotenv import load_dotenv
@@ -22,10 +27,11 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
-# Add the parent directory to the path so we can import app modules
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Add the server directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from app.core.config import settings
+from batch_rewrite import DELETE, BatchRewriter, Rule, RuleMapping
 import logging
 
 # Configure logging
@@ -35,21 +41,33 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+CHECKPOINT_FILE = Path(__file__).with_suffix('.checkpoint.json')
+
+# Keep 'en' and 'es' (case-insensitive); delete everything else, including null/empty
+LANGUAGE_RULES = RuleMapping('language', [
+    Rule('records_with_en', lambda language: language == 'en'),
+    Rule('records_with_es', lambda language: language == 'es'),
+    Rule('records_to_delete', lambda language: True, DELETE),
+], normalize=lambda value: (value or '').strip().lower())
+
 
 class LanguageColumnCleanup:
     """
     Handles database cleanup operations for language column filtering
     """
     
-    def __init__(self, dry_run: bool = True):
+    def __init__(self, dry_run: bool = True, resume: bool = True):
         """
         Initialize the cleanup handler
         
         Args:
             dry_run: If True, only analyze data without making changes
+            resume: Continue an interrupted live run from its checkpoint
         """
         self.dry_run = dry_run
+        self.resume = resume
         self.supabase = None
+        self.result = None
         self.stats = {
             'total_records': 0,
             'records_with_en': 0,
@@ -81,21 +99,27 @@ class LanguageColumnCleanup:
             logger.error(f"❌ Failed to initialize database: {e}")
             return False
     
-    async def analyze_data(self) -> Dict[str, Any]:
+    async def cleanup_records(self) -> Dict[str, Any]:
         """
-        Analyze the current state of language column in food_items table
+        Stream food_items once and delete items that don't have language 'en' or 'es'
+        
+        This deletes all records where language is NOT 'en' or 'es' (including
+        null/empty values), in grouped batches of ids. In dry-run mode nothing
+        is deleted.
         
         Returns:
-            Dict containing analysis results
+            Dict containing cleanup results
         """
-        logger.info("🔍 Analyzing language column in food_items table...")
+        logger.info("🔍 Analyzing and cleaning language column in food_items table...")
+        if self.dry_run:
+            logger.info("🔍 DRY RUN MODE - No records will be deleted")
         
         try:
             # Get total count of food items
             total_response = self.supabase.table("food_items").select(
                 "id", 
                 count="exact"
-            ).execute()
+            ).limit(1).execute()
             
             self.stats['total_records'] = total_response.count or 0
             
@@ -105,157 +129,51 @@ class LanguageColumnCleanup:
                 logger.warning("⚠️  No food items found in database")
                 return self.stats
             
-            # Get all food items with language values (handle pagination)
-            logger.info("📋 Fetching food items...")
-            all_food_items = []
-            page_size = 1000
-            offset = 0
-            
-            while True:
-                response = self.supabase.table("food_items").select(
-                    "id, name, brand, language"
-                ).range(offset, offset + page_size - 1).execute()
-                
-                if not response.data:
-                    break
-                    
-                all_food_items.extend(response.data)
-                offset += page_size
-                
-                logger.info(f"📦 Retrieved {len(all_food_items)} food items so far...")
-                
-                # Break if we got fewer items than page size (last page)
-                if len(response.data) < page_size:
-                    break
+            language_distribution = Counter()
             
-            food_items = all_food_items
-            logger.info(f"📦 Retrieved {len(food_items)} food items total")
-            
-            # Analyze each item
-            items_to_delete = []
-            items_with_en = []
-            items_with_es = []
-            language_distribution = {}
-            
-            for item in food_items:
-                language = item.get('language', '').strip().lower() if item.get('language') else ''
-                
+            def mapping(row):
                 # Track language distribution
-                lang_key = language if language else 'null/empty'
-                language_distribution[lang_key] = language_distribution.get(lang_key, 0) + 1
-                
-                # Keep 'en' and 'es' (case-insensitive)
-                if language == 'en':
-                    items_with_en.append(item)
-                elif language == 'es':
-                    items_with_es.append(item)
-                else:
-                    # Mark for deletion (null, empty, or any other language)
-                    items_to_delete.append(item)
+                language = (row.get('language') or '').strip().lower()
+                language_distribution[language or 'null/empty'] += 1
+                return LANGUAGE_RULES(row)
             
-            self.stats['records_with_en'] = len(items_with_en)
-            self.stats['records_with_es'] = len(items_with_es)
-            self.stats['records_to_delete'] = len(items_to_delete)
-            self.stats['language_distribution'] = language_distribution
+            rewriter = BatchRewriter(
+                self.supabase,
+                table="food_items",
+                column="language",
+                columns="id, name, brand, language",
+                mapping=mapping,
+                dry_run=self.dry_run,
+                checkpoint_file=CHECKPOINT_FILE
+            )
+            self.result = rewriter.run(resume=self.resume)
             
-            # Store items to delete for later use
-            self.items_to_delete = items_to_delete
+            for label in ('records_with_en', 'records_with_es', 'records_to_delete'):
+                self.stats[label] = self.result.labels[label]
+            self.stats['records_deleted'] = self.result.deleted
+            self.stats['language_distribution'] = dict(language_distribution)
+            self.stats['errors'].extend(self.result.errors)
             
             # Log analysis results
-            logger.info(f"📊 Analysis Results:")
+            logger.info(f"📊 Results:")
             logger.info(f"  Records with language 'en': {self.stats['records_with_en']}")
             logger.info(f"  Records with language 'es': {self.stats['records_with_es']}")
             logger.info(f"  Records to delete (not 'en' or 'es'): {self.stats['records_to_delete']}")
-            logger.info("")
-            logger.info("📋 Language Distribution:")
-            for lang, count in sorted(language_distribution.items(), key=lambda x: x[1], reverse=True):
-                logger.info(f"  '{lang}': {count}")
+            logger.info(f"  Records deleted: {self.stats['records_deleted']} ({self.result.statements} statements)")
             
-            # Show some examples of items that will be deleted
-            if items_to_delete:
+            # Show some examples of items that were (or would be) deleted
+            if self.result.examples:
                 logger.info("")
                 logger.info("📝 Sample items to be deleted:")
-                for i, item in enumerate(items_to_delete[:10]):  # Show first 10
+                for i, item in enumerate(self.result.examples):
                     lang = item.get('language', 'null/empty')
                     logger.info(
                         f"  {i+1}. {item.get('name', 'Unknown')} "
                         f"(Brand: {item.get('brand', 'Unknown')}) "
                         f"[Language: '{lang}']"
                     )
-                if len(items_to_delete) > 10:
-                    logger.info(f"  ... and {len(items_to_delete) - 10} more")
-            
-            return self.stats
-            
-        except Exception as e:
-            error_msg = f"Error analyzing data: {e}"
-            logger.error(error_msg)
-            self.stats['errors'].append(error_msg)
-            return self.stats
-    
-    async def cleanup_records(self) -> Dict[str, Any]:
-        """
-        Delete food items that don't have language 'en' or 'es'
-        
-        This method deletes all records where language is NOT 'en' or 'es'
-        (including null/empty values).
-        
-        Returns:
-            Dict containing cleanup results
-        """
-        if self.dry_run:
-            logger.info("🔍 DRY RUN MODE - No records will be deleted")
-            logger.info(f"   Would delete {self.stats['records_to_delete']} records")
-            return self.stats
-        
-        if not hasattr(self, 'items_to_delete') or not self.items_to_delete:
-            logger.info("✅ No records need to be deleted")
-            return self.stats
-        
-        logger.info(f"🧹 Starting language column cleanup...")
-        logger.info(f"   Will delete {len(self.items_to_delete)} records")
-        
-        try:
-            deleted_count = 0
-            failed_count = 0
-            
-            # Delete records one by one to ensure accuracy and proper error handling
-            # This approach ensures we only delete exactly what we analyzed
-            for i, item in enumerate(self.items_to_delete):
-                try:
-                    # Delete the record by ID
-                    delete_response = self.supabase.table("food_items").delete().eq(
-                        'id', item['id']
-                    ).execute()
-                    
-                    # Check if deletion was successful
-                    # Supabase returns deleted data or empty list
-                    if delete_response.data is not None:
-                        deleted_count += 1
-                    else:
-                        # If no data returned but no error, record might not exist
-                        # Log it but count as successful (might have been deleted already)
-                        logger.debug(f"Record {item['id']} returned no data (might already be deleted)")
-                        deleted_count += 1
-                    
-                    # Log progress every 100 records
-                    if (i + 1) % 100 == 0:
-                        logger.info(
-                            f"📊 Progress: {i + 1}/{len(self.items_to_delete)} "
-                            f"deleted, {failed_count} failed"
-                        )
-                        
-                except Exception as e:
-                    failed_count += 1
-                    error_msg = f"Error deleting record {item['id']} ({item.get('name', 'Unknown')}): {e}"
-                    logger.error(error_msg)
-                    self.stats['errors'].append(error_msg)
-            
-            self.stats['records_deleted'] = deleted_count
-            logger.info(f"✅ Cleanup completed:")
-            logger.info(f"   Successfully deleted: {deleted_count} records")
-            if failed_count > 0:
-                logger.warning(f"   Failed to delete: {failed_count} records")
+                if self.result.changes > len(self.result.examples):
+                    logger.info(f"  ... and {self.result.changes - len(self.result.examples)} more")
             
             return self.stats
             
@@ -286,6 +204,8 @@ class LanguageColumnCleanup:
         report.append(f"  Records with language 'es': {self.stats['records_with_es']}")
         report.append(f"  Records to delete: {self.stats['records_to_delete']}")
         report.append(f"  Records deleted: {self.stats['records_deleted']}")
+        if self.result and self.result.resumed_from:
+            report.append(f"  (resumed after id {self.result.resumed_from}; counts cover this run only)")
         report.append("")
         
         report.append("📋 LANGUAGE DISTRIBUTION:")
@@ -338,10 +258,7 @@ class LanguageColumnCleanup:
             if not await self.initialize():
                 return False
             
-            # Analyze current data
-            await self.analyze_data()
-            
-            # Perform cleanup
+            # Analyze and clean up in one pass
             await self.cleanup_records()
             
             # Generate and display report
@@ -380,6 +297,11 @@ async def main():
         action="store_true", 
         help="Confirm that you want to delete records"
     )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Ignore the checkpoint of an interrupted run and start from the beginning"
+    )
     
     args = parser.parse_args()
     
@@ -403,7 +325,7 @@ async def main():
                 return
     
     # Create cleanup handler
-    cleanup = LanguageColumnCleanup(dry_run=dry_run)
+    cleanup = LanguageColumnCleanup(dry_run=dry_run, resume=not args.restart)
     
     # Run cleanup
     success = await cleanup.cleanup()
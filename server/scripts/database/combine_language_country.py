@@ -10,24 +10,30 @@ This script will:
 4. Update the country column with the combined value
 5. Provide statistics on what was updated
 
+Rows are streamed once with keyset pagination and rewritten with one grouped
+update per distinct combined value (see batch_rewrite.py). Interrupted live
+runs resume from a checkpoint.
+
 Usage:
-    python scripts/database/combine_language_country.py [--dry-run] [--confirm]
+    python scripts/database/combine_language_country.py [--dry-run] [--confirm] [--restart]
 """
 
 import asyncio
 import sys
 import os
-from typing import List, Dict, Any, Optional
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Add the parent directory to the path so we can import app modules
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Add the server directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from app.core.config import settings
+from batch_rewrite import KEEP, BatchRewriter
 import logging
 
 # Configure logging
@@ -37,21 +43,26 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+CHECKPOINT_FILE = Path(__file__).with_suffix('.checkpoint.json')
+
 
 class LanguageCountryCombiner:
     """
     Handles combining language and country columns in food_items table
     """
     
-    def __init__(self, dry_run: bool = True):
+    def __init__(self, dry_run: bool = True, resume: bool = True):
         """
         Initialize the combiner
         
         Args:
             dry_run: If True, only analyze data without making changes
+            resume: Continue an interrupted live run from its checkpoint
         """
         self.dry_run = dry_run
+        self.resume = resume
         self.supabase = None
+        self.result = None
         self.stats = {
             'total_records': 0,
             'records_with_both_values': 0,
@@ -143,21 +154,51 @@ class LanguageCountryCombiner:
         
         return False
     
-    async def analyze_data(self) -> Dict[str, Any]:
+    def _classify(self, row: Dict[str, Any]) -> Tuple[str, Any]:
         """
-        Analyze the current state of language and country columns in food_items table
+        Batch rewrite mapping: statistics label and new country value for a row
         
+        Args:
+            row: food_items row with language and country
+            
         Returns:
-            Dict containing analysis results
+            (label, 'language:country') for rows to update, (label, KEEP) otherwise
         """
-        logger.info("🔍 Analyzing language and country columns in food_items table...")
+        language = (row.get('language') or '').strip()
+        country = (row.get('country') or '').strip()
+        
+        if not language:
+            return 'records_missing_language', KEEP
+        if not country:
+            return 'records_missing_country', KEEP
+        if self._is_already_formatted(language, country):
+            return 'records_already_formatted', KEEP
+        
+        combined = self._combine_language_country(language, country)
+        if not combined:
+            return 'records_invalid', KEEP
+        return 'records_to_update', combined
+    
+    async def combine_records(self) -> Dict[str, Any]:
+        """
+        Stream food_items once and update country with the combined language:country format
+        
+        Changed rows are written with one grouped update per distinct combined
+        value; in dry-run mode nothing is written.
+        
+        Returns:
+            Dict containing combination results
+        """
+        logger.info("🔍 Analyzing and combining language and country columns in food_items table...")
+        if self.dry_run:
+            logger.info("🔍 DRY RUN MODE - No records will be updated")
         
         try:
             # Get total count of food items
             total_response = self.supabase.table("food_items").select(
                 "id", 
                 count="exact"
-            ).execute()
+            ).limit(1).execute()
             
             self.stats['total_records'] = total_response.count or 0
             
@@ -167,170 +208,49 @@ class LanguageCountryCombiner:
                 logger.warning("⚠️  No food items found in database")
                 return self.stats
             
-            # Get all food items with both language and country values (handle pagination)
-            logger.info("📋 Fetching food items...")
-            all_food_items = []
-            page_size = 1000
-            offset = 0
-            
-            while True:
-                response = self.supabase.table("food_items").select(
-                    "id, name, brand, language, country"
-                ).range(offset, offset + page_size - 1).execute()
-                
-                if not response.data:
-                    break
-                    
-                all_food_items.extend(response.data)
-                offset += page_size
-                
-                logger.info(f"📦 Retrieved {len(all_food_items)} food items so far...")
-                
-                # Break if we got fewer items than page size (last page)
-                if len(response.data) < page_size:
-                    break
-            
-            food_items = all_food_items
-            logger.info(f"📦 Retrieved {len(food_items)} food items total")
-            
-            # Analyze each item
-            items_to_update = []
-            items_with_both = []
-            items_missing_language = []
-            items_missing_country = []
-            items_already_formatted = []
-            
-            for item in food_items:
-                language = item.get('language', '').strip() if item.get('language') else ''
-                country = item.get('country', '').strip() if item.get('country') else ''
-                
-                # Check if language is missing
-                if not language:
-                    items_missing_language.append(item)
-                    continue
-                
-                # Check if country is missing
-                if not country:
-                    items_missing_country.append(item)
-                    continue
-                
-                # Both values exist
-                items_with_both.append(item)
-                
-                # Check if already formatted correctly
-                if self._is_already_formatted(language, country):
-                    items_already_formatted.append(item)
-                    continue
-                
-                # Need to update
-                combined = self._combine_language_country(language, country)
-                if combined:
-                    items_to_update.append({
-                        'id': item['id'],
-                        'old_country': country,
-                        'new_country': combined,
-                        'language': language,
-                        'name': item.get('name', 'Unknown'),
-                        'brand': item.get('brand', 'Unknown')
-                    })
-            
-            self.stats['records_with_both_values'] = len(items_with_both)
-            self.stats['records_missing_language'] = len(items_missing_language)
-            self.stats['records_missing_country'] = len(items_missing_country)
-            self.stats['records_already_formatted'] = len(items_already_formatted)
-            self.stats['records_to_update'] = len(items_to_update)
+            rewriter = BatchRewriter(
+                self.supabase,
+                table="food_items",
+                column="country",
+                columns="id, name, brand, language, country",
+                mapping=self._classify,
+                dry_run=self.dry_run,
+                checkpoint_file=CHECKPOINT_FILE
+            )
+            self.result = rewriter.run(resume=self.resume)
+            labels = self.result.labels
             
-            # Store items to update for later use
-            self.items_to_update = items_to_update
+            self.stats['records_missing_language'] = labels['records_missing_language']
+            self.stats['records_missing_country'] = labels['records_missing_country']
+            self.stats['records_already_formatted'] = labels['records_already_formatted']
+            self.stats['records_to_update'] = labels['records_to_update']
+            self.stats['records_with_both_values'] = (
+                labels['records_already_formatted'] + labels['records_to_update'] + labels['records_invalid']
+            )
+            self.stats['records_updated'] = self.result.updated
+            self.stats['errors'].extend(self.result.errors)
             
-            # Store first 10 examples for reporting
-            self.stats['update_examples'] = items_to_update[:10]
+            # First examples for reporting
+            self.stats['update_examples'] = [
+                {
+                    'id': item['id'],
+                    'old_country': item.get('country'),
+                    'new_country': item['new_value'],
+                    'language': item.get('language'),
+                    'name': item.get('name', 'Unknown'),
+                    'brand': item.get('brand', 'Unknown')
+                }
+                for item in self.result.examples
+            ]
             
-            # Log analysis results
-            logger.info(f"📊 Analysis Results:")
+            # Log results
+            logger.info(f"📊 Results:")
             logger.info(f"  Records with both language and country: {self.stats['records_with_both_values']}")
             logger.info(f"  Records missing language: {self.stats['records_missing_language']}")
             logger.info(f"  Records missing country: {self.stats['records_missing_country']}")
-            logger.info(f"  Records already in 'language:country' format (will be skipped): {self.stats['records_already_formatted']}")
+            logger.info(f"  Records already in 'language:country' format (skipped): {self.stats['records_already_formatted']}")
             logger.info(f"  Records to update: {self.stats['records_to_update']}")
-            
-            # Show some examples of items that will be updated
-            if items_to_update:
-                logger.info("")
-                logger.info("📝 Sample items to be updated:")
-                for i, item_update in enumerate(items_to_update[:10]):  # Show first 10
-                    logger.info(
-                        f"  {i+1}. {item_update['name']} "
-                        f"(Brand: {item_update['brand']}) "
-                        f"[Language: '{item_update['language']}'] "
-                        f"[{item_update['old_country']} → {item_update['new_country']}]"
-                    )
-                if len(items_to_update) > 10:
-                    logger.info(f"  ... and {len(items_to_update) - 10} more")
-            
-            return self.stats
-            
-        except Exception as e:
-            error_msg = f"Error analyzing data: {e}"
-            logger.error(error_msg)
-            self.stats['errors'].append(error_msg)
-            return self.stats
-    
-    async def combine_records(self) -> Dict[str, Any]:
-        """
-        Update food items with combined language:country format
-        
-        Returns:
-            Dict containing cleanup results
-        """
-        if self.dry_run:
-            logger.info("🔍 DRY RUN MODE - No records will be updated")
-            logger.info(f"   Would update {self.stats['records_to_update']} records")
-            return self.stats
-        
-        if not hasattr(self, 'items_to_update') or not self.items_to_update:
-            logger.info("✅ No records need to be updated")
-            return self.stats
-        
-        logger.info(f"🔄 Starting language-country combination...")
-        logger.info(f"   Will update {len(self.items_to_update)} records")
-        
-        try:
-            updated_count = 0
-            failed_count = 0
-            
-            # Update records one by one to ensure accuracy
-            for i, item_update in enumerate(self.items_to_update):
-                try:
-                    # Update the record
-                    update_response = self.supabase.table("food_items").update({
-                        'country': item_update['new_country']
-                    }).eq('id', item_update['id']).execute()
-                    
-                    if update_response.data:
-                        updated_count += 1
-                    
-                    # Log progress every 100 records
-                    if (i + 1) % 100 == 0:
-                        logger.info(
-                            f"📊 Progress: {i + 1}/{len(self.items_to_update)} "
-                            f"updated, {failed_count} failed"
-                        )
-                        
-                except Exception as e:
-                    failed_count += 1
-                    error_msg = (
-                        f"Error updating record {item_update['id']} "
-                        f"({item_update.get('name', 'Unknown')}): {e}"
-                    )
-                    logger.error(error_msg)
-                    self.stats['errors'].append(error_msg)
-            
-            self.stats['records_updated'] = updated_count
-            logger.info(f"✅ Combination completed:")
-            logger.info(f"   Successfully updated: {updated_count} records")
-            if failed_count > 0:
-                logger.warning(f"   Failed to update: {failed_count} records")
+            logger.info(f"  Records updated: {self.stats['records_updated']} ({self.result.statements} statements)")
             
             return self.stats
             
@@ -363,8 +283,16 @@ class LanguageCountryCombiner:
         report.append(f"  Records already in 'language:country' format (skipped): {self.stats['records_already_formatted']}")
         report.append(f"  Records to update: {self.stats['records_to_update']}")
         report.append(f"  Records updated: {self.stats['records_updated']}")
+        if self.result and self.result.resumed_from:
+            report.append(f"  (resumed after id {self.result.resumed_from}; counts cover this run only)")
         report.append("")
         
+        if self.result and self.result.transitions:
+            report.append("🔄 CHANGES (old → new: rows):")
+            for line in self.result.diff_lines():
+                report.append(f"  {line}")
+            report.append("")
+        
         if self.stats['update_examples']:
             report.append("📝 SAMPLE UPDATES:")
             for i, example in enumerate(self.stats['update_examples'][:10], 1):
@@ -418,10 +346,7 @@ class LanguageCountryCombiner:
             if not await self.initialize():
                 return False
             
-            # Analyze current data
-            await self.analyze_data()
-            
-            # Perform combination
+            # Analyze and combine in one pass
             await self.combine_records()
             
             # Generate and display report
@@ -460,6 +385,11 @@ async def main():
         action="store_true", 
         help="Confirm that you want to update records"
     )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Ignore the checkpoint of an interrupted run and start from the beginning"
+    )
     
     args = parser.parse_args()
     
@@ -483,7 +413,7 @@ async def main():
                 return
     
     # Create combiner handler
-    combiner = LanguageCountryCombiner(dry_run=dry_run)
+    combiner = LanguageCountryCombiner(dry_run=dry_run, resume=not args.restart)
     
     # Run combination
     success = await combiner.combine()
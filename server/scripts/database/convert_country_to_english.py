@@ -9,24 +9,30 @@ This script will:
 3. Use ISO 3166-1 alpha-2 country code mappings
 4. Provide statistics on what was converted
 
+Rows are streamed once with keyset pagination and rewritten with one grouped
+update per distinct English name (see batch_rewrite.py). Interrupted live runs
+resume from a checkpoint.
+
 Usage:
-    python scripts/database/convert_country_to_english.py [--dry-run] [--confirm]
+    python scripts/database/convert_country_to_english.py [--dry-run] [--confirm] [--restart]
 """
 
 import asyncio
 import sys
 import os
-from typing import List, Dict, Any, Optional
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Add the parent directory to the path so we can import app modules
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Add the server directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from app.core.config import settings
+from batch_rewrite import KEEP, BatchRewriter
 import logging
 
 # Configure logging
@@ -181,20 +187,56 @@ def convert_to_english(country_value: str) -> Optional[str]:
     return f"{code.lower()}:{english_name}"
 
 
+def classify_country(row: Dict[str, Any]) -> Tuple[str, Any]:
+    """
+    Batch rewrite mapping: statistics label and new country value for a row
+    
+    Args:
+        row: food_items row with a country value
+        
+    Returns:
+        (label, 'code:English_name') for convertible rows, (label, KEEP) otherwise
+    """
+    country = (row.get('country') or '').strip()
+    if not country:
+        return 'records_empty', KEEP
+    
+    # Try to convert to English
+    converted = convert_to_english(country)
+    if converted is not None:
+        return 'records_to_convert', converted
+    
+    # Check if it's already in English or unknown format
+    result = extract_country_code_and_name(country)
+    if not result:
+        return 'records_unknown_format', KEEP
+    
+    code, name = result
+    if code in COUNTRY_CODE_TO_ENGLISH and name.lower() == COUNTRY_CODE_TO_ENGLISH[code].lower():
+        return 'records_already_english', KEEP
+    return 'records_unknown_code', KEEP
+
+
+CHECKPOINT_FILE = Path(__file__).with_suffix('.checkpoint.json')
+
+
 class CountryToEnglishConverter:
     """
     Handles database conversion operations for country column localization
     """
     
-    def __init__(self, dry_run: bool = True):
+    def __init__(self, dry_run: bool = True, resume: bool = True):
         """
         Initialize the converter
         
         Args:
             dry_run: If True, only analyze data without making changes
+            resume: Continue an interrupted live run from its checkpoint
         """
         self.dry_run = dry_run
+        self.resume = resume
         self.supabase = None
+        self.result = None
         self.stats = {
             'total_records': 0,
             'records_to_convert': 0,
@@ -226,21 +268,26 @@ class CountryToEnglishConverter:
             logger.error(f"❌ Failed to initialize database: {e}")
             return False
     
-    async def analyze_data(self) -> Dict[str, Any]:
+    async def convert_records(self) -> Dict[str, Any]:
         """
-        Analyze the current state of country column in food_items table
+        Stream food_items once and convert localized country names to English
+        
+        Changed rows are written with one grouped update per distinct English
+        value; in dry-run mode nothing is written.
         
         Returns:
-            Dict containing analysis results
+            Dict containing conversion results
         """
-        logger.info("🔍 Analyzing country column in food_items table...")
+        logger.info("🔍 Analyzing and converting country column in food_items table...")
+        if self.dry_run:
+            logger.info("🔍 DRY RUN MODE - No records will be updated")
         
         try:
             # Get total count of food items with country values
             total_response = self.supabase.table("food_items").select(
                 "id", 
                 count="exact"
-            ).not_.is_("country", "null").execute()
+            ).not_.is_("country", "null").limit(1).execute()
             
             self.stats['total_records'] = total_response.count or 0
             
@@ -250,162 +297,41 @@ class CountryToEnglishConverter:
                 logger.warning("⚠️  No food items with country values found in database")
                 return self.stats
             
-            # Get all food items with country values (handle pagination)
-            logger.info("📋 Fetching food items with country values...")
-            all_food_items = []
-            page_size = 1000
-            offset = 0
-            
-            while True:
-                response = self.supabase.table("food_items").select(
-                    "id, name, brand, country"
-                ).not_.is_("country", "null").range(offset, offset + page_size - 1).execute()
-                
-                if not response.data:
-                    break
-                    
-                all_food_items.extend(response.data)
-                offset += page_size
-                
-                logger.info(f"📦 Retrieved {len(all_food_items)} food items so far...")
-                
-                if len(response.data) < page_size:
-                    break
-            
-            food_items = all_food_items
-            logger.info(f"📦 Retrieved {len(food_items)} food items total")
-            
-            # Analyze each item
-            items_to_update = []
-            items_already_english = []
-            items_unknown_format = []
-            items_unknown_code = []
-            
-            for item in food_items:
-                country = item.get('country', '').strip()
-                
-                if not country:
-                    continue
-                
-                # Try to convert to English
-                converted = convert_to_english(country)
-                
-                if converted is None:
-                    # Check if it's already in English or unknown format
-                    result = extract_country_code_and_name(country)
-                    if result:
-                        code, name = result
-                        if code in COUNTRY_CODE_TO_ENGLISH:
-                            english_name = COUNTRY_CODE_TO_ENGLISH[code]
-                            if name.lower() == english_name.lower():
-                                items_already_english.append(item)
-                            else:
-                                items_unknown_code.append(item)
-                        else:
-                            items_unknown_code.append(item)
-                    else:
-                        items_unknown_format.append(item)
-                else:
-                    # Conversion possible
-                    items_to_update.append({
-                        'id': item['id'],
-                        'old_country': country,
-                        'new_country': converted
-                    })
-                    
-                    # Track conversion mapping
-                    if country not in self.stats['conversion_map']:
-                        self.stats['conversion_map'][country] = converted
+            rewriter = BatchRewriter(
+                self.supabase,
+                table="food_items",
+                column="country",
+                columns="id, name, brand, country",
+                mapping=classify_country,
+                filters=lambda builder: builder.not_.is_("country", "null"),
+                dry_run=self.dry_run,
+                checkpoint_file=CHECKPOINT_FILE
+            )
+            self.result = rewriter.run(resume=self.resume)
             
-            self.stats['records_to_convert'] = len(items_to_update)
-            self.stats['records_already_english'] = len(items_already_english)
-            self.stats['records_unknown_format'] = len(items_unknown_format)
-            self.stats['records_unknown_code'] = len(items_unknown_code)
+            for label in ('records_to_convert', 'records_already_english',
+                          'records_unknown_format', 'records_unknown_code'):
+                self.stats[label] = self.result.labels[label]
+            self.stats['records_updated'] = self.result.updated
+            self.stats['errors'].extend(self.result.errors)
             
-            # Store items to update for later use
-            self.items_to_update = items_to_update
+            # Track conversions: old -> new
+            for old, new in self.result.transitions:
+                self.stats['conversion_map'].setdefault(old, new)
             
-            # Log analysis results
-            logger.info(f"📊 Analysis Results:")
+            # Log results
+            logger.info(f"📊 Results:")
             logger.info(f"  Records to convert: {self.stats['records_to_convert']}")
             logger.info(f"  Records already in English: {self.stats['records_already_english']}")
             logger.info(f"  Records with unknown format: {self.stats['records_unknown_format']}")
             logger.info(f"  Records with unknown country code: {self.stats['records_unknown_code']}")
+            logger.info(f"  Records updated: {self.stats['records_updated']} ({self.result.statements} statements)")
             
             # Show conversion mappings
-            if self.stats['conversion_map']:
-                logger.info("🔄 Conversion mappings:")
-                for old, new in list(self.stats['conversion_map'].items())[:20]:  # Show first 20
-                    logger.info(f"  {old} → {new}")
-                if len(self.stats['conversion_map']) > 20:
-                    logger.info(f"  ... and {len(self.stats['conversion_map']) - 20} more")
-            
-            # Show some examples of items that will be updated
-            if items_to_update:
-                logger.info("📝 Sample items to be updated:")
-                for i, item_update in enumerate(items_to_update[:10]):  # Show first 10
-                    item_data = next(
-                        (item for item in food_items if item['id'] == item_update['id']), 
-                        None
-                    )
-                    if item_data:
-                        logger.info(
-                            f"  {i+1}. {item_data.get('name', 'Unknown')} "
-                            f"(Brand: {item_data.get('brand', 'Unknown')}) "
-                            f"[{item_update['old_country']} → {item_update['new_country']}]"
-                        )
-                if len(items_to_update) > 10:
-                    logger.info(f"  ... and {len(items_to_update) - 10} more")
-            
-            return self.stats
-            
-        except Exception as e:
-            error_msg = f"Error analyzing data: {e}"
-            logger.error(error_msg)
-            self.stats['errors'].append(error_msg)
-            return self.stats
-    
-    async def convert_records(self) -> Dict[str, Any]:
-        """
-        Update food items with English country names
-        
-        Returns:
-            Dict containing conversion results
-        """
-        if self.dry_run:
-            logger.info("🔍 DRY RUN MODE - No records will be updated")
-            return self.stats
-        
-        if not hasattr(self, 'items_to_update') or not self.items_to_update:
-            logger.info("✅ No records need to be converted")
-            return self.stats
-        
-        logger.info("🔄 Starting country name conversion to English...")
-        
-        try:
-            updated_count = 0
-            
-            # Update records one by one
-            for i, item_update in enumerate(self.items_to_update):
-                try:
-                    update_response = self.supabase.table("food_items").update({
-                        'country': item_update['new_country']
-                    }).eq('id', item_update['id']).execute()
-                    
-                    if update_response.data:
-                        updated_count += 1
-                    
-                    # Log progress every 100 records
-                    if (i + 1) % 100 == 0:
-                        logger.info(f"📊 Updated {i + 1} of {len(self.items_to_update)} records...")
-                        
-                except Exception as e:
-                    error_msg = f"Error updating record {item_update['id']}: {e}"
-                    logger.error(error_msg)
-                    self.stats['errors'].append(error_msg)
-            
-            self.stats['records_updated'] = updated_count
-            logger.info(f"✅ Conversion completed. Updated {updated_count} records")
+            if self.result.transitions:
+                logger.info("🔄 Conversion mappings (rows):")
+                for line in self.result.diff_lines():
+                    logger.info(f"  {line}")
             
             return self.stats
             
@@ -437,6 +363,8 @@ class CountryToEnglishConverter:
         report.append(f"  Records with unknown format: {self.stats['records_unknown_format']}")
         report.append(f"  Records with unknown country code: {self.stats['records_unknown_code']}")
         report.append(f"  Records updated: {self.stats['records_updated']}")
+        if self.result and self.result.resumed_from:
+            report.append(f"  (resumed after id {self.result.resumed_from}; counts cover this run only)")
         report.append("")
         
         if self.stats['conversion_map']:
@@ -482,10 +410,7 @@ class CountryToEnglishConverter:
             if not await self.initialize():
                 return False
             
-            # Analyze current data
-            await self.analyze_data()
-            
-            # Perform conversion
+            # Analyze and convert in one pass
             await self.convert_records()
             
             # Generate and display report
@@ -524,6 +449,11 @@ async def main():
         action="store_true", 
         help="Confirm that you want to update records"
     )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Ignore the checkpoint of an interrupted run and start from the beginning"
+    )
     
     args = parser.parse_args()
     
@@ -545,7 +475,7 @@ async def main():
                 return
     
     # Create converter handler
-    converter = CountryToEnglishConverter(dry_run=dry_run)
+    converter = CountryToEnglishConverter(dry_run=dry_run, resume=not args.restart)
     
     # Run conversion
     success = await converter.convert()
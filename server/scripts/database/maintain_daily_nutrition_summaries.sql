@@ -0,0 +1,250 @@
+-- Migration: Maintain daily_nutrition_summaries as a rollup of feeding_records
+-- Date: 2026-10-18
+-- Description: The summary endpoints used to be placeholders and the multi-pet
+--              insights endpoint returned hard-coded numbers. daily_nutrition_summaries
+--              is now kept current by triggers on feeding_records (and on the
+--              inputs the day depends on), so the API only reads one row per day.
+--              weekly_nutrition_summaries rolls the daily rows up per ISO week.
+--              Existing feeding history is backfilled at the end.
+
+-- -----------------------------------------------------------------------------
+-- Calorie score: how close a day's calories are to the pet's target (0-100)
+-- -----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION nutrition_calorie_score(
+    p_total_calories DECIMAL,
+    p_target_calories DECIMAL
+)
+RETURNS DECIMAL(5,2) AS $$
+    SELECT CASE
+        WHEN p_target_calories IS NULL OR p_target_calories <= 0 THEN 0
+        ELSE ROUND(GREATEST(
+            0,
+            100 - ABS(p_total_calories - p_target_calories) / p_target_calories * 100
+        ), 2)
+    END;
+$$ LANGUAGE sql IMMUTABLE
+SET search_path = public;
+
+-- Calorie target: the pet's calorie goal, else its nutritional requirements.
+-- NutritionSummaryService._calorie_goal falls back the same way.
+CREATE OR REPLACE FUNCTION nutrition_calorie_target(p_pet_id UUID)
+RETURNS DECIMAL(10,2) AS $$
+    SELECT COALESCE(
+        (SELECT cg.daily_calories FROM public.calorie_goals cg WHERE cg.pet_id = p_pet_id),
+        (SELECT nr.daily_calories FROM public.nutritional_requirements nr WHERE nr.pet_id = p_pet_id)
+    );
+$$ LANGUAGE sql STABLE
+SET search_path = public;
+
+CREATE OR REPLACE FUNCTION nutrition_calorie_recommendations(
+    p_total_calories DECIMAL,
+    p_target_calories DECIMAL
+)
+RETURNS TEXT[] AS $$
+    SELECT CASE
+        WHEN p_target_calories IS NULL THEN ARRAY['Set a daily calorie goal to track intake']
+        WHEN p_total_calories < p_target_calories * 0.8 THEN ARRAY['Calorie intake was below the daily goal']
+        WHEN p_total_calories > p_target_calories * 1.2 THEN ARRAY['Calorie intake was above the daily goal']
+        ELSE ARRAY[]::TEXT[]
+    END;
+$$ LANGUAGE sql IMMUTABLE
+SET search_path = public;
+
+REVOKE EXECUTE ON FUNCTION nutrition_calorie_target(UUID) FROM PUBLIC, anon, authenticated;
+
+-- -----------------------------------------------------------------------------
+-- Recompute one pet-day
+-- -----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION refresh_daily_nutrition_summary(
+    p_pet_id UUID,
+    p_date DATE
+)
+RETURNS VOID AS $$
+DECLARE
+    v_total_calories DECIMAL(10,2);
+    v_total_protein DECIMAL(10,2);
+    v_total_fat DECIMAL(10,2);
+    v_total_fiber DECIMAL(10,2);
+    v_feeding_count INTEGER;
+    v_target DECIMAL(10,2);
+BEGIN
+    -- Same formulas as update_nutritional_trends: stored calories win,
+    -- otherwise calories and macros come from the analysed food
+    SELECT
+        COALESCE(SUM(COALESCE(NULLIF(fr.calories, 0), (fa.calories_per_100g / 100.0) * fr.amount_grams, 0)), 0),
+        COALESCE(SUM((fa.protein_percentage / 100.0) * fr.amount_grams), 0),
+        COALESCE(SUM((fa.fat_percentage / 100.0) * fr.amount_grams), 0),
+        COALESCE(SUM((fa.fiber_percentage / 100.0) * fr.amount_grams), 0),
+        COUNT(*)
+    INTO v_total_calories, v_total_protein, v_total_fat, v_total_fiber, v_feeding_count
+    FROM public.feeding_records fr
+    LEFT JOIN public.food_analyses fa ON fa.id = fr.food_analysis_id
+    WHERE fr.pet_id = p_pet_id
+    AND fr.feeding_time >= p_date
+    AND fr.feeding_time < p_date + 1;
+
+    IF v_feeding_count = 0 THEN
+        DELETE FROM public.daily_nutrition_summaries
+        WHERE pet_id = p_pet_id AND date = p_date;
+        RETURN;
+    END IF;
+
+    v_target := nutrition_calorie_target(p_pet_id);
+
+    INSERT INTO public.daily_nutrition_summaries (
+        pet_id, date, total_calories, total_protein, total_fat, total_fiber,
+        feeding_count, average_compatibility, recommendations
+    ) VALUES (
+        p_pet_id, p_date, v_total_calories, v_total_protein, v_total_fat, v_total_fiber,
+        v_feeding_count, nutrition_calorie_score(v_total_calories, v_target),
+        nutrition_calorie_recommendations(v_total_calories, v_target)
+    )
+    ON CONFLICT (pet_id, date) DO UPDATE SET
+        total_calories = EXCLUDED.total_calories,
+        total_protein = EXCLUDED.total_protein,
+        total_fat = EXCLUDED.total_fat,
+        total_fiber = EXCLUDED.total_fiber,
+        feeding_count = EXCLUDED.feeding_count,
+        average_compatibility = EXCLUDED.average_compatibility,
+        recommendations = EXCLUDED.recommendations;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER
+SET search_path = public;
+
+COMMENT ON FUNCTION refresh_daily_nutrition_summary(UUID, DATE) IS
+'Recomputes the daily_nutrition_summaries row for one pet and day from feeding_records; deletes it when the day has no feedings.';
+
+REVOKE EXECUTE ON FUNCTION refresh_daily_nutrition_summary(UUID, DATE) FROM PUBLIC, anon, authenticated;
+
+-- -----------------------------------------------------------------------------
+-- Triggers: every write path keeps the rollup current
+-- -----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION feeding_records_refresh_daily_summary()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM refresh_daily_nutrition_summary(OLD.pet_id, OLD.feeding_time::date);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        IF TG_OP = 'INSERT'
+           OR NEW.pet_id IS DISTINCT FROM OLD.pet_id
+           OR NEW.feeding_time::date IS DISTINCT FROM OLD.feeding_time::date THEN
+            PERFORM refresh_daily_nutrition_summary(NEW.pet_id, NEW.feeding_time::date);
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER
+SET search_path = public;
+
+DROP TRIGGER IF EXISTS refresh_daily_nutrition_summary_on_feeding ON public.feeding_records;
+CREATE TRIGGER refresh_daily_nutrition_summary_on_feeding
+    AFTER INSERT OR UPDATE OR DELETE ON public.feeding_records
+    FOR EACH ROW EXECUTE FUNCTION feeding_records_refresh_daily_summary();
+
+-- Corrected nutrition on an analysis changes every day it was fed on
+CREATE OR REPLACE FUNCTION food_analyses_refresh_daily_summaries()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_day RECORD;
+BEGIN
+    FOR v_day IN
+        SELECT DISTINCT fr.pet_id, fr.feeding_time::date AS day
+        FROM public.feeding_records fr
+        WHERE fr.food_analysis_id = NEW.id
+    LOOP
+        PERFORM refresh_daily_nutrition_summary(v_day.pet_id, v_day.day);
+    END LOOP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER
+SET search_path = public;
+
+DROP TRIGGER IF EXISTS refresh_daily_nutrition_summaries_on_analysis ON public.food_analyses;
+CREATE TRIGGER refresh_daily_nutrition_summaries_on_analysis
+    AFTER UPDATE OF calories_per_100g, protein_percentage, fat_percentage, fiber_percentage
+    ON public.food_analyses
+    FOR EACH ROW EXECUTE FUNCTION food_analyses_refresh_daily_summaries();
+
+-- A changed calorie target re-scores the pet's days without re-aggregating them
+CREATE OR REPLACE FUNCTION rescore_daily_nutrition_summaries(p_pet_id UUID)
+RETURNS VOID AS $$
+DECLARE
+    v_target DECIMAL(10,2) := nutrition_calorie_target(p_pet_id);
+BEGIN
+    UPDATE public.daily_nutrition_summaries
+    SET average_compatibility = nutrition_calorie_score(total_calories, v_target),
+        recommendations = nutrition_calorie_recommendations(total_calories, v_target)
+    WHERE pet_id = p_pet_id;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER
+SET search_path = public;
+
+-- Goals and requirements both feed the target: a new, changed or deleted row
+-- re-scores the pet (a deleted goal falls back to the requirements)
+CREATE OR REPLACE FUNCTION calorie_target_rescore_daily_summaries()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM rescore_daily_nutrition_summaries(OLD.pet_id);
+    END IF;
+    IF TG_OP = 'INSERT'
+       OR (TG_OP = 'UPDATE' AND NEW.pet_id IS DISTINCT FROM OLD.pet_id) THEN
+        PERFORM rescore_daily_nutrition_summaries(NEW.pet_id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER
+SET search_path = public;
+
+DROP TRIGGER IF EXISTS rescore_daily_nutrition_summaries_on_goal ON public.calorie_goals;
+CREATE TRIGGER rescore_daily_nutrition_summaries_on_goal
+    AFTER INSERT OR UPDATE OF daily_calories, pet_id OR DELETE ON public.calorie_goals
+    FOR EACH ROW EXECUTE FUNCTION calorie_target_rescore_daily_summaries();
+
+DROP TRIGGER IF EXISTS rescore_daily_nutrition_summaries_on_requirements ON public.nutritional_requirements;
+CREATE TRIGGER rescore_daily_nutrition_summaries_on_requirements
+    AFTER INSERT OR UPDATE OF daily_calories, pet_id OR DELETE ON public.nutritional_requirements
+    FOR EACH ROW EXECUTE FUNCTION calorie_target_rescore_daily_summaries();
+
+DROP FUNCTION IF EXISTS calorie_goals_rescore_daily_summaries();
+
+REVOKE EXECUTE ON FUNCTION feeding_records_refresh_daily_summary() FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION food_analyses_refresh_daily_summaries() FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION rescore_daily_nutrition_summaries(UUID) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION calorie_target_rescore_daily_summaries() FROM PUBLIC, anon, authenticated;
+
+-- -----------------------------------------------------------------------------
+-- Weekly rollup (reads the daily rows, RLS applies through security_invoker)
+-- -----------------------------------------------------------------------------
+CREATE OR REPLACE VIEW public.weekly_nutrition_summaries
+WITH (security_invoker = true) AS
+SELECT
+    pet_id,
+    date_trunc('week', date)::date AS week_start,
+    (date_trunc('week', date)::date + 6) AS week_end,
+    COUNT(*)::INTEGER AS days_logged,
+    SUM(total_calories) AS total_calories,
+    ROUND(AVG(total_calories), 2) AS average_daily_calories,
+    SUM(total_protein) AS total_protein,
+    SUM(total_fat) AS total_fat,
+    SUM(total_fiber) AS total_fiber,
+    SUM(feeding_count)::INTEGER AS feeding_count,
+    ROUND(AVG(average_compatibility), 2) AS average_compatibility
+FROM public.daily_nutrition_summaries
+GROUP BY pet_id, date_trunc('week', date);
+
+-- -----------------------------------------------------------------------------
+-- Backfill existing feeding history
+-- -----------------------------------------------------------------------------
+DO $$
+DECLARE
+    v_day RECORD;
+BEGIN
+    FOR v_day IN
+        SELECT DISTINCT pet_id, feeding_time::date AS day
+        FROM public.feeding_records
+    LOOP
+        PERFORM refresh_daily_nutrition_summary(v_day.pet_id, v_day.day);
+    END LOOP;
+END $$;
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Rescore Food Quality Script
+
+Streams the whole food_items catalog in pages, scores each page with the
+columnar DataQualityService path and writes quality_score / quality_level
+back to food_items. Memory use is bounded by the page size.
+
+By default only rows that were never scored, or were scored with a different
+scoring configuration (quality_version), are processed - run it after
+changing DataQualityService weights. Use --all to rescore every row.
+
+Run after applying add_food_items_quality_score.sql and
+add_food_items_quality_version.sql.
+
+Usage:
+    python scripts/database/rescore_food_quality.py [--dry-run] [--all] [--limit N]
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from supabase import create_client
+from app.core.config import settings
+from app.services.food_quality_catalog_service import FoodQualityCatalogService
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+async def main():
+    """Main function to run the rescore"""
+    parser = argparse.ArgumentParser(
+        description="Score food_items data quality and persist the results",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Show catalog quality statistics without writing
+  python scripts/database/rescore_food_quality.py --dry-run
+
+  # Rescore rows that are unscored or stale after a weights change
+  python scripts/database/rescore_food_quality.py
+
+  # Rescore and persist the whole catalog
+  python scripts/database/rescore_food_quality.py --all
+        """
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Compute statistics without writing scores"
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Rescore every row, not only unscored or stale ones"
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=None,
+        help="Maximum number of items to score (default: all)"
+    )
+
+    args = parser.parse_args()
+
+    if args.dry_run:
+        print("🔍 DRY RUN MODE - No scores will be written")
+        print()
+
+    try:
+        # Use service role key for admin operations
+        supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
+        service = FoodQualityCatalogService(supabase)
+        stats = await service.compute_statistics(
+            limit=args.limit,
+            persist=not args.dry_run,
+            stale_only=not args.all
+        )
+    except Exception as e:
+        logger.error(f"❌ Rescore failed: {e}")
+        sys.exit(1)
+
+    print(f"📊 Items scored: {stats['total_items']}")
+    print(f"📈 Average score: {stats['average_score']}")
+    for level, count in stats["quality_distribution"].items():
+        print(f"   {level}: {count}")
+    if not args.dry_run:
+        print(f"💾 Scores written: {stats.get('persisted_items', 0)}")
+
+    print("\n✅ Food quality rescore completed successfully!")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,25 @@
+-- Migration: One cache row per (pet_id, analysis_type) in nutritional_analytics_cache
+-- Date: 2026-10-18
+-- Description: The analytics service now upserts cache rows ON CONFLICT (pet_id, analysis_type)
+--              instead of appending a new row on every refresh. Removes accumulated duplicates
+--              (keeping the most recently generated row) and replaces the non-unique lookup
+--              index with a unique one that backs the upsert.
+
+-- Remove duplicates, keeping the latest generated row per pet and analysis type
+DELETE FROM public.nutritional_analytics_cache c
+USING (
+    SELECT id,
+           ROW_NUMBER() OVER (
+               PARTITION BY pet_id, analysis_type
+               ORDER BY generated_at DESC, created_at DESC, id
+           ) AS rn
+    FROM public.nutritional_analytics_cache
+) ranked
+WHERE c.id = ranked.id
+AND ranked.rn > 1;
+
+-- Unique index replaces idx_analytics_cache_pet_type (same columns, same lookups)
+CREATE UNIQUE INDEX IF NOT EXISTS uq_analytics_cache_pet_type
+ON public.nutritional_analytics_cache(pet_id, analysis_type);
+
+DROP INDEX IF EXISTS public.idx_analytics_cache_pet_type;
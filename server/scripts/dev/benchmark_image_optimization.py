@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Benchmark Image Optimization
+Measures the cost of optimizing an upload (decode, resize, JPEG encode) for
+typical phone photos, screenshots and transparent PNGs.
+
+ImageOptimizerService.optimize_image (draft decode + quality search) is
+compared with the previous approach: full decode, resize and re-encode
+dropping quality by 10 until the target size is met. Reports ms per image
+and JPEG encodes per image, then the time to create all derivatives and
+the bytes a list view downloads per image. With --concurrency, also reports
+how long the event loop is blocked while that many uploads are optimized.
+
+Usage:
+    python3 scripts/dev/benchmark_image_optimization.py [--repeat N] [--target-kb N] [--concurrency N]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from io import BytesIO
+
+# Add the server directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from PIL import Image, ImageDraw, ImageFilter
+
+from app.services.image_optimizer import ImageOptimizerService
+
+
+def make_photo(width, height, fmt='JPEG', mode='RGB', seed=0):
+    """Photo-like test image: smooth gradients with detail and noise"""
+    rng = random.Random(seed)
+    img = Image.radial_gradient('L').resize((width, height))
+    img = Image.merge('RGB', (img, img.rotate(90), Image.linear_gradient('L').resize((width, height))))
+    draw = ImageDraw.Draw(img)
+    for _ in range(300):
+        x, y = rng.randrange(width), rng.randrange(height)
+        r = rng.randrange(5, max(6, width // 15))
+        draw.ellipse((x, y, x + r, y + r), fill=tuple(rng.randrange(256) for _ in range(3)))
+    img = img.filter(ImageFilter.GaussianBlur(1))
+    noise = Image.merge('RGB', [Image.effect_noise((width, height), 64) for _ in range(3)])
+    img = Image.blend(img, noise, 0.35)
+    if mode == 'RGBA':
+        img = img.convert('RGBA')
+        img.putalpha(Image.linear_gradient('L').resize((width, height)))
+    output = BytesIO()
+    img.save(output, format=fmt, quality=95)
+    return output.getvalue()
+
+
+# Sample name -> image bytes
+SAMPLES = {
+    'phone photo 4032x3024 jpeg': lambda: make_photo(4032, 3024),
+    'photo 2048x1536 jpeg': lambda: make_photo(2048, 1536, seed=1),
+    'small photo 800x600 jpeg': lambda: make_photo(800, 600, seed=2),
+    'screenshot 1170x2532 png': lambda: make_photo(1170, 2532, fmt='PNG', seed=3),
+    'transparent 1500x1500 png': lambda: make_photo(1500, 1500, fmt='PNG', mode='RGBA', seed=4),
+}
+
+
+def optimize_step_down(image_data, target_size):
+    """The previous optimization: full decode, resize, step quality down by 10"""
+    img = Image.open(BytesIO(image_data))
+    if img.mode != 'RGB':
+        if img.mode == 'RGBA':
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            background.paste(img, mask=img.split()[3])
+            img = background
+        else:
+            img = img.convert('RGB')
+    if max(img.size) > ImageOptimizerService.MAX_DIMENSION:
+        img = ImageOptimizerService._resize_image(img, ImageOptimizerService.MAX_DIMENSION)
+
+    quality = ImageOptimizerService.START_QUALITY
+    attempts = 0
+    while attempts < 10:
+        attempts += 1
+        output = BytesIO()
+        img.save(output, format='JPEG', quality=quality, optimize=True, progressive=True)
+        data = output.getvalue()
+        if len(data) <= target_size:
+            break
+        quality -= 10
+        if quality < ImageOptimizerService.MIN_QUALITY:
+            quality = ImageOptimizerService.MIN_QUALITY
+            reduction_factor = (target_size / len(data)) ** 0.5
+            img = ImageOptimizerService._resize_image(img, int(max(img.size) * reduction_factor))
+    return data, attempts
+
+
+def optimize_current(image_data, target_size):
+    """The current optimization"""
+    data, metadata = ImageOptimizerService.optimize_image(image_data, target_size=target_size)
+    return data, metadata['optimization_attempts']
+
+
+def measure(func, image_data, target_size, repeat):
+    """Best time in ms, plus encodes and output size of the last run"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        data, encodes = func(image_data, target_size)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, encodes, len(data)
+
+
+async def measure_loop_blocking(image_data, target_size, concurrency, use_pool):
+    """Longest event loop stall (ms) and wall time (ms) while optimizing concurrent uploads"""
+    longest_stall = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal longest_stall
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            longest_stall = max(longest_stall, time.perf_counter() - start - 0.001)
+
+    async def upload():
+        if use_pool:
+            await ImageOptimizerService.optimize_image_async(image_data, target_size=target_size)
+        else:
+            ImageOptimizerService.optimize_image(image_data, target_size=target_size)
+            await asyncio.sleep(0)
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    await asyncio.gather(*(upload() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    done = True
+    await tick
+    return longest_stall * 1000, elapsed * 1000
+
+
+def main():
+    """Main function to run the benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmark upload image optimization')
+    parser.add_argument('--repeat', '-r', type=int, default=3, help='Runs per measurement (best is reported)')
+    parser.add_argument('--target-kb', '-t', type=int, default=ImageOptimizerService.TARGET_FILE_SIZE // 1024,
+                        help='Target size in KB (lower it to exercise the quality search)')
+    parser.add_argument('--concurrency', '-c', type=int, default=4, help='Concurrent uploads for the event loop test (0 to skip)')
+    args = parser.parse_args()
+    target_size = args.target_kb * 1024
+
+    print("\n📷 Generating samples...")
+    samples = {name: build() for name, build in SAMPLES.items()}
+
+    print(f"\n⏱️  Optimization to {args.target_kb} KB (best of {args.repeat}):")
+    print(f"   {'sample':<28} {'input':>8} {'step-down ms':>12} {'encodes':>7} {'current ms':>10} {'encodes':>7} {'output':>8} {'speedup':>8}")
+    for name, image_data in samples.items():
+        before, before_encodes, _ = measure(optimize_step_down, image_data, target_size, args.repeat)
+        after, after_encodes, size = measure(optimize_current, image_data, target_size, args.repeat)
+        print(
+            f"   {name:<28} {len(image_data) // 1024:>6}KB {before:>12.1f} {before_encodes:>7} "
+            f"{after:>10.1f} {after_encodes:>7} {size // 1024:>6}KB {before / after:>7.1f}x"
+        )
+
+    print(f"\n🖼️  Derivatives (best of {args.repeat}):")
+    print(f"   {'sample':<28} {'ms':>8} {'full jpg':>9} {'list jpg':>9} {'list webp':>10} {'thumb webp':>11}")
+    for name, image_data in samples.items():
+        with tempfile.TemporaryDirectory() as output_dir:
+            best = float('inf')
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                derivatives = ImageOptimizerService.create_derivatives(image_data, output_dir, target_size)['derivatives']
+                best = min(best, time.perf_counter() - start)
+        sizes = {file_name: d['size'] // 1024 for file_name, d in derivatives.items()}
+        print(
+            f"   {name:<28} {best * 1000:>8.1f} {sizes['full.jpg']:>7}KB {sizes['list.jpg']:>7}KB "
+            f"{sizes['list.webp']:>8}KB {sizes['thumbnail.webp']:>9}KB"
+        )
+
+    if args.concurrency:
+        image_data = samples['phone photo 4032x3024 jpeg']
+        print(f"\n🔄 Event loop with {args.concurrency} concurrent phone photo uploads:")
+        print(f"   {'':<28} {'longest stall ms':>16} {'wall ms':>9}")
+        for label, use_pool in (('on the event loop', False), ('process pool', True)):
+            if use_pool:
+                # Start the workers outside the measurement
+                asyncio.run(ImageOptimizerService.optimize_image_async(image_data, target_size=target_size))
+            stall, elapsed = asyncio.run(measure_loop_blocking(image_data, target_size, args.concurrency, use_pool))
+            print(f"   {label:<28} {stall:>16.1f} {elapsed:>9.1f}")
+        ImageOptimizerService.shutdown_pool()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+On-disk offset index for the OpenPetFoodFacts JSONL export.
+Maps external_id -> (byte offset, length) so products can be read lazily
+through mmap instead of loading the whole export into memory.
+
+The index is built once and stored next to the JSONL file:
+    <file>.idx.npy   sorted (key, offset, length) records, memory-mapped
+    <file>.idx.json  metadata used to detect a changed source file
+
+Usage:
+    python3 jsonl_index.py [path/to/openpetfoodfacts-products.jsonl]
+"""
+
+import json
+import logging
+import mmap
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT_VERSION = 1
+
+
+class JsonlOffsetIndex:
+    """
+    Lazy, memory-mapped lookup of JSONL products by external_id.
+
+    Behaves like a read-only mapping (``in``, ``[]``, ``get``, ``len``), so it
+    can replace a dict of fully parsed products. Only the products that are
+    actually looked up are parsed.
+    """
+
+    def __init__(self, jsonl_file: str, index_file: Optional[str] = None):
+        self.jsonl_file = Path(jsonl_file)
+        self.index_file = Path(index_file) if index_file else Path(f"{self.jsonl_file}.idx.npy")
+        self.meta_file = self.index_file.with_suffix('.json')
+
+        self._entries: Optional[np.ndarray] = None
+        self._keys: Optional[np.ndarray] = None
+        self._file = None
+        self._mmap: Optional[mmap.mmap] = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def open(self, rebuild: bool = False) -> 'JsonlOffsetIndex':
+        """Open the index, building it first if missing, stale or rebuild is set."""
+        if rebuild or not self._is_current():
+            self.build()
+
+        self._entries = np.load(self.index_file, mmap_mode='r')
+        self._keys = self._entries['key']
+
+        self._file = open(self.jsonl_file, 'rb')
+        if self.jsonl_file.stat().st_size > 0:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        logger.info(f"✅ Opened JSONL index with {len(self):,} products ({self.index_file.name})")
+        return self
+
+    def close(self):
+        """Release the memory maps and file handle."""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._entries = None
+        self._keys = None
+
+    def __enter__(self) -> 'JsonlOffsetIndex':
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def _source_signature(self) -> Dict[str, int]:
+        stat = self.jsonl_file.stat()
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    def _is_current(self) -> bool:
+        """Whether a persisted index exists and matches the current source file."""
+        if not self.index_file.exists() or not self.meta_file.exists():
+            return False
+        try:
+            meta = json.loads(self.meta_file.read_text())
+        except (OSError, json.JSONDecodeError):
+            return False
+        return (
+            meta.get('format_version') == INDEX_FORMAT_VERSION and
+            meta.get('source') == self._source_signature()
+        )
+
+    def _scan(self) -> Iterator[Tuple[str, int, int]]:
+        """Yield (external_id, offset, length) for every valid line of the source."""
+        offset = 0
+        with open(self.jsonl_file, 'rb') as f:
+            for line_num, line in enumerate(f, 1):
+                length = len(line)
+                stripped = line.rstrip(b'\r\n')
+                if stripped.strip():
+                    try:
+                        data = json.loads(stripped)
+                        external_id = data.get('_id') or data.get('id')
+                        if external_id:
+                            yield str(external_id), offset, len(stripped)
+                    except json.JSONDecodeError as e:
+                        logger.warning(f"Invalid JSON on line {line_num}: {e}")
+                offset += length
+
+    def build(self):
+        """Scan the JSONL file once and persist the sorted offset index."""
+        logger.info(f"🔨 Building JSONL offset index for {self.jsonl_file}...")
+
+        # Later lines win for duplicate ids (same as loading into a dict)
+        positions: Dict[bytes, Tuple[int, int]] = {}
+        for external_id, offset, length in self._scan():
+            positions[external_id.encode('utf-8')] = (offset, length)
+
+        key_width = max((len(key) for key in positions), default=1)
+        dtype = np.dtype([('key', f'S{key_width}'), ('offset', '<u8'), ('length', '<u4')])
+        entries = np.empty(len(positions), dtype=dtype)
+        for i, (key, (offset, length)) in enumerate(positions.items()):
+            entries[i] = (key, offset, length)
+        entries.sort(order='key')
+
+        # Write to temporary names first so an interrupted build is never picked up
+        tmp_index = self.index_file.with_name(self.index_file.name + '.tmp')
+        with open(tmp_index, 'wb') as f:
+            np.save(f, entries)
+        os.replace(tmp_index, self.index_file)
+
+        self.meta_file.write_text(json.dumps({
+            'format_version': INDEX_FORMAT_VERSION,
+            'source': self._source_signature(),
+            'count': int(len(entries))
+        }))
+
+        logger.info(f"✅ Indexed {len(entries):,} products -> {self.index_file}")
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def _position(self, external_id: str) -> Optional[int]:
+        if self._keys is None:
+            raise RuntimeError("JSONL index is not open")
+        if not external_id or len(self._keys) == 0:
+            return None
+        key = str(external_id).encode('utf-8')
+        i = int(np.searchsorted(self._keys, key))
+        if i < len(self._keys) and self._keys[i] == key:
+            return i
+        return None
+
+    def __len__(self) -> int:
+        return 0 if self._entries is None else len(self._entries)
+
+    def __contains__(self, external_id) -> bool:
+        return self._position(external_id) is not None
+
+    def __getitem__(self, external_id: str) -> dict:
+        i = self._position(external_id)
+        if i is None:
+            raise KeyError(external_id)
+        entry = self._entries[i]
+        start = int(entry['offset'])
+        return json.loads(self._mmap[start:start + int(entry['length'])])
+
+    def get(self, external_id: str, default=None):
+        """Return the parsed product for external_id, or default."""
+        try:
+            return self[external_id]
+        except KeyError:
+            return default
+
+
+def main():
+    """Build (or rebuild) the index for a JSONL file."""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    jsonl_file = sys.argv[1] if len(sys.argv) > 1 else "../importing/openpetfoodfacts-products.jsonl"
+    if not Path(jsonl_file).exists():
+        logger.error(f"❌ JSONL file not found: {jsonl_file}")
+        sys.exit(1)
+    JsonlOffsetIndex(jsonl_file).build()
+
+
+if __name__ == '__main__':
+    main()
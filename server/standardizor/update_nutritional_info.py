@@ -1,20 +1,36 @@
 #!/usr/bin/env python3
 """
-Update Nutritional Info from Cleaned Data
-Updates existing database records' nutritional_info field using cleaned_food_items.json as reference.
+Update Nutritional Info from JSONL Data
+Updates existing database records' nutritional_info field using the OpenPetFoodFacts JSONL export as reference.
 """
 
+import argparse
+import hashlib
 import json
+import random
 import sys
 import logging
 import os
+import threading
+import time
 import requests
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Add the server directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.shared.utils.data_quality_scoring import DataQualityService
+from app.shared.utils.product_extraction import (
+    extract_nutritional_info, extract_nutritional_info_batch, standardize_nutritional_info
+)
+from jsonl_index import JsonlOffsetIndex
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -25,10 +41,30 @@ logger = logging.getLogger(__name__)
 class NutritionalInfoUpdater:
     """Update nutritional_info field using JSONL data as reference."""
     
-    def __init__(self, supabase_url: str, supabase_key: str, jsonl_file: str = None):
+    # Columns read for every record
+    RECORD_COLUMNS = "id,name,brand,barcode,external_id,nutritional_info"
+    
+    # Bulk update tuning
+    PAGE_SIZE = 1000
+    DEFAULT_BATCH_SIZE = 500
+    DEFAULT_WORKERS = 4
+    MAX_RETRIES = 5
+    BACKOFF_BASE_SECONDS = 0.5
+    BACKOFF_MAX_SECONDS = 30.0
+    RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+    
+    def __init__(self, supabase_url: str, supabase_key: str, jsonl_file: str = None,
+                 batch_size: int = DEFAULT_BATCH_SIZE, workers: int = DEFAULT_WORKERS,
+                 dry_run: bool = False):
         self.supabase_url = supabase_url.rstrip('/')
         self.supabase_key = supabase_key
         self.jsonl_file = jsonl_file or "../importing/openpetfoodfacts-products.jsonl"
+        self.batch_size = batch_size
+        self.workers = workers
+        self.dry_run = dry_run
+        
+        # requests.Session is not thread-safe; one per worker thread
+        self._local = threading.local()
         
         self.headers = {
             'apikey': self.supabase_key,
@@ -37,30 +73,19 @@ class NutritionalInfoUpdater:
             'Prefer': 'return=minimal'
         }
         
-        # Load JSONL data for reference
-        self.jsonl_data = {}
+        # Lazy, mmap-backed lookup of JSONL products by external_id
+        self.jsonl_data = JsonlOffsetIndex(self.jsonl_file)
         self.load_jsonl_data()
     
     def load_jsonl_data(self):
-        """Load JSONL data and index by external_id."""
+        """Open the on-disk offset index for the JSONL file (built on first use)."""
         if not Path(self.jsonl_file).exists():
             logger.error(f"JSONL file not found: {self.jsonl_file}")
             return
         
-        logger.info(f"📚 Loading JSONL data from {self.jsonl_file}...")
-        
-        with open(self.jsonl_file, 'r', encoding='utf-8') as f:
-            for line_num, line in enumerate(f, 1):
-                try:
-                    data = json.loads(line.strip())
-                    external_id = data.get('_id') or data.get('id')
-                    if external_id:
-                        self.jsonl_data[external_id] = data
-                except json.JSONDecodeError as e:
-                    logger.warning(f"Invalid JSON on line {line_num}: {e}")
-                    continue
-        
-        logger.info(f"✅ Loaded {len(self.jsonl_data):,} JSONL products indexed by external_id")
+        logger.info(f"📚 Opening JSONL index for {self.jsonl_file}...")
+        self.jsonl_data.open()
+        logger.info(f"✅ Indexed {len(self.jsonl_data):,} JSONL products by external_id")
     
     def test_connection(self) -> bool:
         """Test Supabase API connection."""
@@ -75,324 +100,222 @@ class NutritionalInfoUpdater:
             logger.error(f"❌ Supabase API connection failed: {e}")
             return False
     
-    def get_records_to_update(self, limit: int = None) -> list:
-        """Get existing records that have external_id and can be updated."""
-        url = f"{self.supabase_url}/rest/v1/food_items?external_id=not.is.null&select=id,name,external_id,nutritional_info"
-        
-        if limit:
-            url += f"&limit={limit}"
-        
-        try:
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Error fetching records: {e}")
-            return []
-    
-    def extract_nutritional_data_from_jsonl(self, jsonl_item: dict) -> dict:
-        """Extract nutritional data from JSONL item and convert to standardized format."""
-        # Extract nutriments data
-        nutriments = jsonl_item.get('nutriments', {})
-        
-        # Extract ingredients
-        ingredients = []
-        if 'ingredients_text' in jsonl_item:
-            ingredients_text = jsonl_item['ingredients_text']
-            if isinstance(ingredients_text, str):
-                ingredients = [ing.strip() for ing in ingredients_text.split(',') if ing.strip()]
-        elif 'ingredients' in jsonl_item:
-            ingredients = jsonl_item['ingredients']
-            if isinstance(ingredients, list):
-                ingredients = [str(ing) for ing in ingredients if ing]
-        
-        # Extract allergens
-        allergens = []
-        if 'allergens_tags' in jsonl_item:
-            allergens = [tag.replace('en:', '') for tag in jsonl_item['allergens_tags'] if tag.startswith('en:')]
-        elif 'allergens' in jsonl_item:
-            allergens = jsonl_item['allergens']
-            if isinstance(allergens, list):
-                allergens = [str(allergen) for allergen in allergens if allergen]
+    def iter_records(self, only_with_external_id: bool = False, limit: int = None) -> Iterator[List[dict]]:
+        """Yield food_items records page by page (keyset pagination on id)."""
+        last_id = None
+        fetched = 0
         
-        # Extract nutritional values
-        nutritional_data = {
-            # Calories (try multiple fields)
-            'calories_per_100g': (
-                nutriments.get('energy-kcal_100g') or 
-                nutriments.get('energy_100g') or 
-                nutriments.get('energy-kcal') or 
-                nutriments.get('energy')
-            ),
+        while limit is None or fetched < limit:
+            page_size = self.PAGE_SIZE if limit is None else min(self.PAGE_SIZE, limit - fetched)
+            params = {'select': self.RECORD_COLUMNS, 'order': 'id', 'limit': str(page_size)}
+            if only_with_external_id:
+                params['external_id'] = 'not.is.null'
+            if last_id is not None:
+                params['id'] = f'gt.{last_id}'
             
-            # Protein
-            'protein_percentage': (
-                nutriments.get('proteins_100g') or 
-                nutriments.get('proteins')
-            ),
+            response = self._request_with_retry('GET', f"{self.supabase_url}/rest/v1/food_items", params=params)
+            records = response.json()
+            if not records:
+                break
             
-            # Fat
-            'fat_percentage': (
-                nutriments.get('fat_100g') or 
-                nutriments.get('fat')
-            ),
+            yield records
             
-            # Fiber
-            'fiber_percentage': (
-                nutriments.get('fiber_100g') or 
-                nutriments.get('fiber')
-            ),
-            
-            # Moisture
-            'moisture_percentage': (
-                nutriments.get('moisture_100g') or 
-                nutriments.get('moisture')
-            ),
-            
-            # Ash
-            'ash_percentage': (
-                nutriments.get('ash_100g') or 
-                nutriments.get('ash')
-            ),
-            
-            # Carbohydrates
-            'carbohydrates_percentage': (
-                nutriments.get('carbohydrates_100g') or 
-                nutriments.get('carbohydrates')
-            ),
-            
-            # Sugars
-            'sugars_percentage': (
-                nutriments.get('sugars_100g') or 
-                nutriments.get('sugars')
-            ),
-            
-            # Saturated fat
-            'saturated_fat_percentage': (
-                nutriments.get('saturated-fat_100g') or 
-                nutriments.get('saturated-fat')
-            ),
-            
-            # Sodium
-            'sodium_percentage': (
-                nutriments.get('sodium_100g') or 
-                nutriments.get('sodium')
-            ),
-            
-            # Arrays
-            'ingredients': ingredients,
-            'allergens': allergens,
-            'additives': jsonl_item.get('additives_tags', []),
-            'vitamins': jsonl_item.get('vitamins_tags', []),
-            'minerals': jsonl_item.get('minerals_tags', []),
-            
-            # Strings
-            'source': 'openpetfoodfacts',
-            'external_id': jsonl_item.get('_id', ''),
-            'data_quality_score': jsonl_item.get('completeness', 0.0),
-            'last_updated': jsonl_item.get('last_modified_t', ''),
-            
-            # Objects
-            'nutrient_levels': jsonl_item.get('nutrient_levels', {}),
-            'packaging_info': jsonl_item.get('packaging', {}),
-            'manufacturing_info': {
-                'country': jsonl_item.get('countries', ''),
-                'brand': jsonl_item.get('brands', ''),
-                'manufacturer': jsonl_item.get('manufacturing_places', '')
-            }
-        }
-        
-        return nutritional_data
+            fetched += len(records)
+            last_id = records[-1]['id']
+            if len(records) < page_size:
+                break
+    
+    def extract_nutritional_data_from_jsonl(self, jsonl_item: dict) -> dict:
+        """Extract nutritional data from JSONL item and convert to standardized format."""
+        return extract_nutritional_info(jsonl_item)
     
     def standardize_nutritional_info(self, nutritional_info: dict) -> dict:
         """Standardize nutritional_info to ensure all properties are present with appropriate defaults."""
-        # Define the complete standardized structure with default values
-        standardized = {
-            # Nutritional values (numbers or null)
-            'calories_per_100g': None,
-            'protein_percentage': None,
-            'fat_percentage': None,
-            'fiber_percentage': None,
-            'moisture_percentage': None,
-            'ash_percentage': None,
-            'carbohydrates_percentage': None,
-            'sugars_percentage': None,
-            'saturated_fat_percentage': None,
-            'sodium_percentage': None,
-            
-            # Arrays (empty arrays if missing)
-            'ingredients': [],
-            'allergens': [],
-            'additives': [],
-            'vitamins': [],
-            'minerals': [],
+        return standardize_nutritional_info(nutritional_info)
+    
+    @staticmethod
+    def content_hash(nutritional_info: dict) -> str:
+        """Stable hash of a nutritional_info document (key order independent)."""
+        canonical = json.dumps(nutritional_info or {}, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+    
+    def build_update_row(self, record: dict, nutritional_data: dict) -> Optional[dict]:
+        """
+        Standardize nutritional_data for record and return the bulk update row,
+        or None when the standardized document is identical to the stored one.
+        """
+        standardized = self.standardize_nutritional_info(nutritional_data)
+        if self.content_hash(standardized) == self.content_hash(record.get('nutritional_info')):
+            return None
+        
+        row = {'id': record['id'], 'nutritional_info': standardized}
+        row.update(DataQualityService.quality_columns({**record, 'nutritional_info': standardized}))
+        return row
+    
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(self.headers)
+            self._local.session = session
+        return session
+    
+    def _request_with_retry(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request, retrying transient failures with exponential backoff and jitter."""
+        for attempt in range(self.MAX_RETRIES + 1):
+            try:
+                response = self._session().request(method, url, timeout=60, **kwargs)
+                if response.status_code not in self.RETRYABLE_STATUS_CODES:
+                    response.raise_for_status()
+                    return response
+                error = requests.exceptions.HTTPError(f"{response.status_code} from {url}", response=response)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = e
             
-            # Strings (empty strings if missing)
-            'source': '',
-            'external_id': '',
-            'data_quality_score': 0.0,
-            'last_updated': '',
+            if attempt == self.MAX_RETRIES:
+                raise error
             
-            # Objects (empty objects if missing)
-            'nutrient_levels': {},
-            'packaging_info': {},
-            'manufacturing_info': {}
-        }
-        
-        # Update with actual values from nutritional_info
-        if nutritional_info:
-            for key, value in nutritional_info.items():
-                if key in standardized:
-                    # Ensure proper data types
-                    if key in ['calories_per_100g', 'protein_percentage', 'fat_percentage', 
-                              'fiber_percentage', 'moisture_percentage', 'ash_percentage',
-                              'carbohydrates_percentage', 'sugars_percentage', 'saturated_fat_percentage',
-                              'sodium_percentage', 'data_quality_score']:
-                        # Numeric fields
-                        standardized[key] = value if value is not None else None
-                    elif key in ['ingredients', 'allergens', 'additives', 'vitamins', 'minerals']:
-                        # Array fields
-                        standardized[key] = value if isinstance(value, list) else []
-                    elif key in ['source', 'external_id', 'last_updated']:
-                        # String fields
-                        standardized[key] = str(value) if value is not None else ''
-                    elif key in ['nutrient_levels', 'packaging_info', 'manufacturing_info']:
-                        # Object fields
-                        standardized[key] = value if isinstance(value, dict) else {}
-        
-        return standardized
+            delay = min(self.BACKOFF_MAX_SECONDS, self.BACKOFF_BASE_SECONDS * (2 ** attempt))
+            delay = random.uniform(delay / 2, delay)
+            logger.warning(f"⏳ {method} failed ({error}); retry {attempt + 1}/{self.MAX_RETRIES} in {delay:.1f}s")
+            time.sleep(delay)
     
-    def update_nutritional_info(self, record_id: str, nutritional_info: dict) -> bool:
-        """Update nutritional_info for a specific record with standardized structure."""
-        url = f"{self.supabase_url}/rest/v1/food_items"
-        params = {'id': f'eq.{record_id}'}
-        
-        # Standardize the nutritional_info structure
-        standardized_nutritional_info = self.standardize_nutritional_info(nutritional_info)
+    def bulk_update_nutritional_info(self, rows: List[dict]) -> int:
+        """Apply a batch of row updates with a single UPDATE ... FROM (RPC)."""
+        if self.dry_run or not rows:
+            return len(rows)
         
-        update_data = {'nutritional_info': standardized_nutritional_info}
-        
-        try:
-            response = requests.patch(url, json=update_data, headers=self.headers, params=params)
-            response.raise_for_status()
-            return True
-        except requests.exceptions.RequestException as e:
-            logger.warning(f"Error updating record {record_id}: {e}")
-            return False
+        response = self._request_with_retry(
+            'POST',
+            f"{self.supabase_url}/rest/v1/rpc/bulk_update_food_nutritional_info",
+            json={'p_rows': rows}
+        )
+        return int(response.json() or 0)
     
-    def update_records(self, limit: int = None):
-        """Update nutritional_info for records that have matching external_id in cleaned data."""
-        logger.info("🔍 Finding records to update...")
+    def _run_bulk_update(self, pages: Iterator[List[dict]],
+                         resolve: Callable[[List[dict]], List[Optional[dict]]]) -> dict:
+        """
+        Standardize records page by page and send changed rows in batches
+        through a bounded worker pool.
         
-        # Get existing records
-        existing_records = self.get_records_to_update(limit)
-        logger.info(f"📊 Found {len(existing_records):,} existing records with external_id")
+        resolve(records) returns, for each record of a page, the nutritional
+        data to standardize, or None to skip the record.
+        """
+        stats = {'processed': 0, 'skipped': 0, 'unchanged': 0, 'queued': 0,
+                 'updated': 0, 'failed_batches': 0, 'failed_rows': 0}
+        batch: List[dict] = []
+        in_flight = {}
+        max_in_flight = self.workers * 2
         
-        updated_count = 0
-        not_found_count = 0
-        error_count = 0
+        def collect(done):
+            for future in done:
+                batch_len = in_flight.pop(future)
+                try:
+                    stats['updated'] += future.result()
+                except Exception as e:
+                    stats['failed_batches'] += 1
+                    stats['failed_rows'] += batch_len
+                    logger.error(f"❌ Batch of {batch_len} rows failed after retries: {e}")
         
-        for i, record in enumerate(existing_records):
-            external_id = record.get('external_id')
-            record_id = record.get('id')
-            name = record.get('name', 'Unknown')
-            
-            try:
-                # Check if we have cleaned data for this external_id
-                if external_id in self.cleaned_data:
-                    cleaned_item = self.cleaned_data[external_id]
-                    cleaned_nutritional_info = cleaned_item.get('nutritional_info', {})
+        def submit(executor, rows):
+            if len(in_flight) >= max_in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(done)
+            in_flight[executor.submit(self.bulk_update_nutritional_info, rows)] = len(rows)
+        
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for records in pages:
+                for record, nutritional_data in zip(records, resolve(records)):
+                    stats['processed'] += 1
+                    try:
+                        if nutritional_data is None:
+                            stats['skipped'] += 1
+                            continue
+                        
+                        row = self.build_update_row(record, nutritional_data)
+                        if row is None:
+                            stats['unchanged'] += 1
+                            continue
+                    except Exception as e:
+                        logger.error(f"Error processing record {record.get('id')}: {e}")
+                        stats['skipped'] += 1
+                        continue
                     
-                    if cleaned_nutritional_info:
-                        # Update the record with cleaned nutritional_info
-                        if self.update_nutritional_info(record_id, cleaned_nutritional_info):
-                            updated_count += 1
-                            logger.info(f"✅ Updated {name} (external_id: {external_id})")
-                        else:
-                            error_count += 1
-                    else:
-                        logger.warning(f"⚠️  No nutritional_info in cleaned data for {name}")
-                        error_count += 1
-                else:
-                    not_found_count += 1
-                    if not_found_count <= 5:  # Only log first 5 not found
-                        logger.info(f"🔍 No cleaned data found for {name} (external_id: {external_id})")
-                
-                # Progress update
-                if (i + 1) % 100 == 0:
-                    logger.info(f"📊 Processed {i + 1:,}/{len(existing_records):,} records...")
+                    batch.append(row)
+                    stats['queued'] += 1
+                    if len(batch) >= self.batch_size:
+                        submit(executor, batch)
+                        batch = []
                 
-            except Exception as e:
-                logger.error(f"Error processing record {record_id}: {e}")
-                error_count += 1
+                logger.info(f"📊 Processed {stats['processed']:,} records "
+                            f"({stats['queued']:,} changed, {stats['unchanged']:,} unchanged)...")
+            
+            if batch:
+                submit(executor, batch)
+            collect(wait(in_flight).done)
         
-        logger.info("✅ Update completed!")
-        logger.info(f"📈 Total records processed: {len(existing_records):,}")
-        logger.info(f"✅ Updated: {updated_count:,}")
-        logger.info(f"🔍 Not found in cleaned data: {not_found_count:,}")
-        logger.info(f"❌ Errors: {error_count:,}")
+        return stats
     
-    def standardize_all_records(self, limit: int = None):
-        """Standardize nutritional_info structure for ALL records using JSONL data."""
-        logger.info("🔧 Standardizing ALL records with complete nutritional_info structure using JSONL data...")
+    def _extract_page(self, records: List[dict], fallback_to_stored: bool) -> Tuple[List[Optional[dict]], int]:
+        """
+        Nutritional data for a page of records, extracted in one batch from the
+        matching JSONL products. Records without a match get their stored
+        nutritional_info when fallback_to_stored is set, None otherwise.
         
-        # Get ALL records (not just those with external_id)
-        url = f"{self.supabase_url}/rest/v1/food_items?select=id,name,external_id,nutritional_info"
-        if limit:
-            url += f"&limit={limit}"
-        
-        try:
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            all_records = response.json()
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Error fetching all records: {e}")
-            return
+        Returns the per-record data and the number of JSONL matches.
+        """
+        products = []
+        matched = []
+        for i, record in enumerate(records):
+            external_id = record.get('external_id')
+            product = self.jsonl_data.get(external_id) if external_id else None
+            if product is not None:
+                products.append(product)
+                matched.append(i)
+        if fallback_to_stored:
+            # Use existing nutritional_info or empty dict
+            resolved = [record.get('nutritional_info') or {} for record in records]
+        else:
+            resolved = [None] * len(records)
+        for i, nutritional_data in zip(matched, extract_nutritional_info_batch(products)):
+            resolved[i] = nutritional_data
+        return resolved, len(matched)
+    
+    def _log_stats(self, title: str, stats: dict):
+        logger.info(f"✅ {title} completed!")
+        logger.info(f"📈 Total records processed: {stats['processed']:,}")
+        logger.info(f"✅ Updated: {stats['updated']:,}{' (dry run)' if self.dry_run else ''}")
+        logger.info(f"⏭️  Unchanged (same content hash): {stats['unchanged']:,}")
+        logger.info(f"🔍 Skipped: {stats['skipped']:,}")
+        logger.info(f"❌ Failed batches: {stats['failed_batches']:,} ({stats['failed_rows']:,} rows)")
+    
+    def update_records(self, limit: int = None) -> dict:
+        """Update nutritional_info for records that have a matching external_id in the JSONL data."""
+        logger.info("🔍 Updating records with a JSONL match...")
         
-        logger.info(f"📊 Found {len(all_records):,} total records to standardize")
+        def resolve(records):
+            return self._extract_page(records, fallback_to_stored=False)[0]
         
-        updated_count = 0
-        error_count = 0
+        stats = self._run_bulk_update(self.iter_records(only_with_external_id=True, limit=limit), resolve)
+        self._log_stats("Update", stats)
+        return stats
+    
+    def standardize_all_records(self, limit: int = None) -> dict:
+        """Standardize nutritional_info structure for ALL records using JSONL data."""
+        logger.info("🔧 Standardizing ALL records with complete nutritional_info structure using JSONL data...")
         jsonl_matches = 0
         
-        for i, record in enumerate(all_records):
-            record_id = record.get('id')
-            name = record.get('name', 'Unknown')
-            external_id = record.get('external_id')
-            current_nutritional_info = record.get('nutritional_info', {})
-            
-            try:
-                # Check if we have JSONL data for this external_id
-                if external_id and external_id in self.jsonl_data:
-                    # Extract nutritional data from JSONL
-                    jsonl_item = self.jsonl_data[external_id]
-                    nutritional_data = self.extract_nutritional_data_from_jsonl(jsonl_item)
-                    jsonl_matches += 1
-                else:
-                    # Use existing nutritional_info or empty dict
-                    nutritional_data = current_nutritional_info
-                
-                # Standardize the structure
-                if self.update_nutritional_info(record_id, nutritional_data):
-                    updated_count += 1
-                    if updated_count % 50 == 0:
-                        logger.info(f"✅ Standardized {name}")
-                else:
-                    error_count += 1
-                
-                # Progress update
-                if (i + 1) % 100 == 0:
-                    logger.info(f"📊 Processed {i + 1:,}/{len(all_records):,} records...")
-                
-            except Exception as e:
-                logger.error(f"Error processing record {record_id}: {e}")
-                error_count += 1
+        def resolve(records):
+            nonlocal jsonl_matches
+            page, matches = self._extract_page(records, fallback_to_stored=True)
+            jsonl_matches += matches
+            return page
         
-        logger.info("✅ Standardization completed!")
-        logger.info(f"📈 Total records processed: {len(all_records):,}")
-        logger.info(f"✅ Standardized: {updated_count:,}")
+        stats = self._run_bulk_update(self.iter_records(limit=limit), resolve)
+        stats['jsonl_matches'] = jsonl_matches
+        self._log_stats("Standardization", stats)
         logger.info(f"🔗 JSONL matches: {jsonl_matches:,}")
-        logger.info(f"❌ Errors: {error_count:,}")
+        return stats
     
     def analyze_results(self):
         """Analyze the results of the update."""
@@ -456,6 +379,15 @@ class NutritionalInfoUpdater:
 
 def main():
     """Main function."""
+    parser = argparse.ArgumentParser(description='Standardize food_items nutritional_info using JSONL data')
+    parser.add_argument('--dry-run', '-d', action='store_true', help='Compute changes without writing')
+    parser.add_argument('--limit', '-l', type=int, default=None, help='Maximum number of records to process')
+    parser.add_argument('--batch-size', '-b', type=int, default=NutritionalInfoUpdater.DEFAULT_BATCH_SIZE,
+                        help='Rows per bulk update request')
+    parser.add_argument('--workers', '-w', type=int, default=NutritionalInfoUpdater.DEFAULT_WORKERS,
+                        help='Concurrent bulk update requests')
+    args = parser.parse_args()
+    
     supabase_url = os.getenv('SUPABASE_URL')
     supabase_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
     
@@ -468,7 +400,10 @@ def main():
         logger.error(f"❌ JSONL file not found: {jsonl_file}")
         sys.exit(1)
     
-    updater = NutritionalInfoUpdater(supabase_url, supabase_key, jsonl_file)
+    updater = NutritionalInfoUpdater(
+        supabase_url, supabase_key, jsonl_file,
+        batch_size=args.batch_size, workers=args.workers, dry_run=args.dry_run
+    )
     
     # Test connection first
     if not updater.test_connection():
@@ -477,7 +412,7 @@ def main():
     
     try:
         # Standardize ALL records using JSONL data
-        updater.standardize_all_records()  # Test with 100 records first
+        updater.standardize_all_records(limit=args.limit)
         
         # Analyze results
         updater.analyze_results()
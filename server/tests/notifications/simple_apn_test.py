@@ -43,7 +43,7 @@ async def simple_apn_test(device_token: str = None):
     print("\n🔐 Testing JWT Token Creation...")
     try:
         push_service = PushNotificationService()
-        headers = await push_service._create_headers()
+        headers = push_service._create_headers()
         
         if 'authorization' in headers:
             print("✅ JWT token created successfully")
@@ -65,7 +65,7 @@ class APNTester:
         
         try:
             # This will test the JWT creation in the push service
-            headers = await self.push_service._create_headers()
+            headers = self.push_service._create_headers()
             
             if 'authorization' in headers:
                 print("✅ JWT token created successfully")
@@ -3,12 +3,23 @@ Data Quality Service Tests
 Test the enhanced data quality assessment functionality
 """
 
+import asyncio
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
 import pytest
 from app.services.data_quality_service import (
     DataQualityService, 
     DataQualityMetrics, 
-    DataQualityLevel
+    DataQualityLevel,
+    QualityStatsAccumulator
 )
+from app.services.food_quality_catalog_service import FoodQualityCatalogService
 
 
 class TestDataQualityService:
@@ -256,7 +267,169 @@ class TestDataQualityService:
         assert "recommendations" in summary
         assert summary["overall_score"] <= 1.0
         assert summary["quality_level"] in ["excellent", "good", "fair", "poor"]
+    
+    def test_score_batch_matches_single_assessment(self):
+        """Test columnar batch scoring matches per-item assessment exactly"""
+        food_items = [
+            {
+                "id": "1",
+                "name": "Premium Dog Food",
+                "brand": "Healthy Paws",
+                "barcode": "123456789",
+                "nutritional_info": {
+                    "calories_per_100g": 350.0,
+                    "protein_percentage": 25.0,
+                    "fat_percentage": 15.0,
+                    "fiber_percentage": 3.0,
+                    "moisture_percentage": 10.0,
+                    "ash_percentage": 8.0,
+                    "ingredients": ["chicken"] * 12
+                }
+            },
+            {
+                "id": "2",
+                "name": "Test Dog Food",
+                "brand": "Test Brand",
+                "nutritional_info": {
+                    "calories_per_100g": 350.0,
+                    "protein_percentage": 25.0,
+                    "ingredients": ["chicken", "rice"]
+                }
+            },
+            {"id": "3", "name": "Empty", "nutritional_info": None},
+        ]
+        
+        batch = DataQualityService.score_batch(food_items)
+        
+        assert len(batch) == 3
+        for i, food_item in enumerate(food_items):
+            metrics = DataQualityService.assess_data_quality(food_item)
+            assert batch.overall_score[i] == metrics.overall_score
+            assert batch.levels[i] == metrics.level.value
+            assert batch.ingredients_count[i] == metrics.ingredients_count
+            assert batch.nutritional_fields_count[i] == metrics.nutritional_fields_count
+    
+    def test_quality_stats_accumulator_streams_batches(self):
+        """Test statistics folded page by page equal a single-pass result"""
+        food_items = [
+            {"id": str(i), "name": "Food", "nutritional_info": {"calories_per_100g": 300.0, "ingredients": ["a"] * i}}
+            for i in range(10)
+        ]
+        
+        streamed = QualityStatsAccumulator()
+        streamed.add(DataQualityService.score_batch(food_items[:4]))
+        streamed.add(DataQualityService.score_batch(food_items[4:]))
+        single = QualityStatsAccumulator()
+        single.add(DataQualityService.score_batch(food_items))
+        
+        assert streamed.summary() == single.summary()
+        assert streamed.summary()["total_items"] == 10
+        assert sum(streamed.summary()["quality_distribution"].values()) == 10
 
+    
+    def test_quality_columns_match_assessment(self):
+        """Test materialized columns carry the assessed score, level and version"""
+        food_item = {
+            "name": "Test Dog Food",
+            "brand": "Test Brand",
+            "nutritional_info": {
+                "calories_per_100g": 350.0,
+                "protein_percentage": 25.0,
+                "ingredients": ["chicken", "rice"]
+            }
+        }
+        
+        columns = DataQualityService.quality_columns(food_item)
+        metrics = DataQualityService.assess_data_quality(food_item)
+        
+        assert columns["quality_score"] == round(metrics.overall_score, 3)
+        assert columns["quality_level"] == metrics.level.value
+        assert columns["quality_version"] == DataQualityService.scoring_version()
+        assert columns["quality_scored_at"]
+    
+    def test_scoring_version_changes_with_weights(self, monkeypatch):
+        """Test changing a weight produces a new scoring version"""
+        original = DataQualityService.scoring_version()
+        assert DataQualityService.scoring_version() == original
+        
+        monkeypatch.setattr(DataQualityService, "CRITICAL_FIELD_WEIGHT", 0.35)
+        
+        assert DataQualityService.scoring_version() != original
+
+    def test_ingredient_bins_shared_by_both_paths(self, monkeypatch):
+        """Test the scalar ingredients score reads the same bins as score_batch"""
+        monkeypatch.setattr(DataQualityService, "INGREDIENT_BIN_SCORES", [0.0, 0.1, 0.4, 0.6, 0.8, 0.9])
+        food_item = {"id": "1", "nutritional_info": {"ingredients": ["a"] * 7}}
+        
+        score, count = DataQualityService.calculate_ingredients_score(["a"] * 7)
+        
+        assert (score, count) == (0.6, 7)
+        assert DataQualityService.score_batch([food_item]).ingredients_score[0] == score
+    
+    def test_stored_statistics_aggregates_materialized_scores(self):
+        """Test the overview is built from the per-level aggregate without scoring"""
+        rows = [
+            {"quality_level": "good", "items": 3, "score_sum": "2.4", "items_with_ingredients": 3, "items_with_nutritional": 3},
+            {"quality_level": "poor", "items": 1, "score_sum": "0.2", "items_with_ingredients": 0, "items_with_nutritional": 1},
+            {"quality_level": None, "items": 4, "score_sum": "0", "items_with_ingredients": 1, "items_with_nutritional": 2},
+        ]
+        calls = []
+        
+        def rpc(name, params):
+            calls.append((name, params))
+            return SimpleNamespace(execute=lambda: SimpleNamespace(data=rows))
+        
+        stats = asyncio.run(FoodQualityCatalogService(SimpleNamespace(rpc=rpc)).stored_statistics())
+        
+        assert calls[0][0] == "food_quality_statistics"
+        assert calls[0][1]["p_version"] == DataQualityService.scoring_version()
+        assert stats["total_items"] == 8
+        assert stats["scored_items"] == 4 and stats["unscored_items"] == 4
+        assert stats["quality_distribution"] == {"excellent": 0, "good": 3, "fair": 0, "poor": 1}
+        assert stats["average_score"] == 0.65
+        assert stats["ingredients_coverage"] == 0.5
+        assert stats["nutritional_coverage"] == 0.75
+
+    def test_stored_coverage_fields_match_scorer(self):
+        """Test the has_nutritional_info column counts the scorer's nutritional fields"""
+        migration = Path(__file__).resolve().parents[1] / "scripts" / "database" / "add_food_quality_statistics.sql"
+        sql = migration.read_text()
+        array = sql[sql.index("?| ARRAY["):sql.index("]", sql.index("?| ARRAY["))]
+        
+        assert set(re.findall(r"'(\w+)'", array)) == set(
+            DataQualityService.CRITICAL_NUTRITIONAL_FIELDS +
+            DataQualityService.IMPORTANT_NUTRITIONAL_FIELDS +
+            DataQualityService.EXTENDED_NUTRITIONAL_FIELDS
+        )
+
+    def test_low_quality_items_use_current_version(self):
+        """Test low-quality items are read from scores of the current version only"""
+        supabase = MagicMock()
+        query = supabase.table.return_value.select.return_value
+        query.eq.return_value.lt.return_value.order.return_value.limit.return_value.execute.return_value = (
+            SimpleNamespace(data=[{"id": "1", "quality_score": "0.2", "quality_level": "poor"}])
+        )
+        
+        rows = asyncio.run(FoodQualityCatalogService(supabase).get_low_quality_items(0.5, 10))
+        
+        query.eq.assert_called_once_with("quality_version", DataQualityService.scoring_version())
+        query.eq.return_value.lt.assert_called_once_with("quality_score", 0.5)
+        assert "nutritional_info" not in supabase.table.return_value.select.call_args[0][0]
+        assert rows[0]["quality_level"] == "poor"
+
+    def test_scorer_imports_without_app_environment(self):
+        """Test scripts can import the scorer without the API's settings"""
+        env = {"PATH": os.environ.get("PATH", "")}
+        code = (
+            "import sys; from app.shared.utils.data_quality_scoring import DataQualityService; "
+            "assert 'app.core.config' not in sys.modules and 'app.services' not in sys.modules"
+        )
+        
+        result = subprocess.run(
+            [sys.executable, "-c", code], cwd=Path(__file__).resolve().parents[1], env=env, capture_output=True
+        )
+        
+        assert result.returncode == 0, result.stderr.decode()
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,213 @@
+"""
+Shared fixtures for the unit tests
+
+make_supabase builds an in-memory stand-in for the Supabase client. Table
+queries filter, order, limit and write plain dict rows, every executed query
+is recorded in calls, and RPCs answer from per-function handlers.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+_COMPARISONS = {
+    "eq": lambda value, target: value == target,
+    "neq": lambda value, target: value != target,
+    "gt": lambda value, target: value is not None and value > target,
+    "gte": lambda value, target: value is not None and value >= target,
+    "lt": lambda value, target: value is not None and value < target,
+    "lte": lambda value, target: value is not None and value <= target,
+    "in": lambda value, target: value in target,
+    "is": lambda value, target: value is target,
+}
+_IS_VALUES = {"null": None, "true": True, "false": False}
+
+
+def _split_terms(logic):
+    """Split a PostgREST logic string on top-level commas"""
+    terms, depth, quoted, start = [], 0, False, 0
+    for i, char in enumerate(logic):
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and not depth and char == ",":
+            terms.append(logic[start:i])
+            start = i + 1
+    terms.append(logic[start:])
+    return terms
+
+
+def _logic_matches(row, logic, combine=any):
+    """Evaluate an or_() filter string such as 'a.eq.1,and(b.gt."x",c.lt.2)'"""
+    results = []
+    for term in _split_terms(logic):
+        if term.startswith(("and(", "or(")):
+            group, _, inner = term.partition("(")
+            results.append(_logic_matches(row, inner[:-1], all if group == "and" else any))
+            continue
+        column, op, target = term.split(".", 2)
+        target = target.strip('"')
+        value = row.get(column)
+        if op == "is":
+            target = _IS_VALUES[target]
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            target = float(target)
+        results.append(_COMPARISONS[op](value, target))
+    return combine(results)
+
+
+class FakeQuery:
+    """One chained table query; call records what was asked of the table"""
+
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.call = {
+            "table": table, "action": "select", "columns": None, "count": None, "data": None,
+            "filters": [], "or": None, "order": [], "limit": None, "on_conflict": None, "matched": 0,
+        }
+
+    def select(self, columns="*", count=None, **kwargs):
+        self.call.update(columns=columns, count=count)
+        return self
+
+    def insert(self, data, **kwargs):
+        self.call.update(action="insert", data=data)
+        return self
+
+    def update(self, data, **kwargs):
+        self.call.update(action="update", data=data)
+        return self
+
+    def upsert(self, data, on_conflict="id", **kwargs):
+        self.call.update(action="upsert", data=data, on_conflict=on_conflict)
+        return self
+
+    def delete(self, **kwargs):
+        self.call["action"] = "delete"
+        return self
+
+    def _filter(self, op, column, value):
+        self.call["filters"].append((op, column, value))
+        return self
+
+    def eq(self, column, value):
+        return self._filter("eq", column, value)
+
+    def neq(self, column, value):
+        return self._filter("neq", column, value)
+
+    def gt(self, column, value):
+        return self._filter("gt", column, value)
+
+    def gte(self, column, value):
+        return self._filter("gte", column, value)
+
+    def lt(self, column, value):
+        return self._filter("lt", column, value)
+
+    def lte(self, column, value):
+        return self._filter("lte", column, value)
+
+    def in_(self, column, values):
+        return self._filter("in", column, list(values))
+
+    def is_(self, column, value):
+        return self._filter("is", column, _IS_VALUES.get(value, value))
+
+    def or_(self, filters, **kwargs):
+        self.call["or"] = filters
+        return self
+
+    def order(self, column, desc=False, foreign_table=None, **kwargs):
+        # Ordering of embedded rows is left to the test data
+        if foreign_table is None:
+            self.call["order"].append((column, desc))
+        return self
+
+    def limit(self, count, **kwargs):
+        self.call["limit"] = count
+        return self
+
+    def range(self, start, end):
+        self.call["range"] = (start, end)
+        return self
+
+    def _matches(self, row):
+        if not all(_COMPARISONS[op](row.get(column), value) for op, column, value in self.call["filters"]):
+            return False
+        return self.call["or"] is None or _logic_matches(row, self.call["or"])
+
+    def execute(self):
+        call = self.call
+        if self.table in self.client.failing or (self.table, call["action"]) in self.client.failing:
+            raise RuntimeError(f"{call['action']} on {self.table} failed")
+        self.client.calls.append(call)
+
+        rows = self.client.tables.setdefault(self.table, [])
+        if call["action"] == "insert":
+            inserted = [dict(row) for row in (call["data"] if isinstance(call["data"], list) else [call["data"]])]
+            rows.extend(inserted)
+            call["matched"] = len(inserted)
+            return SimpleNamespace(data=[dict(row) for row in inserted], count=len(inserted))
+        if call["action"] == "upsert":
+            keys = call["on_conflict"].split(",")
+            upserted = [dict(row) for row in (call["data"] if isinstance(call["data"], list) else [call["data"]])]
+            for new in upserted:
+                rows[:] = [row for row in rows if any(row.get(key) != new.get(key) for key in keys)]
+                rows.append(new)
+            call["matched"] = len(upserted)
+            return SimpleNamespace(data=[dict(row) for row in upserted], count=len(upserted))
+
+        matched = [row for row in rows if self._matches(row)]
+        for column, desc in reversed(call["order"]):
+            matched.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+        if "range" in call:
+            matched = matched[call["range"][0]:call["range"][1] + 1]
+        if call["limit"] is not None:
+            matched = matched[:call["limit"]]
+        call["matched"] = len(matched)
+
+        if call["action"] == "update":
+            for row in matched:
+                row.update(call["data"])
+        elif call["action"] == "delete":
+            rows[:] = [row for row in rows if not any(row is match for match in matched)]
+        return SimpleNamespace(data=[dict(row) for row in matched], count=len(matched))
+
+
+class FakeSupabase:
+    """In-memory Supabase client: tables of dict rows, recorded calls and RPC handlers"""
+
+    def __init__(self, tables=None, rpc_handlers=None, failing=()):
+        self.tables = tables if tables is not None else {}
+        self.rpc_handlers = dict(rpc_handlers or {})
+        # Table names, or (table, action) pairs, whose queries raise
+        self.failing = set(failing)
+        self.calls = []
+        self.rpcs = []
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def rpc(self, name, params=None):
+        self.rpcs.append((name, params))
+        handler = self.rpc_handlers.get(name)
+        data = handler(params) if callable(handler) else handler
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=data))
+
+    def queries(self, table=None, action=None):
+        """Executed calls, optionally only those on a table and/or of an action"""
+        return [
+            call for call in self.calls
+            if table in (None, call["table"]) and action in (None, call["action"])
+        ]
+
+
+@pytest.fixture
+def make_supabase():
+    """Factory for in-memory Supabase clients: make_supabase({"table": [rows]})"""
+    return FakeSupabase
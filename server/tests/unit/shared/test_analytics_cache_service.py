@@ -0,0 +1,209 @@
+"""
+Unit tests for the tiered analytics cache
+
+Tests read-through of L1 (in-process), L2 (Redis) and L3 (table), that
+invalidation clears every tier, that L1 entries are short-lived so other
+workers' invalidations are seen, and that a result invalidated while it is
+being computed is not left in the cache.
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from app.models.nutrition.advanced_nutrition import AnalyticsType
+from app.services.analytics.analytics_cache_service import AnalyticsCacheService
+from app.shared.services import cache_service as cache_module
+from app.shared.services.database_operation_service import DatabaseOperationService
+
+WEEKLY = AnalyticsType.WEEKLY_SUMMARY
+
+
+class FakeRedis:
+    """The subset of redis.asyncio used by the cache"""
+
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.values[key] = value
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+    async def incr(self, key):
+        self.values[key] = str(int(self.values.get(key, 0)) + 1)
+        return int(self.values[key])
+
+    async def expire(self, key, seconds):
+        return True
+
+
+@pytest.fixture(autouse=True)
+def upsert(monkeypatch):
+    """Upsert into the fake table, keyed by (pet_id, analysis_type)"""
+
+    async def upsert_on_conflict(self, table_name, data, on_conflict, **kwargs):
+        row = {
+            key: value.isoformat() if isinstance(value, datetime) else value
+            for key, value in data.items()
+        }
+        rows = self.supabase.tables.setdefault(table_name, [])
+        rows[:] = [
+            r for r in rows
+            if (r["pet_id"], r["analysis_type"]) != (row["pet_id"], row["analysis_type"])
+        ]
+        row.update(id=f"{row['pet_id']}-{row['analysis_type']}", created_at=row["generated_at"])
+        rows.append(row)
+        return [row]
+
+    monkeypatch.setattr(DatabaseOperationService, "upsert_on_conflict", upsert_on_conflict)
+    AnalyticsCacheService._l1.clear()
+    yield
+    AnalyticsCacheService._l1.clear()
+
+
+@pytest.fixture
+def no_redis(monkeypatch):
+    monkeypatch.setattr(cache_module.cache_service, "_use_redis", False)
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(cache_module.cache_service, "_use_redis", True)
+    monkeypatch.setattr(cache_module.cache_service, "_redis_client", fake)
+    return fake
+
+
+def counting_compute(calls, value="v1"):
+    async def compute():
+        calls.append(value)
+        return {"value": value}
+    return compute
+
+
+class TestReadThrough:
+    """Test suite for reads through L1, L2 and L3"""
+
+    def test_second_read_is_served_from_l1(self, no_redis, make_supabase):
+        """Test a computed result is read back without recomputing or querying"""
+        supabase = make_supabase()
+        service = AnalyticsCacheService(supabase)
+        calls = []
+
+        async def run():
+            await service.get_or_compute("p1", WEEKLY, counting_compute(calls))
+            reads = len(supabase.queries(action="select"))
+            cached = await service.get_or_compute("p1", WEEKLY, counting_compute(calls))
+            return cached, reads
+
+        cached, reads = asyncio.run(run())
+
+        assert calls == ["v1"]
+        assert cached.analysis_data == {"value": "v1"}
+        assert len(supabase.queries(action="select")) == reads
+
+    def test_l3_backfills_l1(self, no_redis, make_supabase):
+        """Test a row found in the table is cached in L1"""
+        supabase = make_supabase()
+        service = AnalyticsCacheService(supabase)
+        asyncio.run(service.get_or_compute("p1", WEEKLY, counting_compute([])))
+        AnalyticsCacheService._l1.clear()
+
+        assert asyncio.run(service.get("p1", WEEKLY)).analysis_data == {"value": "v1"}
+        assert AnalyticsCacheService.cache_key("p1", WEEKLY) in AnalyticsCacheService._l1
+
+    def test_l2_is_read_before_l3(self, redis, make_supabase):
+        """Test another worker's result is served from Redis without a table query"""
+        supabase = make_supabase()
+        asyncio.run(AnalyticsCacheService(supabase).get_or_compute("p1", WEEKLY, counting_compute([])))
+        AnalyticsCacheService._l1.clear()
+        reads = len(supabase.queries(action="select"))
+
+        assert asyncio.run(AnalyticsCacheService(supabase).get("p1", WEEKLY)).analysis_data == {"value": "v1"}
+        assert len(supabase.queries(action="select")) == reads
+
+    def test_l1_entries_are_short_lived_without_redis(self, no_redis, make_supabase):
+        """Test L1 is capped so another worker's invalidation is picked up from L3"""
+        service = AnalyticsCacheService(make_supabase())
+
+        asyncio.run(service.get_or_compute("p1", WEEKLY, counting_compute([])))
+
+        entry = AnalyticsCacheService._l1[AnalyticsCacheService.cache_key("p1", WEEKLY)]
+        assert entry.ttl <= AnalyticsCacheService.L1_TTL_SECONDS
+
+
+class TestInvalidation:
+    """Test suite for invalidate_pet"""
+
+    def test_clears_every_tier(self, redis, make_supabase):
+        """Test invalidation removes the L1 entry, the Redis key and the table row"""
+        supabase = make_supabase()
+        service = AnalyticsCacheService(supabase)
+        calls = []
+
+        async def run():
+            await service.get_or_compute("p1", WEEKLY, counting_compute(calls, "v1"))
+            await service.invalidate_pet("p1")
+            return await service.get_or_compute("p1", WEEKLY, counting_compute(calls, "v2"))
+
+        result = asyncio.run(run())
+
+        assert calls == ["v1", "v2"]
+        assert result.analysis_data == {"value": "v2"}
+        assert redis.values[AnalyticsCacheService.generation_key("p1")] == "1"
+
+    def test_invalidation_during_compute_is_not_overwritten(self, no_redis, make_supabase):
+        """Test a result computed from data invalidated meanwhile is not cached"""
+        supabase = make_supabase()
+        service = AnalyticsCacheService(supabase)
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def slow_compute():
+            started.set()
+            await release.wait()
+            return {"value": "stale"}
+
+        async def run():
+            task = asyncio.create_task(service.get_or_compute("p1", WEEKLY, slow_compute))
+            await started.wait()
+            await service.invalidate_pet("p1")
+            release.set()
+            returned = await task
+            return returned, await service.get("p1", WEEKLY)
+
+        returned, cached = asyncio.run(run())
+
+        assert returned.analysis_data == {"value": "stale"}
+        assert cached is None
+        assert not supabase.tables[AnalyticsCacheService.TABLE_NAME]
+        assert not AnalyticsCacheService._computing
+
+    def test_other_worker_invalidation_during_compute(self, redis, make_supabase):
+        """Test a generation bump from another worker drops the stored result"""
+        supabase = make_supabase()
+        service = AnalyticsCacheService(supabase)
+
+        async def compute():
+            # Another worker invalidates the pet while this one computes
+            await redis.incr(AnalyticsCacheService.generation_key("p1"))
+            return {"value": "stale"}
+
+        asyncio.run(service.get_or_compute("p1", WEEKLY, compute))
+
+        assert AnalyticsCacheService.cache_key("p1", WEEKLY) not in redis.values
+        assert AnalyticsCacheService.cache_key("p1", WEEKLY) not in AnalyticsCacheService._l1
+        assert not supabase.tables[AnalyticsCacheService.TABLE_NAME]
@@ -0,0 +1,188 @@
+"""
+Unit tests for the batch endpoint
+
+Tests sub-request validation, wave grouping, in-process dispatch through the
+middleware stack and that the batch context is shared with sub-requests only
+for the batch token.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import APIRouter, Body, FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.api.v1.batch.router import _waves, execute_batch
+from app.core.middleware.json_compression import JSONCompressionMiddleware
+from app.models.core.batch import BatchRequest, BatchSubRequest
+from app.shared.services.batch_context import BatchContext, batch_scope, get_batch_context
+
+
+def make_context(token="token-1"):
+    return BatchContext(access_token=token, user=SimpleNamespace(id="user-1"), supabase=None)
+
+
+def make_app(calls, seen=None, limit=None):
+    """
+    App whose routes record the order they run in and the batch context they see
+
+    A middleware records every request it sees (and rejects requests past
+    `limit`), and JSON responses are gzipped as in the real app.
+    """
+    seen = [] if seen is None else seen
+    api = APIRouter()
+
+    @api.get("/api/v1/items")
+    async def list_items(request: Request, limit: int = 10, tag: str = None):
+        calls.append("list")
+        batch = get_batch_context(request.headers["authorization"].split(" ", 1)[1])
+        return {"limit": limit, "tag": tag, "user": batch.user.id if batch else None}
+
+    @api.post("/api/v1/items")
+    async def create_item(item: dict = Body(...)):
+        await asyncio.sleep(0)
+        calls.append("create")
+        return {"created": item["name"]}
+
+    @api.get("/api/v1/missing")
+    async def missing():
+        raise HTTPException(status_code=404, detail="Pet not found or access denied")
+
+    @api.get("/api/v1/broken")
+    async def broken():
+        raise RuntimeError("boom")
+
+    app = FastAPI()
+    app.include_router(api)
+
+    async def record(request: Request, call_next):
+        seen.append((request.method, request.url.path, request.headers.get("x-forwarded-for")))
+        if limit is not None and len(seen) > limit:
+            return JSONResponse(status_code=429, content={"detail": "Rate limit exceeded"})
+        return await call_next(request)
+
+    app.add_middleware(BaseHTTPMiddleware, dispatch=record)
+    app.add_middleware(JSONCompressionMiddleware)
+
+    @app.post("/api/v1/batch")
+    async def batch(payload: BatchRequest, request: Request):
+        responses = await execute_batch(request.app, request.scope, make_context(), payload.requests)
+        return [response.model_dump() for response in responses]
+
+    return app
+
+
+class TestBatchRequestValidation:
+    """Test suite for batch request models"""
+
+    def test_normalizes_method(self):
+        """Test methods are upper-cased"""
+        assert BatchSubRequest(id="a", method="get", path="/api/v1/pets/").method == "GET"
+
+    @pytest.mark.parametrize("path", ["/docs", "/api/v1/batch", "/api/v1/auth/login", "/api/v1/../x"])
+    def test_rejects_unbatchable_paths(self, path):
+        """Test non-API, nested batch and auth paths are rejected"""
+        with pytest.raises(ValidationError):
+            BatchSubRequest(id="a", path=path)
+
+    def test_rejects_duplicate_ids(self):
+        """Test sub-request ids must be unique"""
+        with pytest.raises(ValidationError):
+            BatchRequest(requests=[{"id": "a", "path": "/api/v1/pets/"}] * 2)
+
+
+class TestWaves:
+    """Test suite for wave grouping"""
+
+    def test_reads_grouped_writes_alone(self):
+        """Test consecutive GETs share a wave and each write is its own wave"""
+        subs = [
+            BatchSubRequest(id="1", path="/api/v1/a"),
+            BatchSubRequest(id="2", path="/api/v1/b"),
+            BatchSubRequest(id="3", method="POST", path="/api/v1/c"),
+            BatchSubRequest(id="4", method="DELETE", path="/api/v1/d"),
+            BatchSubRequest(id="5", path="/api/v1/e"),
+        ]
+
+        assert [[sub.id for sub in wave] for wave in _waves(subs)] == [["1", "2"], ["3"], ["4"], ["5"]]
+
+
+class TestExecuteBatch:
+    """Test suite for in-process dispatch"""
+
+    def test_dispatches_in_order_with_context(self):
+        """Test results keep request order, queries merge and sub-requests see the context"""
+        calls = []
+        client = TestClient(make_app(calls))
+
+        response = client.post("/api/v1/batch", json={"requests": [
+            {"id": "list", "path": "/api/v1/items?limit=5", "query": {"tag": "dog"}},
+            {"id": "create", "method": "POST", "path": "/api/v1/items", "body": {"name": "Rex"}},
+            {"id": "after", "path": "/api/v1/items"},
+        ]})
+
+        results = response.json()
+        assert [r["id"] for r in results] == ["list", "create", "after"]
+        assert results[0]["body"] == {"limit": 5, "tag": "dog", "user": "user-1"}
+        assert results[1]["body"] == {"created": "Rex"}
+        assert calls == ["list", "create", "list"]
+
+    def test_errors_are_per_sub_request(self):
+        """Test HTTP errors and crashes are reported without failing the batch"""
+        client = TestClient(make_app([]))
+
+        response = client.post("/api/v1/batch", json={"requests": [
+            {"id": "missing", "path": "/api/v1/missing"},
+            {"id": "broken", "path": "/api/v1/broken"},
+            {"id": "invalid", "path": "/api/v1/items", "query": {"limit": "x"}},
+            {"id": "ok", "path": "/api/v1/items"},
+        ]})
+
+        statuses = {r["id"]: r["status"] for r in response.json()}
+        assert response.status_code == 200
+        assert statuses == {"missing": 404, "broken": 500, "invalid": 422, "ok": 200}
+
+    def test_sub_requests_pass_through_middleware(self):
+        """Test every sub-request is seen (and can be rejected) by the middleware stack"""
+        seen = []
+        client = TestClient(make_app([], seen=seen, limit=3))
+
+        response = client.post(
+            "/api/v1/batch",
+            headers={"X-Forwarded-For": "203.0.113.7"},
+            json={"requests": [
+                {"id": "a", "path": "/api/v1/items", "query": {"tag": "a" * 100}},
+                {"id": "b", "method": "POST", "path": "/api/v1/items", "body": {"name": "Rex"}},
+                {"id": "c", "path": "/api/v1/items"},
+            ]}
+        )
+
+        results = {r["id"]: r for r in response.json()}
+        assert seen == [
+            ("POST", "/api/v1/batch", "203.0.113.7"),
+            ("GET", "/api/v1/items", "203.0.113.7"),
+            ("POST", "/api/v1/items", "203.0.113.7"),
+            ("GET", "/api/v1/items", "203.0.113.7"),
+        ]
+        assert results["a"]["body"]["tag"] == "a" * 100
+        assert results["b"]["status"] == 200
+        assert results["c"]["status"] == 429
+
+
+class TestBatchContext:
+    """Test suite for the batch context"""
+
+    def test_scoped_to_token(self):
+        """Test the context is only visible inside the scope and for its token"""
+        context = make_context()
+
+        with batch_scope(context):
+            assert get_batch_context() is context
+            assert get_batch_context("token-1") is context
+            assert get_batch_context("other-token") is None
+
+        assert get_batch_context() is None
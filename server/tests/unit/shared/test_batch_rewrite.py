@@ -0,0 +1,157 @@
+"""
+Unit tests for the batch rewrite engine used by the food_items cleanup scripts
+
+Tests first-match rule tables, keyset paging, grouped writes (one statement
+per target value and id chunk), dry runs and checkpoint resume.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "scripts" / "database"))
+
+from batch_rewrite import DELETE, KEEP, BatchRewriter, Rule, RuleMapping  # noqa: E402
+
+
+def food_items_table(values):
+    return {"food_items": [{"id": f"id-{i:03d}", "country": value} for i, value in enumerate(values)]}
+
+
+def writes(supabase):
+    """(action, data, ids) of every update and delete statement"""
+    return [
+        (call["action"], call["data"], call["filters"][0][2])
+        for call in supabase.calls if call["action"] != "select"
+    ]
+
+
+def page_starts(supabase):
+    """The id each page read started after (None for the first page)"""
+    return [
+        next((value for op, _, value in call["filters"] if op == "gt"), None)
+        for call in supabase.queries(action="select")
+    ]
+
+
+COUNTRY_RULES = RuleMapping("country", [
+    Rule("blank", lambda country: not country, DELETE),
+    Rule("usa", lambda country: country.lower() in ("us", "usa"), "United States"),
+    Rule("kept", lambda country: True),
+])
+
+
+def make_rewriter(supabase, **kwargs):
+    options = {"page_size": 3, "flush_threshold": 100, "dry_run": False}
+    options.update(kwargs)
+    return BatchRewriter(
+        supabase, table="food_items", column="country", columns="id, country",
+        mapping=COUNTRY_RULES, **options
+    )
+
+
+class TestRuleMapping:
+    """Test suite for RuleMapping"""
+
+    def test_first_match_wins(self):
+        """Test rules are tried in order on the normalized value"""
+        assert COUNTRY_RULES({"country": " USA "}) == ("usa", "United States")
+        assert COUNTRY_RULES({"country": None}) == ("blank", DELETE)
+        assert COUNTRY_RULES({"country": "France"}) == ("kept", KEEP)
+
+    def test_callable_target_gets_row(self):
+        """Test a callable target is evaluated per row"""
+        mapping = RuleMapping("country", [Rule("copy", lambda c: True, lambda row: row["other"])])
+
+        assert mapping({"country": "x", "other": "y"}) == ("copy", "y")
+
+    def test_default_label_keeps(self):
+        """Test unmatched rows are kept"""
+        assert RuleMapping("country", [])({"country": "x"}) == ("unmatched", KEEP)
+
+
+class TestBatchRewriter:
+    """Test suite for BatchRewriter.run"""
+
+    def test_writes_grouped_by_target(self, make_supabase):
+        """Test one update per new value and one delete, regardless of row count"""
+        supabase = make_supabase(food_items_table(["us", "USA", "", "France", "us", None, "United States"]))
+
+        stats = make_rewriter(supabase).run()
+
+        assert writes(supabase) == [
+            ("update", {"country": "United States"}, ["id-000", "id-001", "id-004"]),
+            ("delete", None, ["id-002", "id-005"]),
+        ]
+        assert (stats.scanned, stats.changes, stats.updated, stats.deleted, stats.statements) == (7, 5, 3, 2, 2)
+        assert stats.labels == {"usa": 3, "blank": 2, "kept": 2}
+        assert [row["country"] for row in supabase.tables["food_items"]] == [
+            "United States", "United States", "France", "United States", "United States"
+        ]
+
+    def test_pages_by_keyset(self, make_supabase):
+        """Test each page starts after the last id of the previous one"""
+        supabase = make_supabase(food_items_table(["France"] * 7))
+
+        make_rewriter(supabase).run()
+
+        assert page_starts(supabase) == [None, "id-002", "id-005"]
+
+    def test_ids_are_chunked(self, monkeypatch, make_supabase):
+        """Test large groups are split into several statements"""
+        monkeypatch.setattr(BatchRewriter, "ID_CHUNK_SIZE", 2)
+        supabase = make_supabase(food_items_table(["us"] * 5))
+
+        stats = make_rewriter(supabase).run()
+
+        assert [len(ids) for _, _, ids in writes(supabase)] == [2, 2, 1]
+        assert stats.updated == 5
+
+    def test_dry_run_only_reports(self, make_supabase):
+        """Test a dry run writes nothing and reports old -> new transitions"""
+        supabase = make_supabase(food_items_table(["us", "us", ""]))
+
+        stats = make_rewriter(supabase, dry_run=True).run()
+
+        assert not writes(supabase)
+        assert stats.transitions == {("us", "United States"): 2, ("", "<deleted>"): 1}
+        assert stats.diff_lines()[0] == "'us' → 'United States': 2"
+
+
+class TestCheckpoint:
+    """Test suite for checkpoint resume"""
+
+    def test_resumes_after_checkpoint(self, tmp_path, make_supabase):
+        """Test a run continues after the id stored by an interrupted run"""
+        checkpoint = tmp_path / "checkpoint.json"
+        checkpoint.write_text(json.dumps({"table": "food_items", "column": "country", "last_id": "id-002"}))
+        supabase = make_supabase(food_items_table(["us"] * 5))
+
+        stats = make_rewriter(supabase, checkpoint_file=str(checkpoint)).run()
+
+        assert stats.resumed_from == "id-002"
+        assert writes(supabase) == [("update", {"country": "United States"}, ["id-003", "id-004"])]
+        assert not checkpoint.exists()
+
+    def test_checkpoint_for_other_column_is_ignored(self, tmp_path, make_supabase):
+        """Test a checkpoint left by another script does not skip rows"""
+        checkpoint = tmp_path / "checkpoint.json"
+        checkpoint.write_text(json.dumps({"table": "food_items", "column": "language", "last_id": "id-002"}))
+
+        stats = make_rewriter(make_supabase(food_items_table(["us"] * 5)), checkpoint_file=str(checkpoint)).run()
+
+        assert stats.resumed_from is None
+        assert stats.updated == 5
+
+    def test_failed_write_keeps_checkpoint(self, tmp_path, make_supabase):
+        """Test errors are collected and the checkpoint is not cleared"""
+        checkpoint = tmp_path / "checkpoint.json"
+        checkpoint.write_text(json.dumps({"table": "food_items", "column": "country", "last_id": "id-000"}))
+        supabase = make_supabase(food_items_table(["us"] * 3), failing={("food_items", "update")})
+
+        stats = make_rewriter(supabase, checkpoint_file=str(checkpoint)).run()
+
+        assert len(stats.errors) == 1
+        assert json.loads(checkpoint.read_text())["last_id"] == "id-000"
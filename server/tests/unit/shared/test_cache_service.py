@@ -0,0 +1,56 @@
+"""
+Unit tests for cache service helpers
+
+Tests single-flight coalescing of concurrent cache misses.
+"""
+
+import asyncio
+
+import pytest
+
+from app.shared.services.cache_service import SingleFlight
+
+
+class TestSingleFlight:
+    """Test suite for SingleFlight"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_run_loader_once(self):
+        """Test concurrent callers for one key share a single execution"""
+        # Arrange
+        single_flight = SingleFlight()
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"value": 42}
+
+        # Act
+        results = await asyncio.gather(*[single_flight.do("key", loader) for _ in range(5)])
+
+        # Assert
+        assert calls == 1
+        assert all(result == {"value": 42} for result in results)
+        assert not single_flight.in_flight("key")
+
+    @pytest.mark.asyncio
+    async def test_exception_propagates_to_all_waiters(self):
+        """Test a failing loader raises for every waiter and is not cached"""
+        # Arrange
+        single_flight = SingleFlight()
+
+        async def failing_loader():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        # Act
+        results = await asyncio.gather(
+            *[single_flight.do("key", failing_loader) for _ in range(3)],
+            return_exceptions=True
+        )
+
+        # Assert
+        assert all(isinstance(result, ValueError) for result in results)
+        assert await single_flight.do("key", lambda: asyncio.sleep(0, result="ok")) == "ok"
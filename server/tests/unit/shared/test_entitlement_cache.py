@@ -0,0 +1,218 @@
+"""
+Unit tests for the subscription entitlement cache
+
+Tests that premium checks are answered from the cache without database or
+RevenueCat calls, that webhooks populate and invalidate it, that role and
+subscription writes invalidate it, that cancelled subscriptions keep access
+until they expire, and that RevenueCat is only consulted in the background.
+"""
+
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from app.models.core.user import UserRole
+from app.services.subscription.entitlement_cache import EntitlementCache
+from app.services.subscription.revenuecat_subscription_service import RevenueCatSubscriptionService
+from app.services.subscription.revenuecat_webhook_service import RevenueCatWebhookService
+from app.services.subscription.subscription_checker import SubscriptionChecker
+from app.services.subscription.subscription_service import SubscriptionService
+from app.shared.services.database_operation_service import DatabaseOperationService
+from app.shared.services.datetime_service import DateTimeService
+from app.shared.services.user_role_manager import UserRoleManager
+
+
+class FakeRevenueCat:
+    def __init__(self, subscriber_info=None):
+        self.subscriber_info = subscriber_info or {"has_subscription": False}
+        self.calls = []
+
+    async def get_subscriber_info(self, user_id):
+        self.calls.append(user_id)
+        return self.subscriber_info
+
+    async def is_admin_user(self, user_id):
+        return False
+
+
+def in_days(days):
+    return (DateTimeService.now() + timedelta(days=days)).isoformat()
+
+
+def make_checker(supabase, revenuecat=None):
+    checker = SubscriptionChecker.__new__(SubscriptionChecker)
+    checker.supabase = supabase
+    checker.revenuecat_service = revenuecat or FakeRevenueCat()
+    return checker
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(monkeypatch):
+    monkeypatch.setattr("app.services.subscription.entitlement_cache.cache_service._use_redis", False)
+    monkeypatch.setattr("app.services.subscription.subscription_checker.settings.revenuecat_api_key", None)
+    EntitlementCache._l1.clear()
+    yield
+    EntitlementCache._l1.clear()
+
+
+class TestSubscriptionChecker:
+    """Test suite for cached subscription checks"""
+
+    def test_second_check_is_served_from_cache(self, make_supabase):
+        """Test a resolved status is cached and later checks do no I/O"""
+        checker = make_checker(make_supabase({
+            "users": [{"id": "u1", "role": "premium", "bypass_subscription": False}],
+            "subscriptions": [{"user_id": "u1", "status": "active", "product_id": "monthly",
+                               "expiration_date": in_days(10)}],
+        }))
+
+        first = asyncio.run(checker.check_subscription_status("u1"))
+        queries = len(checker.supabase.calls)
+        second = asyncio.run(checker.check_subscription_status("u1"))
+
+        assert first["is_premium"] and first["source"] == "database"
+        assert second == first
+        assert len(checker.supabase.calls) == queries
+        assert checker.is_premium_user("u1") is True
+        assert len(checker.supabase.calls) == queries
+        assert not checker.revenuecat_service.calls
+
+    @pytest.mark.parametrize("expiration_days, is_premium", [(3, True), (-1, False)])
+    def test_cancelled_keeps_access_until_expiry(self, expiration_days, is_premium, make_supabase):
+        """Test a cancelled subscription is premium only until it expires"""
+        checker = make_checker(make_supabase({
+            "users": [{"id": "u1", "role": "premium", "bypass_subscription": False}],
+            "subscriptions": [{"user_id": "u1", "status": "cancelled", "product_id": "monthly",
+                               "expiration_date": in_days(expiration_days)}],
+        }))
+
+        status = asyncio.run(checker.check_subscription_status("u1"))
+
+        assert status["is_premium"] is is_premium
+
+    def test_cache_lifetime_ends_with_subscription(self):
+        """Test an entry expires when the cached subscription period ends"""
+        status = EntitlementCache.subscribed_status("monthly", in_days(1 / 24), "database")
+
+        assert 3500 < EntitlementCache._ttl(status) <= 3600
+        assert EntitlementCache._ttl({"is_premium": False}) == EntitlementCache.TTL_SECONDS
+
+    def test_l1_entries_are_short_lived_without_redis(self):
+        """Test L1 is capped so another worker's webhook is picked up from the database"""
+        asyncio.run(EntitlementCache.set("u1", {"is_premium": False}))
+
+        entry = EntitlementCache._l1[EntitlementCache.cache_key("u1")]
+        assert entry.ttl <= EntitlementCache.L1_TTL_SECONDS
+
+    def test_revenuecat_reconciles_in_background(self, monkeypatch, make_supabase):
+        """Test a cache miss schedules RevenueCat instead of waiting on it"""
+        monkeypatch.setattr("app.services.subscription.subscription_checker.settings.revenuecat_api_key", "key")
+        revenuecat = FakeRevenueCat()
+        checker = make_checker(
+            make_supabase({"users": [{"id": "u1", "role": "free", "bypass_subscription": False}]}), revenuecat
+        )
+
+        async def run():
+            status = await checker.check_subscription_status("u1")
+            assert not revenuecat.calls
+            await asyncio.gather(*SubscriptionChecker._background_tasks)
+            return status
+
+        assert asyncio.run(run())["is_premium"] is False
+        assert revenuecat.calls == ["u1"]
+
+
+class FakeSubscriptionService:
+    def __init__(self):
+        self.updates = []
+
+    async def update_subscription(self, **kwargs):
+        self.updates.append(kwargs)
+
+    async def update_user_role(self, user_id, role, allow_downgrade=True):
+        pass
+
+
+class TestWebhookCache:
+    """Test suite for webhook-driven cache updates"""
+
+    def make_service(self, supabase):
+        service = RevenueCatWebhookService.__new__(RevenueCatWebhookService)
+        service.supabase = supabase
+        service.subscription_service = FakeSubscriptionService()
+        return service
+
+    def test_purchase_populates_and_expiration_invalidates(self, make_supabase):
+        """Test premium is cached on purchase and dropped on expiration"""
+        service = self.make_service(make_supabase({"users": [{"id": "u1", "role": "free"}]}))
+        entitlement = {"pro_user": {"is_active": True, "expires_date": in_days(30)}}
+
+        asyncio.run(service.handle_initial_purchase(
+            {"app_user_id": "u1", "product_id": "monthly", "entitlements": entitlement}
+        ))
+
+        cached = EntitlementCache.get_local("u1")
+        assert cached["is_premium"] and cached["source"] == "revenuecat_webhook"
+        assert make_checker(make_supabase()).is_premium_user("u1") is True
+
+        asyncio.run(service.handle_expiration(
+            {"app_user_id": "u1", "product_id": "monthly", "entitlements": {"pro_user": {"is_active": False}}}
+        ))
+
+        assert EntitlementCache.get_local("u1") is None
+
+
+class TestWriteInvalidation:
+    """Test suite for invalidation when roles or subscriptions are written"""
+
+    @pytest.fixture
+    def cached(self):
+        EntitlementCache._l1_set("u1", {"is_premium": False}, 60)
+        return "u1"
+
+    @pytest.fixture
+    def updates(self, monkeypatch):
+        calls = []
+
+        async def update_with_timestamp(self, table_name, record_id, data, **kwargs):
+            calls.append((table_name, record_id, data))
+            return {"id": record_id, **data}
+
+        async def insert_with_timestamps(self, table_name, data, **kwargs):
+            calls.append((table_name, None, data))
+            return data
+
+        monkeypatch.setattr(DatabaseOperationService, "update_with_timestamp", update_with_timestamp)
+        monkeypatch.setattr(DatabaseOperationService, "insert_with_timestamps", insert_with_timestamps)
+        return calls
+
+    def test_role_change_invalidates(self, cached, updates, make_supabase):
+        """Test a role update drops the cached status"""
+        manager = UserRoleManager.__new__(UserRoleManager)
+        manager.supabase = make_supabase({"users": [{"id": cached, "role": "free", "bypass_subscription": False}]})
+
+        assert asyncio.run(manager.update_user_role(cached, UserRole.PREMIUM, "test")) is True
+        assert updates == [("users", cached, {"role": "premium"})]
+        assert EntitlementCache.get_local(cached) is None
+
+    def test_revenuecat_subscription_write_invalidates(self, cached, updates, make_supabase):
+        """Test writing the subscriptions row from RevenueCat drops the cached status"""
+        service = RevenueCatSubscriptionService(make_supabase({
+            "subscriptions": [{"id": "s1", "user_id": cached, "status": "active", "product_id": "monthly"}]
+        }))
+
+        asyncio.run(service.update_subscription(cached, "active", "monthly", "pro_user", in_days(30)))
+
+        assert updates[0][:2] == ("subscriptions", "s1")
+        assert EntitlementCache.get_local(cached) is None
+
+    def test_app_store_cancel_invalidates(self, cached, updates, make_supabase):
+        """Test cancelling an App Store subscription drops the cached status"""
+        service = SubscriptionService.__new__(SubscriptionService)
+        service.supabase = make_supabase(
+            {"subscriptions": [{"id": "s1", "user_id": cached, "original_transaction_id": "t1"}]}
+        )
+
+        assert asyncio.run(service.cancel_subscription(cached, "t1")) is True
+        assert EntitlementCache.get_local(cached) is None
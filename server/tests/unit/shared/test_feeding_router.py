@@ -0,0 +1,162 @@
+"""
+Unit tests for the feeding records endpoint
+
+Tests that the food analysis is embedded in the feeding_records query and
+flattened onto each record, that stored calories win over the per-100g
+fallback, that the date filters bound feeding_time, and that paginated
+requests set X-Next-Cursor only while more pages may follow.
+"""
+
+import asyncio
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException, Response
+
+from app.api.v1.nutrition.feeding.router import _flatten_feeding_record, get_feeding_records
+from app.shared.services.pagination_service import PaginationService
+
+PET_ID = "pet-1"
+ANALYSIS = {
+    "food_name": "Kibble",
+    "brand": "Acme",
+    "calories_per_100g": 400.0,
+    "protein_percentage": 26.0,
+    "fat_percentage": 15.0,
+    "fiber_percentage": 4.0,
+}
+
+
+def feeding_row(day, calories=None, analysis=ANALYSIS, amount_grams=50.0):
+    return {
+        "id": str(uuid.uuid5(uuid.NAMESPACE_OID, f"feeding-{day}")),
+        "pet_id": PET_ID,
+        "food_analysis_id": "analysis-1",
+        "amount_grams": amount_grams,
+        "feeding_time": f"2026-10-{day:02d}T08:00:00+00:00",
+        "created_at": f"2026-10-{day:02d}T08:00:05+00:00",
+        "notes": None,
+        "calories": calories,
+        "food_analysis": dict(analysis) if analysis else None,
+    }
+
+
+@pytest.fixture
+def owner_checks(monkeypatch):
+    checks = []
+
+    async def verify_pet_ownership(pet_id, user_id, db=None):
+        checks.append((pet_id, user_id))
+        return {"id": pet_id}
+
+    monkeypatch.setattr("app.shared.services.pet_authorization.verify_pet_ownership", verify_pet_ownership)
+    return checks
+
+
+def fetch(supabase, response=None, **params):
+    options = {"limit": None, "cursor": None, "start_date": None, "end_date": None}
+    options.update(params)
+    return asyncio.run(get_feeding_records(
+        PET_ID, response or Response(),
+        current_user=SimpleNamespace(id="u1"), supabase=supabase, **options
+    ))
+
+
+class TestFlattenFeedingRecord:
+    """Test suite for _flatten_feeding_record"""
+
+    def test_moves_analysis_onto_record(self):
+        """Test the embedded analysis becomes top-level response fields"""
+        record = _flatten_feeding_record(feeding_row(1, calories=180.0))
+
+        assert "food_analysis" not in record
+        assert (record["food_name"], record["food_brand"]) == ("Kibble", "Acme")
+        assert record["calories_per_100g"] == 400.0
+        assert record["fiber_percentage"] == 4.0
+
+    def test_stored_calories_win(self):
+        """Test calories recorded with the feeding are kept as is"""
+        assert _flatten_feeding_record(feeding_row(1, calories=180.0))["calories"] == 180.0
+
+    @pytest.mark.parametrize("stored", [None, 0])
+    def test_calories_fall_back_to_analysis(self, stored):
+        """Test missing or zero calories are derived from calories_per_100g"""
+        assert _flatten_feeding_record(feeding_row(1, calories=stored))["calories"] == 200.0
+
+    def test_without_analysis(self):
+        """Test a record without an analysis has no joined values or calories"""
+        record = _flatten_feeding_record(feeding_row(1, analysis=None))
+
+        assert record["food_name"] is None
+        assert record["calories_per_100g"] is None
+        assert record["calories"] is None
+
+
+class TestGetFeedingRecords:
+    """Test suite for get_feeding_records"""
+
+    def test_embeds_analysis_in_one_query(self, owner_checks, make_supabase):
+        """Test the analysis is selected as an embed and flattened, newest first"""
+        supabase = make_supabase({"feeding_records": [feeding_row(1), feeding_row(2, calories=90.0)]})
+
+        records = fetch(supabase)
+
+        assert owner_checks == [(PET_ID, "u1")]
+        assert len(supabase.calls) == 1
+        columns = supabase.calls[0]["columns"]
+        assert "food_analysis:food_analyses(food_name,brand,calories_per_100g," in columns
+        assert "food_name" not in columns.split(",")
+        assert [record.calories for record in records] == [90.0, 200.0]
+        assert records[1].food_name == "Kibble"
+
+    def test_date_filters_bound_feeding_time(self, owner_checks, make_supabase):
+        """Test start_date and end_date are inclusive bounds on feeding_time"""
+        supabase = make_supabase({"feeding_records": [feeding_row(day) for day in (1, 2, 3, 4)]})
+
+        records = fetch(
+            supabase,
+            start_date=datetime(2026, 10, 2, tzinfo=timezone.utc),
+            end_date=datetime(2026, 10, 3, 23, 59, tzinfo=timezone.utc)
+        )
+
+        assert [record.feeding_time.day for record in records] == [3, 2]
+        filters = supabase.calls[0]["filters"]
+        assert ("gte", "feeding_time", "2026-10-02T00:00:00+00:00") in filters
+        assert ("lte", "feeding_time", "2026-10-03T23:59:00+00:00") in filters
+
+    def test_next_cursor_header_pages_through(self, owner_checks, make_supabase):
+        """Test a full page sets X-Next-Cursor and the last page does not"""
+        supabase = make_supabase({"feeding_records": [feeding_row(day) for day in (1, 2, 3)]})
+        first = Response()
+
+        page = fetch(supabase, first, limit=2)
+        cursor = first.headers[PaginationService.NEXT_CURSOR_HEADER]
+        last = Response()
+        rest = fetch(supabase, last, limit=2, cursor=cursor)
+
+        assert [record.feeding_time.day for record in page] == [3, 2]
+        assert [record.feeding_time.day for record in rest] == [1]
+        assert PaginationService.NEXT_CURSOR_HEADER not in last.headers
+        assert [call["limit"] for call in supabase.calls] == [2, 2]
+
+    def test_unpaginated_request_has_no_cursor(self, owner_checks, make_supabase):
+        """Test requests without limit or cursor return everything without a header"""
+        supabase = make_supabase({"feeding_records": [feeding_row(day) for day in (1, 2, 3)]})
+        response = Response()
+
+        assert len(fetch(supabase, response)) == 3
+        assert supabase.calls[0]["limit"] is None
+        assert PaginationService.NEXT_CURSOR_HEADER not in response.headers
+
+    def test_invalid_cursor_is_rejected(self, owner_checks, make_supabase):
+        """Test a malformed cursor is a 400 before any query runs"""
+        supabase = make_supabase()
+
+        with pytest.raises(HTTPException) as error:
+            fetch(supabase, cursor="not-a-cursor")
+
+        assert error.value.status_code == 400
+        assert not owner_checks
+        assert not supabase.calls
@@ -0,0 +1,116 @@
+"""
+Unit tests for food comparison
+
+Tests that food details and access checks are one IN query each, that foods
+come back in the requested order, and that the vectorized metrics and
+rankings equal a per-food calculation.
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.nutrition.food_comparison_service import FoodComparisonService
+
+
+def food_row(food_id, calories, protein, fat, fiber, user_id="u1"):
+    return {
+        "id": food_id,
+        "user_id": user_id,
+        "food_name": f"Food {food_id}",
+        "brand": "Brand",
+        "calories_per_100g": calories,
+        "protein_percentage": protein,
+        "fat_percentage": fat,
+        "fiber_percentage": fiber,
+        "moisture_percentage": 10.0,
+        "ingredients": [],
+        "allergens": [],
+        "analyzed_at": "2026-10-18T08:00:00+00:00",
+    }
+
+
+ROWS = [
+    food_row("a", 360.0, 30.0, 15.0, 4.0),
+    food_row("b", 420.0, 22.0, 20.0, 3.0),
+    food_row("c", 80.0, 0.0, 0.0, 0.0),
+    food_row("d", 350.0, 50.0, 25.0, 10.0, user_id="u2"),
+]
+
+
+def reference_composite(calories, protein, fat, fiber, cost):
+    """The per-food score formula the vectorized ranking replaced"""
+    scores = [
+        max(0, min(100, 100 - abs(calories - 350) / 3.5)),
+        min(100, protein * 2),
+        min(100, fat * 4),
+        min(100, fiber * 10),
+        max(0, min(100, 100 - cost * 1000)),
+    ]
+    return round(sum(s * w for s, w in zip(scores, [0.25, 0.25, 0.20, 0.15, 0.15])), 1)
+
+
+class TestFoodLookups:
+    """Test suite for the batched food queries"""
+
+    def test_details_are_one_query_in_requested_order(self, make_supabase):
+        """Test details come from one IN query, in order, without duplicates or missing IDs"""
+        supabase = make_supabase({"food_analyses": ROWS})
+        service = FoodComparisonService(supabase)
+
+        foods = asyncio.run(service._get_food_details(["b", "a", "b", "missing"]))
+
+        assert [call["filters"] for call in supabase.calls] == [[("in", "id", ["b", "a", "missing"])]]
+        assert [food["id"] for food in foods] == ["b", "a"]
+        assert foods[0]["name"] == "Food b"
+
+    def test_access_check_rejects_other_users_food(self, make_supabase):
+        """Test one query checks every ID and names the first inaccessible one"""
+        supabase = make_supabase({"food_analyses": ROWS})
+        service = FoodComparisonService(supabase)
+
+        asyncio.run(service._validate_food_access(["a", "b", "a"], "u1"))
+        with pytest.raises(ValueError, match="Food analysis d"):
+            asyncio.run(service._validate_food_access(["a", "d"], "u1"))
+
+        assert len(supabase.calls) == 2
+
+
+class TestMetrics:
+    """Test suite for the vectorized metrics and rankings"""
+
+    def test_rankings_match_per_food_scores(self, make_supabase):
+        """Test composite scores equal the per-food formula and are sorted descending"""
+        service = FoodComparisonService(make_supabase({"food_analyses": ROWS}))
+        foods = asyncio.run(service._get_food_details(["a", "b", "c"]))
+
+        metrics = asyncio.run(service._generate_detailed_metrics(["a", "b", "c"], foods))
+
+        expected = {
+            food["id"]: reference_composite(
+                food["calories_per_100g"], food["protein_percentage"], food["fat_percentage"],
+                food["fiber_percentage"], 0.01 + index * 0.005
+            )
+            for index, food in enumerate(foods)
+        }
+        rankings = metrics.overall_rankings
+        assert {r["food_id"]: r["composite_score"] for r in rankings} == expected
+        assert [r["composite_score"] for r in rankings] == sorted(expected.values(), reverse=True)
+        assert metrics.cost_per_calorie == {"a": 0.01, "b": 0.015, "c": 0.02}
+
+    def test_density_without_protein_or_fat_is_zero(self, make_supabase):
+        """Test foods with no protein or fat get zero density instead of dividing by zero"""
+        service = FoodComparisonService(make_supabase({"food_analyses": ROWS}))
+        foods = asyncio.run(service._get_food_details(["a", "c"]))
+
+        metrics = asyncio.run(service._generate_detailed_metrics(["a", "c"], foods))
+
+        assert metrics.nutritional_density == {"a": 8.0, "c": 0.0}
+        assert metrics.compatibility_scores == {"a": 70.0, "c": 75.0}
+
+    def test_no_foods_raises(self, make_supabase):
+        """Test metrics need at least one food"""
+        service = FoodComparisonService(make_supabase())
+
+        with pytest.raises(ValueError):
+            asyncio.run(service._generate_detailed_metrics([], []))
@@ -0,0 +1,277 @@
+"""
+Unit tests for GDPR deletion jobs and the retention sweep
+
+Tests that deletion removes rows in batches and storage objects in bulk,
+that a failed step leaves the completed ones recorded so the next run
+resumes from there, and that the retention sweep keeps its position, moves
+past a user whose anonymization failed and retries that user later, and
+that deletions are resumed by their own worker.
+"""
+
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.gdpr_retention_worker import GDPRDeletionResumeWorker, GDPRRetentionWorker
+from app.services.gdpr_service import GDPRService
+from app.shared.services.pagination_service import PaginationService
+
+
+class FakeBucket:
+    def __init__(self, storage, name):
+        self.storage = storage
+        self.name = name
+
+    def list(self, path, options):
+        if self.name in self.storage.failing_buckets:
+            raise RuntimeError("storage unavailable")
+        files = self.storage.files.get(self.name, [])
+        children = {}
+        for file in files:
+            if file.startswith(path + "/"):
+                name, _, rest = file[len(path) + 1:].partition("/")
+                children[name] = {"name": name, "id": None if rest else f"id-{name}"}
+        items = sorted(children.values(), key=lambda item: item["name"])
+        return items[options["offset"]:options["offset"] + options["limit"]]
+
+    def remove(self, paths):
+        self.storage.removed.append((self.name, list(paths)))
+        self.storage.files[self.name] = [f for f in self.storage.files[self.name] if f not in paths]
+        return [{"name": path} for path in paths]
+
+
+class FakeStorage:
+    def __init__(self, files=None, failing_buckets=()):
+        self.files = files or {}
+        self.failing_buckets = set(failing_buckets)
+        self.removed = []
+
+    def from_(self, name):
+        return FakeBucket(self, name)
+
+
+@pytest.fixture
+def make_client(make_supabase):
+    """Service role client with storage, auth admin and the deletion job RPCs"""
+
+    def make(tables=None, files=None, failing_buckets=()):
+        supabase = make_supabase({"gdpr_deletion_jobs": [], **(tables or {})})
+        jobs = supabase.tables["gdpr_deletion_jobs"]
+
+        def start(params):
+            job = next((job for job in jobs if job["user_id"] == params["p_user_id"]), None)
+            if job is None:
+                job = {"user_id": params["p_user_id"], "completed_steps": [], "attempts": 0}
+                jobs.append(job)
+            job.update(status="running", attempts=job["attempts"] + 1)
+            return list(job["completed_steps"])
+
+        def complete(params):
+            job = next(job for job in jobs if job["user_id"] == params["p_user_id"])
+            if params["p_step"] not in job["completed_steps"]:
+                job["completed_steps"].append(params["p_step"])
+
+        supabase.rpc_handlers.update(start_gdpr_deletion=start, complete_gdpr_deletion_step=complete)
+        supabase.storage = FakeStorage(files, failing_buckets)
+        supabase.deleted_auth = []
+        supabase.auth = SimpleNamespace(admin=SimpleNamespace(delete_user=supabase.deleted_auth.append))
+        return supabase
+
+    return make
+
+
+def job(supabase, user_id="u1"):
+    return next(job for job in supabase.tables["gdpr_deletion_jobs"] if job["user_id"] == user_id)
+
+
+def make_service(supabase, anon=None):
+    service = GDPRService.__new__(GDPRService)
+    service.supabase = anon or SimpleNamespace()
+    service.service_supabase = supabase
+    return service
+
+
+def user_tables():
+    return {
+        "users": [{"id": "u1"}, {"id": "u2"}],
+        "pets": [{"id": "p1", "user_id": "u1"}],
+        "scans": [{"id": f"s{i}", "user_id": "u1"} for i in range(25)] + [{"id": "other", "user_id": "u2"}],
+    }
+
+
+def user_files():
+    return {
+        "pet-images": [f"u1/pets/{'a' * 64}/{name}" for name in ("full.jpg", "list.jpg", "thumbnail.webp")],
+        "scan-images": [f"u1/scans/s{i}.jpg" for i in range(5)] + ["u2/scans/x.jpg"],
+    }
+
+
+class TestDeleteUserData:
+    """Test suite for GDPRService.delete_user_data"""
+
+    def test_deletes_rows_and_storage_in_batches(self, monkeypatch, make_client):
+        """Test the user's rows and files are gone and other users' are kept"""
+        monkeypatch.setattr("app.services.gdpr_service.settings.gdpr_delete_batch_size", 10)
+        monkeypatch.setattr(GDPRService, "STORAGE_REMOVE_BATCH_SIZE", 2)
+        supabase = make_client(user_tables(), user_files())
+
+        assert asyncio.run(make_service(supabase).delete_user_data("u1")) is True
+
+        assert supabase.tables["scans"] == [{"id": "other", "user_id": "u2"}]
+        assert supabase.tables["users"] == [{"id": "u2"}]
+        assert supabase.storage.files["scan-images"] == ["u2/scans/x.jpg"]
+        assert supabase.storage.files["pet-images"] == []
+        assert all(len(paths) <= 2 for _, paths in supabase.storage.removed)
+        assert [call["matched"] for call in supabase.queries("scans", "delete")] == [10, 10, 5]
+        assert supabase.deleted_auth == ["u1"]
+        assert job(supabase)["status"] == "completed"
+
+    def test_failed_step_resumes_from_checkpoint(self, make_client):
+        """Test a failure stops before users are deleted and a retry skips completed steps"""
+        supabase = make_client(user_tables(), user_files(), failing_buckets={"scan-images"})
+        service = make_service(supabase)
+
+        with pytest.raises(HTTPException):
+            asyncio.run(service.delete_user_data("u1"))
+
+        assert job(supabase)["status"] == "failed"
+        assert "storage:scan-images" in job(supabase)["last_error"]
+        assert "rows:scans" in job(supabase)["completed_steps"]
+        assert {"id": "u1"} in supabase.tables["users"]
+        assert not supabase.deleted_auth
+
+        supabase.storage.failing_buckets.clear()
+        supabase.calls.clear()
+        asyncio.run(service.delete_user_data("u1"))
+
+        assert job(supabase)["status"] == "completed"
+        assert job(supabase)["attempts"] == 2
+        assert not supabase.queries(table="scans")
+        assert supabase.deleted_auth == ["u1"]
+
+    def test_step_that_deleted_nothing_is_not_completed(self, monkeypatch, make_client):
+        """Test rows the delete did not remove (e.g. filtered by RLS) fail the step"""
+        supabase = make_client(user_tables(), user_files())
+        table = supabase.table
+
+        def rls_filtered_table(name):
+            query = table(name)
+            execute = query.execute
+            if name == "scans":
+                query.execute = lambda: SimpleNamespace(data=[]) if query.call["action"] == "delete" else execute()
+            return query
+
+        monkeypatch.setattr(supabase, "table", rls_filtered_table)
+
+        with pytest.raises(HTTPException):
+            asyncio.run(make_service(supabase).delete_user_data("u1"))
+
+        assert job(supabase)["status"] == "failed"
+        assert "rows:scans" not in job(supabase)["completed_steps"]
+        assert not supabase.deleted_auth
+
+    def test_refuses_to_run_without_service_role(self, make_client):
+        """Test the job does not start when only the anon client is available"""
+        supabase = make_client(user_tables(), user_files())
+
+        with pytest.raises(HTTPException):
+            asyncio.run(make_service(supabase, anon=supabase).delete_user_data("u1"))
+
+        assert not supabase.rpcs
+        assert len(supabase.tables["scans"]) == 26
+
+
+class TestCleanupExpiredData:
+    """Test suite for the retention sweep"""
+
+    def test_failed_user_is_recorded_and_skipped(self, monkeypatch, make_client):
+        """Test the sweep moves past a failing user and records it for a retry"""
+        ids = [str(uuid.UUID(int=i)) for i in range(1, 4)]
+        users = [{"id": ids[i - 1], "created_at": f"2020-01-0{i}T00:00:00+00:00"} for i in range(1, 4)]
+        supabase = make_client({"users": users})
+        service = make_service(supabase)
+        anonymized = []
+
+        async def anonymize(user_id):
+            if user_id == ids[1]:
+                raise HTTPException(status_code=500, detail="Failed to anonymize user data")
+            anonymized.append(user_id)
+
+        monkeypatch.setattr(service, "anonymize_user_data", anonymize)
+
+        assert asyncio.run(service.cleanup_expired_data(batch_size=10)) == 3
+        assert sorted(anonymized) == [ids[0], ids[2]]
+        cursor = supabase.tables["gdpr_job_checkpoints"][0]["cursor"]
+        assert PaginationService.decode_cursor(cursor) == (users[-1]["created_at"], ids[2])
+        failure = supabase.tables["gdpr_retention_failures"][0]
+        assert (failure["user_id"], failure["attempts"]) == (ids[1], 1)
+        assert failure["last_error"] == "Failed to anonymize user data"
+
+    def test_failed_user_is_retried_later(self, monkeypatch, make_client):
+        """Test a recorded user is retried once due, and dropped when it succeeds"""
+        supabase = make_client({
+            "users": [],
+            "gdpr_retention_failures": [
+                {"user_id": "u2", "attempts": 1, "updated_at": "2020-01-01T00:00:00+00:00"},
+                {"user_id": "u4", "attempts": GDPRService.MAX_RETENTION_ATTEMPTS,
+                 "updated_at": "2020-01-01T00:00:00+00:00"},
+            ],
+        })
+        service = make_service(supabase)
+        anonymized = []
+
+        async def anonymize(user_id):
+            anonymized.append(user_id)
+
+        monkeypatch.setattr(service, "anonymize_user_data", anonymize)
+
+        assert asyncio.run(service.cleanup_expired_data(batch_size=10)) == 1
+        assert anonymized == ["u2"]
+        assert [row["user_id"] for row in supabase.tables["gdpr_retention_failures"]] == ["u4"]
+        assert not supabase.tables["gdpr_job_checkpoints"]
+
+    def test_anonymizes_with_service_role(self, make_client):
+        """Test anonymization updates the user's rows through the service role client"""
+        supabase = make_client(user_tables())
+
+        assert asyncio.run(make_service(supabase).anonymize_user_data("u1")) is True
+
+        assert supabase.tables["users"][0]["first_name"] == "Anonymous"
+        assert "first_name" not in supabase.tables["users"][1]
+
+    def test_nothing_due(self, make_client):
+        """Test an empty sweep processes nothing"""
+        supabase = make_client({"users": []})
+
+        assert asyncio.run(make_service(supabase).cleanup_expired_data(batch_size=10)) == 0
+
+
+class TestWorkers:
+    """Test suite for the GDPR background workers"""
+
+    def test_resume_and_retention_run_separately(self):
+        """Test the retention worker only sweeps and the resume worker only resumes"""
+        calls = []
+
+        async def cleanup_expired_data(batch_size):
+            calls.append(("cleanup", batch_size))
+            return 0
+
+        async def resume_failed_deletions(limit):
+            calls.append(("resume", limit))
+            return 0
+
+        service = SimpleNamespace(
+            cleanup_expired_data=cleanup_expired_data,
+            resume_failed_deletions=resume_failed_deletions
+        )
+
+        asyncio.run(GDPRRetentionWorker(service).dispatch_due(50))
+        assert calls == [("cleanup", 50)]
+
+        calls.clear()
+        asyncio.run(GDPRDeletionResumeWorker(service).dispatch_due())
+        assert calls == [("resume", GDPRDeletionResumeWorker.BATCH_SIZE)]
@@ -0,0 +1,84 @@
+"""
+Unit tests for the streaming GDPR export
+
+Tests that each table is read in bounded keyset pages, that the streamed
+chunks form a valid ZIP of NDJSON files with a manifest, and that a failing
+query cuts the stream off instead of exporting partial data.
+"""
+
+import asyncio
+import io
+import json
+import uuid
+import zipfile
+
+import pytest
+
+from app.services.gdpr_service import GDPRService
+
+
+def make_service(supabase, page_size=2):
+    service = GDPRService.__new__(GDPRService)
+    service.supabase = supabase
+    service.EXPORT_PAGE_SIZE = page_size
+    return service
+
+
+def rows(prefix, count):
+    return [
+        {"id": str(uuid.uuid5(uuid.NAMESPACE_OID, f"{prefix}-{i}")), "user_id": "u1",
+         "created_at": f"2026-01-01T00:00:0{i}+00:00"}
+        for i in range(count)
+    ]
+
+
+async def collect(stream):
+    return [chunk async for chunk in stream]
+
+
+class TestStreamUserDataExport:
+    """Test suite for GDPRService.stream_user_data_export"""
+
+    def test_streams_ndjson_zip_with_manifest(self, make_supabase):
+        """Test every table is exported as NDJSON and counted in the manifest"""
+        supabase = make_supabase({
+            "users": [{"id": "u1", "created_at": "2026-01-01T00:00:00+00:00", "email": "a@b.c"}],
+            "scans": rows("scan", 5),
+            "favorites": rows("fav", 2),
+        })
+
+        chunks = asyncio.run(collect(make_service(supabase).stream_user_data_export("u1")))
+
+        assert len(chunks) > 1
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+        assert archive.testzip() is None
+        scans = [json.loads(line) for line in archive.read("scans.ndjson").splitlines()]
+        assert [scan["id"] for scan in scans] == [row["id"] for row in rows("scan", 5)]
+        assert archive.read("pets.ndjson") == b""
+
+        manifest = json.loads(archive.read("manifest.json"))
+        assert manifest["record_counts"] == {
+            "user_profile.ndjson": 1,
+            "pets.ndjson": 0,
+            "scans.ndjson": 5,
+            "favorites.ndjson": 2,
+            "audit_logs.ndjson": 0,
+        }
+
+    def test_pages_are_bounded_and_keyset(self, make_supabase):
+        """Test scans are read in limited pages that continue from a cursor"""
+        supabase = make_supabase({"scans": rows("scan", 5)})
+
+        asyncio.run(collect(make_service(supabase).stream_user_data_export("u1")))
+
+        scan_calls = supabase.queries(table="scans")
+        assert [call["limit"] for call in scan_calls] == [2, 2, 2]
+        assert scan_calls[0]["or"] is None
+        assert all("created_at.gt" in call["or"] for call in scan_calls[1:])
+
+    def test_failed_query_stops_the_stream(self, make_supabase):
+        """Test a query failure is raised rather than exporting partial data"""
+        supabase = make_supabase({"scans": rows("scan", 1)}, failing={"favorites"})
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(collect(make_service(supabase).stream_user_data_export("u1")))
@@ -0,0 +1,187 @@
+"""
+Unit tests for the image optimizer
+
+Tests draft decoding, the predicted-quality encode, downscaling when even
+the minimum quality is too large, derivatives and optimization in the
+process pool, including replacing a pool that broke.
+"""
+
+import asyncio
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from unittest.mock import MagicMock
+
+import pytest
+from PIL import Image
+
+from app.services import image_optimizer
+from app.services.image_optimizer import ImageOptimizerService
+
+
+def make_image(width, height, fmt='JPEG', mode='RGB'):
+    """Noisy image that does not compress away"""
+    img = Image.merge('RGB', [Image.effect_noise((width, height), 60) for _ in range(3)])
+    if mode == 'RGBA':
+        img = img.convert('RGBA')
+        img.putalpha(Image.linear_gradient('L').resize((width, height)))
+    output = BytesIO()
+    img.save(output, format=fmt, quality=95)
+    return output.getvalue()
+
+
+def encoded_size(image_data, quality):
+    """Size of the optimizer's output re-encoded at another quality"""
+    output = BytesIO()
+    Image.open(BytesIO(image_data)).save(output, format='JPEG', quality=quality, optimize=True, progressive=True)
+    return len(output.getvalue())
+
+
+class TestOptimizeImage:
+    """Test suite for ImageOptimizerService.optimize_image"""
+
+    def test_large_jpeg_is_downscaled_on_decode(self):
+        """Test a large JPEG ends at MAX_DIMENSION with the aspect ratio kept"""
+        data, metadata = ImageOptimizerService.optimize_image(make_image(3000, 2000))
+
+        assert metadata["original_dimensions"] == {"width": 3000, "height": 2000}
+        assert metadata["optimized_dimensions"] == {"width": 1024, "height": 682}
+        assert Image.open(BytesIO(data)).size == (1024, 682)
+
+    def test_fits_at_start_quality_with_one_encode(self):
+        """Test an image under the target is encoded once at START_QUALITY"""
+        _, metadata = ImageOptimizerService.optimize_image(make_image(400, 300))
+
+        assert metadata["final_quality"] == ImageOptimizerService.START_QUALITY
+        assert metadata["optimization_attempts"] == 1
+
+    def test_predicts_quality_for_target(self):
+        """Test a tight target is met in a few encodes without dropping below MIN_QUALITY"""
+        image_data = make_image(800, 600)
+        start_size = encoded_size(image_data, ImageOptimizerService.START_QUALITY)
+        target = start_size // 2
+
+        data, metadata = ImageOptimizerService.optimize_image(image_data, target_size=target)
+
+        assert len(data) <= target
+        assert ImageOptimizerService.MIN_QUALITY < metadata["final_quality"] < ImageOptimizerService.START_QUALITY
+        assert metadata["optimization_attempts"] <= 4
+        assert Image.open(BytesIO(data)).size == (800, 600)
+
+    def test_downscales_when_min_quality_too_large(self):
+        """Test the image shrinks when no quality meets the target"""
+        data, metadata = ImageOptimizerService.optimize_image(make_image(800, 600), target_size=20_000)
+
+        assert len(data) <= 20_000
+        assert metadata["optimized_dimensions"]["width"] < 800
+
+    def test_transparent_png_is_flattened(self):
+        """Test RGBA input becomes an RGB JPEG"""
+        data, _ = ImageOptimizerService.optimize_image(make_image(300, 300, fmt='PNG', mode='RGBA'))
+
+        img = Image.open(BytesIO(data))
+        assert (img.format, img.mode) == ('JPEG', 'RGB')
+
+    def test_invalid_image_raises_value_error(self):
+        """Test undecodable input raises ValueError"""
+        with pytest.raises(ValueError):
+            ImageOptimizerService.optimize_image(b"not an image")
+
+
+class TestCreateDerivatives:
+    """Test suite for ImageOptimizerService.create_derivatives"""
+
+    def test_writes_every_size_and_format(self, tmp_path):
+        """Test each derivative is written at its size in JPEG and WebP"""
+        metadata = ImageOptimizerService.create_derivatives(make_image(1600, 1200), str(tmp_path))
+
+        assert sorted(p.name for p in tmp_path.iterdir()) == sorted(metadata["derivatives"])
+        for name, dimension in ImageOptimizerService.DERIVATIVE_SIZES.items():
+            jpeg = Image.open(tmp_path / f"{name}.jpg")
+            webp = Image.open(tmp_path / f"{name}.webp")
+            assert max(jpeg.size) == dimension
+            assert (webp.format, webp.size) == ("WEBP", jpeg.size)
+        assert metadata["optimized_size"] == metadata["derivatives"]["full.jpg"]["size"]
+
+    def test_small_image_is_not_upscaled(self, tmp_path):
+        """Test derivatives larger than the image keep its size"""
+        metadata = ImageOptimizerService.create_derivatives(make_image(300, 150), str(tmp_path))
+
+        assert metadata["derivatives"]["list.jpg"]["width"] == 300
+        assert metadata["derivatives"]["thumbnail.jpg"]["width"] == 200
+
+
+class TestPredictQuality:
+    """Test suite for the quality prediction table"""
+
+    @pytest.mark.parametrize("quality, ratio", ImageOptimizerService.QUALITY_SIZE_RATIOS)
+    def test_table_points(self, quality, ratio):
+        """Test each table ratio predicts its own quality"""
+        assert ImageOptimizerService._predict_quality(ratio) == quality
+
+    def test_interpolates_between_points(self):
+        """Test ratios between two points predict a quality between them"""
+        assert 65 < ImageOptimizerService._predict_quality(0.58) < 75
+
+    def test_predict_clamps(self):
+        """Test ratios outside the table clamp to START_QUALITY and MIN_QUALITY"""
+        assert ImageOptimizerService._predict_quality(2.0) == ImageOptimizerService.START_QUALITY
+        assert ImageOptimizerService._predict_quality(0.01) == ImageOptimizerService.MIN_QUALITY
+
+
+class TestOptimizeImageAsync:
+    """Test suite for optimization in the process pool"""
+
+    def test_matches_in_process_result(self):
+        """Test the pool returns the same bytes and metadata as a direct call"""
+        image_data = make_image(1500, 1000)
+
+        try:
+            result = asyncio.run(ImageOptimizerService.optimize_image_async(image_data))
+        finally:
+            ImageOptimizerService.shutdown_pool()
+
+        assert result == ImageOptimizerService.optimize_image(image_data)
+
+
+def broken_pool():
+    """Pool mock whose submitted work fails as if a worker was killed"""
+    pool = MagicMock()
+    future = Future()
+    future.set_exception(BrokenProcessPool("worker died"))
+    pool.submit.return_value = future
+    return pool
+
+
+class TestBrokenPool:
+    """Test suite for replacing a broken process pool"""
+
+    def test_broken_pool_falls_back_without_waiting(self, monkeypatch):
+        """Test the request runs in a thread and the old pool is shut down without blocking"""
+        pool = broken_pool()
+        monkeypatch.setattr(image_optimizer, "_pool", pool)
+        monkeypatch.setattr(image_optimizer, "_slots", None)
+
+        async def run():
+            slots = image_optimizer._get_slots()
+            async with slots:
+                result = await ImageOptimizerService._run_in_pool(len, b"abc")
+            return result, slots
+
+        result, slots = asyncio.run(run())
+
+        assert result == 3
+        pool.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+        assert image_optimizer._pool is None
+        assert image_optimizer._slots is slots
+
+    def test_replacement_pool_is_left_alone(self, monkeypatch):
+        """Test a late failure on the old pool does not shut down its replacement"""
+        old, new = broken_pool(), MagicMock()
+        monkeypatch.setattr(image_optimizer, "_pool", new)
+
+        image_optimizer._discard_pool(old)
+
+        assert image_optimizer._pool is new
+        new.shutdown.assert_not_called()
+        old.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
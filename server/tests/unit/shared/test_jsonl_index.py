@@ -0,0 +1,132 @@
+"""
+Unit tests for the JSONL offset index
+
+Tests that the index is built and persisted on first open, reused while the
+export is unchanged and rebuilt when it goes stale, and that lookups behave
+like a dict of parsed products (later duplicates win, missing keys raise,
+CRLF line endings are stripped).
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "standardizor"))
+
+from jsonl_index import JsonlOffsetIndex  # noqa: E402
+
+
+def write_jsonl(path, products, newline="\n"):
+    path.write_bytes(
+        "".join(json.dumps(product) + newline for product in products).encode("utf-8")
+    )
+    return path
+
+
+@pytest.fixture
+def export(tmp_path):
+    return write_jsonl(tmp_path / "products.jsonl", [
+        {"_id": "3000000000001", "product_name": "Kibble"},
+        {"id": "3000000000002", "product_name": "Wet food"},
+        {"product_name": "No id"},
+    ])
+
+
+class TestBuild:
+    """Test suite for building and reusing the persisted index"""
+
+    def test_open_builds_missing_index(self, export):
+        """Test the first open builds the index and metadata next to the export"""
+        with JsonlOffsetIndex(str(export)) as index:
+            assert len(index) == 2
+
+        assert Path(f"{export}.idx.npy").exists()
+        meta = json.loads(Path(f"{export}.idx.json").read_text())
+        assert meta["count"] == 2
+
+    def test_current_index_is_reused(self, export, monkeypatch):
+        """Test an index matching the export is opened without a rebuild"""
+        JsonlOffsetIndex(str(export)).build()
+
+        def fail_build(self):
+            raise AssertionError("index should not be rebuilt")
+
+        monkeypatch.setattr(JsonlOffsetIndex, "build", fail_build)
+        with JsonlOffsetIndex(str(export)) as index:
+            assert "3000000000001" in index
+
+    def test_stale_index_is_rebuilt(self, export):
+        """Test a changed export is re-indexed on the next open"""
+        JsonlOffsetIndex(str(export)).build()
+        with export.open("a") as f:
+            f.write(json.dumps({"_id": "3000000000003", "product_name": "Treats"}) + "\n")
+
+        with JsonlOffsetIndex(str(export)) as index:
+            assert len(index) == 3
+            assert index["3000000000003"]["product_name"] == "Treats"
+
+    def test_empty_export(self, tmp_path):
+        """Test an empty export opens as an empty index"""
+        empty = tmp_path / "empty.jsonl"
+        empty.write_bytes(b"")
+
+        with JsonlOffsetIndex(str(empty)) as index:
+            assert len(index) == 0
+            assert "3000000000001" not in index
+
+
+class TestLookup:
+    """Test suite for dict-like lookups through the index"""
+
+    def test_reads_products_by_id(self, export):
+        """Test both _id and id keys are indexed and parsed lazily"""
+        with JsonlOffsetIndex(str(export)) as index:
+            assert index["3000000000001"]["product_name"] == "Kibble"
+            assert index.get("3000000000002")["product_name"] == "Wet food"
+
+    def test_missing_keys(self, export):
+        """Test unknown ids raise KeyError, or return the default from get"""
+        with JsonlOffsetIndex(str(export)) as index:
+            assert "9999999999999" not in index
+            assert "" not in index
+            assert index.get("9999999999999", "missing") == "missing"
+            with pytest.raises(KeyError):
+                index["9999999999999"]
+
+    def test_later_duplicate_wins(self, tmp_path):
+        """Test the last line for a duplicated id is the one returned"""
+        export = write_jsonl(tmp_path / "dupes.jsonl", [
+            {"_id": "3000000000001", "product_name": "Old"},
+            {"_id": "3000000000001", "product_name": "New"},
+        ])
+
+        with JsonlOffsetIndex(str(export)) as index:
+            assert len(index) == 1
+            assert index["3000000000001"]["product_name"] == "New"
+
+    def test_crlf_line_endings(self, tmp_path):
+        """Test CRLF exports index the JSON without the line terminator"""
+        export = write_jsonl(tmp_path / "crlf.jsonl", [
+            {"_id": "3000000000001", "product_name": "Kibble"},
+            {"_id": "3000000000002", "product_name": "Wet food"},
+        ], newline="\r\n")
+
+        with JsonlOffsetIndex(str(export)) as index:
+            assert index["3000000000001"]["product_name"] == "Kibble"
+            assert index["3000000000002"]["product_name"] == "Wet food"
+
+    def test_invalid_lines_are_skipped(self, tmp_path):
+        """Test malformed and blank lines do not stop the index build"""
+        export = tmp_path / "broken.jsonl"
+        export.write_text('{"_id": "3000000000001"}\nnot json\n\n{"_id": "3000000000002"}\n')
+
+        with JsonlOffsetIndex(str(export)) as index:
+            assert len(index) == 2
+            assert index["3000000000002"] == {"_id": "3000000000002"}
+
+    def test_lookup_requires_open_index(self, export):
+        """Test lookups on an unopened index fail loudly"""
+        with pytest.raises(RuntimeError):
+            "3000000000001" in JsonlOffsetIndex(str(export))
@@ -0,0 +1,155 @@
+"""
+Unit tests for medication reminder scheduling and dispatch
+
+Tests next_fire_at for each frequency, timezone and DST handling, start and
+end bounds, and that the dispatcher sends due doses, reschedules off-schedule
+rows without sending, skips doses that are too late and leaves reminders
+without a timezone to the app.
+"""
+
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from app.services.health.medication_reminder_dispatcher import MedicationReminderDispatcher
+from app.services.health.medication_reminder_service import MedicationReminderService
+from app.services.push_notification_service import PushNotificationService, PushResult
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def make_reminder(frequency="daily", times=("09:00", "21:00"), start=utc(2026, 3, 2, 0, 0), end=None, tz="UTC"):
+    return {
+        "id": "rem-1",
+        "pet_id": "pet-1",
+        "medication_name": "Amoxicillin",
+        "dosage": "250mg",
+        "frequency": frequency,
+        "reminder_times": [{"time": t, "label": f"Dose {t}"} for t in times],
+        "start_date": start.isoformat(),
+        "end_date": end.isoformat() if end else None,
+        "timezone": tz,
+        "is_active": True,
+    }
+
+
+next_fire_at = MedicationReminderService.compute_next_fire_at
+
+
+class TestComputeNextFireAt:
+    """Test suite for MedicationReminderService.compute_next_fire_at"""
+
+    def test_daily_picks_next_time_today_then_tomorrow(self):
+        """Test the next time of day is used, rolling over to the next day"""
+        reminder = make_reminder()
+
+        assert next_fire_at(reminder, utc(2026, 3, 5, 10, 0)) == utc(2026, 3, 5, 21, 0)
+        assert next_fire_at(reminder, utc(2026, 3, 5, 21, 0)) == utc(2026, 3, 6, 9, 0)
+
+    def test_before_start_waits_for_start(self):
+        """Test no dose is scheduled before start_date"""
+        reminder = make_reminder(start=utc(2026, 3, 2, 12, 0))
+
+        assert next_fire_at(reminder, utc(2026, 1, 1)) == utc(2026, 3, 2, 21, 0)
+
+    @pytest.mark.parametrize("frequency, expected", [
+        ("every_other_day", utc(2026, 3, 6, 8, 0)),
+        ("weekly", utc(2026, 3, 9, 8, 0)),
+    ])
+    def test_interval_days_count_from_start(self, frequency, expected):
+        """Test dose days are counted from the start day, skipping today's past dose"""
+        reminder = make_reminder(frequency=frequency, times=("08:00",))
+
+        assert next_fire_at(reminder, utc(2026, 3, 4, 9, 0)) == expected
+
+    def test_once_fires_on_start_day_only(self):
+        """Test a one-time reminder has no dose after its start day"""
+        reminder = make_reminder(frequency="once", times=("09:00",))
+
+        assert next_fire_at(reminder, utc(2026, 3, 1)) == utc(2026, 3, 2, 9, 0)
+        assert next_fire_at(reminder, utc(2026, 3, 2, 9, 0)) is None
+
+    def test_end_date_and_inactive_stop_reminders(self):
+        """Test nothing fires after end_date, when inactive or as needed"""
+        ended = make_reminder(end=utc(2026, 3, 3, 12, 0))
+
+        assert next_fire_at(ended, utc(2026, 3, 3, 10, 0)) is None
+        assert next_fire_at({**ended, "is_active": False}, utc(2026, 3, 2)) is None
+        assert next_fire_at(make_reminder(frequency="as_needed"), utc(2026, 3, 2)) is None
+
+    def test_local_time_across_dst(self):
+        """Test a 09:00 dose stays at 09:00 local time when clocks change"""
+        reminder = make_reminder(times=("09:00",), tz="America/New_York")
+
+        # EST (UTC-5) before 8 March 2026, EDT (UTC-4) after
+        assert next_fire_at(reminder, utc(2026, 3, 7, 15, 0)) == utc(2026, 3, 8, 13, 0)
+        assert next_fire_at(reminder, utc(2026, 3, 6, 15, 0)) == utc(2026, 3, 7, 14, 0)
+
+    def test_no_timezone_never_fires(self):
+        """Test reminders without a timezone are left to the app's local notifications"""
+        assert next_fire_at(make_reminder(tz=None), utc(2026, 3, 5, 10, 0)) is None
+
+    def test_legacy_string_reminder_times(self):
+        """Test rows that stored reminder_times as a JSON string still work"""
+        reminder = make_reminder()
+        reminder["reminder_times"] = '[{"time": "9:00", "label": "Morning"}]'
+
+        assert next_fire_at(reminder, utc(2026, 3, 5, 10, 0)) == utc(2026, 3, 6, 9, 0)
+
+
+class FakePush:
+    def __init__(self):
+        self.sent = []
+
+    async def send_batch(self, notifications):
+        batch = list(notifications)
+        self.sent.extend(batch)
+        return {n["device_token"]: PushResult(n["device_token"], 200) for n in batch}
+
+    send_batch_by_key = PushNotificationService.send_batch_by_key
+
+
+class TestDispatcher:
+    """Test suite for MedicationReminderDispatcher.dispatch_due"""
+
+    def claimed(self, reminder_id, fire_at, device_token="tok"):
+        return {**make_reminder(), "id": reminder_id, "next_fire_at": fire_at.isoformat(),
+                "pet_name": "Rex", "device_token": device_token}
+
+    def test_sends_due_doses_and_advances(self, monkeypatch, make_supabase):
+        """Test due doses are sent and every claimed reminder moves to its next dose"""
+        now = utc(2026, 3, 5, 9, 1)
+        monkeypatch.setattr("app.services.health.medication_reminder_dispatcher.DateTimeService.now", lambda: now)
+        claimed = [
+            self.claimed("due", utc(2026, 3, 5, 9, 0)),
+            self.claimed("moved", utc(2026, 3, 5, 8, 59, 30)),
+            self.claimed("late", utc(2026, 3, 4, 21, 0)),
+            self.claimed("no-token", utc(2026, 3, 5, 9, 0), device_token=None),
+            {**self.claimed("no-timezone", utc(2026, 3, 5, 9, 0)), "timezone": None},
+        ]
+        supabase = make_supabase(rpc_handlers={
+            "claim_due_medication_reminders": claimed,
+            "advance_medication_reminders": lambda params: len(params["p_updates"]),
+        })
+        push = FakePush()
+
+        assert asyncio.run(MedicationReminderDispatcher(push, supabase).dispatch_due()) == 5
+        assert [n["payload"]["medication_id"] for n in push.sent] == ["due"]
+        payload = push.sent[0]["payload"]
+        assert payload["aps"]["alert"]["body"] == "Time to give Amoxicillin (250mg) to Rex"
+        assert payload["reminder_label"] == "Dose 09:00"
+
+        name, params = supabase.rpcs[-1]
+        assert name == "advance_medication_reminders"
+        advanced = {update["id"]: update for update in params["p_updates"]}
+        assert advanced["due"]["sent"] is True
+        assert not any(advanced[key]["sent"] for key in ("moved", "late", "no-token", "no-timezone"))
+        assert all(
+            advanced[key]["next_fire_at"] == utc(2026, 3, 5, 21, 0).isoformat()
+            for key in ("due", "moved", "late", "no-token")
+        )
+        assert advanced["no-timezone"]["next_fire_at"] is None
+        assert advanced["moved"]["fired_at"] == utc(2026, 3, 5, 8, 59, 30).isoformat()
@@ -0,0 +1,209 @@
+"""
+Unit tests for the scheduled notification queue
+
+Tests what is sent to the schedule and claim functions, how APNs outcomes
+are recorded (sent, retried with backoff, failed) under the claimed lease,
+that a token due twice in one batch gets both notifications, and that the
+worker stops cleanly.
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.notification_scheduler import NotificationScheduler, ScheduledNotification
+from app.services.push_notification_service import PushNotificationService, PushResult
+
+
+class FakePush:
+    """Answers with a fixed PushResult per device token"""
+
+    def __init__(self, outcomes=None):
+        self.outcomes = outcomes or {}
+        self.batches = []
+
+    async def send_batch(self, notifications):
+        batch = list(notifications)
+        self.batches.append(batch)
+        return {
+            n["device_token"]: self.outcomes.get(n["device_token"], PushResult(n["device_token"], 200))
+            for n in batch
+        }
+
+    send_batch_by_key = PushNotificationService.send_batch_by_key
+
+
+LEASE = "2026-10-18T08:02:00.123456+00:00"
+
+
+def claimed_row(row_id, token, attempts=1):
+    return {
+        "id": row_id,
+        "device_token": token,
+        "payload": {"aps": {"alert": row_id}},
+        "attempts": attempts,
+        "locked_until": LEASE
+    }
+
+
+def updates_by_status(supabase):
+    return {call["data"]["status"]: call for call in supabase.queries(action="update")}
+
+
+@pytest.fixture
+def make_client(make_supabase):
+    """Client whose claim returns the given rows once, then nothing"""
+
+    def make(claimed=(), tables=None):
+        queue = [list(claimed)]
+
+        def claim(params):
+            return queue.pop() if queue else []
+
+        def schedule(params):
+            return [f"id-{i}" for i, _ in enumerate(params["p_notifications"])]
+
+        return make_supabase(tables, rpc_handlers={
+            "claim_due_notifications": claim,
+            "schedule_notifications": schedule,
+        })
+
+    return make
+
+
+class TestSchedule:
+    """Test suite for NotificationScheduler.schedule"""
+
+    def test_sends_rows_with_send_at(self, make_client):
+        """Test notifications are queued in one call with an absolute send time"""
+        supabase = make_client()
+        scheduler = NotificationScheduler(FakePush(), supabase)
+
+        ids = asyncio.run(scheduler.schedule([
+            ScheduledNotification("tok", {"aps": {}}, delay_seconds=60, user_id="u1"),
+            ScheduledNotification("tok", {"aps": {}}, delay_seconds=-5, user_id="u1"),
+        ]))
+
+        name, params = supabase.rpcs[0]
+        rows = params["p_notifications"]
+        assert name == "schedule_notifications"
+        assert ids == ["id-0", "id-1"]
+        assert rows[0]["send_at"] > rows[1]["send_at"]
+        assert rows[0]["user_id"] == "u1"
+
+    def test_repeated_dedupe_key_keeps_last(self, make_client):
+        """Test one statement never carries the same dedupe key twice"""
+        supabase = make_client()
+        scheduler = NotificationScheduler(FakePush(), supabase)
+
+        asyncio.run(scheduler.schedule([
+            ScheduledNotification("tok", {"n": 1}, 60, dedupe_key="k"),
+            ScheduledNotification("tok", {"n": 2}, 60, dedupe_key="k"),
+        ]))
+
+        assert [row["payload"] for row in supabase.rpcs[0][1]["p_notifications"]] == [{"n": 2}]
+
+    def test_cancel_only_touches_pending(self, make_client):
+        """Test cancelling marks only the user's pending rows"""
+        supabase = make_client(tables={"scheduled_notifications": [
+            *({"id": f"n{i}", "user_id": "u1", "status": "pending"} for i in range(3)),
+            {"id": "n3", "user_id": "u1", "status": "sent"},
+            {"id": "n4", "user_id": "u2", "status": "pending"},
+        ]})
+        scheduler = NotificationScheduler(FakePush(), supabase)
+
+        assert asyncio.run(scheduler.cancel_user_notifications("u1")) == 3
+        assert supabase.calls[0]["filters"] == [("eq", "user_id", "u1"), ("eq", "status", "pending")]
+
+
+class TestDispatchDue:
+    """Test suite for NotificationScheduler.dispatch_due"""
+
+    def test_records_each_outcome_once(self, make_client):
+        """Test sent, retryable and permanent failures are one update each"""
+        supabase = make_client(claimed=[
+            claimed_row("r1", "ok"),
+            claimed_row("r2", "busy"),
+            claimed_row("r3", "gone"),
+            claimed_row("r4", "ok2"),
+        ])
+        push = FakePush({
+            "busy": PushResult("busy", 503, "ServiceUnavailable"),
+            "gone": PushResult("gone", 410, "Unregistered"),
+        })
+        scheduler = NotificationScheduler(push, supabase)
+
+        assert asyncio.run(scheduler.dispatch_due(batch_size=10)) == 4
+
+        updates = updates_by_status(supabase)
+        assert updates["sent"]["filters"][0] == ("in", "id", ["r1", "r4"])
+        assert updates["pending"]["data"]["last_error"] == "ServiceUnavailable"
+        assert "send_at" in updates["pending"]["data"]
+        assert updates["failed"]["filters"][0] == ("in", "id", ["r3"])
+        assert all(("eq", "status", "pending") in call["filters"] for call in supabase.queries(action="update"))
+
+    def test_claim_caps_attempts(self, monkeypatch, make_client):
+        """Test the claim is told the attempt limit, so expired leases are not retried forever"""
+        monkeypatch.setattr("app.services.notification_scheduler.settings.notification_max_attempts", 3)
+        supabase = make_client()
+
+        asyncio.run(NotificationScheduler(FakePush(), supabase).dispatch_due())
+
+        assert supabase.rpcs[0][1]["p_max_attempts"] == 3
+
+    def test_outcome_only_recorded_under_claimed_lease(self, make_client):
+        """Test a row rescheduled or reclaimed while sending is not marked with the old outcome"""
+        supabase = make_client(claimed=[claimed_row("r1", "ok")])
+
+        asyncio.run(NotificationScheduler(FakePush(), supabase).dispatch_due())
+
+        assert ("eq", "locked_until", LEASE) in updates_by_status(supabase)["sent"]["filters"]
+
+    def test_gives_up_after_max_attempts(self, monkeypatch, make_client):
+        """Test a transient failure on the last attempt is marked failed"""
+        monkeypatch.setattr("app.services.notification_scheduler.settings.notification_max_attempts", 3)
+        supabase = make_client(claimed=[claimed_row("r1", "busy", attempts=3)])
+        scheduler = NotificationScheduler(FakePush({"busy": PushResult("busy", 0, "ConnectError")}), supabase)
+
+        asyncio.run(scheduler.dispatch_due())
+
+        assert list(updates_by_status(supabase)) == ["failed"]
+
+    def test_same_token_twice_is_sent_twice(self, make_client):
+        """Test two due rows for one device are sent in separate rounds"""
+        supabase = make_client(claimed=[claimed_row("r1", "tok"), claimed_row("r2", "tok")])
+        push = FakePush()
+        scheduler = NotificationScheduler(push, supabase)
+
+        asyncio.run(scheduler.dispatch_due())
+
+        assert [[n["payload"]["aps"]["alert"] for n in batch] for batch in push.batches] == [["r1"], ["r2"]]
+        assert updates_by_status(supabase)["sent"]["filters"][0] == ("in", "id", ["r1", "r2"])
+
+    def test_nothing_due(self, make_client):
+        """Test an empty claim sends nothing"""
+        push = FakePush()
+        scheduler = NotificationScheduler(push, make_client())
+
+        assert asyncio.run(scheduler.dispatch_due()) == 0
+        assert not push.batches
+
+
+class TestWorker:
+    """Test suite for the worker loop"""
+
+    def test_drains_queue_then_stops(self, monkeypatch, make_client):
+        """Test the worker claims until the queue is empty and stops promptly"""
+        monkeypatch.setattr("app.services.notification_scheduler.settings.notification_poll_interval_seconds", 60)
+        supabase = make_client(claimed=[claimed_row("r1", "tok")])
+        scheduler = NotificationScheduler(FakePush(), supabase)
+
+        async def run():
+            scheduler.start()
+            await asyncio.sleep(0.05)
+            await asyncio.wait_for(scheduler.stop(), timeout=1)
+
+        asyncio.run(run())
+
+        assert [name for name, _ in supabase.rpcs] == ["claim_due_notifications"]
+        assert list(updates_by_status(supabase)) == ["sent"]
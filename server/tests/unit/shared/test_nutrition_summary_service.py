@@ -0,0 +1,115 @@
+"""
+Unit tests for NutritionSummaryService scoring
+
+Tests per-pet scores computed from daily rollup rows and the comparative
+insights derived from them.
+"""
+
+from app.services.nutrition.nutrition_summary_service import NutritionSummaryService
+
+
+def make_pet(pet_id="pet-1", name="Rex", daily_calories=1000):
+    goal = [{"daily_calories": daily_calories}] if daily_calories is not None else []
+    return {"id": pet_id, "name": name, "species": "dog", "calorie_goals": goal}
+
+
+def make_summaries(*calorie_scores):
+    return [
+        {"total_calories": calories, "average_compatibility": score}
+        for calories, score in calorie_scores
+    ]
+
+
+class TestScorePet:
+    """Test suite for NutritionSummaryService.score_pet"""
+
+    def test_averages_logged_days(self):
+        """Test averages use logged days and consistency uses the window"""
+        pet = NutritionSummaryService.score_pet(
+            make_pet(), make_summaries((900, 90), (1100, 90), (700, 70)), days=7
+        )
+
+        assert pet["days_logged"] == 3
+        assert pet["average_daily_calories"] == 900.0
+        assert pet["nutrition_score"] == 83.3
+        assert pet["logging_consistency"] == 42.9
+        assert pet["calorie_goal"] == 1000.0
+
+    def test_no_goal_has_no_score(self):
+        """Test pets without a calorie goal are not scored"""
+        pet = NutritionSummaryService.score_pet(
+            make_pet(daily_calories=None), make_summaries((900, 0)), days=7
+        )
+
+        assert pet["calorie_goal"] is None
+        assert pet["nutrition_score"] is None
+
+    def test_goal_as_object(self):
+        """Test a one-to-one embed returned as an object is handled"""
+        pet_row = make_pet()
+        pet_row["calorie_goals"] = {"daily_calories": 500}
+
+        pet = NutritionSummaryService.score_pet(pet_row, [], days=7)
+
+        assert pet["calorie_goal"] == 500.0
+        assert pet["days_logged"] == 0
+        assert pet["nutrition_score"] is None
+
+    def test_falls_back_to_requirements(self):
+        """Test pets without a goal are scored against their requirements"""
+        pet_row = make_pet(daily_calories=None)
+        pet_row["nutritional_requirements"] = [{"daily_calories": 800}]
+
+        pet = NutritionSummaryService.score_pet(pet_row, make_summaries((800, 100)), days=7)
+
+        assert pet["calorie_goal"] == 800.0
+        assert pet["nutrition_score"] == 100.0
+
+    def test_goal_wins_over_requirements(self):
+        """Test the calorie goal takes precedence like the SQL rollup"""
+        pet_row = make_pet(daily_calories=1200)
+        pet_row["nutritional_requirements"] = {"daily_calories": 800}
+
+        pet = NutritionSummaryService.score_pet(pet_row, [], days=7)
+
+        assert pet["calorie_goal"] == 1200.0
+
+
+class TestComparativeInsights:
+    """Test suite for NutritionSummaryService.comparative_insights"""
+
+    def score(self, pet_row, summaries):
+        return NutritionSummaryService.score_pet(pet_row, summaries, days=7)
+
+    def test_missing_data_and_goal(self):
+        """Test pets without feedings or goals get setup insights"""
+        pets = [
+            self.score(make_pet("a", "Rex"), []),
+            self.score(make_pet("b", "Tom", daily_calories=None), make_summaries((300, 0))),
+        ]
+
+        insights = NutritionSummaryService.comparative_insights(pets)
+
+        assert [i.type for i in insights] == ["missing_data", "missing_goal"]
+
+    def test_low_score_and_spread(self):
+        """Test off-goal pets are flagged and a large spread is compared"""
+        pets = [
+            self.score(make_pet("a", "Rex"), make_summaries((1000, 95))),
+            self.score(make_pet("b", "Tom"), make_summaries((1700, 30))),
+        ]
+
+        insights = NutritionSummaryService.comparative_insights(pets)
+
+        assert [i.type for i in insights] == ["calorie_target", "comparison"]
+        assert insights[0].severity == "high"
+        assert "above" in insights[0].description
+
+    def test_on_target_pets_have_no_insights(self):
+        """Test well-fed pets with similar scores produce nothing"""
+        pets = [
+            self.score(make_pet("a", "Rex"), make_summaries((1000, 95))),
+            self.score(make_pet("b", "Tom"), make_summaries((950, 90))),
+        ]
+
+        assert NutritionSummaryService.comparative_insights(pets) == []
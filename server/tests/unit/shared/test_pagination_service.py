@@ -0,0 +1,164 @@
+"""
+Unit tests for cursor pagination
+
+Tests cursor encoding, next-cursor calculation and the keyset filter built
+by QueryBuilderService.apply_keyset.
+"""
+
+import uuid
+
+import pytest
+from fastapi import HTTPException, Response
+
+from app.shared.services.pagination_service import PaginationService
+from app.shared.services.query_builder_service import QueryBuilderService
+
+
+class RecordingQuery:
+    """Minimal stand-in for a postgrest select builder that records calls"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        def method(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+        return method
+
+
+ROW_ID = "6f1c2a4e-8d3b-4c5a-9e7f-0a1b2c3d4e5f"
+
+
+def make_rows(count, start=0):
+    return [
+        {"id": str(uuid.UUID(int=i)), "created_at": f"2026-10-{18 - i % 10:02d}T08:00:00+00:00"}
+        for i in range(start, start + count)
+    ]
+
+
+class TestCursorEncoding:
+    """Test suite for encode_cursor / decode_cursor"""
+
+    def test_round_trip(self):
+        """Test a cursor decodes to the sort value and id it was built from"""
+        cursor = PaginationService.encode_cursor("2026-10-18T08:00:00+00:00", ROW_ID)
+
+        assert "=" not in cursor
+        assert PaginationService.decode_cursor(cursor) == ("2026-10-18T08:00:00+00:00", ROW_ID)
+
+    def test_rejects_other_sort_field(self):
+        """Test a cursor from another ordering is rejected"""
+        cursor = PaginationService.encode_cursor("2026-10-18", ROW_ID, "event_date")
+
+        with pytest.raises(ValueError):
+            PaginationService.decode_cursor(cursor, "created_at")
+
+    @pytest.mark.parametrize("cursor", ["not-a-cursor", "", "W10", "WyJjcmVhdGVkX2F0IixudWxsLCJhIl0"])
+    def test_rejects_malformed(self, cursor):
+        """Test garbage, empty and null-valued cursors are rejected"""
+        with pytest.raises(ValueError):
+            PaginationService.decode_cursor(cursor)
+
+    @pytest.mark.parametrize("sort_value, id", [
+        ('2026-10-18",user_id.neq."x', ROW_ID),
+        ("anything", ROW_ID),
+        (True, ROW_ID),
+        ({"a": 1}, ROW_ID),
+        ("2026-10-18", 'x",user_id.neq."y'),
+        ("2026-10-18", 42),
+    ])
+    def test_rejects_values_unsafe_in_filter(self, sort_value, id):
+        """Test sort values other than numbers/ISO timestamps and non-UUID ids are rejected"""
+        cursor = PaginationService.encode_cursor(sort_value, id)
+
+        with pytest.raises(ValueError):
+            PaginationService.decode_cursor(cursor)
+
+    def test_accepts_numeric_sort_value(self):
+        """Test numeric sort values round-trip"""
+        cursor = PaginationService.encode_cursor(12.5, ROW_ID)
+
+        assert PaginationService.decode_cursor(cursor) == (12.5, ROW_ID)
+
+    def test_validate_cursor_raises_400(self):
+        """Test invalid cursors become a 400 response"""
+        assert PaginationService.validate_cursor(None) is None
+
+        with pytest.raises(HTTPException) as exc_info:
+            PaginationService.validate_cursor("not-a-cursor")
+
+        assert exc_info.value.status_code == 400
+
+
+class TestNextCursor:
+    """Test suite for next cursor calculation"""
+
+    def test_full_page_has_cursor(self):
+        """Test a full page gets a cursor pointing at its last row"""
+        rows = make_rows(3)
+
+        cursor = PaginationService.next_cursor(rows, limit=3)
+
+        assert PaginationService.decode_cursor(cursor) == (rows[-1]["created_at"], rows[-1]["id"])
+
+    def test_short_page_is_last(self):
+        """Test a short or empty page has no cursor"""
+        assert PaginationService.next_cursor(make_rows(2), limit=3) is None
+        assert PaginationService.next_cursor([], limit=3) is None
+
+    def test_build_cursor_response(self):
+        """Test the response carries next_cursor and a fallback count"""
+        page = PaginationService.build_cursor_response(make_rows(2), limit=2)
+
+        assert page.has_more is True
+        assert page.next_cursor is not None
+        assert page.offset == 0
+        assert page.total_count == 3
+
+    def test_header(self):
+        """Test list endpoints get the cursor as a header"""
+        response = Response()
+
+        PaginationService.set_next_cursor_header(response, make_rows(2), limit=2)
+
+        assert response.headers[PaginationService.NEXT_CURSOR_HEADER]
+
+
+class TestApplyKeyset:
+    """Test suite for QueryBuilderService.apply_keyset"""
+
+    def test_first_page_only_orders(self):
+        """Test without a cursor the query is ordered by sort column and id"""
+        query = RecordingQuery()
+
+        QueryBuilderService.apply_keyset(query, None)
+
+        assert query.calls == [
+            ("order", ("created_at",), {"desc": True}),
+            ("order", ("id",), {"desc": True}),
+        ]
+
+    def test_cursor_filters_after_last_row(self):
+        """Test the cursor becomes a (sort, id) < (value, last_id) filter"""
+        cursor = PaginationService.encode_cursor("2026-10-18T08:00:00+00:00", ROW_ID, "event_date")
+        query = RecordingQuery()
+
+        QueryBuilderService.apply_keyset(query, cursor, "event_date")
+
+        name, args, _ = query.calls[0]
+        assert name == "or_"
+        assert args[0] == (
+            'event_date.lt."2026-10-18T08:00:00+00:00",'
+            f'and(event_date.eq."2026-10-18T08:00:00+00:00",id.lt."{ROW_ID}")'
+        )
+
+    def test_ascending_uses_greater_than(self):
+        """Test ascending order pages forward with gt"""
+        cursor = PaginationService.encode_cursor("2026-10-18", ROW_ID)
+        query = RecordingQuery()
+
+        QueryBuilderService.apply_keyset(query, cursor, desc=False)
+
+        assert 'created_at.gt."2026-10-18"' in query.calls[0][1][0]
+        assert query.calls[1] == ("order", ("created_at",), {"desc": False})
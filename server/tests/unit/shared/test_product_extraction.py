@@ -0,0 +1,186 @@
+"""
+Unit tests for OpenPetFoodFacts product extraction
+
+Tests numeric coercion, field mapping and that the batch paths match the
+per-product ones.
+"""
+
+import math
+
+import numpy as np
+
+from app.shared.utils.product_extraction import (
+    NUTRIENT_COLUMNS,
+    NUTRITIONAL_INFO_DEFAULTS,
+    coerce_floats,
+    extract_nutritional_info,
+    extract_nutritional_info_batch,
+    extract_product,
+    extract_products_batch,
+    standardize_nutritional_info,
+    to_float,
+)
+
+
+def make_product(**overrides):
+    product = {
+        "_id": "3000000000001",
+        "code": "3000000000001",
+        "product_name": "Adult Dog Chicken Kibble",
+        "brands": "Acme",
+        "lang": "en",
+        "countries": "France",
+        "categories_tags": ["en:dog-food", "en:dry-dog-food"],
+        "ingredients_text": "chicken, rice; Rice, corn",
+        "allergens_tags": ["en:fish"],
+        "additives_tags": ["en:e306", "en:e306"],
+        "vitamins_tags": ["en:vitamin-a"],
+        "nutriments": {
+            "energy-kcal_100g": 365,
+            "proteins_100g": "24,5",
+            "fat_100g": "14 %",
+            "fiber_100g": 0,
+            "water_100g": None,
+            "moisture_100g": "10",
+        },
+        "last_modified_t": 1700000000,
+    }
+    product.update(overrides)
+    return product
+
+
+class TestNumericCoercion:
+    """Test suite for to_float and coerce_floats"""
+
+    def test_to_float(self):
+        """Test numbers, numeric strings, units and decimal commas"""
+        assert to_float(12) == 12.0
+        assert to_float(" 3.5 ") == 3.5
+        assert to_float("12 %") == 12.0
+        assert to_float("3,5") == 3.5
+        assert to_float("n/a") is None
+        assert to_float("") is None
+        assert to_float(None) is None
+        assert to_float(float("nan")) is None
+        assert to_float({}) is None
+
+    def test_coerce_floats_matches_to_float(self):
+        """Test the column path gives the same values as the scalar path"""
+        values = [1, "2.5", None, "3,5", "7 g", float("inf"), "abc"]
+
+        column = coerce_floats(values)
+
+        expected = [to_float(v) for v in values]
+        assert [None if math.isnan(v) else v for v in column.tolist()] == expected
+
+    def test_coerce_floats_fast_path(self):
+        """Test plain numeric columns convert directly"""
+        column = coerce_floats([1, "2", None])
+
+        assert column.dtype == np.float64
+        assert column[:2].tolist() == [1.0, 2.0]
+        assert math.isnan(column[2])
+
+
+class TestExtractProduct:
+    """Test suite for single-product extraction"""
+
+    def test_extract_product_fields(self):
+        """Test column mapping, nutrient fallbacks and arrays"""
+        record = extract_product(make_product())
+
+        assert record["name"] == "Adult Dog Chicken Kibble"
+        assert record["species"] == "dog"
+        assert record["life_stage"] == "adult"
+        assert record["product_type"] == "dry"
+        assert record["calories_per_100g"] == 365.0
+        assert record["protein_percentage"] == 24.5
+        assert record["fat_percentage"] == 14.0
+        # A real zero is kept rather than falling through to the next key
+        assert record["fiber_percentage"] == 0.0
+        # water_100g is missing, moisture_100g is the fallback
+        assert record["moisture_percentage"] == 10.0
+        assert record["ingredients"] == ["chicken", "rice", "corn"]
+        assert record["allergens"] == ["Fish"]
+        assert record["additives"] == ["E306"]
+
+    def test_extract_product_without_name(self):
+        """Test products without a usable name are skipped"""
+        assert extract_product(make_product(product_name=" ")) is None
+
+    def test_nutritional_info_is_standardized(self):
+        """Test the nutritional_info document has the full structure"""
+        info = extract_product(make_product())["nutritional_info"]
+
+        assert set(info) == set(NUTRITIONAL_INFO_DEFAULTS)
+        assert info["source"] == "openpetfoodfacts"
+        assert info["external_id"] == "3000000000001"
+        assert info["last_updated"] == "1700000000"
+        assert info == extract_nutritional_info(make_product())
+        assert standardize_nutritional_info(info) == info
+
+
+class TestBatchExtraction:
+    """Test suite for batch extraction"""
+
+    def test_batch_matches_single(self):
+        """Test batch extraction gives the same records as per-product extraction"""
+        products = [
+            make_product(),
+            make_product(product_name=None),
+            make_product(_id="2", nutriments={"energy_100g": "1500 kJ", "proteins_100g": "x"}),
+            make_product(_id="3", nutriments=None),
+        ]
+
+        batch = extract_products_batch(products)
+
+        expected = [r for r in (extract_product(p) for p in products) if r is not None]
+        assert batch.records == expected
+        assert batch.positions.tolist() == [0, 2, 3]
+        assert batch.nutrients.shape == (3, len(NUTRIENT_COLUMNS))
+        assert extract_nutritional_info_batch(products) == [extract_nutritional_info(p) for p in products]
+
+    def test_batch_columns(self):
+        """Test the columnar view"""
+        batch = extract_products_batch([make_product(), make_product(_id="2", product_name="Cat Treats")])
+
+        columns = batch.to_columns()
+
+        assert columns["protein_percentage"].dtype == np.float64
+        assert columns["protein_percentage"].tolist() == [24.5, 24.5]
+        assert columns["name"].tolist() == ["Adult Dog Chicken Kibble", "Cat Treats"]
+        assert "nutritional_info" not in columns
+
+    def test_empty_batch(self):
+        """Test an empty batch"""
+        batch = extract_products_batch([])
+
+        assert len(batch) == 0
+        assert batch.to_columns() == {}
+        assert extract_nutritional_info_batch([]) == []
+
+
+class TestStandardize:
+    """Test suite for standardize_nutritional_info"""
+
+    def test_fills_defaults_and_coerces(self):
+        """Test missing keys get defaults, unknown keys are dropped, numbers coerced"""
+        info = standardize_nutritional_info({
+            "protein_percentage": "25",
+            "ingredients": "chicken",
+            "external_id": 42,
+            "unknown": 1,
+        })
+
+        assert set(info) == set(NUTRITIONAL_INFO_DEFAULTS)
+        assert info["protein_percentage"] == 25.0
+        assert info["ingredients"] == []
+        assert info["external_id"] == "42"
+        assert info["data_quality_score"] == 0.0
+
+    def test_defaults_are_not_shared(self):
+        """Test returned documents do not alias the module defaults"""
+        info = standardize_nutritional_info(None)
+        info["ingredients"].append("x")
+
+        assert NUTRITIONAL_INFO_DEFAULTS["ingredients"] == []
@@ -0,0 +1,237 @@
+"""
+Unit tests for the APNs push notification client
+
+Runs the client against a local HTTP/2 server that answers like APNs, to
+test that batches are multiplexed over one connection with bounded
+concurrency, that the provider token is cached and refreshed, and that
+per-token results are reported and invalid tokens are cleaned up in batches.
+"""
+
+import asyncio
+import json
+
+import h2.config
+import h2.connection
+import h2.events
+import jwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from app.services.push_notification_service import PushNotificationService
+
+
+class MockAPNsServer:
+    """
+    Minimal APNs stand-in speaking HTTP/2 without TLS
+
+    Responds 200 unless responses maps a device token to (status, reason).
+    Records connections, authorization headers and the most requests that
+    were in flight at once.
+    """
+
+    def __init__(self, responses=None, delay=0.0):
+        self.responses = responses or {}
+        self.delay = delay
+        self.connections = 0
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._server = None
+
+    @property
+    def url(self):
+        port = self._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+    async def __aenter__(self):
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self
+
+    async def __aexit__(self, *exc):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        conn = h2.connection.H2Connection(config=h2.config.H2Configuration(client_side=False))
+        conn.initiate_connection()
+        writer.write(conn.data_to_send())
+        headers = {}
+        tasks = set()
+        try:
+            while data := await reader.read(65535):
+                for event in conn.receive_data(data):
+                    if isinstance(event, h2.events.RequestReceived):
+                        headers[event.stream_id] = dict(
+                            (k.decode(), v.decode()) for k, v in event.headers
+                        )
+                    elif isinstance(event, h2.events.StreamEnded):
+                        task = asyncio.create_task(
+                            self._respond(conn, writer, event.stream_id, headers.pop(event.stream_id))
+                        )
+                        tasks.add(task)
+                        task.add_done_callback(tasks.discard)
+                writer.write(conn.data_to_send())
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def _respond(self, conn, writer, stream_id, headers):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        self.requests.append(headers)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+
+        device_token = headers[":path"].rsplit("/", 1)[1]
+        status, reason = self.responses.get(device_token, (200, None))
+        body = json.dumps({"reason": reason}).encode() if reason else b""
+        conn.send_headers(stream_id, [(":status", str(status)), ("apns-id", f"id-{device_token}")])
+        conn.send_data(stream_id, body, end_stream=True)
+        writer.write(conn.data_to_send())
+
+
+@pytest.fixture
+def private_key():
+    key = ec.generate_private_key(ec.SECP256R1())
+    return key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+
+
+def make_service(url, private_key):
+    service = PushNotificationService(apns_url=url)
+    service.apns_key_id = "KEY123"
+    service.apns_team_id = "TEAM123"
+    service.apns_bundle_id = "com.example.app"
+    service.apns_private_key = private_key
+    return service
+
+
+def notifications(count):
+    return [{"device_token": f"token{i}", "payload": {"aps": {"alert": f"n{i}"}}} for i in range(count)]
+
+
+class TestSendBatch:
+    """Test suite for PushNotificationService.send_batch"""
+
+    def test_multiplexes_over_one_connection(self, private_key):
+        """Test a batch is sent concurrently on a single HTTP/2 connection"""
+        async def run():
+            async with MockAPNsServer(delay=0.05) as server:
+                service = make_service(server.url, private_key)
+                try:
+                    results = await service.send_batch(notifications(50), max_concurrency=20)
+                finally:
+                    await service.close()
+                return server, results
+
+        server, results = asyncio.run(run())
+
+        assert len(results) == 50 and all(result.success for result in results.values())
+        assert results["token7"].apns_id == "id-token7"
+        assert server.connections == 1
+        assert server.max_in_flight == 20
+
+    def test_reports_per_token_results_and_cleans_up(self, private_key, monkeypatch):
+        """Test failures are reported per token and invalid tokens are removed in one call"""
+        cleaned = []
+
+        async def fake_cleanup(tokens):
+            cleaned.append(sorted(tokens))
+
+        async def run():
+            responses = {
+                "token1": (400, "BadDeviceToken"),
+                "token2": (410, "Unregistered"),
+                "token3": (413, "PayloadTooLarge"),
+            }
+            async with MockAPNsServer(responses=responses) as server:
+                service = make_service(server.url, private_key)
+                monkeypatch.setattr(service, "_cleanup_invalid_tokens", fake_cleanup)
+                try:
+                    return await service.send_batch_notifications(notifications(5))
+                finally:
+                    await service.close()
+
+        results = asyncio.run(run())
+
+        assert results == {"token0": True, "token1": False, "token2": False, "token3": False, "token4": True}
+        assert cleaned == [["token1", "token2"]]
+
+
+class TestProviderToken:
+    """Test suite for provider token caching"""
+
+    def test_token_is_reused_until_ttl(self, private_key, monkeypatch):
+        """Test one token is signed for many requests and replaced after the TTL"""
+        now = [1000.0]
+        monkeypatch.setattr("app.services.push_notification_service.time.monotonic", lambda: now[0])
+        service = make_service("https://api.example", private_key)
+        signed = []
+        generate = service._generate_jwt_token
+        monkeypatch.setattr(service, "_generate_jwt_token", lambda: signed.append(generate()) or signed[-1])
+
+        first = service._create_headers()["authorization"]
+        now[0] += PushNotificationService.PROVIDER_TOKEN_TTL_SECONDS - 1
+        assert service._create_headers()["authorization"] == first
+        assert len(signed) == 1
+
+        now[0] += 1
+        token = service._create_headers()["authorization"].split()[1]
+        assert len(signed) == 2
+        assert jwt.get_unverified_header(token) == {"alg": "ES256", "kid": "KEY123", "typ": "JWT"}
+        assert jwt.decode(token, options={"verify_signature": False})["iss"] == "TEAM123"
+
+    def test_expired_token_is_refreshed_and_retried(self, private_key):
+        """Test ExpiredProviderToken signs a new token and retries once"""
+        async def run():
+            async with MockAPNsServer() as server:
+                service = make_service(server.url, private_key)
+                signed = []
+                generate = service._generate_jwt_token
+                service._generate_jwt_token = lambda: signed.append(generate()) or signed[-1]
+                server.responses["token0"] = (403, "ExpiredProviderToken")
+                try:
+                    result = await service._send("token0", {"aps": {}})
+                finally:
+                    await service.close()
+                return server, signed, result
+
+        server, signed, result = asyncio.run(run())
+
+        assert len(signed) == 2
+        assert len(server.requests) == 2
+        assert result.reason == "ExpiredProviderToken"
+
+    def test_unconfigured_key_is_not_cached(self):
+        """Test a missing key is retried on the next request rather than cached"""
+        service = make_service("https://api.example", None)
+
+        assert service._create_headers()["authorization"] == "bearer "
+        assert service._provider_token is None
+
+
+class TestInvalidTokenCleanup:
+    """Test suite for PushNotificationService._cleanup_invalid_tokens"""
+
+    def test_removes_tokens_in_batches(self, make_supabase, monkeypatch):
+        """Test tokens are cleared in bounded IN batches from both tables"""
+        tokens = [f"token{i}" for i in range(5)]
+        supabase = make_supabase({
+            "users": [{"id": f"u{i}", "device_token": token} for i, token in enumerate(tokens)]
+            + [{"id": "kept", "device_token": "valid"}],
+            "device_tokens_temp": [{"device_token": token} for token in tokens + ["valid"]],
+        })
+        monkeypatch.setattr("app.core.database.get_supabase_service_role_client", lambda: supabase)
+        service = make_service("https://api.example", None)
+        service.TOKEN_CLEANUP_BATCH_SIZE = 2
+
+        asyncio.run(service._cleanup_invalid_tokens(tokens))
+
+        assert [len(call["filters"][0][2]) for call in supabase.queries("users", "update")] == [2, 2, 1]
+        assert [len(call["filters"][0][2]) for call in supabase.queries("device_tokens_temp", "delete")] == [2, 2, 1]
+        assert [user["device_token"] for user in supabase.tables["users"]] == [None] * 5 + ["valid"]
+        assert supabase.tables["device_tokens_temp"] == [{"device_token": "valid"}]
@@ -0,0 +1,155 @@
+"""
+Unit tests for QueryBuilderService column projections
+
+Tests that select lists derived from response models honour exclusions,
+renames and embedded relations.
+"""
+
+import re
+from pathlib import Path
+from typing import Optional, Set
+
+from pydantic import BaseModel, Field
+
+from app.shared.services.query_builder_service import QueryBuilderService
+
+
+class AnalysisModel(BaseModel):
+    food_name: str
+    brand: Optional[str] = None
+
+
+class RecordModel(BaseModel):
+    id: str
+    amount_grams: float
+    notes: Optional[str] = None
+    food_analysis: Optional[AnalysisModel] = None
+    computed: Optional[int] = None
+    external: Optional[str] = Field(None, alias="external_ref")
+
+
+class TestColumnsForModel:
+    """Test suite for QueryBuilderService.columns_for_model"""
+
+    def test_plain_fields(self):
+        """Test fields map to columns, aliases win and exclusions are dropped"""
+        columns = QueryBuilderService.columns_for_model(RecordModel, exclude=["computed", "food_analysis"])
+
+        assert columns == ["id", "amount_grams", "notes", "external_ref"]
+
+    def test_rename(self):
+        """Test renamed fields are selected as field:column"""
+        columns = QueryBuilderService.columns_for_model(
+            RecordModel, exclude=["computed", "food_analysis"], rename={"notes": "description"}
+        )
+
+        assert "notes:description" in columns
+        assert "notes" not in columns
+
+    def test_embed_model_and_columns(self):
+        """Test embedded relations replace the field of the same name"""
+        columns = QueryBuilderService.columns_for_model(
+            RecordModel,
+            exclude=["computed"],
+            embed={"food_analysis:food_analyses": AnalysisModel, "pets": ["name"]}
+        )
+
+        assert "food_analysis" not in columns
+        assert columns[-2:] == ["food_analysis:food_analyses(food_name,brand)", "pets(name)"]
+
+    def test_cached_per_model(self):
+        """Test repeated projections come from the cache"""
+        QueryBuilderService.columns_for_model(AnalysisModel)
+        hits = QueryBuilderService._model_columns.cache_info().hits
+
+        QueryBuilderService.columns_for_model(AnalysisModel)
+
+        assert QueryBuilderService._model_columns.cache_info().hits == hits + 1
+
+
+class TestForModel:
+    """Test suite for QueryBuilderService.for_model"""
+
+    def test_selects_projection_with_count(self, make_supabase):
+        """Test the builder selects the projected columns and count mode"""
+        builder = QueryBuilderService.for_model(
+            make_supabase(),
+            "records",
+            AnalysisModel,
+            include_count=True,
+            count_method=QueryBuilderService.ESTIMATED_COUNT
+        )
+
+        assert (builder.query.call["columns"], builder.query.call["count"]) == ("food_name,brand", "estimated")
+
+
+SCHEMA_PATH = Path(__file__).resolve().parents[3] / "database_schemas" / "01_complete_database_schema.sql"
+_NOT_COLUMNS = {"CONSTRAINT", "PRIMARY", "UNIQUE", "FOREIGN", "CHECK", "EXCLUDE"}
+
+
+def schema_columns(table: str) -> Set[str]:
+    """Columns of a table in the complete schema (CREATE TABLE and ADD COLUMN)"""
+    schema = SCHEMA_PATH.read_text()
+    create = re.search(
+        rf"CREATE TABLE IF NOT EXISTS public\.{table} \((.*?)\n\);", schema, re.S
+    )
+    assert create, f"{table} not found in schema"
+    columns = set()
+    for line in create.group(1).splitlines():
+        name = line.strip().split(" ", 1)[0].strip('",')
+        if name and not name.startswith("--") and name.upper() not in _NOT_COLUMNS:
+            columns.add(name)
+    columns.update(re.findall(
+        rf"ALTER TABLE (?:public\.)?{table}\s+ADD COLUMN (?:IF NOT EXISTS )?(\w+)", schema
+    ))
+    return columns
+
+
+def projected_columns(columns) -> Set[str]:
+    """Table columns read by a select list (renames resolved, embeds skipped)"""
+    return {column.split(":", 1)[-1] for column in columns if "(" not in column}
+
+
+class TestProjectionsMatchSchema:
+    """Test that router projections only select columns the tables have"""
+
+    def test_food_items(self):
+        """Test the food_items projection (PostgREST rejects unknown columns)"""
+        from app.api.v1.food_management.router import FOOD_ITEM_RESPONSE_EXCLUDE
+        from app.models.nutrition.food_items import FoodItemResponse
+
+        columns = QueryBuilderService.columns_for_model(FoodItemResponse, exclude=FOOD_ITEM_RESPONSE_EXCLUDE)
+
+        assert projected_columns(columns) <= schema_columns("food_items")
+
+    def test_scans(self):
+        """Test the scans projection"""
+        from app.api.v1.scanning.router import SCAN_RESPONSE_EXCLUDE
+        from app.models.scanning.scan import ScanResponse
+
+        columns = QueryBuilderService.columns_for_model(ScanResponse, exclude=SCAN_RESPONSE_EXCLUDE)
+
+        assert projected_columns(columns) <= schema_columns("scans")
+
+    def test_feeding_records(self):
+        """Test the feeding_records projection and its embedded analysis columns"""
+        from app.api.v1.nutrition.feeding.router import (
+            FEEDING_RECORD_ANALYSIS_COLUMNS,
+            FEEDING_RECORD_JOINED_FIELDS,
+        )
+        from app.models.nutrition.nutrition import FeedingRecordResponse
+
+        columns = QueryBuilderService.columns_for_model(
+            FeedingRecordResponse, exclude=FEEDING_RECORD_JOINED_FIELDS
+        )
+
+        assert projected_columns(columns) <= schema_columns("feeding_records")
+        assert set(FEEDING_RECORD_ANALYSIS_COLUMNS) <= schema_columns("food_analyses")
+
+    def test_daily_nutrition_summaries(self):
+        """Test the daily summary projection used by NutritionSummaryService"""
+        from app.models.nutrition.nutrition import DailyNutritionSummaryResponse
+
+        columns = QueryBuilderService.columns_for_model(DailyNutritionSummaryResponse)
+
+        assert projected_columns(columns) <= schema_columns("daily_nutrition_summaries")
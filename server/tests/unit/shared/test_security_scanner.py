@@ -0,0 +1,175 @@
+"""
+Unit tests for the compiled security scanner and HTML sanitization fast path
+
+Tests that the single-pass scanner and profanity checks agree with the
+per-pattern checks they replace, and that skipping bleach for plain text
+does not change results.
+"""
+
+import re
+
+import bleach
+import pytest
+from fastapi import HTTPException
+
+from app.core.validation.input_validator import InputValidator
+from app.core.validation.security_patterns import (
+    DANGEROUS_PATTERNS,
+    INAPPROPRIATE_WORDS,
+    OBFUSCATION_PATTERNS,
+    SQL_INJECTION_PATTERNS,
+)
+from app.core.validation.security_scanner import (
+    DANGEROUS,
+    SQL_INJECTION,
+    SecurityScanner,
+    _split_literal_prefix,
+    contains_inappropriate_content,
+    scan_text,
+)
+from app.shared.services.html_sanitization_service import HTMLSanitizationService, SanitizationLevel
+
+SAMPLES = [
+    "",
+    "Rex threw up after breakfast, will call the vet tomorrow.",
+    "Mixed kibble and wet food",
+    "<script>alert(1)</script>",
+    "<IMG SRC=x onerror=alert(1)>",
+    "JavaScript:void(0)",
+    "select <b>name</b> from pets",
+    "1; DROP TABLE pets; --",
+    "see ../../etc/passwd",
+    "/* comment */ union   select *",
+    "style=\"behavior: url(x)\"",
+    "-moz-binding and @import",
+    "sleep(5) or pg_sleep (5)",
+    "a long note " * 40 + "<iframe src=x>",
+    "--moz-binding",
+    "<and 1=1 >",
+]
+
+
+def per_pattern_categories(text):
+    """The categories the previous one-search-per-pattern checks would find"""
+    text_lower = text.lower()
+    categories = set()
+    if any(re.search(p, text_lower, re.IGNORECASE) for p in DANGEROUS_PATTERNS):
+        categories.add(DANGEROUS)
+    if any(re.search(p, text_lower, re.IGNORECASE) for p in SQL_INJECTION_PATTERNS):
+        categories.add(SQL_INJECTION)
+    return categories
+
+
+def per_rule_inappropriate(text):
+    """The previous profanity check, rule by rule"""
+    text_lower = text.lower()
+    if any(word in text_lower for word in INAPPROPRIATE_WORDS):
+        return True
+    normalized = text_lower
+    for pattern, replacement in OBFUSCATION_PATTERNS:
+        normalized = re.sub(pattern, replacement, normalized)
+    if any(word in normalized for word in INAPPROPRIATE_WORDS):
+        return True
+    if re.search(r'(.)\1{2,}', text_lower):
+        return any(
+            re.search(''.join(c + '{1,}' for c in word), text_lower)
+            for word in INAPPROPRIATE_WORDS if len(word) > 2
+        )
+    return False
+
+
+class TestSecurityScanner:
+    """Test suite for scan_text"""
+
+    @pytest.mark.parametrize("text", SAMPLES)
+    def test_matches_per_pattern_search(self, text):
+        """Test the single pass finds the same categories as one search per pattern"""
+        assert set(scan_text(text).categories) == per_pattern_categories(text)
+
+    def test_every_pattern_is_reachable(self):
+        """Test each pattern is found when its own example text is scanned"""
+        scanner = SecurityScanner({"only": [r'union\s+select', r'sp_', r'<a[^>]*>']})
+
+        assert scanner.scan("UNION  SELECT").pattern_for("only") == r'union\s+select'
+        assert scanner.scan("x sp_who").pattern_for("only") == r'sp_'
+        assert scanner.scan("<a href=x>").pattern_for("only") == r'<a[^>]*>'
+        assert not scanner.scan("plain text")
+
+    def test_overlapping_matches_report_both_categories(self):
+        """Test a long match in one category does not hide another inside it"""
+        result = scan_text("select <script>x</script> from t")
+
+        assert result.categories == {DANGEROUS, SQL_INJECTION}
+        assert [category for category, _ in result.matches] == [DANGEROUS, SQL_INJECTION]
+
+    @pytest.mark.parametrize("text, categories", [
+        ("--moz-binding", {DANGEROUS, SQL_INJECTION}),
+        ("<and 1=1", {SQL_INJECTION}),
+        ("<a and b>", {DANGEROUS, SQL_INJECTION}),
+    ])
+    def test_match_starting_inside_another_is_found(self, text, categories):
+        """Test a match does not consume the text another category matches in"""
+        assert scan_text(text).categories == categories
+
+    def test_categories_matching_at_same_position(self):
+        """Test every category matching at one position is reported"""
+        scanner = SecurityScanner({"short": ["ab"], "long": [r"abc\d"]})
+
+        assert scanner.scan("xabc1").categories == {"short", "long"}
+        assert scanner.scan("xabc").categories == {"short"}
+
+    def test_split_literal_prefix(self):
+        """Test literal prefixes stop at regex syntax and quantified characters"""
+        assert _split_literal_prefix(r'union\s+select') == ("union", r'\s+select')
+        assert _split_literal_prefix(r'\.\./') == ("../", "")
+        assert _split_literal_prefix(r'ab*c') == ("a", "b*c")
+
+
+class TestInappropriateContent:
+    """Test suite for contains_inappropriate_content"""
+
+    @pytest.mark.parametrize("text", ["buddy", "d4mn_it", "sh!t", "fuuuck", "b-i-t-c-h", "happy_pup", "classic"])
+    def test_matches_per_rule_checks(self, text):
+        """Test the compiled checks agree with the rule-by-rule version"""
+        assert contains_inappropriate_content(text) == per_rule_inappropriate(text)
+
+
+class TestSanitizeText:
+    """Test suite for InputValidator.sanitize_text"""
+
+    def test_rejects_dangerous_before_sql(self):
+        """Test dangerous markup takes priority over SQL patterns"""
+        with pytest.raises(HTTPException) as exc_info:
+            InputValidator.sanitize_text("select <script>x</script> from t")
+
+        assert exc_info.value.detail == "Input contains potentially dangerous content"
+
+    def test_plain_text_passes(self):
+        """Test plain text is escaped and trimmed"""
+        assert InputValidator.sanitize_text("  rex's_food  ") == "rex&#x27;s_food"
+
+
+class TestHTMLSanitizationFastPath:
+    """Test suite for skipping bleach on plain text"""
+
+    @pytest.mark.parametrize("text", [
+        "plain note", "a > b", "fish & rice", "tab\tline\r\nbreak", "form\x0cfeed;", "nul\x00l", "<b>bold</b> text",
+    ])
+    @pytest.mark.parametrize("level", list(SanitizationLevel))
+    def test_matches_bleach(self, text, level):
+        """Test results equal a fresh bleach.clean call"""
+        if level == SanitizationLevel.STRICT:
+            expected = bleach.clean(text, tags=[], strip=True)
+        else:
+            tags = (HTMLSanitizationService.MODERATE_ALLOWED_TAGS if level == SanitizationLevel.MODERATE
+                    else HTMLSanitizationService.PERMISSIVE_ALLOWED_TAGS)
+            expected = bleach.clean(
+                text,
+                tags=tags,
+                attributes=HTMLSanitizationService.ALLOWED_ATTRIBUTES,
+                protocols=HTMLSanitizationService.ALLOWED_SCHEMES,
+                strip=True
+            )
+
+        assert HTMLSanitizationService.sanitize(text, level) == expected.strip()
+        assert HTMLSanitizationService.strip_tags(text) == bleach.clean(text, tags=[], strip=True)
@@ -0,0 +1,247 @@
+"""
+Unit tests for the storage upload pipeline
+
+Tests header-only validation, full verification of originals uploaded
+unoptimized, that spooled uploads are passed through as files, that
+optimized images and derivatives are streamed to storage from temporary
+files that are removed afterwards, content-addressed dedup per resource,
+removal of replaced pet images and derivative URLs.
+"""
+
+import asyncio
+import hashlib
+import os
+import tempfile
+from io import BufferedReader, BytesIO
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from PIL import Image
+
+from app.services import storage_service
+from app.services.image_optimizer import ImageOptimizerService
+from app.services.storage_service import StorageService
+
+
+def make_image(width, height, fmt='JPEG'):
+    img = Image.merge('RGB', [Image.effect_noise((width, height), 60) for _ in range(3)])
+    output = BytesIO()
+    img.save(output, format=fmt)
+    return output.getvalue()
+
+
+def spooled(data):
+    """Upload as Starlette hands it over: a spooled file at position 0"""
+    spool = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    spool.write(data)
+    spool.seek(0)
+    return spool
+
+
+class FakeBucket:
+    """Records what each upload sent, reading files the way httpx would"""
+
+    def __init__(self):
+        self.uploads = []
+        self.removed = []
+
+    def upload(self, path, file, file_options):
+        name = getattr(file, "name", None)
+        body = file if isinstance(file, bytes) else file.read()
+        self.uploads.append(SimpleNamespace(
+            path=path, file_type=type(file), name=name, body=body, options=file_options
+        ))
+        return SimpleNamespace(status_code=200)
+
+    def list(self, prefix):
+        """Immediate children of a folder, like the storage API"""
+        names = {
+            u.path[len(prefix) + 1:].split("/", 1)[0]
+            for u in self.uploads
+            if u.path.startswith(prefix + "/") and u.path not in self.removed
+        }
+        return [{"name": name} for name in sorted(names)]
+
+    def remove(self, paths):
+        self.removed.extend(paths)
+        return []
+
+    def get_public_url(self, path):
+        return f"https://storage.example/{path}?"
+
+
+@pytest.fixture
+def bucket(monkeypatch):
+    fake = FakeBucket()
+    client = SimpleNamespace(storage=SimpleNamespace(from_=lambda name: fake))
+    monkeypatch.setattr(storage_service, "get_supabase_client", lambda: client)
+    yield fake
+    ImageOptimizerService.shutdown_pool()
+
+
+class TestInspectImage:
+    """Test suite for ImageOptimizerService.inspect_image"""
+
+    def test_reads_header_and_restores_position(self):
+        """Test format and size come from the header and the file is not consumed"""
+        spool = spooled(make_image(640, 480))
+
+        info = ImageOptimizerService.inspect_image(spool)
+
+        assert info == {"format": "JPEG", "mode": "RGB", "width": 640, "height": 480}
+        assert spool.tell() == 0
+
+    def test_rejects_disallowed_format(self):
+        """Test formats outside ALLOWED_FORMATS are rejected"""
+        with pytest.raises(ValueError, match="Unsupported image format"):
+            ImageOptimizerService.inspect_image(make_image(10, 10, fmt='GIF'))
+
+    def test_rejects_too_many_pixels(self, monkeypatch):
+        """Test images over MAX_PIXELS are rejected before decoding"""
+        monkeypatch.setattr(ImageOptimizerService, "MAX_PIXELS", 100)
+
+        assert not ImageOptimizerService.validate_image(make_image(20, 20))
+
+    def test_rejects_non_image(self):
+        """Test data that is not an image is invalid"""
+        assert not ImageOptimizerService.validate_image(b"%PDF-1.4")
+
+
+class TestUploadPipeline:
+    """Test suite for StorageService uploads"""
+
+    def test_streams_optimized_file_and_removes_it(self, bucket):
+        """Test a spooled upload is optimized to a temp file that is streamed then deleted"""
+        url = asyncio.run(StorageService.upload_user_image(spooled(make_image(2000, 1500)), "user-1"))
+
+        upload = bucket.uploads[0]
+        assert url == "https://storage.example/user-1/profile.jpg?"
+        assert upload.file_type is BufferedReader
+        assert not os.path.exists(upload.name)
+        assert Image.open(BytesIO(upload.body)).size == (1024, 768)
+        assert upload.options["upsert"] == "true"
+
+    def test_stores_derivatives_under_content_hash(self, bucket):
+        """Test pet images are stored as every derivative in a folder named by their hash"""
+        data = make_image(2000, 1500)
+        prefix = f"user-1/pets/pet-1/{hashlib.sha256(data).hexdigest()}"
+
+        url = asyncio.run(StorageService.upload_pet_image(spooled(data), "user-1", "pet-1"))
+
+        assert url == f"https://storage.example/{prefix}/full.jpg?"
+        uploads = {upload.path: upload for upload in bucket.uploads}
+        assert sorted(uploads) == sorted(f"{prefix}/{name}" for name in StorageService.DERIVATIVE_FILES)
+        assert all(upload.file_type is BufferedReader for upload in uploads.values())
+        assert not os.path.exists(os.path.dirname(bucket.uploads[0].name))
+        assert Image.open(BytesIO(uploads[f"{prefix}/thumbnail.jpg"].body)).size == (200, 150)
+        assert Image.open(BytesIO(uploads[f"{prefix}/list.webp"].body)).format == "WEBP"
+        assert uploads[f"{prefix}/list.webp"].options["content-type"] == "image/webp"
+        assert uploads[f"{prefix}/full.jpg"].options["cache-control"] == StorageService.IMMUTABLE_CACHE_SECONDS
+
+    def test_identical_upload_is_deduplicated(self, bucket):
+        """Test uploading the same image again for a scan stores nothing new"""
+        data = make_image(600, 400)
+        first = asyncio.run(StorageService.upload_scan_image(data, "user-1", "scan-1"))
+        stored = len(bucket.uploads)
+
+        second = asyncio.run(StorageService.upload_scan_image(spooled(data), "user-1", "scan-1"))
+
+        assert second == first
+        assert len(bucket.uploads) == stored
+
+    def test_identical_images_are_not_shared_between_resources(self, bucket):
+        """Test two scans of the same image get their own folders"""
+        data = make_image(600, 400)
+        first = asyncio.run(StorageService.upload_scan_image(data, "user-1", "scan-1"))
+
+        second = asyncio.run(StorageService.upload_scan_image(data, "user-1", "scan-2"))
+
+        assert "/scans/scan-1/" in first and "/scans/scan-2/" in second
+        assert len(bucket.uploads) == 2 * len(StorageService.DERIVATIVE_FILES)
+
+    def test_replaced_pet_image_is_removed(self, bucket):
+        """Test a new pet image removes the previous image's derivatives only"""
+        old = make_image(600, 400)
+        new = make_image(400, 600)
+        old_prefix = f"user-1/pets/pet-1/{hashlib.sha256(old).hexdigest()}"
+        asyncio.run(StorageService.upload_pet_image(old, "user-1", "pet-1"))
+        asyncio.run(StorageService.upload_pet_image(old, "user-1", "pet-2"))
+
+        url = asyncio.run(StorageService.upload_pet_image(new, "user-1", "pet-1"))
+
+        assert hashlib.sha256(new).hexdigest() in url
+        assert set(bucket.removed) == {
+            *(f"{old_prefix}/{name}" for name in StorageService.DERIVATIVE_FILES),
+            "user-1/pets/pet-1.jpg",
+            "user-1/pets/pet-2.jpg",
+        }
+
+    def test_unoptimized_upload_sends_original(self, bucket):
+        """Test optimize=False uploads the original bytes"""
+        data = make_image(300, 200, fmt='PNG')
+
+        asyncio.run(StorageService.upload_scan_image(spooled(data), "user-1", "scan-1", optimize=False))
+
+        assert bucket.uploads[0].body == data
+        assert bucket.uploads[0].options["upsert"] == "false"
+        assert bucket.uploads[0].options["content-type"] == "image/png"
+
+    def test_truncated_image_is_not_uploaded(self, bucket, monkeypatch):
+        """Test a corrupt original is rejected when optimization fails"""
+        data = make_image(300, 200)[:-2000]
+
+        async def fail(*args, **kwargs):
+            raise ValueError("optimizer down")
+
+        monkeypatch.setattr(ImageOptimizerService, "optimize_upload_async", fail)
+
+        assert ImageOptimizerService.validate_image(data)
+        with pytest.raises(HTTPException) as exc_info:
+            asyncio.run(StorageService.upload_scan_image(spooled(data), "user-1", "scan-1"))
+
+        assert exc_info.value.status_code == 400
+        assert not bucket.uploads
+
+    def test_rejects_oversized_upload(self, bucket):
+        """Test the size limit is checked without reading the file"""
+        spool = spooled(b"\0" * (StorageService.BUCKETS["user_images"]["max_size"] + 1))
+
+        with pytest.raises(HTTPException) as exc_info:
+            asyncio.run(StorageService.upload_user_image(spool, "user-1"))
+
+        assert exc_info.value.status_code == 413
+        assert not bucket.uploads
+
+    def test_rejects_invalid_image(self, bucket):
+        """Test a non-image upload is rejected"""
+        with pytest.raises(HTTPException) as exc_info:
+            asyncio.run(StorageService.upload_user_image(b"not an image", "user-1"))
+
+        assert exc_info.value.status_code == 400
+
+
+class TestDerivativeUrls:
+    """Test suite for derivative URLs and paths"""
+
+    HASH = "a" * 64
+
+    def test_content_addressed_url(self):
+        """Test every size and format is derived from the full image URL"""
+        urls = StorageService.derivative_urls(f"https://x/object/public/pet-images/u/pets/{self.HASH}/full.jpg?")
+
+        assert urls["thumbnail"] == f"https://x/object/public/pet-images/u/pets/{self.HASH}/thumbnail.jpg?"
+        assert urls["list_webp"] == f"https://x/object/public/pet-images/u/pets/{self.HASH}/list.webp?"
+        assert len(urls) == len(StorageService.DERIVATIVE_FILES)
+
+    def test_single_file_url(self):
+        """Test older single-file images use the same URL for every size"""
+        url = "https://x/object/public/pet-images/u/pets/pet-1.jpg"
+
+        assert StorageService.derivative_urls(url) == {"full": url, "list": url, "thumbnail": url}
+        assert StorageService.derivative_urls(None) is None
+
+    def test_derivative_paths(self):
+        """Test deleting an image covers all its derivatives"""
+        assert len(StorageService.derivative_paths(f"u/scans/{self.HASH}/full.jpg")) == len(StorageService.DERIVATIVE_FILES)
+        assert StorageService.derivative_paths("u/scans/scan-1.jpg") == ["u/scans/scan-1.jpg"]
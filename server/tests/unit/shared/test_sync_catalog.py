@@ -0,0 +1,369 @@
+"""
+Unit tests for the incremental OpenPetFoodFacts catalog sync
+
+Tests content hashing, --since filtering of export lines, and that a batch
+is diffed against food_items into inserts, updates, timestamp-only touches,
+skips and source conflicts, with a row-by-row retry when a batch write fails,
+and that the --since auto watermark only advances after a complete run.
+"""
+
+import gzip
+import json
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import psycopg2
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "importing"))
+
+from sync_catalog import (  # noqa: E402
+    EXISTING_SQL,
+    INSERT_SQL,
+    SAVE_WATERMARK_SQL,
+    TOUCH_SQL,
+    UPDATE_SQL,
+    WATERMARK_SQL,
+    CatalogSync,
+    content_hash,
+    iter_products,
+    sync_watermark,
+)
+from app.shared.utils.product_extraction import SOURCE, extract_product  # noqa: E402
+
+MODIFIED = 1700000000
+
+
+def make_product(product_id="3000000000001", **overrides):
+    product = {
+        "_id": product_id,
+        "code": product_id,
+        "product_name": "Adult Dog Chicken Kibble",
+        "brands": "Acme",
+        "categories_tags": ["en:dog-food"],
+        "nutriments": {"energy-kcal_100g": 365, "proteins_100g": 24},
+        "last_modified_t": MODIFIED,
+    }
+    product.update(overrides)
+    return product
+
+
+def stored_row(product, row_id="row-1", source=SOURCE, modified=MODIFIED - 100, source_hash=None):
+    """A food_items row as returned by EXISTING_SQL"""
+    return {
+        "id": row_id,
+        "external_id": product["_id"],
+        "barcode": product["code"],
+        "external_source": source,
+        "last_updated_external": datetime.fromtimestamp(modified, tz=timezone.utc),
+        "source_hash": source_hash or content_hash(extract_product(product)),
+    }
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.description = None
+        self.rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        if sql == EXISTING_SQL:
+            self.conn.lookups.append(params)
+            columns = list(self.conn.existing[0]) if self.conn.existing else ["id"]
+            self.description = [(column,) for column in columns]
+            self.rows = [tuple(row[c] for c in columns) for row in self.conn.existing]
+        elif sql == WATERMARK_SQL:
+            self.rows = [(self.conn.watermark,)]
+        elif sql == SAVE_WATERMARK_SQL:
+            self.conn.saved_watermarks.append(params)
+        else:
+            rows = json.loads(params[0]) if params else None
+            if rows and len(rows) > 1 and sql in self.conn.fail_batches:
+                raise psycopg2.IntegrityError("duplicate key")
+            if rows and any(row.get("barcode") in self.conn.bad_barcodes for row in rows):
+                raise psycopg2.IntegrityError("duplicate key")
+            self.conn.writes.append((sql, rows))
+
+    def fetchall(self):
+        return self.rows
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+
+class FakeConnection:
+    """Answers EXISTING_SQL / WATERMARK_SQL and records every write"""
+
+    def __init__(self, existing=(), watermark=None, fail_batches=(), bad_barcodes=()):
+        self.existing = list(existing)
+        self.watermark = watermark
+        self.saved_watermarks = []
+        self.fail_batches = set(fail_batches)
+        self.bad_barcodes = set(bad_barcodes)
+        self.lookups = []
+        self.writes = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def written(self, sql):
+        return [row for statement, rows in self.writes if statement == sql for row in rows]
+
+
+class TestContentHash:
+    """Test suite for content_hash"""
+
+    def test_key_order_independent(self):
+        """Test records with the same fields in another order hash the same"""
+        record = extract_product(make_product())
+
+        assert content_hash(record) == content_hash(dict(reversed(list(record.items()))))
+
+    def test_ignores_export_timestamp(self):
+        """Test a re-export with only a newer last_modified_t keeps its hash"""
+        old = extract_product(make_product())
+        new = extract_product(make_product(last_modified_t=MODIFIED + 3600))
+
+        assert content_hash(old) == content_hash(new)
+
+    def test_content_change_changes_hash(self):
+        """Test a changed field gives a new hash"""
+        old = extract_product(make_product())
+        new = extract_product(make_product(brands="Other"))
+
+        assert content_hash(old) != content_hash(new)
+
+
+class TestIterProducts:
+    """Test suite for iter_products"""
+
+    def test_skips_lines_not_newer_than_since(self, tmp_path):
+        """Test old lines are skipped without parsing; lines without a timestamp are kept"""
+        export = tmp_path / "delta.jsonl"
+        export.write_text("\n".join([
+            '{"_id": "a", "last_modified_t": 100, broken json',
+            json.dumps({"_id": "b", "last_modified_t": 200}),
+            "",
+            json.dumps({"_id": "c"}),
+        ]))
+
+        assert [p["_id"] for p in iter_products([str(export)], since=100)] == ["b", "c"]
+
+    def test_reads_gzip_and_skips_invalid_json(self, tmp_path):
+        """Test .gz exports are read and unparseable lines are dropped"""
+        export = tmp_path / "delta.jsonl.gz"
+        with gzip.open(export, "wb") as file:
+            file.write(b'{"_id": "a"}\nnot json\n{"_id": "b"}\n')
+
+        assert [p["_id"] for p in iter_products([str(export)])] == ["a", "b"]
+
+    def test_sync_watermark(self):
+        """Test the stored watermark, or None before the first complete run"""
+        assert sync_watermark(FakeConnection(watermark=MODIFIED)) == MODIFIED
+        assert sync_watermark(FakeConnection(watermark=None)) is None
+
+
+class TestProcessBatch:
+    """Test suite for CatalogSync.process_batch"""
+
+    def test_new_product_is_inserted_with_derived_columns(self):
+        """Test an unknown product is inserted with hash, timestamp and quality score"""
+        conn = FakeConnection()
+        sync = CatalogSync(conn)
+
+        sync.process_batch([make_product()])
+
+        [row] = conn.written(INSERT_SQL)
+        assert row["external_id"] == "3000000000001"
+        assert row["source_hash"] == content_hash(extract_product(make_product()))
+        assert row["last_updated_external"] == datetime.fromtimestamp(MODIFIED, tz=timezone.utc).isoformat()
+        assert row["quality_score"] is not None
+        assert "quality_scored_at" not in row
+        assert sync.stats["inserted"] == 1
+        assert len(conn.lookups) == 1
+
+    def test_changed_product_is_updated(self):
+        """Test a stored product with another hash is updated by id"""
+        product = make_product()
+        conn = FakeConnection(existing=[stored_row(product, source_hash="old")])
+        sync = CatalogSync(conn)
+
+        sync.process_batch([product])
+
+        [row] = conn.written(UPDATE_SQL)
+        assert row["id"] == "row-1"
+        assert row["name"] == "Adult Dog Chicken Kibble"
+        assert sync.stats["updated"] == 1
+        assert not conn.written(INSERT_SQL)
+
+    def test_unchanged_content_only_touches_timestamp(self):
+        """Test a re-exported product with the same hash only moves last_updated_external"""
+        product = make_product(last_modified_t=MODIFIED + 3600)
+        conn = FakeConnection(existing=[stored_row(make_product())])
+        sync = CatalogSync(conn)
+
+        sync.process_batch([product])
+
+        assert conn.written(TOUCH_SQL) == [{
+            "id": "row-1",
+            "last_updated_external": datetime.fromtimestamp(MODIFIED + 3600, tz=timezone.utc).isoformat(),
+        }]
+        assert not conn.written(UPDATE_SQL)
+        assert (sync.stats["unchanged"], sync.stats["touched"]) == (1, 1)
+
+    def test_current_timestamp_is_skipped(self):
+        """Test a product whose stored timestamp is current is not extracted or written"""
+        product = make_product()
+        conn = FakeConnection(existing=[stored_row(product, modified=MODIFIED, source_hash="old")])
+        sync = CatalogSync(conn)
+
+        sync.process_batch([product])
+
+        assert not conn.writes
+        assert sync.stats["unchanged"] == 1
+
+    def test_barcode_from_other_source_is_a_conflict(self):
+        """Test a barcode owned by a row from another source is not overwritten"""
+        product = make_product()
+        row = stored_row(product, source="user_contribution", source_hash="old")
+        row["external_id"] = None
+        conn = FakeConnection(existing=[row])
+        sync = CatalogSync(conn)
+
+        sync.process_batch([product])
+
+        assert not conn.writes
+        assert sync.stats["conflicts"] == 1
+
+    def test_later_duplicate_wins_and_invalid_are_counted(self):
+        """Test a product repeated in a batch is written once, from its last occurrence"""
+        conn = FakeConnection()
+        sync = CatalogSync(conn)
+
+        sync.process_batch([
+            make_product(brands="First"),
+            make_product(brands="Second"),
+            make_product("3000000000002", product_name=""),
+            {"product_name": "No id"},
+        ])
+
+        assert [row["brand"] for row in conn.written(INSERT_SQL)] == ["Second"]
+        assert sync.stats["invalid"] == 2
+
+    def test_dry_run_counts_without_writing(self):
+        """Test a dry run reports changes but writes and commits nothing"""
+        conn = FakeConnection()
+        sync = CatalogSync(conn, dry_run=True)
+
+        sync.process_batch([make_product(), make_product("3000000000002")])
+
+        assert not conn.writes
+        assert conn.commits == 0
+        assert sync.stats["inserted"] == 2
+
+
+class TestWrite:
+    """Test suite for set-based writes and their fallback"""
+
+    def test_batch_is_one_statement(self):
+        """Test all inserts of a batch go out in one statement"""
+        conn = FakeConnection()
+        sync = CatalogSync(conn)
+
+        sync.process_batch([make_product(str(3000000000000 + i)) for i in range(5)])
+
+        assert len(conn.writes) == 1
+        assert len(conn.writes[0][1]) == 5
+
+    def test_failed_batch_is_retried_row_by_row(self):
+        """Test an integrity error retries each row and counts only the failing ones"""
+        conn = FakeConnection(fail_batches=[INSERT_SQL], bad_barcodes={"3000000000002"})
+        sync = CatalogSync(conn)
+
+        sync.process_batch([make_product(str(3000000000000 + i)) for i in range(1, 4)])
+
+        assert [rows[0]["barcode"] for _, rows in conn.writes] == ["3000000000001", "3000000000003"]
+        assert (sync.stats["inserted"], sync.stats["errors"]) == (2, 1)
+        assert conn.rollbacks == 2
+
+    def test_run_batches_products(self, tmp_path):
+        """Test run reads the export and processes it in batch_size chunks"""
+        export = tmp_path / "delta.jsonl"
+        export.write_text("\n".join(json.dumps(make_product(str(3000000000000 + i))) for i in range(5)))
+        conn = FakeConnection()
+
+        stats = CatalogSync(conn, batch_size=2).run([str(export)], since=None)
+
+        assert len(conn.lookups) == 3
+        assert (stats["read"], stats["inserted"]) == (5, 5)
+
+
+class TestWatermark:
+    """Test suite for the --since auto watermark"""
+
+    def write_export(self, tmp_path, offsets):
+        export = tmp_path / "delta.jsonl"
+        export.write_text("\n".join(
+            json.dumps(make_product(str(3000000000000 + i), last_modified_t=MODIFIED + offset))
+            for i, offset in enumerate(offsets)
+        ))
+        return str(export)
+
+    def test_complete_run_saves_newest_timestamp(self, tmp_path):
+        """Test an unsorted export advances the watermark to its newest product"""
+        conn = FakeConnection()
+
+        CatalogSync(conn, batch_size=2).run([self.write_export(tmp_path, [50, 300, 10])], since=None)
+
+        assert conn.saved_watermarks == [(SOURCE, MODIFIED + 300)]
+
+    def test_run_with_errors_keeps_watermark(self, tmp_path):
+        """Test products that failed to write are read again by the next auto run"""
+        conn = FakeConnection(bad_barcodes={"3000000000001"})
+
+        stats = CatalogSync(conn).run([self.write_export(tmp_path, [50, 300, 10])], since=None)
+
+        assert stats["errors"] == 1
+        assert not conn.saved_watermarks
+
+    def test_interrupted_run_keeps_watermark(self, tmp_path, monkeypatch):
+        """Test a run stopped after a later-timestamped batch committed saves nothing"""
+        conn = FakeConnection()
+        sync = CatalogSync(conn, batch_size=1)
+        process_batch = sync.process_batch
+
+        def interrupted(products):
+            if conn.writes:
+                raise KeyboardInterrupt
+            process_batch(products)
+
+        monkeypatch.setattr(sync, "process_batch", interrupted)
+
+        with pytest.raises(KeyboardInterrupt):
+            sync.run([self.write_export(tmp_path, [300, 10])], since=None)
+
+        assert len(conn.writes) == 1
+        assert not conn.saved_watermarks
+
+    def test_dry_run_keeps_watermark(self, tmp_path):
+        """Test a dry run does not move the watermark"""
+        conn = FakeConnection()
+
+        CatalogSync(conn, dry_run=True).run([self.write_export(tmp_path, [50])], since=None)
+
+        assert not conn.saved_watermarks
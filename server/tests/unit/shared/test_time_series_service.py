@@ -0,0 +1,113 @@
+"""
+Unit tests for time-series service
+
+Tests columnar record conversion and vectorized trend statistics.
+"""
+
+import statistics
+
+import pytest
+
+from app.shared.services.time_series_service import TimeSeries, TimeSeriesService
+
+
+class TestTimeSeries:
+    """Test suite for TimeSeries construction"""
+
+    def test_from_records_sorts_and_fills_missing(self):
+        """Test records are sorted by time and missing values become 0.0"""
+        # Arrange
+        records = [
+            {"trend_date": "2025-01-03", "total_calories": 320},
+            {"trend_date": "2025-01-01", "total_calories": None},
+            {"trend_date": "2025-01-02", "total_calories": "310"},
+            {"trend_date": None, "total_calories": 999},
+        ]
+
+        # Act
+        series = TimeSeries.from_records(records, "trend_date", ("total_calories",))
+
+        # Assert
+        assert len(series) == 3
+        assert series.column("total_calories").tolist() == [0.0, 310.0, 320.0]
+        assert series.elapsed_days().tolist() == [0.0, 1.0, 2.0]
+        assert series.span_days() == 2.0
+
+    def test_from_records_empty(self):
+        """Test an empty input produces an empty series"""
+        series = TimeSeries.from_records([], "date", ("calories",))
+
+        assert len(series) == 0
+        assert series.column("calories").size == 0
+        assert series.column("unknown").size == 0
+
+
+class TestTimeSeriesService:
+    """Test suite for time-series statistics"""
+
+    def test_stdev_and_variance_match_statistics_module(self):
+        """Test sample statistics match the stdlib definitions"""
+        values = [280, 300, 310, 295, 330]
+
+        assert TimeSeriesService.stdev(values) == pytest.approx(statistics.stdev(values))
+        assert TimeSeriesService.variance(values) == pytest.approx(statistics.variance(values))
+        assert TimeSeriesService.mean(values) == pytest.approx(statistics.mean(values))
+        assert TimeSeriesService.stdev([1]) == 0.0
+
+    def test_least_squares_exact_line(self):
+        """Test slope and intercept of a perfect linear series"""
+        fit = TimeSeriesService.least_squares([0, 1, 2, 3], [10, 12, 14, 16])
+
+        assert fit["slope"] == pytest.approx(2.0)
+        assert fit["intercept"] == pytest.approx(10.0)
+        assert fit["r_squared"] == pytest.approx(1.0)
+
+    def test_linear_trend_ignores_single_endpoint_outlier(self):
+        """Test a rising series is not flipped by one low final value"""
+        values = [100, 110, 120, 130, 140, 150, 160, 95]
+
+        result = TimeSeriesService.linear_trend(values)
+
+        assert result["trend"] == "increasing"
+
+    def test_linear_trend_insufficient_data(self):
+        """Test fewer than two points reports insufficient data"""
+        assert TimeSeriesService.linear_trend([5])["trend"] == "insufficient_data"
+
+    def test_rolling_mean(self):
+        """Test trailing rolling mean keeps input length"""
+        result = TimeSeriesService.rolling_mean([1, 2, 3, 10, 5], 3)
+
+        assert result.tolist() == pytest.approx([1.0, 1.5, 2.0, 5.0, 6.0])
+
+    def test_ewma_matches_recurrence(self):
+        """Test closed-form EWMA matches the recursive definition"""
+        values = [1, 2, 3, 10, 5]
+        expected = [values[0]]
+        for value in values[1:]:
+            expected.append(0.5 * value + 0.5 * expected[-1])
+
+        result = TimeSeriesService.ewma(values, alpha=0.5)
+
+        assert result.tolist() == pytest.approx(expected)
+
+    def test_correlation(self):
+        """Test Pearson correlation and constant-series handling"""
+        assert TimeSeriesService.correlation([1, 2, 3], [2, 4, 6]) == pytest.approx(1.0)
+        assert TimeSeriesService.correlation([1, 2, 3], [6, 4, 2]) == pytest.approx(-1.0)
+        assert TimeSeriesService.correlation([1, 2, 3], [5, 5, 5]) == 0.0
+
+    def test_seasonality_groups_by_season(self):
+        """Test per-season means are computed from the timestamps"""
+        records = [
+            {"date": "2025-01-10", "calories": 300},
+            {"date": "2025-02-10", "calories": 320},
+            {"date": "2025-07-10", "calories": 260},
+        ]
+        series = TimeSeries.from_records(records, "date", ("calories",))
+
+        result = TimeSeriesService.seasonality(series, ("calories",))
+
+        assert result["buckets"]["winter"] == {"count": 2, "calories": 310.0}
+        assert result["buckets"]["summer"] == {"count": 1, "calories": 260.0}
+        assert result["variation"]["calories"] > 0
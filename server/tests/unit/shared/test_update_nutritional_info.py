@@ -0,0 +1,196 @@
+"""
+Unit tests for the bulk nutritional_info updater
+
+Tests that records whose standardized document hashes the same as the stored
+one are skipped, that changed rows are split into batches of batch_size and
+failed batches are counted, and that transient request failures are retried
+with capped exponential backoff.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "standardizor"))
+
+import update_nutritional_info  # noqa: E402
+from update_nutritional_info import NutritionalInfoUpdater  # noqa: E402
+from app.shared.utils.product_extraction import standardize_nutritional_info  # noqa: E402
+
+URL = "https://example.supabase.co/rest/v1/rpc/bulk_update_food_nutritional_info"
+
+
+@pytest.fixture
+def updater(tmp_path):
+    # A missing export leaves the JSONL index closed, which these tests never use
+    return NutritionalInfoUpdater(
+        "https://example.supabase.co", "service-key",
+        jsonl_file=str(tmp_path / "missing.jsonl"), batch_size=2, workers=1
+    )
+
+
+def make_record(record_id, nutritional_info=None):
+    return {
+        "id": record_id,
+        "name": "Kibble",
+        "brand": "Acme",
+        "barcode": "3000000000001",
+        "nutritional_info": nutritional_info,
+    }
+
+
+def make_response(status_code, body=b"1"):
+    response = requests.Response()
+    response.status_code = status_code
+    response.url = URL
+    response._content = body
+    return response
+
+
+class FakeSession:
+    """requests.Session stand-in that replays queued responses or errors"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+class TestBuildUpdateRow:
+    """Test suite for the unchanged-content skip"""
+
+    def test_unchanged_document_is_skipped(self, updater):
+        """Test a stored document equal to the standardized one is not rewritten"""
+        data = {"protein": 25.0, "fat": 12.0}
+        record = make_record("item-1", dict(reversed(list(standardize_nutritional_info(data).items()))))
+
+        assert updater.build_update_row(record, data) is None
+
+    def test_changed_document_is_rescored(self, updater):
+        """Test a changed document yields the row with fresh quality columns"""
+        record = make_record("item-1", {"protein": 20.0})
+
+        row = updater.build_update_row(record, {"protein": 25.0})
+
+        assert row["id"] == "item-1"
+        assert row["nutritional_info"] == standardize_nutritional_info({"protein": 25.0})
+        assert {"quality_score", "quality_level", "quality_version"} <= row.keys()
+
+
+class TestRunBulkUpdate:
+    """Test suite for batching changed rows through the worker pool"""
+
+    def test_rows_are_split_into_batches(self, updater, monkeypatch):
+        """Test changed rows are sent batch_size at a time and unchanged ones counted"""
+        sent = []
+        monkeypatch.setattr(updater, "bulk_update_nutritional_info", lambda rows: sent.append(rows) or len(rows))
+        unchanged = standardize_nutritional_info({"protein": 1.0})
+        pages = [
+            [make_record(f"item-{i}") for i in range(3)],
+            [make_record("item-3"), make_record("item-4", unchanged), make_record("item-5")],
+        ]
+
+        def resolve(records):
+            return [None if record["id"] == "item-5" else {"protein": 1.0} for record in records]
+
+        stats = updater._run_bulk_update(iter(pages), resolve)
+
+        assert [[row["id"] for row in rows] for rows in sent] == [
+            ["item-0", "item-1"], ["item-2", "item-3"]
+        ]
+        assert stats["processed"] == 6
+        assert stats["queued"] == 4
+        assert stats["updated"] == 4
+        assert stats["unchanged"] == 1
+        assert stats["skipped"] == 1
+
+    def test_failed_batches_are_counted(self, updater, monkeypatch):
+        """Test a batch that fails after retries is counted, not raised"""
+        def bulk_update(rows):
+            if rows[0]["id"] == "item-0":
+                raise requests.exceptions.HTTPError("503")
+            return len(rows)
+
+        monkeypatch.setattr(updater, "bulk_update_nutritional_info", bulk_update)
+        pages = [[make_record(f"item-{i}") for i in range(3)]]
+
+        stats = updater._run_bulk_update(iter(pages), lambda records: [{"protein": 1.0}] * len(records))
+
+        assert stats["failed_batches"] == 1
+        assert stats["failed_rows"] == 2
+        assert stats["updated"] == 1
+
+    def test_dry_run_sends_nothing(self, updater, monkeypatch):
+        """Test dry runs count the batch without a request"""
+        updater.dry_run = True
+        monkeypatch.setattr(updater, "_request_with_retry", pytest.fail)
+
+        assert updater.bulk_update_nutritional_info([{"id": "item-1"}]) == 1
+
+
+class TestRequestWithRetry:
+    """Test suite for transient-failure retries"""
+
+    @pytest.fixture
+    def delays(self, monkeypatch):
+        delays = []
+        monkeypatch.setattr(update_nutritional_info.time, "sleep", delays.append)
+        # Take the upper bound of the jitter range so delays are deterministic
+        monkeypatch.setattr(update_nutritional_info.random, "uniform", lambda low, high: high)
+        return delays
+
+    def test_retries_transient_failures(self, updater, monkeypatch, delays):
+        """Test retryable statuses and connection errors back off exponentially"""
+        session = FakeSession(
+            make_response(503),
+            requests.exceptions.ConnectionError("reset"),
+            make_response(429),
+            make_response(200, b"2"),
+        )
+        monkeypatch.setattr(updater, "_session", lambda: session)
+
+        response = updater._request_with_retry("POST", URL, json={"p_rows": []})
+
+        assert response.json() == 2
+        assert session.calls == 4
+        assert delays == [0.5, 1.0, 2.0]
+
+    def test_backoff_is_capped(self, updater, monkeypatch, delays):
+        """Test the delay never exceeds BACKOFF_MAX_SECONDS"""
+        updater.MAX_RETRIES = 8
+        session = FakeSession(*[make_response(502)] * 8, make_response(200))
+        monkeypatch.setattr(updater, "_session", lambda: session)
+
+        updater._request_with_retry("GET", URL)
+
+        assert max(delays) == updater.BACKOFF_MAX_SECONDS
+
+    def test_gives_up_after_max_retries(self, updater, monkeypatch, delays):
+        """Test the last transient error is raised once retries are exhausted"""
+        session = FakeSession(*[make_response(504)] * (updater.MAX_RETRIES + 1))
+        monkeypatch.setattr(updater, "_session", lambda: session)
+
+        with pytest.raises(requests.exceptions.HTTPError):
+            updater._request_with_retry("POST", URL)
+
+        assert session.calls == updater.MAX_RETRIES + 1
+        assert len(delays) == updater.MAX_RETRIES
+
+    def test_client_errors_are_not_retried(self, updater, monkeypatch, delays):
+        """Test non-retryable statuses fail immediately"""
+        session = FakeSession(make_response(400))
+        monkeypatch.setattr(updater, "_session", lambda: session)
+
+        with pytest.raises(requests.exceptions.HTTPError):
+            updater._request_with_retry("POST", URL)
+
+        assert session.calls == 1
+        assert delays == []